@@ -48,109 +48,19 @@ except Exception:
         MAX_CONTENT_LENGTH: int = int(os.getenv("MAX_CONTENT_LENGTH", str(32 * 1024 * 1024)))  # 32 MB
 
 # ---------- Structured Logging
-class _JsonFormatter(logging.Formatter):
-    """
-    Production-ready JSON log formatter with structured fields.
-    
-    Includes: timestamp, level, logger name, message, request context,
-    user context, trace IDs, and custom fields.
-    """
-    def format(self, record: logging.LogRecord) -> str:
-        import socket
-        import threading
-        from datetime import datetime, timezone
-        
-        # Base payload with standard fields
-        payload = {
-            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
-            "level": record.levelname,
-            "logger": record.name,
-            "message": record.getMessage(),
-            "module": record.module,
-            "function": record.funcName,
-            "line": record.lineno,
-        }
-        
-        # Add process and thread information
-        payload["process_id"] = record.process
-        payload["process_name"] = record.processName
-        payload["thread_id"] = record.thread
-        payload["thread_name"] = record.threadName
-        
-        # Add hostname
-        try:
-            payload["hostname"] = socket.gethostname()
-        except Exception:
-            payload["hostname"] = "unknown"
-        
-        # Include request context if available (request_id, trace_id, user_id)
-        try:
-            from flask import has_request_context, request, g
-            from flask_login import current_user
-            
-            if has_request_context():
-                # Request ID (correlation ID)
-                request_id = getattr(g, "request_id", None)
-                if request_id:
-                    payload["request_id"] = request_id
-                
-                # HTTP context
-                payload["http"] = {
-                    "method": request.method,
-                    "path": request.path,
-                    "ip": request.remote_addr,
-                    "user_agent": request.headers.get("User-Agent", "unknown")[:200],  # Truncate
-                }
-                
-                # User context (if authenticated)
-                try:
-                    if current_user and current_user.is_authenticated:
-                        payload["user"] = {
-                            "id": str(current_user.id),
-                            "username": current_user.username
-                        }
-                except Exception:
-                    pass  # User context not available
-        except Exception:
-            pass  # Flask context not available (e.g., background task)
-        
-        # Add exception info if present
-        if record.exc_info:
-            payload["exception"] = {
-                "type": record.exc_info[0].__name__ if record.exc_info[0] else None,
-                "message": str(record.exc_info[1]) if record.exc_info[1] else None,
-                "traceback": self.formatException(record.exc_info) if record.exc_info else None
-            }
-        
-        # Add custom extra fields from LogRecord
-        # Logger can add custom fields like: logger.info("msg", extra={"custom_field": "value"})
-        for key, value in record.__dict__.items():
-            if key not in {
-                "name", "msg", "args", "created", "filename", "funcName", "levelname",
-                "levelno", "lineno", "module", "msecs", "message", "pathname", "process",
-                "processName", "relativeCreated", "thread", "threadName", "exc_info",
-                "exc_text", "stack_info", "getMessage", "asctime"
-            }:
-                payload[key] = value
-        
-        return json.dumps(payload, ensure_ascii=False, default=str)
-
 def _configure_logging(json_logs: bool = False) -> None:
     """
     Configure logging with optional JSON formatting.
     
-    This sets up a single handler on the root logger and ensures
-    Flask/Werkzeug loggers propagate to it (avoiding duplicates).
+    Root records go through the non-blocking queue pipeline (services.log_pipeline);
+    per-chunk log sites on the transcription path are rate limited per call site.
+    Flask/Werkzeug loggers propagate to root (avoiding duplicates).
     """
-    root = logging.getLogger()
-    root.handlers[:] = []  # reset
-    handler = logging.StreamHandler()
-    handler.setFormatter(
-        _JsonFormatter() if json_logs
-        else logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
-    )
-    root.addHandler(handler)
-    root.setLevel(logging.DEBUG)  # Temporarily DEBUG to diagnose OpenAI parsing issue
+    from services.log_pipeline import get_log_pipeline
+    
+    pipeline = get_log_pipeline()
+    pipeline.configure(json_logs=json_logs)
+    pipeline.limit_hot_paths()
     
     # Prevent duplicate logs by ensuring Flask/Werkzeug loggers propagate to root
     # instead of having their own handlers
@@ -352,6 +262,14 @@ def create_app() -> Flask:
     except Exception as e:
         app.logger.warning(f"⚠️ Request context middleware failed to load: {e}")
 
+    # Request latency histograms and the /metrics scrape endpoint
+    try:
+        from middleware.performance_middleware import setup_performance_middleware  # type: ignore
+        setup_performance_middleware(app)
+        app.logger.info("✅ Performance middleware enabled (/metrics)")
+    except Exception as e:
+        app.logger.warning(f"⚠️ Performance middleware failed to load: {e}")
+
     # Body size limits (Flask-Limiter handles rate limiting now)
     app.config.setdefault("MAX_JSON_BODY_BYTES", 5 * 1024 * 1024)  # 5MB
     app.config.setdefault("MAX_FORM_BODY_BYTES", 50 * 1024 * 1024)  # 50MB
@@ -443,10 +361,23 @@ def create_app() -> Flask:
             db.init_app(app)
             migrate = Migrate(app, db)
 
+            # Keep the daily workspace analytics rollup in step with writes
+            from services.analytics_rollup_service import get_analytics_rollup_service
+            get_analytics_rollup_service().install_listeners()
+
             # Create all tables that don't exist yet (development fallback)
             with app.app_context():
                 db.create_all()
 
+                # Premake upcoming event ledger partitions (no-op unless partitioned)
+                try:
+                    from services.ledger_partitions import get_ledger_partition_manager
+                    get_ledger_partition_manager().ensure_partitions(db.session.connection())
+                    db.session.commit()
+                except Exception as e:
+                    db.session.rollback()
+                    app.logger.warning(f"⚠️ Event ledger partition premake skipped: {e}")
+
             app.logger.info("✅ Database connected and initialized (migrations enabled)")
         except Exception as e:
             app.logger.warning(f"⚠️ Database initialization failed: {e}")
@@ -720,7 +651,9 @@ def create_app() -> Flask:
     # --- Flags Routes ---
     try:
         from routes.flags import flags_bp
+        from services.feature_flags import flags
         app.register_blueprint(flags_bp)
+        flags.init_app(app)
         app.logger.info("Blueprint registered: flags_bp")
     except Exception as e:
         app.logger.warning(f"Failed to register flags_bp: {e}")
@@ -1,42 +1,235 @@
 """
 Cache Decorator Middleware
 Provides Flask route decorators for Redis caching with automatic cache invalidation.
+
+Responses are cached as body + headers (never pickled Response objects) under
+keys that embed the current generation of each cache tag the response depends
+on (prefix:<prefix>, workspace:<id>, user:<id>, meeting:<id>). Invalidating a
+tag is one INCR of its generation counter: entries built for an older
+generation are never read again and age out on their TTL, so invalidation cost
+does not depend on how many entries exist and never touches other tenants.
+
+A small in-process L1 sits in front of Redis. Entries past their TTL are still
+served for `stale_while_revalidate` seconds while a single background request
+refreshes them. Every response carries an ETag, and clients sending a matching
+If-None-Match get a 304.
 """
 
 import logging
 import hashlib
 import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
 from functools import wraps
-from typing import Callable, Optional, Any
-from flask import request, g
+from typing import Callable, Optional, Any, Dict, List, Tuple, Union
+from flask import request, g, make_response, has_request_context, copy_current_request_context, Response
 from flask_login import current_user
 from services.redis_cache_service import get_cache_service
 
 logger = logging.getLogger(__name__)
 
+# Headers that must not be replayed from cache
+_UNCACHED_HEADERS = {'set-cookie', 'content-length', 'etag', 'x-cache', 'date', 'vary'}
+
+# Tags may be given as templates filled from route kwargs, e.g. 'meeting:{meeting_id}'
+TagSpec = Union[None, List[str], Callable[..., List[str]]]
+
+
+@dataclass
+class CachedResponse:
+    """Serialized response body and headers with freshness bounds (wall clock)"""
+    body: bytes
+    status: int
+    headers: List[Tuple[str, str]]
+    etag: str
+    fresh_until: float
+    stale_until: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        try:
+            body, encoding = self.body.decode('utf-8'), 'utf-8'
+        except UnicodeDecodeError:
+            body, encoding = self.body.hex(), 'hex'
+        return {
+            'body': body,
+            'encoding': encoding,
+            'status': self.status,
+            'headers': self.headers,
+            'etag': self.etag,
+            'fresh_until': self.fresh_until,
+            'stale_until': self.stale_until
+        }
+
+    @classmethod
+    def from_dict(cls, data: Any) -> Optional['CachedResponse']:
+        """Rebuild an entry; returns None for anything not written by to_dict()"""
+        if not isinstance(data, dict) or 'etag' not in data:
+            return None
+        body = data['body']
+        return cls(
+            body=bytes.fromhex(body) if data.get('encoding') == 'hex' else body.encode('utf-8'),
+            status=data['status'],
+            headers=[tuple(header) for header in data['headers']],
+            etag=data['etag'],
+            fresh_until=data['fresh_until'],
+            stale_until=data['stale_until']
+        )
+
+    @classmethod
+    def from_response(cls, response: Response, ttl: int, stale_ttl: int) -> 'CachedResponse':
+        body = response.get_data()
+        now = time.time()
+        return cls(
+            body=body,
+            status=response.status_code,
+            headers=[(k, v) for k, v in response.headers.items() if k.lower() not in _UNCACHED_HEADERS],
+            etag=_compute_etag(body),
+            fresh_until=now + ttl,
+            stale_until=now + ttl + stale_ttl
+        )
+
+    def to_response(self, cache_status: str) -> Response:
+        response = Response(self.body, status=self.status, headers=self.headers)
+        return _finalize(response, self.etag, cache_status)
+
+
+class LocalResponseCache:
+    """Bounded in-process LRU of cached responses (L1 in front of Redis)"""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.time() >= entry.stale_until:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CachedResponse):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
 
-def cache_response(ttl: int = 300, prefix: str = 'analytics', 
+class TagGenerations:
+    """
+    Process-local snapshot of tag generation counters.
+
+    Generations are re-read from Redis at most every check_interval seconds;
+    bumps made by this process apply immediately.
+    """
+
+    def __init__(self, check_interval: float = 0.5, max_tags: int = 10000, clock=time.monotonic):
+        self.check_interval = check_interval
+        self.max_tags = max_tags
+        self._clock = clock
+        self._generations: Dict[str, Tuple[int, float]] = {}  # tag -> (generation, checked_at)
+        self._lock = threading.Lock()
+
+    def current(self, cache_service, tags: List[str]) -> Optional[Dict[str, int]]:
+        """Generation of each tag, or None when expired ones cannot be re-read."""
+        now = self._clock()
+        with self._lock:
+            known = {tag: self._generations.get(tag) for tag in tags}
+        expired = [tag for tag, seen in known.items() if seen is None or now - seen[1] >= self.check_interval]
+
+        if expired:
+            fetched = cache_service.get_generations(expired)
+            if fetched is None:
+                return None
+            with self._lock:
+                if len(self._generations) + len(fetched) > self.max_tags:
+                    self._generations.clear()
+                for tag, generation in fetched.items():
+                    self._generations[tag] = (generation, now)
+                    known[tag] = (generation, now)
+
+        return {tag: known[tag][0] for tag in tags}
+
+    def bump(self, cache_service, tags: List[str]) -> Dict[str, int]:
+        generations = cache_service.bump_generation(*tags)
+        now = self._clock()
+        with self._lock:
+            for tag, generation in generations.items():
+                self._generations[tag] = (generation, now)
+        return generations
+
+    def clear(self):
+        with self._lock:
+            self._generations.clear()
+
+
+_local_cache = LocalResponseCache(int(os.environ.get('RESPONSE_CACHE_L1_SIZE', '256')))
+_tag_generations = TagGenerations(float(os.environ.get('CACHE_GENERATION_CHECK_INTERVAL', '0.5')))
+_refreshing: set = set()
+_refreshing_lock = threading.Lock()
+_stats_lock = threading.Lock()
+_stats = {
+    'l1_hits': 0,
+    'l2_hits': 0,
+    'stale_hits': 0,
+    'misses': 0,
+    'not_modified': 0,
+    'bypasses': 0,
+    'revalidations': 0,
+    'invalidations': 0
+}
+
+
+def _count(stat: str, amount: int = 1):
+    with _stats_lock:
+        _stats[stat] += amount
+
+
+def cache_response(ttl: int = 300, prefix: str = 'analytics',
                    key_func: Optional[Callable] = None,
-                   vary_on_user: bool = True):
+                   vary_on_user: bool = True,
+                   tags: TagSpec = None,
+                   stale_while_revalidate: int = 60):
     """
     Decorator to cache Flask route responses in Redis.
-    
+
     Args:
         ttl: Time-to-live in seconds (default: 300 = 5 minutes)
         prefix: Cache key prefix (analytics, session, transcription, etc.)
         key_func: Optional function to generate custom cache key
         vary_on_user: Include user ID in cache key (default: True)
-    
+        tags: Extra invalidation tags, as templates filled from route kwargs
+              (e.g. ['meeting:{meeting_id}']) or a callable(*args, **kwargs).
+              prefix:<prefix>, the current user's workspace:<id> (and user:<id>
+              when vary_on_user) and meeting:<meeting_id> are always included.
+        stale_while_revalidate: Seconds an expired entry may still be served
+                                while it is refreshed in the background
+
     Usage:
         @cache_response(ttl=600, prefix='analytics')
         @login_required
         def get_analytics():
             return jsonify({'data': expensive_computation()})
-    
+
     Example with custom key:
         def custom_key():
             return f"dashboard:{request.args.get('days', 7)}"
-        
+
         @cache_response(ttl=1800, key_func=custom_key)
         def get_dashboard():
             ...
@@ -44,68 +237,109 @@ def cache_response(ttl: int = 300, prefix: str = 'analytics',
     def decorator(f: Callable) -> Callable:
         @wraps(f)
         def decorated_function(*args, **kwargs):
-            cache_service = get_cache_service()
-            
-            # Skip caching if Redis not available or request method is not GET
-            if not cache_service.is_available() or request.method != 'GET':
+            if request.method != 'GET':
                 return f(*args, **kwargs)
-            
+
+            cache_service = get_cache_service()
+
+            # Without Redis, generations cannot be shared across workers: only
+            # attach an ETag so clients can still revalidate
+            if not cache_service.is_available():
+                response = make_response(f(*args, **kwargs))
+                if response.status_code == 200 and not response.is_streamed and not response.direct_passthrough:
+                    return _finalize(response, _compute_etag(response.get_data()), 'BYPASS')
+                return response
+
             try:
                 # Generate cache key
                 if key_func:
-                    cache_key = key_func()
+                    base_key = key_func()
                 else:
-                    cache_key = _generate_cache_key(
+                    base_key = _generate_cache_key(
                         route=request.endpoint or '',
                         args=args,
                         kwargs=kwargs,
                         query_params=request.args.to_dict(),
                         vary_on_user=vary_on_user
                     )
-                
-                # Try to get from cache
-                cached_response = cache_service.get(cache_key, prefix=prefix)
-                if cached_response is not None:
+                entry_tags = _resolve_tags(tags, prefix, vary_on_user, args, kwargs)
+                generations = _tag_generations.current(cache_service, entry_tags)
+            except Exception as e:
+                logger.error(f"❌ Cache decorator error: {e}")
+                return f(*args, **kwargs)
+
+            # Generations unreadable: an entry found now may already have been
+            # invalidated, so neither serve nor store one
+            if generations is None:
+                _count('bypasses')
+                return f(*args, **kwargs)
+
+            try:
+                cache_key = _versioned_key(base_key, generations)
+
+                # L1, then Redis
+                entry = _local_cache.get(cache_key)
+                if entry is not None:
+                    hit_stat = 'l1_hits'
+                else:
+                    entry = CachedResponse.from_dict(cache_service.get(cache_key, prefix=prefix))
+                    hit_stat = 'l2_hits'
+                    if entry is not None:
+                        _local_cache.set(cache_key, entry)
+
+                now = time.time()
+                if entry is not None and now < entry.fresh_until:
                     logger.debug(f"🎯 Cache HIT: {prefix}:{cache_key}")
-                    
-                    # Add cache header for debugging
-                    response_data = cached_response
-                    if isinstance(response_data, tuple):
-                        # Handle (response, status_code) tuples
-                        return response_data
-                    return response_data
-                
-                # Cache miss - execute function
-                logger.debug(f"💨 Cache MISS: {prefix}:{cache_key}")
-                result = f(*args, **kwargs)
-                
-                # Cache the result
-                cache_service.set(cache_key, result, ttl=ttl, prefix=prefix)
-                logger.debug(f"💾 Cached response: {prefix}:{cache_key} (TTL: {ttl}s)")
-                
-                return result
-                
+                    _count(hit_stat)
+                    return entry.to_response('HIT')
+
+                if entry is not None and now < entry.stale_until:
+                    logger.debug(f"🕰️ Cache STALE: {prefix}:{cache_key}")
+                    _count('stale_hits')
+                    _revalidate_in_background(cache_key, lambda: _store(
+                        cache_service, cache_key, prefix, make_response(f(*args, **kwargs)),
+                        ttl, stale_while_revalidate
+                    ))
+                    return entry.to_response('STALE')
+
             except Exception as e:
                 logger.error(f"❌ Cache decorator error: {e}")
                 # Fall back to executing function without cache
                 return f(*args, **kwargs)
-        
+
+            # Cache miss - execute function
+            logger.debug(f"💨 Cache MISS: {prefix}:{cache_key}")
+            _count('misses')
+            response = make_response(f(*args, **kwargs))
+
+            try:
+                entry = _store(cache_service, cache_key, prefix, response, ttl, stale_while_revalidate)
+                if entry is not None:
+                    return _finalize(response, entry.etag, 'MISS')
+            except Exception as e:
+                logger.error(f"❌ Cache store error: {e}")
+
+            return response
+
         return decorated_function
     return decorator
 
 
-def invalidate_cache(prefix: str, pattern: Optional[str] = None):
+def invalidate_cache(prefix: Optional[str] = None, pattern: Optional[str] = None, tags: TagSpec = None):
     """
     Decorator to invalidate cache entries after write operations.
-    
+
     Args:
         prefix: Cache prefix to invalidate (e.g., 'analytics', 'session')
-        pattern: Optional pattern to match specific keys (e.g., 'meeting:123:*')
-    
+        pattern: Optional pattern to match specific keys (e.g., 'meeting:123:*');
+                 scans the keyspace, prefer tags
+        tags: Tags to invalidate, as templates filled from route kwargs or a
+              callable(*args, **kwargs); O(1) per tag
+
     Usage:
-        @invalidate_cache(prefix='analytics', pattern='dashboard:*')
+        @invalidate_cache(tags=['meeting:{meeting_id}'])
         @login_required
-        def update_meeting():
+        def update_meeting(meeting_id):
             # Update meeting
             return jsonify({'success': True})
     """
@@ -114,49 +348,97 @@ def invalidate_cache(prefix: str, pattern: Optional[str] = None):
         def decorated_function(*args, **kwargs):
             # Execute the function first
             result = f(*args, **kwargs)
-            
+
             # Invalidate cache after successful execution
             try:
-                cache_service = get_cache_service()
-                if cache_service.is_available():
-                    if pattern:
+                if tags is not None:
+                    invalidate_tags(*_expand_tags(tags, args, kwargs))
+                elif pattern:
+                    cache_service = get_cache_service()
+                    if cache_service.is_available():
                         keys_to_delete = cache_service.get_keys_by_pattern(pattern, prefix=prefix)
                         for key in keys_to_delete:
                             cache_service.delete(key, prefix=prefix)
                         logger.info(f"🗑️ Invalidated {len(keys_to_delete)} cache entries: {prefix}:{pattern}")
-                    else:
-                        # Clear entire prefix
-                        deleted = cache_service.clear_prefix(prefix)
-                        logger.info(f"🗑️ Cleared cache prefix: {prefix} ({deleted} keys)")
+                elif prefix:
+                    # Drop the entire prefix
+                    invalidate_tags(f"prefix:{prefix}")
             except Exception as e:
                 logger.error(f"❌ Cache invalidation error: {e}")
-            
+
             return result
-        
+
         return decorated_function
     return decorator
 
 
-def invalidate_meeting_cache(meeting_id: int):
+def invalidate_tags(*tags: str) -> Dict[str, int]:
+    """
+    Invalidate every cached response depending on any of the tags.
+
+    Returns:
+        New generation per tag (empty if Redis is unavailable)
+    """
+    if not tags:
+        return {}
+    try:
+        cache_service = get_cache_service()
+        if not cache_service.is_available():
+            return {}
+        generations = _tag_generations.bump(cache_service, list(tags))
+        _count('invalidations', len(generations))
+        logger.info(f"🗑️ Invalidated cache tags: {', '.join(tags)}")
+        return generations
+    except Exception as e:
+        logger.error(f"❌ Cache tag invalidation error: {e}")
+        return {}
+
+
+def workspace_tag(workspace_id: Any) -> str:
+    return f"workspace:{workspace_id}"
+
+
+def meeting_tag(meeting_id: Any) -> str:
+    return f"meeting:{meeting_id}"
+
+
+def user_tag(user_id: Any) -> str:
+    return f"user:{user_id}"
+
+
+def current_workspace_tags(*args, **kwargs) -> List[str]:
+    """Tag of the current user's workspace (usable as a tags callable)."""
+    workspace_id = _current_user_attr('workspace_id')
+    return [workspace_tag(workspace_id)] if workspace_id is not None else []
+
+
+def invalidate_meeting_cache(meeting_id: int, workspace_id: Optional[int] = None):
     """
     Invalidate all cache entries related to a specific meeting.
-    
+
     Args:
         meeting_id: Meeting ID to invalidate cache for
+        workspace_id: Workspace the meeting belongs to (defaults to the current
+                      user's); its lists and dashboards are invalidated too
     """
     try:
+        if workspace_id is None:
+            workspace_id = _current_user_attr('workspace_id')
+
+        tags = [meeting_tag(meeting_id)]
+        if workspace_id is not None:
+            tags.append(workspace_tag(workspace_id))
+        else:
+            # Workspace unknown: fall back to dropping all meeting lists and analytics
+            tags.extend(['prefix:analytics', 'prefix:session'])
+        invalidate_tags(*tags)
+
         cache_service = get_cache_service()
         if cache_service.is_available():
-            # Invalidate analytics cache for this meeting
-            cache_service.delete(f"meeting:{meeting_id}", prefix='analytics')
-            
-            # Invalidate dashboard cache (contains meeting data)
-            cache_service.clear_prefix('analytics')
-            
             # Invalidate session cache if exists
             cache_service.delete(str(meeting_id), prefix='session')
-            
-            logger.info(f"🗑️ Invalidated cache for meeting {meeting_id}")
+
+        logger.info(f"🗑️ Invalidated cache for meeting {meeting_id}")
     except Exception as e:
         logger.error(f"❌ Error invalidating meeting cache: {e}")
 
@@ -164,72 +446,179 @@ def invalidate_meeting_cache(meeting_id: int):
 def invalidate_user_cache(user_id: Optional[int] = None):
     """
     Invalidate cache entries for a specific user.
-    
+
     Args:
         user_id: User ID to invalidate cache for (defaults to current_user)
     """
     try:
-        if user_id is None and hasattr(current_user, 'id'):
-            user_id = current_user.id
-        
+        if user_id is None:
+            user_id = _current_user_attr('id')
+
         if user_id is None:
             return
-        
-        cache_service = get_cache_service()
-        if cache_service.is_available():
-            # Invalidate user-specific analytics
-            pattern = f"*:user:{user_id}:*"
-            keys = cache_service.get_keys_by_pattern(pattern, prefix='analytics')
-            for key in keys:
-                cache_service.delete(key, prefix='analytics')
-            
-            logger.info(f"🗑️ Invalidated cache for user {user_id}")
+
+        invalidate_tags(user_tag(user_id))
+        logger.info(f"🗑️ Invalidated cache for user {user_id}")
     except Exception as e:
         logger.error(f"❌ Error invalidating user cache: {e}")
 
 
-def _generate_cache_key(route: str, args: tuple, kwargs: dict, 
+def get_response_cache_stats() -> Dict[str, Any]:
+    """Response cache hit ratios and invalidation counts."""
+    with _stats_lock:
+        stats = dict(_stats)
+    served = stats['l1_hits'] + stats['l2_hits'] + stats['stale_hits']
+    lookups = served + stats['misses']
+    stats['hit_ratio'] = round(served / lookups, 4) if lookups else 0.0
+    stats['l1_entries'] = len(_local_cache)
+    return stats
+
+
+def _generate_cache_key(route: str, args: tuple, kwargs: dict,
                         query_params: dict, vary_on_user: bool = True) -> str:
     """
     Generate a cache key based on route, arguments, and query parameters.
-    
+
     Returns:
         Cache key string
     """
     key_parts = [route]
-    
+
     # Add user ID if vary_on_user is True
-    if vary_on_user and hasattr(current_user, 'id'):
-        key_parts.append(f"user:{current_user.id}")
-    
+    user_id = _current_user_attr('id') if vary_on_user else None
+    if user_id is not None:
+        key_parts.append(f"user:{user_id}")
+
     # Add route arguments (e.g., meeting_id from URL)
     if args:
         key_parts.append(":".join(str(arg) for arg in args))
     if kwargs:
         key_parts.append(":".join(f"{k}={v}" for k, v in sorted(kwargs.items())))
-    
+
     # Add query parameters (sorted for consistent keys)
     if query_params:
         query_str = ":".join(f"{k}={v}" for k, v in sorted(query_params.items()))
         key_parts.append(query_str)
-    
+
     # Join all parts
     cache_key = ":".join(key_parts)
-    
+
     # Hash if too long (Redis key limit is 512MB but shorter is better)
     if len(cache_key) > 200:
         cache_key = hashlib.md5(cache_key.encode()).hexdigest()
-    
+
     return cache_key
 
 
+def _resolve_tags(tags: TagSpec, prefix: str, vary_on_user: bool, args: tuple, kwargs: dict) -> List[str]:
+    """Tags a cached response depends on"""
+    resolved = [f"prefix:{prefix}"]
+
+    workspace_id = _current_user_attr('workspace_id')
+    if workspace_id is not None:
+        resolved.append(workspace_tag(workspace_id))
+    if vary_on_user:
+        user_id = _current_user_attr('id')
+        if user_id is not None:
+            resolved.append(user_tag(user_id))
+    if 'meeting_id' in kwargs:
+        resolved.append(meeting_tag(kwargs['meeting_id']))
+
+    for tag in _expand_tags(tags, args, kwargs):
+        if tag not in resolved:
+            resolved.append(tag)
+    return resolved
+
+
+def _expand_tags(tags: TagSpec, args: tuple, kwargs: dict) -> List[str]:
+    if tags is None:
+        return []
+    if callable(tags):
+        return list(tags(*args, **kwargs))
+    return [tag.format(**kwargs) for tag in tags]
+
+
+def _versioned_key(base_key: str, generations: Dict[str, int]) -> str:
+    """Embed tag generations in the key so bumping any of them orphans the entry"""
+    version = "|".join(f"{tag}={generation}" for tag, generation in generations.items())
+    return f"{base_key}:g{hashlib.md5(version.encode()).hexdigest()[:12]}"
+
+
+def _current_user_attr(name: str) -> Optional[Any]:
+    if not has_request_context():
+        return None
+    try:
+        return getattr(current_user, name, None)
+    except Exception:
+        return None
+
+
+def _compute_etag(body: bytes) -> str:
+    return hashlib.sha1(body).hexdigest()
+
+
+def _finalize(response: Response, etag: str, cache_status: str) -> Response:
+    """Attach ETag and cache status; turn into a 304 if If-None-Match matches"""
+    response.set_etag(etag)
+    response.headers['X-Cache'] = cache_status
+    response = response.make_conditional(request)
+    if response.status_code == 304:
+        _count('not_modified')
+    return response
+
+
+def _store(cache_service, cache_key: str, prefix: str, response: Response,
+           ttl: int, stale_ttl: int) -> Optional[CachedResponse]:
+    """Cache a successful response in Redis and L1"""
+    if response.status_code != 200 or response.is_streamed or response.direct_passthrough:
+        return None
+
+    entry = CachedResponse.from_response(response, ttl, stale_ttl)
+    cache_service.set(cache_key, entry.to_dict(), ttl=ttl + stale_ttl, prefix=prefix)
+    _local_cache.set(cache_key, entry)
+    logger.debug(f"💾 Cached response: {prefix}:{cache_key} (TTL: {ttl}s + {stale_ttl}s stale)")
+    return entry
+
+
+def _revalidate_in_background(cache_key: str, refresh: Callable[[], Any]):
+    """Run one refresh per key in a thread bound to a copy of the request context"""
+    with _refreshing_lock:
+        if cache_key in _refreshing:
+            return
+        _refreshing.add(cache_key)
+
+    def run():
+        try:
+            refresh()
+            _count('revalidations')
+        except Exception as e:
+            logger.error(f"❌ Cache revalidation error for {cache_key}: {e}")
+        finally:
+            with _refreshing_lock:
+                _refreshing.discard(cache_key)
+
+    try:
+        threading.Thread(target=copy_current_request_context(run), daemon=True).start()
+    except Exception as e:
+        with _refreshing_lock:
+            _refreshing.discard(cache_key)
+        logger.error(f"❌ Could not start cache revalidation: {e}")
+
+
 # Convenience cache invalidation helpers
-def invalidate_analytics_cache():
-    """Clear all analytics cache entries."""
-    cache_service = get_cache_service()
-    if cache_service.is_available():
-        deleted = cache_service.clear_prefix('analytics')
-        logger.info(f"🗑️ Cleared analytics cache ({deleted} keys)")
+def invalidate_analytics_cache(workspace_id: Optional[int] = None):
+    """
+    Invalidate analytics cache entries.
+
+    Args:
+        workspace_id: Only invalidate this workspace; all analytics otherwise
+    """
+    if workspace_id is not None:
+        invalidate_tags(workspace_tag(workspace_id))
+        logger.info(f"🗑️ Invalidated analytics cache for workspace {workspace_id}")
+    else:
+        invalidate_tags('prefix:analytics')
+        logger.info("🗑️ Invalidated analytics cache")
 
 
 def invalidate_session_cache_by_id(session_id: str):
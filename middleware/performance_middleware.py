@@ -2,8 +2,9 @@
 Flask middleware for automatic performance tracking.
 """
 import time
-from flask import request, g
+from flask import request, g, Response
 from services.performance_monitoring import performance_monitor
+from services.metrics_registry import CONTENT_TYPE
 import logging
 
 logger = logging.getLogger(__name__)
@@ -11,36 +12,40 @@ logger = logging.getLogger(__name__)
 
 def setup_performance_middleware(app):
     """Setup performance monitoring middleware for Flask app."""
-    
+
     @app.before_request
     def before_request():
         """Record request start time."""
-        g.start_time = time.time()
-    
+        g.start_time = time.perf_counter()
+
     @app.after_request
     def after_request(response):
         """Track request performance after completion."""
         if hasattr(g, 'start_time'):
-            duration_ms = (time.time() - g.start_time) * 1000
-            
+            duration_ms = (time.perf_counter() - g.start_time) * 1000
+
+            # Endpoint names keep the route label bounded; raw paths of
+            # unmatched requests (404 scans) would not be
             performance_monitor.track_request(
-                route=request.endpoint or request.path,
+                route=request.endpoint or 'unmatched',
                 method=request.method,
                 duration_ms=duration_ms,
                 status_code=response.status_code
             )
-            
+
             response.headers['X-Response-Time'] = f"{duration_ms:.2f}ms"
-        
+
         return response
-    
+
     @app.route('/metrics')
     def metrics_endpoint():
-        """Endpoint for monitoring tools to scrape metrics."""
-        stats = performance_monitor.get_stats()
-        return {
-            'status': 'ok',
-            'performance': stats
-        }, 200
-    
+        """Endpoint for monitoring tools to scrape metrics (Prometheus text format)."""
+        if request.args.get('format') == 'json':
+            return {
+                'status': 'ok',
+                'performance': performance_monitor.get_stats(),
+                'metrics': performance_monitor.registry.snapshot()
+            }, 200
+        return Response(performance_monitor.registry.expose(), mimetype=CONTENT_TYPE)
+
     logger.info("Performance monitoring middleware initialized")
@@ -0,0 +1,39 @@
+"""Add feature flag rollouts and the shared flag version counter
+
+Revision ID: feature_flag_rollouts
+Revises: event_ledger_partitions
+Create Date: 2026-10-18
+
+Percentage and user-targeted rollouts on feature_flags, plus the single-row
+feature_flag_versions counter that workers poll to pick up flag changes when
+Redis is not configured.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'feature_flag_rollouts'
+down_revision = 'event_ledger_partitions'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Add rollout columns and create the flag version counter."""
+    op.add_column('feature_flags', sa.Column('rollout_percentage', sa.Float(), nullable=True))
+    op.add_column('feature_flags', sa.Column('target_users', sa.JSON(), nullable=True))
+    op.create_table(
+        'feature_flag_versions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.execute("INSERT INTO feature_flag_versions (id, version) VALUES (1, 0)")
+
+
+def downgrade():
+    """Drop the flag version counter and rollout columns."""
+    op.drop_table('feature_flag_versions')
+    op.drop_column('feature_flags', 'target_users')
+    op.drop_column('feature_flags', 'rollout_percentage')
@@ -0,0 +1,55 @@
+"""Add workspace_daily_rollups table for dashboard analytics
+
+Revision ID: workspace_daily_rollups
+Revises: crown45_task_fields
+Create Date: 2026-10-18
+
+Populate existing data with scripts/backfill_analytics_rollup.py.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'workspace_daily_rollups'
+down_revision = 'crown45_task_fields'
+branch_labels = None
+depends_on = None
+
+INT_COLUMNS = (
+    'meeting_count', 'live_meeting_count', 'analyzed_meeting_count', 'duration_count',
+    'efficiency_count', 'effectiveness_count', 'engagement_count', 'sentiment_count',
+    'decisions_sum', 'action_items_sum', 'task_count', 'completed_task_count',
+    'completion_days_sum', 'completion_days_count', 'low_priority_task_count',
+    'medium_priority_task_count', 'high_priority_task_count', 'urgent_priority_task_count',
+    'tasks_created_count',
+)
+FLOAT_COLUMNS = (
+    'duration_minutes_sum', 'efficiency_sum', 'effectiveness_sum', 'engagement_sum', 'sentiment_sum',
+)
+
+
+def upgrade():
+    """Create the daily per-workspace analytics rollup table and its supporting indexes."""
+    op.create_table(
+        'workspace_daily_rollups',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('workspace_id', sa.Integer(), sa.ForeignKey('workspaces.id'), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        *[sa.Column(name, sa.Integer(), nullable=True) for name in INT_COLUMNS],
+        *[sa.Column(name, sa.Float(), nullable=True) for name in FLOAT_COLUMNS],
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('workspace_id', 'day', name='uq_workspace_daily_rollups_workspace_day'),
+    )
+    
+    # Indexes for recomputing a day's bucket
+    op.create_index('ix_meetings_workspace_created', 'meetings', ['workspace_id', 'created_at'])
+    op.create_index('ix_tasks_created_at', 'tasks', ['created_at'])
+
+
+def downgrade():
+    """Drop the daily per-workspace analytics rollup table."""
+    op.drop_index('ix_tasks_created_at', table_name='tasks')
+    op.drop_index('ix_meetings_workspace_created', table_name='meetings')
+    op.drop_table('workspace_daily_rollups')
@@ -0,0 +1,113 @@
+"""Partition event_ledger by created_at on PostgreSQL
+
+Revision ID: event_ledger_partitions
+Revises: workspace_daily_rollups
+Create Date: 2026-10-18
+
+Rebuilds event_ledger as a RANGE (created_at) partitioned table with daily
+partitions covering existing rows plus a week ahead and a DEFAULT partition.
+Further partitions are premade by services/ledger_partitions.py. The primary
+key becomes (id, created_at) and the parent_event_id self-reference loses its
+foreign key, since PostgreSQL requires unique constraints on a partitioned
+table to include the partition key. Other databases only get the new
+compaction_summaries column.
+
+"""
+from datetime import date, timedelta
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'event_ledger_partitions'
+down_revision = 'workspace_daily_rollups'
+branch_labels = None
+depends_on = None
+
+PREMAKE_DAYS = 7
+
+INDEXES = (
+    ('ix_event_ledger_event_type', ['event_type']),
+    ('ix_event_ledger_session_id', ['session_id']),
+    ('ix_event_ledger_external_session_id', ['external_session_id']),
+    ('ix_event_ledger_status', ['status']),
+    ('ix_event_ledger_created_at', ['created_at']),
+    ('ix_event_ledger_trace_id', ['trace_id']),
+    ('ix_event_ledger_idempotency_key', ['idempotency_key']),
+    ('ix_event_ledger_sequence_num', ['sequence_num']),
+    ('ix_event_ledger_session_created', ['session_id', 'created_at']),
+    ('ix_event_ledger_type_status', ['event_type', 'status']),
+    ('ix_event_ledger_trace_created', ['trace_id', 'created_at']),
+    ('ix_event_ledger_sequence', ['sequence_num']),
+)
+
+
+def _has_table(bind, name):
+    return sa.inspect(bind).has_table(name)
+
+
+def _create_indexes():
+    for name, columns in INDEXES:
+        op.create_index(name, 'event_ledger', columns)
+
+
+def upgrade():
+    """Partition event_ledger and record retired partitions in compaction summaries."""
+    bind = op.get_bind()
+    if _has_table(bind, 'compaction_summaries'):
+        columns = {c['name'] for c in sa.inspect(bind).get_columns('compaction_summaries')}
+        if 'partition_name' not in columns:
+            op.add_column('compaction_summaries', sa.Column('partition_name', sa.String(64), nullable=True))
+
+    if bind.dialect.name != 'postgresql' or not _has_table(bind, 'event_ledger'):
+        return
+
+    op.execute("ALTER TABLE event_ledger RENAME TO event_ledger_unpartitioned")
+    op.execute("ALTER INDEX IF EXISTS event_ledger_pkey RENAME TO event_ledger_unpartitioned_pkey")
+    op.execute("ALTER SEQUENCE IF EXISTS event_ledger_id_seq OWNED BY NONE")
+    for name, _ in INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+    op.execute(
+        "CREATE TABLE event_ledger (LIKE event_ledger_unpartitioned INCLUDING DEFAULTS) "
+        "PARTITION BY RANGE (created_at)"
+    )
+    op.execute("ALTER TABLE event_ledger ADD PRIMARY KEY (id, created_at)")
+    op.execute(
+        "ALTER TABLE event_ledger ADD FOREIGN KEY (session_id) REFERENCES sessions (id) ON DELETE CASCADE"
+    )
+    op.execute("CREATE TABLE event_ledger_default PARTITION OF event_ledger DEFAULT")
+
+    oldest = bind.execute(sa.text("SELECT min(created_at) FROM event_ledger_unpartitioned")).scalar()
+    day = oldest.date() if oldest else date.today()
+    while day <= date.today() + timedelta(days=PREMAKE_DAYS):
+        op.execute(
+            f"CREATE TABLE event_ledger_p{day:%Y%m%d} PARTITION OF event_ledger "
+            f"FOR VALUES FROM ('{day:%Y-%m-%d}') TO ('{day + timedelta(days=1):%Y-%m-%d}')"
+        )
+        day += timedelta(days=1)
+
+    op.execute("INSERT INTO event_ledger SELECT * FROM event_ledger_unpartitioned")
+    op.execute("DROP TABLE event_ledger_unpartitioned")
+    op.execute("ALTER SEQUENCE IF EXISTS event_ledger_id_seq OWNED BY event_ledger.id")
+    _create_indexes()
+
+
+def downgrade():
+    """Fold the partitions back into a single event_ledger table."""
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql' and _has_table(bind, 'event_ledger'):
+        op.execute("ALTER SEQUENCE IF EXISTS event_ledger_id_seq OWNED BY NONE")
+        op.execute("CREATE TABLE event_ledger_single (LIKE event_ledger INCLUDING DEFAULTS)")
+        op.execute("INSERT INTO event_ledger_single SELECT * FROM event_ledger")
+        op.execute("DROP TABLE event_ledger CASCADE")
+        op.execute("ALTER TABLE event_ledger_single RENAME TO event_ledger")
+        op.execute("ALTER TABLE event_ledger ADD PRIMARY KEY (id)")
+        op.execute(
+            "ALTER TABLE event_ledger ADD FOREIGN KEY (session_id) REFERENCES sessions (id) ON DELETE CASCADE"
+        )
+        op.execute("ALTER TABLE event_ledger ADD FOREIGN KEY (parent_event_id) REFERENCES event_ledger (id)")
+        op.execute("ALTER SEQUENCE IF EXISTS event_ledger_id_seq OWNED BY event_ledger.id")
+        _create_indexes()
+
+    if _has_table(bind, 'compaction_summaries'):
+        op.drop_column('compaction_summaries', 'partition_name')
@@ -33,6 +33,7 @@ from .copilot_template import CopilotTemplate
 from .copilot_conversation import CopilotConversation
 from .event_ledger import EventLedger, EventType, EventStatus
 from .compaction_summary import CompactionSummary
+from .workspace_rollup import WorkspaceDailyRollup
 
 # Import Summary last to avoid circular imports
 try:
@@ -42,11 +43,11 @@ except ImportError:
     Summary = None
 
 # Import Feature Flags models
-from .core_models import FeatureFlag, FlagAuditLog
+from .core_models import FeatureFlag, FeatureFlagVersion, FlagAuditLog
 
 __all__ = [
     'db', 'Base', 'Session', 'Segment', 'Summary', 'SharedLink', 'TeamShare', 'ShareAnalytic',
     'ChunkMetric', 'SessionMetric', 'User', 'Workspace', 'Meeting', 
     'Participant', 'Task', 'TaskViewState', 'TaskCounters', 'OfflineQueue', 'CalendarEvent', 'Analytics', 'Marker', 'Comment', 'CopilotTemplate',
-    'CopilotConversation', 'EventLedger', 'EventType', 'EventStatus', 'CompactionSummary', 'FeatureFlag', 'FlagAuditLog'
+    'CopilotConversation', 'EventLedger', 'EventType', 'EventStatus', 'CompactionSummary', 'WorkspaceDailyRollup', 'FeatureFlag', 'FeatureFlagVersion', 'FlagAuditLog'
 ]
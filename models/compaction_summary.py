@@ -35,6 +35,7 @@ class CompactionSummary(Base):
     # Date range of compacted events
     earliest_event_date: Mapped[datetime] = mapped_column(DateTime, nullable=True)
     latest_event_date: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    partition_name: Mapped[str] = mapped_column(String(64), nullable=True)  # Retired ledger partition
     
     # Compaction results
     events_deleted: Mapped[int] = mapped_column(Integer, default=0)
@@ -56,6 +57,7 @@ class CompactionSummary(Base):
             'avg_duration_ms': self.avg_duration_ms,
             'earliest_event_date': self.earliest_event_date.isoformat() if self.earliest_event_date else None,
             'latest_event_date': self.latest_event_date.isoformat() if self.latest_event_date else None,
+            'partition_name': self.partition_name,
             'events_deleted': self.events_deleted,
             'compaction_success': self.compaction_success,
             'error_message': self.error_message
@@ -10,8 +10,16 @@ class FeatureFlag(db.Model):
     key = db.Column(db.String(80), unique=True, nullable=False, index=True)
     enabled = db.Column(db.Boolean, default=False, nullable=False)
     note = db.Column(db.String(255))
+    rollout_percentage = db.Column(db.Float)  # None = everyone when enabled
+    target_users = db.Column(db.JSON)  # User ids always included while enabled
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    def to_dict(self): return {"key": self.key, "enabled": self.enabled, "note": self.note, "updated_at": self.updated_at.isoformat()}
+    def to_dict(self): return {"key": self.key, "enabled": self.enabled, "note": self.note, "rollout_percentage": self.rollout_percentage, "target_users": self.target_users or [], "updated_at": self.updated_at.isoformat()}
+
+class FeatureFlagVersion(db.Model):
+    """Single-row counter bumped on every flag write; polled by each process."""
+    __tablename__ = "feature_flag_versions"
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.BigInteger, default=0, nullable=False)
 
 class FlagAuditLog(db.Model):
     __tablename__ = "flag_audit_logs"
@@ -3,12 +3,22 @@ EventLedger Model - Atomic event tracking for CROWN+ Event Sequencing
 
 Every event in Mina is tracked for auditability, replay, and debugging.
 Ensures atomic, idempotent, and traceable event history.
+
+On PostgreSQL event_ledger is partitioned by created_at (see
+migrations/versions/partition_event_ledger.py): the primary key is
+(id, created_at) and parent_event_id carries no foreign key, because unique
+constraints on a partitioned table must include the partition key. The ORM
+still identifies events by id alone.
 """
 
 from datetime import datetime
 from typing import Optional, Dict, Any
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import String, Integer, DateTime, JSON, Enum as SQLEnum, Index, ForeignKey, Text, func
+from sqlalchemy import (
+    String, Integer, DateTime, JSON, Enum as SQLEnum, Index, ForeignKey, Text, func, PrimaryKeyConstraint
+)
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.schema import CreateColumn
 import enum
 from .base import Base
 
@@ -107,7 +117,9 @@ class EventLedger(Base):
     )
     
     # Timing
-    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), nullable=False, index=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, primary_key=True, server_default=func.now(), nullable=False, index=True
+    )
     started_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
     completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
     
@@ -118,10 +130,7 @@ class EventLedger(Base):
     
     # Tracing and correlation
     trace_id: Mapped[Optional[str]] = mapped_column(String(64), nullable=True, index=True)  # For distributed tracing
-    parent_event_id: Mapped[Optional[int]] = mapped_column(
-        ForeignKey('event_ledger.id'),
-        nullable=True
-    )
+    parent_event_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)  # No FK on a partitioned table
     
     # Performance tracking
     duration_ms: Mapped[Optional[float]] = mapped_column(nullable=True)  # Event processing time
@@ -147,6 +156,7 @@ class EventLedger(Base):
         Index('ix_event_ledger_trace_created', 'trace_id', 'created_at'),
         Index('ix_event_ledger_sequence', 'sequence_num'),
     )
+    __mapper_args__ = {'primary_key': [id]}
     
     def __repr__(self):
         return f'<EventLedger {self.event_type.value} session={self.external_session_id} status={self.status.value}>'
@@ -190,3 +200,21 @@ class EventLedger(Base):
     def processing_time_seconds(self) -> Optional[float]:
         """Get processing time in seconds"""
         return self.duration_ms / 1000.0 if self.duration_ms else None
+
+
+
+# SQLite cannot autoincrement a column of a composite primary key: there, id
+# stays the rowid alias and (id, created_at) is kept as a unique constraint.
+@compiles(CreateColumn, 'sqlite')
+def _sqlite_ledger_id(element, compiler, **kw):
+    column = element.element
+    if column.table is not None and column.table.name == EventLedger.__tablename__ and column.name == 'id':
+        return f"{compiler.preparer.format_column(column)} INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT"
+    return compiler.visit_create_column(element, **kw)
+
+
+@compiles(PrimaryKeyConstraint, 'sqlite')
+def _sqlite_ledger_primary_key(constraint, compiler, **kw):
+    if constraint.table is not None and constraint.table.name == EventLedger.__tablename__:
+        return "UNIQUE (id, created_at)"
+    return compiler.visit_primary_key_constraint(constraint, **kw)
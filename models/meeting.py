@@ -94,6 +94,8 @@ class Meeting(Base):
     __table_args__ = (
         # Composite index for workspace meetings list (workspace + status + sort)
         Index('ix_meetings_workspace_status_created', 'workspace_id', 'status', 'created_at'),
+        # Composite index for date-bucketed workspace aggregates (analytics rollup)
+        Index('ix_meetings_workspace_created', 'workspace_id', 'created_at'),
         # Composite index for calendar queries (workspace + date range)
         Index('ix_meetings_workspace_scheduled', 'workspace_id', 'scheduled_start'),
         # Single column indexes for filtering
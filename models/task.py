@@ -99,6 +99,8 @@ class Task(Base):
         Index('ix_tasks_assigned_status_due', 'assigned_to_id', 'status', 'due_date'),
         # Composite index for meeting tasks (meeting + status)
         Index('ix_tasks_meeting_status', 'meeting_id', 'status'),
+        # Index for tasks-created-per-day aggregates (analytics rollup)
+        Index('ix_tasks_created_at', 'created_at'),
         # Single column indexes for filtering
         Index('ix_tasks_created_by', 'created_by_id'),
         Index('ix_tasks_depends_on', 'depends_on_task_id'),
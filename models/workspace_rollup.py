@@ -0,0 +1,66 @@
+"""
+WorkspaceDailyRollup Model for Dashboard Analytics
+Pre-aggregated per-workspace, per-day meeting, task and analytics totals.
+Dashboard and analytics endpoints sum a date range of rows instead of scanning
+meetings, tasks and analytics.
+"""
+
+from datetime import date, datetime
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import Integer, Float, Date, DateTime, ForeignKey, func, UniqueConstraint
+from .base import Base
+
+
+class WorkspaceDailyRollup(Base):
+    """
+    Daily rollup of a workspace's meetings, their tasks and their analytics.
+    Meeting, task and analytics figures are bucketed by the meeting's creation
+    day; tasks_created_count is bucketed by the task's own creation day.
+    Maintained by services.analytics_rollup_service.
+    """
+    __tablename__ = "workspace_daily_rollups"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    workspace_id: Mapped[int] = mapped_column(ForeignKey("workspaces.id"), nullable=False)
+    day: Mapped[date] = mapped_column(Date, nullable=False)
+
+    # Meetings
+    meeting_count: Mapped[int] = mapped_column(Integer, default=0)
+    live_meeting_count: Mapped[int] = mapped_column(Integer, default=0)
+
+    # Analytics (sum + count of non-null values, so ranges average exactly)
+    analyzed_meeting_count: Mapped[int] = mapped_column(Integer, default=0)  # analysis_status == completed
+    duration_minutes_sum: Mapped[float] = mapped_column(Float, default=0.0)
+    duration_count: Mapped[int] = mapped_column(Integer, default=0)
+    efficiency_sum: Mapped[float] = mapped_column(Float, default=0.0)
+    efficiency_count: Mapped[int] = mapped_column(Integer, default=0)
+    effectiveness_sum: Mapped[float] = mapped_column(Float, default=0.0)
+    effectiveness_count: Mapped[int] = mapped_column(Integer, default=0)
+    engagement_sum: Mapped[float] = mapped_column(Float, default=0.0)
+    engagement_count: Mapped[int] = mapped_column(Integer, default=0)
+    sentiment_sum: Mapped[float] = mapped_column(Float, default=0.0)
+    sentiment_count: Mapped[int] = mapped_column(Integer, default=0)
+    decisions_sum: Mapped[int] = mapped_column(Integer, default=0)
+    action_items_sum: Mapped[int] = mapped_column(Integer, default=0)
+
+    # Tasks of the day's meetings
+    task_count: Mapped[int] = mapped_column(Integer, default=0)
+    completed_task_count: Mapped[int] = mapped_column(Integer, default=0)
+    completion_days_sum: Mapped[int] = mapped_column(Integer, default=0)  # Whole days created -> completed
+    completion_days_count: Mapped[int] = mapped_column(Integer, default=0)
+    low_priority_task_count: Mapped[int] = mapped_column(Integer, default=0)
+    medium_priority_task_count: Mapped[int] = mapped_column(Integer, default=0)
+    high_priority_task_count: Mapped[int] = mapped_column(Integer, default=0)
+    urgent_priority_task_count: Mapped[int] = mapped_column(Integer, default=0)
+
+    # Tasks created on this day (any meeting of the workspace)
+    tasks_created_count: Mapped[int] = mapped_column(Integer, default=0)
+
+    updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        UniqueConstraint('workspace_id', 'day', name='uq_workspace_daily_rollups_workspace_day'),
+    )
+
+    def __repr__(self):
+        return f'<WorkspaceDailyRollup workspace_id={self.workspace_id} day={self.day} meetings={self.meeting_count}>'
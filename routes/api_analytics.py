@@ -7,6 +7,7 @@ from flask import Blueprint, request, jsonify
 from flask_login import login_required, current_user
 from models import db, Analytics, Meeting, Task, Participant, User
 from services.analytics_service import analytics_service
+from services.analytics_rollup_service import get_analytics_rollup_service
 from middleware.cache_decorator import cache_response
 from datetime import datetime, timedelta, date
 from sqlalchemy import func, desc, and_
@@ -28,7 +29,8 @@ def get_analytics_overview():
         # Get workspace analytics summary
         summary = analytics_service.get_workspace_analytics_summary(
             current_user.workspace_id, 
-            days=days
+            days=days,
+            include_records=False
         )
         
         return jsonify({
@@ -245,61 +247,21 @@ def get_productivity_analytics():
     try:
         workspace_id = current_user.workspace_id
         days = request.args.get('days', 30, type=int)
-        cutoff_date = datetime.now() - timedelta(days=days)
-        
-        # Get meetings from the period
-        meetings = db.session.query(Meeting).filter(
-            Meeting.workspace_id == workspace_id,
-            Meeting.created_at >= cutoff_date
-        ).all()
         
-        meeting_ids = [m.id for m in meetings]
+        totals = get_analytics_rollup_service().get_totals_since(workspace_id, days)
+        meeting_count = totals.meeting_count
         
         # Task analytics
-        total_tasks = db.session.query(Task).filter(Task.meeting_id.in_(meeting_ids)).count()
-        completed_tasks = db.session.query(Task).filter(
-            Task.meeting_id.in_(meeting_ids),
-            Task.status == 'completed'
-        ).count()
-        
-        # Tasks by priority
-        task_priority_dist = db.session.query(
-            Task.priority,
-            func.count(Task.id).label('count')
-        ).filter(Task.meeting_id.in_(meeting_ids)).group_by(Task.priority).all()
-        
-        priority_distribution = {priority: count for priority, count in task_priority_dist}
-        
-        # Average completion time for completed tasks
-        completed_task_times = []
-        for task in db.session.query(Task).filter(
-            Task.meeting_id.in_(meeting_ids),
-            Task.status == 'completed',
-            Task.completed_at.isnot(None)
-        ).all():
-            if task.completed_at and task.created_at:
-                completion_time = (task.completed_at - task.created_at).days
-                completed_task_times.append(completion_time)
-        
-        avg_completion_days = sum(completed_task_times) / len(completed_task_times) if completed_task_times else 0
+        total_tasks = totals.task_count
+        completed_tasks = totals.completed_task_count
+        priority_distribution = totals.priority_distribution
+        avg_completion_days = totals.average('completion_days') or 0
         
         # Decision making analytics
-        decisions_made = db.session.query(
-            func.sum(Analytics.decisions_made_count)
-        ).join(Meeting).filter(
-            Meeting.workspace_id == workspace_id,
-            Meeting.created_at >= cutoff_date,
-            Analytics.decisions_made_count.isnot(None)
-        ).scalar() or 0
+        decisions_made = totals.decisions_sum
         
         # Meeting efficiency
-        efficiency_scores = db.session.query(Analytics).join(Meeting).filter(
-            Meeting.workspace_id == workspace_id,
-            Meeting.created_at >= cutoff_date,
-            Analytics.meeting_efficiency_score.isnot(None)
-        ).all()
-        
-        avg_efficiency = sum(a.meeting_efficiency_score for a in efficiency_scores if a.meeting_efficiency_score is not None) / len(efficiency_scores) if efficiency_scores else 0
+        avg_efficiency = totals.average('efficiency') or 0
         
         return jsonify({
             'success': True,
@@ -313,14 +275,14 @@ def get_productivity_analytics():
                 },
                 'decisions': {
                     'total_made': int(decisions_made),
-                    'avg_per_meeting': round(decisions_made / len(meetings), 1) if meetings else 0
+                    'avg_per_meeting': round(decisions_made / meeting_count, 1) if meeting_count else 0
                 },
                 'efficiency': {
                     'average_score': round(avg_efficiency * 100, 1),
-                    'meetings_analyzed': len(efficiency_scores)
+                    'meetings_analyzed': totals.efficiency_count
                 },
                 'period_days': days,
-                'total_meetings': len(meetings)
+                'total_meetings': meeting_count
             }
         })
         
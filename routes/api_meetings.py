@@ -9,7 +9,10 @@ from models import db, Meeting, Session, Task, Participant, Analytics, Workspace
 from services.task_extraction_service import task_extraction_service
 from services.meeting_metadata_service import meeting_metadata_service
 from services.analytics_service import analytics_service
-from middleware.cache_decorator import cache_response, invalidate_cache, invalidate_meeting_cache
+from services.analytics_rollup_service import get_analytics_rollup_service
+from middleware.cache_decorator import (
+    cache_response, invalidate_cache, invalidate_meeting_cache, current_workspace_tags
+)
 from datetime import datetime
 import asyncio
 import json
@@ -110,8 +113,7 @@ def get_meeting(meeting_id):
 
 
 @api_meetings_bp.route('/', methods=['POST'])
-@invalidate_cache(prefix='session')  # Invalidate meeting list cache
-@invalidate_cache(prefix='analytics')  # Invalidate analytics cache
+@invalidate_cache(tags=current_workspace_tags)  # Invalidate this workspace's meeting lists and analytics
 @login_required
 def create_meeting():
     """Create a new meeting."""
@@ -183,7 +185,7 @@ def update_meeting(meeting_id):
         db.session.commit()
         
         # Invalidate cache for this meeting
-        invalidate_meeting_cache(meeting_id)
+        invalidate_meeting_cache(meeting_id, workspace_id=current_user.workspace_id)
         
         return jsonify({
             'success': True,
@@ -209,6 +211,11 @@ def delete_meeting(meeting_id):
         if not meeting:
             return jsonify({'success': False, 'message': 'Meeting not found'}), 404
         
+        # Bulk deletes bypass the analytics rollup listener: mark the
+        # deleted tasks' creation days for recomputation
+        rollup = get_analytics_rollup_service()
+        rollup.mark_stale(db.session, meeting.workspace_id, rollup.task_created_days(db.session, meeting_id))
+        
         # Delete associated data
         db.session.query(Task).filter_by(meeting_id=meeting_id).delete()
         db.session.query(Participant).filter_by(meeting_id=meeting_id).delete()
@@ -10,6 +10,7 @@ from sqlalchemy import desc, func, and_
 from sqlalchemy.orm import joinedload
 from datetime import datetime, timedelta, date
 from services.event_broadcaster import event_broadcaster
+from services.analytics_rollup_service import get_analytics_rollup_service
 
 try:
     from services.uptime_monitoring import uptime_monitor
@@ -306,10 +307,6 @@ def tasks():
 @login_required
 def analytics():
     """Analytics and insights page."""
-    from sqlalchemy import select, cast, Date
-    from datetime import datetime, timedelta
-    from models import Participant
-    
     if not current_user.workspace_id:
         return render_template('dashboard/analytics.html',
                              total_meetings=0,
@@ -321,70 +318,26 @@ def analytics():
     
     # Get date range (last 30 days by default)
     days = 30
-    cutoff_date = datetime.now() - timedelta(days=days)
-    
-    # Total meetings in period
-    total_meetings = db.session.query(Meeting).filter(
-        Meeting.workspace_id == current_user.workspace_id,
-        Meeting.created_at >= cutoff_date
-    ).count()
-    
-    # Total tasks
-    meeting_ids_query = select(Meeting.id).where(
-        Meeting.workspace_id == current_user.workspace_id,
-        Meeting.created_at >= cutoff_date
-    )
-    meeting_ids = [row[0] for row in db.session.execute(meeting_ids_query)]
-    
-    total_tasks = db.session.query(Task).filter(Task.meeting_id.in_(meeting_ids)).count() if meeting_ids else 0
-    completed_tasks = db.session.query(Task).filter(
-        Task.meeting_id.in_(meeting_ids),
-        Task.status == 'completed'
-    ).count() if meeting_ids else 0
+    totals = get_analytics_rollup_service().get_totals_since(current_user.workspace_id, days)
     
-    task_completion_rate = round((completed_tasks / total_tasks * 100), 1) if total_tasks > 0 else 0
+    total_meetings = totals.meeting_count
+    total_tasks = totals.task_count
+    task_completion_rate = totals.task_completion_rate
     
     # Average meeting duration
-    avg_duration_query = db.session.query(func.avg(Analytics.total_duration_minutes)).join(Meeting).filter(
-        Meeting.workspace_id == current_user.workspace_id,
-        Meeting.created_at >= cutoff_date,
-        Analytics.total_duration_minutes.isnot(None)
-    ).scalar()
+    avg_duration_query = totals.average('duration_minutes')
     avg_duration = round(avg_duration_query) if avg_duration_query else 45
     
     # Hours saved (estimate based on meeting efficiency)
-    total_meeting_hours = db.session.query(func.sum(Analytics.total_duration_minutes)).join(Meeting).filter(
-        Meeting.workspace_id == current_user.workspace_id,
-        Meeting.created_at >= cutoff_date,
-        Analytics.total_duration_minutes.isnot(None)
-    ).scalar() or 0
-    
-    avg_efficiency = db.session.query(func.avg(Analytics.meeting_efficiency_score)).join(Meeting).filter(
-        Meeting.workspace_id == current_user.workspace_id,
-        Meeting.created_at >= cutoff_date,
-        Analytics.meeting_efficiency_score.isnot(None)
-    ).scalar() or 0.5
+    total_meeting_hours = totals.duration_minutes_sum
+    avg_efficiency = totals.average('efficiency') or 0.5
     
     hours_saved = round((total_meeting_hours / 60) * (avg_efficiency * 0.3))  # Estimate savings
     
     # Calculate workspace averages
-    avg_effectiveness = db.session.query(func.avg(Analytics.meeting_effectiveness_score)).join(Meeting).filter(
-        Meeting.workspace_id == current_user.workspace_id,
-        Meeting.created_at >= cutoff_date,
-        Analytics.meeting_effectiveness_score.isnot(None)
-    ).scalar() or 0
-    
-    avg_engagement = db.session.query(func.avg(Analytics.overall_engagement_score)).join(Meeting).filter(
-        Meeting.workspace_id == current_user.workspace_id,
-        Meeting.created_at >= cutoff_date,
-        Analytics.overall_engagement_score.isnot(None)
-    ).scalar() or 0
-    
-    avg_sentiment = db.session.query(func.avg(Analytics.overall_sentiment_score)).join(Meeting).filter(
-        Meeting.workspace_id == current_user.workspace_id,
-        Meeting.created_at >= cutoff_date,
-        Analytics.overall_sentiment_score.isnot(None)
-    ).scalar() or 0
+    avg_effectiveness = totals.average('effectiveness') or 0
+    avg_engagement = totals.average('engagement') or 0
+    avg_sentiment = totals.average('sentiment') or 0
     
     return render_template('dashboard/analytics.html',
                          total_meetings=total_meetings,
@@ -448,21 +401,17 @@ def api_recent_activity():
 @login_required
 def api_stats():
     """API endpoint for dashboard statistics."""
+    rollup = get_analytics_rollup_service()
+    totals = rollup.get_totals(current_user.workspace_id)
+    
     # Meeting stats
-    total_meetings = db.session.query(Meeting).filter_by(workspace_id=current_user.workspace_id).count()
-    active_meetings = db.session.query(Meeting).filter_by(
-        workspace_id=current_user.workspace_id,
-        status='live'
-    ).count()
+    total_meetings = totals.meeting_count
+    active_meetings = totals.live_meeting_count
     
     # Task stats
-    total_tasks = db.session.query(Task).join(Meeting).filter(
-        Meeting.workspace_id == current_user.workspace_id
-    ).count()
-    completed_tasks = db.session.query(Task).join(Meeting).filter(
-        Meeting.workspace_id == current_user.workspace_id,
-        Task.status == 'completed'
-    ).count()
+    total_tasks = totals.task_count
+    completed_tasks = totals.completed_task_count
+    # Overdue depends on today's date, so it is counted live
     overdue_tasks = db.session.query(Task).join(Meeting).filter(
         Meeting.workspace_id == current_user.workspace_id,
         Task.due_date < datetime.now().date(),
@@ -470,15 +419,10 @@ def api_stats():
     ).count()
     
     # This week's activity
-    week_start = datetime.now() - timedelta(days=datetime.now().weekday())
-    this_week_meetings = db.session.query(Meeting).filter_by(
-        workspace_id=current_user.workspace_id
-    ).filter(Meeting.created_at >= week_start).count()
-    
-    this_week_tasks = db.session.query(Task).join(Meeting).filter(
-        Meeting.workspace_id == current_user.workspace_id,
-        Task.created_at >= week_start
-    ).count()
+    week_start = datetime.now().date() - timedelta(days=datetime.now().weekday())
+    this_week = rollup.get_totals(current_user.workspace_id, start_day=week_start)
+    this_week_meetings = this_week.meeting_count
+    this_week_tasks = this_week.tasks_created_count
     
     return jsonify({
         'meetings': {
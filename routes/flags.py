@@ -54,6 +54,8 @@ def upsert_flag():
         key = body.get("key", "").strip()
         enabled = bool(body.get("enabled", False))
         note = body.get("note", "").strip() if body.get("note") else None
+        rollout_percentage = body.get("rollout_percentage")
+        target_users = body.get("target_users") or []
         
         if not validate_flag_key(key):
             return jsonify({"error": "Invalid flag key. Use only alphanumeric, underscore, and hyphen characters.", "success": False}), 400
@@ -61,20 +63,30 @@ def upsert_flag():
         if note and len(note) > 255:
             return jsonify({"error": "Note must be 255 characters or less.", "success": False}), 400
         
+        if rollout_percentage is not None:
+            if isinstance(rollout_percentage, bool) or not isinstance(rollout_percentage, (int, float)) or not 0 <= rollout_percentage <= 100:
+                return jsonify({"error": "rollout_percentage must be a number between 0 and 100.", "success": False}), 400
+        
+        if not isinstance(target_users, list):
+            return jsonify({"error": "target_users must be a list of user ids.", "success": False}), 400
+        target_users = [str(user) for user in target_users]
+        
         flag = FeatureFlag.query.filter_by(key=key).first()
         
         if not flag:
             action = "create"
             old_value = None
-            new_value = {"enabled": enabled, "note": note}
-            flag = FeatureFlag(key=key, enabled=enabled, note=note)
+            new_value = {"enabled": enabled, "note": note, "rollout_percentage": rollout_percentage, "target_users": target_users}
+            flag = FeatureFlag(key=key, enabled=enabled, note=note, rollout_percentage=rollout_percentage, target_users=target_users)
             db.session.add(flag)
         else:
             action = "update"
-            old_value = {"enabled": flag.enabled, "note": flag.note}
-            new_value = {"enabled": enabled, "note": note}
+            old_value = {"enabled": flag.enabled, "note": flag.note, "rollout_percentage": flag.rollout_percentage, "target_users": flag.target_users or []}
+            new_value = {"enabled": enabled, "note": note, "rollout_percentage": rollout_percentage, "target_users": target_users}
             flag.enabled = enabled
             flag.note = note
+            flag.rollout_percentage = rollout_percentage
+            flag.target_users = target_users
         
         create_audit_log(key, action, old_value, new_value)
         db.session.commit()
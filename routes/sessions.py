@@ -218,6 +218,46 @@ def finalize_session(session_id):
         return jsonify({'error': f'Failed to finalize session: {str(e)}'}), 500
 
 
+@sessions_bp.route('/<int:session_id>/recording', methods=['POST'])
+def transcribe_session_recording(session_id):
+    """
+    POST /sessions/<id>/recording - Batch-transcribe an uploaded recording into the session
+    
+    Form fields:
+    - audio: Recording file (WAV, or any format ffmpeg can decode)
+    - replace: 'true' to replace the session's existing segments (default: false)
+    """
+    audio_file = request.files.get('audio')
+    if audio_file is None:
+        return jsonify({'error': 'No audio file provided'}), 400
+    replace = request.form.get('replace', 'false').lower() == 'true'
+    
+    session = SessionService.get_session_by_id(session_id)
+    if not session:
+        return jsonify({'error': 'Session not found'}), 404
+    
+    from services.batch_transcription import IncompleteTranscriptionError, get_batch_transcription_service
+    try:
+        result = get_batch_transcription_service().transcribe_recording(
+            session_id, audio_file.read(), mime_hint=audio_file.mimetype, replace=replace
+        )
+    except IncompleteTranscriptionError as e:
+        logger.warning(f"Batch transcription of session {session_id} incomplete: {e}")
+        return jsonify({'error': str(e)}), 502
+    except Exception as e:
+        logger.error(f"Error transcribing recording for session {session_id}: {e}", exc_info=True)
+        return jsonify({'error': f'Failed to transcribe recording: {str(e)}'}), 500
+    
+    return jsonify({
+        'session_id': session_id,
+        'segments': len(result.segments),
+        'audio_seconds': round(result.audio_seconds, 1),
+        'windows': result.windows,
+        'failed_windows': result.failed_windows,
+        'replaced': replace
+    })
+
+
 @sessions_bp.route('/stats', methods=['GET'])
 def get_session_stats():
     """
@@ -744,6 +744,7 @@ def detailed_health_metrics():
     try:
         health_monitor = get_health_monitor()
         circuit_manager = __import__('services.circuit_breaker', fromlist=['circuit_manager']).circuit_manager
+        from services.llm_response_cache import get_llm_cache
         
         # Get time range from query params
         hours = int(request.args.get('hours', 1))
@@ -766,6 +767,7 @@ def detailed_health_metrics():
             },
             'alerts': health_monitor.get_alerts(hours),
             'circuit_breakers': circuit_manager.get_all_stats(),
+            'llm_cache': get_llm_cache().get_stats(),
             'performance_summary': health_monitor.get_performance_summary()
         })
     except Exception as e:
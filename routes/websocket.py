@@ -4,11 +4,11 @@ import binascii
 import logging
 import time
 import uuid
-from collections import defaultdict
+from collections import Counter, defaultdict
 from typing import Dict, Optional
 from datetime import datetime
 
-from flask import Blueprint
+from flask import Blueprint, request
 from flask_socketio import emit
 
 # Import the socketio instance from the consolidated app
@@ -330,22 +330,65 @@ def on_finalize(data):
     _LAST_EMIT_AT.pop(session_id, None)
     _LAST_INTERIM_TEXT.pop(session_id, None)
     
-    # Clear speaker diarization state
-    _SPEAKER_ENGINES.pop(session_id, None)
-    _MULTI_SPEAKER_SYSTEMS.pop(session_id, None)
-    _SESSION_SPEAKERS.pop(session_id, None)
-    
-    logger.info(f"🎤 Cleared speaker diarization state for session: {session_id}")
+    # Speakers are re-clustered over the whole meeting in the background; their
+    # diarization state is dropped once that has finished
+    socketio.start_background_task(_finalize_speakers, session_id, request.sid)
 
-@socketio.on("get_session_speakers")
-def on_get_session_speakers(data):
-    """Get current speakers for a session."""
-    session_id = (data or {}).get("session_id")
-    if not session_id:
-        emit("error", {"message": "Missing session_id"})
-        return
-    
-    speakers = _SESSION_SPEAKERS.get(session_id, {})
+def _finalize_speakers(session_id: str, sid: str):
+    """Re-cluster a finished session's speakers, send the relabeled list, then clear diarization state."""
+    engine = _SPEAKER_ENGINES.get(session_id)
+    multi_speaker = _MULTI_SPEAKER_SYSTEMS.get(session_id)
+    speakers = _SESSION_SPEAKERS.get(session_id)
+    try:
+        if engine is not None:
+            engine.finalize_session(session_id, background=False)
+        if multi_speaker is not None and speakers is not None:
+            multi_speaker.finalize_meeting(
+                background=False,
+                on_complete=lambda result: _apply_recluster(session_id, sid, speakers, multi_speaker, result)
+            )
+    finally:
+        # A rejoin during re-clustering installs fresh state that must survive
+        if _SPEAKER_ENGINES.get(session_id) is engine:
+            _SPEAKER_ENGINES.pop(session_id, None)
+        if _MULTI_SPEAKER_SYSTEMS.get(session_id) is multi_speaker:
+            _MULTI_SPEAKER_SYSTEMS.pop(session_id, None)
+        if _SESSION_SPEAKERS.get(session_id) is speakers:
+            _SESSION_SPEAKERS.pop(session_id, None)
+        logger.info(f"🎤 Cleared speaker diarization state for session: {session_id}")
+
+def _apply_recluster(session_id: str, sid: str, speakers: Dict[str, Dict],
+                     multi_speaker: MultiSpeakerDiarization, result):
+    """Fold merged speakers into their survivors, add split-out ones and emit the new speaker list."""
+    for absorbed, survivor in result.merged.items():
+        info = speakers.pop(absorbed, None)
+        target = speakers.get(survivor)
+        if info is not None and target is not None:
+            target["first_seen"] = min(target["first_seen"], info["first_seen"])
+            target["last_activity"] = max(target["last_activity"], info["last_activity"])
+
+    for speaker_id in result.created:
+        profile = multi_speaker.speaker_profiles.get(speaker_id)
+        first_seen = profile.first_seen * 1000.0 if profile else _now_ms()
+        speakers[speaker_id] = {
+            "id": speaker_id,
+            "name": f"Speaker {len(speakers) + 1}",
+            "first_seen": first_seen,
+            "total_segments": 0,
+            "last_activity": profile.last_seen * 1000.0 if profile else first_seen
+        }
+
+    counts = Counter(result.assignments.values())
+    for speaker_id, info in speakers.items():
+        info["total_segments"] = counts[speaker_id]
+
+    payload = _speakers_payload(session_id, speakers)
+    payload["reclustered"] = True
+    socketio.emit("session_speakers", payload, to=sid)
+    logger.info(f"🎤 Sent re-clustered speakers for session {session_id}: {payload['total_speakers']} speakers")
+
+def _speakers_payload(session_id: str, speakers: Dict[str, Dict]) -> Dict:
+    """session_speakers event body, most recently active speaker first."""
     speaker_list = []
     
     for speaker_id, speaker_info in speakers.items():
@@ -361,12 +404,23 @@ def on_get_session_speakers(data):
     # Sort by last activity (most recent first)
     speaker_list.sort(key=lambda x: x["last_activity"], reverse=True)
     
-    emit("session_speakers", {
+    return {
         "session_id": session_id,
         "speakers": speaker_list,
         "total_speakers": len(speaker_list),
         "timestamp": int(_now_ms())
-    })
+    }
+
+@socketio.on("get_session_speakers")
+def on_get_session_speakers(data):
+    """Get current speakers for a session."""
+    session_id = (data or {}).get("session_id")
+    if not session_id:
+        emit("error", {"message": "Missing session_id"})
+        return
+    
+    payload = _speakers_payload(session_id, _SESSION_SPEAKERS.get(session_id, {}))
+    emit("session_speakers", payload)
     
-    logger.debug(f"🎤 Sent speaker list for session {session_id}: {len(speaker_list)} speakers")
+    logger.debug(f"🎤 Sent speaker list for session {session_id}: {payload['total_speakers']} speakers")
     
\ No newline at end of file
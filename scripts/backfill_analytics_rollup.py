@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Backfill script to build the daily workspace analytics rollup from existing
+meetings, tasks and analytics. Safe to re-run: each workspace is recomputed
+from scratch.
+"""
+
+import logging
+from sqlalchemy import select
+from app import app, db
+from models.workspace import Workspace
+from services.analytics_rollup_service import get_analytics_rollup_service
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def backfill_analytics_rollup():
+    """
+    Rebuild the rollup rows of every workspace, one commit per workspace.
+    """
+    with app.app_context():
+        try:
+            rollup = get_analytics_rollup_service()
+            workspace_ids = db.session.scalars(select(Workspace.id)).all()
+            logger.info(f"Rebuilding analytics rollup for {len(workspace_ids)} workspaces")
+            
+            total_days = 0
+            for workspace_id in workspace_ids:
+                try:
+                    total_days += rollup.rebuild_workspace(workspace_id, session=db.session)
+                    db.session.commit()
+                except Exception as e:
+                    db.session.rollback()
+                    logger.error(f"❌ Error rebuilding rollup for workspace {workspace_id}: {e}", exc_info=True)
+            
+            logger.info(f"✅ Backfill complete: {total_days} rollup days written")
+            
+        except Exception as e:
+            logger.error(f"Backfill script failed: {e}", exc_info=True)
+
+
+if __name__ == '__main__':
+    backfill_analytics_rollup()
@@ -0,0 +1,124 @@
+"""
+Analytics Rollup Benchmark
+Compares the dashboard analytics page's per-request aggregate queries over
+meetings/tasks/analytics with one range query over the daily workspace rollup,
+and measures the rollup upkeep added to a write.
+Usage:
+    python scripts/benchmark_analytics_rollup.py --meetings 50000 --days 365
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session as OrmSession
+
+from models.analytics import Analytics
+from models.base import Base
+from models.meeting import Meeting
+from models.task import Task
+from services.analytics_rollup_service import get_analytics_rollup_service
+
+WORKSPACE_ID = 1
+
+
+def seed(session, meetings: int, days: int, tasks_per_meeting: int):
+    rng = random.Random(33)
+    now = datetime.now()
+    meeting_rows, analytics_rows, task_rows = [], [], []
+    for meeting_id in range(1, meetings + 1):
+        created = now - timedelta(days=rng.randint(0, days - 1), minutes=rng.randint(0, 1439))
+        meeting_rows.append(dict(id=meeting_id, title='m', organizer_id=1, workspace_id=WORKSPACE_ID,
+                                 status=rng.choice(['completed', 'completed', 'live']), created_at=created))
+        analytics_rows.append(dict(meeting_id=meeting_id, analysis_status='completed',
+                                   total_duration_minutes=rng.uniform(15, 90),
+                                   meeting_efficiency_score=rng.random(),
+                                   meeting_effectiveness_score=rng.random(),
+                                   overall_engagement_score=rng.random(),
+                                   overall_sentiment_score=rng.uniform(-1, 1),
+                                   decisions_made_count=rng.randint(0, 4)))
+        for _ in range(tasks_per_meeting):
+            task_rows.append(dict(title='t', meeting_id=meeting_id, created_at=created,
+                                  status=rng.choice(['todo', 'completed']),
+                                  priority=rng.choice(['low', 'medium', 'high', 'urgent'])))
+    # Core inserts bypass the flush listener; the rollup is rebuilt afterwards
+    session.execute(Meeting.__table__.insert(), meeting_rows)
+    session.execute(Analytics.__table__.insert(), analytics_rows)
+    session.execute(Task.__table__.insert(), task_rows)
+    session.commit()
+
+
+def legacy_queries(session, cutoff):
+    """The per-request aggregates the analytics page used to run."""
+    in_range = (Meeting.workspace_id == WORKSPACE_ID, Meeting.created_at >= cutoff)
+    session.query(Meeting).filter(*in_range).count()
+    meeting_ids = [row[0] for row in session.execute(select(Meeting.id).where(*in_range))]
+    session.query(Task).filter(Task.meeting_id.in_(meeting_ids)).count()
+    session.query(Task).filter(Task.meeting_id.in_(meeting_ids), Task.status == 'completed').count()
+    for column in (Analytics.total_duration_minutes, Analytics.meeting_efficiency_score,
+                   Analytics.meeting_effectiveness_score, Analytics.overall_engagement_score,
+                   Analytics.overall_sentiment_score):
+        session.query(func.avg(column)).join(Meeting).filter(*in_range, column.isnot(None)).scalar()
+    session.query(func.sum(Analytics.total_duration_minutes)).join(Meeting).filter(*in_range).scalar()
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def run(meetings: int, days: int, tasks_per_meeting: int, repeat: int):
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    rollup = get_analytics_rollup_service()
+    rollup.install_listeners()
+
+    with Session(engine) as session:
+        start = time.perf_counter()
+        seed(session, meetings, days, tasks_per_meeting)
+        print(f"Seeded {meetings} meetings, {meetings * tasks_per_meeting} tasks over {days} days "
+              f"in {time.perf_counter() - start:.1f} s")
+
+        start = time.perf_counter()
+        rows = rollup.rebuild_workspace(WORKSPACE_ID, session=session)
+        session.commit()
+        print(f"Rebuilt {rows} rollup rows in {(time.perf_counter() - start) * 1000:.0f} ms\n")
+
+        for window in (7, 30, days):
+            cutoff = datetime.now() - timedelta(days=window)
+            legacy = timed(lambda: legacy_queries(session, cutoff), repeat)
+            rolled = timed(lambda: rollup.get_totals_since(WORKSPACE_ID, window, session=session), repeat)
+            print(f"{window:4d}-day range  legacy {legacy:9.2f} ms  rollup {rolled:7.3f} ms  "
+                  f"speedup {legacy / rolled:7.1f}x")
+
+        task = session.get(Task, 1)
+        statuses = ['todo', 'completed']
+
+        def update_task():
+            task.status = statuses[(statuses.index(task.status) + 1) % 2]
+            session.commit()
+
+        write = timed(update_task, repeat)
+        event.remove(OrmSession, 'after_flush', rollup._after_flush)
+        bare = timed(update_task, repeat)
+        event.listen(OrmSession, 'after_flush', rollup._after_flush)
+        print(f"\nTask status commit  with rollup {write:7.2f} ms  without {bare:7.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--meetings", type=int, default=50000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--tasks-per-meeting", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    run(args.meetings, args.days, args.tasks_per_meeting, args.repeat)
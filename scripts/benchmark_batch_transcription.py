@@ -0,0 +1,104 @@
+"""
+Batch Transcription Benchmark
+Throughput (audio minutes per wall-clock minute) of offline transcription
+against a local stub engine that models a hosted Whisper call as a fixed
+request latency plus a per-second-of-audio cost.
+
+Compares the realtime-style path (every 2 s buffer sent in turn, silence
+included) with BatchTranscriptionService (speech-only ~30 s windows) at
+several parallelism levels, on a synthetic meeting recording with pauses.
+Usage:
+    python scripts/benchmark_batch_transcription.py --minutes 30 --parallel 1 4 8
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.batch_transcription import (
+    BatchTranscriptionConfig, BatchTranscriptionService, decode_audio, encode_wav
+)
+
+SAMPLE_RATE = 16000
+REALTIME_BUFFER_SECONDS = 2.0
+
+
+class StubEngine:
+    """Sleeps like a remote engine and returns one timed segment per 5 s."""
+
+    def __init__(self, latency: float, seconds_per_audio_second: float):
+        self.latency = latency
+        self.cost = seconds_per_audio_second
+        self.calls = 0
+        self.uploaded_seconds = 0.0
+
+    def __call__(self, wav_bytes: bytes, config=None):
+        seconds = (len(wav_bytes) - 44) / 2 / SAMPLE_RATE
+        self.calls += 1
+        self.uploaded_seconds += seconds
+        time.sleep(self.latency + self.cost * seconds)
+        return {'segments': [{'start': s, 'end': min(seconds, s + 5), 'text': f"words at {s}"}
+                             for s in range(0, int(np.ceil(seconds)), 5)]}
+
+
+def synthesize(minutes: float, seed: int = 39) -> np.ndarray:
+    """Talk spurts of 2-12 s separated by 0.2-6 s pauses over low noise."""
+    rng = np.random.default_rng(seed)
+    total = int(minutes * 60 * SAMPLE_RATE)
+    audio = rng.normal(0, 0.002, total).astype(np.float32)
+    position = 0
+    while position < total:
+        spurt = int(rng.uniform(2, 12) * SAMPLE_RATE)
+        t = np.arange(min(spurt, total - position)) / SAMPLE_RATE
+        f0 = rng.uniform(90, 220)
+        audio[position:position + len(t)] += 0.2 * np.sin(2 * np.pi * f0 * t) * (0.6 + 0.4 * np.sin(2 * np.pi * 4 * t))
+        position += spurt + int(rng.uniform(0.2, 6) * SAMPLE_RATE)
+    return audio
+
+
+def run_realtime(samples: np.ndarray, engine: StubEngine) -> float:
+    """Sequential fixed buffers, as the streaming path does."""
+    step = int(REALTIME_BUFFER_SECONDS * SAMPLE_RATE)
+    start = time.perf_counter()
+    for offset in range(0, len(samples), step):
+        engine(encode_wav(samples[offset:offset + step], SAMPLE_RATE))
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--minutes", type=float, default=30)
+    parser.add_argument("--parallel", type=int, nargs='+', default=[1, 4, 8])
+    parser.add_argument("--latency-ms", type=float, default=20, help="Stub per-request latency")
+    parser.add_argument("--cost-ms", type=float, default=2, help="Stub cost per second of uploaded audio")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    samples = synthesize(args.minutes)
+    wav = encode_wav(samples, SAMPLE_RATE)
+    audio_minutes = len(samples) / SAMPLE_RATE / 60
+    print(f"{audio_minutes:.1f} min recording, stub latency {args.latency_ms:.0f} ms "
+          f"+ {args.cost_ms:.0f} ms per audio second")
+
+    engine = StubEngine(args.latency_ms / 1000, args.cost_ms / 1000)
+    elapsed = run_realtime(samples, engine)
+    print(f"  realtime buffers      {engine.calls:5d} calls  {engine.uploaded_seconds / 60:6.1f} min uploaded  "
+          f"{audio_minutes / (elapsed / 60):8.1f} audio-min/wall-min")
+
+    start = time.perf_counter()
+    decode_audio(wav, SAMPLE_RATE)
+    print(f"  decode once           {(time.perf_counter() - start) * 1000:8.1f} ms")
+
+    for parallel in args.parallel:
+        engine = StubEngine(args.latency_ms / 1000, args.cost_ms / 1000)
+        service = BatchTranscriptionService(BatchTranscriptionConfig(max_parallel=parallel), engine=engine)
+        result = service.transcribe(wav)
+        print(f"  batch x{parallel:<2d}             {engine.calls:5d} calls  "
+              f"{engine.uploaded_seconds / 60:6.1f} min uploaded  {result.throughput:8.1f} audio-min/wall-min  "
+              f"({len(result.segments)} segments)")
@@ -0,0 +1,112 @@
+"""
+Circuit Breaker Benchmark
+Simulates N workers sending traffic through a 5-minute upstream outage
+that then recovers, on a simulated clock. Compares per-process breakers
+(each worker detects the outage and probes on its own) with breakers
+sharing one state backend: calls sent to the failing upstream, recovery
+probes, and state-backend round trips per call.
+
+Runs against fakeredis by default (needs lupa for scripts); pass
+--redis-url to use a real Redis.
+Usage:
+    python scripts/benchmark_circuit_breaker.py --workers 16 --rate 20
+"""
+
+import argparse
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.circuit_breaker import (
+    CircuitBreaker, CircuitBreakerConfig, CircuitBreakerOpenError, MemoryBreakerBackend, RedisBreakerBackend
+)
+
+
+class Clock:
+    def __init__(self, now=1_700_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class CountingBackend:
+    def __init__(self, backend):
+        self.backend = backend
+        self.calls = 0
+
+    def transition(self, *args):
+        self.calls += 1
+        return self.backend.transition(*args)
+
+
+def simulate(backends, rate, outage, duration, config):
+    """Drive every worker at `rate` calls/s; the upstream fails for the first `outage` seconds."""
+    clock = Clock()
+    start = clock.now
+    workers = [CircuitBreaker('openai_api', config, backend, clock) for backend in backends]
+    upstream = {'failed': 0, 'succeeded': 0, 'rejected': 0}
+
+    def request():
+        if clock.now - start < outage:
+            upstream['failed'] += 1
+            raise ConnectionError("upstream down")
+        upstream['succeeded'] += 1
+
+    for tick in range(int(duration * rate)):
+        clock.now = start + tick / rate
+        for worker in workers:
+            try:
+                worker.call(request)
+            except CircuitBreakerOpenError:
+                upstream['rejected'] += 1
+            except ConnectionError:
+                pass
+    upstream['probes'] = sum(worker.stats.probes for worker in workers)
+    return upstream
+
+
+def report(label, result, backends, calls):
+    round_trips = sum(b.calls for b in backends if isinstance(b, CountingBackend))
+    print(f"  {label:24s} failed upstream calls {result['failed']:6d}  rejected {result['rejected']:7d}  "
+          f"probes {result['probes']:4d}  "
+          f"state round trips/call {round_trips / calls:.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--rate", type=int, default=20, help="Calls per second per worker")
+    parser.add_argument("--outage", type=float, default=300.0, help="Seconds the upstream fails")
+    parser.add_argument("--duration", type=float, default=420.0)
+    parser.add_argument("--redis-url", default=None)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    config = CircuitBreakerConfig(failure_threshold=3, recovery_timeout=30, success_threshold=2, request_timeout=45)
+    calls = int(args.duration * args.rate) * args.workers
+    print(f"{args.workers} workers x {args.rate} calls/s, {args.outage:.0f} s outage, {calls} calls")
+
+    per_process = [CountingBackend(MemoryBreakerBackend()) for _ in range(args.workers)]
+    report('per-process breakers', simulate(per_process, args.rate, args.outage, args.duration, config),
+           [], calls)
+
+    shared_memory = CountingBackend(MemoryBreakerBackend())
+    report('shared (memory)', simulate([shared_memory] * args.workers, args.rate, args.outage, args.duration,
+                                       config), [shared_memory], calls)
+
+    if args.redis_url:
+        import redis
+        client = redis.Redis.from_url(args.redis_url)
+    else:
+        import fakeredis
+        client = fakeredis.FakeRedis()
+    try:
+        shared_redis = CountingBackend(RedisBreakerBackend(client))
+        client.delete('circuit:openai_api', 'circuit:openai_api:failures')
+        report('shared (redis script)', simulate([shared_redis] * args.workers, args.rate, args.outage,
+                                                 args.duration, config), [shared_redis], calls)
+    except Exception as e:
+        print(f"  (scripts unavailable on this client: {e})")
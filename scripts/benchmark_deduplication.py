@@ -0,0 +1,133 @@
+"""
+Deduplication Benchmark
+Per-result latency of AdvancedDeduplicationEngine on long sessions of
+synthetic interim and final results: the previous pairwise scan (every
+uncommitted segment aligned, every committed segment checked for overlap)
+against the time-bucketed SegmentIndex. Both engines see the same stream
+on a simulated clock, and their responses are compared.
+
+Usage:
+    python scripts/benchmark_deduplication.py --results 10000
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.deduplication_engine import AdvancedDeduplicationEngine, TranscriptionResult
+
+VOCABULARY = ('we need to ship the billing migration before friday and review the mobile release plan with the '
+              'security team so that customers see the new onboarding flow next week um yeah okay right').split()
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def interim_stream(count: int, seed: int = 3):
+    """(result, arrival time) pairs: growing interim hypotheses per utterance, then a final."""
+    rng = random.Random(seed)
+    t, n, stream = 0.0, 0, []
+    while len(stream) < count:
+        words = [rng.choice(VOCABULARY) for _ in range(rng.randint(3, 16))]
+        k = 0
+        while k < len(words):
+            k = min(len(words), k + rng.randint(1, 3))
+            text = words[:k]
+            if rng.random() < 0.25:
+                text = text[:]
+                text[rng.randrange(k)] = rng.choice(VOCABULARY)
+            result = TranscriptionResult(' '.join(text).capitalize(), rng.uniform(0.4, 0.75), t, t + 0.4 * k, f'c{n}')
+            stream.append((result, t + 0.4 * k + 0.3))
+            n += 1
+        result = TranscriptionResult(' '.join(words).capitalize() + '.', rng.uniform(0.8, 0.97), t,
+                                     t + 0.4 * len(words), f'c{n}', is_final=True)
+        stream.append((result, t + 0.4 * len(words) + 0.5))
+        n += 1
+        t += 0.4 * len(words) + rng.uniform(0.2, 1.0)
+    return stream[:count]
+
+
+class PairwiseScanEngine(AdvancedDeduplicationEngine):
+    """The previous lookups: full scans of active and committed segments."""
+
+    def _find_similar_segments(self, session_id, segment):
+        similar = []
+        for existing_segment in self.active_segments[session_id]:
+            if existing_segment.is_committed:
+                continue
+            similarity = self._calculate_text_similarity(existing_segment.text, segment.text)
+            temporal_overlap = self._calculate_temporal_overlap(existing_segment, segment)
+            if (similarity >= self.similarity_threshold and
+                    (temporal_overlap > 0.1 or abs(existing_segment.start_time - segment.start_time) < 2.0)):
+                similar.append(existing_segment)
+        return similar
+
+    def _resolve_overlaps(self, session_id, final_segment):
+        overlapping_segments = [committed for committed in self.committed_segments[session_id]
+                                if self._calculate_temporal_overlap(committed, final_segment) > 0.3]
+        if not overlapping_segments:
+            self.committed_segments[session_id].append(final_segment)
+            return {'action': 'committed_no_overlap', 'segment_count': 1}
+        best_segment = self._choose_best_segment([final_segment] + overlapping_segments)
+        for overlap in overlapping_segments:
+            if overlap in self.committed_segments[session_id]:
+                self.committed_segments[session_id].remove(overlap)
+        self.committed_segments[session_id].append(best_segment)
+        return {
+            'action': 'overlap_resolved',
+            'overlapping_segments': len(overlapping_segments),
+            'best_segment_id': best_segment.segment_id,
+            'resolution_method': 'highest_confidence'
+        }
+
+    def _cleanup_old_segments(self, session_id):
+        cutoff_time = self._clock() - (self.stability_window_s * 3)
+        active_segments = self.active_segments[session_id]
+        for segment in [s for s in active_segments if s.last_seen < cutoff_time and not s.is_committed]:
+            active_segments.remove(segment)
+
+
+def run(engine_class, stream):
+    clock = Clock()
+    engine = engine_class(clock=clock)
+    latencies, responses = [], []
+    for result, arrival in stream:
+        clock.now = arrival
+        start = time.perf_counter()
+        responses.append(engine.process_transcription_result('session', result))
+        latencies.append(time.perf_counter() - start)
+    return latencies, responses, engine.get_committed_transcript('session')
+
+
+def report(label, latencies):
+    ordered = sorted(latencies)
+    print(f"  {label:16s} p50 {ordered[len(ordered) // 2] * 1e6:7.1f} µs  "
+          f"p99 {ordered[int(len(ordered) * 0.99)] * 1e6:7.1f} µs  "
+          f"last 1000 mean {sum(latencies[-1000:]) / len(latencies[-1000:]) * 1e6:7.1f} µs  "
+          f"total {sum(latencies):6.2f} s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--results", type=int, default=10000, help="Interim and final results in the session")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    stream = interim_stream(args.results)
+    print(f"{args.results} results, {sum(r.is_final for r, _ in stream)} finals")
+    scan_latencies, scan_responses, scan_transcript = run(PairwiseScanEngine, stream)
+    indexed_latencies, indexed_responses, indexed_transcript = run(AdvancedDeduplicationEngine, stream)
+    report('pairwise scan', scan_latencies)
+    report('segment index', indexed_latencies)
+    identical = scan_responses == indexed_responses and scan_transcript == indexed_transcript
+    print(f"  responses identical: {identical}")
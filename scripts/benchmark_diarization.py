@@ -0,0 +1,161 @@
+"""
+Diarization Benchmark
+Simulates a multi-speaker meeting (10 speakers, 2 hours of 1-3 s segments by
+default) and measures:
+  - speaker matching: the per-profile scipy cosine loop the diarizers used to
+    run against SpeakerEmbeddingIndex.best_match (one matrix-vector product)
+  - end-of-meeting re-clustering over every segment of the meeting
+  - end-to-end MultiSpeakerDiarization / SpeakerDiarizationEngine cost per
+    segment on synthetic voices, with speaker purity before and after
+    re-clustering
+Usage:
+    python scripts/benchmark_diarization.py --hours 2 --speakers 10 --audio-segments 200
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+from collections import Counter
+
+import numpy as np
+from scipy.spatial.distance import cosine
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.multi_speaker_diarization import MultiSpeakerDiarization
+from services.speaker_diarization import DiarizationConfig, SpeakerDiarizationEngine
+from services.speaker_embedding_index import SpeakerEmbeddingIndex
+
+SAMPLE_RATE = 16000
+EMBEDDING_DIM = 39
+
+
+def make_speakers(count: int, rng: np.random.Generator):
+    """Random pitch, formants, spectral tilt and breathiness per speaker."""
+    return [dict(
+        f0=rng.uniform(85, 260),
+        formants=np.sort(rng.uniform([300, 900, 2000], [900, 2400, 3600])),
+        tilt=rng.uniform(0.5, 1.5),
+        breath=rng.uniform(0.005, 0.03)
+    ) for _ in range(count)]
+
+
+def utterance(speaker, seconds: float, rng: np.random.Generator) -> np.ndarray:
+    """Harmonic voice with vibrato, formant shaping and a syllable-rate envelope."""
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    f0 = speaker['f0'] * (1 + 0.05 * np.sin(2 * np.pi * rng.uniform(2, 5) * t + rng.uniform(0, 6)))
+    phase = 2 * np.pi * np.cumsum(f0) / SAMPLE_RATE
+    audio = np.zeros_like(t)
+    for k in range(1, int(7000 / speaker['f0']) + 1):
+        gain = sum(np.exp(-((k * speaker['f0'] - f) / 120) ** 2) for f in speaker['formants']) + 0.05
+        audio += gain * np.sin(k * phase) / k ** speaker['tilt']
+    envelope = 0.6 + 0.4 * np.sin(2 * np.pi * 4 * t + rng.uniform(0, 6)) ** 2
+    audio = 0.5 * audio * envelope / np.max(np.abs(audio)) + rng.normal(0, speaker['breath'], len(t))
+    return audio.astype(np.float32)
+
+
+def meeting_turns(hours: float, speakers: int, rng: np.random.Generator):
+    """(speaker, duration) turns of 1-3 s until the meeting length is reached."""
+    turns, elapsed = [], 0.0
+    while elapsed < hours * 3600:
+        duration = rng.uniform(1.0, 3.0)
+        turns.append((int(rng.integers(speakers)), duration))
+        elapsed += duration
+    return turns
+
+
+def purity(labels, truth):
+    """Share of segments in the majority true speaker of their cluster."""
+    majority = Counter()
+    for (label, _), count in Counter(zip(labels, truth)).items():
+        majority[label] = max(majority[label], count)
+    return sum(majority.values()) / len(truth)
+
+
+def bench_matching(turns, speakers: int, rng: np.random.Generator):
+    """Speaker matching and re-clustering over embedding vectors, no audio."""
+    voices = rng.normal(0, 1, (speakers, EMBEDDING_DIM)) + 5.0
+    embeddings = voices[[speaker for speaker, _ in turns]] + rng.normal(0, 0.3, (len(turns), EMBEDDING_DIM))
+    profiles = {f"speaker_{i + 1}": voices[i] for i in range(speakers)}
+
+    start = time.perf_counter()
+    for embedding in embeddings:
+        max(profiles, key=lambda speaker_id: 1 - cosine(embedding, profiles[speaker_id]))
+    loop = time.perf_counter() - start
+
+    index = SpeakerEmbeddingIndex(EMBEDDING_DIM, capacity=speakers, segment_capacity=len(turns))
+    for speaker_id, voice in profiles.items():
+        index.add_speaker(speaker_id, voice)
+    start = time.perf_counter()
+    for position, embedding in enumerate(embeddings):
+        speaker_id, _ = index.best_match(embedding)
+        index.update(speaker_id, embedding)
+        index.record_segment(f"seg{position}", speaker_id, embedding)
+    matched = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = index.recluster(max_speakers=speakers)
+    reclustered = time.perf_counter() - start
+
+    count = len(turns)
+    print(f"matching  {count} segments x {speakers} speakers")
+    print(f"  scipy cosine loop        {loop * 1e6 / count:8.1f} µs/segment")
+    print(f"  index match + update     {matched * 1e6 / count:8.1f} µs/segment   ({loop / matched:.1f}x)")
+    print(f"  re-cluster whole meeting {reclustered * 1000:8.1f} ms   "
+          f"{result.speaker_count} speakers, {result.iterations} passes")
+
+
+def bench_audio(turns, speakers: int, segments: int, rng: np.random.Generator):
+    """End-to-end diarization on synthetic voices for the first `segments` turns."""
+    voices = make_speakers(speakers, rng)
+    turns = turns[:segments]
+    multi = MultiSpeakerDiarization(max_speakers=speakers)
+    engine = SpeakerDiarizationEngine(DiarizationConfig(max_speakers=speakers))
+    engine.initialize_session('bench')
+
+    multi_time = engine_time = offset = 0.0
+    for position, (speaker, duration) in enumerate(turns):
+        audio = utterance(voices[speaker], duration, rng)
+        start = time.perf_counter()
+        multi.process_audio_segment(audio, offset, f"seg{position}")
+        multi_time += time.perf_counter() - start
+
+        pcm = (np.clip(audio, -1, 1) * 32767).astype(np.int16).tobytes()
+        start = time.perf_counter()
+        engine.process_audio_segment('bench', pcm, offset, offset + duration)
+        engine_time += time.perf_counter() - start
+        offset += duration
+
+    truth = [speaker for speaker, _ in turns]
+    multi_online = [entry['speaker_id'] for entry in multi.diarization_history]
+    engine_online = [segment.speaker_id for segment in engine.session_segments['bench']]
+    multi.finalize_meeting(background=False)
+    engine.finalize_session('bench', background=False)
+    multi_final = [entry['speaker_id'] for entry in multi.diarization_history]
+    engine_final = [segment.speaker_id for segment in engine.session_segments['bench']]
+
+    print(f"audio     {len(turns)} segments ({offset / 60:.1f} min)")
+    for name, elapsed, online, final in (('multi-speaker', multi_time, multi_online, multi_final),
+                                         ('engine', engine_time, engine_online, engine_final)):
+        print(f"  {name:14s} {elapsed * 1000 / len(turns):7.1f} ms/segment   "
+              f"purity online {purity(online, truth):.2f} ({len(set(online))} speakers)   "
+              f"re-clustered {purity(final, truth):.2f} ({len(set(final))} speakers)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--hours", type=float, default=2.0)
+    parser.add_argument("--speakers", type=int, default=10)
+    parser.add_argument("--audio-segments", type=int, default=200,
+                        help="Segments run through full feature extraction (0 to skip)")
+    parser.add_argument("--seed", type=int, default=38)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    rng = np.random.default_rng(args.seed)
+    turns = meeting_turns(args.hours, args.speakers, rng)
+    bench_matching(turns, args.speakers, rng)
+    if args.audio_segments:
+        bench_audio(turns, args.speakers, args.audio_segments, rng)
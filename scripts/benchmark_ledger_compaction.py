@@ -0,0 +1,154 @@
+"""
+Ledger Compaction Benchmark
+Compares row-batch compaction (select rows, summarise in Python, DELETE ... WHERE
+id IN (...)) with partition compaction (GROUP BY per partition, retire the
+whole partition), and measures insert latency of a concurrent writer while each
+one runs. Defaults to a SQLite file; pass --database-url to run against a
+PostgreSQL database migrated to the partitioned ledger.
+Usage:
+    python scripts/benchmark_ledger_compaction.py --events 200000 --days 120
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from sqlalchemy import and_, delete, or_, select, text
+
+from models import db
+from models.event_ledger import EventLedger, EventStatus, EventType
+from services.ledger_compactor import LedgerCompactor
+
+
+def make_app(database_url: str) -> Flask:
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_url
+    if database_url.startswith('sqlite'):
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {'connect_args': {'timeout': 30}}
+    db.init_app(app)
+    return app
+
+
+def seed(events: int, days: int):
+    rng = random.Random(35)
+    now = datetime.utcnow()
+    types = list(EventType)
+    rows = []
+    for _ in range(events):
+        rows.append(dict(
+            event_type=rng.choice(types), event_name='bench',
+            status=rng.choices([EventStatus.COMPLETED, EventStatus.FAILED, EventStatus.PENDING], [90, 3, 7])[0],
+            created_at=now - timedelta(days=rng.uniform(0, days)),
+            duration_ms=rng.uniform(1, 200), payload={'n': rng.random()},
+            event_version=1, conflict_resolution_strategy='server_wins',
+        ))
+    for start in range(0, len(rows), 10000):
+        db.session.execute(EventLedger.__table__.insert(), rows[start:start + 10000])
+    db.session.commit()
+
+
+def legacy_summary(events) -> dict:
+    """Per-row summary as the pre-partitioning compactor built it."""
+    by_type, by_status = {}, {}
+    for event in events:
+        by_type[event.event_type.value] = by_type.get(event.event_type.value, 0) + 1
+        by_status[event.status.value] = by_status.get(event.status.value, 0) + 1
+    return {'total_events': len(events), 'by_type': by_type, 'by_status': by_status,
+            'total_duration_ms': sum(e.duration_ms or 0.0 for e in events)}
+
+
+def legacy_compaction(compactor: LedgerCompactor, batch_size: int = 1000) -> int:
+    """The pre-partitioning loop: fetch a batch, summarise in Python, delete by id."""
+    now = datetime.utcnow()
+    expired = or_(*(
+        and_(EventLedger.status == status, EventLedger.created_at < now - timedelta(days=days))
+        for status, days in ((EventStatus.COMPLETED, compactor.RETENTION_DAYS_COMPLETED),
+                             (EventStatus.FAILED, compactor.RETENTION_DAYS_FAILED),
+                             (EventStatus.PENDING, compactor.RETENTION_DAYS_PENDING))
+    ))
+    total = 0
+    while True:
+        events = list(db.session.scalars(
+            select(EventLedger).where(expired).order_by(EventLedger.created_at.asc()).limit(batch_size)
+        ))
+        if not events:
+            return total
+        legacy_summary(events)
+        db.session.execute(delete(EventLedger).where(EventLedger.id.in_([e.id for e in events])))
+        db.session.commit()
+        total += len(events)
+
+
+def with_writer(app: Flask, work):
+    """Run `work` while another thread inserts events; returns (result, seconds, latencies_ms)."""
+    latencies = []
+    done = threading.Event()
+
+    def writer():
+        with app.app_context():
+            while not done.is_set():
+                start = time.perf_counter()
+                db.session.add(EventLedger(event_type=EventType.TASK_UPDATE, event_name='live',
+                                           status=EventStatus.PENDING, created_at=datetime.utcnow()))
+                db.session.commit()
+                latencies.append((time.perf_counter() - start) * 1000)
+                time.sleep(0.002)
+            db.session.remove()
+
+    thread = threading.Thread(target=writer, daemon=True)
+    thread.start()
+    start = time.perf_counter()
+    result = work()
+    elapsed = time.perf_counter() - start
+    done.set()
+    thread.join()
+    return result, elapsed, latencies
+
+
+def report(label: str, elapsed: float, compacted: int, latencies):
+    latencies = sorted(latencies) or [0.0]
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"{label:11s} {compacted:8d} events in {elapsed * 1000:9.1f} ms   "
+          f"writer p50 {statistics.median(latencies):6.2f} ms  p99 {p99:7.2f} ms  max {latencies[-1]:7.2f} ms  "
+          f"({len(latencies)} inserts)")
+
+
+def run(database_url: str, events: int, days: int):
+    app = make_app(database_url)
+    for label in ('row-batch', 'partition'):
+        with app.app_context():
+            db.drop_all()
+            db.create_all()
+            if database_url.startswith('sqlite'):
+                db.session.execute(text('PRAGMA journal_mode=WAL'))  # Readers don't block the writer
+            seed(events, days)
+            compactor = LedgerCompactor()
+            if label == 'row-batch':
+                compacted, elapsed, latencies = with_writer(app, lambda: legacy_compaction(compactor))
+            else:
+                result, elapsed, latencies = with_writer(
+                    app, lambda: compactor.compact_events(max_partitions=days + 1)
+                )
+                compacted = result.get('events_compacted', 0)
+            report(label, elapsed, compacted, latencies)
+            db.session.remove()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--events", type=int, default=200000)
+    parser.add_argument("--days", type=int, default=120)
+    args = parser.parse_args()
+    url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'ledger_bench.db')}"
+    print(f"{args.events} events over {args.days} days on {url.split(':')[0]}")
+    run(url, args.events, args.days)
@@ -0,0 +1,135 @@
+"""
+Log Pipeline Benchmark
+Measures caller-side logging cost per audio chunk: the per-chunk log calls of
+process_audio_sync through the previous synchronous JSON formatter at DEBUG,
+against the queue pipeline with lazy formatting at INFO and hot-path limits.
+Usage:
+    python scripts/benchmark_log_pipeline.py --chunks 20000
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+
+from services.log_pipeline import LogPipeline
+
+logger = logging.getLogger('services.transcription_service')
+
+
+class LegacyJsonFormatter(logging.Formatter):
+    """The previous app formatter: imports, hostname and Flask lookups on every record."""
+
+    def format(self, record):
+        import socket
+        from datetime import datetime, timezone
+        payload = {
+            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname, "logger": record.name, "message": record.getMessage(),
+            "module": record.module, "function": record.funcName, "line": record.lineno,
+            "process_id": record.process, "thread_id": record.thread,
+        }
+        payload["hostname"] = socket.gethostname()
+        try:
+            from flask import has_request_context, request, g
+            from flask_login import current_user
+            if has_request_context():
+                payload["request_id"] = getattr(g, "request_id", None)
+                payload["http"] = {"method": request.method, "path": request.path,
+                                   "ip": request.remote_addr, "user_agent": request.headers.get("User-Agent", "")}
+                try:
+                    if current_user and current_user.is_authenticated:
+                        payload["user"] = {"id": str(current_user.id)}
+                except Exception:
+                    pass
+        except Exception:
+            pass
+        for key, value in record.__dict__.items():
+            if key not in {"name", "msg", "args", "created", "filename", "funcName", "levelname", "levelno",
+                           "lineno", "module", "msecs", "message", "pathname", "process", "processName",
+                           "relativeCreated", "thread", "threadName", "exc_info", "exc_text", "stack_info",
+                           "getMessage", "asctime", "taskName"}:
+                payload[key] = value
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class Vad:
+    is_speech = True
+    confidence = 0.91
+
+
+def legacy_chunk(session_id, state, text, vad):
+    """process_audio_sync's log calls before this change (eager f-strings, ITER3 at INFO)."""
+    logger.debug(f"VAD Result for session {session_id}: is_speech={vad.is_speech}, confidence={vad.confidence}")
+    logger.debug(f"🔄 Buffering audio: {len(state['audio_buffer'])} chunks, {state['buffer_duration']:.2f}s")
+    logger.info(f"🎤 WHISPER API CALL: Sending buffered audio to Whisper for session {session_id}, combined size: {32000} bytes")
+    logger.info(f"✅ WHISPER SUCCESS: Got text '{text[:100]}...' for session {session_id} (latency: {412.5:.2f}ms)")
+    logger.info(f"🔧 ITER3: CONFIDENCE FILTER BYPASSED for '{text}' (conf: {0.42:.2f})")
+    logger.info(f"🚨 ITER3 EMERGENCY: Force finalizing '{text}' - bypassing all filters!")
+    logger.info(f"SYNC QUALITY CHECK PASSED for session {session_id}: '{text}' (confidence: {0.42:.2f})")
+
+
+def current_chunk(session_id, state, text, vad):
+    """The same log sites as they are now written."""
+    logger.debug("VAD Result for session %s: is_speech=%s, confidence=%s", session_id, vad.is_speech, vad.confidence)
+    logger.debug("🔄 Buffering audio: %d chunks, %.2fs", len(state['audio_buffer']), state['buffer_duration'])
+    logger.info("🎤 WHISPER API CALL: Sending buffered audio to Whisper for session %s, combined size: %d bytes", session_id, 32000)
+    logger.info("✅ WHISPER SUCCESS: Got text '%.100s...' for session %s (latency: %.2fms)", text, session_id, 412.5)
+    logger.debug("🔧 ITER3: CONFIDENCE FILTER BYPASSED for '%s' (conf: %.2f)", text, 0.42)
+    logger.debug("🚨 ITER3 EMERGENCY: Force finalizing '%s' - bypassing all filters!", text)
+    logger.info("SYNC QUALITY CHECK PASSED for session %s: '%s' (confidence: %.2f)", session_id, text, 0.42)
+
+
+def measure(chunk_fn, chunks):
+    state = {'audio_buffer': [b'x'] * 6, 'buffer_duration': 1.5}
+    text, vad = "so the next thing on the agenda is the quarterly roadmap", Vad()
+    app = Flask(__name__)
+    with app.test_request_context('/socket.io/', headers={'User-Agent': 'bench'}):
+        start = time.perf_counter()
+        for i in range(chunks):
+            chunk_fn('session-abc', state, text, vad)
+        return (time.perf_counter() - start) * 1e6 / chunks
+
+
+def run(chunks: int):
+    devnull = open(os.devnull, 'w')
+    root = logging.getLogger()
+
+    root.handlers[:] = []
+    handler = logging.StreamHandler(devnull)
+    handler.setFormatter(LegacyJsonFormatter())
+    root.addHandler(handler)
+    root.setLevel(logging.DEBUG)
+    legacy = measure(legacy_chunk, chunks)
+
+    pipeline = LogPipeline()
+    pipeline.configure(json_logs=True, level='INFO', async_logging=True, queue_size=chunks * 10, stream=devnull)
+    unlimited = measure(current_chunk, chunks)
+    pipeline.stop()
+
+    pipeline.configure(json_logs=True, level='INFO', async_logging=True, queue_size=chunks * 10, stream=devnull)
+    pipeline.limit_hot_paths(['services.transcription_service'], per_second=5)
+    start = time.perf_counter()
+    limited = measure(current_chunk, chunks)
+    pipeline.stop()
+    drain = (time.perf_counter() - start) * 1e6 / chunks
+    stats = pipeline.get_stats()
+
+    print(f"{chunks} chunks, caller-side logging cost per chunk")
+    print(f"  sync JSON formatter, DEBUG           {legacy:8.1f} us")
+    print(f"  queue pipeline, INFO                 {unlimited:8.1f} us")
+    print(f"  queue pipeline, INFO + hot-path cap  {limited:8.1f} us   "
+          f"(incl. listener drain {drain:.1f} us, suppressed {stats['suppressed']['services.transcription_service']})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chunks", type=int, default=20000)
+    args = parser.parse_args()
+    run(args.chunks)
@@ -0,0 +1,72 @@
+"""
+Meeting Insights Benchmark
+Feeds segments for many concurrent sessions from worker threads and measures
+throughput, per-segment latency and summary generation time.
+Usage:
+    python scripts/benchmark_meeting_insights.py --sessions 50 --segments 400
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.meeting_insights_service import MeetingInsightsService
+
+SENTENCES = [
+    "Let's review the project timeline and the remaining deliverables.",
+    "I'll send the updated budget report to finance by Friday.",
+    "We decided to move the launch milestone to next quarter.",
+    "The customer asked about latency on the new dashboard.",
+    "Yesterday I finished the migration, today I'm working on the blockers.",
+    "Can we brainstorm some ideas for the onboarding flow?",
+]
+
+
+def run(sessions: int, segments: int):
+    service = MeetingInsightsService()
+    latencies = [[] for _ in range(sessions)]
+    barrier = threading.Barrier(sessions)
+
+    def worker(n):
+        rng = random.Random(n)
+        session_id = f"bench-{n}"
+        barrier.wait()
+        for i in range(segments):
+            text = " ".join(rng.choice(SENTENCES) for _ in range(rng.randint(1, 3)))
+            start = time.perf_counter()
+            service.process_transcript_segment(session_id, f"speaker-{i % 4}", text, i * 3.0,
+                                               {'compound': rng.uniform(-1, 1)})
+            latencies[n].append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(sessions)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    flat = sorted(x * 1000 for per in latencies for x in per)
+    total = len(flat)
+    print(f"Sessions: {sessions}, segments/session: {segments}")
+    print(f"Throughput: {total / elapsed:9.0f} segments/s ({elapsed:.2f}s)")
+    print(f"Latency ms: p50={statistics.median(flat):.3f} p99={flat[int(total * 0.99) - 1]:.3f}")
+
+    start = time.perf_counter()
+    for n in range(sessions):
+        service.generate_meeting_summary(f"bench-{n}")
+    print(f"Summaries: {(time.perf_counter() - start) * 1000 / sessions:.2f} ms/session")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--segments", type=int, default=400)
+    args = parser.parse_args()
+    run(args.sessions, args.segments)
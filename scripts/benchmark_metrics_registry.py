@@ -0,0 +1,104 @@
+"""
+Metrics Registry Benchmark
+Per-observation cost of recording into the metrics registry: a counter
+increment, a histogram observation on a cached series, and the full
+labels(...).observe(...) path the request middleware takes. Each is timed
+single-threaded and with several writer threads, and compared against the
+previous PerformanceTracker bookkeeping (list append under a lock, and a
+sort of the last 1000 durations, meant to run every 100 operations but run
+on every one once the list is full).
+
+Usage:
+    python scripts/benchmark_metrics_registry.py --observations 1000000 --threads 4
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.metrics_registry import MetricsRegistry
+
+ROUTES = ['dashboard.index', 'api.meetings', 'api.tasks', 'auth.login', 'static', 'health']
+
+
+class SortingPercentiles:
+    """The previous PerformanceTracker bookkeeping."""
+
+    def __init__(self):
+        self.durations = []
+        self.lock = threading.RLock()
+
+    def observe(self, value):
+        with self.lock:
+            self.durations.append(value)
+            if len(self.durations) > 1000:
+                self.durations.pop(0)
+            if len(self.durations) % 100 == 0:
+                ordered = sorted(self.durations)
+                n = len(ordered)
+                self.percentiles = {q: ordered[int(n * q)] for q in (0.5, 0.9, 0.95, 0.99)}
+
+
+def timed(threads: int, observations: int, work):
+    """Nanoseconds per observation with `threads` writers sharing `observations`."""
+    per_thread = observations // threads
+    values = [random.Random(i).lognormvariate(-4, 1.2) for i in range(1024)]
+    barrier = threading.Barrier(threads + 1)
+
+    def run():
+        barrier.wait()
+        for i in range(per_thread):
+            work(values[i & 1023], i)
+        barrier.wait()
+
+    workers = [threading.Thread(target=run) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    barrier.wait()
+    start = time.perf_counter()
+    barrier.wait()
+    elapsed = time.perf_counter() - start
+    for worker in workers:
+        worker.join()
+    return elapsed / (per_thread * threads) * 1e9
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--observations", type=int, default=1000000)
+    parser.add_argument("--threads", type=int, default=4, help="Writer threads for the contended run")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    registry = MetricsRegistry()
+    counter = registry.counter('bench_events_total', 'Events').labels()
+    histogram = registry.histogram('bench_stage_seconds', 'Stage latency', ('stage',)).labels('asr')
+    requests = registry.histogram('bench_http_seconds', 'Request latency', ('route', 'method', 'status'))
+    legacy = SortingPercentiles()
+
+    cases = [
+        ('counter.inc', lambda value, i: counter.inc()),
+        ('histogram.observe', lambda value, i: histogram.observe(value)),
+        ('labels(...).observe', lambda value, i: requests.labels(ROUTES[i % 6], 'GET', 200).observe(value)),
+        ('previous: list + sort', lambda value, i: legacy.observe(value)),
+    ]
+    print(f"{args.observations} observations, per observation (includes loop overhead):")
+    for label, work in cases:
+        # Once full, the previous tracker sorts on every observation; fewer suffice
+        observations = min(args.observations, 20000) if work is cases[-1][1] else args.observations
+        single = timed(1, observations, work)
+        contended = timed(args.threads, observations, work)
+        print(f"  {label:24s} {single:7.0f} ns  ({args.threads} threads: {contended:7.0f} ns)")
+
+    loop_only = timed(1, args.observations, lambda value, i: None)
+    print(f"  {'empty loop':24s} {loop_only:7.0f} ns")
+
+    start = time.perf_counter()
+    text = registry.expose()
+    print(f"  exposition of {len(text.splitlines())} lines: {(time.perf_counter() - start) * 1000:.2f} ms")
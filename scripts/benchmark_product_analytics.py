@@ -0,0 +1,94 @@
+"""
+Product Analytics Benchmark
+Request-path latency of ProductAnalytics.track() and end-to-end insert
+throughput against a file-backed SQLite database, comparing the unbuffered
+path (one INSERT + COMMIT per event) with the buffered path (bounded buffer,
+bulk INSERT per batch from a background thread). Also times the report
+queries over the resulting table.
+Usage:
+    python scripts/benchmark_product_analytics.py --events 100000 --batch-size 500
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+
+from models import db
+from services.product_analytics import AnalyticsEventBuffer, ProductAnalytics
+
+EVENT_MIX = ['user.login', 'session.started', 'meeting.created', 'task.created', 'task.completed',
+             'session.completed', 'user.signup']
+
+
+def make_app(path: str) -> Flask:
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{path}'
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def run(app: Flask, analytics: ProductAnalytics, events: int, users: int):
+    """Track `events` events; returns (per-call latencies in µs, seconds until all are committed)."""
+    rng = np.random.default_rng(41)
+    names = rng.choice(EVENT_MIX, events)
+    user_ids = rng.integers(1, users + 1, events).tolist()
+    latencies = np.empty(events)
+    with app.app_context():
+        start = time.perf_counter()
+        for index in range(events):
+            call = time.perf_counter()
+            analytics.track(names[index], user_id=user_ids[index], properties={'n': index})
+            latencies[index] = time.perf_counter() - call
+        if analytics.buffer is not None:
+            analytics.buffer.shutdown()
+        return latencies * 1e6, time.perf_counter() - start
+
+
+def report(label: str, latencies: np.ndarray, elapsed: float):
+    print(f"  {label:<12s} track p50 {np.percentile(latencies, 50):8.1f} µs  p99 {np.percentile(latencies, 99):8.1f} µs  "
+          f"throughput {len(latencies) / elapsed:10,.0f} events/s  ({elapsed:.2f} s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=100000)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--skip-unbuffered", action="store_true", help="Skip the slow per-event commit path")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        print(f"{args.events:,} events, {args.users} users, SQLite file database")
+
+        if not args.skip_unbuffered:
+            app = make_app(os.path.join(workdir, 'unbuffered.db'))
+            report("unbuffered", *run(app, ProductAnalytics(buffered=False), args.events, args.users))
+
+        app = make_app(os.path.join(workdir, 'buffered.db'))
+        buffer = AnalyticsEventBuffer(batch_size=args.batch_size, max_age=2.0,
+                                      capacity=max(args.events, 10000),
+                                      spill_path=os.path.join(workdir, 'spill.jsonl'))
+        analytics = ProductAnalytics(buffer=buffer)
+        report("buffered", *run(app, analytics, args.events, args.users))
+        print(f"  {'':<12s} {buffer.stats['batches']} batches, {buffer.stats['spilled']} spilled")
+
+        with app.app_context():
+            for name, query in [('activation', lambda: analytics.get_activation_rate(days=7)),
+                                ('engagement', lambda: analytics.get_engagement_score(1, days=30)),
+                                ('retention', lambda: analytics.get_retention_cohort(cohort_days=0)),
+                                ('funnel', analytics.get_conversion_funnel)]:
+                start = time.perf_counter()
+                query()
+                print(f"  {name:<12s} {(time.perf_counter() - start) * 1000:8.1f} ms")
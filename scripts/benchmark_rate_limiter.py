@@ -0,0 +1,95 @@
+"""
+Rate Limiter Benchmark
+Per-check latency and accuracy of the previous pipelined sorted-set check
+against the atomic script engine (GCRA and sliding log), the in-memory
+backend, and the local pre-check for clients already over their limit.
+
+Runs against fakeredis by default (needs lupa for scripts); pass
+--redis-url to measure real round trips.
+Usage:
+    python scripts/benchmark_rate_limiter.py --checks 20000 --redis-url redis://localhost:6379/15
+"""
+
+import argparse
+import logging
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.rate_limit_engine import MemoryRateLimitBackend, RateLimitEngine, RedisRateLimitBackend
+
+
+def legacy_check(redis_client, key, limit, window):
+    """The previous check_rate_limit: second-resolution members, pipeline plus ZREM on denial."""
+    now = int(time.time())
+    pipe = redis_client.pipeline()
+    pipe.zremrangebyscore(key, 0, now - window)
+    pipe.zcard(key)
+    pipe.zadd(key, {str(now): now})
+    pipe.expire(key, window + 60)
+    count = pipe.execute()[1] + 1
+    if count > limit:
+        redis_client.zrem(key, str(now))
+    return count <= limit
+
+
+def measure(check, checks):
+    latencies = []
+    allowed = 0
+    for _ in range(checks):
+        start = time.perf_counter()
+        allowed += bool(check())
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return allowed, statistics.median(latencies) * 1e6, latencies[int(len(latencies) * 0.99)] * 1e6
+
+
+def report(label, result, limit):
+    allowed, p50, p99 = result
+    print(f"  {label:28s} p50 {p50:8.1f} µs  p99 {p99:8.1f} µs  admitted {allowed:6d} (limit {limit})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--checks", type=int, default=20000)
+    parser.add_argument("--limit", type=int, default=100, help="Requests per 60 s window")
+    parser.add_argument("--redis-url", default=None)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    if args.redis_url:
+        import redis
+        client = redis.Redis.from_url(args.redis_url)
+    else:
+        import fakeredis
+        client = fakeredis.FakeRedis()
+    client.flushdb()
+
+    print(f"{args.checks} checks from one client, limit {args.limit}/60 s, "
+          f"{'Redis ' + args.redis_url if args.redis_url else 'fakeredis'}")
+    report('legacy pipeline', measure(lambda: legacy_check(client, 'legacy', args.limit, 60), args.checks), args.limit)
+
+    try:
+        backend = RedisRateLimitBackend(client)
+        backend.gcra('probe', 1, 1)
+    except Exception as e:
+        backend = None
+        print(f"  (scripts unavailable on this client: {e})")
+
+    if backend:
+        for algorithm in ('gcra', 'sliding_log'):
+            engine = RateLimitEngine(backend, precheck=False)
+            report(f'script {algorithm}', measure(lambda: engine.check(f'script:{algorithm}', args.limit, 60,
+                                                                       algorithm).allowed, args.checks), args.limit)
+        engine = RateLimitEngine(backend)
+        report('script gcra + pre-check', measure(lambda: engine.check('precheck', args.limit, 60).allowed,
+                                                  args.checks), args.limit)
+        print(f"  {'':28s} {engine.get_stats()['backend_calls']} Redis round trips")
+
+    for algorithm in ('gcra', 'sliding_log'):
+        engine = RateLimitEngine(MemoryRateLimitBackend(), precheck=False)
+        report(f'memory {algorithm}', measure(lambda: engine.check('memory', args.limit, 60, algorithm).allowed,
+                                              args.checks), args.limit)
@@ -0,0 +1,83 @@
+"""
+Sentiment Trend Benchmark
+Measures wall time of the analytics sentiment-trend stage for a long meeting
+using a stub async OpenAI client with fixed latency.
+Usage:
+    python scripts/benchmark_sentiment_trend.py --hours 2 --latency-ms 400
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import services.analytics_service as analytics_module
+import services.llm_response_cache as llm_cache_module
+from services.llm_response_cache import LLMResponseCache
+
+WORDS = ("we should ship the release great plan problem with the build not good "
+         "really effective work agree next steps deadline is hard").split()
+
+
+class StubAsyncClient:
+    def __init__(self, latency_s: float):
+        self.calls = 0
+        self._latency_s = latency_s
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def _create(self, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self._latency_s)
+        if kwargs.get("response_format"):
+            windows = json.loads(kwargs["messages"][1]["content"])
+            content = json.dumps({"scores": [{"window": w["window"], "score": 0.1} for w in windows]})
+        else:
+            content = "0.1"
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+                               usage=SimpleNamespace(total_tokens=60))
+
+
+def make_windows(hours: float):
+    rng = random.Random(42)
+    windows = int(hours * 60 / 5)
+    # ~150 words per minute of speech
+    return [" ".join(rng.choice(WORDS) for _ in range(750)) for _ in range(windows)]
+
+
+async def sequential(service, texts):
+    """Previous behaviour: one awaited request per window."""
+    return [await service._get_text_sentiment(text) for text in texts]
+
+
+def run(hours: float, latency_ms: int):
+    texts = make_windows(hours)
+    print(f"Windows: {len(texts)} ({hours}h meeting), stub latency {latency_ms}ms\n")
+
+    for mode in ("sequential", "concurrent", "batched", "local"):
+        llm_cache_module._global_llm_cache = LLMResponseCache()
+        client = StubAsyncClient(latency_ms / 1000.0)
+        analytics_module.get_openai_client = lambda: client
+        service = analytics_module.AnalyticsService()
+        service.sentiment_trend_mode = mode
+
+        start = time.perf_counter()
+        if mode == "sequential":
+            asyncio.run(sequential(service, texts))
+        else:
+            asyncio.run(service._score_sentiment_windows(texts))
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{mode:12s} {elapsed:9.1f} ms   api_calls={client.calls}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--hours", type=float, default=2)
+    parser.add_argument("--latency-ms", type=int, default=400)
+    args = parser.parse_args()
+    run(args.hours, args.latency_ms)
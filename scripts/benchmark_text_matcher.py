@@ -0,0 +1,153 @@
+"""
+Text Matcher Benchmark
+Validates extracted tasks against a long synthetic meeting transcript with
+the previous implementation (SequenceMatcher over every word window and
+every sentence, transcript re-normalized per task) and with the indexed
+TextMatcher, and checks that both produce the same scores and quotes.
+
+Usage:
+    python scripts/benchmark_text_matcher.py --minutes 180 --tasks 100
+
+At the defaults the previous implementation alone takes several minutes.
+"""
+
+import argparse
+import logging
+import os
+import random
+import re
+import sys
+import time
+from difflib import SequenceMatcher
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.text_matcher import TextMatcher
+
+WORDS_PER_MINUTE = 150
+
+NAMES = ['alice', 'bob', 'carol', 'dmitri', 'priya', 'tomas', 'wei', 'fatima', 'jonas', 'keiko']
+SUBJECTS = ['the onboarding flow', 'the billing migration', 'the mobile release', 'the Q3 roadmap',
+            'the latency dashboard', 'the vendor contract', 'the search index', 'the hiring plan',
+            'the security review', 'the customer survey', 'the data retention policy', 'the API gateway']
+VERBS = ['review', 'update', 'draft', 'finalize', 'schedule', 'benchmark', 'document', 'migrate',
+         'audit', 'prototype', 'escalate', 'summarize']
+FILLERS = ['So I think', 'Honestly', 'Right, and', 'Okay so', 'Yeah, I mean', 'To be fair', 'Anyway',
+           'From my side', 'Just to add', 'If I remember correctly']
+CHATTER = ['we spent a lot of time on {s} last sprint', 'the numbers for {s} look better than expected',
+           'there is still some confusion around {s}', 'the team had mixed feelings about {s}',
+           'customers keep asking about {s}', 'we should not lose sight of {s}',
+           'I saw a comment about {s} in the channel', 'nobody has looked at {s} since March']
+COMMITMENTS = ['{n} will {v} {s} before {d}', "{n} said they'll {v} {s} by {d}",
+               'we need to {v} {s} by {d}', '{n} is going to {v} {s} and share it on {d}']
+DAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'the offsite', 'end of month']
+
+
+def synthetic_meeting(minutes: int, seed: int = 7):
+    """Transcript of roughly `minutes` of speech, plus the commitments made in it."""
+    rng = random.Random(seed)
+    lines, commitments, words = [], [], 0
+    while words < minutes * WORDS_PER_MINUTE:
+        speaker = rng.choice(NAMES).title()
+        if rng.random() < 0.08:
+            sentence = rng.choice(COMMITMENTS).format(n=rng.choice(NAMES).title(), v=rng.choice(VERBS),
+                                                      s=rng.choice(SUBJECTS), d=rng.choice(DAYS))
+            commitments.append(sentence)
+        else:
+            sentence = rng.choice(CHATTER).format(s=rng.choice(SUBJECTS))
+        line = f"{speaker}: {rng.choice(FILLERS)} {sentence}{rng.choice(['.', '?', '!', '.'])}"
+        lines.append(line)
+        words += len(line.split())
+    return '\n'.join(lines), commitments
+
+
+def extracted_tasks(commitments, count: int, seed: int = 11):
+    """Tasks as a model would return them: paraphrased commitments plus some hallucinations."""
+    rng = random.Random(seed)
+    tasks = []
+    for i in range(count):
+        if i % 5 == 4:
+            text = f"{rng.choice(NAMES).title()} to {rng.choice(VERBS)} the quarterly {rng.choice(['budget', 'offsite', 'press release'])}"
+        else:
+            words = rng.choice(commitments).split()
+            if rng.random() < 0.5:
+                del words[rng.randrange(len(words))]
+            text = ' '.join(words).capitalize()
+        tasks.append({'text': text})
+    return tasks
+
+
+# =============================================================================
+# PREVIOUS IMPLEMENTATION
+# =============================================================================
+
+def legacy_fuzzy(extracted, transcript):
+    stop_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for'}
+    key_words = [w for w in extracted.split() if w not in stop_words and len(w) > 2]
+    if not extracted or not transcript or not key_words:
+        return 0.0
+    word_match_ratio = sum(1 for word in key_words if word in transcript) / len(key_words)
+    words = transcript.split()
+    best_ratio = 0.0
+    for i in range(len(words) - len(key_words) + 1):
+        window = ' '.join(words[i:i + len(key_words) + 5])
+        best_ratio = max(best_ratio, SequenceMatcher(None, extracted, window).ratio())
+    return min((word_match_ratio * 0.7 + best_ratio * 0.3) * 100, 100.0)
+
+
+def legacy_evidence(matcher, extracted, transcript):
+    sentences = [s.strip() for s in re.split(r'[.!?]+', transcript) if len(s.strip()) > 10]
+    best_match, best_ratio = None, 0.0
+    extracted_words = set(matcher._normalize_text(extracted).split())
+    for sentence in sentences:
+        sentence_clean = matcher._normalize_text(sentence)
+        overlap_ratio = len(extracted_words & set(sentence_clean.split())) / len(extracted_words)
+        seq_ratio = SequenceMatcher(None, matcher._normalize_text(extracted), sentence_clean).ratio()
+        combined_ratio = overlap_ratio * 0.6 + seq_ratio * 0.4
+        if combined_ratio > best_ratio and combined_ratio > 0.3:
+            best_ratio, best_match = combined_ratio, sentence.strip()
+    return best_match if best_ratio > 0.3 else None
+
+
+def legacy_validate(matcher, text, transcript):
+    extracted = matcher._normalize_text(text)
+    transcript_clean = matcher._normalize_text(transcript)
+    fuzzy = legacy_fuzzy(extracted, transcript_clean)
+    keywords = [kw for kw in matcher.ACTION_KEYWORDS if kw in extracted]
+    matching = [kw for kw in keywords if kw in transcript_clean]
+    keyword = 50.0 if not keywords else (len(matching) / len(keywords)) * 100
+    quote = legacy_evidence(matcher, extracted, transcript)
+    return round(fuzzy * 0.6 + (40 if quote else 0) * 0.3 + keyword * 0.1, 2), quote
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--minutes", type=int, default=180, help="Length of the synthetic meeting")
+    parser.add_argument("--tasks", type=int, default=100)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    transcript, commitments = synthetic_meeting(args.minutes)
+    tasks = extracted_tasks(commitments, args.tasks)
+    print(f"{len(transcript.split())} transcript words, {len(tasks)} extracted tasks")
+
+    matcher = TextMatcher()
+    start = time.perf_counter()
+    legacy = [legacy_validate(matcher, task['text'], transcript) for task in tasks]
+    legacy_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index = matcher.get_index(transcript)
+    build_seconds = time.perf_counter() - start
+    indexed = [matcher.validate_extraction(task['text'], transcript, 'action', index=index) for task in tasks]
+    indexed_seconds = time.perf_counter() - start
+
+    mismatches = sum(1 for (score, quote), result in zip(legacy, indexed)
+                     if abs(score - result['confidence_score']) > 0.01 or quote != result['evidence_quote'])
+    stats = index.stats
+    print(f"  previous   {legacy_seconds:8.2f} s")
+    print(f"  indexed    {indexed_seconds:8.2f} s  (index build {build_seconds * 1000:.0f} ms)  "
+          f"{legacy_seconds / indexed_seconds:.0f}x faster")
+    print(f"  aligned {stats['windows_aligned']}/{stats['windows']} windows, "
+          f"{stats['sentences_aligned']}/{stats['sentences']} sentences")
+    print(f"  validated {sum(r['is_valid'] for r in indexed)}/{len(tasks)}, score/quote mismatches: {mismatches}")
@@ -0,0 +1,98 @@
+"""
+User Matching Benchmark
+Name-reference resolution against a synthetic workspace: build time of the
+WorkspaceNameIndex and per-lookup latency by kind of reference, compared
+with a naive scan that scores every member's name tokens.
+Usage:
+    python scripts/benchmark_user_matching.py --members 50000 --queries 2000
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.user_matching_service import WorkspaceNameIndex, normalize_name, trigrams
+
+FIRST = ['james', 'mary', 'robert', 'patricia', 'john', 'jennifer', 'michael', 'linda', 'william', 'elizabeth',
+         'david', 'barbara', 'richard', 'susan', 'joseph', 'jessica', 'thomas', 'sarah', 'charles', 'karen',
+         'christopher', 'nancy', 'daniel', 'lisa', 'matthew', 'betty', 'anthony', 'margaret', 'mark', 'sandra',
+         'siobhan', 'priya', 'wei', 'olusegun', 'mateo', 'aoife', 'yuki', 'fatima', 'dmitri', 'ingrid']
+# Consonant-vowel(-consonant) syllables; 2-3 per surname gives ~50k distinct surnames
+SYLLABLES = [c + v + e for c in 'bcdfghklmnprstvwz' for v in 'aeiou' for e in ('', 'n', 'r', 'l')]
+KINDS = {
+    'full name': lambda f, l, rng: f"{f} {l}",
+    'first name': lambda f, l, rng: f,
+    'nickname': lambda f, l, rng: {'robert': 'bob', 'william': 'bill', 'elizabeth': 'liz', 'michael': 'mike',
+                                   'richard': 'rick', 'daniel': 'dan', 'thomas': 'tom'}.get(f, f) + f" {l}",
+    'typo': lambda f, l, rng: f"{f} " + (l[:2] + l[3:] if len(l) > 4 else l + 'e'),
+    'unknown': lambda f, l, rng: 'xq' + ''.join(rng.choice(SYLLABLES, 2)),
+}
+
+
+def synthesize(members: int, seed: int = 43):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for user_id in range(1, members + 1):
+        first = str(rng.choice(FIRST))
+        last = ''.join(rng.choice(SYLLABLES, rng.integers(2, 4)))
+        rows.append((user_id, first.title(), last.title(), None, f"{first[0]}{last}{user_id}",
+                     f"{first}.{last}{user_id}@example.com"))
+    return rows
+
+
+def naive_match(rows, reference):
+    """Score every member: mean over reference tokens of the best trigram similarity."""
+    tokens = normalize_name(reference)
+    best, best_score = None, 0.0
+    for row in rows:
+        names = normalize_name(f"{row[1]} {row[2]}")
+        score = 0.0
+        for token in tokens:
+            grams = trigrams(token)
+            score += max(len(grams & trigrams(name)) / len(grams | trigrams(name)) for name in names)
+        if score > best_score:
+            best, best_score = row[0], score
+    return best
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--members", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--naive-queries", type=int, default=5)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    rows = synthesize(args.members)
+    start = time.perf_counter()
+    index = WorkspaceNameIndex.build(1, rows)
+    print(f"{args.members:,} members, index built in {(time.perf_counter() - start) * 1000:.0f} ms "
+          f"({len(index.tokens):,} tokens, {len(index.trigram_postings):,} trigrams)")
+
+    rng = np.random.default_rng(7)
+    for kind, make in KINDS.items():
+        picks = rng.integers(0, len(rows), args.queries)
+        references = [make(rows[i][1].lower(), rows[i][2].lower(), rng) for i in picks]
+        latencies = []
+        hits = 0
+        for target, reference in zip(picks, references):
+            started = time.perf_counter()
+            results = index.candidates(reference, limit=5)
+            latencies.append(time.perf_counter() - started)
+            hits += any(r.user_id == rows[target][0] for r in results)
+        latencies = np.array(latencies) * 1e6
+        print(f"  {kind:<11s} p50 {np.percentile(latencies, 50):7.1f} µs  p99 {np.percentile(latencies, 99):7.1f} µs  "
+              f"target in top 5: {hits / args.queries:6.1%}")
+
+    references = [KINDS['full name'](rows[i][1].lower(), rows[i][2].lower(), rng)
+                  for i in rng.integers(0, len(rows), args.naive_queries)]
+    started = time.perf_counter()
+    for reference in references:
+        naive_match(rows, reference)
+    print(f"  naive scan  {(time.perf_counter() - started) / len(references) * 1000:7.1f} ms per lookup")
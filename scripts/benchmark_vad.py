@@ -0,0 +1,72 @@
+"""
+VAD Benchmark
+Measures VADService cost in microseconds per 20 ms frame on synthetic audio that
+alternates speech-like harmonic bursts with low background noise, for several
+chunk sizes and for the full and fast tiers.
+Usage:
+    python scripts/benchmark_vad.py --seconds 60 --chunk-ms 20 100 500
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.vad_service import VADConfig, VADService
+
+SAMPLE_RATE = 16000
+FRAME_MS = 20
+
+
+def synthesize(seconds: float, seed: int = 37) -> np.ndarray:
+    """Alternating 1 s speech-like / background segments as int16 samples."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    speaking = (t.astype(int) % 2) == 0
+    f0 = 140 + 20 * np.sin(2 * np.pi * 0.5 * t)
+    phase = 2 * np.pi * np.cumsum(f0) / SAMPLE_RATE
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 8)) * (0.5 + 0.5 * np.sin(2 * np.pi * 4 * t) ** 2)
+    audio = np.where(speaking, 0.25 * voiced, 0.0) + rng.normal(0, 0.003, len(t))
+    return (np.clip(audio, -1, 1) * 32767).astype(np.int16)
+
+
+def run(audio: np.ndarray, chunk_ms: int, tier: str):
+    config = VADConfig(min_speech_duration=100)
+    if hasattr(config, 'tier'):
+        config.tier = tier
+    elif tier != 'full':
+        return None
+    vad = VADService(config)
+    chunk = SAMPLE_RATE * chunk_ms // 1000
+    chunks = [audio[i:i + chunk].tobytes() for i in range(0, len(audio) - chunk + 1, chunk)]
+
+    speech = 0
+    start = time.perf_counter()
+    for i, data in enumerate(chunks):
+        speech += vad.process_audio_chunk(data, i * chunk_ms / 1000).is_speech
+    elapsed = time.perf_counter() - start
+    frames = len(chunks) * chunk_ms / FRAME_MS
+    return elapsed * 1e6 / frames, speech / len(chunks)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=60)
+    parser.add_argument("--chunk-ms", type=int, nargs='+', default=[20, 100, 500])
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    audio = synthesize(args.seconds)
+    print(f"{args.seconds:.0f} s of audio, {FRAME_MS} ms frames")
+    for chunk_ms in args.chunk_ms:
+        for tier in ('full', 'fast'):
+            outcome = run(audio, chunk_ms, tier)
+            if outcome is None:
+                continue
+            per_frame, speech_ratio = outcome
+            print(f"chunk {chunk_ms:4d} ms  {tier:4s}  {per_frame:8.1f} µs/frame   speech {speech_ratio:5.1%}")
@@ -13,6 +13,8 @@ from datetime import datetime
 from openai import OpenAI
 from openai._exceptions import OpenAIError
 
+from services.llm_response_cache import cached_chat_completion
+
 logger = logging.getLogger(__name__)
 
 
@@ -58,7 +60,8 @@ class AIInsightsService:
         try:
             prompt = self._build_comprehensive_prompt(transcript_text, metadata)
             
-            response = self.client.chat.completions.create(
+            response = cached_chat_completion(
+                self.client, "ai insights: generate comprehensive insights",
                 model="gpt-4o-mini-2024-07-18",
                 messages=[
                     {
@@ -137,7 +140,8 @@ Be concise, accurate, and actionable. Use null for missing information."""
             return {"summary": "AI summary not available (API key not configured)", "paragraphs": []}
         
         try:
-            response = self.client.chat.completions.create(
+            response = cached_chat_completion(
+                self.client, "ai insights: generate summary",
                 model="gpt-4o-mini-2024-07-18",
                 messages=[
                     {
@@ -172,7 +176,8 @@ Be concise, accurate, and actionable. Use null for missing information."""
             return []
         
         try:
-            response = self.client.chat.completions.create(
+            response = cached_chat_completion(
+                self.client, "ai insights: extract key points",
                 model="gpt-4o-mini-2024-07-18",
                 messages=[
                     {
@@ -201,7 +206,8 @@ Be concise, accurate, and actionable. Use null for missing information."""
             return []
         
         try:
-            response = self.client.chat.completions.create(
+            response = cached_chat_completion(
+                self.client, "ai insights: extract action items",
                 model="gpt-4o-mini-2024-07-18",
                 messages=[
                     {
@@ -254,7 +260,8 @@ Return as JSON array with ALL tasks found:
             return []
         
         try:
-            response = self.client.chat.completions.create(
+            response = cached_chat_completion(
+                self.client, "ai insights: extract questions",
                 model="gpt-4o-mini-2024-07-18",
                 messages=[
                     {
@@ -283,7 +290,8 @@ Return as JSON array with ALL tasks found:
             return []
         
         try:
-            response = self.client.chat.completions.create(
+            response = cached_chat_completion(
+                self.client, "ai insights: extract decisions",
                 model="gpt-4o-mini-2024-07-18",
                 messages=[
                     {
@@ -312,7 +320,8 @@ Return as JSON array with ALL tasks found:
             return {"overall": "neutral", "score": 0.5, "explanation": "AI not available"}
         
         try:
-            response = self.client.chat.completions.create(
+            response = cached_chat_completion(
+                self.client, "ai insights: analyze sentiment",
                 model="gpt-4o-mini-2024-07-18",
                 messages=[
                     {
@@ -340,7 +349,8 @@ Return as JSON array with ALL tasks found:
             return []
         
         try:
-            response = self.client.chat.completions.create(
+            response = cached_chat_completion(
+                self.client, "ai insights: detect topics",
                 model="gpt-4o-mini-2024-07-18",
                 messages=[
                     {
@@ -369,7 +379,8 @@ Return as JSON array with ALL tasks found:
             return {"language": "unknown", "confidence": 0.0, "code": "und"}
         
         try:
-            response = self.client.chat.completions.create(
+            response = cached_chat_completion(
+                self.client, "ai insights: detect language",
                 model="gpt-4o-mini-2024-07-18",
                 messages=[
                     {
@@ -401,7 +412,8 @@ Return as JSON array with ALL tasks found:
             return {"result": "AI not available", "success": False}
         
         try:
-            response = self.client.chat.completions.create(
+            response = cached_chat_completion(
+                self.client, "ai insights: execute custom prompt",
                 model="gpt-4o-mini-2024-07-18",
                 messages=[
                     {
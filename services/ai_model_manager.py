@@ -6,6 +6,7 @@ This service provides:
 - Retry logic with exponential backoff (3 attempts per model)
 - Comprehensive API error logging
 - Degradation event tracking for monitoring
+- Optional prompt-level response cache with request coalescing (see llm_response_cache)
 """
 
 import logging
@@ -75,7 +76,9 @@ class AIModelManager:
         cls,
         api_call: Callable,
         operation_name: str = "AI operation",
-        custom_model_chain: Optional[List[str]] = None
+        custom_model_chain: Optional[List[str]] = None,
+        cache_request: Optional[Dict[str, Any]] = None,
+        cache_refresh: bool = False
     ) -> ModelFallbackResult:
         """
         Async version of call_with_fallback for async API calls.
@@ -84,12 +87,18 @@ class AIModelManager:
             api_call: Async function that takes model name and returns API response
             operation_name: Description for logging
             custom_model_chain: Optional custom model order
+            cache_request: Request payload (everything except the model) used as the
+                response cache key; caching is disabled when omitted
+            cache_refresh: Bypass cached responses and store the fresh one
             
         Returns:
             ModelFallbackResult with success status, model used, and response
         """
         import asyncio
         
+        if cache_request is not None:
+            api_call = cls._wrap_with_cache_async(api_call, operation_name, cache_request, cache_refresh)
+        
         models_to_try = custom_model_chain or cls.MODEL_FALLBACK_CHAIN
         primary_model = models_to_try[0]
         all_attempts = []
@@ -196,7 +205,9 @@ class AIModelManager:
         cls,
         api_call: Callable,
         operation_name: str = "AI operation",
-        custom_model_chain: Optional[List[str]] = None
+        custom_model_chain: Optional[List[str]] = None,
+        cache_request: Optional[Dict[str, Any]] = None,
+        cache_refresh: bool = False
     ) -> ModelFallbackResult:
         """
         Execute an OpenAI API call with intelligent model fallback and retry logic.
@@ -205,6 +216,11 @@ class AIModelManager:
             api_call: Function that takes model name and returns API response
             operation_name: Description for logging (e.g., "insights generation")
             custom_model_chain: Optional custom model order (defaults to standard chain)
+            cache_request: Request payload (everything except the model) used as the
+                response cache key; caching is disabled when omitted. Identical
+                requests within the TTL are served from cache and concurrent ones
+                are coalesced into a single API call.
+            cache_refresh: Bypass cached responses and store the fresh one
             
         Returns:
             ModelFallbackResult with success status, model used, and response
@@ -228,6 +244,9 @@ class AIModelManager:
                     logger.warning(f"Degraded to {result.model_used}")
             ```
         """
+        if cache_request is not None:
+            api_call = cls._wrap_with_cache(api_call, operation_name, cache_request, cache_refresh)
+        
         models_to_try = custom_model_chain or cls.MODEL_FALLBACK_CHAIN
         primary_model = models_to_try[0]
         all_attempts = []
@@ -352,6 +371,36 @@ class AIModelManager:
             degraded=False
         )
     
+    @staticmethod
+    def _wrap_with_cache(api_call: Callable, operation_name: str,
+                         cache_request: Dict[str, Any], cache_refresh: bool) -> Callable:
+        """Route a per-model API call through the shared LLM response cache."""
+        from services.llm_response_cache import get_llm_cache
+        cache = get_llm_cache()
+        
+        def cached_call(model: str):
+            return cache.get_or_call(
+                model, cache_request, lambda: api_call(model),
+                caller=operation_name, refresh=cache_refresh
+            )
+        
+        return cached_call
+    
+    @staticmethod
+    def _wrap_with_cache_async(api_call: Callable, operation_name: str,
+                               cache_request: Dict[str, Any], cache_refresh: bool) -> Callable:
+        """Async version of _wrap_with_cache."""
+        from services.llm_response_cache import get_llm_cache
+        cache = get_llm_cache()
+        
+        async def cached_call(model: str):
+            return await cache.get_or_call_async(
+                model, cache_request, lambda: api_call(model),
+                caller=operation_name, refresh=cache_refresh
+            )
+        
+        return cached_call
+    
     @staticmethod
     def _is_permission_error(error_message: str) -> bool:
         """Check if error is a permission/access denied error."""
@@ -741,22 +741,27 @@ class AnalysisService:
             # Use unified AI model manager with GPT-4.1 fallback chain
             from services.ai_model_manager import AIModelManager
             
+            request_params = {
+                "messages": [
+                    {"role": "system", "content": "You are a professional meeting analyst. Respond with valid JSON only."},
+                    {"role": "user", "content": prompt}
+                ],
+                "response_format": {"type": "json_object"},
+                "temperature": 0.2  # Lower temperature for consistency and reduced hallucination
+            }
+            
             def make_api_call(model: str):
                 """API call wrapper for model manager."""
-                return client.chat.completions.create(
-                    model=model,
-                    messages=[
-                        {"role": "system", "content": "You are a professional meeting analyst. Respond with valid JSON only."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    response_format={"type": "json_object"},
-                    temperature=0.2  # Lower temperature for consistency and reduced hallucination
-                )
+                return client.chat.completions.create(model=model, **request_params)
             
-            # Call with intelligent fallback and retry
+            # Call with intelligent fallback and retry. Identical prompts (pipeline
+            # retries, repeated clicks) are served from the shared LLM cache; retries
+            # after a bad response bypass it so a fresh completion is requested.
             result_obj = AIModelManager.call_with_fallback(
                 make_api_call,
-                operation_name="insights generation"
+                operation_name="insights generation",
+                cache_request=request_params,
+                cache_refresh=attempt > 0
             )
             
             if not result_obj.success:
@@ -0,0 +1,553 @@
+"""
+Analytics Rollup Service - daily per-workspace aggregates for dashboards
+
+Keeps WorkspaceDailyRollup rows in step with meetings, tasks and analytics so
+dashboard endpoints answer any date range with one aggregate query over at most
+one row per day, instead of counting and averaging the source tables.
+
+Maintenance is incremental: an after_flush listener collects the
+(workspace, day) buckets touched by the flushed Meeting, Task and Analytics
+changes and recomputes just those buckets from the source rows, inside the same
+transaction. Recomputing a bucket (rather than applying +/- deltas) keeps rows
+exact when old attribute values were never loaded. Bulk query.update() /
+query.delete() calls bypass the ORM flush; callers mark those buckets with
+mark_stale(), and rebuild_workspace() backfills or repairs a whole workspace.
+"""
+
+import logging
+import threading
+import weakref
+from dataclasses import dataclass, fields
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import and_, case, delete, event, func, inspect as sa_inspect, or_, select, true
+from sqlalchemy.orm import Session as OrmSession
+
+from models.analytics import Analytics
+from models.meeting import Meeting
+from models.task import Task
+from models.workspace_rollup import WorkspaceDailyRollup
+
+logger = logging.getLogger(__name__)
+
+RollupKey = Tuple[int, date]
+
+TASK_PRIORITIES = ('low', 'medium', 'high', 'urgent')
+
+# Attributes whose changes can move a rollup figure
+MEETING_ROLLUP_ATTRS = ('workspace_id', 'created_at', 'status')
+TASK_ROLLUP_ATTRS = ('meeting_id', 'created_at', 'status', 'priority', 'completed_at')
+ANALYTICS_ROLLUP_ATTRS = (
+    'meeting_id', 'analysis_status', 'total_duration_minutes', 'meeting_efficiency_score',
+    'meeting_effectiveness_score', 'overall_engagement_score', 'overall_sentiment_score',
+    'decisions_made_count', 'action_items_created'
+)
+
+_STALE_KEYS_INFO = 'analytics_rollup_stale_keys'
+
+# Days recomputed / written per statement (bounds filters and bind parameters)
+REFRESH_BATCH_DAYS = 31
+
+
+# ============================================
+# Range Totals
+# ============================================
+
+@dataclass
+class RollupTotals:
+    """Summed WorkspaceDailyRollup columns over a date range."""
+    meeting_count: int = 0
+    live_meeting_count: int = 0
+    analyzed_meeting_count: int = 0
+    duration_minutes_sum: float = 0.0
+    duration_count: int = 0
+    efficiency_sum: float = 0.0
+    efficiency_count: int = 0
+    effectiveness_sum: float = 0.0
+    effectiveness_count: int = 0
+    engagement_sum: float = 0.0
+    engagement_count: int = 0
+    sentiment_sum: float = 0.0
+    sentiment_count: int = 0
+    decisions_sum: int = 0
+    action_items_sum: int = 0
+    task_count: int = 0
+    completed_task_count: int = 0
+    completion_days_sum: int = 0
+    completion_days_count: int = 0
+    low_priority_task_count: int = 0
+    medium_priority_task_count: int = 0
+    high_priority_task_count: int = 0
+    urgent_priority_task_count: int = 0
+    tasks_created_count: int = 0
+
+    def average(self, metric: str) -> Optional[float]:
+        """
+        Mean of a summed metric over the rows that had a value.
+
+        Args:
+            metric: duration_minutes, efficiency, effectiveness, engagement,
+                    sentiment or completion_days
+
+        Returns:
+            The average, or None when no row had a value
+        """
+        count = getattr(self, f"{metric.replace('_minutes', '')}_count")
+        if not count:
+            return None
+        return getattr(self, f"{metric}_sum") / count
+
+    @property
+    def task_completion_rate(self) -> float:
+        """Completed share of the tasks, as a percentage rounded to 0.1."""
+        if not self.task_count:
+            return 0
+        return round(self.completed_task_count / self.task_count * 100, 1)
+
+    @property
+    def priority_distribution(self) -> Dict[str, int]:
+        """Task counts per priority, omitting priorities with no tasks."""
+        distribution = {}
+        for priority in TASK_PRIORITIES:
+            count = getattr(self, f"{priority}_priority_task_count")
+            if count:
+                distribution[priority] = count
+        return distribution
+
+
+ROLLUP_COLUMNS = [f.name for f in fields(RollupTotals)]
+
+
+def _as_date(value: Any) -> Optional[date]:
+    """Normalize a DATE()/timestamp result (sqlite returns strings) to a date."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def _day_ranges(column, days: Iterable[date]):
+    """Index-friendly 'column falls on one of these days' condition."""
+    return or_(*[
+        and_(column >= datetime.combine(day, time.min),
+             column < datetime.combine(day + timedelta(days=1), time.min))
+        for day in sorted(days)
+    ])
+
+
+class AnalyticsRollupService:
+    """Reads and maintains the daily workspace analytics rollup."""
+
+    def __init__(self):
+        self._table_ready: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+        self._listeners_installed = False
+        self._install_lock = threading.Lock()
+
+    # ============================================
+    # Queries
+    # ============================================
+
+    def get_totals(self, workspace_id: int, start_day: Optional[date] = None,
+                   end_day: Optional[date] = None, session=None) -> RollupTotals:
+        """
+        Sum the rollup for a workspace over an inclusive day range.
+
+        Args:
+            workspace_id: Workspace to aggregate
+            start_day: First day (None = from the beginning)
+            end_day: Last day (None = no upper bound)
+            session: SQLAlchemy session (defaults to db.session)
+
+        Returns:
+            RollupTotals for the range, from a single query
+        """
+        session = session or self._default_session()
+        columns = [
+            func.coalesce(func.sum(getattr(WorkspaceDailyRollup, name)), 0)
+            for name in ROLLUP_COLUMNS
+        ]
+        stmt = select(*columns).where(WorkspaceDailyRollup.workspace_id == workspace_id)
+        if start_day is not None:
+            stmt = stmt.where(WorkspaceDailyRollup.day >= start_day)
+        if end_day is not None:
+            stmt = stmt.where(WorkspaceDailyRollup.day <= end_day)
+
+        row = session.execute(stmt).one()
+        return RollupTotals(**dict(zip(ROLLUP_COLUMNS, row)))
+
+    def get_totals_since(self, workspace_id: int, days: int, session=None) -> RollupTotals:
+        """Totals for the last `days` days, including the whole cutoff day."""
+        start_day = (datetime.now() - timedelta(days=days)).date()
+        return self.get_totals(workspace_id, start_day=start_day, session=session)
+
+    # ============================================
+    # Maintenance
+    # ============================================
+
+    def refresh(self, connection, keys: Iterable[RollupKey]):
+        """
+        Recompute rollup rows for (workspace_id, day) buckets from source rows.
+
+        Args:
+            connection: Connection inside the writing transaction
+            keys: Buckets to recompute; days with no data are stored as zeros
+        """
+        by_workspace: Dict[int, Set[date]] = {}
+        for workspace_id, day in keys:
+            if workspace_id is not None and day is not None:
+                by_workspace.setdefault(workspace_id, set()).add(day)
+
+        for workspace_id, days in by_workspace.items():
+            ordered = sorted(days)
+            for start in range(0, len(ordered), REFRESH_BATCH_DAYS):
+                batch = ordered[start:start + REFRESH_BATCH_DAYS]
+                rows = self._compute_days(connection, workspace_id, set(batch))
+                self._upsert(connection, [
+                    dict(workspace_id=workspace_id, day=day, **rows.get(day, {}))
+                    for day in batch
+                ])
+
+    def rebuild_workspace(self, workspace_id: int, session=None) -> int:
+        """
+        Recompute every rollup row of a workspace (backfill / repair).
+
+        Args:
+            workspace_id: Workspace to rebuild
+            session: SQLAlchemy session (defaults to db.session); not committed
+
+        Returns:
+            Number of rollup rows written
+        """
+        session = session or self._default_session()
+        connection = session.connection()
+
+        rows = self._compute_days(connection, workspace_id, None)
+        rows.pop(None, None)  # Meetings/tasks without created_at
+        connection.execute(delete(WorkspaceDailyRollup).where(
+            WorkspaceDailyRollup.workspace_id == workspace_id
+        ))
+        ordered = [dict(workspace_id=workspace_id, day=day, **rows[day]) for day in sorted(rows)]
+        for start in range(0, len(ordered), REFRESH_BATCH_DAYS):
+            self._upsert(connection, ordered[start:start + REFRESH_BATCH_DAYS])
+        logger.info(f"📊 Rebuilt analytics rollup for workspace {workspace_id}: {len(rows)} days")
+        return len(rows)
+
+    def mark_stale(self, session, workspace_id: int, days: Iterable[date]):
+        """
+        Queue buckets for recomputation at the session's next flush.
+
+        Use around bulk query.update()/query.delete() calls, which the flush
+        listener never sees.
+        """
+        stale = session.info.setdefault(_STALE_KEYS_INFO, set())
+        stale.update((workspace_id, _as_date(day)) for day in days)
+
+    def task_created_days(self, session, meeting_id: int) -> Set[date]:
+        """Creation days of a meeting's tasks (for mark_stale before a bulk delete)."""
+        days = session.execute(
+            select(func.date(Task.created_at)).where(
+                Task.meeting_id == meeting_id,
+                Task.created_at.isnot(None)
+            ).distinct()
+        ).scalars().all()
+        return {_as_date(d) for d in days}
+
+    def install_listeners(self):
+        """Register the after_flush listener on all ORM sessions (idempotent)."""
+        with self._install_lock:
+            if self._listeners_installed:
+                return
+            event.listen(OrmSession, 'after_flush', self._after_flush)
+            self._listeners_installed = True
+
+    # ============================================
+    # Bucket Recompute
+    # ============================================
+
+    def _compute_days(self, connection, workspace_id: int,
+                      days: Optional[Set[date]]) -> Dict[date, Dict[str, Any]]:
+        """Rollup column values per day, from the source tables (days=None: all days)."""
+        result: Dict[date, Dict[str, Any]] = {}
+        meeting_day = func.date(Meeting.created_at)
+        in_days = _day_ranges(Meeting.created_at, days) if days is not None else true()
+
+        # Meetings with their (unique) analytics row
+        meeting_rows = connection.execute(
+            select(
+                meeting_day,
+                func.count(Meeting.id),
+                func.sum(case((Meeting.status == 'live', 1), else_=0)),
+                func.sum(case((Analytics.analysis_status == 'completed', 1), else_=0)),
+                func.sum(Analytics.total_duration_minutes), func.count(Analytics.total_duration_minutes),
+                func.sum(Analytics.meeting_efficiency_score), func.count(Analytics.meeting_efficiency_score),
+                func.sum(Analytics.meeting_effectiveness_score), func.count(Analytics.meeting_effectiveness_score),
+                func.sum(Analytics.overall_engagement_score), func.count(Analytics.overall_engagement_score),
+                func.sum(Analytics.overall_sentiment_score), func.count(Analytics.overall_sentiment_score),
+                func.sum(Analytics.decisions_made_count),
+                func.sum(Analytics.action_items_created),
+            )
+            .select_from(Meeting)
+            .outerjoin(Analytics, Analytics.meeting_id == Meeting.id)
+            .where(Meeting.workspace_id == workspace_id, in_days)
+            .group_by(meeting_day)
+        ).all()
+        meeting_columns = (
+            'meeting_count', 'live_meeting_count', 'analyzed_meeting_count',
+            'duration_minutes_sum', 'duration_count', 'efficiency_sum', 'efficiency_count',
+            'effectiveness_sum', 'effectiveness_count', 'engagement_sum', 'engagement_count',
+            'sentiment_sum', 'sentiment_count', 'decisions_sum', 'action_items_sum'
+        )
+        for row in meeting_rows:
+            values = result.setdefault(_as_date(row[0]), {})
+            for name, value in zip(meeting_columns, row[1:]):
+                values[name] = value or 0
+
+        # Tasks of those meetings, by priority
+        task_rows = connection.execute(
+            select(
+                meeting_day,
+                Task.priority,
+                func.count(Task.id),
+                func.sum(case((Task.status == 'completed', 1), else_=0)),
+            )
+            .select_from(Task)
+            .join(Meeting, Task.meeting_id == Meeting.id)
+            .where(Meeting.workspace_id == workspace_id, in_days)
+            .group_by(meeting_day, Task.priority)
+        ).all()
+        for day, priority, count, completed in task_rows:
+            values = result.setdefault(_as_date(day), {})
+            values['task_count'] = values.get('task_count', 0) + count
+            values['completed_task_count'] = values.get('completed_task_count', 0) + (completed or 0)
+            if priority in TASK_PRIORITIES:
+                column = f"{priority}_priority_task_count"
+                values[column] = values.get(column, 0) + count
+
+        # Whole days from creation to completion (portable: computed here)
+        completion_rows = connection.execute(
+            select(meeting_day, Task.created_at, Task.completed_at)
+            .select_from(Task)
+            .join(Meeting, Task.meeting_id == Meeting.id)
+            .where(
+                Meeting.workspace_id == workspace_id, in_days,
+                Task.status == 'completed',
+                Task.completed_at.isnot(None),
+                Task.created_at.isnot(None)
+            )
+        ).all()
+        for day, created_at, completed_at in completion_rows:
+            values = result.setdefault(_as_date(day), {})
+            values['completion_days_sum'] = values.get('completion_days_sum', 0) + (completed_at - created_at).days
+            values['completion_days_count'] = values.get('completion_days_count', 0) + 1
+
+        # Tasks created on each day, whatever their meeting's day. For a few
+        # days, scan those days' tasks (created_at index) and keep this
+        # workspace's rows, rather than walking every meeting of the workspace
+        task_day = func.date(Task.created_at)
+        stmt = (
+            select(task_day, Meeting.workspace_id, func.count(Task.id))
+            .select_from(Task)
+            .join(Meeting, Task.meeting_id == Meeting.id)
+            .group_by(task_day, Meeting.workspace_id)
+        )
+        if days is not None:
+            stmt = stmt.where(_day_ranges(Task.created_at, days))
+        else:
+            stmt = stmt.where(Meeting.workspace_id == workspace_id, Task.created_at.isnot(None))
+        for day, task_workspace_id, count in connection.execute(stmt):
+            if task_workspace_id != workspace_id:
+                continue
+            result.setdefault(_as_date(day), {})['tasks_created_count'] = count
+
+        return result
+
+    def _upsert(self, connection, rows: List[Dict[str, Any]]):
+        """Insert or overwrite rollup rows keyed by (workspace_id, day)."""
+        if not rows:
+            return
+        now = datetime.now()
+        for row in rows:
+            for name in ROLLUP_COLUMNS:
+                row.setdefault(name, 0)
+            row['updated_at'] = now
+
+        dialect = connection.dialect.name
+        if dialect in ('postgresql', 'sqlite'):
+            if dialect == 'postgresql':
+                from sqlalchemy.dialects.postgresql import insert
+            else:
+                from sqlalchemy.dialects.sqlite import insert
+            stmt = insert(WorkspaceDailyRollup).values(rows)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=['workspace_id', 'day'],
+                set_={name: stmt.excluded[name] for name in ROLLUP_COLUMNS + ['updated_at']}
+            )
+            connection.execute(stmt)
+            return
+
+        for row in rows:
+            connection.execute(delete(WorkspaceDailyRollup).where(
+                WorkspaceDailyRollup.workspace_id == row['workspace_id'],
+                WorkspaceDailyRollup.day == row['day']
+            ))
+        connection.execute(WorkspaceDailyRollup.__table__.insert(), rows)
+
+    # ============================================
+    # Flush Listener
+    # ============================================
+
+    def _after_flush(self, session, flush_context):
+        """Recompute the buckets touched by this flush."""
+        stale = session.info.pop(_STALE_KEYS_INFO, set())
+        meeting_ids: Set[int] = set()
+        task_ids: Set[int] = set()
+        keys: Set[RollupKey] = set(stale)
+        task_created: Set[Tuple[int, date]] = set()  # (meeting_id, day) of deleted tasks
+        moved_meetings: Dict[int, List[int]] = {}  # meeting_id -> previous workspace ids
+
+        for obj, is_new, deleted in self._changed_objects(session):
+            if isinstance(obj, Meeting):
+                if is_new or deleted or self._changed(obj, MEETING_ROLLUP_ATTRS):
+                    keys.update(self._old_meeting_keys(obj))
+                    if obj.id is not None and not deleted:
+                        meeting_ids.add(obj.id)
+                        previous = sa_inspect(obj).attrs['workspace_id'].history.deleted
+                        if previous and not is_new:
+                            moved_meetings[obj.id] = list(previous)
+            elif isinstance(obj, Task):
+                if is_new or deleted or self._changed(obj, TASK_ROLLUP_ATTRS):
+                    for meeting_id in self._values(obj, 'meeting_id'):
+                        meeting_ids.add(meeting_id)
+                        for created_at in self._values(obj, 'created_at'):
+                            task_created.add((meeting_id, _as_date(created_at)))
+                    if obj.id is not None and not deleted:
+                        task_ids.add(obj.id)
+            elif isinstance(obj, Analytics):
+                if is_new or deleted or self._changed(obj, ANALYTICS_ROLLUP_ATTRS):
+                    meeting_ids.update(self._values(obj, 'meeting_id'))
+
+        if not keys and not meeting_ids and not task_ids:
+            return
+
+        # The refresh shares the caller's transaction; run it in a SAVEPOINT so
+        # a failed statement rolls back only the refresh (on Postgres it would
+        # otherwise abort the transaction and fail the caller's commit)
+        connection = session.connection()
+        try:
+            with connection.begin_nested():
+                if not self._has_table(connection):
+                    return
+                keys.update(self._resolve_keys(connection, meeting_ids, task_ids, task_created, moved_meetings))
+                self.refresh(connection, keys)
+        except Exception as e:
+            logger.warning(f"⚠️ Analytics rollup refresh failed: {e}")
+
+    @staticmethod
+    def _changed_objects(session):
+        """(object, is_new, is_deleted) for everything in the flush."""
+        for obj in session.new:
+            yield obj, True, False
+        for obj in session.dirty:
+            yield obj, False, False
+        for obj in session.deleted:
+            yield obj, False, True
+
+    @staticmethod
+    def _changed(obj, attrs) -> bool:
+        state = sa_inspect(obj)
+        return any(state.attrs[attr].history.has_changes() for attr in attrs)
+
+    @staticmethod
+    def _values(obj, attr) -> List[Any]:
+        """Current and previous loaded values of an attribute (no lazy loads)."""
+        attribute = sa_inspect(obj).attrs[attr]
+        history = attribute.history
+        values = list(history.added) + list(history.unchanged) + list(history.deleted)
+        return [value for value in dict.fromkeys(values) if value is not None]
+
+    def _old_meeting_keys(self, meeting) -> Set[RollupKey]:
+        """Buckets a meeting counted in before this flush."""
+        keys = set()
+        for workspace_id in self._values(meeting, 'workspace_id'):
+            for created_at in self._values(meeting, 'created_at'):
+                keys.add((workspace_id, _as_date(created_at)))
+        return keys
+
+    @staticmethod
+    def _resolve_keys(connection, meeting_ids: Set[int], task_ids: Set[int],
+                      task_created: Set[Tuple[int, date]],
+                      moved_meetings: Dict[int, List[int]]) -> Set[RollupKey]:
+        """Map touched meetings and tasks to their buckets, as now stored."""
+        keys: Set[RollupKey] = set()
+        meeting_workspaces: Dict[int, int] = {}
+
+        all_meeting_ids = meeting_ids | {meeting_id for meeting_id, _ in task_created}
+        if all_meeting_ids:
+            for meeting_id, workspace_id, created_at in connection.execute(
+                select(Meeting.id, Meeting.workspace_id, Meeting.created_at)
+                .where(Meeting.id.in_(all_meeting_ids))
+            ):
+                meeting_workspaces[meeting_id] = workspace_id
+                if meeting_id in meeting_ids:
+                    keys.add((workspace_id, _as_date(created_at)))
+
+        for meeting_id, day in task_created:
+            if meeting_id in meeting_workspaces:
+                keys.add((meeting_workspaces[meeting_id], day))
+
+        if task_ids:
+            for workspace_id, created_at in connection.execute(
+                select(Meeting.workspace_id, Task.created_at)
+                .join(Meeting, Task.meeting_id == Meeting.id)
+                .where(Task.id.in_(task_ids))
+            ):
+                keys.add((workspace_id, _as_date(created_at)))
+
+        # Tasks follow a meeting that changed workspace: their creation days
+        # move between the two workspaces' buckets
+        if moved_meetings:
+            for meeting_id, created_at in connection.execute(
+                select(Task.meeting_id, Task.created_at).where(Task.meeting_id.in_(moved_meetings))
+            ):
+                day = _as_date(created_at)
+                keys.add((meeting_workspaces.get(meeting_id), day))
+                keys.update((workspace_id, day) for workspace_id in moved_meetings[meeting_id])
+        return keys
+
+    def _has_table(self, connection) -> bool:
+        """Whether the rollup table exists (cached per engine)."""
+        engine = connection.engine
+        ready = self._table_ready.get(engine)
+        if ready is None:
+            ready = sa_inspect(connection).has_table(WorkspaceDailyRollup.__tablename__)
+            self._table_ready[engine] = ready
+            if not ready:
+                logger.warning("⚠️ workspace_daily_rollups table missing; analytics rollup disabled")
+        return ready
+
+    @staticmethod
+    def _default_session():
+        from models import db
+        return db.session
+
+
+# ============================================
+# Global Service Instance
+# ============================================
+
+_rollup_service: Optional[AnalyticsRollupService] = None
+_rollup_lock = threading.Lock()
+
+
+def get_analytics_rollup_service() -> AnalyticsRollupService:
+    """Get global analytics rollup service instance (thread-safe)."""
+    global _rollup_service
+    if _rollup_service is None:
+        with _rollup_lock:
+            if _rollup_service is None:
+                _rollup_service = AnalyticsRollupService()
+    return _rollup_service
@@ -3,13 +3,16 @@ Analytics Service
 Comprehensive meeting analytics, insights, and performance metrics calculation.
 """
 
+import asyncio
 import json
+import os
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 from statistics import mean, median
 from collections import defaultdict
 from models import db, Analytics, Meeting, Participant, Task, Session, Segment
 from services.openai_client_manager import get_openai_client
+from services.llm_response_cache import cached_chat_completion_async
 from services.event_broadcaster import EventBroadcaster
 
 
@@ -20,6 +23,10 @@ class AnalyticsService:
         self.client = get_openai_client()
         self.event_broadcaster = EventBroadcaster()
         
+        # Sentiment trend scoring: "batched" (one request), "concurrent" or "local"
+        self.sentiment_trend_mode = os.environ.get("ANALYTICS_SENTIMENT_MODE", "batched")
+        self.sentiment_max_concurrency = int(os.environ.get("ANALYTICS_SENTIMENT_CONCURRENCY", "4"))
+        
         # Keywords for different analysis
         self.decision_keywords = [
             "decide", "decision", "agreed", "consensus", "vote", "choose",
@@ -211,9 +218,6 @@ class AnalyticsService:
 
     async def _analyze_sentiment_trend(self, session: Session) -> List[float]:
         """Analyze sentiment trend over time during the meeting."""
-        if not self.client:
-            return [0.0]
-        
         segments = db.session.query(Segment).filter_by(
             session_id=session.id, 
             is_final=True
@@ -232,14 +236,89 @@ class AnalyticsService:
             window_index = int(time_diff // window_size)
             time_windows[window_index].append(segment.text)
         
-        # Analyze sentiment for each window
-        sentiment_trend = []
-        for window_index in sorted(time_windows.keys()):
-            window_text = " ".join(time_windows[window_index])
-            sentiment = await self._get_text_sentiment(window_text)
-            sentiment_trend.append(sentiment)
+        window_texts = [" ".join(time_windows[i]) for i in sorted(time_windows.keys())]
+        return await self._score_sentiment_windows(window_texts)
+
+    async def _score_sentiment_windows(self, window_texts: List[str]) -> List[float]:
+        """
+        Score sentiment for each time window.
+        
+        Modes (ANALYTICS_SENTIMENT_MODE):
+        - "batched": all windows scored in a single structured LLM request
+        - "concurrent": one request per window, at most ANALYTICS_SENTIMENT_CONCURRENCY in flight
+        - "local": lexicon scoring only, no API calls
+        
+        Windows the LLM fails to score fall back to the local lexicon score.
+        """
+        if not window_texts:
+            return []
+        
+        if not self.client or self.sentiment_trend_mode == "local":
+            return self._local_window_sentiment(window_texts)
+        
+        if self.sentiment_trend_mode == "concurrent":
+            semaphore = asyncio.Semaphore(self.sentiment_max_concurrency)
+            
+            async def score(text: str) -> float:
+                async with semaphore:
+                    return await self._get_text_sentiment(text)
+            
+            return list(await asyncio.gather(*(score(text) for text in window_texts)))
+        
+        scores = await self._get_batched_sentiment(window_texts)
+        if scores is None:
+            return self._local_window_sentiment(window_texts)
+        return scores
+
+    async def _get_batched_sentiment(self, window_texts: List[str]) -> Optional[List[float]]:
+        """Score all windows in one structured request. Returns None if the request fails."""
+        windows_payload = [
+            {"window": i, "text": text[:500]}  # Same per-window limit as _get_text_sentiment
+            for i, text in enumerate(window_texts)
+        ]
+        
+        try:
+            response = await cached_chat_completion_async(
+                self.client, "analytics: batched sentiment",
+                model="gpt-3.5-turbo",
+                messages=[
+                    {
+                        "role": "system",
+                        "content": "Analyze the sentiment of each meeting window. Return a JSON object "
+                                   "{\"scores\": [{\"window\": <index>, \"score\": <number between -1 (very negative) and 1 (very positive)>}, ...]} "
+                                   "with one entry per window."
+                    },
+                    {"role": "user", "content": json.dumps(windows_payload)}
+                ],
+                temperature=0.1,
+                max_tokens=20 * len(window_texts) + 50,
+                response_format={"type": "json_object"}
+            )
+            
+            result = json.loads(response.choices[0].message.content)
+        except Exception:
+            return None
+        
+        scored: Dict[int, float] = {}
+        for item in result.get("scores", []) if isinstance(result, dict) else []:
+            try:
+                scored[int(item["window"])] = max(-1.0, min(1.0, float(item["score"])))
+            except (KeyError, TypeError, ValueError):
+                continue
+        
+        missing = [i for i in range(len(window_texts)) if i not in scored]
+        if missing:
+            local_scores = self._local_window_sentiment([window_texts[i] for i in missing])
+            scored.update(zip(missing, local_scores))
+        
+        return [scored[i] for i in range(len(window_texts))]
+
+    def _local_window_sentiment(self, window_texts: List[str]) -> List[float]:
+        """Lexicon-based sentiment for all windows in one vectorized pass."""
+        from services.sentiment_analysis_service import get_sentiment_service
         
-        return sentiment_trend
+        scores = get_sentiment_service().score_texts_compound(window_texts)
+        return [max(-1.0, min(1.0, score)) for score in scores]
 
     async def _get_text_sentiment(self, text: str) -> float:
         """Get sentiment score for a piece of text."""
@@ -247,7 +326,8 @@ class AnalyticsService:
             return 0.0
         
         try:
-            response = await self.client.chat.completions.create(
+            response = await cached_chat_completion_async(
+                self.client, "analytics: text sentiment",
                 model="gpt-3.5-turbo",
                 messages=[
                     {
@@ -336,7 +416,8 @@ class AnalyticsService:
             return []
         
         try:
-            response = await self.client.chat.completions.create(
+            response = await cached_chat_completion_async(
+                self.client, "analytics: key topics",
                 model="gpt-3.5-turbo",
                 messages=[
                     {
@@ -616,29 +697,31 @@ class AnalyticsService:
             # Use unified AI model manager with GPT-4.1 fallback (async version)
             from services.ai_model_manager import AIModelManager
             
-            async def make_api_call(model: str):
-                return await self.client.chat.completions.create(
-                    model=model,
-                    messages=[
+            request_params = {
+                "messages": [
+                    {
+                        "role": "system",
+                        "content": """Analyze this meeting data and provide insights and recommendations.
+                        Return a JSON object with:
                         {
-                            "role": "system",
-                            "content": """Analyze this meeting data and provide insights and recommendations.
-                            Return a JSON object with:
-                            {
-                              "insights": ["insight 1", "insight 2", ...],
-                              "recommendations": ["recommendation 1", "recommendation 2", ...]
-                            }"""
-                        },
-                        {"role": "user", "content": json.dumps(meeting_summary)}
-                    ],
-                    temperature=0.3,
-                    max_tokens=500
-                )
+                          "insights": ["insight 1", "insight 2", ...],
+                          "recommendations": ["recommendation 1", "recommendation 2", ...]
+                        }"""
+                    },
+                    {"role": "user", "content": json.dumps(meeting_summary)}
+                ],
+                "temperature": 0.3,
+                "max_tokens": 500
+            }
+            
+            async def make_api_call(model: str):
+                return await self.client.chat.completions.create(model=model, **request_params)
             
             # Use async version of AI model manager
             result_obj = await AIModelManager.call_with_fallback_async(
                 make_api_call,
-                operation_name="analytics insights generation"
+                operation_name="analytics insights generation",
+                cache_request=request_params
             )
             
             if not result_obj.success:
@@ -740,7 +823,8 @@ class AnalyticsService:
             return []
         
         try:
-            response = await self.client.chat.completions.create(
+            response = await cached_chat_completion_async(
+                self.client, "analytics: window topics",
                 model="gpt-3.5-turbo",
                 messages=[
                     {
@@ -832,48 +916,51 @@ class AnalyticsService:
         
         return has_indicator and substantial_response
 
-    def get_workspace_analytics_summary(self, workspace_id: int, days: int = 30) -> Dict:
-        """Get analytics summary for a workspace over specified days."""
-        cutoff_date = datetime.now() - timedelta(days=days)
-        
-        meetings = db.session.query(Meeting).filter(
-            Meeting.workspace_id == workspace_id,
-            Meeting.created_at >= cutoff_date
-        ).all()
-        
-        if not meetings:
-            return {"meetings": [], "summary": {}}
-        
-        analytics_records = []
-        for meeting in meetings:
-            analytics = db.session.query(Analytics).filter_by(meeting_id=meeting.id).first()
-            if analytics and analytics.is_analysis_complete:
-                analytics_records.append(analytics)
-        
-        if not analytics_records:
-            return {"meetings": [m.to_dict() for m in meetings], "summary": {}}
-        
-        # Calculate workspace averages
-        avg_effectiveness = mean([a.meeting_effectiveness_score for a in analytics_records if a.meeting_effectiveness_score])
-        avg_engagement = mean([a.overall_engagement_score for a in analytics_records if a.overall_engagement_score])
-        avg_sentiment = mean([a.overall_sentiment_score for a in analytics_records if a.overall_sentiment_score])
-        total_tasks = sum(a.action_items_created or 0 for a in analytics_records)
-        total_decisions = sum(a.decisions_made_count or 0 for a in analytics_records)
-        
-        return {
-            "meetings": [m.to_dict() for m in meetings],
-            "analytics": [a.to_dict() for a in analytics_records],
-            "summary": {
-                "total_meetings": len(meetings),
-                "analyzed_meetings": len(analytics_records),
-                "avg_effectiveness": round(avg_effectiveness, 2) if avg_effectiveness else 0,
-                "avg_engagement": round(avg_engagement, 2) if avg_engagement else 0,
-                "avg_sentiment": round(avg_sentiment, 2) if avg_sentiment else 0,
-                "total_tasks_created": total_tasks,
-                "total_decisions_made": total_decisions,
-                "productivity_score": round((total_tasks + total_decisions) / len(meetings), 2) if meetings else 0
-            }
+    def get_workspace_analytics_summary(self, workspace_id: int, days: int = 30,
+                                        include_records: bool = True) -> Dict:
+        """
+        Get analytics summary for a workspace over specified days.
+
+        The summary is read from the daily workspace rollup; meeting and
+        analytics records are loaded with one joined query only when
+        include_records is set.
+        """
+        from services.analytics_rollup_service import get_analytics_rollup_service
+
+        totals = get_analytics_rollup_service().get_totals_since(workspace_id, days)
+        result = {"meetings": [], "summary": {}}
+
+        if include_records and totals.meeting_count:
+            cutoff_date = datetime.now() - timedelta(days=days)
+            rows = db.session.query(Meeting, Analytics).outerjoin(
+                Analytics, Analytics.meeting_id == Meeting.id
+            ).filter(
+                Meeting.workspace_id == workspace_id,
+                Meeting.created_at >= cutoff_date
+            ).all()
+            result["meetings"] = [m.to_dict() for m, _ in rows]
+            result["analytics"] = [a.to_dict() for _, a in rows if a and a.is_analysis_complete]
+
+        if not totals.meeting_count or not totals.analyzed_meeting_count:
+            return result
+
+        avg_effectiveness = totals.average('effectiveness')
+        avg_engagement = totals.average('engagement')
+        avg_sentiment = totals.average('sentiment')
+        total_tasks = totals.action_items_sum
+        total_decisions = totals.decisions_sum
+
+        result["summary"] = {
+            "total_meetings": totals.meeting_count,
+            "analyzed_meetings": totals.analyzed_meeting_count,
+            "avg_effectiveness": round(avg_effectiveness, 2) if avg_effectiveness else 0,
+            "avg_engagement": round(avg_engagement, 2) if avg_engagement else 0,
+            "avg_sentiment": round(avg_sentiment, 2) if avg_sentiment else 0,
+            "total_tasks_created": total_tasks,
+            "total_decisions_made": total_decisions,
+            "productivity_score": round((total_tasks + total_decisions) / totals.meeting_count, 2)
         }
+        return result
 
 
 # Singleton instance
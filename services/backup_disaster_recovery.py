@@ -11,20 +11,35 @@ Key Features:
 - Disaster recovery procedures
 - Backup validation and testing
 - Multi-tier backup strategy (local, cloud, archive)
+- Deduplicated incremental backups
+
+Full backups are standalone gzip files. Incremental backups go through a
+content-defined-chunking store (services/chunk_store.py) under
+<local_backup_dir>/store: the dump is chunked and hashed as it streams in,
+only chunks not already stored are written, and the backup itself is a
+manifest of chunk hashes. The first incremental seeds the store; later ones
+cost roughly the changed rows. pg_dump runs with --compress=0 so unchanged
+rows produce identical bytes between dumps. A sqlite:/// DATABASE_URL is
+dumped with sqlite3's iterdump, which keeps the whole path testable without
+Postgres.
 """
 
 import os
 import sys
 import json
 import logging
+import hashlib
+import sqlite3
 import subprocess
 import shutil
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Iterable, Iterator, Optional
 from dataclasses import dataclass, asdict
 from datetime import datetime, timedelta
 from pathlib import Path
 import gzip
 
+from services.chunk_store import ChunkedBackup, ChunkStore, ContentDefinedChunker
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -44,6 +59,11 @@ class BackupConfig:
     full_backup_interval_hours: int = 24
     incremental_backup_interval_hours: int = 6
     
+    # Incremental chunk store (content-defined chunk sizes, bytes)
+    chunk_min_size: int = 16 * 1024
+    chunk_avg_size: int = 64 * 1024
+    chunk_max_size: int = 256 * 1024
+    
     # Compression and encryption
     enable_compression: bool = True
     enable_encryption: bool = True
@@ -65,6 +85,23 @@ class BackupResult:
     success: bool
     error_message: Optional[str] = None
     validation_passed: Optional[bool] = None
+    bytes_written: int = 0          # Bytes that reached disk; below file_size for incrementals
+    chunks: int = 0
+    new_chunks: int = 0
+
+class _HashingWriter:
+    """File wrapper that hashes bytes on their way to disk."""
+    
+    def __init__(self, f, file_hash):
+        self.f = f
+        self.file_hash = file_hash
+    
+    def write(self, data: bytes) -> int:
+        self.file_hash.update(data)
+        return self.f.write(data)
+    
+    def flush(self):
+        self.f.flush()
 
 class BackupDisasterRecoveryManager:
     """
@@ -80,6 +117,11 @@ class BackupDisasterRecoveryManager:
         
         # Ensure backup directories exist
         self._ensure_backup_directories()
+        self.chunk_store = ChunkStore(
+            str(Path(self.config.local_backup_dir) / "store"),
+            ContentDefinedChunker(self.config.chunk_min_size, self.config.chunk_avg_size, self.config.chunk_max_size),
+            compression_level=6 if self.config.enable_compression else 0
+        )
         
         logger.info("🔄 Backup & Disaster Recovery Manager initialized")
     
@@ -92,31 +134,49 @@ class BackupDisasterRecoveryManager:
         ]:
             Path(dir_path).mkdir(parents=True, exist_ok=True)
     
-    def create_database_backup(self, backup_type: str = "full") -> BackupResult:
-        """Create database backup with compression and validation."""
+    def create_database_backup(self, backup_type: str = "full",
+                               source: Optional[Iterable[bytes]] = None) -> BackupResult:
+        """
+        Create database backup with compression and validation.
+        
+        Args:
+            backup_type: "full" (standalone gzip file) or "incremental" (chunk store manifest)
+            source: Dump stream as byte blocks; defaults to dumping DATABASE_URL
+            
+        Returns:
+            BackupResult; file_size is the dump size for incrementals
+        """
         start_time = datetime.utcnow()
         
         try:
-            # Generate backup filename
             timestamp = start_time.strftime("%Y%m%d_%H%M%S")
-            backup_filename = f"mina_db_{backup_type}_{timestamp}.sql"
-            
-            if self.config.enable_compression:
-                backup_filename += ".gz"
-            
-            backup_path = Path(self.config.local_backup_dir) / backup_filename
+            blocks = source if source is not None else self._dump_blocks()
             
             # Create the backup
             if backup_type == "full":
-                success = self._create_full_backup(backup_path)
+                backup_filename = f"mina_db_{backup_type}_{timestamp}.sql"
+                if self.config.enable_compression:
+                    backup_filename += ".gz"
+                backup_path = Path(self.config.local_backup_dir) / backup_filename
+                checksum = self._create_full_backup(backup_path, blocks)
+                if checksum:
+                    file_size = backup_path.stat().st_size
+                    written = {'bytes_written': file_size}
             elif backup_type == "incremental":
-                success = self._create_incremental_backup(backup_path)
+                backup_id = f"mina_db_{backup_type}_{timestamp}_{start_time.microsecond:06d}"
+                chunked = self._create_incremental_backup(backup_id, blocks)
+                checksum = chunked.sha256 if chunked else None
+                if chunked:
+                    backup_path = Path(chunked.manifest_path)
+                    file_size = chunked.size
+                    written = {'bytes_written': chunked.bytes_written, 'chunks': chunked.chunks,
+                               'new_chunks': chunked.new_chunks}
             else:
                 raise ValueError(f"Unknown backup type: {backup_type}")
             
             end_time = datetime.utcnow()
             
-            if not success:
+            if not checksum:
                 return BackupResult(
                     backup_type=backup_type,
                     start_time=start_time,
@@ -128,10 +188,6 @@ class BackupDisasterRecoveryManager:
                     error_message="Backup creation failed"
                 )
             
-            # Calculate file size and checksum
-            file_size = backup_path.stat().st_size
-            checksum = self._calculate_checksum(backup_path)
-            
             # Validate backup if enabled
             validation_passed = None
             if self.config.enable_backup_validation:
@@ -145,7 +201,8 @@ class BackupDisasterRecoveryManager:
                 file_size=file_size,
                 checksum=checksum,
                 success=True,
-                validation_passed=validation_passed
+                validation_passed=validation_passed,
+                **written
             )
             
             self.backup_history.append(result)
@@ -156,7 +213,8 @@ class BackupDisasterRecoveryManager:
             # Clean up old backups
             self._cleanup_old_backups()
             
-            logger.info(f"Database backup completed: {backup_filename} ({file_size} bytes)")
+            logger.info(f"Database backup completed: {backup_path.name} "
+                        f"({file_size} bytes, {result.bytes_written} written)")
             return result
             
         except Exception as e:
@@ -172,60 +230,98 @@ class BackupDisasterRecoveryManager:
                 error_message=str(e)
             )
     
-    def _create_full_backup(self, backup_path: Path) -> bool:
-        """Create full database backup."""
+    def _dump_blocks(self, block_size: int = 1024 * 1024) -> Iterator[bytes]:
+        """
+        Stream a dump of DATABASE_URL as byte blocks.
+        
+        Postgres dumps come from pg_dump in custom format without its own
+        compression; sqlite:/// URLs are dumped as SQL with iterdump.
+        """
+        database_url = os.environ.get("DATABASE_URL")
+        if not database_url:
+            raise RuntimeError("DATABASE_URL not found")
+        
+        if database_url.startswith("sqlite:///"):
+            connection = sqlite3.connect(database_url[len("sqlite:///"):])
+            try:
+                pending: List[bytes] = []
+                pending_size = 0
+                for line in connection.iterdump():
+                    encoded = (line + "\n").encode()
+                    pending.append(encoded)
+                    pending_size += len(encoded)
+                    if pending_size >= block_size:
+                        yield b"".join(pending)
+                        pending, pending_size = [], 0
+                if pending:
+                    yield b"".join(pending)
+            finally:
+                connection.close()
+            return
+        
+        # Build pg_dump command
+        cmd = [
+            self.config.pg_dump_path,
+            "--no-password",
+            "--clean",
+            "--if-exists",
+            "--create",
+            "--format=custom",
+            "--compress=0",
+            "--dbname", database_url
+        ]
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
         try:
-            database_url = os.environ.get("DATABASE_URL")
-            if not database_url:
-                logger.error("DATABASE_URL not found")
-                return False
-            
-            # Build pg_dump command
-            cmd = [
-                self.config.pg_dump_path,
-                "--no-password",
-                "--verbose",
-                "--clean",
-                "--if-exists",
-                "--create",
-                "--format=custom",
-                "--dbname", database_url
-            ]
-            
-            # Execute backup
-            if self.config.enable_compression:
-                with gzip.open(backup_path, 'wb') as f:
-                    result = subprocess.run(cmd, stdout=f, stderr=subprocess.PIPE, check=True)
-            else:
-                with open(backup_path, 'wb') as f:
-                    result = subprocess.run(cmd, stdout=f, stderr=subprocess.PIPE, check=True)
+            yield from iter(lambda: process.stdout.read(block_size), b"")
+        finally:
+            process.stdout.close()
+            stderr = process.stderr.read()
+            if process.wait() != 0:
+                raise subprocess.CalledProcessError(process.returncode, cmd, stderr=stderr)
+    
+    def _create_full_backup(self, backup_path: Path, blocks: Iterable[bytes]) -> Optional[str]:
+        """
+        Create full database backup.
+        
+        Returns:
+            SHA256 of the written file, computed while writing, or None on failure
+        """
+        try:
+            file_hash = hashlib.sha256()
+            
+            with open(backup_path, 'wb') as raw:
+                writer = _HashingWriter(raw, file_hash)
+                if self.config.enable_compression:
+                    with gzip.GzipFile(fileobj=writer, mode='wb') as f:
+                        for block in blocks:
+                            f.write(block)
+                else:
+                    for block in blocks:
+                        writer.write(block)
             
             logger.info(f"Full backup created: {backup_path}")
-            return True
+            return file_hash.hexdigest()
             
         except subprocess.CalledProcessError as e:
-            logger.error(f"pg_dump failed: {e.stderr.decode()}")
-            return False
+            logger.error(f"pg_dump failed: {e.stderr.decode(errors='replace')}")
         except Exception as e:
             logger.error(f"Full backup failed: {e}")
-            return False
+        backup_path.unlink(missing_ok=True)
+        return None
     
-    def _create_incremental_backup(self, backup_path: Path) -> bool:
-        """Create incremental backup (simplified - full backup for now)."""
-        # For now, implement as full backup
-        # In production, you'd use WAL-E or similar for true incremental backups
-        logger.info("Creating incremental backup (using full backup method)")
-        return self._create_full_backup(backup_path)
+    def _create_incremental_backup(self, backup_id: str, blocks: Iterable[bytes]) -> Optional[ChunkedBackup]:
+        """Create incremental backup: store the dump's new chunks and a manifest."""
+        try:
+            return self.chunk_store.write(backup_id, blocks, {'backup_type': 'incremental'})
+        except subprocess.CalledProcessError as e:
+            logger.error(f"pg_dump failed: {e.stderr.decode(errors='replace')}")
+        except Exception as e:
+            logger.error(f"Incremental backup failed: {e}")
+        return None
     
-    def _calculate_checksum(self, file_path: Path) -> str:
-        """Calculate SHA256 checksum of backup file."""
-        import hashlib
-        
-        sha256_hash = hashlib.sha256()
-        with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                sha256_hash.update(chunk)
-        return sha256_hash.hexdigest()
+    @staticmethod
+    def _is_manifest(backup_path: Path) -> bool:
+        return backup_path.suffix == ".json"
     
     def _validate_backup(self, backup_path: Path) -> bool:
         """Validate backup by testing restore to temporary database."""
@@ -234,6 +330,10 @@ class BackupDisasterRecoveryManager:
             if not backup_path.exists():
                 return False
             
+            # Incrementals: reassemble and verify every chunk and the stream checksum
+            if self._is_manifest(backup_path):
+                return self.chunk_store.verify(str(backup_path))
+            
             if backup_path.stat().st_size == 0:
                 return False
             
@@ -260,6 +360,10 @@ class BackupDisasterRecoveryManager:
     def _upload_to_cloud(self, backup_path: Path):
         """Upload backup to cloud storage."""
         try:
+            if self._is_manifest(backup_path):
+                self._upload_chunks_to_cloud(backup_path)
+                return
+            
             cloud_path = Path(self.config.cloud_backup_dir) / backup_path.name
             
             # For now, copy to cloud directory (in production, use AWS S3/Azure/GCP)
@@ -270,6 +374,27 @@ class BackupDisasterRecoveryManager:
         except Exception as e:
             logger.error(f"Cloud upload failed: {e}")
     
+    def _upload_chunks_to_cloud(self, manifest_path: Path):
+        """Mirror an incremental's manifest and the chunks the cloud copy lacks."""
+        store_root = self.chunk_store.root
+        cloud_root = Path(self.config.cloud_backup_dir) / store_root.name
+        manifest = self.chunk_store.load_manifest(str(manifest_path))
+        
+        uploaded = 0
+        for digest in {digest for digest, _ in manifest['chunks']}:
+            source = self.chunk_store.chunk_path(digest)
+            target = cloud_root / source.relative_to(store_root)
+            if not target.exists():
+                target.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copy2(source, target)
+                uploaded += 1
+        
+        # Manifest last, so a cloud manifest never references missing chunks
+        target = cloud_root / manifest_path.relative_to(store_root)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(manifest_path, target)
+        logger.info(f"Backup uploaded to cloud: {target} ({uploaded} new chunks)")
+    
     def _cleanup_old_backups(self):
         """Remove old backups based on retention policy."""
         try:
@@ -286,17 +411,30 @@ class BackupDisasterRecoveryManager:
             # Cleanup archive backups
             self._cleanup_directory(self.config.archive_backup_dir, archive_cutoff)
             
+            # Expired incremental manifests, then the chunks only they used
+            self._cleanup_chunk_store(self.chunk_store, retention_cutoff)
+            
+            # The cloud mirror of the store expires the same way
+            cloud_store = Path(self.config.cloud_backup_dir) / self.chunk_store.root.name
+            if cloud_store.exists():
+                self._cleanup_chunk_store(ChunkStore(str(cloud_store)), retention_cutoff)
+            
         except Exception as e:
             logger.error(f"Backup cleanup failed: {e}")
     
-    def _cleanup_directory(self, directory: str, cutoff_date: datetime):
+    def _cleanup_chunk_store(self, store: ChunkStore, cutoff_date: datetime):
+        """Remove manifests older than cutoff date, then chunks no manifest references."""
+        self._cleanup_directory(str(store.manifest_dir), cutoff_date, "*.json")
+        store.collect_garbage()
+    
+    def _cleanup_directory(self, directory: str, cutoff_date: datetime, pattern: str = "*.sql*"):
         """Remove files older than cutoff date from directory."""
         try:
             dir_path = Path(directory)
             if not dir_path.exists():
                 return
             
-            for file_path in dir_path.glob("*.sql*"):
+            for file_path in dir_path.glob(pattern):
                 if file_path.stat().st_mtime < cutoff_date.timestamp():
                     file_path.unlink()
                     logger.info(f"Removed old backup: {file_path}")
@@ -317,6 +455,9 @@ class BackupDisasterRecoveryManager:
                 # Modify database URL for target database
                 database_url = database_url.replace("/mina_db", f"/{target_database}")
             
+            if self._is_manifest(backup_file):
+                return self._restore_incremental(backup_file, database_url)
+            
             # Build pg_restore command
             cmd = [
                 "pg_restore",
@@ -346,6 +487,40 @@ class BackupDisasterRecoveryManager:
             logger.error(f"Restore operation failed: {e}")
             return False
     
+    def _restore_incremental(self, manifest_path: Path, database_url: str) -> bool:
+        """
+        Stream a manifest's chunks into the target database.
+        
+        Chunks are verified as they are read; a bad chunk or stream checksum
+        aborts the restore (pg_restore is killed before it finishes).
+        """
+        manifest = self.chunk_store.load_manifest(str(manifest_path))
+        
+        if database_url.startswith("sqlite:///"):
+            script = b"".join(self.chunk_store.iter_backup(manifest)).decode()
+            connection = sqlite3.connect(database_url[len("sqlite:///"):])
+            try:
+                connection.executescript(script)
+            finally:
+                connection.close()
+        else:
+            cmd = ["pg_restore", "--no-password", "--clean", "--if-exists", "--create", "--dbname", database_url]
+            process = subprocess.Popen(cmd, stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+            try:
+                for data in self.chunk_store.iter_backup(manifest):
+                    process.stdin.write(data)
+                process.stdin.close()
+            except Exception:
+                process.kill()
+                process.wait()
+                raise
+            stderr = process.stderr.read()
+            if process.wait() != 0:
+                raise subprocess.CalledProcessError(process.returncode, cmd, stderr=stderr)
+        
+        logger.info(f"Database restored from incremental: {manifest_path}")
+        return True
+    
     def test_disaster_recovery(self) -> Dict[str, Any]:
         """Test disaster recovery procedures."""
         test_results = {
@@ -427,6 +602,7 @@ class BackupDisasterRecoveryManager:
                 status["newest_backup"] = sorted_backups[-1].start_time.isoformat()
                 status["last_backup"] = sorted_backups[-1].start_time.isoformat()
                 status["total_backup_size"] = sum(b.file_size for b in self.backup_history)
+                status["total_bytes_written"] = sum(b.bytes_written for b in self.backup_history)
                 
                 # Check health
                 recent_cutoff = datetime.utcnow() - timedelta(hours=25)  # Within last 25 hours
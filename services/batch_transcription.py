@@ -0,0 +1,473 @@
+"""
+Batch Transcription Service
+Offline transcription for uploaded recordings and recovered sessions.
+
+The realtime path (TranscriptionService.process_audio_sync,
+StreamingAudioProcessor) sends ~2 s buffers to Whisper one at a time as they
+arrive. When the whole recording is already on hand that is wasteful: every
+call pays request latency, silence is uploaded and transcribed, and words are
+cut at arbitrary buffer edges. Here the file is decoded once, split at VAD
+silences into speech-only windows of up to ~30 s, the windows are transcribed
+concurrently with bounded parallelism, and the results are stitched back onto
+the recording's timeline and written as Segment rows in one bulk insert.
+
+Continuous speech longer than a window is cut with a short overlap; segments
+in the overlap are kept from whichever window they sit in the middle of, and
+words repeated across the cut are dropped.
+"""
+
+import io
+import logging
+import os
+import threading
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+try:
+    from pydub import AudioSegment
+    PYDUB_AVAILABLE = True
+except ImportError:
+    AudioSegment = None
+    PYDUB_AVAILABLE = False
+
+
+class IncompleteTranscriptionError(Exception):
+    """Some windows of a recording failed, so its transcript cannot replace the stored one."""
+
+
+@dataclass
+class BatchTranscriptionConfig:
+    """Configuration for offline batch transcription."""
+    sample_rate: int = 16000
+    window_seconds: float = float(os.environ.get('BATCH_WINDOW_SECONDS', 30.0))
+    max_parallel: int = int(os.environ.get('BATCH_TRANSCRIBE_CONCURRENCY', 4))
+    overlap_seconds: float = 1.0     # Only used when continuous speech must be cut
+    max_gap_seconds: float = 2.0     # Longer silences end a window instead of being uploaded
+
+    # Energy VAD over the decoded file
+    frame_ms: int = 30
+    min_silence_ms: int = 300        # Shorter pauses do not count as cut points
+    speech_pad_ms: int = 150         # Kept around each speech region
+    energy_ratio: float = 3.0        # Speech when frame RMS exceeds the noise floor by this factor
+    min_speech_rms: float = 0.005
+
+    language: Optional[str] = os.environ.get('LANGUAGE_HINT', 'en')
+    model: str = os.environ.get('WHISPER_MODEL', 'whisper-1')
+
+
+@dataclass
+class AudioWindow:
+    """A slice of the recording sent to the engine in one call."""
+    index: int
+    start: float                     # Seconds from the start of the recording
+    end: float
+    keep_from: float                 # Segments whose midpoint falls in [keep_from, keep_until) are kept
+    keep_until: float
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+@dataclass
+class TranscribedSegment:
+    """A stitched segment on the recording's timeline."""
+    start: float
+    end: float
+    text: str
+    confidence: float
+    window: int
+
+
+@dataclass
+class BatchTranscriptionResult:
+    """Outcome of transcribing one recording."""
+    segments: List[TranscribedSegment] = field(default_factory=list)
+    audio_seconds: float = 0.0
+    speech_seconds: float = 0.0
+    windows: int = 0
+    failed_windows: List[int] = field(default_factory=list)
+    wall_seconds: float = 0.0
+
+    @property
+    def text(self) -> str:
+        return ' '.join(segment.text for segment in self.segments)
+
+    @property
+    def throughput(self) -> float:
+        """Audio minutes transcribed per wall-clock minute."""
+        return self.audio_seconds / self.wall_seconds if self.wall_seconds > 0 else 0.0
+
+
+# Engine: WAV bytes of one window -> {'text': str, 'segments': [{'start', 'end', 'text', ...}]}
+# with segment times relative to the window. 'segments' may be omitted.
+TranscriptionEngine = Callable[[bytes, BatchTranscriptionConfig], Dict[str, Any]]
+
+
+def whisper_engine(wav_bytes: bytes, config: BatchTranscriptionConfig) -> Dict[str, Any]:
+    """Transcribe one window with the OpenAI Whisper API (verbose_json for segment timestamps)."""
+    from services.openai_client_manager import get_openai_client
+
+    client = get_openai_client()
+    if client is None:
+        raise RuntimeError("OpenAI client not available")
+    kwargs = {'model': config.model, 'file': ('window.wav', io.BytesIO(wav_bytes), 'audio/wav'),
+              'response_format': 'verbose_json'}
+    if config.language:
+        kwargs['language'] = config.language
+    response = client.audio.transcriptions.create(**kwargs)
+    segments = [
+        {'start': s.start, 'end': s.end, 'text': s.text, 'avg_logprob': getattr(s, 'avg_logprob', None)}
+        for s in (getattr(response, 'segments', None) or [])
+    ]
+    return {'text': getattr(response, 'text', '') or '', 'segments': segments}
+
+
+# =============================================================================
+# DECODING
+# =============================================================================
+
+def decode_audio(data: bytes, sample_rate: int = 16000, mime_hint: Optional[str] = None) -> np.ndarray:
+    """
+    Decode a whole recording to mono float32 at `sample_rate`.
+
+    WAV is read with the standard library; anything else goes through pydub
+    (which needs ffmpeg).
+
+    Args:
+        data: Encoded audio file
+        sample_rate: Target sample rate
+        mime_hint: Optional MIME type or extension, e.g. 'audio/webm'
+
+    Returns:
+        Samples in [-1, 1]
+    """
+    if data[:4] == b'RIFF':
+        with wave.open(io.BytesIO(data), 'rb') as wav_file:
+            channels, width, rate = wav_file.getnchannels(), wav_file.getsampwidth(), wav_file.getframerate()
+            raw = wav_file.readframes(wav_file.getnframes())
+    elif PYDUB_AVAILABLE:
+        audio_format = (mime_hint or '').split(';')[0].split('/')[-1] or None
+        segment = AudioSegment.from_file(io.BytesIO(data), format=audio_format)
+        channels, width, rate, raw = segment.channels, segment.sample_width, segment.frame_rate, segment.raw_data
+    else:
+        raise ValueError("Only WAV recordings can be decoded without pydub")
+
+    if width == 1:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128) / 128
+    elif width in (2, 4):
+        dtype = np.int16 if width == 2 else np.int32
+        samples = np.frombuffer(raw, dtype=dtype).astype(np.float32) / np.iinfo(dtype).max
+    else:
+        raise ValueError(f"Unsupported sample width: {width} bytes")
+
+    if channels > 1:
+        samples = samples[:len(samples) - len(samples) % channels].reshape(-1, channels).mean(axis=1)
+    if rate != sample_rate:
+        from scipy.signal import resample_poly
+        divisor = np.gcd(rate, sample_rate)
+        samples = resample_poly(samples, sample_rate // divisor, rate // divisor).astype(np.float32)
+    return samples
+
+
+def encode_wav(samples: np.ndarray, sample_rate: int = 16000) -> bytes:
+    """Mono 16-bit WAV bytes for float samples in [-1, 1]."""
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes((np.clip(samples, -1, 1) * 32767).astype(np.int16).tobytes())
+    return buffer.getvalue()
+
+
+# =============================================================================
+# BATCH TRANSCRIPTION
+# =============================================================================
+
+class BatchTranscriptionService:
+    """
+    Decode once, split on silence, transcribe windows in parallel, stitch.
+
+    The engine is pluggable so the pipeline can run against a local stub; by
+    default windows go to Whisper.
+    """
+
+    def __init__(self, config: Optional[BatchTranscriptionConfig] = None,
+                 engine: Optional[TranscriptionEngine] = None):
+        self.config = config or BatchTranscriptionConfig()
+        self.engine = engine or whisper_engine
+        self.stats = {'recordings': 0, 'windows': 0, 'failed_windows': 0, 'audio_seconds': 0.0,
+                      'wall_seconds': 0.0}
+        self._lock = threading.Lock()
+
+    def transcribe(self, data: bytes, mime_hint: Optional[str] = None) -> BatchTranscriptionResult:
+        """
+        Transcribe an encoded recording.
+
+        Args:
+            data: Encoded audio file (WAV, or any format pydub can read)
+            mime_hint: Optional MIME type of `data`
+
+        Returns:
+            BatchTranscriptionResult with stitched segments
+        """
+        return self.transcribe_samples(decode_audio(data, self.config.sample_rate, mime_hint))
+
+    def transcribe_samples(self, samples: np.ndarray) -> BatchTranscriptionResult:
+        """Transcribe decoded mono samples at the configured sample rate."""
+        started = time.perf_counter()
+        config = self.config
+        result = BatchTranscriptionResult(audio_seconds=len(samples) / config.sample_rate)
+
+        regions = self.detect_speech(samples)
+        windows = self.plan_windows(regions)
+        result.windows = len(windows)
+        result.speech_seconds = sum(end - start for start, end in regions)
+
+        responses: List[Optional[Dict[str, Any]]] = [None] * len(windows)
+        if windows:
+            with ThreadPoolExecutor(max_workers=max(1, min(config.max_parallel, len(windows))),
+                                    thread_name_prefix='batch-transcribe') as pool:
+                futures = [pool.submit(self._transcribe_window, samples, window) for window in windows]
+                for window, future in zip(windows, futures):
+                    try:
+                        responses[window.index] = future.result()
+                    except Exception as e:
+                        logger.error(f"❌ Batch window {window.index} ({window.start:.1f}-{window.end:.1f}s) failed: {e}")
+                        result.failed_windows.append(window.index)
+
+        result.segments = self.stitch(windows, responses)
+        result.wall_seconds = time.perf_counter() - started
+
+        with self._lock:
+            self.stats['recordings'] += 1
+            self.stats['windows'] += len(windows)
+            self.stats['failed_windows'] += len(result.failed_windows)
+            self.stats['audio_seconds'] += result.audio_seconds
+            self.stats['wall_seconds'] += result.wall_seconds
+        logger.info(f"📼 Batch transcribed {result.audio_seconds / 60:.1f} min in {result.wall_seconds:.1f}s "
+                    f"({len(windows)} windows, {result.throughput:.1f}x realtime)")
+        return result
+
+    def _transcribe_window(self, samples: np.ndarray, window: AudioWindow) -> Dict[str, Any]:
+        rate = self.config.sample_rate
+        audio = samples[int(window.start * rate):int(window.end * rate)]
+        return self.engine(encode_wav(audio, rate), self.config)
+
+    # =========================================================================
+    # SPLITTING
+    # =========================================================================
+
+    def detect_speech(self, samples: np.ndarray) -> List[Tuple[float, float]]:
+        """
+        Speech regions of the recording from frame energy.
+
+        Frames louder than the noise floor (10th percentile of frame RMS) by
+        `energy_ratio` are speech; pauses shorter than `min_silence_ms` are
+        bridged and every region is padded by `speech_pad_ms`.
+
+        Returns:
+            (start, end) pairs in seconds
+        """
+        config = self.config
+        frame = config.sample_rate * config.frame_ms // 1000
+        count = len(samples) // frame
+        if count == 0:
+            return []
+
+        rms = np.sqrt(np.mean(np.square(samples[:count * frame].reshape(count, frame), dtype=np.float64), axis=1))
+        threshold = max(config.min_speech_rms, np.percentile(rms, 10) * config.energy_ratio)
+        speech = rms > threshold
+
+        # Bridge short pauses, then pad: a closing followed by a dilation on the frame mask
+        bridge = max(1, config.min_silence_ms // config.frame_ms)
+        pad = config.speech_pad_ms // config.frame_ms
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], speech.astype(np.int8), [0]))))
+        starts, ends = edges[::2], edges[1::2]
+        if len(starts) == 0:
+            return []
+        keep = np.concatenate(([True], starts[1:] - ends[:-1] >= bridge))
+        starts, ends = starts[keep], np.concatenate((ends[:-1][keep[1:]], ends[-1:]))
+
+        seconds = config.frame_ms / 1000
+        total = len(samples) / config.sample_rate
+        return [(max(0.0, (start - pad) * seconds), min(total, (end + pad) * seconds))
+                for start, end in zip(starts.tolist(), ends.tolist())]
+
+    def plan_windows(self, regions: List[Tuple[float, float]]) -> List[AudioWindow]:
+        """
+        Group speech regions into windows of at most `window_seconds`.
+
+        A window closes at the silence before a region that would overflow it
+        or that follows a pause longer than `max_gap_seconds`. A single region
+        longer than a window is cut into overlapping windows whose keep ranges
+        meet in the middle of each overlap.
+        """
+        config = self.config
+        spans: List[Tuple[float, float]] = []
+        for start, end in regions:
+            if spans and end - spans[-1][0] <= config.window_seconds and start - spans[-1][1] <= config.max_gap_seconds:
+                spans[-1] = (spans[-1][0], end)
+            else:
+                spans.append((start, end))
+
+        windows: List[AudioWindow] = []
+        step = config.window_seconds - config.overlap_seconds
+        for start, end in spans:
+            if end - start <= config.window_seconds:
+                windows.append(AudioWindow(len(windows), start, end, start, end))
+                continue
+            pieces = int(np.ceil((end - start - config.overlap_seconds) / step))
+            for piece in range(pieces):
+                piece_start = start + piece * step
+                piece_end = min(end, piece_start + config.window_seconds)
+                keep_from = start if piece == 0 else piece_start + config.overlap_seconds / 2
+                keep_until = end if piece == pieces - 1 else piece_end - config.overlap_seconds / 2
+                windows.append(AudioWindow(len(windows), piece_start, piece_end, keep_from, keep_until))
+        return windows
+
+    # =========================================================================
+    # STITCHING
+    # =========================================================================
+
+    def stitch(self, windows: List[AudioWindow], responses: List[Optional[Dict[str, Any]]]) -> List[TranscribedSegment]:
+        """
+        Place window results on the recording's timeline.
+
+        Segment times are shifted by the window start and clipped to it; a
+        segment is kept only if its midpoint lies in the window's keep range,
+        so each stretch of an overlap is taken from exactly one window. Words a
+        kept segment repeats from the end of the previous one (a word straddling
+        the cut) are dropped.
+        """
+        stitched: List[TranscribedSegment] = []
+        for window, response in zip(windows, responses):
+            if not response:
+                continue
+            timed = bool(response.get('segments'))
+            parts = response.get('segments') if timed else [{'text': response.get('text', '')}]
+            for part in parts:
+                start = window.start + min(max(float(part.get('start', 0.0)), 0.0), window.duration)
+                end = window.start + min(max(float(part.get('end', window.duration)), 0.0), window.duration)
+                if timed and not window.keep_from <= (start + end) / 2 < window.keep_until:
+                    continue
+                text = (part.get('text') or '').strip()
+                if stitched and start - stitched[-1].end < self.config.overlap_seconds:
+                    text = _drop_repeated_words(stitched[-1].text, text)
+                if not text:
+                    continue
+                stitched.append(TranscribedSegment(start, end, text, _segment_confidence(part), window.index))
+        return stitched
+
+    # =========================================================================
+    # PERSISTENCE
+    # =========================================================================
+
+    def store_segments(self, session_id: int, result: BatchTranscriptionResult, replace: bool = False) -> int:
+        """
+        Write stitched segments as final Segment rows in one bulk insert.
+
+        Args:
+            session_id: Database id of the Session
+            result: Batch transcription result
+            replace: Delete the session's existing segments in the same transaction
+
+        Returns:
+            Number of rows inserted
+
+        Raises:
+            IncompleteTranscriptionError: `replace` was requested but some windows failed
+        """
+        if replace and result.failed_windows:
+            # A partial transcript must never overwrite a complete one
+            raise IncompleteTranscriptionError(
+                f"{len(result.failed_windows)} of {result.windows} windows failed; "
+                f"keeping the existing segments of session {session_id}"
+            )
+
+        from sqlalchemy import delete, insert
+        from models import db
+        from models.segment import Segment
+
+        rows = [{
+            'session_id': session_id,
+            'kind': 'final',
+            'text': segment.text,
+            'avg_confidence': segment.confidence,
+            'start_ms': int(round(segment.start * 1000)),
+            'end_ms': int(round(segment.end * 1000)),
+        } for segment in result.segments]
+
+        try:
+            if replace:
+                db.session.execute(delete(Segment).where(Segment.session_id == session_id))
+            if rows:
+                db.session.execute(insert(Segment), rows)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        logger.info(f"💾 Stored {len(rows)} batch segments for session {session_id}")
+        return len(rows)
+
+    def transcribe_recording(self, session_id: int, data: bytes, mime_hint: Optional[str] = None,
+                             replace: bool = False) -> BatchTranscriptionResult:
+        """
+        Transcribe a recording and store its segments on the session.
+
+        Raises:
+            IncompleteTranscriptionError: `replace` was requested but some windows failed;
+                                          nothing is written
+        """
+        result = self.transcribe(data, mime_hint)
+        self.store_segments(session_id, result, replace=replace)
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+        stats['throughput'] = stats['audio_seconds'] / stats['wall_seconds'] if stats['wall_seconds'] else 0.0
+        return stats
+
+
+def _segment_confidence(part: Dict[str, Any]) -> float:
+    """Confidence from an explicit value or Whisper's average log-probability."""
+    if part.get('confidence') is not None:
+        return float(part['confidence'])
+    if part.get('avg_logprob') is not None:
+        return float(np.clip(np.exp(part['avg_logprob']), 0.0, 1.0))
+    return 0.9
+
+
+def _drop_repeated_words(previous: str, text: str, max_words: int = 8) -> str:
+    """Strip the longest run of leading words in `text` that ends `previous`."""
+    before = [word.strip('.,!?;:').lower() for word in previous.split()[-max_words:]]
+    words = text.split()
+    after = [word.strip('.,!?;:').lower() for word in words[:max_words]]
+    for size in range(min(len(before), len(after)), 0, -1):
+        if before[-size:] == after[:size]:
+            return ' '.join(words[size:])
+    return text
+
+
+# Global batch transcription service
+_batch_service: Optional[BatchTranscriptionService] = None
+_batch_service_lock = threading.Lock()
+
+
+def get_batch_transcription_service() -> BatchTranscriptionService:
+    """Get the global batch transcription service."""
+    global _batch_service
+    if _batch_service is None:
+        with _batch_service_lock:
+            if _batch_service is None:
+                _batch_service = BatchTranscriptionService()
+    return _batch_service
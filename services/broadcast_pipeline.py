@@ -0,0 +1,318 @@
+"""
+Broadcast Pipeline - coalesced, batched WebSocket delivery
+
+Buffers outgoing events per (namespace, room) for a short window and sends
+them as one frame: a single event keeps its own event name, several events go
+out as one 'event_batch' array frame of {event, data} items. Refresh-style
+events carry a coalesce key; a newer event with the same key replaces the
+queued one (moving to the newer position), so a burst of dashboard refreshes
+reaches the room once. Each room is capped at a number of frames per second;
+a room over its cap keeps accumulating (and coalescing) until a frame is
+allowed. After every flush the delivered ledger event ids are reported once,
+so their status can be written with a single bulk update.
+
+Configuration (environment):
+    BROADCAST_BATCH_WINDOW_MS      - batching window, 0 sends immediately (default 50)
+    BROADCAST_MAX_FRAMES_PER_SEC   - frames per room per second (default 20)
+    BROADCAST_MAX_BATCH_SIZE       - events per array frame (default 100)
+"""
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+BATCH_EVENT_NAME = 'event_batch'
+
+RoomKey = Tuple[str, Optional[str]]  # (namespace, room)
+
+
+@dataclass
+class QueuedMessage:
+    """One message waiting in a room batch."""
+    event_name: str
+    payload: Any
+    event_ids: List[int] = field(default_factory=list)  # Ledger ids it delivers (incl. coalesced)
+    coalesce_key: Optional[Hashable] = None
+    merged: int = 1  # Events this message stands for
+
+
+class RoomBatch:
+    """Messages queued for one (namespace, room), in send order."""
+
+    def __init__(self):
+        self.messages: List[Optional[QueuedMessage]] = []
+        self.by_key: Dict[Hashable, int] = {}
+        self.scheduled = False
+
+    def add(self, message: QueuedMessage) -> bool:
+        """Queue a message; returns True if it replaced a queued one."""
+        replaced = False
+        if message.coalesce_key is not None:
+            index = self.by_key.get(message.coalesce_key)
+            if index is not None:
+                previous = self.messages[index]
+                self.messages[index] = None
+                message.event_ids = previous.event_ids + message.event_ids
+                message.merged += previous.merged
+                replaced = True
+            self.by_key[message.coalesce_key] = len(self.messages)
+        self.messages.append(message)
+        return replaced
+
+    def drain(self, limit: int) -> List[QueuedMessage]:
+        """Remove and return up to `limit` queued messages."""
+        taken: List[QueuedMessage] = []
+        position = 0
+        while position < len(self.messages) and len(taken) < limit:
+            message = self.messages[position]
+            position += 1
+            if message is not None:
+                taken.append(message)
+        self.messages = self.messages[position:]
+        self.by_key = {
+            m.coalesce_key: i for i, m in enumerate(self.messages)
+            if m is not None and m.coalesce_key is not None
+        }
+        return taken
+
+    def __len__(self):
+        return sum(1 for m in self.messages if m is not None)
+
+
+class FrameRateLimiter:
+    """Per-room token bucket: `rate` frames per second, bursts up to `rate`."""
+
+    def __init__(self, rate: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.clock = clock
+        self._buckets: Dict[RoomKey, Tuple[float, float]] = {}  # key -> (tokens, updated_at)
+
+    def acquire(self, key: RoomKey) -> float:
+        """
+        Take one frame token.
+
+        Returns:
+            0 if the frame may be sent now, else seconds until a token is available
+        """
+        if self.rate <= 0:
+            return 0.0
+        now = self.clock()
+        tokens, updated_at = self._buckets.get(key, (self.rate, now))
+        tokens = min(self.rate, tokens + (now - updated_at) * self.rate)
+        if tokens >= 1:
+            self._buckets[key] = (tokens - 1, now)
+            return 0.0
+        self._buckets[key] = (tokens, now)
+        return (1 - tokens) / self.rate
+
+    def forget_idle(self):
+        """Drop buckets that have refilled completely."""
+        now = self.clock()
+        for key, (tokens, updated_at) in list(self._buckets.items()):
+            if tokens + (now - updated_at) * self.rate >= self.rate:
+                del self._buckets[key]
+
+
+class BroadcastPipeline:
+    """Coalescing, batching, rate-capped broadcaster."""
+
+    def __init__(
+        self,
+        emit: Callable[[str, Any, str, Optional[str]], None],
+        on_delivered: Optional[Callable[[str, Optional[str], List[int], Optional[str]], None]] = None,
+        window_ms: Optional[float] = None,
+        max_frames_per_second: Optional[float] = None,
+        max_batch_size: Optional[int] = None,
+        spawn: Optional[Callable[..., Any]] = None,
+        sleep: Callable[[float], None] = time.sleep,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            emit: Sends one frame: emit(event_name, payload, namespace, room)
+            on_delivered: Called once per flushed batch with
+                          (namespace, room, event_ids, error); error is None on success
+            window_ms: Batching window; 0 flushes on enqueue
+            max_frames_per_second: Frame cap per room (0 = uncapped)
+            max_batch_size: Maximum events per array frame
+            spawn: Starts a background task: spawn(fn, *args) (default: daemon thread)
+            sleep: Sleep used by background flushes
+            clock: Monotonic clock
+        """
+        self.emit = emit
+        self.on_delivered = on_delivered
+        self.window = (window_ms if window_ms is not None
+                       else float(os.environ.get('BROADCAST_BATCH_WINDOW_MS', '50'))) / 1000.0
+        rate = (max_frames_per_second if max_frames_per_second is not None
+                else float(os.environ.get('BROADCAST_MAX_FRAMES_PER_SEC', '20')))
+        self.max_batch_size = max(1, max_batch_size if max_batch_size is not None
+                                  else int(os.environ.get('BROADCAST_MAX_BATCH_SIZE', '100')))
+        self.spawn = spawn or self._spawn_thread
+        self.sleep = sleep
+        self.limiter = FrameRateLimiter(rate, clock)
+
+        self._batches: Dict[RoomKey, RoomBatch] = {}
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self.stats = {
+            'events_enqueued': 0,
+            'events_coalesced': 0,
+            'events_sent': 0,
+            'frames_sent': 0,
+            'frames_saved': 0,
+            'rate_limited': 0,
+            'send_errors': 0,
+        }
+
+    # ============================================
+    # Public API
+    # ============================================
+
+    def enqueue(
+        self,
+        namespace: str,
+        room: Optional[str],
+        event_name: str,
+        payload: Any,
+        event_id: Optional[int] = None,
+        coalesce_key: Optional[Hashable] = None
+    ):
+        """
+        Queue an event for its room's next frame.
+
+        Args:
+            namespace: WebSocket namespace
+            room: Room (None = whole namespace)
+            event_name: Client-side event name
+            payload: Event payload
+            event_id: Ledger event id reported to on_delivered
+            coalesce_key: Events with equal keys in one batch collapse to the latest
+        """
+        key = (namespace, room)
+        message = QueuedMessage(event_name, payload, [event_id] if event_id is not None else [], coalesce_key)
+        with self._lock:
+            batch = self._batches.setdefault(key, RoomBatch())
+            self.stats['events_enqueued'] += 1
+            if batch.add(message):
+                self.stats['events_coalesced'] += 1
+            schedule = not batch.scheduled and self.window > 0
+            if schedule:
+                batch.scheduled = True
+
+        if self.window <= 0:
+            self.flush(namespace, room)
+        elif schedule:
+            self.spawn(self._flush_later, key, self.window)
+
+    def flush(self, namespace: str, room: Optional[str], force: bool = False) -> int:
+        """
+        Send a room's queued events now.
+
+        Args:
+            namespace: WebSocket namespace
+            room: Room
+            force: Ignore the room's frame cap
+
+        Returns:
+            Number of frames sent
+        """
+        key = (namespace, room)
+        frames = 0
+        with self._send_lock:
+            while True:
+                with self._lock:
+                    batch = self._batches.get(key)
+                    if batch is None or not len(batch):
+                        if batch is not None and not batch.scheduled:
+                            del self._batches[key]
+                        return frames
+                    wait = 0.0 if force else self.limiter.acquire(key)
+                    if wait > 0:
+                        self.stats['rate_limited'] += 1
+                        reschedule = not batch.scheduled
+                        batch.scheduled = True
+                        messages = None
+                    else:
+                        messages = batch.drain(self.max_batch_size)
+                if messages is None:
+                    if reschedule:
+                        self.spawn(self._flush_later, key, wait)
+                    return frames
+                self._send(key, messages)
+                frames += 1
+
+    def flush_all(self, force: bool = True) -> int:
+        """Send every queued room (used by synchronous replays and shutdown)."""
+        with self._lock:
+            keys = list(self._batches)
+        return sum(self.flush(namespace, room, force=force) for namespace, room in keys)
+
+    def pending_count(self) -> int:
+        """Queued (not yet sent) messages across rooms."""
+        with self._lock:
+            return sum(len(batch) for batch in self._batches.values())
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Counters for batching effectiveness."""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['pending'] = sum(len(batch) for batch in self._batches.values())
+            stats['rooms'] = len(self._batches)
+        stats['window_ms'] = self.window * 1000
+        stats['max_frames_per_second'] = self.limiter.rate
+        return stats
+
+    # ============================================
+    # Internals
+    # ============================================
+
+    def _flush_later(self, key: RoomKey, delay: float):
+        self.sleep(delay)
+        with self._lock:
+            batch = self._batches.get(key)
+            if batch is not None:
+                batch.scheduled = False
+        try:
+            self.flush(*key)
+        except Exception as e:
+            logger.error(f"Broadcast flush failed for {key}: {e}", exc_info=True)
+        self.limiter.forget_idle()
+
+    def _send(self, key: RoomKey, messages: List[QueuedMessage]):
+        namespace, room = key
+        if len(messages) == 1:
+            event_name, payload = messages[0].event_name, messages[0].payload
+        else:
+            event_name = BATCH_EVENT_NAME
+            payload = [{'event': m.event_name, 'data': m.payload} for m in messages]
+
+        event_ids = [event_id for m in messages for event_id in m.event_ids]
+        error = None
+        try:
+            self.emit(event_name, payload, namespace, room)
+            with self._lock:
+                self.stats['frames_sent'] += 1
+                self.stats['events_sent'] += len(messages)
+                self.stats['frames_saved'] += sum(m.merged for m in messages) - 1
+        except Exception as e:
+            error = str(e)
+            with self._lock:
+                self.stats['send_errors'] += 1
+            logger.error(f"Failed to broadcast {len(messages)} events to {namespace} {room}: {e}")
+
+        if self.on_delivered and event_ids:
+            try:
+                self.on_delivered(namespace, room, event_ids, error)
+            except Exception as e:
+                logger.error(f"Broadcast delivery callback failed: {e}", exc_info=True)
+
+    @staticmethod
+    def _spawn_thread(fn, *args):
+        thread = threading.Thread(target=fn, args=args, daemon=True)
+        thread.start()
+        return thread
@@ -12,15 +12,27 @@ Key Features:
 - Recovery from checkpoint data
 - Configurable checkpoint intervals
 - Redis-backed persistent storage
+
+Checkpoints of one session and type form chains: a full base snapshot every
+max_checkpoints_per_session checkpoints (or once the deltas outweigh it),
+then deltas holding only changed keys, with lists that only grew (e.g.
+transcript segments) stored as appended items. Each record carries a
+checksum of the full state after it, maintained incrementally per key, and
+is written together with its index updates and any pruning in one
+MULTI/EXEC pipeline, zlib-compressed above compression_threshold_bytes.
+Recovery fetches the session's records with one MGET and replays base +
+deltas up to the recovery point, verifying every checksum.
 """
 
+import base64
+import copy
 import logging
 import time
 import json
 import threading
-import pickle
 import hashlib
-from typing import Dict, Any, Optional, List, Callable
+import zlib
+from typing import Dict, Any, Optional, List, Callable, Tuple
 from dataclasses import dataclass, field, asdict
 from datetime import datetime, timedelta
 from enum import Enum
@@ -68,17 +80,159 @@ class CheckpointingConfig:
     audio_buffer_checkpoint_interval: float = 60.0
     
     # Retention
-    max_checkpoints_per_session: int = 20
+    max_checkpoints_per_session: int = 20   # Longest base + delta chain
+    chains_retained: int = 2                # Chains kept per session and type
     checkpoint_retention_hours: int = 24
     
     # Storage
     compression_enabled: bool = True
+    compression_threshold_bytes: int = 1024
     encryption_enabled: bool = False
     
     # Recovery
     auto_recovery_enabled: bool = True
     recovery_timeout_s: float = 30.0
 
+# =============================================================================
+# DELTA CHAINS
+# =============================================================================
+
+RECORD_FORMAT = 2
+_MISSING = object()
+
+
+def _dumps(value: Any) -> str:
+    """Canonical JSON used for both storage and checksums."""
+    return json.dumps(value, sort_keys=True, separators=(',', ':'), default=str)
+
+
+def _digest(*parts: str) -> bytes:
+    return hashlib.sha256('\0'.join(parts).encode()).digest()
+
+
+class ChainState:
+    """
+    Replayable state of one checkpoint chain.
+
+    The state checksum is the sum (mod 2^64) of per-key digests; a list's
+    digest is folded over its items so appending items only hashes the new
+    ones. Values are kept as private JSON round-tripped copies, so callers
+    mutating their objects in place are still detected as changes.
+    """
+
+    def __init__(self):
+        self.values: Dict[str, Any] = {}
+        self._key_digests: Dict[str, int] = {}
+        self._list_heads: Dict[str, bytes] = {}
+        self._total = 0
+
+    @property
+    def checksum(self) -> str:
+        return format(self._total, '016x')
+
+    def _put(self, key: str, digest: int):
+        self._total = (self._total - self._key_digests.get(key, 0) + digest) % (1 << 64)
+        self._key_digests[key] = digest
+
+    def set(self, key: str, value: Any, encoded: Optional[List[str]] = None) -> str:
+        """Replace a key; returns its JSON. `encoded` are the item JSONs of a list value."""
+        if isinstance(value, list):
+            items = encoded if encoded is not None else [_dumps(item) for item in value]
+            head = _digest('list', key)
+            self._list_heads[key] = head
+            self.values[key] = []
+            self._extend(key, items)
+            return '[' + ','.join(items) + ']'
+        text = _dumps(value)
+        self._list_heads.pop(key, None)
+        self.values[key] = json.loads(text)
+        self._put(key, int.from_bytes(_digest('value', key, text)[:8], 'big'))
+        return text
+
+    def append(self, key: str, items: List[str]):
+        """Append already-encoded items to a list key."""
+        self._extend(key, items)
+
+    def _extend(self, key: str, items: List[str]):
+        head = self._list_heads[key]
+        for item in items:
+            head = hashlib.sha256(head + item.encode()).digest()
+        self._list_heads[key] = head
+        if items:
+            self.values[key].extend(json.loads('[' + ','.join(items) + ']'))
+        self._put(key, int.from_bytes(head[:8], 'big'))
+
+    def delete(self, key: str):
+        self.values.pop(key, None)
+        self._list_heads.pop(key, None)
+        self._total = (self._total - self._key_digests.pop(key, 0)) % (1 << 64)
+
+    def apply(self, ops: Dict[str, Any]):
+        """Replay a stored record's operations."""
+        for key in ops.get('del', ()):
+            self.delete(key)
+        for key, value in ops.get('set', {}).items():
+            self.set(key, value)
+        for key, items in ops.get('append', {}).items():
+            self._extend(key, [_dumps(item) for item in items])
+
+    def diff(self, data: Dict[str, Any], full: bool) -> Tuple[str, int]:
+        """
+        Bring the state up to `data`, returning the operations as JSON.
+
+        Args:
+            data: New full state
+            full: Write every key (base snapshot) instead of only changes
+
+        Returns:
+            (ops JSON, number of changed keys)
+        """
+        sets, appends = [], []
+        changed = 0
+        if full:
+            for key in list(self.values):
+                self.delete(key)
+        for key, value in data.items():
+            key = str(key)
+            old = self.values.get(key, _MISSING)
+            if old is not _MISSING and value == old:
+                continue
+            changed += 1
+            if (isinstance(value, list) and isinstance(old, list) and key in self._list_heads
+                    and len(value) > len(old) and value[:len(old)] == old):
+                items = [_dumps(item) for item in value[len(old):]]
+                self.append(key, items)
+                appends.append(_dumps(key) + ':[' + ','.join(items) + ']')
+            else:
+                sets.append(_dumps(key) + ':' + self.set(key, value))
+        seen = {str(key) for key in data}
+        removed = [key for key in self.values if key not in seen]
+        for key in removed:
+            self.delete(key)
+        changed += len(removed)
+        ops = '{"set":{' + ','.join(sets) + '},"append":{' + ','.join(appends) + '},"del":' + _dumps(removed) + '}'
+        return ops, changed
+
+
+@dataclass
+class CheckpointChain:
+    """Writer-side bookkeeping for one session + checkpoint type."""
+    state: ChainState = field(default_factory=ChainState)
+    base_id: Optional[str] = None
+    seq: int = 0                      # Position of the last record in the current chain
+    written: int = 0                  # Records written over the chain's lifetime, keeps ids unique
+    base_bytes: int = 0               # Operation bytes of the base ...
+    delta_bytes: int = 0              # ... and of the deltas since; replay cost
+    ids: List[str] = field(default_factory=list)
+    previous: List[List[str]] = field(default_factory=list)   # Older chains, oldest first
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+def _text(value) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+
 class CheckpointingManager:
     """
     💾 Production-grade checkpointing manager for fault tolerance.
@@ -107,6 +261,17 @@ class CheckpointingManager:
         self.checkpoint_failures = 0
         self.recovery_attempts = 0
         self.successful_recoveries = 0
+        self.base_checkpoints = 0
+        self.delta_checkpoints = 0
+        self.compressed_checkpoints = 0
+        self.bytes_written = 0
+        self.redis_commands = 0
+        self.round_trips = 0
+        
+        # Delta chains per (session, type); writer-side only
+        self._chains: Dict[Tuple[str, CheckpointType], CheckpointChain] = {}
+        connection_kwargs = getattr(getattr(redis_client, 'connection_pool', None), 'connection_kwargs', {})
+        self._decode_responses = bool(connection_kwargs.get('decode_responses'))
         
         # Background cleanup
         self._start_cleanup_thread()
@@ -148,6 +313,9 @@ class CheckpointingManager:
         """
         Create a checkpoint for session data.
         
+        Writes a base snapshot when a new chain starts and otherwise a delta
+        of the keys that changed since the previous checkpoint of this type.
+        
         Args:
             session_id: Session identifier
             checkpoint_type: Type of checkpoint
@@ -157,79 +325,241 @@ class CheckpointingManager:
         Returns:
             Checkpoint ID
         """
-        try:
-            checkpoint_id = f"{session_id}_{checkpoint_type.value}_{int(time.time() * 1000)}"
-            
-            # Create checkpoint object
-            checkpoint = Checkpoint(
-                checkpoint_id=checkpoint_id,
-                session_id=session_id,
-                checkpoint_type=checkpoint_type,
-                timestamp=time.time(),
-                data=data,
-                metadata=metadata or {}
-            )
-            
-            # Store in Redis
-            self._store_checkpoint(checkpoint)
-            
-            # Update session tracking
+        with self.checkpoint_lock:
+            chain = self._chains.setdefault((session_id, checkpoint_type), CheckpointChain())
+        
+        with chain.lock:
+            try:
+                timestamp = time.time()
+                checkpoint_id = f"{session_id}_{checkpoint_type.value}_{int(timestamp * 1000)}_{chain.written}"
+                
+                is_base = (chain.base_id is None
+                           or chain.seq + 1 >= self.config.max_checkpoints_per_session
+                           or chain.delta_bytes > chain.base_bytes)
+                ops, _ = chain.state.diff(data, full=is_base)
+                header = {
+                    'format': RECORD_FORMAT,
+                    'checkpoint_id': checkpoint_id,
+                    'session_id': session_id,
+                    'checkpoint_type': checkpoint_type.value,
+                    'timestamp': timestamp,
+                    'metadata': metadata or {},
+                    'kind': 'base' if is_base else 'delta',
+                    'base_id': checkpoint_id if is_base else chain.base_id,
+                    'seq': 0 if is_base else chain.seq + 1,
+                    'checksum': chain.state.checksum
+                }
+                record = _dumps(header)[:-1] + ',"ops":' + ops + '}'
+                
+                pruned = []
+                if is_base and chain.ids:
+                    retained = chain.previous + [chain.ids]
+                    while len(retained) >= max(1, self.config.chains_retained):
+                        pruned.extend(retained.pop(0))
+                
+                self._store_checkpoint(checkpoint_id, session_id, checkpoint_type, timestamp, record, pruned)
+                
+                if is_base:
+                    if chain.ids:
+                        chain.previous = retained
+                    chain.base_id, chain.seq, chain.ids = checkpoint_id, 0, []
+                    chain.base_bytes, chain.delta_bytes = len(ops), 0
+                    self.base_checkpoints += 1
+                else:
+                    chain.seq += 1
+                    chain.delta_bytes += len(ops)
+                    self.delta_checkpoints += 1
+                chain.ids.append(checkpoint_id)
+                chain.written += 1
+                
+            except Exception as e:
+                # The in-memory state may be ahead of Redis; restart the chain
+                chain.state, chain.base_id = ChainState(), None
+                self.checkpoint_failures += 1
+                logger.error(f"Failed to create checkpoint for {session_id}: {e}")
+                raise
+        
+        # Update session tracking
+        with self.checkpoint_lock:
             if session_id in self.active_sessions:
-                self.active_sessions[session_id]['last_checkpoint'] = checkpoint.timestamp
+                self.active_sessions[session_id]['last_checkpoint'] = timestamp
                 self.active_sessions[session_id]['checkpoint_count'] += 1
-            
             self.checkpoints_created += 1
-            logger.debug(f"Created checkpoint {checkpoint_id} for session {session_id}")
-            
-            return checkpoint_id
-            
-        except Exception as e:
-            self.checkpoint_failures += 1
-            logger.error(f"Failed to create checkpoint for {session_id}: {e}")
-            raise
+        
+        logger.debug(f"Created {header['kind']} checkpoint {checkpoint_id} for session {session_id}")
+        return checkpoint_id
     
-    def _store_checkpoint(self, checkpoint: Checkpoint):
-        """Store checkpoint in Redis."""
-        # Store checkpoint data
-        checkpoint_key = f"checkpoint:{checkpoint.checkpoint_id}"
-        checkpoint_data = {
-            'checkpoint_id': checkpoint.checkpoint_id,
-            'session_id': checkpoint.session_id,
-            'checkpoint_type': checkpoint.checkpoint_type.value,
-            'timestamp': checkpoint.timestamp,
-            'data': checkpoint.data,
-            'metadata': checkpoint.metadata,
-            'size_bytes': checkpoint.size_bytes,
-            'checksum': checkpoint.checksum
-        }
+    def _store_checkpoint(self, checkpoint_id: str, session_id: str, checkpoint_type: CheckpointType,
+                          timestamp: float, record: str, pruned: List[str]):
+        """
+        Write a record, its index entries and any pruning in one MULTI/EXEC.
         
-        # Store with TTL based on retention policy
+        Args:
+            checkpoint_id: Checkpoint identifier
+            session_id: Session identifier
+            checkpoint_type: Type of checkpoint
+            timestamp: Index score
+            record: Serialized record
+            pruned: Checkpoint IDs of the chain being retired
+        """
+        payload = self._encode(record)
         ttl_seconds = self.config.checkpoint_retention_hours * 3600
+        session_index_key = f"session_checkpoints:{session_id}"
+        type_index_key = f"checkpoints_by_type:{checkpoint_type.value}"
         
-        self.redis_client.setex(
-            checkpoint_key,
-            ttl_seconds,
-            json.dumps(checkpoint_data)
-        )
+        pipe = self.redis_client.pipeline(transaction=True)
+        pipe.set(f"checkpoint:{checkpoint_id}", payload, ex=ttl_seconds)
+        pipe.zadd(session_index_key, {checkpoint_id: timestamp})
+        pipe.expire(session_index_key, ttl_seconds)
+        pipe.zadd(type_index_key, {checkpoint_id: timestamp})
+        pipe.expire(type_index_key, ttl_seconds)
+        commands = 5
+        if pruned:
+            pipe.delete(*[f"checkpoint:{pruned_id}" for pruned_id in pruned])
+            pipe.zrem(session_index_key, *pruned)
+            pipe.zrem(type_index_key, *pruned)
+            commands += 3
+        pipe.execute()
         
-        # Add to session checkpoint index
-        session_index_key = f"session_checkpoints:{checkpoint.session_id}"
-        self.redis_client.zadd(
-            session_index_key,
-            {checkpoint.checkpoint_id: checkpoint.timestamp}
+        self.bytes_written += len(payload)
+        self.redis_commands += commands
+        self.round_trips += 1
+    
+    def _encode(self, record: str):
+        """Compress records above the threshold; plain JSON stays readable as before."""
+        if not self.config.compression_enabled or len(record) < self.config.compression_threshold_bytes:
+            return record
+        compressed = zlib.compress(record.encode(), 6)
+        if len(compressed) + 1 >= len(record):
+            return record
+        self.compressed_checkpoints += 1
+        if self._decode_responses:
+            return 'B' + base64.b64encode(compressed).decode()
+        return b'Z' + compressed
+    
+    @staticmethod
+    def _decode(raw) -> Optional[Dict[str, Any]]:
+        """Parse a stored record; None when it is missing or unreadable."""
+        if raw is None:
+            return None
+        try:
+            if isinstance(raw, bytes) and raw[:1] == b'Z':
+                text = zlib.decompress(raw[1:])
+            elif isinstance(raw, str) and raw[:1] == 'B':
+                text = zlib.decompress(base64.b64decode(raw[1:]))
+            else:
+                text = raw
+            record = json.loads(text)
+            record['_size'] = len(text)
+            return record
+        except (ValueError, zlib.error) as e:
+            logger.warning(f"Unreadable checkpoint record: {e}")
+            return None
+    
+    def _fetch_records(self, session_id: str, max_time: Optional[float] = None) -> List[Dict[str, Any]]:
+        """All readable records of a session up to max_time: one ZRANGEBYSCORE and one MGET."""
+        checkpoint_ids = self.redis_client.zrangebyscore(
+            f"session_checkpoints:{session_id}", '-inf', '+inf' if max_time is None else max_time
         )
-        self.redis_client.expire(session_index_key, ttl_seconds)
+        if not checkpoint_ids:
+            return []
+        raw_records = self.redis_client.mget([f"checkpoint:{_text(checkpoint_id)}" for checkpoint_id in checkpoint_ids])
+        records = [record for record in map(self._decode, raw_records) if record]
+        return sorted(records, key=lambda record: (record['timestamp'], record.get('seq', 0)))
+    
+    def _replay(self, records: List[Dict[str, Any]], warnings: List[str],
+                keep_all: bool = False) -> List[Checkpoint]:
+        """
+        Rebuild full checkpoints from the time-ordered records of one type.
         
-        # Add to type-based index
-        type_index_key = f"checkpoints_by_type:{checkpoint.checkpoint_type.value}"
-        self.redis_client.zadd(
-            type_index_key,
-            {checkpoint.checkpoint_id: checkpoint.timestamp}
-        )
-        self.redis_client.expire(type_index_key, ttl_seconds)
+        Every record's checksum is verified against the replayed state. A
+        mismatch or a gap in a chain stops that chain, so the last verified
+        checkpoint (possibly from the previous chain) is what survives.
         
-        # Maintain checkpoint count limit
-        self._cleanup_old_checkpoints(checkpoint.session_id)
+        Args:
+            records: Records of a single session and checkpoint type
+            warnings: Collects integrity problems
+            keep_all: Materialize every checkpoint instead of only the last
+            
+        Returns:
+            Verified checkpoints in time order
+        """
+        checkpoints: List[Checkpoint] = []
+        state: Optional[ChainState] = None
+        verified: List[Dict[str, Any]] = []   # Records of the current chain that replayed cleanly
+        
+        def to_checkpoint(record: Dict[str, Any], data: Dict[str, Any]) -> Checkpoint:
+            return Checkpoint(
+                checkpoint_id=record['checkpoint_id'],
+                session_id=record['session_id'],
+                checkpoint_type=CheckpointType(record['checkpoint_type']),
+                timestamp=record['timestamp'],
+                data=data,
+                metadata=record['metadata'],
+                size_bytes=record.get('size_bytes') or record['_size'],
+                checksum=record['checksum']
+            )
+        
+        def end_chain(reason: Optional[str] = None, checkpoint_id: str = '', dirty: bool = False):
+            nonlocal state
+            if reason:
+                warnings.append(f"{reason}:{checkpoint_id}")
+            if dirty and verified and not keep_all:
+                # The live state holds a rejected record; rebuild the last good one
+                rebuilt = ChainState()
+                for record in verified:
+                    rebuilt.apply(record['ops'])
+                checkpoints[-1] = to_checkpoint(verified[-1], rebuilt.values)
+            state = None
+            verified.clear()
+        
+        for record in records:
+            checkpoint_id = record['checkpoint_id']
+            if 'format' not in record:
+                # Full snapshot written before delta chains existed
+                end_chain()
+                checkpoint = to_checkpoint(record, record['data'])
+                if checkpoint.checksum != checkpoint._calculate_checksum():
+                    warnings.append(f"checksum_mismatch:{checkpoint_id}")
+                else:
+                    checkpoints.append(checkpoint)
+                continue
+            
+            if record['kind'] == 'base':
+                end_chain()
+                state = ChainState()
+            elif state is None or record['base_id'] != verified[0]['checkpoint_id'] \
+                    or record['seq'] != verified[-1]['seq'] + 1:
+                end_chain('chain_gap' if state is not None else None, checkpoint_id)
+                continue
+            
+            state.apply(record['ops'])
+            if state.checksum != record['checksum']:
+                end_chain('checksum_mismatch', checkpoint_id, dirty=True)
+                continue
+            
+            verified.append(record)
+            if keep_all:
+                checkpoints.append(to_checkpoint(record, copy.deepcopy(state.values)))
+            elif verified[0] is record:
+                checkpoints.append(to_checkpoint(record, state.values))
+            else:
+                checkpoints[-1] = to_checkpoint(record, state.values)
+        
+        return checkpoints
+    
+    def _replay_by_type(self, records: List[Dict[str, Any]], warnings: List[str],
+                        keep_all: bool = False) -> Dict[CheckpointType, List[Checkpoint]]:
+        """Split a session's records by type and replay each chain."""
+        by_type: Dict[CheckpointType, List[Dict[str, Any]]] = {}
+        for record in records:
+            by_type.setdefault(CheckpointType(record['checkpoint_type']), []).append(record)
+        replayed = {}
+        for checkpoint_type, type_records in by_type.items():
+            checkpoints = self._replay(type_records, warnings, keep_all)
+            if checkpoints:
+                replayed[checkpoint_type] = checkpoints
+        return replayed
     
     def get_latest_checkpoint(self, session_id: str, 
                             checkpoint_type: Optional[CheckpointType] = None) -> Optional[Checkpoint]:
@@ -244,17 +574,12 @@ class CheckpointingManager:
             Latest checkpoint or None
         """
         try:
-            session_index_key = f"session_checkpoints:{session_id}"
+            records = self._fetch_records(session_id)
+            if checkpoint_type:
+                records = [record for record in records if record['checkpoint_type'] == checkpoint_type.value]
             
-            # Get latest checkpoint IDs (most recent first)
-            checkpoint_ids = self.redis_client.zrevrange(session_index_key, 0, 10)
-            
-            for checkpoint_id in checkpoint_ids:
-                checkpoint = self._load_checkpoint(checkpoint_id)
-                if checkpoint and (not checkpoint_type or checkpoint.checkpoint_type == checkpoint_type):
-                    return checkpoint
-            
-            return None
+            latest = [checkpoints[-1] for checkpoints in self._replay_by_type(records, []).values()]
+            return max(latest, key=lambda c: c.timestamp) if latest else None
             
         except Exception as e:
             logger.error(f"Failed to get latest checkpoint for {session_id}: {e}")
@@ -274,19 +599,14 @@ class CheckpointingManager:
             List of checkpoints in time range
         """
         try:
-            session_index_key = f"session_checkpoints:{session_id}"
-            
-            # Get checkpoint IDs in time range
-            checkpoint_ids = self.redis_client.zrangebyscore(
-                session_index_key, start_time, end_time
-            )
-            
-            checkpoints = []
-            for checkpoint_id in checkpoint_ids:
-                checkpoint = self._load_checkpoint(checkpoint_id)
-                if checkpoint:
-                    checkpoints.append(checkpoint)
-            
+            # Deltas in range need their chain from its base, which may be older
+            records = self._fetch_records(session_id, end_time)
+            checkpoints = [
+                checkpoint
+                for type_checkpoints in self._replay_by_type(records, [], keep_all=True).values()
+                for checkpoint in type_checkpoints
+                if checkpoint.timestamp >= start_time
+            ]
             return sorted(checkpoints, key=lambda c: c.timestamp)
             
         except Exception as e:
@@ -294,34 +614,26 @@ class CheckpointingManager:
             return []
     
     def _load_checkpoint(self, checkpoint_id: str) -> Optional[Checkpoint]:
-        """Load checkpoint from Redis."""
+        """Load checkpoint from Redis, replaying its chain when it is a delta."""
         try:
-            checkpoint_key = f"checkpoint:{checkpoint_id}"
-            data_json = self.redis_client.get(checkpoint_key)
-            
-            if not data_json:
+            record = self._decode(self.redis_client.get(f"checkpoint:{checkpoint_id}"))
+            if not record:
                 return None
             
-            data = json.loads(data_json)
-            
-            # Verify checksum
-            checkpoint = Checkpoint(
-                checkpoint_id=data['checkpoint_id'],
-                session_id=data['session_id'],
-                checkpoint_type=CheckpointType(data['checkpoint_type']),
-                timestamp=data['timestamp'],
-                data=data['data'],
-                metadata=data['metadata'],
-                size_bytes=data['size_bytes'],
-                checksum=data['checksum']
-            )
-            
-            # Verify data integrity
-            if checkpoint.checksum != checkpoint._calculate_checksum():
-                logger.warning(f"Checksum mismatch for checkpoint {checkpoint_id}")
+            records = [record]
+            if record.get('kind') == 'delta':
+                records = [
+                    chain_record
+                    for chain_record in self._fetch_records(record['session_id'], record['timestamp'])
+                    if chain_record.get('base_id') == record['base_id']
+                ]
+            
+            warnings: List[str] = []
+            checkpoints = self._replay(records, warnings)
+            if warnings or not checkpoints or checkpoints[-1].checkpoint_id != checkpoint_id:
+                logger.warning(f"Checkpoint {checkpoint_id} failed verification: {warnings}")
                 return None
-            
-            return checkpoint
+            return checkpoints[-1]
             
         except Exception as e:
             logger.error(f"Failed to load checkpoint {checkpoint_id}: {e}")
@@ -331,6 +643,9 @@ class CheckpointingManager:
         """
         Recover session from checkpoints.
         
+        Replays every type's base + deltas up to the recovery point from a
+        single MGET, verifying each record's checksum on the way.
+        
         Args:
             session_id: Session identifier
             recovery_point: Optional specific time to recover to
@@ -344,44 +659,31 @@ class CheckpointingManager:
             
             logger.info(f"Starting session recovery for {session_id}")
             
-            # Get recovery checkpoint
-            if recovery_point:
-                # Find checkpoint closest to recovery point
-                checkpoints = self.get_checkpoints_by_time_range(
-                    session_id, 0, recovery_point
-                )
-                if not checkpoints:
+            records = self._fetch_records(session_id, recovery_point)
+            warnings: List[str] = []
+            by_type = {checkpoint_type: checkpoints[-1]
+                       for checkpoint_type, checkpoints in self._replay_by_type(records, warnings).items()}
+            
+            if not by_type:
+                if recovery_point is not None:
                     return {
                         'success': False,
                         'error': 'no_checkpoints_before_recovery_point',
-                        'recovery_point': recovery_point
-                    }
-                checkpoint = checkpoints[-1]  # Latest before recovery point
-            else:
-                # Get latest checkpoint
-                checkpoint = self.get_latest_checkpoint(session_id)
-                if not checkpoint:
-                    return {
-                        'success': False,
-                        'error': 'no_checkpoints_found',
-                        'session_id': session_id
+                        'recovery_point': recovery_point,
+                        'warnings': warnings
                     }
+                return {
+                    'success': False,
+                    'error': 'no_checkpoints_found',
+                    'session_id': session_id,
+                    'warnings': warnings
+                }
             
-            # Restore data by type
-            restored_data = {}
-            
-            # Get all checkpoint types for this session
-            session_checkpoints = self.get_checkpoints_by_time_range(
-                session_id, 0, checkpoint.timestamp
-            )
-            
-            # Group by type and get latest of each
-            by_type = {}
-            for cp in session_checkpoints:
-                if cp.checkpoint_type not in by_type or cp.timestamp > by_type[cp.checkpoint_type].timestamp:
-                    by_type[cp.checkpoint_type] = cp
+            if warnings:
+                logger.warning(f"⚠️ Recovery of {session_id} skipped unverifiable records: {warnings}")
             
             # Restore each type
+            restored_data = {}
             for checkpoint_type, cp in by_type.items():
                 restored_data[checkpoint_type.value] = cp.data
                 
@@ -392,7 +694,9 @@ class CheckpointingManager:
                     except Exception as e:
                         logger.error(f"Recovery callback error for {checkpoint_type}: {e}")
             
+            checkpoint = max(by_type.values(), key=lambda c: c.timestamp)
             recovery_time = time.time() - start_time
+            self.checkpoints_restored += len(by_type)
             self.successful_recoveries += 1
             
             logger.info(f"✅ Session {session_id} recovered in {recovery_time:.2f}s from checkpoint {checkpoint.checkpoint_id}")
@@ -404,6 +708,8 @@ class CheckpointingManager:
                 'recovery_timestamp': checkpoint.timestamp,
                 'recovery_time_s': recovery_time,
                 'restored_types': list(restored_data.keys()),
+                'records_replayed': len(records),
+                'warnings': warnings,
                 'data': restored_data
             }
             
@@ -457,28 +763,6 @@ class CheckpointingManager:
         timer.start()
         self.checkpoint_timers[session_id] = timer
     
-    def _cleanup_old_checkpoints(self, session_id: str):
-        """Clean up old checkpoints to maintain count limit."""
-        try:
-            session_index_key = f"session_checkpoints:{session_id}"
-            checkpoint_count = self.redis_client.zcard(session_index_key)
-            
-            if checkpoint_count > self.config.max_checkpoints_per_session:
-                # Remove oldest checkpoints
-                excess_count = checkpoint_count - self.config.max_checkpoints_per_session
-                old_checkpoint_ids = self.redis_client.zrange(session_index_key, 0, excess_count - 1)
-                
-                for checkpoint_id in old_checkpoint_ids:
-                    # Remove checkpoint data
-                    checkpoint_key = f"checkpoint:{checkpoint_id}"
-                    self.redis_client.delete(checkpoint_key)
-                    
-                    # Remove from indices
-                    self.redis_client.zrem(session_index_key, checkpoint_id)
-        
-        except Exception as e:
-            logger.error(f"Checkpoint cleanup failed for {session_id}: {e}")
-    
     def _start_cleanup_thread(self):
         """Start background cleanup thread for expired checkpoints."""
         def cleanup_loop():
@@ -550,6 +834,8 @@ class CheckpointingManager:
             
             # Remove from active sessions
             self.active_sessions.pop(session_id, None)
+            for key in [key for key in self._chains if key[0] == session_id]:
+                del self._chains[key]
             
             logger.info(f"Unregistered session {session_id} from checkpointing")
     
@@ -566,6 +852,13 @@ class CheckpointingManager:
             'recovery_success_rate_percent': round(
                 (self.successful_recoveries / max(1, self.recovery_attempts)) * 100, 1
             ),
+            'base_checkpoints': self.base_checkpoints,
+            'delta_checkpoints': self.delta_checkpoints,
+            'compressed_checkpoints': self.compressed_checkpoints,
+            'bytes_written': self.bytes_written,
+            'redis_commands': self.redis_commands,
+            'redis_round_trips': self.round_trips,
+            'bytes_per_checkpoint': round(self.bytes_written / max(1, self.checkpoints_created), 1),
             'config': asdict(self.config)
         }
 
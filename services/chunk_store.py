@@ -0,0 +1,333 @@
+"""
+Chunk Store - content-defined chunking for deduplicated backups
+A dump stream is cut into variable-size chunks wherever a rolling gear hash
+over the last 32 bytes hits a mask, so boundaries follow content rather than
+offsets: rows changed or inserted in the middle of a dump only disturb the
+chunks around them. Chunks are hashed while the stream is read, stored once
+by SHA-256 under `chunks/`, and each backup is a JSON manifest listing its
+chunks in order plus the SHA-256 of the whole stream.
+
+Restores and validation reassemble a stream from its manifest and verify
+every chunk and the stream checksum as they go, without temporary files.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import zlib
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FORMAT = 1
+WINDOW_BYTES = 32
+HASH_PIECE_BYTES = 64 * 1024
+
+# Per-byte gear values derived from SHA-256 so chunk boundaries never change
+# between releases or numpy versions
+GEAR = np.array(
+    [int.from_bytes(hashlib.sha256(b'gear' + bytes([value])).digest()[:4], 'little') for value in range(256)],
+    dtype=np.uint32
+)
+
+
+class ChunkStoreError(Exception):
+    """A chunk or manifest is missing or does not match its checksum."""
+
+
+@dataclass
+class ChunkedBackup:
+    """Outcome of writing one stream into the store."""
+    backup_id: str
+    manifest_path: str
+    size: int                  # Bytes of the original stream
+    sha256: str
+    chunks: int
+    new_chunks: int
+    bytes_written: int         # Chunk and manifest bytes actually written to disk
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+class ContentDefinedChunker:
+    """
+    Split a byte stream at content-defined boundaries.
+
+    Boundaries only depend on the bytes since the previous boundary, so the
+    same content chunks identically wherever it appears in a stream.
+    """
+
+    def __init__(self, min_size: int = 16 * 1024, avg_size: int = 64 * 1024,
+                 max_size: int = 256 * 1024, read_size: int = 4 * 1024 * 1024):
+        if not 0 < min_size < avg_size < max_size:
+            raise ValueError("chunk sizes must satisfy 0 < min < avg < max")
+        self.min_size = min_size
+        self.max_size = max_size
+        self.read_size = max(read_size, max_size)
+        # Boundaries past min_size occur about every 2^bits bytes
+        bits = max(1, int(round(np.log2(avg_size - min_size))))
+        self._shift = np.uint32(32 - bits)
+
+    def _candidates(self, data: bytes) -> np.ndarray:
+        """Offsets just after every byte whose 32-byte window hash hits the mask."""
+        values = np.frombuffer(data, dtype=np.uint8)
+        found = []
+        # Cache-sized pieces, each with the previous 31 bytes of window history
+        for start in range(0, len(values), HASH_PIECE_BYTES):
+            low = max(0, start - WINDOW_BYTES + 1)
+            h = GEAR[values[low:start + HASH_PIECE_BYTES]]
+            width = 1
+            while width < WINDOW_BYTES:
+                # Window doubling: H_2w[i] = H_w[i] + (H_w[i - w] << w), wrapping mod 2^32
+                h[width:] += h[:-width] << np.uint32(width)
+                width *= 2
+            found.append(np.flatnonzero((h[start - low:] >> self._shift) == 0) + start + 1)
+        return np.concatenate(found) if found else np.empty(0, dtype=np.int64)
+
+    def _cuts(self, data: bytes, final: bool) -> List[int]:
+        cuts = []
+        last = 0
+        for candidate in self._candidates(data).tolist():
+            if candidate - last < self.min_size:
+                continue
+            while candidate - last > self.max_size:
+                last += self.max_size
+                cuts.append(last)
+            if candidate - last < self.min_size:
+                continue
+            cuts.append(candidate)
+            last = candidate
+        while len(data) - last >= self.max_size:
+            last += self.max_size
+            cuts.append(last)
+        if final and last < len(data):
+            cuts.append(len(data))
+        return cuts
+
+    def chunks(self, blocks: Iterable[bytes]) -> Iterator[bytes]:
+        """
+        Chunk a stream given as an iterable of byte blocks of any size.
+
+        Args:
+            blocks: Successive pieces of the stream
+
+        Returns:
+            Iterator of chunks that concatenate back to the stream
+        """
+        pending = b''
+        for block in blocks:
+            pending += block
+            if len(pending) < self.read_size:
+                continue
+            cuts = self._cuts(pending, final=False)
+            start = 0
+            for cut in cuts:
+                yield pending[start:cut]
+                start = cut
+            pending = pending[start:]
+        if pending:
+            start = 0
+            for cut in self._cuts(pending, final=True):
+                yield pending[start:cut]
+                start = cut
+
+
+def iter_blocks(stream: BinaryIO, size: int = 1024 * 1024) -> Iterator[bytes]:
+    """Read a binary file object in blocks."""
+    return iter(lambda: stream.read(size), b'')
+
+
+class ChunkStore:
+    """
+    Deduplicated chunk storage plus per-backup manifests under one directory.
+
+    Layout:
+        <root>/chunks/ab/abcd...   one file per unique chunk, 1-byte codec prefix
+        <root>/manifests/<backup_id>.json
+    """
+
+    def __init__(self, root: str, chunker: Optional[ContentDefinedChunker] = None,
+                 compression_level: int = 6):
+        self.root = Path(root)
+        self.chunk_dir = self.root / 'chunks'
+        self.manifest_dir = self.root / 'manifests'
+        self.chunker = chunker or ContentDefinedChunker()
+        self.compression_level = compression_level   # 0 stores chunks raw
+        self.chunk_dir.mkdir(parents=True, exist_ok=True)
+        self.manifest_dir.mkdir(parents=True, exist_ok=True)
+
+    # =========================================================================
+    # WRITING
+    # =========================================================================
+
+    def chunk_path(self, digest: str) -> Path:
+        return self.chunk_dir / digest[:2] / digest
+
+    def manifest_path(self, backup_id: str) -> Path:
+        return self.manifest_dir / f"{backup_id}.json"
+
+    def _put_chunk(self, digest: str, data: bytes) -> int:
+        """Store a chunk unless it already exists; returns bytes written."""
+        path = self.chunk_path(digest)
+        if path.exists():
+            return 0
+        if self.compression_level:
+            compressed = zlib.compress(data, self.compression_level)
+            payload = b'Z' + compressed if len(compressed) < len(data) else b'R' + data
+        else:
+            payload = b'R' + data
+        path.parent.mkdir(exist_ok=True)
+        temporary = path.with_name(f"{digest}.{os.getpid()}.tmp")
+        with open(temporary, 'wb') as f:
+            f.write(payload)
+        os.replace(temporary, path)
+        return len(payload)
+
+    def write(self, backup_id: str, blocks: Iterable[bytes],
+              metadata: Optional[Dict[str, Any]] = None) -> ChunkedBackup:
+        """
+        Chunk a stream, store its new chunks and write its manifest.
+
+        Args:
+            backup_id: Unique name for the manifest
+            blocks: The stream as successive byte blocks
+            metadata: Extra fields to keep in the manifest
+
+        Returns:
+            ChunkedBackup with the stream checksum and bytes written
+        """
+        stream_hash = hashlib.sha256()
+        chunks: List[Tuple[str, int]] = []
+        new_chunks = 0
+        bytes_written = 0
+
+        for chunk in self.chunker.chunks(blocks):
+            stream_hash.update(chunk)
+            digest = hashlib.sha256(chunk).hexdigest()
+            written = self._put_chunk(digest, chunk)
+            if written:
+                new_chunks += 1
+                bytes_written += written
+            chunks.append((digest, len(chunk)))
+
+        manifest = {
+            'format': MANIFEST_FORMAT,
+            'backup_id': backup_id,
+            'created_at': datetime.utcnow().isoformat(),
+            'size': sum(size for _, size in chunks),
+            'sha256': stream_hash.hexdigest(),
+            'metadata': metadata or {},
+            'chunks': chunks
+        }
+        manifest_bytes = json.dumps(manifest, separators=(',', ':')).encode()
+        path = self.manifest_path(backup_id)
+        temporary = path.with_suffix('.tmp')
+        with open(temporary, 'wb') as f:
+            f.write(manifest_bytes)
+        os.replace(temporary, path)
+
+        logger.info(f"📦 Backup {backup_id}: {len(chunks)} chunks, {new_chunks} new, "
+                    f"{bytes_written + len(manifest_bytes)} bytes written for {manifest['size']} bytes")
+        return ChunkedBackup(
+            backup_id=backup_id,
+            manifest_path=str(path),
+            size=manifest['size'],
+            sha256=manifest['sha256'],
+            chunks=len(chunks),
+            new_chunks=new_chunks,
+            bytes_written=bytes_written + len(manifest_bytes),
+            metadata=manifest['metadata']
+        )
+
+    # =========================================================================
+    # READING
+    # =========================================================================
+
+    def load_manifest(self, manifest_path: str) -> Dict[str, Any]:
+        """Read a manifest by path."""
+        try:
+            with open(manifest_path, 'rb') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError) as e:
+            raise ChunkStoreError(f"unreadable manifest {manifest_path}: {e}") from e
+        if manifest.get('format') != MANIFEST_FORMAT:
+            raise ChunkStoreError(f"unsupported manifest format in {manifest_path}")
+        return manifest
+
+    def _read_chunk(self, digest: str, size: int) -> bytes:
+        try:
+            with open(self.chunk_path(digest), 'rb') as f:
+                payload = f.read()
+        except OSError as e:
+            raise ChunkStoreError(f"missing chunk {digest}") from e
+        try:
+            data = zlib.decompress(payload[1:]) if payload[:1] == b'Z' else payload[1:]
+        except zlib.error as e:
+            raise ChunkStoreError(f"corrupt chunk {digest}: {e}") from e
+        if len(data) != size or hashlib.sha256(data).hexdigest() != digest:
+            raise ChunkStoreError(f"checksum mismatch in chunk {digest}")
+        return data
+
+    def iter_backup(self, manifest: Dict[str, Any]) -> Iterator[bytes]:
+        """
+        Reassemble a backup stream, verifying every chunk and, after the
+        last one, the whole-stream checksum.
+
+        Raises:
+            ChunkStoreError: On a missing or mismatching chunk or stream
+        """
+        stream_hash = hashlib.sha256()
+        for digest, size in manifest['chunks']:
+            data = self._read_chunk(digest, size)
+            stream_hash.update(data)
+            yield data
+        if stream_hash.hexdigest() != manifest['sha256']:
+            raise ChunkStoreError(f"stream checksum mismatch for {manifest['backup_id']}")
+
+    def restore(self, manifest_path: str, output: BinaryIO) -> int:
+        """Write a backup's stream to `output`; returns bytes written."""
+        written = 0
+        for data in self.iter_backup(self.load_manifest(manifest_path)):
+            output.write(data)
+            written += len(data)
+        return written
+
+    def verify(self, manifest_path: str) -> bool:
+        """True when every chunk of a backup is present and checks out."""
+        try:
+            for _ in self.iter_backup(self.load_manifest(manifest_path)):
+                pass
+            return True
+        except ChunkStoreError as e:
+            logger.error(f"Backup verification failed: {e}")
+            return False
+
+    # =========================================================================
+    # RETENTION
+    # =========================================================================
+
+    def collect_garbage(self) -> Dict[str, int]:
+        """Delete chunks no remaining manifest references."""
+        live = set()
+        for path in self.manifest_dir.glob('*.json'):
+            try:
+                live.update(digest for digest, _ in self.load_manifest(str(path))['chunks'])
+            except ChunkStoreError as e:
+                # Keep everything rather than lose chunks of a backup we cannot read
+                logger.error(f"Skipping garbage collection: {e}")
+                return {'chunks_removed': 0, 'bytes_freed': 0}
+
+        removed, freed = 0, 0
+        for path in self.chunk_dir.glob('*/*'):
+            if path.name not in live and not path.name.endswith('.tmp'):
+                freed += path.stat().st_size
+                path.unlink()
+                removed += 1
+        if removed:
+            logger.info(f"🧹 Removed {removed} unreferenced chunks ({freed} bytes)")
+        return {'chunks_removed': removed, 'bytes_freed': freed}
@@ -1,9 +1,21 @@
 """
 🔒 CIRCUIT BREAKER SERVICE: Robust API failure protection
 Implements circuit breaker pattern to prevent cascading failures
+
+Breaker state is shared by every worker through a state backend: Redis when
+REDIS_URL is set (one Lua script per transition, each operation bounded by
+CIRCUIT_BREAKER_REDIS_TIMEOUT seconds, default 0.25), otherwise an in-process
+stand-in. Failures from all workers count towards one rolling window, so an
+outage trips the breaker once for the whole fleet. When the recovery
+timeout passes, a single-probe lease lets exactly one worker test the
+service while the rest keep rejecting. Each worker caches the decision it
+last saw: calls rejected by a known-open breaker, and calls made while the
+breaker was recently seen closed, cost no network hop.
 """
 
+import os
 import time
+import uuid
 import logging
 import threading
 from enum import Enum
@@ -11,6 +23,11 @@ from dataclasses import dataclass, field
 from typing import Dict, Callable, Any, Optional
 from collections import deque
 
+try:
+    import redis
+except ImportError:  # redis not installed
+    redis = None
+
 logger = logging.getLogger(__name__)
 
 class CircuitState(Enum):
@@ -26,6 +43,13 @@ class CircuitBreakerConfig:
     success_threshold: int = 3        # Successes to close breaker
     request_timeout: int = 30         # Request timeout in seconds
     window_size: int = 10            # Rolling window for failure tracking
+    failure_window: float = 60.0      # Seconds of failures (all workers) counted towards the threshold
+    state_refresh_interval: float = 1.0  # Seconds a worker trusts a CLOSED state it has seen
+
+    @property
+    def probe_lease(self) -> float:
+        """How long one worker may hold the half-open probe."""
+        return float(self.request_timeout)
 
 @dataclass
 class CircuitBreakerStats:
@@ -34,157 +58,367 @@ class CircuitBreakerStats:
     successful_requests: int = 0
     failed_requests: int = 0
     circuit_opens: int = 0
+    local_rejections: int = 0         # Rejected from the cached decision, no backend call
+    probes: int = 0                   # Half-open probes this worker was granted
     last_failure_time: Optional[float] = None
     last_success_time: Optional[float] = None
     recent_failures: deque = field(default_factory=lambda: deque(maxlen=10))
 
+@dataclass(frozen=True)
+class BreakerView:
+    """Shared breaker state as returned by a backend transition."""
+    state: CircuitState
+    open_until: float = 0.0
+    failures: int = 0
+    successes: int = 0
+    probe_granted: bool = False
+    probe_until: float = 0.0
+
+# =============================================================================
+# STATE BACKENDS
+# =============================================================================
+# transition(op, name, now, config, token) with op one of:
+#   probe   - admission check; OPEN past its timeout becomes HALF_OPEN and the
+#             caller gets the probe lease if nobody holds it
+#   failure - count a failure; trips CLOSED at the threshold, re-opens HALF_OPEN
+#   success - in HALF_OPEN, count towards closing and release the caller's lease
+#   get     - read only
+#   reset   - back to CLOSED
+
+class MemoryBreakerBackend:
+    """Shared state for breakers in one process (tests, single worker)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+
+    def transition(self, op: str, name: str, now: float, config: CircuitBreakerConfig,
+                   token: str = '') -> BreakerView:
+        with self._lock:
+            entry = self._entries.setdefault(name, {
+                'state': CircuitState.CLOSED, 'open_until': 0.0, 'successes': 0,
+                'failures': deque(), 'probe_token': '', 'probe_until': 0.0
+            })
+            failures = entry['failures']
+            while failures and failures[0] <= now - config.failure_window:
+                failures.popleft()
+            granted = False
+
+            if op == 'failure':
+                if entry['state'] == CircuitState.HALF_OPEN:
+                    entry.update(state=CircuitState.OPEN, open_until=now + config.recovery_timeout, successes=0)
+                    if entry['probe_token'] == token:
+                        entry.update(probe_token='', probe_until=0.0)
+                elif entry['state'] == CircuitState.CLOSED:
+                    failures.append(now)
+                    if len(failures) >= config.failure_threshold:
+                        entry.update(state=CircuitState.OPEN, open_until=now + config.recovery_timeout)
+                        failures.clear()
+            elif op == 'success':
+                if entry['state'] == CircuitState.HALF_OPEN:
+                    entry['successes'] += 1
+                    if entry['probe_token'] == token:
+                        entry.update(probe_token='', probe_until=0.0)
+                    if entry['successes'] >= config.success_threshold:
+                        entry.update(state=CircuitState.CLOSED, successes=0)
+                        failures.clear()
+            elif op == 'probe':
+                if entry['state'] == CircuitState.OPEN and now >= entry['open_until']:
+                    entry.update(state=CircuitState.HALF_OPEN, successes=0)
+                if entry['state'] == CircuitState.HALF_OPEN and entry['probe_until'] <= now:
+                    entry.update(probe_token=token, probe_until=now + config.probe_lease)
+                    granted = True
+            elif op == 'reset':
+                del self._entries[name]
+                return BreakerView(CircuitState.CLOSED)
+
+            return BreakerView(entry['state'], entry['open_until'], len(failures), entry['successes'],
+                               granted, entry['probe_until'])
+
+BREAKER_SCRIPT = """
+local key, failures_key = KEYS[1], KEYS[2]
+local op = ARGV[1]
+local now = tonumber(ARGV[2])
+local threshold = tonumber(ARGV[3])
+local window = tonumber(ARGV[4])
+local recovery = tonumber(ARGV[5])
+local success_threshold = tonumber(ARGV[6])
+local lease = tonumber(ARGV[7])
+local token = ARGV[8]
+local ttl = tonumber(ARGV[9])
+
+if op == 'reset' then
+  redis.call('DEL', key, failures_key)
+  return {'closed', '0', 0, 0, 0, '0'}
+end
+
+local h = redis.call('HMGET', key, 'state', 'open_until', 'successes', 'probe_token', 'probe_until')
+local state = h[1] or 'closed'
+local open_until = tonumber(h[2]) or 0
+local successes = tonumber(h[3]) or 0
+local probe_token = h[4] or ''
+local probe_until = tonumber(h[5]) or 0
+local granted = 0
+
+redis.call('ZREMRANGEBYSCORE', failures_key, '-inf', now - window)
+
+if op == 'failure' then
+  if state == 'half_open' then
+    state = 'open'; open_until = now + recovery; successes = 0
+    if probe_token == token then probe_token = ''; probe_until = 0 end
+  elseif state == 'closed' then
+    redis.call('ZADD', failures_key, now, token)
+    if redis.call('ZCARD', failures_key) >= threshold then
+      state = 'open'; open_until = now + recovery
+      redis.call('DEL', failures_key)
+    end
+  end
+elseif op == 'success' then
+  if state == 'half_open' then
+    successes = successes + 1
+    if probe_token == token then probe_token = ''; probe_until = 0 end
+    if successes >= success_threshold then
+      state = 'closed'; successes = 0
+      redis.call('DEL', failures_key)
+    end
+  end
+elseif op == 'probe' then
+  if state == 'open' and now >= open_until then state = 'half_open'; successes = 0 end
+  if state == 'half_open' and probe_until <= now then
+    probe_token = token; probe_until = now + lease; granted = 1
+  end
+end
+
+if op ~= 'get' then
+  redis.call('HSET', key, 'state', state, 'open_until', string.format('%.6f', open_until),
+             'successes', successes, 'probe_token', probe_token, 'probe_until', string.format('%.6f', probe_until))
+  redis.call('PEXPIRE', key, ttl)
+  redis.call('PEXPIRE', failures_key, ttl)
+end
+return {state, string.format('%.6f', open_until), redis.call('ZCARD', failures_key), successes, granted,
+        string.format('%.6f', probe_until)}
+"""
+
+class RedisBreakerBackend:
+    """Shared state in Redis; every transition is one atomic script call."""
+
+    def __init__(self, redis_client, key_prefix: str = "circuit"):
+        self.redis_client = redis_client
+        self.key_prefix = key_prefix
+        self._script = redis_client.register_script(BREAKER_SCRIPT)
+
+    def transition(self, op: str, name: str, now: float, config: CircuitBreakerConfig,
+                   token: str = '') -> BreakerView:
+        key = f"{self.key_prefix}:{name}"
+        # Idle state outlives any window, timeout or lease it could still matter for
+        ttl_ms = int(10 * max(config.failure_window, config.recovery_timeout + config.probe_lease) * 1000)
+        state, open_until, failures, successes, granted, probe_until = self._script(
+            keys=[key, f"{key}:failures"],
+            args=[op, repr(now), config.failure_threshold, config.failure_window, config.recovery_timeout,
+                  config.success_threshold, config.probe_lease, token, ttl_ms]
+        )
+        state = state.decode() if isinstance(state, bytes) else state
+        return BreakerView(CircuitState(state), float(open_until), int(failures), int(successes),
+                           bool(granted), float(probe_until))
+
+def _default_backend():
+    """Redis when REDIS_URL is configured, else process-local state."""
+    url = os.getenv("REDIS_URL")
+    if url and redis:
+        try:
+            # Every breaker check may hit Redis: a hung server must cost a call
+            # a fraction of a second, not the client's default of no timeout
+            timeout = float(os.getenv("CIRCUIT_BREAKER_REDIS_TIMEOUT", "0.25"))
+            return RedisBreakerBackend(redis.from_url(url, socket_connect_timeout=timeout, socket_timeout=timeout))
+        except Exception as e:
+            logger.warning(f"Circuit breaker state falling back to process memory: {e}")
+    return MemoryBreakerBackend()
+
+# =============================================================================
+# CIRCUIT BREAKER
+# =============================================================================
+
 class CircuitBreaker:
     """
     Production-grade circuit breaker implementation
     Protects external services from cascade failures
     """
-    
-    def __init__(self, name: str, config: Optional[CircuitBreakerConfig] = None):
+
+    def __init__(self, name: str, config: Optional[CircuitBreakerConfig] = None,
+                 backend=None, clock: Callable[[], float] = time.time):
         self.name = name
         self.config = config or CircuitBreakerConfig()
+        self.backend = backend or MemoryBreakerBackend()
         self.state = CircuitState.CLOSED
         self.stats = CircuitBreakerStats()
         self.lock = threading.RLock()
-        self.last_attempt_time = 0
-        
+        self._clock = clock
+
+        # Cached decision: trust CLOSED until _trust_until, reject until _reject_until
+        self._trust_until = 0.0
+        self._reject_until = 0.0
+
+        # Used while the shared backend is unreachable
+        self._fallback = MemoryBreakerBackend()
+        self._backend_degraded = False
+
         logger.info(f"🔒 Circuit breaker '{name}' initialized with config: {self.config}")
-    
+
     def __call__(self, func: Callable) -> Callable:
         """Decorator to protect functions with circuit breaker"""
         def wrapper(*args, **kwargs):
             return self.call(func, *args, **kwargs)
         return wrapper
-    
+
     def call(self, func: Callable, *args, **kwargs) -> Any:
         """Execute function with circuit breaker protection"""
         with self.lock:
             self.stats.total_requests += 1
-            
-            # Check if circuit should remain open
-            if self._should_reject_request():
-                error_msg = f"Circuit breaker '{self.name}' is OPEN - rejecting request"
-                logger.warning(error_msg)
-                raise CircuitBreakerOpenError(error_msg)
-            
-            # If half-open, only allow limited requests
-            if self.state == CircuitState.HALF_OPEN:
-                logger.info(f"🔍 Circuit breaker '{self.name}' testing recovery")
-        
+
+        probe_token = self._admit()
+
         try:
             # Execute the protected function
             start_time = time.time()
             result = func(*args, **kwargs)
             execution_time = time.time() - start_time
-            
+
             # Record success
-            self._on_success(execution_time)
+            self._on_success(execution_time, probe_token)
             return result
-            
+
         except Exception as e:
             # Record failure
-            self._on_failure(e)
+            self._on_failure(e, probe_token)
             raise
-    
-    def _should_reject_request(self) -> bool:
-        """Determine if request should be rejected based on circuit state"""
-        if self.state == CircuitState.CLOSED:
-            return False
-        
-        if self.state == CircuitState.OPEN:
-            # Check if recovery timeout has passed
-            if time.time() - self.last_attempt_time > self.config.recovery_timeout:
-                logger.info(f"🔄 Circuit breaker '{self.name}' entering HALF_OPEN state")
-                self.state = CircuitState.HALF_OPEN
-                return False
-            return True
-        
-        # HALF_OPEN state - allow some requests through
-        return False
-    
-    def _on_success(self, execution_time: float):
+
+    def _admit(self) -> Optional[str]:
+        """
+        Decide whether a call may run.
+
+        Returns:
+            Probe token when this call is the half-open probe, else None
+
+        Raises:
+            CircuitBreakerOpenError: Breaker open, or another worker is probing
+        """
+        now = self._clock()
+        with self.lock:
+            if self.state == CircuitState.CLOSED and now < self._trust_until:
+                return None
+            if self.state != CircuitState.CLOSED and now < self._reject_until:
+                self.stats.local_rejections += 1
+                raise CircuitBreakerOpenError(f"Circuit breaker '{self.name}' is OPEN - rejecting request")
+
+        token = uuid.uuid4().hex
+        view = self._transition('probe', now, token)
+
+        if view.state == CircuitState.CLOSED:
+            return None
+        if view.probe_granted:
+            with self.lock:
+                self.stats.probes += 1
+            logger.info(f"🔍 Circuit breaker '{self.name}' testing recovery")
+            return token
+
+        error_msg = f"Circuit breaker '{self.name}' is {view.state.name} - rejecting request"
+        logger.warning(error_msg)
+        raise CircuitBreakerOpenError(error_msg)
+
+    def _transition(self, op: str, now: float, token: str = '') -> BreakerView:
+        """Apply a transition to the shared state and cache the result locally."""
+        try:
+            view = self.backend.transition(op, self.name, now, self.config, token)
+            if self._backend_degraded:
+                self._backend_degraded = False
+                logger.info(f"Circuit breaker '{self.name}' shared state reachable again")
+        except Exception as e:
+            if not self._backend_degraded:
+                self._backend_degraded = True
+                logger.error(f"Circuit breaker '{self.name}' shared state unavailable, using local state: {e}")
+            view = self._fallback.transition(op, self.name, now, self.config, token)
+
+        with self.lock:
+            previous = self.state
+            self.state = view.state
+            if view.state == CircuitState.CLOSED:
+                self._trust_until = now + self.config.state_refresh_interval
+                self._reject_until = 0.0
+            elif view.state == CircuitState.OPEN:
+                self._reject_until = view.open_until
+            else:
+                # Half-open: the lease holder's call is in flight until probe_until
+                self._reject_until = view.probe_until
+            if view.state == CircuitState.OPEN and previous != CircuitState.OPEN:
+                self._open_circuit()
+            elif view.state == CircuitState.CLOSED and previous != CircuitState.CLOSED:
+                self._close_circuit()
+        return view
+
+    def _on_success(self, execution_time: float, probe_token: Optional[str] = None):
         """Handle successful request"""
+        now = self._clock()
         with self.lock:
             self.stats.successful_requests += 1
-            self.stats.last_success_time = time.time()
-            
-            if self.state == CircuitState.HALF_OPEN:
-                # Check if we have enough successes to close circuit
-                recent_successes = self._count_recent_successes()
-                if recent_successes >= self.config.success_threshold:
-                    self._close_circuit()
-            
-            logger.debug(f"✅ Circuit breaker '{self.name}' recorded success ({execution_time:.2f}s)")
-    
-    def _on_failure(self, exception: Exception):
+            self.stats.last_success_time = now
+            needs_backend = probe_token is not None or self.state == CircuitState.HALF_OPEN
+
+        if needs_backend:
+            self._transition('success', now, probe_token or '')
+
+        logger.debug(f"✅ Circuit breaker '{self.name}' recorded success ({execution_time:.2f}s)")
+
+    def _on_failure(self, exception: Exception, probe_token: Optional[str] = None):
         """Handle failed request"""
+        now = self._clock()
         with self.lock:
             self.stats.failed_requests += 1
-            self.stats.last_failure_time = time.time()
-            self.stats.recent_failures.append(time.time())
-            self.last_attempt_time = time.time()
-            
-            # Check if we should open the circuit
-            if self._should_open_circuit():
-                self._open_circuit()
-            
-            logger.warning(f"❌ Circuit breaker '{self.name}' recorded failure: {exception}")
-    
-    def _should_open_circuit(self) -> bool:
-        """Check if circuit should be opened due to failures"""
-        if self.state == CircuitState.OPEN:
-            return False
-        
-        # Count recent failures within window
-        current_time = time.time()
-        recent_failures = sum(1 for failure_time in self.stats.recent_failures 
-                            if current_time - failure_time < 60)  # Last minute
-        
-        return recent_failures >= self.config.failure_threshold
-    
+            self.stats.last_failure_time = now
+            self.stats.recent_failures.append(now)
+
+        # Every failure goes to the shared window; the probe token doubles as its unique member
+        self._transition('failure', now, probe_token or uuid.uuid4().hex)
+
+        logger.warning(f"❌ Circuit breaker '{self.name}' recorded failure: {exception}")
+
     def _open_circuit(self):
         """Open circuit due to failures"""
-        self.state = CircuitState.OPEN
         self.stats.circuit_opens += 1
         logger.warning(f"🔴 Circuit breaker '{self.name}' OPENED due to failures")
-    
+
     def _close_circuit(self):
         """Close circuit after successful recovery"""
-        self.state = CircuitState.CLOSED
         logger.info(f"🟢 Circuit breaker '{self.name}' CLOSED - service recovered")
-    
-    def _count_recent_successes(self) -> int:
-        """Count recent successful requests"""
-        # For simplicity, we'll use a basic counter
-        # In production, you'd want a more sophisticated sliding window
-        return min(self.stats.successful_requests, self.config.success_threshold)
-    
+
     def get_stats(self) -> dict:
         """Get circuit breaker statistics"""
+        shared = self._transition('get', self._clock())
         with self.lock:
             return {
                 'name': self.name,
-                'state': self.state.value,
+                'state': shared.state.value,
                 'total_requests': self.stats.total_requests,
                 'successful_requests': self.stats.successful_requests,
                 'failed_requests': self.stats.failed_requests,
                 'circuit_opens': self.stats.circuit_opens,
+                'local_rejections': self.stats.local_rejections,
+                'probes': self.stats.probes,
                 'success_rate': (self.stats.successful_requests / max(1, self.stats.total_requests)) * 100,
                 'last_failure_time': self.stats.last_failure_time,
                 'last_success_time': self.stats.last_success_time,
-                'recent_failures_count': len(self.stats.recent_failures)
+                'recent_failures_count': len(self.stats.recent_failures),
+                'shared_failures_in_window': shared.failures,
+                'open_until': shared.open_until if shared.state == CircuitState.OPEN else None,
+                'shared_state_degraded': self._backend_degraded
             }
-    
+
     def reset(self):
         """Reset circuit breaker to initial state"""
+        self._transition('reset', self._clock())
         with self.lock:
             self.state = CircuitState.CLOSED
             self.stats = CircuitBreakerStats()
-            self.last_attempt_time = 0
+            self._trust_until = self._reject_until = 0.0
             logger.info(f"🔄 Circuit breaker '{self.name}' reset")
 
 class CircuitBreakerOpenError(Exception):
@@ -193,33 +427,34 @@ class CircuitBreakerOpenError(Exception):
 
 class CircuitBreakerManager:
     """Centralized management of circuit breakers"""
-    
-    def __init__(self):
+
+    def __init__(self, backend=None):
         self.breakers: Dict[str, CircuitBreaker] = {}
         self.lock = threading.RLock()
-    
+        self.backend = backend if backend is not None else _default_backend()
+
     def get_breaker(self, name: str, config: Optional[CircuitBreakerConfig] = None) -> CircuitBreaker:
         """Get or create circuit breaker by name"""
         with self.lock:
             if name not in self.breakers:
-                self.breakers[name] = CircuitBreaker(name, config)
+                self.breakers[name] = CircuitBreaker(name, config, self.backend)
             return self.breakers[name]
-    
+
     def get_all_stats(self) -> Dict[str, dict]:
         """Get statistics for all circuit breakers"""
         with self.lock:
             return {name: breaker.get_stats() for name, breaker in self.breakers.items()}
-    
+
     def health_check(self) -> dict:
         """Overall health check for all circuit breakers"""
         stats = self.get_all_stats()
-        
+
         total_breakers = len(stats)
         open_breakers = sum(1 for s in stats.values() if s['state'] == 'open')
         half_open_breakers = sum(1 for s in stats.values() if s['state'] == 'half_open')
-        
+
         overall_health = "healthy" if open_breakers == 0 else "degraded" if open_breakers < total_breakers else "unhealthy"
-        
+
         return {
             'overall_health': overall_health,
             'total_breakers': total_breakers,
@@ -252,4 +487,4 @@ def get_audio_processing_circuit_breaker() -> CircuitBreaker:
     )
     return circuit_manager.get_breaker("audio_processing", config)
 
-logger.info("🔒 Circuit Breaker service initialized")
\ No newline at end of file
+logger.info("🔒 Circuit Breaker service initialized")
@@ -11,19 +11,37 @@ Key Features:
 - Segment confirmation and commitment logic
 - Overlap resolution between consecutive chunks
 - Memory-efficient segment tracking
+
+Candidate lookup: uncommitted segments are filed in fixed-width time buckets
+(SegmentIndex) with their normalized text and character counts cached, so a
+new result is only compared with segments that can satisfy the temporal
+rule. Before SequenceMatcher runs, a length bound and a shared-character
+bound (matched characters never exceed either) skip pairs that cannot reach
+similarity_threshold. Committed segments get the same buckets for overlap
+resolution. Decisions are identical to comparing every pair.
 """
 
 import logging
+import math
 import time
-from typing import List, Dict, Any, Optional, Tuple, Set
+from typing import List, Dict, Any, Optional, Tuple, Set, Callable
 from dataclasses import dataclass, field
 from datetime import datetime
 import difflib
 import re
-from collections import deque
+from collections import Counter, deque
 
 logger = logging.getLogger(__name__)
 
+START_PROXIMITY_S = 2.0      # Segments starting this close count as related regardless of overlap
+TIME_BUCKET_S = 2.0          # Width of SegmentIndex time buckets
+MAX_SEGMENT_BUCKETS = 64     # Longer segments are checked against every query instead
+
+
+def _similarity_text(text: str) -> str:
+    """Lowercase, punctuation stripped: the form text similarity is measured on."""
+    return re.sub(r'[^\w\s]', '', text.lower()).strip()
+
 @dataclass
 class TextSegment:
     """Represents a segment of transcribed text with confidence tracking."""
@@ -45,6 +63,11 @@ class TextSegment:
     @property
     def word_count(self) -> int:
         return len(self.text.split())
+    
+    @property
+    def avg_confidence(self) -> float:
+        # Merged segments keep the confidence of their best result
+        return self.confidence
 
 @dataclass
 class TranscriptionResult:
@@ -58,6 +81,114 @@ class TranscriptionResult:
     speaker_id: Optional[str] = None
     language: str = 'en'
 
+@dataclass
+class _IndexEntry:
+    segment: TextSegment
+    seq: int
+    buckets: Optional[range]          # None: too long or unbounded, checked on every query
+    text: Optional[str] = None        # Text the cached signature was built from
+    normalized: str = ""
+    char_counts: Optional[Counter] = None
+
+class SegmentIndex:
+    """
+    Segments of one session filed by time, in insertion order.
+    
+    A segment is filed under every TIME_BUCKET_S bucket its
+    [start_time, end_time] touches, so a query for a time range returns
+    every segment whose span or start falls in it (plus possibly a few
+    more from the edge buckets). With signatures, each entry also caches
+    the normalized text and its character counts.
+    """
+    
+    def __init__(self, signatures: bool = False, bucket_s: float = TIME_BUCKET_S):
+        self.signatures = signatures
+        self.bucket_s = bucket_s
+        self._entries: Dict[int, _IndexEntry] = {}                   # {id(segment): entry}
+        self._buckets: Dict[int, Dict[int, _IndexEntry]] = {}
+        self._unbucketed: Dict[int, _IndexEntry] = {}
+        self._next_seq = 0
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def __contains__(self, segment: TextSegment) -> bool:
+        return id(segment) in self._entries
+    
+    def segments(self) -> List[TextSegment]:
+        return [entry.segment for entry in self._entries.values()]
+    
+    def _bucket_range(self, start: float, end: float) -> Optional[range]:
+        if not (math.isfinite(start) and math.isfinite(end)):
+            return None
+        first = math.floor(start / self.bucket_s)
+        last = max(first, math.floor(end / self.bucket_s))
+        return range(first, last + 1) if last - first < MAX_SEGMENT_BUCKETS else None
+    
+    def _file(self, entry: _IndexEntry):
+        key = id(entry.segment)
+        if entry.buckets is None:
+            self._unbucketed[key] = entry
+        else:
+            for bucket in entry.buckets:
+                self._buckets.setdefault(bucket, {})[key] = entry
+    
+    def _unfile(self, entry: _IndexEntry):
+        key = id(entry.segment)
+        if entry.buckets is None:
+            self._unbucketed.pop(key, None)
+            return
+        for bucket in entry.buckets:
+            members = self._buckets.get(bucket)
+            if members is not None:
+                members.pop(key, None)
+                if not members:
+                    del self._buckets[bucket]
+    
+    def add(self, segment: TextSegment):
+        """File a segment after all current ones."""
+        entry = _IndexEntry(segment, self._next_seq, self._bucket_range(segment.start_time, segment.end_time))
+        self._next_seq += 1
+        self._entries[id(segment)] = entry
+        self._file(entry)
+    
+    def discard(self, segment: TextSegment):
+        entry = self._entries.pop(id(segment), None)
+        if entry is not None:
+            self._unfile(entry)
+    
+    def refresh(self, segment: TextSegment):
+        """Re-file a segment whose times changed; its signature is rebuilt lazily."""
+        entry = self._entries.get(id(segment))
+        if entry is None:
+            return
+        buckets = self._bucket_range(segment.start_time, segment.end_time)
+        if buckets != entry.buckets:
+            self._unfile(entry)
+            entry.buckets = buckets
+            self._file(entry)
+    
+    def signature(self, entry: _IndexEntry) -> _IndexEntry:
+        """Entry with its normalized text and character counts up to date."""
+        if entry.text != entry.segment.text:
+            entry.text = entry.segment.text
+            entry.normalized = _similarity_text(entry.text)
+            entry.char_counts = Counter(entry.normalized)
+        return entry
+    
+    def candidates(self, start: float, end: float) -> List[_IndexEntry]:
+        """Entries that may start or overlap within [start, end], in insertion order."""
+        buckets = self._bucket_range(start, end)
+        if buckets is None:
+            found = self._entries
+        else:
+            found = dict(self._unbucketed)
+            for bucket in buckets:
+                members = self._buckets.get(bucket)
+                if members:
+                    found.update(members)
+        return sorted(found.values(), key=lambda entry: entry.seq)
+
 class AdvancedDeduplicationEngine:
     """
     🔄 Production-grade deduplication engine for stable text commitment.
@@ -67,11 +198,13 @@ class AdvancedDeduplicationEngine:
     """
     
     def __init__(self, confirmation_threshold: int = 2, stability_window_s: float = 3.0,
-                 similarity_threshold: float = 0.85, max_segments: int = 1000):
+                 similarity_threshold: float = 0.85, max_segments: int = 1000,
+                 clock: Callable[[], float] = time.time):
         self.confirmation_threshold = confirmation_threshold  # Times text must be seen to commit
         self.stability_window_s = stability_window_s  # Time window for text stability
         self.similarity_threshold = similarity_threshold  # Text similarity for matching
         self.max_segments = max_segments  # Max segments to track per session
+        self._clock = clock  # Wall-clock seconds, injectable for tests
         
         # Segment tracking
         self.active_segments: Dict[str, deque] = {}  # {session_id: deque[TextSegment]}
@@ -81,6 +214,10 @@ class AdvancedDeduplicationEngine:
         # Overlap resolution
         self.pending_overlaps: Dict[str, List[TextSegment]] = {}  # {session_id: [TextSegment]}
         
+        # Candidate lookup: uncommitted active segments, and committed segments
+        self.segment_index: Dict[str, SegmentIndex] = {}  # {session_id: SegmentIndex}
+        self.committed_index: Dict[str, SegmentIndex] = {}  # {session_id: SegmentIndex}
+        
         # Metrics
         self.total_results_processed = 0
         self.segments_committed = 0
@@ -111,6 +248,8 @@ class AdvancedDeduplicationEngine:
             self.committed_segments[session_id] = []
             self.segment_sequence[session_id] = 0
             self.pending_overlaps[session_id] = []
+            self.segment_index[session_id] = SegmentIndex(signatures=True)
+            self.committed_index[session_id] = SegmentIndex()
         
         # Create text segment from result
         segment = self._create_segment_from_result(session_id, result)
@@ -119,14 +258,24 @@ class AdvancedDeduplicationEngine:
         similar_segments = self._find_similar_segments(session_id, segment)
         
         # Process based on similarity findings
+        index = self.segment_index[session_id]
         if similar_segments:
             # Update existing segment
             updated_segment = self._update_similar_segment(similar_segments[0], segment)
-            decision = self._evaluate_commitment(updated_segment)
+            index.refresh(updated_segment)
+            self.committed_index[session_id].refresh(updated_segment)
         else:
-            # Add new segment
-            self.active_segments[session_id].append(segment)
-            decision = self._evaluate_commitment(segment)
+            # Add new segment (a full deque drops its oldest)
+            updated_segment = segment
+            active = self.active_segments[session_id]
+            if active.maxlen is not None and active and len(active) >= active.maxlen:
+                index.discard(active[0])
+            active.append(segment)
+            if active.maxlen != 0:
+                index.add(segment)
+        decision = self._evaluate_commitment(updated_segment)
+        if updated_segment.is_committed:
+            index.discard(updated_segment)
         
         # Handle overlap resolution if final result
         if result.is_final:
@@ -175,26 +324,42 @@ class AdvancedDeduplicationEngine:
             segment_id=segment_id,
             chunk_ids=[result.chunk_id],
             confirmation_count=1,
+            last_seen=self._clock(),
             speaker_id=result.speaker_id
         )
     
     def _find_similar_segments(self, session_id: str, segment: TextSegment) -> List[TextSegment]:
-        """Find segments similar to the given segment."""
+        """Find uncommitted segments similar to the given segment, oldest first."""
         similar = []
-        
-        for existing_segment in self.active_segments[session_id]:
-            if existing_segment.is_committed:
-                continue
-            
-            # Check text similarity
-            similarity = self._calculate_text_similarity(existing_segment.text, segment.text)
+        index = self.segment_index[session_id]
+        normalized = _similarity_text(segment.text)
+        char_counts = Counter(normalized)
+        matcher = difflib.SequenceMatcher(None, b=normalized)
+        
+        # Only segments that could start within START_PROXIMITY_S or overlap in time
+        for entry in index.candidates(segment.start_time - START_PROXIMITY_S,
+                                      max(segment.end_time, segment.start_time + START_PROXIMITY_S)):
+            existing_segment = entry.segment
             
             # Check temporal overlap
             temporal_overlap = self._calculate_temporal_overlap(existing_segment, segment)
+            if not (temporal_overlap > 0.1 or abs(existing_segment.start_time - segment.start_time) < START_PROXIMITY_S):
+                continue
+            
+            # Check text similarity, skipping pairs whose upper bound is already too low
+            entry = index.signature(entry)
+            if not entry.normalized or not normalized:
+                similarity = 0.0
+            else:
+                total = len(entry.normalized) + len(normalized)
+                if (2.0 * min(len(entry.normalized), len(normalized)) / total < self.similarity_threshold or
+                        2.0 * sum((entry.char_counts & char_counts).values()) / total < self.similarity_threshold):
+                    continue
+                matcher.set_seq1(entry.normalized)
+                similarity = matcher.ratio()
             
             # Consider similar if high text similarity and some temporal relationship
-            if (similarity >= self.similarity_threshold and 
-                (temporal_overlap > 0.1 or abs(existing_segment.start_time - segment.start_time) < 2.0)):
+            if similarity >= self.similarity_threshold:
                 similar.append(existing_segment)
         
         return similar
@@ -202,8 +367,8 @@ class AdvancedDeduplicationEngine:
     def _calculate_text_similarity(self, text1: str, text2: str) -> float:
         """Calculate text similarity using sequence matching."""
         # Normalize texts
-        text1_norm = re.sub(r'[^\w\s]', '', text1.lower()).strip()
-        text2_norm = re.sub(r'[^\w\s]', '', text2.lower()).strip()
+        text1_norm = _similarity_text(text1)
+        text2_norm = _similarity_text(text2)
         
         if not text1_norm or not text2_norm:
             return 0.0
@@ -238,7 +403,7 @@ class AdvancedDeduplicationEngine:
         
         # Increment confirmation count
         existing.confirmation_count += 1
-        existing.last_seen = time.time()
+        existing.last_seen = self._clock()
         
         # Add chunk IDs
         existing.chunk_ids.extend(new.chunk_ids)
@@ -251,7 +416,7 @@ class AdvancedDeduplicationEngine:
     
     def _evaluate_commitment(self, segment: TextSegment) -> Dict[str, Any]:
         """Evaluate whether a segment should be committed."""
-        current_time = time.time()
+        current_time = self._clock()
         
         # Check if already committed
         if segment.is_committed:
@@ -296,15 +461,17 @@ class AdvancedDeduplicationEngine:
     def _resolve_overlaps(self, session_id: str, final_segment: TextSegment) -> Optional[Dict[str, Any]]:
         """Resolve overlaps when a final segment is processed."""
         overlapping_segments = []
+        committed_index = self.committed_index[session_id]
         
         # Find overlapping committed segments
-        for committed in self.committed_segments[session_id]:
-            if self._calculate_temporal_overlap(committed, final_segment) > 0.3:
-                overlapping_segments.append(committed)
+        for entry in committed_index.candidates(final_segment.start_time, final_segment.end_time):
+            if self._calculate_temporal_overlap(entry.segment, final_segment) > 0.3:
+                overlapping_segments.append(entry.segment)
         
         if not overlapping_segments:
             # No overlaps, commit the final segment
             self.committed_segments[session_id].append(final_segment)
+            committed_index.add(final_segment)
             return {
                 'action': 'committed_no_overlap',
                 'segment_count': 1
@@ -314,11 +481,15 @@ class AdvancedDeduplicationEngine:
         best_segment = self._choose_best_segment([final_segment] + overlapping_segments)
         
         # Remove overlapping segments and add the best one
+        overlap_ids = {id(overlap) for overlap in overlapping_segments}
+        self.committed_segments[session_id][:] = [
+            segment for segment in self.committed_segments[session_id] if id(segment) not in overlap_ids
+        ]
         for overlap in overlapping_segments:
-            if overlap in self.committed_segments[session_id]:
-                self.committed_segments[session_id].remove(overlap)
+            committed_index.discard(overlap)
         
         self.committed_segments[session_id].append(best_segment)
+        committed_index.add(best_segment)
         
         return {
             'action': 'overlap_resolved',
@@ -348,19 +519,24 @@ class AdvancedDeduplicationEngine:
     
     def _cleanup_old_segments(self, session_id: str):
         """Clean up old uncommitted segments."""
-        current_time = time.time()
+        current_time = self._clock()
         cutoff_time = current_time - (self.stability_window_s * 3)  # 3x stability window
         
-        # Remove old active segments
-        active_segments = self.active_segments[session_id]
-        to_remove = []
-        
-        for segment in active_segments:
-            if segment.last_seen < cutoff_time and not segment.is_committed:
-                to_remove.append(segment)
+        # Remove old active segments (the index holds exactly the uncommitted ones)
+        index = self.segment_index[session_id]
+        to_remove = [segment for segment in index.segments() if segment.last_seen < cutoff_time]
+        if not to_remove:
+            return
         
+        # Stale uncommitted segments are recent, so search from the right
+        # (by identity: deque.remove would compare every dataclass field)
+        active_segments = self.active_segments[session_id]
         for segment in to_remove:
-            active_segments.remove(segment)
+            for position in range(len(active_segments) - 1, -1, -1):
+                if active_segments[position] is segment:
+                    del active_segments[position]
+                    break
+            index.discard(segment)
     
     def get_committed_transcript(self, session_id: str) -> str:
         """Get the current committed transcript for a session."""
@@ -400,7 +576,8 @@ class AdvancedDeduplicationEngine:
     def cleanup_session(self, session_id: str):
         """Clean up all data for a session."""
         for collection in [self.active_segments, self.committed_segments, 
-                          self.segment_sequence, self.pending_overlaps]:
+                          self.segment_sequence, self.pending_overlaps,
+                          self.segment_index, self.committed_index]:
             collection.pop(session_id, None)
         
         logger.info(f"Cleaned up deduplication data for session {session_id}")
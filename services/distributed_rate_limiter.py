@@ -8,7 +8,8 @@ Prevents abuse and ensures fair resource allocation across all API endpoints.
 Key Features:
 - Redis-backed distributed rate limiting
 - Per-IP, per-user, and per-endpoint limits
-- Sliding window algorithm
+- Exact sliding-log or GCRA limits, each check one atomic Redis script
+  (services/rate_limit_engine.py)
 - Burst protection and backoff
 - Rate limit headers for clients
 - Whitelist/blacklist support
@@ -23,6 +24,8 @@ from flask import request, jsonify, current_app
 import redis
 from functools import wraps
 
+from services.rate_limit_engine import RateLimitEngine, RedisRateLimitBackend
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -46,6 +49,10 @@ class RateLimitConfig:
     upload_requests_per_hour: int = 50
     transcription_requests_per_minute: int = 20
     
+    # Algorithm: 'sliding_log' (exact window) or 'gcra' (smooth token bucket)
+    algorithm: str = "sliding_log"
+    enable_precheck: bool = True  # Answer already-denied clients without Redis
+    
     # Advanced features
     enable_whitelist: bool = True
     enable_blacklist: bool = True
@@ -63,9 +70,13 @@ class DistributedRateLimiter:
     Implements multiple rate limiting strategies with enterprise features.
     """
     
-    def __init__(self, redis_client: redis.Redis, config: Optional[RateLimitConfig] = None):
+    def __init__(self, redis_client: redis.Redis, config: Optional[RateLimitConfig] = None,
+                 engine: Optional[RateLimitEngine] = None):
         self.redis_client = redis_client
         self.config = config or RateLimitConfig()
+        self.engine = engine or RateLimitEngine(
+            RedisRateLimitBackend(redis_client), precheck=self.config.enable_precheck
+        )
         
         # Rate limit keys
         self.key_prefix = "rate_limit"
@@ -126,52 +137,28 @@ class DistributedRateLimiter:
     
     def check_rate_limit(self, identifier: str, endpoint: str, limit: int, window: int) -> Tuple[bool, Dict]:
         """
-        Check rate limit using sliding window algorithm.
+        Check rate limit with the configured algorithm in one atomic call.
         
         Returns:
             (is_allowed, rate_limit_info)
         """
-        now = int(time.time())
         key = f"{self.key_prefix}:{identifier}:{endpoint}:{window}"
         
         try:
-            pipe = self.redis_client.pipeline()
-            
-            # Remove expired entries
-            pipe.zremrangebyscore(key, 0, now - window)
-            
-            # Count current requests
-            pipe.zcard(key)
-            
-            # Add current request
-            pipe.zadd(key, {str(now): now})
-            
-            # Set expiry
-            pipe.expire(key, window + 60)
-            
-            results = pipe.execute()
-            current_count = results[1] + 1  # +1 for current request
-            
-            rate_limit_info = {
-                'limit': limit,
-                'remaining': max(0, limit - current_count),
-                'reset_time': now + window,
-                'retry_after': window if current_count > limit else 0
-            }
-            
-            is_allowed = current_count <= limit
+            decision = self.engine.check(key, limit, window, self.config.algorithm)
+            rate_limit_info = decision.to_info()
             
-            if not is_allowed:
-                # Remove the request we just added since it's not allowed
-                self.redis_client.zrem(key, str(now))
+            if not decision.allowed:
                 self.stats['rate_limit_blocks'] += 1
-                logger.warning(f"Rate limit exceeded for {identifier} on {endpoint}: {current_count}/{limit}")
+                if not decision.cached:
+                    logger.warning(f"Rate limit exceeded for {identifier} on {endpoint}: {limit}/{window}s")
             
-            return is_allowed, rate_limit_info
+            return decision.allowed, rate_limit_info
             
         except Exception as e:
             logger.error(f"Rate limit check error: {e}")
             # Fail open in case of Redis issues
+            now = int(time.time())
             return True, {'limit': limit, 'remaining': limit, 'reset_time': now + window, 'retry_after': 0}
     
     def check_burst_protection(self, identifier: str) -> Tuple[bool, Dict]:
@@ -257,6 +244,7 @@ class DistributedRateLimiter:
             
             return {
                 **self.stats,
+                'engine': self.engine.get_stats(),
                 'whitelist_count': whitelist_count,
                 'blacklist_count': blacklist_count,
                 'block_rate': self.stats['blocked_requests'] / max(1, self.stats['total_requests'])
@@ -381,10 +369,11 @@ def rate_limit(requests_per_minute: Optional[int] = None,
 # Initialize global rate limiter instance
 rate_limiter = None
 
-def init_rate_limiter(app, redis_client: redis.Redis, config: Optional[RateLimitConfig] = None):
+def init_rate_limiter(app, redis_client: redis.Redis, config: Optional[RateLimitConfig] = None,
+                      engine: Optional[RateLimitEngine] = None):
     """Initialize rate limiter for Flask app."""
     global rate_limiter
-    rate_limiter = DistributedRateLimiter(redis_client, config)
+    rate_limiter = DistributedRateLimiter(redis_client, config, engine)
     app.rate_limiter = rate_limiter
     
     logger.info("🔒 Distributed rate limiter initialized for Flask app")
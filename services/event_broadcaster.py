@@ -5,17 +5,30 @@ Broadcasts events to connected clients via WebSocket namespaces for
 real-time dashboard updates, task synchronization, and analytics refresh.
 
 Integrates with EventSequencer to ensure ordered, reliable event delivery.
+Events go through a BroadcastPipeline: they are batched per (namespace, room),
+redundant refreshes collapse, and ledger broadcast status is written in bulk.
 """
 
 import logging
-from typing import Dict, Any, Optional, List
+import time
+from typing import Dict, Any, Optional, List, Hashable
 from datetime import datetime
+from flask import current_app, has_app_context
 from flask_socketio import emit, join_room, leave_room
 from models.event_ledger import EventLedger, EventType, EventStatus
 from services.event_sequencer import event_sequencer
+from services.broadcast_pipeline import BroadcastPipeline
 
 logger = logging.getLogger(__name__)
 
+# Refresh events where only the latest one per key matters: a newer event
+# replaces a queued one. Value = payload fields that make up the key.
+COALESCED_EVENT_TYPES = {
+    EventType.DASHBOARD_REFRESH: (),
+    EventType.DASHBOARD_IDLE_SYNC: (),
+    EventType.ANALYTICS_REFRESH: ('meeting_id',),
+}
+
 
 class EventBroadcaster:
     """
@@ -36,11 +49,26 @@ class EventBroadcaster:
             socketio: Flask-SocketIO instance (injected at runtime)
         """
         self.socketio = socketio
+        self._app = None  # Flask app for ledger writes from background flushes
+        self.pipeline = BroadcastPipeline(
+            emit=self._emit_frame,
+            on_delivered=self._record_delivery,
+            spawn=self._spawn,
+            sleep=self._sleep
+        )
         
     def set_socketio(self, socketio):
         """Set SocketIO instance after initialization."""
         self.socketio = socketio
     
+    def flush(self) -> int:
+        """Send every queued broadcast now. Returns number of frames sent."""
+        return self.pipeline.flush_all()
+    
+    def get_broadcast_stats(self) -> Dict[str, Any]:
+        """Batching metrics: events enqueued/coalesced/sent, frames sent/saved."""
+        return self.pipeline.get_stats()
+    
     def emit_event(
         self,
         event: EventLedger,
@@ -51,6 +79,9 @@ class EventBroadcaster:
         """
         Emit an event to WebSocket clients.
         
+        The event is queued for its room's next batched frame; the ledger is
+        marked sent (or failed) in bulk once that frame goes out.
+        
         Args:
             event: EventLedger instance to broadcast
             namespace: WebSocket namespace (e.g., /dashboard, /analytics)
@@ -58,7 +89,7 @@ class EventBroadcaster:
             broadcast: Whether to broadcast to all clients in room
             
         Returns:
-            True if successfully emitted, False otherwise
+            True if queued for broadcast, False otherwise
         """
         if not self.socketio:
             logger.warning("SocketIO not initialized, cannot broadcast event")
@@ -78,31 +109,20 @@ class EventBroadcaster:
                 'checksum': event.checksum
             }
             
-            # Emit to specific room or broadcast to all
-            if room:
-                self.socketio.emit(
-                    event.event_type.value,
-                    payload,
-                    namespace=namespace,
-                    room=room
-                )
-            else:
-                self.socketio.emit(
-                    event.event_type.value,
-                    payload,
-                    namespace=namespace,
-                    broadcast=broadcast
-                )
+            if self._app is None and has_app_context():
+                self._app = current_app._get_current_object()
             
-            # Mark event as broadcast successfully
-            event_sequencer.mark_event_completed(
-                event.id,
-                result={'broadcast': 'sent', 'namespace': namespace, 'room': room},
-                broadcast_status='sent'
+            self.pipeline.enqueue(
+                namespace,
+                room,
+                event.event_type.value,
+                payload,
+                event_id=event.id,
+                coalesce_key=self._coalesce_key(event)
             )
             
             logger.debug(
-                f"Broadcast event {event.id} ({event.event_type.value}) to {namespace}"
+                f"Queued event {event.id} ({event.event_type.value}) for {namespace}"
                 f"{' room=' + room if room else ''}"
             )
             
@@ -120,6 +140,56 @@ class EventBroadcaster:
             
             return False
     
+    def _coalesce_key(self, event: EventLedger) -> Optional[Hashable]:
+        """Key under which a newer event supersedes a queued one (None = never)."""
+        fields = COALESCED_EVENT_TYPES.get(event.event_type)
+        if fields is None:
+            return None
+        data = event.payload if isinstance(event.payload, dict) else {}
+        return (event.event_type.value,) + tuple(data.get(name) for name in fields)
+    
+    def _emit_frame(self, event_name: str, payload: Any, namespace: str, room: Optional[str]):
+        """Send one (possibly batched) frame."""
+        if room:
+            self.socketio.emit(event_name, payload, namespace=namespace, room=room)
+        else:
+            self.socketio.emit(event_name, payload, namespace=namespace)
+    
+    def _record_delivery(self, namespace: str, room: Optional[str], event_ids: List[int], error: Optional[str]):
+        """Bulk-update the ledger for a flushed frame."""
+        if has_app_context() or self._app is None:
+            self._write_delivery(namespace, room, event_ids, error)
+        else:
+            with self._app.app_context():
+                self._write_delivery(namespace, room, event_ids, error)
+    
+    @staticmethod
+    def _write_delivery(namespace: str, room: Optional[str], event_ids: List[int], error: Optional[str]):
+        if error:
+            event_sequencer.mark_events_broadcast(
+                event_ids,
+                broadcast_status='failed',
+                error_message=error
+            )
+        else:
+            event_sequencer.mark_events_broadcast(
+                event_ids,
+                result={'broadcast': 'sent', 'namespace': namespace, 'room': room},
+                broadcast_status='sent'
+            )
+    
+    def _spawn(self, fn, *args):
+        """Run a delayed flush as a SocketIO background task (eventlet-aware)."""
+        if self.socketio is not None and hasattr(self.socketio, 'start_background_task'):
+            return self.socketio.start_background_task(fn, *args)
+        return BroadcastPipeline._spawn_thread(fn, *args)
+    
+    def _sleep(self, seconds: float):
+        if self.socketio is not None and hasattr(self.socketio, 'sleep'):
+            self.socketio.sleep(seconds)
+        else:
+            time.sleep(seconds)
+    
     def broadcast_session_created(
         self,
         session_id: int,
@@ -544,9 +614,12 @@ class EventBroadcaster:
                 if event.payload and isinstance(event.payload, dict):
                     workspace_id = event.payload.get('workspace_id')
                 
-                # Broadcast event
+                # Queue event; rooms are flushed together below
                 room = f"workspace_{workspace_id}" if workspace_id else None
                 self.emit_event(event, namespace=namespace, room=room)
+            
+            # Send queued rooms now as batched frames with bulk ledger updates
+            self.pipeline.flush_all()
                 
         except Exception as e:
             logger.error(f"Failed to process pending events: {e}", exc_info=True)
@@ -11,6 +11,8 @@ from datetime import datetime
 from sqlalchemy import select, and_, or_
 from models import db
 from models.event_ledger import EventLedger, EventType, EventStatus
+from models.session import Session
+from services.ledger_partitions import get_ledger_partition_manager
 
 logger = logging.getLogger(__name__)
 
@@ -171,13 +173,23 @@ class EventLedgerService:
         session_id: Optional[int] = None,
         external_session_id: Optional[str] = None,
         event_type: Optional[EventType] = None,
-        status: Optional[EventStatus] = None
+        status: Optional[EventStatus] = None,
+        since: Optional[datetime] = None
     ) -> List[EventLedger]:
-        """Get all events for a session"""
+        """
+        Get all events for a session.
+        
+        The query is bounded below by `since`, or by the session's start time when
+        it can be resolved, so the partitioned ledger only scans partitions that
+        can hold the session's events.
+        """
         try:
             stmt = select(EventLedger)
             
             conditions = []
+            since = since or EventLedgerService._session_floor(session_id, external_session_id)
+            if since:
+                conditions.append(EventLedger.created_at >= since)
             if session_id:
                 conditions.append(EventLedger.session_id == session_id)
             if external_session_id:
@@ -196,6 +208,26 @@ class EventLedgerService:
             logger.error(f"Failed to get session events: {e}")
             return []
     
+    @staticmethod
+    def _session_floor(
+        session_id: Optional[int] = None,
+        external_session_id: Optional[str] = None
+    ) -> Optional[datetime]:
+        """Earliest created_at a session's events can have, for partition pruning"""
+        if not session_id and not external_session_id:
+            return None
+        try:
+            stmt = select(Session.started_at)
+            if session_id:
+                stmt = stmt.where(Session.id == session_id)
+            else:
+                stmt = stmt.where(Session.external_id == external_session_id)
+            started_at = db.session.execute(stmt.limit(1)).scalar()
+            return get_ledger_partition_manager().prune_floor(started_at) if started_at else None
+        except Exception as e:
+            logger.debug(f"Session start lookup failed, ledger query not pruned: {e}")
+            return None
+    
     @staticmethod
     def get_by_idempotency_key(idempotency_key: str) -> Optional[EventLedger]:
         """Get event by idempotency key"""
@@ -217,6 +249,9 @@ class EventLedgerService:
             stmt = select(EventLedger)
             
             conditions = []
+            since = EventLedgerService._session_floor(session_id, external_session_id)
+            if since:
+                conditions.append(EventLedger.created_at >= since)
             if session_id:
                 conditions.append(EventLedger.session_id == session_id)
             if external_session_id:
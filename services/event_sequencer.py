@@ -15,11 +15,12 @@ import logging
 import hashlib
 import json
 import time
-from typing import Optional, Dict, Any, List, Tuple
+from typing import Optional, Dict, Any, List, Tuple, Callable, Hashable
 from datetime import datetime
-from sqlalchemy import select, func
+from sqlalchemy import select, func, update
 from models import db
 from models.event_ledger import EventLedger, EventType, EventStatus
+from services.causal_ordering import find_concurrent_pairs
 
 logger = logging.getLogger(__name__)
 
@@ -342,6 +343,61 @@ class EventSequencer:
             logger.error(f"Failed to mark event {event_id} as failed: {e}")
             return False
     
+    @staticmethod
+    def mark_events_broadcast(
+        event_ids: List[int],
+        result: Optional[Dict[str, Any]] = None,
+        broadcast_status: str = "sent",
+        error_message: Optional[str] = None
+    ) -> int:
+        """
+        Record the broadcast outcome of many events with one UPDATE and commit.
+
+        Bulk counterpart of mark_event_completed / mark_event_failed, used by
+        the batched broadcast pipeline.
+
+        Args:
+            event_ids: Event IDs delivered (or not) in the same batch
+            result: Broadcast result stored on every event
+            broadcast_status: sent marks events completed; failed marks them failed
+            error_message: Failure description (failed status only)
+
+        Returns:
+            Number of events updated
+        """
+        ids = sorted({event_id for event_id in event_ids if event_id is not None})
+        if not ids:
+            return 0
+
+        values: Dict[str, Any] = {
+            'completed_at': datetime.utcnow(),
+            'broadcast_status': broadcast_status,
+        }
+        if broadcast_status == "failed":
+            values['status'] = EventStatus.FAILED
+            values['error_message'] = error_message
+        else:
+            values['status'] = EventStatus.COMPLETED
+            values['result'] = result
+            values['last_applied_id'] = EventLedger.id  # Mark as applied
+
+        try:
+            updated = db.session.execute(
+                update(EventLedger)
+                .where(EventLedger.id.in_(ids))
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            db.session.commit()
+
+            logger.debug(f"Marked {updated} events broadcast_status={broadcast_status}")
+
+            return updated
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Failed to mark {len(ids)} events as {broadcast_status}: {e}")
+            return 0
+
     @staticmethod
     def get_pending_events(limit: int = 100) -> List[EventLedger]:
         """
@@ -548,7 +604,8 @@ class EventSequencer:
     @staticmethod
     def detect_conflicts(
         events: List[EventLedger],
-        resource_id: Optional[int] = None
+        resource_id: Optional[int] = None,
+        resource_key: Optional[Callable[[Any], Optional[Hashable]]] = None
     ) -> List[Tuple[EventLedger, EventLedger]]:
         """
         Detect concurrent events that may cause conflicts.
@@ -556,33 +613,23 @@ class EventSequencer:
         Args:
             events: List of events to check for conflicts
             resource_id: Optional resource ID to filter events
+            resource_key: Optional function returning the resource an event
+                          touches; only events on the same resource can conflict
             
         Returns:
             List of conflicting event pairs
         """
         try:
-            conflicts = []
-            
             # Filter events by resource if specified
             if resource_id:
                 events = [e for e in events if e.session_id == resource_id]
             
-            # Check each pair of events for concurrency
-            for i, event_a in enumerate(events):
-                for event_b in events[i+1:]:
-                    if not event_a.vector_clock or not event_b.vector_clock:
-                        continue
-                    
-                    relation = EventSequencer.compare_vector_clocks(
-                        event_a.vector_clock,
-                        event_b.vector_clock
-                    )
-                    
-                    if relation == "concurrent":
-                        conflicts.append((event_a, event_b))
-                        logger.warning(
-                            f"Conflict detected between events {event_a.id} and {event_b.id}"
-                        )
+            conflicts = find_concurrent_pairs(events, resource_key=resource_key)
+            
+            for event_a, event_b in conflicts:
+                logger.warning(
+                    f"Conflict detected between events {event_a.id} and {event_b.id}"
+                )
             
             return conflicts
             
@@ -1,26 +1,278 @@
+"""
+Feature flags.
+
+Flags are evaluated against an immutable FlagSnapshot held in process memory,
+never against the database on the request path. Every flag write bumps a
+monotonic version counter, kept in Redis when REDIS_URL is set and in the
+feature_flag_versions row otherwise. Each process polls that counter at most
+every FLAG_VERSION_CHECK_INTERVAL seconds and reloads only when it changed,
+so a toggle reaches every worker within that interval. A reload builds a new
+snapshot and swaps it in with one assignment; readers never see a half-built
+table.
+
+Within a request the first lookup pins the current snapshot on flask.g, so
+all checks in that request agree even if a refresh lands midway. Partial
+rollouts are decided by hashing (flag key, user id) into one of 10000
+buckets, which is stable across processes and restarts.
+"""
 from __future__ import annotations
+import logging
+import os
+import threading
+import time
+import zlib
+from dataclasses import dataclass, field
 from functools import wraps
-from typing import Optional
-from flask import request, abort
-from models.core_models import FeatureFlag
+from typing import Dict, FrozenSet, Iterable, Optional
+from flask import request, abort, g, has_app_context, has_request_context
+from models.core_models import FeatureFlag, FeatureFlagVersion
 from models import db
 
+try:
+    import redis
+except Exception:  # redis not installed
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+ROLLOUT_BUCKETS = 10000
+
+
+def rollout_bucket(key: str, user_id) -> int:
+    """Stable bucket in [0, ROLLOUT_BUCKETS) for a user under a flag."""
+    return zlib.crc32(f"{key}:{user_id}".encode()) % ROLLOUT_BUCKETS
+
+
+@dataclass(frozen=True)
+class FlagRule:
+    """Evaluation rule for one flag."""
+    enabled: bool
+    rollout_percentage: float = 100.0
+    target_users: FrozenSet[str] = frozenset()
+
+    def is_enabled(self, key: str, user_id=None) -> bool:
+        if not self.enabled:
+            return False
+        if self.rollout_percentage >= 100:
+            return True
+        if user_id is None:
+            return False
+        if str(user_id) in self.target_users:
+            return True
+        return rollout_bucket(key, user_id) < self.rollout_percentage * ROLLOUT_BUCKETS / 100
+
+
+@dataclass(frozen=True)
+class FlagSnapshot:
+    """Immutable view of every flag at one version."""
+    version: Optional[int] = None
+    rules: Dict[str, FlagRule] = field(default_factory=dict)
+
+    def get(self, key: str, default: bool = False, user_id=None) -> bool:
+        rule = self.rules.get(key)
+        return default if rule is None else rule.is_enabled(key, user_id)
+
+    @classmethod
+    def from_rows(cls, version: Optional[int], rows: Iterable[FeatureFlag]) -> "FlagSnapshot":
+        return cls(version, {
+            row.key: FlagRule(
+                enabled=bool(row.enabled),
+                rollout_percentage=100.0 if row.rollout_percentage is None else float(row.rollout_percentage),
+                target_users=frozenset(str(user) for user in (row.target_users or ()))
+            )
+            for row in rows
+        })
+
+
+# =============================================================================
+# VERSION STORES
+# =============================================================================
+
+class MemoryVersionStore:
+    """Process-local version counter; for tests and single-process runs."""
+
+    def __init__(self):
+        self._version = 0
+        self._lock = threading.Lock()
+
+    def get(self) -> int:
+        return self._version
+
+    def bump(self) -> int:
+        with self._lock:
+            self._version += 1
+            return self._version
+
+
+class RedisVersionStore:
+    """Version counter shared through one Redis key."""
+
+    KEY = "feature_flags:version"
+
+    def __init__(self, client):
+        self.client = client
+
+    def get(self) -> int:
+        return int(self.client.get(self.KEY) or 0)
+
+    def bump(self) -> int:
+        return int(self.client.incr(self.KEY))
+
+
+class DatabaseVersionStore:
+    """Version counter in the single feature_flag_versions row."""
+
+    def get(self) -> int:
+        version = db.session.query(FeatureFlagVersion.version).filter_by(id=1).scalar()
+        return version or 0
+
+    def bump(self) -> int:
+        try:
+            updated = FeatureFlagVersion.query.filter_by(id=1).update(
+                {FeatureFlagVersion.version: FeatureFlagVersion.version + 1}, synchronize_session=False
+            )
+            if not updated:
+                db.session.add(FeatureFlagVersion(id=1, version=1))
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return self.get()
+
+
+def _make_version_store():
+    url = os.getenv("REDIS_URL")
+    if url and redis:
+        return RedisVersionStore(redis.from_url(url, decode_responses=True))
+    return DatabaseVersionStore()
+
+
+# =============================================================================
+# FLAG SERVICE
+# =============================================================================
+
 class _Flags:
-    _cache = None
-    def get(self, key: str, default: bool=False) -> bool:
-        if self._cache is None:
-            self._cache = {f.key: f.enabled for f in FeatureFlag.query.all()}
-        return self._cache.get(key, default)
+    """
+    Process-wide flag cache refreshed from the shared version counter.
+
+    The version is read at most once per check_interval; one thread does the
+    check while others keep serving the current snapshot.
+    """
+
+    def __init__(self, version_store=None, check_interval: Optional[float] = None, clock=time.monotonic):
+        self._store = version_store
+        self.check_interval = (check_interval if check_interval is not None
+                               else float(os.getenv('FLAG_VERSION_CHECK_INTERVAL', '2.0')))
+        self._clock = clock
+        self._snapshot: Optional[FlagSnapshot] = None
+        self._last_check = float('-inf')
+        self._refresh_lock = threading.Lock()
+        self._app = None
+        self.stats = {'version_checks': 0, 'reloads': 0, 'errors': 0}
+
+    @property
+    def version_store(self):
+        if self._store is None:
+            self._store = _make_version_store()
+        return self._store
+
+    def init_app(self, app):
+        """Load the flags at startup so no request pays for the first table scan."""
+        self._app = app
+        try:
+            with app.app_context():
+                self.refresh(force=True)
+        except Exception as e:
+            logger.warning(f"Feature flags not preloaded: {e}")
+
+    def snapshot(self) -> FlagSnapshot:
+        """The current process-wide snapshot, refreshed if the check interval has passed."""
+        if self._clock() - self._last_check >= self.check_interval:
+            self.refresh()
+        return self._snapshot or FlagSnapshot()
+
+    def refresh(self, force: bool = False) -> FlagSnapshot:
+        """
+        Poll the version and reload the flags if it moved.
+
+        Args:
+            force: Reload even if the version is unchanged
+
+        Returns:
+            The snapshot in effect afterwards
+        """
+        blocking = self._snapshot is None or force
+        if not self._refresh_lock.acquire(blocking=blocking):
+            return self._snapshot   # Another thread is already checking
+        try:
+            if not has_app_context() and self._app is not None:
+                with self._app.app_context():
+                    self._refresh(force)
+            else:
+                self._refresh(force)
+        except Exception as e:
+            self.stats['errors'] += 1
+            self._last_check = self._clock()   # Retry after the interval, not on every lookup
+            logger.warning(f"Feature flag refresh failed, serving version {getattr(self._snapshot, 'version', None)}: {e}")
+        finally:
+            self._refresh_lock.release()
+        return self._snapshot
+
+    def _refresh(self, force: bool):
+        self.stats['version_checks'] += 1
+        try:
+            version = self.version_store.get()
+            if force or self._snapshot is None or version != self._snapshot.version:
+                # Version first: rows committed after this read are picked up by the next poll
+                self._snapshot = FlagSnapshot.from_rows(version, FeatureFlag.query.all())
+                self.stats['reloads'] += 1
+                logger.debug(f"Loaded {len(self._snapshot.rules)} feature flags at version {version}")
+        except Exception:
+            # A failed read would otherwise leave the request's transaction aborted
+            db.session.rollback()
+            raise
+        self._last_check = self._clock()
+
+    def get(self, key: str, default: bool = False, user_id=None) -> bool:
+        return current_snapshot().get(key, default, user_id)
+
     def invalidate_cache(self):
-        self._cache = None
+        """Publish a flag change to every process and reload this one now."""
+        try:
+            self.version_store.bump()
+        except Exception as e:
+            logger.error(f"Feature flag version bump failed, other workers will not see the change: {e}")
+        self.refresh(force=True)
+
 
 flags = _Flags()
 
+
+def current_snapshot() -> FlagSnapshot:
+    """The snapshot pinned to this request, or the process-wide one outside requests."""
+    if not has_request_context():
+        return flags.snapshot()
+    snapshot = getattr(g, '_flag_snapshot', None)
+    if snapshot is None:
+        snapshot = g._flag_snapshot = flags.snapshot()
+    return snapshot
+
+
+def _request_user_id():
+    try:
+        from flask_login import current_user
+        if current_user.is_authenticated:
+            return current_user.get_id()
+    except Exception:
+        pass
+    return None
+
+
 def require_flag(key: str, default: bool=False):
     def deco(fn):
         @wraps(fn)
         def inner(*a, **kw):
-            if not flags.get(key, default):
+            if not current_snapshot().get(key, default, _request_user_id()):
                 abort(403, f"Feature '{key}' disabled")
             return fn(*a, **kw)
         return inner
@@ -5,7 +5,7 @@ Implements daily mutation compression for EventLedger. Compacts old event
 entries to reduce database size while maintaining auditability.
 
 Key Features:
-- Daily compression of old event ledger entries
+- Daily compression of old event ledger entries, one time partition at a time
 - Preserve audit trail with compressed summaries
 - Configurable retention policies
 - Background job scheduling
@@ -19,6 +19,7 @@ from sqlalchemy import select, and_, func, delete
 from models import db
 from models.event_ledger import EventLedger, EventStatus, EventType
 from models.compaction_summary import CompactionSummary
+from services.ledger_partitions import get_ledger_partition_manager
 
 logger = logging.getLogger(__name__)
 
@@ -39,7 +40,7 @@ class LedgerCompactor:
     RETENTION_DAYS_COMPLETED = 30  # Keep completed events for 30 days
     RETENTION_DAYS_FAILED = 90  # Keep failed events for 90 days (for debugging)
     RETENTION_DAYS_PENDING = 7  # Keep old pending events for 7 days
-    SUMMARY_BATCH_SIZE = 1000  # Events to summarize per batch
+    MAX_PARTITIONS_PER_RUN = 31  # Partitions retired per compaction run
     
     def __init__(self):
         """Initialize LedgerCompactor."""
@@ -53,222 +54,140 @@ class LedgerCompactor:
             'last_compaction_time': None
         }
     
-    def should_compact_event(self, event: EventLedger) -> bool:
+    def retired_statuses(self, partition_end: datetime, now: datetime) -> List[EventStatus]:
         """
-        Determine if an event should be compacted based on age and status.
+        Statuses whose retention has fully elapsed for a partition ending at `partition_end`.
         
-        Args:
-            event: EventLedger instance
-            
-        Returns:
-            True if should compact, False otherwise
-        """
-        if not event.created_at:
-            return False
-        
-        age_days = (datetime.utcnow() - event.created_at).days
-        
-        # Check retention based on status
-        if event.status == EventStatus.COMPLETED:
-            return age_days > self.RETENTION_DAYS_COMPLETED
-        elif event.status == EventStatus.FAILED:
-            return age_days > self.RETENTION_DAYS_FAILED
-        elif event.status == EventStatus.PENDING:
-            return age_days > self.RETENTION_DAYS_PENDING
-        
-        return False
-    
-    def get_events_for_compaction(
-        self,
-        batch_size: int = SUMMARY_BATCH_SIZE
-    ) -> List[EventLedger]:
-        """
-        Get events that should be compacted.
-        
-        Args:
-            batch_size: Maximum number of events to return
-            
-        Returns:
-            List of events ready for compaction
-        """
-        try:
-            # Calculate cutoff dates
-            completed_cutoff = datetime.utcnow() - timedelta(days=self.RETENTION_DAYS_COMPLETED)
-            failed_cutoff = datetime.utcnow() - timedelta(days=self.RETENTION_DAYS_FAILED)
-            pending_cutoff = datetime.utcnow() - timedelta(days=self.RETENTION_DAYS_PENDING)
-            
-            # Build query for old events
-            query = select(EventLedger).where(
-                and_(
-                    EventLedger.created_at < completed_cutoff,
-                    EventLedger.status == EventStatus.COMPLETED
-                ) | and_(
-                    EventLedger.created_at < failed_cutoff,
-                    EventLedger.status == EventStatus.FAILED
-                ) | and_(
-                    EventLedger.created_at < pending_cutoff,
-                    EventLedger.status == EventStatus.PENDING
-                )
-            ).order_by(EventLedger.created_at.asc()).limit(batch_size)
-            
-            events = list(db.session.scalars(query).all())
-            
-            logger.info(f"Found {len(events)} events ready for compaction")
-            
-            return events
-            
-        except Exception as e:
-            logger.error(f"Failed to get events for compaction: {e}")
-            return []
-    
-    def create_compaction_summary(
-        self,
-        events: List[EventLedger]
-    ) -> Dict[str, Any]:
-        """
-        Create a summary of compacted events.
+        Completed events are kept for 30 days, failed ones for 90 and pending ones
+        for 7; processing and skipped events are never retired.
         
         Args:
-            events: Events to summarize
+            partition_end: End of the partition window
+            now: Reference time
             
         Returns:
-            Summary dictionary
+            Statuses that can be retired from the partition
         """
-        try:
-            # Group by event type
-            by_type: Dict[str, int] = {}
-            by_status: Dict[str, int] = {}
-            total_duration_ms = 0.0
-            
-            for event in events:
-                # Count by type
-                event_type = event.event_type.value
-                by_type[event_type] = by_type.get(event_type, 0) + 1
-                
-                # Count by status
-                status = event.status.value
-                by_status[status] = by_status.get(status, 0) + 1
-                
-                # Sum duration
-                if event.duration_ms:
-                    total_duration_ms += event.duration_ms
-            
-            # Build summary
-            summary = {
-                'compaction_date': datetime.utcnow().isoformat(),
-                'total_events': len(events),
-                'by_type': by_type,
-                'by_status': by_status,
-                'total_duration_ms': total_duration_ms,
-                'avg_duration_ms': total_duration_ms / len(events) if events else 0,
-                'date_range': {
-                    'start': min(e.created_at for e in events if e.created_at).isoformat() if events else None,
-                    'end': max(e.created_at for e in events if e.created_at).isoformat() if events else None
-                }
-            }
-            
-            logger.debug(f"Created compaction summary for {len(events)} events")
-            
-            return summary
-            
-        except Exception as e:
-            logger.error(f"Failed to create compaction summary: {e}")
-            return {
-                'error': str(e),
-                'total_events': len(events)
-            }
+        retention = {
+            EventStatus.COMPLETED: self.RETENTION_DAYS_COMPLETED,
+            EventStatus.FAILED: self.RETENTION_DAYS_FAILED,
+            EventStatus.PENDING: self.RETENTION_DAYS_PENDING,
+        }
+        return [status for status, days in retention.items() if partition_end <= now - timedelta(days=days)]
     
     def compact_events(
         self,
         dry_run: bool = False,
-        batch_size: int = SUMMARY_BATCH_SIZE
+        max_partitions: int = MAX_PARTITIONS_PER_RUN,
+        now: Optional[datetime] = None
     ) -> Dict[str, Any]:
         """
-        Compact old events by creating persisted summaries and deleting originals.
+        Compact old events by retiring whole ledger partitions.
         
-        Persists summary to CompactionSummary table before deletion to maintain
-        audit trail as required by CROWN⁴.5 spec.
+        Each status keeps its own retention (see retired_statuses): a partition's
+        events in a status are retired once the whole window is older than that
+        status's retention, and everything else in the partition is carried
+        forward. Each partition is aggregated with a
+        single GROUP BY, the summary is persisted to CompactionSummary, and the
+        partition is dropped in the same transaction so the audit trail never
+        lags the deletion.
         
         Args:
-            dry_run: If True, don't actually delete events
-            batch_size: Number of events to compact per batch
+            dry_run: If True, only report what would be retired
+            max_partitions: Maximum number of partitions retired per run
+            now: Reference time (defaults to utcnow)
             
         Returns:
             Compaction result summary
         """
+        now = now or datetime.utcnow()
+        manager = get_ledger_partition_manager()
+        retired: List[Dict[str, Any]] = []
+        summary_ids: List[int] = []
+        events_deleted = 0
+        
         try:
-            # Get events to compact
-            events_to_compact = self.get_events_for_compaction(batch_size)
-            
-            if not events_to_compact:
-                return {
-                    'success': True,
-                    'events_compacted': 0,
-                    'dry_run': dry_run,
-                    'message': 'No events ready for compaction'
-                }
-            
-            # Create summary dictionary
-            summary_data = self.create_compaction_summary(events_to_compact)
-            
-            # Persist summary to database BEFORE deletion
-            deleted_count = 0
-            summary_id = None
-            
+            connection = db.session.connection()
             if not dry_run:
-                # Create CompactionSummary record
+                manager.ensure_partitions(connection, now)
+                db.session.commit()
+                connection = db.session.connection()
+            
+            # Pending events have the shortest retention
+            cutoff = now - timedelta(days=self.RETENTION_DAYS_PENDING)
+            
+            for partition in manager.list_partitions(connection, before=cutoff):
+                if len(retired) >= max_partitions:
+                    break
+                statuses = self.retired_statuses(partition.end, now)
+                summary_data = manager.summarize(connection, partition, statuses=statuses)
+                if not summary_data['total_events']:
+                    if partition.native and EventStatus.COMPLETED in statuses and not dry_run:
+                        manager.drop_partition(connection, partition, statuses=statuses)  # Nothing to summarise
+                        db.session.commit()
+                        connection = db.session.connection()
+                    continue
+                retired.append(summary_data)
+                if dry_run:
+                    continue
+                
+                date_range = summary_data['date_range']
                 compaction_summary = CompactionSummary(
-                    total_events_compacted=len(events_to_compact),
-                    events_by_type=summary_data.get('by_type', {}),
-                    events_by_status=summary_data.get('by_status', {}),
-                    total_duration_ms=summary_data.get('total_duration_ms'),
-                    avg_duration_ms=summary_data.get('avg_duration_ms'),
-                    earliest_event_date=datetime.fromisoformat(summary_data['date_range']['start']) if summary_data.get('date_range', {}).get('start') else None,
-                    latest_event_date=datetime.fromisoformat(summary_data['date_range']['end']) if summary_data.get('date_range', {}).get('end') else None,
-                    events_deleted=0,  # Will update after deletion
+                    total_events_compacted=summary_data['total_events'],
+                    events_by_type=summary_data['by_type'],
+                    events_by_status=summary_data['by_status'],
+                    total_duration_ms=summary_data['total_duration_ms'],
+                    avg_duration_ms=summary_data['avg_duration_ms'],
+                    earliest_event_date=datetime.fromisoformat(date_range['start']) if date_range['start'] else None,
+                    latest_event_date=datetime.fromisoformat(date_range['end']) if date_range['end'] else None,
+                    partition_name=partition.name,
+                    events_deleted=0,
                     compaction_success=True
                 )
-                
                 db.session.add(compaction_summary)
-                db.session.flush()  # Get ID but don't commit yet
-                summary_id = compaction_summary.id
+                db.session.flush()
                 
-                # Now safe to delete events (summary is persisted)
-                event_ids = [e.id for e in events_to_compact]
-                delete_stmt = delete(EventLedger).where(EventLedger.id.in_(event_ids))
-                result = db.session.execute(delete_stmt)
-                deleted_count = result.rowcount
-                
-                # Update summary with deletion count
-                compaction_summary.events_deleted = deleted_count
-                
-                # Commit both summary and deletions
+                deleted = manager.drop_partition(connection, partition, statuses=statuses)
+                compaction_summary.events_deleted = summary_data['total_events'] if deleted is None else deleted
                 db.session.commit()
+                connection = db.session.connection()
                 
-                # Update metrics
-                self.metrics['events_compacted'] += len(events_to_compact)
-                self.metrics['events_deleted'] += deleted_count
+                summary_ids.append(compaction_summary.id)
+                events_deleted += compaction_summary.events_deleted
+                self.metrics['events_compacted'] += summary_data['total_events']
+                self.metrics['events_deleted'] += compaction_summary.events_deleted
                 self.metrics['summaries_created'] += 1
-                self.metrics['total_compactions'] += 1
-                self.metrics['last_compaction_time'] = datetime.utcnow().isoformat()
                 
                 logger.info(
-                    f"Compaction completed: {len(events_to_compact)} events compacted, "
-                    f"{deleted_count} deleted, summary ID {summary_id}"
+                    f"Retired ledger partition {partition.name}: {summary_data['total_events']} events, "
+                    f"summary ID {compaction_summary.id}"
                 )
             
-            result = {
+            if not retired:
+                return {
+                    'success': True,
+                    'events_compacted': 0,
+                    'partitions': [],
+                    'dry_run': dry_run,
+                    'message': 'No events ready for compaction'
+                }
+            
+            if not dry_run:
+                self.metrics['total_compactions'] += 1
+                self.metrics['last_compaction_time'] = datetime.utcnow().isoformat()
+            
+            events_found = sum(s['total_events'] for s in retired)
+            return {
                 'success': True,
-                'events_found': len(events_to_compact),
-                'events_compacted': len(events_to_compact),
-                'events_deleted': deleted_count,
-                'summary': summary_data,
-                'summary_id': summary_id,
+                'partitions': [s['partition'] for s in retired],
+                'events_found': events_found,
+                'events_compacted': events_found,
+                'events_deleted': events_deleted,
+                'summaries': retired,
+                'summary_ids': summary_ids,
                 'dry_run': dry_run
             }
             
-            return result
-            
         except Exception as e:
             db.session.rollback()
             logger.error(f"Failed to compact events: {e}")
@@ -294,6 +213,8 @@ class LedgerCompactor:
             return {
                 'success': False,
                 'error': str(e),
+                'partitions': [s['partition'] for s in retired],
+                'summary_ids': summary_ids,
                 'dry_run': dry_run
             }
     
@@ -378,6 +299,9 @@ class LedgerCompactor:
                 select(EventLedger.created_at).order_by(EventLedger.created_at.desc()).limit(1)
             )
             
+            connection = db.session.connection()
+            manager = get_ledger_partition_manager()
+            
             # Calculate size estimate (rough)
             avg_event_size_kb = 2  # Rough estimate
             estimated_size_mb = (total_count * avg_event_size_kb) / 1024
@@ -388,6 +312,8 @@ class LedgerCompactor:
                 'oldest_event': oldest.isoformat() if oldest else None,
                 'newest_event': newest.isoformat() if newest else None,
                 'estimated_size_mb': round(estimated_size_mb, 2),
+                'partitioned': manager.is_native(connection),
+                'partition_count': len(manager.list_partitions(connection)),
                 'compaction_metrics': self.metrics
             }
             
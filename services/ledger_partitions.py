@@ -0,0 +1,343 @@
+"""
+Ledger Partitions - time-partitioned storage for the event ledger
+
+On PostgreSQL, event_ledger is a declaratively partitioned table
+(PARTITION BY RANGE (created_at)) with one child table per window of
+LEDGER_PARTITION_DAYS days. A DEFAULT partition catches rows that fall outside
+the premade windows. Retiring old history is a DETACH + DROP of a whole child
+table, so compaction never deletes rows from the table that live writes go to.
+Failed events still inside their longer retention are carried into the DEFAULT
+partition before the drop. Queries that bound created_at are pruned to the
+partitions they can hit.
+
+Other databases (SQLite in tests and local development) keep a single
+event_ledger table. The same day-aligned windows act as logical shards there:
+each one is summarised with the same range-bounded GROUP BY and retired with a
+single range DELETE on the created_at index.
+
+Configuration (environment):
+    LEDGER_PARTITION_DAYS          - days per partition (default 1)
+    LEDGER_PARTITION_PREMAKE_DAYS  - days of partitions created ahead of today (default 7)
+"""
+
+import logging
+import os
+import re
+import threading
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import bindparam, column, delete, func, select, table, text
+from sqlalchemy.engine import Connection
+
+from models.event_ledger import EventLedger, EventStatus, EventType
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = 'event_ledger'
+DEFAULT_PARTITION = 'event_ledger_default'
+PARTITION_PREFIX = 'event_ledger_p'
+
+_EPOCH = date(1970, 1, 1)
+_BOUND_PATTERN = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+
+@dataclass
+class LedgerPartition:
+    """One time window of the ledger: [start, end)."""
+    name: str
+    start: datetime
+    end: datetime
+    native: bool = False  # Backed by its own PostgreSQL child table
+
+
+class LedgerPartitionManager:
+    """Creates, lists, summarises and retires event ledger partitions."""
+
+    def __init__(self, partition_days: Optional[int] = None, premake_days: Optional[int] = None):
+        """
+        Args:
+            partition_days: Width of each partition in days
+            premake_days: How far ahead of today partitions are created
+        """
+        self.partition_days = max(1, partition_days if partition_days is not None
+                                  else int(os.environ.get('LEDGER_PARTITION_DAYS', '1')))
+        self.premake_days = max(0, premake_days if premake_days is not None
+                                else int(os.environ.get('LEDGER_PARTITION_PREMAKE_DAYS', '7')))
+        self._native: Dict[str, bool] = {}  # engine url -> event_ledger is partitioned
+        self._lock = threading.Lock()
+
+    # ============================================
+    # Windows
+    # ============================================
+
+    def bounds_for(self, moment: datetime) -> Tuple[datetime, datetime]:
+        """Start and end of the partition window containing `moment`."""
+        day = moment.date() if isinstance(moment, datetime) else moment
+        offset = (day - _EPOCH).days // self.partition_days * self.partition_days
+        start = datetime.combine(_EPOCH + timedelta(days=offset), datetime.min.time())
+        return start, start + timedelta(days=self.partition_days)
+
+    def partition_for(self, moment: datetime) -> LedgerPartition:
+        """The (possibly not yet created) partition holding `moment`."""
+        start, end = self.bounds_for(moment)
+        return LedgerPartition(f"{PARTITION_PREFIX}{start:%Y%m%d}", start, end)
+
+    def prune_floor(self, moment: datetime) -> datetime:
+        """
+        Lower created_at bound for events tied to something that started at `moment`.
+
+        Goes back one extra window so clock skew between the database's now() and
+        application UTC timestamps cannot hide an event.
+        """
+        return self.bounds_for(moment - timedelta(days=self.partition_days))[0]
+
+    # ============================================
+    # Catalog
+    # ============================================
+
+    def is_native(self, connection: Connection) -> bool:
+        """True when event_ledger is a PostgreSQL partitioned table."""
+        if connection.dialect.name != 'postgresql':
+            return False
+        key = str(connection.engine.url)
+        with self._lock:
+            if key in self._native:
+                return self._native[key]
+        native = connection.execute(text(
+            "SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid "
+            "WHERE c.relname = :name"
+        ), {'name': PARENT_TABLE}).first() is not None
+        if not native:
+            logger.warning("⚠️ event_ledger is not partitioned; compaction falls back to range deletes")
+        with self._lock:
+            self._native[key] = native
+        return native
+
+    def list_partitions(self, connection: Connection, before: Optional[datetime] = None) -> List[LedgerPartition]:
+        """
+        List partitions in time order.
+
+        Args:
+            connection: Database connection
+            before: Only partitions whose window ends at or before this time
+
+        Returns:
+            Native child tables on PostgreSQL plus windows of rows held by the
+            DEFAULT partition; otherwise the windows that hold rows
+        """
+        if self.is_native(connection):
+            partitions = []
+            rows = connection.execute(text(
+                "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+                "WHERE p.relname = :parent"
+            ), {'parent': PARENT_TABLE})
+            has_default = False
+            for name, bound in rows:
+                match = _BOUND_PATTERN.search(bound or '')
+                if not match:
+                    has_default = has_default or name == DEFAULT_PARTITION
+                    continue
+                partitions.append(LedgerPartition(
+                    name, datetime.fromisoformat(match.group(1)), datetime.fromisoformat(match.group(2)), native=True
+                ))
+            if has_default:
+                # Failed events carried past their partition's drop, and rows outside any window
+                partitions.extend(
+                    p for p in self._row_windows(connection, table(DEFAULT_PARTITION, column('created_at')), before)
+                    if not any(c.start < p.end and p.start < c.end for c in partitions)
+                )
+        else:
+            partitions = self._row_windows(connection, EventLedger.__table__, before)
+
+        if before is not None:
+            partitions = [p for p in partitions if p.end <= before]
+        return sorted(partitions, key=lambda p: p.start)
+
+    def _row_windows(self, connection: Connection, source, before: Optional[datetime]) -> List[LedgerPartition]:
+        """Logical partitions for the windows that hold rows in `source`."""
+        stmt = select(func.date(source.c.created_at)).distinct()
+        if before is not None:
+            stmt = stmt.where(source.c.created_at < before)
+        seen: Dict[str, LedgerPartition] = {}
+        for (day,) in connection.execute(stmt):
+            if day is None:
+                continue
+            if isinstance(day, str):
+                day = date.fromisoformat(day)
+            partition = self.partition_for(day)
+            seen.setdefault(partition.name, partition)
+        return list(seen.values())
+
+    def ensure_partitions(self, connection: Connection, now: Optional[datetime] = None) -> List[str]:
+        """
+        Create missing partitions from the current window through the premake horizon.
+
+        Rows already routed to the DEFAULT partition for a window are moved into the
+        new child table. No-op when event_ledger is not natively partitioned.
+
+        Returns:
+            Names of the partitions created
+        """
+        if not self.is_native(connection):
+            return []
+        now = now or datetime.utcnow()
+        existing = self.list_partitions(connection)
+        created = []
+        partition = self.partition_for(now)
+        horizon = now + timedelta(days=self.premake_days)
+        while partition.start <= horizon:
+            if not any(p.start < partition.end and partition.start < p.end for p in existing):
+                self._create_partition(connection, partition)
+                created.append(partition.name)
+            partition = self.partition_for(partition.end)
+        if created:
+            logger.info(f"✅ Created event ledger partitions: {', '.join(created)}")
+        return created
+
+    def _create_partition(self, connection: Connection, partition: LedgerPartition):
+        quote = connection.dialect.identifier_preparer.quote
+        name, parent, default = quote(partition.name), quote(PARENT_TABLE), quote(DEFAULT_PARTITION)
+        bounds = f"FROM ('{partition.start:%Y-%m-%d %H:%M:%S}') TO ('{partition.end:%Y-%m-%d %H:%M:%S}')"
+        in_range = f"created_at >= '{partition.start:%Y-%m-%d %H:%M:%S}' AND created_at < '{partition.end:%Y-%m-%d %H:%M:%S}'"
+
+        has_default = connection.execute(
+            text("SELECT to_regclass(:name) IS NOT NULL"), {'name': DEFAULT_PARTITION}
+        ).scalar()
+        stranded = has_default and connection.execute(
+            text(f"SELECT EXISTS (SELECT 1 FROM {default} WHERE {in_range})")
+        ).scalar()
+        if not stranded:
+            connection.execute(text(f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {parent} FOR VALUES {bounds}"))
+            return
+
+        # Attaching over rows held by DEFAULT would fail the partition constraint: move them first
+        connection.execute(text(f"CREATE TABLE {name} (LIKE {parent} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+        connection.execute(text(f"INSERT INTO {name} SELECT * FROM {default} WHERE {in_range}"))
+        connection.execute(text(f"DELETE FROM {default} WHERE {in_range}"))
+        connection.execute(text(f"ALTER TABLE {parent} ATTACH PARTITION {name} FOR VALUES {bounds}"))
+
+    # ============================================
+    # Compaction
+    # ============================================
+
+    def summarize(
+        self,
+        connection: Connection,
+        partition: LedgerPartition,
+        statuses: Optional[Iterable[EventStatus]] = None
+    ) -> Dict[str, Any]:
+        """
+        Aggregate a partition with one GROUP BY (pruned to that partition on PostgreSQL).
+
+        Args:
+            connection: Database connection
+            partition: Partition to aggregate
+            statuses: Only count events in these statuses (default: all)
+
+        Returns:
+            Summary with totals by type and status, durations and date range
+        """
+        ledger = EventLedger.__table__
+        stmt = select(
+            ledger.c.event_type,
+            ledger.c.status,
+            func.count(),
+            func.sum(ledger.c.duration_ms),
+            func.min(ledger.c.created_at),
+            func.max(ledger.c.created_at),
+        ).where(
+            ledger.c.created_at >= partition.start,
+            ledger.c.created_at < partition.end,
+        ).group_by(ledger.c.event_type, ledger.c.status)
+        if statuses is not None:
+            stmt = stmt.where(ledger.c.status.in_(list(statuses)))
+
+        by_type: Dict[str, int] = {}
+        by_status: Dict[str, int] = {}
+        total = 0
+        total_duration_ms = 0.0
+        earliest = latest = None
+        for event_type, status, count, duration_ms, first, last in connection.execute(stmt):
+            type_name = event_type.value if isinstance(event_type, EventType) else str(event_type)
+            status_name = status.value if isinstance(status, EventStatus) else str(status)
+            by_type[type_name] = by_type.get(type_name, 0) + count
+            by_status[status_name] = by_status.get(status_name, 0) + count
+            total += count
+            total_duration_ms += duration_ms or 0.0
+            if first and (earliest is None or first < earliest):
+                earliest = first
+            if last and (latest is None or last > latest):
+                latest = last
+
+        return {
+            'partition': partition.name,
+            'compaction_date': datetime.utcnow().isoformat(),
+            'total_events': total,
+            'by_type': by_type,
+            'by_status': by_status,
+            'total_duration_ms': total_duration_ms,
+            'avg_duration_ms': total_duration_ms / total if total else 0,
+            'date_range': {
+                'start': earliest.isoformat() if earliest else None,
+                'end': latest.isoformat() if latest else None
+            }
+        }
+
+    def drop_partition(
+        self,
+        connection: Connection,
+        partition: LedgerPartition,
+        statuses: Optional[Iterable[EventStatus]] = None
+    ) -> Optional[int]:
+        """
+        Retire the events of a partition.
+
+        A native child table is detached and dropped when its bulk (completed
+        events) is being retired; events in other statuses are re-inserted
+        through the parent first, landing in the DEFAULT partition. Otherwise
+        the retired statuses are removed with a range DELETE.
+
+        Args:
+            connection: Database connection
+            partition: Partition to retire
+            statuses: Statuses to retire (default: all); the rest are kept
+
+        Returns:
+            Rows deleted by a range DELETE, None when a child table was dropped
+        """
+        statuses = list(statuses) if statuses is not None else None
+        if partition.native and (statuses is None or EventStatus.COMPLETED in statuses):
+            quote = connection.dialect.identifier_preparer.quote
+            parent, name = quote(PARENT_TABLE), quote(partition.name)
+            connection.execute(text(f"ALTER TABLE {parent} DETACH PARTITION {name}"))
+            if statuses is not None:
+                carry = text(
+                    f"INSERT INTO {parent} SELECT * FROM {name} WHERE status NOT IN :statuses"
+                ).bindparams(bindparam('statuses', expanding=True))
+                connection.execute(carry, {'statuses': [s.name for s in statuses]})
+            connection.execute(text(f"DROP TABLE {name}"))
+            return None
+
+        ledger = EventLedger.__table__
+        stmt = delete(ledger).where(ledger.c.created_at >= partition.start, ledger.c.created_at < partition.end)
+        if statuses is not None:
+            stmt = stmt.where(ledger.c.status.in_(statuses))
+        return connection.execute(stmt).rowcount
+
+
+# Singleton instance
+_manager: Optional[LedgerPartitionManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_ledger_partition_manager() -> LedgerPartitionManager:
+    """Get the process-wide ledger partition manager."""
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = LedgerPartitionManager()
+    return _manager
@@ -0,0 +1,374 @@
+"""
+LLM Response Cache - Prompt-level caching and request coalescing for OpenAI calls.
+
+This service provides:
+- Cache keyed on (model, prompt hash, parameters) in front of every LLM call
+- TTL expiry with size-bounded LRU eviction
+- Single-flight coalescing: concurrent identical requests share one API call
+- Per-caller hit rates and tokens saved for monitoring
+
+Only successful responses are cached. Errors are propagated to every coalesced
+waiter and never stored, so the fallback/retry logic in AIModelManager still
+sees real failures.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CacheEntry:
+    """A cached LLM response."""
+    response: Any
+    created_at: float
+    expires_at: float
+    tokens: int = 0
+
+
+@dataclass
+class CallerStats:
+    """Cache statistics for a single caller (e.g. "task extraction")."""
+    requests: int = 0
+    hits: int = 0
+    misses: int = 0
+    coalesced: int = 0
+    errors: int = 0
+    tokens_saved: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        if not self.requests:
+            return 0.0
+        return (self.hits + self.coalesced) / self.requests
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'requests': self.requests,
+            'hits': self.hits,
+            'misses': self.misses,
+            'coalesced': self.coalesced,
+            'errors': self.errors,
+            'tokens_saved': self.tokens_saved,
+            'hit_rate': round(self.hit_rate, 4),
+        }
+
+
+@dataclass
+class _InFlight:
+    """A request currently being executed by one thread."""
+    event: threading.Event = field(default_factory=threading.Event)
+    response: Any = None
+    error: Optional[BaseException] = None
+
+
+class LLMResponseCache:
+    """
+    In-process LLM response cache with single-flight coalescing.
+
+    Thread-safe for the synchronous OpenAI client and coroutine-safe for the
+    async client. Both paths share the same entry store.
+    """
+
+    DEFAULT_TTL_SECONDS = 3600
+    DEFAULT_MAX_ENTRIES = 512
+
+    def __init__(self, ttl_seconds: int = DEFAULT_TTL_SECONDS,
+                 max_entries: int = DEFAULT_MAX_ENTRIES,
+                 clock: Callable[[], float] = time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._inflight: Dict[str, _InFlight] = {}
+        self._async_inflight: Dict[str, asyncio.Future] = {}
+        self._stats: Dict[str, CallerStats] = defaultdict(CallerStats)
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    # ============================================
+    # Keys
+    # ============================================
+
+    @staticmethod
+    def make_key(model: str, request: Dict[str, Any]) -> str:
+        """
+        Build a stable cache key from the model and request payload.
+
+        Args:
+            model: Model name the request is sent to
+            request: Everything else that affects the output (messages,
+                temperature, max_tokens, response_format, ...)
+
+        Returns:
+            Hex digest identifying the request
+        """
+        payload = json.dumps(request, sort_keys=True, separators=(',', ':'), default=str)
+        prompt_hash = hashlib.sha256(payload.encode('utf-8')).hexdigest()
+        return f"{model}:{prompt_hash}"
+
+    # ============================================
+    # Lookup / store
+    # ============================================
+
+    def _lookup(self, key: str, caller: str) -> Optional[CacheEntry]:
+        """Return a live entry and record the hit. Caller must hold the lock."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= self._clock():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        stats = self._stats[caller]
+        stats.hits += 1
+        stats.tokens_saved += entry.tokens
+        return entry
+
+    def _store(self, key: str, response: Any):
+        """Insert a response, evicting least-recently-used entries. Caller must hold the lock."""
+        now = self._clock()
+        self._entries[key] = CacheEntry(
+            response=response,
+            created_at=now,
+            expires_at=now + self.ttl_seconds,
+            tokens=self._count_tokens(response),
+        )
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    @staticmethod
+    def _count_tokens(response: Any) -> int:
+        """Read total token usage from an OpenAI response, if present."""
+        usage = getattr(response, 'usage', None)
+        if usage is None and isinstance(response, dict):
+            usage = response.get('usage')
+        if usage is None:
+            return 0
+        if isinstance(usage, dict):
+            return int(usage.get('total_tokens') or 0)
+        return int(getattr(usage, 'total_tokens', 0) or 0)
+
+    # ============================================
+    # Public API
+    # ============================================
+
+    def get_or_call(self, model: str, request: Dict[str, Any], api_call: Callable[[], Any],
+                    caller: str = "default", refresh: bool = False) -> Any:
+        """
+        Return a cached response or execute api_call exactly once per key.
+
+        Args:
+            model: Model name the request is sent to
+            request: Request payload used for the cache key
+            api_call: Zero-argument function performing the real API call
+            caller: Name used for per-caller statistics
+            refresh: Skip the lookup (e.g. the cached output failed validation)
+                and overwrite the entry with a fresh response
+
+        Returns:
+            The API response
+        """
+        key = self.make_key(model, request)
+
+        with self._lock:
+            stats = self._stats[caller]
+            stats.requests += 1
+            if not refresh:
+                entry = self._lookup(key, caller)
+                if entry is not None:
+                    return entry.response
+                inflight = self._inflight.get(key)
+                if inflight is not None:
+                    stats.coalesced += 1
+            else:
+                inflight = None
+            if inflight is None:
+                stats.misses += 1
+                inflight = _InFlight()
+                self._inflight[key] = inflight
+                owner = True
+            else:
+                owner = False
+
+        if not owner:
+            inflight.event.wait()
+            if inflight.error is not None:
+                raise inflight.error
+            with self._lock:
+                self._stats[caller].tokens_saved += self._count_tokens(inflight.response)
+            return inflight.response
+
+        try:
+            response = api_call()
+        except BaseException as e:
+            inflight.error = e
+            with self._lock:
+                self._stats[caller].errors += 1
+                if self._inflight.get(key) is inflight:
+                    del self._inflight[key]
+            inflight.event.set()
+            raise
+
+        inflight.response = response
+        with self._lock:
+            self._store(key, response)
+            if self._inflight.get(key) is inflight:
+                del self._inflight[key]
+        inflight.event.set()
+        return response
+
+    async def get_or_call_async(self, model: str, request: Dict[str, Any],
+                                api_call: Callable[[], Awaitable[Any]],
+                                caller: str = "default", refresh: bool = False) -> Any:
+        """
+        Async version of get_or_call for the AsyncOpenAI client.
+
+        Coalescing applies to coroutines running on the same event loop.
+        """
+        key = self.make_key(model, request)
+        loop = asyncio.get_running_loop()
+
+        with self._lock:
+            stats = self._stats[caller]
+            stats.requests += 1
+            future = None
+            if not refresh:
+                entry = self._lookup(key, caller)
+                if entry is not None:
+                    return entry.response
+                future = self._async_inflight.get(key)
+                if future is not None and future.get_loop() is not loop:
+                    future = None
+                if future is not None:
+                    stats.coalesced += 1
+            if future is None:
+                stats.misses += 1
+                future = loop.create_future()
+                self._async_inflight[key] = future
+                owner = True
+            else:
+                owner = False
+
+        if not owner:
+            response = await asyncio.shield(future)
+            with self._lock:
+                self._stats[caller].tokens_saved += self._count_tokens(response)
+            return response
+
+        try:
+            response = await api_call()
+        except BaseException as e:
+            with self._lock:
+                self._stats[caller].errors += 1
+                if self._async_inflight.get(key) is future:
+                    del self._async_inflight[key]
+            if not future.done():
+                future.set_exception(e)
+                # Mark retrieved so unobserved failures don't log warnings
+                future.exception()
+            raise
+
+        with self._lock:
+            self._store(key, response)
+            if self._async_inflight.get(key) is future:
+                del self._async_inflight[key]
+        if not future.done():
+            future.set_result(response)
+        return response
+
+    def invalidate(self, model: str, request: Dict[str, Any]) -> bool:
+        """Drop a single cached response. Returns True if an entry was removed."""
+        key = self.make_key(model, request)
+        with self._lock:
+            return self._entries.pop(key, None) is not None
+
+    def clear(self):
+        """Drop all cached responses and statistics."""
+        with self._lock:
+            self._entries.clear()
+            self._stats.clear()
+            self._evictions = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return cache size and per-caller hit rates / tokens saved."""
+        with self._lock:
+            callers = {name: s.to_dict() for name, s in self._stats.items()}
+            total_requests = sum(s.requests for s in self._stats.values())
+            total_served = sum(s.hits + s.coalesced for s in self._stats.values())
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'evictions': self._evictions,
+                'requests': total_requests,
+                'hit_rate': round(total_served / total_requests, 4) if total_requests else 0.0,
+                'tokens_saved': sum(s.tokens_saved for s in self._stats.values()),
+                'callers': callers,
+            }
+
+
+def _split_request(kwargs: Dict[str, Any]):
+    """Separate the model from the rest of a chat.completions.create payload."""
+    request = dict(kwargs)
+    model = request.pop('model')
+    return model, request
+
+
+def cached_chat_completion(client, caller: str, refresh: bool = False, **kwargs) -> Any:
+    """
+    Cached drop-in for client.chat.completions.create(**kwargs).
+
+    Example:
+        ```python
+        response = cached_chat_completion(
+            self.client, "ai insights summary",
+            model="gpt-4o-mini-2024-07-18",
+            messages=[...],
+            temperature=0.5,
+        )
+        ```
+    """
+    model, request = _split_request(kwargs)
+    return get_llm_cache().get_or_call(
+        model, request,
+        lambda: client.chat.completions.create(**kwargs),
+        caller=caller, refresh=refresh
+    )
+
+
+async def cached_chat_completion_async(client, caller: str, refresh: bool = False, **kwargs) -> Any:
+    """Cached drop-in for await client.chat.completions.create(**kwargs)."""
+    model, request = _split_request(kwargs)
+    return await get_llm_cache().get_or_call_async(
+        model, request,
+        lambda: client.chat.completions.create(**kwargs),
+        caller=caller, refresh=refresh
+    )
+
+
+# Global LLM cache instance
+_global_llm_cache = None
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMResponseCache:
+    """Get global LLM response cache"""
+    global _global_llm_cache
+
+    if _global_llm_cache is None:
+        with _llm_cache_lock:
+            if _global_llm_cache is None:
+                _global_llm_cache = LLMResponseCache()
+
+    return _global_llm_cache
@@ -0,0 +1,330 @@
+"""
+Log Pipeline - non-blocking structured logging
+
+Logging calls on request and audio paths only build the LogRecord, capture a
+small tuple of request context and put the record on a bounded queue. A
+background QueueListener renders JSON (or text) and writes it, so formatting
+and stream I/O never run on the caller's thread. Fields that never change for
+the process (hostname) are computed once. When the queue is full
+records are dropped and counted instead of blocking the caller; the drop count
+is reported in the next record that gets through.
+
+Hot-path log sites (one per audio chunk or Whisper call) can be rate limited
+and/or sampled per logger with HotPathFilter: INFO and below are capped per
+call site, warnings and errors always pass, and the number of suppressed
+records is attached to the next record from that site.
+
+Configuration (environment):
+    LOG_LEVEL              - root level (default INFO)
+    LOG_ASYNC              - 'false' writes synchronously (default true)
+    LOG_QUEUE_SIZE         - queued records before dropping (default 10000)
+    LOG_HOT_PATH_LOGGERS   - comma-separated loggers to rate limit
+                             (default services.transcription_service)
+    LOG_HOT_PATH_RATE      - records per call site per second (default 5)
+    LOG_HOT_PATH_SAMPLE    - additionally keep only every Nth record per site (default 1)
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import socket
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+try:
+    from flask import g, has_request_context, request
+except ImportError:  # pragma: no cover - Flask is always installed with the app
+    has_request_context = None
+
+# LogRecord attributes that are not user-supplied extra fields
+_RESERVED_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {
+    'message', 'asctime', 'log_context', 'exc_summary', 'suppressed', 'dropped_records',
+}
+_traceback_formatter = logging.Formatter()
+
+
+def capture_log_context() -> Optional[Tuple[Any, ...]]:
+    """
+    Capture request context for a record on the logging thread.
+
+    Only cheap attribute reads happen here; the dict is built by the formatter on
+    the listener thread. The user is read from what Flask-Login already loaded for
+    this request, so logging never triggers a user lookup.
+
+    Returns:
+        (request_id, method, path, ip, user_agent, user_id, username) or None
+    """
+    if has_request_context is None or not has_request_context():
+        return None
+    user = getattr(g, '_login_user', None)
+    user_id = username = None
+    if user is not None and getattr(user, 'is_authenticated', False):
+        user_id, username = getattr(user, 'id', None), getattr(user, 'username', None)
+    return (
+        getattr(g, 'request_id', None),
+        request.method,
+        request.path,
+        request.remote_addr,
+        request.headers.get('User-Agent', 'unknown')[:200],
+        user_id,
+        username,
+    )
+
+
+class StructuredJsonFormatter(logging.Formatter):
+    """
+    JSON log formatter with structured fields.
+
+    Includes: timestamp, level, logger name, message, source location, process and
+    thread, request/user context captured at log time, and custom extra fields.
+    """
+
+    def __init__(self, static_fields: Optional[Dict[str, Any]] = None):
+        super().__init__()
+        try:
+            hostname = socket.gethostname()
+        except Exception:
+            hostname = 'unknown'
+        self.static_fields = {'hostname': hostname, **(static_fields or {})}
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            'timestamp': datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'module': record.module,
+            'function': record.funcName,
+            'line': record.lineno,
+            'process_id': record.process,
+            'process_name': record.processName,
+            'thread_id': record.thread,
+            'thread_name': record.threadName,
+        }
+        payload.update(self.static_fields)
+
+        context = getattr(record, 'log_context', None)
+        if context:
+            request_id, method, path, ip, user_agent, user_id, username = context
+            if request_id:
+                payload['request_id'] = request_id
+            payload['http'] = {'method': method, 'path': path, 'ip': ip, 'user_agent': user_agent}
+            if user_id is not None:
+                payload['user'] = {'id': str(user_id), 'username': username}
+
+        if record.exc_info:
+            payload['exception'] = {
+                'type': record.exc_info[0].__name__ if record.exc_info[0] else None,
+                'message': str(record.exc_info[1]) if record.exc_info[1] else None,
+                'traceback': self.formatException(record.exc_info),
+            }
+        elif record.exc_text:
+            exc_type, exc_message = getattr(record, 'exc_summary', (None, None))
+            payload['exception'] = {'type': exc_type, 'message': exc_message, 'traceback': record.exc_text}
+
+        for key in ('suppressed', 'dropped_records'):
+            if getattr(record, key, None):
+                payload[key] = getattr(record, key)
+
+        # Custom fields: logger.info("msg", extra={"custom_field": "value"})
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS:
+                payload[key] = value
+
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class AsyncQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that never blocks and never formats on the caller's thread."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.enqueued = 0
+        self.dropped = 0
+        self._unreported_drops = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Render the message now (args may be mutated later) but leave JSON and
+        # traceback layout to the listener. Tracebacks are the exception: the
+        # frames must be rendered while they are still alive.
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = _traceback_formatter.formatException(record.exc_info)
+            exc_type, exc_value = record.exc_info[:2]
+            record.exc_summary = (exc_type.__name__ if exc_type else None, str(exc_value) if exc_value else None)
+            record.exc_info = None
+        record.log_context = capture_log_context()
+        if self._unreported_drops:
+            record.dropped_records, self._unreported_drops = self._unreported_drops, 0
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+            self.enqueued += 1
+        except queue.Full:
+            self.dropped += 1
+            self._unreported_drops += 1 + (getattr(record, 'dropped_records', None) or 0)
+
+
+class HotPathFilter(logging.Filter):
+    """
+    Per-call-site rate limit and sampling for INFO/DEBUG records of one logger.
+
+    Each (file, line) site may emit `per_second` records per second, and of those
+    only every `sample_every`-th. WARNING and above always pass. The count of
+    records suppressed since the site's last emitted record is attached as
+    `suppressed`.
+    """
+
+    def __init__(self, per_second: float = 5.0, sample_every: int = 1, clock=time.monotonic):
+        super().__init__()
+        self.per_second = per_second
+        self.sample_every = max(1, sample_every)
+        self.clock = clock
+        self._sites: Dict[Tuple[str, int], list] = {}  # site -> [tokens, updated_at, seen, suppressed]
+        self._lock = threading.Lock()
+        self.suppressed_total = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        site = (record.pathname, record.lineno)
+        now = self.clock()
+        with self._lock:
+            state = self._sites.get(site)
+            if state is None:
+                state = self._sites[site] = [self.per_second, now, 0, 0]
+            state[2] += 1
+            if self.per_second > 0:
+                state[0] = min(self.per_second, state[0] + (now - state[1]) * self.per_second)
+                state[1] = now
+            allowed = (state[2] - 1) % self.sample_every == 0 and (self.per_second <= 0 or state[0] >= 1)
+            if not allowed:
+                state[3] += 1
+                self.suppressed_total += 1
+                return False
+            if self.per_second > 0:
+                state[0] -= 1
+            if state[3]:
+                record.suppressed, state[3] = state[3], 0
+        return True
+
+
+class LogPipeline:
+    """Root logging setup: async queue in front of a stream handler."""
+
+    def __init__(self):
+        self.handler: Optional[logging.Handler] = None
+        self.queue_handler: Optional[AsyncQueueHandler] = None
+        self.listener: Optional[logging.handlers.QueueListener] = None
+        self.hot_path_filters: Dict[str, HotPathFilter] = {}
+
+    def configure(
+        self,
+        json_logs: bool = False,
+        level: Optional[str] = None,
+        async_logging: Optional[bool] = None,
+        queue_size: Optional[int] = None,
+        stream=None
+    ) -> logging.Handler:
+        """
+        Install the pipeline on the root logger (replacing its handlers).
+
+        Args:
+            json_logs: Structured JSON output instead of text
+            level: Root level name
+            async_logging: Route records through the background queue
+            queue_size: Queue capacity before records are dropped
+            stream: Output stream (default stderr)
+
+        Returns:
+            The handler installed on the root logger
+        """
+        self.stop()
+        level = level or os.environ.get('LOG_LEVEL', 'INFO')
+        if async_logging is None:
+            async_logging = os.environ.get('LOG_ASYNC', 'true').lower() != 'false'
+        queue_size = queue_size or int(os.environ.get('LOG_QUEUE_SIZE', '10000'))
+
+        self.handler = logging.StreamHandler(stream)
+        self.handler.setFormatter(
+            StructuredJsonFormatter() if json_logs
+            else logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+        )
+
+        root = logging.getLogger()
+        root.handlers[:] = []
+        root.setLevel(level.upper())
+        if async_logging:
+            self.queue_handler = AsyncQueueHandler(queue.Queue(queue_size))
+            self.listener = logging.handlers.QueueListener(self.queue_handler.queue, self.handler)
+            self.listener.start()
+            root.addHandler(self.queue_handler)
+            return self.queue_handler
+        root.addHandler(self.handler)
+        return self.handler
+
+    def limit_hot_paths(
+        self,
+        logger_names: Optional[Iterable[str]] = None,
+        per_second: Optional[float] = None,
+        sample_every: Optional[int] = None
+    ):
+        """Attach a HotPathFilter to each named logger (configured from env by default)."""
+        if logger_names is None:
+            logger_names = [
+                name.strip() for name in
+                os.environ.get('LOG_HOT_PATH_LOGGERS', 'services.transcription_service').split(',')
+                if name.strip()
+            ]
+        per_second = per_second if per_second is not None else float(os.environ.get('LOG_HOT_PATH_RATE', '5'))
+        sample_every = sample_every or int(os.environ.get('LOG_HOT_PATH_SAMPLE', '1'))
+        for name in logger_names:
+            logger = logging.getLogger(name)
+            previous = self.hot_path_filters.pop(name, None)
+            if previous is not None:
+                logger.removeFilter(previous)
+            hot_filter = HotPathFilter(per_second, sample_every)
+            logger.addFilter(hot_filter)
+            self.hot_path_filters[name] = hot_filter
+
+    def stop(self):
+        """Flush queued records and stop the listener."""
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue and suppression counters."""
+        queue_handler = self.queue_handler if self.listener is not None else None
+        return {
+            'async': queue_handler is not None,
+            'enqueued': queue_handler.enqueued if queue_handler else 0,
+            'dropped': queue_handler.dropped if queue_handler else 0,
+            'queued': queue_handler.queue.qsize() if queue_handler else 0,
+            'suppressed': {name: f.suppressed_total for name, f in self.hot_path_filters.items()},
+        }
+
+
+# Singleton instance
+_pipeline: Optional[LogPipeline] = None
+_pipeline_lock = threading.Lock()
+
+
+def get_log_pipeline() -> LogPipeline:
+    """Get the process-wide log pipeline."""
+    global _pipeline
+    if _pipeline is None:
+        with _pipeline_lock:
+            if _pipeline is None:
+                _pipeline = LogPipeline()
+                atexit.register(_pipeline.stop)
+    return _pipeline
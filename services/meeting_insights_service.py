@@ -9,12 +9,16 @@ import logging
 import threading
 from typing import Dict, List, Optional, Any, Tuple, Set
 from dataclasses import dataclass, field
-from collections import defaultdict, deque
+from collections import Counter, defaultdict, deque
 import re
 import json
 from datetime import datetime, timedelta
 import numpy as np
 
+from services.pattern_matcher import (
+    ACTION_ITEM_PATTERNS, DECISION_PATTERNS, PatternMatch, get_extraction_matcher
+)
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -92,19 +96,73 @@ class MeetingInsights:
     sentiment_timeline: List[Tuple[float, float]] = field(default_factory=list)
     topic_timeline: List[Tuple[float, str]] = field(default_factory=list)
 
+class SegmentHistory:
+    """
+    Capped per-session segment history stored column-wise.
+    
+    Keeps the most recent segments as parallel columns instead of one dict per
+    segment (and only the compound sentiment instead of the whole sentiment
+    payload). Whole-meeting aggregates are kept separately on the session state,
+    so the cap does not change summaries.
+    """
+    
+    def __init__(self, max_segments: int = 2000):
+        self.speaker_ids: deque = deque(maxlen=max_segments)
+        self.texts: deque = deque(maxlen=max_segments)
+        self.timestamps: deque = deque(maxlen=max_segments)
+        self.sentiments: deque = deque(maxlen=max_segments)  # compound score or None
+        self.total_segments = 0
+    
+    def append(self, speaker_id: str, text: str, timestamp: float, sentiment_data: Optional[Dict]):
+        self.speaker_ids.append(speaker_id)
+        self.texts.append(text)
+        self.timestamps.append(timestamp)
+        self.sentiments.append(sentiment_data.get('compound', 0) if sentiment_data else None)
+        self.total_segments += 1
+    
+    def __len__(self) -> int:
+        return len(self.texts)
+    
+    def rows(self) -> List[Dict[str, Any]]:
+        """Retained segments as dicts (speaker_id, text, timestamp, sentiment)."""
+        return [
+            {'speaker_id': speaker_id, 'text': text, 'timestamp': ts, 'sentiment': sentiment}
+            for speaker_id, text, ts, sentiment in zip(self.speaker_ids, self.texts, self.timestamps, self.sentiments)
+        ]
+
+@dataclass
+class SessionInsightsState:
+    """Per-session insights state guarded by its own lock"""
+    insights: MeetingInsights
+    history: SegmentHistory
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    word_counts: Counter = field(default_factory=Counter)  # word cloud candidates, whole meeting
+    indicator_counts: Counter = field(default_factory=Counter)  # meeting type -> indicator hits
+
 class MeetingInsightsService:
     """
     Advanced meeting analysis and insights generation
     """
     
-    def __init__(self):
+    WORD_CLOUD_STOP_WORDS = frozenset({
+        'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by',
+        'a', 'an', 'is', 'are', 'was', 'were', 'be', 'been', 'have', 'has', 'had',
+        'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may', 'might',
+        'i', 'you', 'he', 'she', 'it', 'we', 'they', 'me', 'him', 'her', 'us', 'them'
+    })
+    
+    def __init__(self, max_history_segments: int = 2000):
+        # Per-session state, each with its own lock. insights_lock only guards
+        # creation/removal of sessions, never segment processing.
+        self.sessions: Dict[str, SessionInsightsState] = {}
         self.meeting_insights: Dict[str, MeetingInsights] = {}
-        self.session_transcripts: Dict[str, List[Dict]] = {}  # session_id -> segments
         self.insights_lock = threading.RLock()
+        self.max_history_segments = max_history_segments
         
         # Analysis patterns and keywords
         self.action_patterns = self._load_action_patterns()
         self.decision_patterns = self._load_decision_patterns()
+        self.pattern_matcher = get_extraction_matcher()
         self.topic_keywords = self._load_topic_keywords()
         self.meeting_type_indicators = self._load_meeting_type_indicators()
         
@@ -123,42 +181,37 @@ class MeetingInsightsService:
                                  sentiment_data: Optional[Dict] = None) -> Dict[str, Any]:
         """Process individual transcript segment for insights"""
         try:
-            with self.insights_lock:
-                # Initialize session if needed
-                if session_id not in self.meeting_insights:
-                    self._initialize_session(session_id, timestamp)
-                
-                if session_id not in self.session_transcripts:
-                    self.session_transcripts[session_id] = []
-                
+            # CPU-heavy extraction runs before taking any lock
+            text_lower = text.lower()
+            pattern_matches = self.pattern_matcher.scan(text_lower, groups=['action_item', 'decision'])
+            action_items = self._extract_action_items(text, speaker_id, timestamp,
+                                                      pattern_matches['action_item'], session_id=session_id)
+            decisions = self._extract_decisions(text, speaker_id, timestamp,
+                                                pattern_matches['decision'], session_id=session_id)
+            topics = self._extract_topics(text, timestamp)
+            word_counts = self._count_word_cloud_words(text_lower)
+            indicator_counts = self._count_meeting_type_indicators(text_lower)
+            
+            state = self._get_session_state(session_id, timestamp)
+            
+            # Extract insights from segment
+            insights = {}
+            
+            with state.lock:
                 # Store segment
-                segment = {
-                    'speaker_id': speaker_id,
-                    'text': text,
-                    'timestamp': timestamp,
-                    'sentiment': sentiment_data
-                }
-                self.session_transcripts[session_id].append(segment)
-                
-                # Extract insights from segment
-                insights = {}
+                state.history.append(speaker_id, text, timestamp, sentiment_data)
+                state.word_counts.update(word_counts)
+                state.indicator_counts.update(indicator_counts)
                 
-                # Detect action items
-                action_items = self._extract_action_items(text, speaker_id, timestamp)
                 if action_items:
                     insights['action_items'] = action_items
-                    for action in action_items:
-                        self.meeting_insights[session_id].action_items.append(action)
+                    state.insights.action_items.extend(action_items)
                 
-                # Detect decisions
-                decisions = self._extract_decisions(text, speaker_id, timestamp)
                 if decisions:
                     insights['decisions'] = decisions
-                    for decision in decisions:
-                        self.meeting_insights[session_id].decisions.append(decision)
+                    state.insights.decisions.extend(decisions)
                 
                 # Update topics
-                topics = self._extract_topics(text, timestamp)
                 if topics:
                     insights['topics'] = topics
                     self._update_topics(session_id, topics, speaker_id, timestamp, sentiment_data)
@@ -168,8 +221,8 @@ class MeetingInsightsService:
                 
                 # Update meeting analytics
                 self._update_meeting_analytics(session_id, text, timestamp, sentiment_data)
-                
-                return insights
+            
+            return insights
                 
         except Exception as e:
             logger.error(f"❌ Transcript segment processing failed: {e}")
@@ -178,11 +231,12 @@ class MeetingInsightsService:
     def generate_meeting_summary(self, session_id: str) -> MeetingInsights:
         """Generate comprehensive meeting summary and insights"""
         try:
-            with self.insights_lock:
-                if session_id not in self.meeting_insights:
-                    return MeetingInsights(session_id=session_id)
-                
-                insights = self.meeting_insights[session_id]
+            state = self.sessions.get(session_id)
+            if state is None:
+                return MeetingInsights(session_id=session_id)
+            
+            with state.lock:
+                insights = state.insights
                 
                 # Calculate final metrics
                 self._calculate_final_metrics(session_id, insights)
@@ -211,58 +265,100 @@ class MeetingInsightsService:
             logger.error(f"❌ Meeting summary generation failed: {e}")
             return MeetingInsights(session_id=session_id)
     
-    def _initialize_session(self, session_id: str, start_time: float):
-        """Initialize new meeting session"""
-        self.meeting_insights[session_id] = MeetingInsights(
-            session_id=session_id,
-            start_time=start_time
+    def get_session_segments(self, session_id: str) -> List[Dict[str, Any]]:
+        """Retained (most recent) segments for a session"""
+        state = self.sessions.get(session_id)
+        if state is None:
+            return []
+        with state.lock:
+            return state.history.rows()
+    
+    def _get_session_state(self, session_id: str, timestamp: float) -> SessionInsightsState:
+        """Get or create the state for a session; the registry lock is only taken on creation"""
+        state = self.sessions.get(session_id)
+        if state is None:
+            with self.insights_lock:
+                state = self.sessions.get(session_id)
+                if state is None:
+                    state = self._initialize_session(session_id, timestamp)
+        return state
+    
+    def _initialize_session(self, session_id: str, start_time: float) -> SessionInsightsState:
+        """Initialize new meeting session (caller holds insights_lock)"""
+        state = SessionInsightsState(
+            insights=MeetingInsights(
+                session_id=session_id,
+                start_time=start_time
+            ),
+            history=SegmentHistory(self.max_history_segments)
         )
+        self.meeting_insights[session_id] = state.insights
+        self.sessions[session_id] = state
+        return state
     
-    def _extract_action_items(self, text: str, speaker_id: str, timestamp: float) -> List[ActionItem]:
-        """Extract action items from text"""
+    def _count_word_cloud_words(self, text_lower: str) -> Counter:
+        """Word cloud candidate counts for one segment"""
+        return Counter(
+            word for word in re.findall(r'\b\w+\b', text_lower)
+            if len(word) > 3 and word not in self.WORD_CLOUD_STOP_WORDS
+        )
+    
+    def _count_meeting_type_indicators(self, text_lower: str) -> Counter:
+        """Meeting type indicator hits for one segment"""
+        counts = Counter()
+        for meeting_type, indicators in self.meeting_type_indicators.items():
+            hits = sum(text_lower.count(indicator) for indicator in indicators)
+            if hits:
+                counts[meeting_type] = hits
+        return counts
+    
+    def _extract_action_items(self, text: str, speaker_id: str, timestamp: float,
+                              pattern_matches: Optional[List[PatternMatch]] = None,
+                              session_id: str = "") -> List[ActionItem]:
+        """Extract action items from text (or from precomputed action_item pattern matches)"""
         try:
             action_items = []
-            text_lower = text.lower()
+            if pattern_matches is None:
+                pattern_matches = self.pattern_matcher.scan(text.lower(), groups=['action_item'])['action_item']
             
-            for pattern_info in self.action_patterns:
-                pattern = pattern_info['pattern']
+            for tagged in pattern_matches:
+                pattern_info = tagged.pattern.metadata
                 confidence_base = pattern_info['confidence']
                 category = pattern_info.get('category', 'general')
+                match = tagged.match
                 
-                matches = re.finditer(pattern, text_lower)
-                for match in matches:
-                    # Extract the action text
-                    action_text = self._extract_action_text(text, match)
-                    
-                    if len(action_text.strip()) < 10:  # Skip very short actions
-                        continue
-                    
-                    # Detect assignee
-                    assignee = self._detect_assignee(action_text, speaker_id)
-                    
-                    # Detect due date
-                    due_date = self._detect_due_date(action_text)
-                    
-                    # Calculate priority
-                    priority = self._calculate_action_priority(action_text)
-                    
-                    # Calculate confidence
-                    confidence = self._calculate_action_confidence(action_text, confidence_base)
-                    
-                    if confidence >= self.action_confidence_threshold:
-                        action_item = ActionItem(
-                            id=f"action_{session_id}_{len(action_items)}_{int(timestamp)}",
-                            text=action_text.strip(),
-                            assignee=assignee,
-                            due_date=due_date,
-                            priority=priority,
-                            context=text[:100] + "..." if len(text) > 100 else text,
-                            confidence=confidence,
-                            timestamp=timestamp,
-                            speaker_id=speaker_id,
-                            category=category
-                        )
-                        action_items.append(action_item)
+                # Extract the action text
+                action_text = self._extract_action_text(text, match)
+                
+                if len(action_text.strip()) < 10:  # Skip very short actions
+                    continue
+                
+                # Detect assignee
+                assignee = self._detect_assignee(action_text, speaker_id)
+                
+                # Detect due date
+                due_date = self._detect_due_date(action_text)
+                
+                # Calculate priority
+                priority = self._calculate_action_priority(action_text)
+                
+                # Calculate confidence
+                confidence = self._calculate_action_confidence(action_text, confidence_base)
+                
+                if confidence >= self.action_confidence_threshold:
+                    action_item = ActionItem(
+                        id=f"action_{session_id}_{len(action_items)}_{int(timestamp)}",
+                        text=action_text.strip(),
+                        assignee=assignee,
+                        due_date=due_date,
+                        priority=priority,
+                        context=text[:100] + "..." if len(text) > 100 else text,
+                        confidence=confidence,
+                        timestamp=timestamp,
+                        speaker_id=speaker_id,
+                        category=category
+                    )
+                    action_items.append(action_item)
             
             return action_items
             
@@ -270,43 +366,45 @@ class MeetingInsightsService:
             logger.error(f"❌ Action item extraction failed: {e}")
             return []
     
-    def _extract_decisions(self, text: str, speaker_id: str, timestamp: float) -> List[Decision]:
-        """Extract decisions from text"""
+    def _extract_decisions(self, text: str, speaker_id: str, timestamp: float,
+                           pattern_matches: Optional[List[PatternMatch]] = None,
+                           session_id: str = "") -> List[Decision]:
+        """Extract decisions from text (or from precomputed decision pattern matches)"""
         try:
             decisions = []
-            text_lower = text.lower()
+            if pattern_matches is None:
+                pattern_matches = self.pattern_matcher.scan(text.lower(), groups=['decision'])['decision']
             
-            for pattern_info in self.decision_patterns:
-                pattern = pattern_info['pattern']
+            for tagged in pattern_matches:
+                pattern_info = tagged.pattern.metadata
                 confidence_base = pattern_info['confidence']
                 decision_type = pattern_info.get('type', 'general')
+                match = tagged.match
                 
-                matches = re.finditer(pattern, text_lower)
-                for match in matches:
-                    # Extract decision text
-                    decision_text = self._extract_decision_text(text, match)
-                    
-                    if len(decision_text.strip()) < 15:  # Skip very short decisions
-                        continue
-                    
-                    # Calculate confidence
-                    confidence = self._calculate_decision_confidence(decision_text, confidence_base)
+                # Extract decision text
+                decision_text = self._extract_decision_text(text, match)
+                
+                if len(decision_text.strip()) < 15:  # Skip very short decisions
+                    continue
+                
+                # Calculate confidence
+                confidence = self._calculate_decision_confidence(decision_text, confidence_base)
+                
+                if confidence >= self.decision_confidence_threshold:
+                    # Detect impact level
+                    impact_level = self._detect_impact_level(decision_text)
                     
-                    if confidence >= self.decision_confidence_threshold:
-                        # Detect impact level
-                        impact_level = self._detect_impact_level(decision_text)
-                        
-                        decision = Decision(
-                            id=f"decision_{session_id}_{len(decisions)}_{int(timestamp)}",
-                            decision_text=decision_text.strip(),
-                            context=text[:150] + "..." if len(text) > 150 else text,
-                            participants=[speaker_id],
-                            timestamp=timestamp,
-                            confidence=confidence,
-                            decision_type=decision_type,
-                            impact_level=impact_level
-                        )
-                        decisions.append(decision)
+                    decision = Decision(
+                        id=f"decision_{session_id}_{len(decisions)}_{int(timestamp)}",
+                        decision_text=decision_text.strip(),
+                        context=text[:150] + "..." if len(text) > 150 else text,
+                        participants=[speaker_id],
+                        timestamp=timestamp,
+                        confidence=confidence,
+                        decision_type=decision_type,
+                        impact_level=impact_level
+                    )
+                    decisions.append(decision)
             
             return decisions
             
@@ -660,25 +758,12 @@ class MeetingInsightsService:
     def _generate_word_cloud_data(self, session_id: str) -> Dict[str, int]:
         """Generate word cloud data from meeting transcript"""
         try:
-            if session_id not in self.session_transcripts:
+            state = self.sessions.get(session_id)
+            if state is None:
                 return {}
             
-            word_counts = defaultdict(int)
-            stop_words = {'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by',
-                         'a', 'an', 'is', 'are', 'was', 'were', 'be', 'been', 'have', 'has', 'had',
-                         'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may', 'might',
-                         'i', 'you', 'he', 'she', 'it', 'we', 'they', 'me', 'him', 'her', 'us', 'them'}
-            
-            for segment in self.session_transcripts[session_id]:
-                text = segment['text'].lower()
-                words = re.findall(r'\b\w+\b', text)
-                
-                for word in words:
-                    if len(word) > 3 and word not in stop_words:
-                        word_counts[word] += 1
-            
             # Return top 50 words
-            sorted_words = sorted(word_counts.items(), key=lambda x: x[1], reverse=True)
+            sorted_words = sorted(state.word_counts.items(), key=lambda x: x[1], reverse=True)
             return dict(sorted_words[:50])
             
         except Exception as e:
@@ -688,18 +773,15 @@ class MeetingInsightsService:
     def _classify_meeting_type(self, session_id: str, insights: MeetingInsights) -> str:
         """Classify the type of meeting based on content and patterns"""
         try:
-            if session_id not in self.session_transcripts:
+            state = self.sessions.get(session_id)
+            if state is None:
                 return "general"
             
-            # Analyze transcript for meeting type indicators
-            all_text = " ".join(segment['text'].lower() for segment in self.session_transcripts[session_id])
-            
-            type_scores = {}
-            for meeting_type, indicators in self.meeting_type_indicators.items():
-                score = 0
-                for indicator in indicators:
-                    score += all_text.count(indicator)
-                type_scores[meeting_type] = score
+            # Meeting type indicator hits, accumulated per segment
+            type_scores = {
+                meeting_type: state.indicator_counts.get(meeting_type, 0)
+                for meeting_type in self.meeting_type_indicators
+            }
             
             # Additional analysis based on structure
             if len(insights.action_items) > 5:
@@ -722,25 +804,12 @@ class MeetingInsightsService:
     
     # Pattern and configuration loading methods
     def _load_action_patterns(self) -> List[Dict]:
-        """Load action item detection patterns"""
-        return [
-            {'pattern': r'\b(?:will|should|need to|must|have to|going to)\s+(\w+(?:\s+\w+)*)', 'confidence': 0.7, 'category': 'general'},
-            {'pattern': r'\b(?:action item|todo|task):\s*(.+)', 'confidence': 0.9, 'category': 'explicit'},
-            {'pattern': r'\b(\w+)\s+(?:will|should)\s+(?:follow up|reach out|contact)', 'confidence': 0.8, 'category': 'follow_up'},
-            {'pattern': r'\bby\s+(\w+day|\w+\s+\d+)', 'confidence': 0.6, 'category': 'deadline'},
-            {'pattern': r'\bassign(?:ed)?\s+to\s+(\w+)', 'confidence': 0.8, 'category': 'assignment'},
-            {'pattern': r'\b(?:next steps?|follow up):\s*(.+)', 'confidence': 0.8, 'category': 'follow_up'}
-        ]
+        """Load action item detection patterns (compiled copies live in pattern_matcher)"""
+        return [{'pattern': p.regex, **p.metadata} for p in ACTION_ITEM_PATTERNS]
     
     def _load_decision_patterns(self) -> List[Dict]:
-        """Load decision detection patterns"""
-        return [
-            {'pattern': r'\b(?:we (?:decided|agreed|concluded)|decision made|it was decided)\s+(.+)', 'confidence': 0.9, 'type': 'explicit'},
-            {'pattern': r'\b(?:let\'s go with|we\'ll use|we\'re going with)\s+(.+)', 'confidence': 0.8, 'type': 'selection'},
-            {'pattern': r'\b(?:approved|rejected|accepted)\s+(.+)', 'confidence': 0.7, 'type': 'approval'},
-            {'pattern': r'\bthe plan is to\s+(.+)', 'confidence': 0.7, 'type': 'planning'},
-            {'pattern': r'\bwe will\s+(?:not\s+)?(.+)', 'confidence': 0.6, 'type': 'commitment'}
-        ]
+        """Load decision detection patterns (compiled copies live in pattern_matcher)"""
+        return [{'pattern': p.regex, **p.metadata} for p in DECISION_PATTERNS]
     
     def _load_topic_keywords(self) -> Dict[str, List[str]]:
         """Load topic keyword mappings"""
@@ -988,10 +1057,8 @@ class MeetingInsightsService:
     def clear_session_data(self, session_id: str):
         """Clear insights data for a session"""
         with self.insights_lock:
-            if session_id in self.meeting_insights:
-                del self.meeting_insights[session_id]
-            if session_id in self.session_transcripts:
-                del self.session_transcripts[session_id]
+            self.sessions.pop(session_id, None)
+            self.meeting_insights.pop(session_id, None)
             logger.info(f"🗑️ Cleared insights data for session {session_id}")
 
 # Global insights service
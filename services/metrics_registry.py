@@ -0,0 +1,539 @@
+"""
+📈 METRICS REGISTRY: One process-wide home for counters, gauges and histograms
+
+Every monitor records into the same registry, and `/metrics` renders it in
+the Prometheus text format. Writers take no lock: counters and histograms
+keep one cell per thread, and reads fold the cells together. Cells of
+finished threads are folded in once and dropped, and beyond
+MAX_THREAD_CELLS live threads the rest share one locked cell, so memory
+stays bounded under green-thread workers too.
+
+Histograms are log-linear (HDR-style): each power of two is split into
+SUB_BUCKETS buckets, so a quantile read back is within RELATIVE_ERROR of the
+exact value whatever the distribution, memory is bounded by the float
+range rather than the number of observations, and two histograms merge by
+adding their counts. The fixed `le` buckets of the exposition are derived
+from the same counts.
+"""
+
+import math
+import os
+import re
+import threading
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+SUB_BUCKET_BITS = 5
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS                  # Buckets per power of two
+RELATIVE_ERROR = 1.0 / (2 * SUB_BUCKETS)            # Worst-case quantile error (1/64)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)   # Seconds
+DEFAULT_MAX_SERIES = int(os.environ.get('METRICS_MAX_SERIES', '1000'))              # Label sets per metric
+OVERFLOW_LABEL = 'other'
+MAX_THREAD_CELLS = int(os.environ.get('METRICS_MAX_THREAD_CELLS', '64'))            # Per series
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+_NAME_RE = re.compile(r'^[a-zA-Z_:][a-zA-Z0-9_:]*$')
+_LABEL_RE = re.compile(r'^[a-zA-Z_][a-zA-Z0-9_]*$')
+_MANTISSA_SCALE = 2.0 * SUB_BUCKETS                 # frexp mantissa [0.5, 1) -> [SUB_BUCKETS, 2 * SUB_BUCKETS)
+_frexp = math.frexp
+
+
+# =============================================================================
+# HISTOGRAM DATA
+# =============================================================================
+
+def bucket_index(value: float) -> int:
+    """Log-linear bucket of a positive value."""
+    mantissa, exponent = math.frexp(value)
+    return (exponent << SUB_BUCKET_BITS) + int(mantissa * _MANTISSA_SCALE) - SUB_BUCKETS
+
+
+def bucket_bounds(index: int) -> Tuple[float, float]:
+    """[low, high) range of values that land in a bucket."""
+    exponent = index >> SUB_BUCKET_BITS
+    step = (index & (SUB_BUCKETS - 1)) + SUB_BUCKETS
+    return (math.ldexp(step, exponent - SUB_BUCKET_BITS - 1),
+            math.ldexp(step + 1, exponent - SUB_BUCKET_BITS - 1))
+
+
+@dataclass
+class HistogramSnapshot:
+    """Bucket counts of a histogram; also the per-thread cell writers update."""
+    counts: Dict[int, int] = field(default_factory=dict)
+    zeros: int = 0                    # Observations <= 0
+    count: int = 0
+    total: float = 0.0
+    min: float = math.inf
+    max: float = -math.inf
+
+    def observe(self, value: float):
+        if value > 0:
+            mantissa, exponent = _frexp(value)
+            index = (exponent << SUB_BUCKET_BITS) + int(mantissa * _MANTISSA_SCALE) - SUB_BUCKETS
+            counts = self.counts
+            counts[index] = counts.get(index, 0) + 1
+        else:
+            self.zeros += 1
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: 'HistogramSnapshot') -> 'HistogramSnapshot':
+        """Add another histogram's observations into this one.
+
+        Args:
+            other: Histogram to fold in (left unchanged)
+
+        Returns:
+            self, for chaining
+        """
+        counts = self.counts
+        for index, n in other.counts.copy().items():
+            counts[index] = counts.get(index, 0) + n
+        self.zeros += other.zeros
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        """Nearest-rank quantile, within RELATIVE_ERROR of the exact value.
+
+        Args:
+            q: Quantile in [0, 1]
+
+        Returns:
+            Estimated value, or 0.0 for an empty histogram
+        """
+        if not 0.0 <= q <= 1.0:
+            raise ValueError(f"quantile must be in [0, 1], got {q}")
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(q * self.count))
+        seen = self.zeros
+        if seen >= rank:
+            return min(max(0.0, self.min), self.max)
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                low, high = bucket_bounds(index)
+                return min(max((low + high) / 2, self.min), self.max)
+        return self.max
+
+    def cumulative_counts(self, bounds: Sequence[float]) -> List[int]:
+        """Observations at or below each bound (a bucket counts where its midpoint falls).
+
+        Args:
+            bounds: Ascending upper bounds
+
+        Returns:
+            One cumulative count per bound
+        """
+        result, seen, position = [], self.zeros, 0
+        ordered = sorted(self.counts.items())
+        for bound in bounds:
+            while position < len(ordered):
+                low, high = bucket_bounds(ordered[position][0])
+                if (low + high) / 2 > bound:
+                    break
+                seen += ordered[position][1]
+                position += 1
+            result.append(seen)
+        return result
+
+
+# =============================================================================
+# PER-THREAD CELLS
+# =============================================================================
+
+class _ThreadCells:
+    """One accumulator per writing thread; only the owning thread writes to it.
+
+    Past max_cells live threads (green-thread servers start one per request),
+    new threads share a single cell that serializes its writers.
+    """
+
+    def __init__(self, factory: Callable[[], Any], locked_factory: Callable[[], Any],
+                 fold: Callable[[Any, Any], Any], max_cells: int = None):
+        self._local = threading.local()
+        self._factory = factory
+        self._fold = fold
+        self._max_cells = MAX_THREAD_CELLS if max_cells is None else max_cells
+        self._cells: List[Tuple[threading.Thread, Any]] = []
+        self._retired = factory()          # Totals of threads that have exited
+        self._shared = locked_factory()
+        self._lock = threading.Lock()      # Guards the cell list, never held by writers
+
+    def get(self):
+        try:
+            return self._local.cell
+        except AttributeError:
+            with self._lock:
+                if len(self._cells) < self._max_cells:
+                    cell = self._factory()
+                    self._cells.append((threading.current_thread(), cell))
+                else:
+                    cell = self._shared
+            self._local.cell = cell
+            return cell
+
+    def read(self) -> List[Any]:
+        """All cells, after folding in those of threads that have exited."""
+        with self._lock:
+            live = []
+            for thread, cell in self._cells:
+                if thread.is_alive():
+                    live.append((thread, cell))
+                else:
+                    self._fold(self._retired, cell)
+            self._cells = live
+            return [self._retired, self._shared] + [cell for _, cell in live]
+
+
+class _CounterCell:
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def add(self, amount: float):
+        self.value += amount
+
+    def merge(self, other: '_CounterCell') -> '_CounterCell':
+        self.value += other.value
+        return self
+
+
+class _LockedCounterCell(_CounterCell):
+    __slots__ = ('_lock',)
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+
+    def add(self, amount: float):
+        with self._lock:
+            self.value += amount
+
+
+class _LockedHistogramCell(HistogramSnapshot):
+    """Histogram cell shared by the threads beyond the per-thread cell cap."""
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        with self._lock:
+            super().observe(value)
+
+
+# =============================================================================
+# METRICS
+# =============================================================================
+
+class Counter:
+    """Monotonic counter."""
+
+    def __init__(self):
+        self._cells = _ThreadCells(_CounterCell, _LockedCounterCell, _CounterCell.merge)
+
+    def inc(self, amount: float = 1.0):
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        self._cells.get().add(amount)
+
+    def value(self) -> float:
+        return sum(cell.value for cell in self._cells.read())
+
+
+class Gauge:
+    """Value that goes up and down, or is read from a callback at collection time."""
+
+    def __init__(self):
+        self._value = 0.0
+        self._function: Optional[Callable[[], float]] = None
+        self._lock = threading.Lock()
+
+    def set(self, value: float):
+        self._value = float(value)
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0):
+        self.inc(-amount)
+
+    def set_function(self, function: Callable[[], float]):
+        self._function = function
+
+    def value(self) -> float:
+        if self._function is not None:
+            try:
+                return float(self._function())
+            except Exception as e:
+                logger.warning(f"⚠️ Gauge callback failed: {e}")
+                return math.nan
+        return self._value
+
+
+class Histogram:
+    """Log-linear histogram; observations are lock-free and O(1)."""
+
+    def __init__(self):
+        self._cells = _ThreadCells(HistogramSnapshot, _LockedHistogramCell, HistogramSnapshot.merge)
+
+    def observe(self, value: float):
+        self._cells.get().observe(value)
+
+    def snapshot(self) -> HistogramSnapshot:
+        """Merged copy of every thread's observations."""
+        merged = HistogramSnapshot()
+        for cell in self._cells.read():
+            merged.merge(cell)
+        # A concurrent write may land between reading the counts and the
+        # totals; the counts are authoritative so the exposition stays consistent
+        merged.count = merged.zeros + sum(merged.counts.values())
+        return merged
+
+    def quantile(self, q: float) -> float:
+        return self.snapshot().quantile(q)
+
+
+_KINDS = {'counter': Counter, 'gauge': Gauge, 'histogram': Histogram}
+
+
+class MetricFamily:
+    """A named metric and its labelled series."""
+
+    def __init__(self, name: str, documentation: str, kind: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS, max_series: int = DEFAULT_MAX_SERIES):
+        if not _NAME_RE.match(name):
+            raise ValueError(f"Invalid metric name: {name!r}")
+        for label in labelnames:
+            if not _LABEL_RE.match(label) or label.startswith('__') or label == 'le':
+                raise ValueError(f"Invalid label name for {name}: {label!r}")
+        self.name = name
+        self.documentation = documentation
+        self.kind = kind
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(float(b) for b in buckets if b != math.inf))
+        self.max_series = max_series
+        self._children: Dict[Tuple, Any] = {}     # Label values as passed -> series
+        self._series: Dict[Tuple[str, ...], Any] = {}   # Label values as strings -> series
+        self._lock = threading.Lock()
+
+    def labels(self, *values, **labelkwargs):
+        """Series for one set of label values (created on first use).
+
+        Args:
+            *values: Label values in labelnames order
+            **labelkwargs: Or label values by name
+
+        Returns:
+            The Counter, Gauge or Histogram for those labels
+        """
+        if labelkwargs:
+            if values or set(labelkwargs) != set(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            values = tuple(labelkwargs[label] for label in self.labelnames)
+        try:
+            return self._children[values]
+        except KeyError:
+            return self._new_child(values)
+        except TypeError:   # Unhashable label value
+            return self._new_child(values)
+
+    def _new_child(self, values: Tuple):
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {len(values)} values")
+        key = tuple(str(v) for v in values)
+        with self._lock:
+            child = self._series.get(key)
+            if child is None:
+                if len(self._series) >= self.max_series:
+                    # Unbounded label values must not grow memory without bound
+                    key = (OVERFLOW_LABEL,) * len(self.labelnames)
+                    child = self._series.get(key)
+                    if child is None:
+                        logger.warning(f"⚠️ {self.name} reached {self.max_series} series; "
+                                       f"folding new label values into '{OVERFLOW_LABEL}'")
+                if child is None:
+                    child = self._series[key] = _KINDS[self.kind]()
+            try:
+                self._children[values] = child
+            except TypeError:
+                pass
+        return child
+
+    # Unlabelled metrics are used directly
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+    def dec(self, amount: float = 1.0):
+        self.labels().dec(amount)
+
+    def set(self, value: float):
+        self.labels().set(value)
+
+    def set_function(self, function: Callable[[], float]):
+        self.labels().set_function(function)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def series(self) -> List[Tuple[Tuple[str, ...], Any]]:
+        with self._lock:
+            return sorted(self._series.items(), key=lambda item: item[0])
+
+
+# =============================================================================
+# REGISTRY
+# =============================================================================
+
+class MetricsRegistry:
+    """Named metric families, rendered together for `/metrics`."""
+
+    def __init__(self, max_series: int = DEFAULT_MAX_SERIES):
+        self.max_series = max_series
+        self._families: Dict[str, MetricFamily] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, name: str, documentation: str, kind: str, labelnames: Sequence[str],
+                       **kwargs) -> MetricFamily:
+        family = self._families.get(name)
+        if family is None:
+            with self._lock:
+                family = self._families.get(name)
+                if family is None:
+                    family = self._families[name] = MetricFamily(
+                        name, documentation, kind, labelnames, max_series=self.max_series, **kwargs)
+                    return family
+        if family.kind != kind or family.labelnames != tuple(labelnames):
+            raise ValueError(f"{name} is already registered as a {family.kind} "
+                             f"with labels {family.labelnames}")
+        return family
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> MetricFamily:
+        return self._get_or_create(name, documentation, 'counter', labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> MetricFamily:
+        return self._get_or_create(name, documentation, 'gauge', labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> MetricFamily:
+        return self._get_or_create(name, documentation, 'histogram', labelnames, buckets=buckets)
+
+    def get(self, name: str) -> Optional[MetricFamily]:
+        return self._families.get(name)
+
+    def families(self) -> List[MetricFamily]:
+        with self._lock:
+            return sorted(self._families.values(), key=lambda family: family.name)
+
+    def expose(self) -> str:
+        """All metrics in the Prometheus text exposition format (0.0.4)."""
+        lines = []
+        for family in self.families():
+            series = family.series()
+            if not series:
+                continue
+            lines.append(f"# HELP {family.name} {_escape_help(family.documentation)}")
+            lines.append(f"# TYPE {family.name} {family.kind}")
+            for values, metric in series:
+                labels = list(zip(family.labelnames, values))
+                if family.kind != 'histogram':
+                    lines.append(f"{family.name}{_format_labels(labels)} {_format_value(metric.value())}")
+                    continue
+                snapshot = metric.snapshot()
+                for bound, cumulative in zip(family.buckets, snapshot.cumulative_counts(family.buckets)):
+                    lines.append(f"{family.name}_bucket{_format_labels(labels + [('le', _format_value(bound))])} "
+                                 f"{cumulative}")
+                lines.append(f"{family.name}_bucket{_format_labels(labels + [('le', '+Inf')])} {snapshot.count}")
+                lines.append(f"{family.name}_sum{_format_labels(labels)} {_format_value(snapshot.total)}")
+                lines.append(f"{family.name}_count{_format_labels(labels)} {snapshot.count}")
+        return '\n'.join(lines) + '\n' if lines else ''
+
+    def snapshot(self, quantiles: Iterable[float] = (0.5, 0.95, 0.99)) -> Dict[str, Any]:
+        """JSON-friendly view: values, and count/sum/quantiles for histograms."""
+        quantiles = tuple(quantiles)
+        result = {}
+        for family in self.families():
+            entries = []
+            for values, metric in family.series():
+                entry: Dict[str, Any] = {'labels': dict(zip(family.labelnames, values))}
+                if family.kind == 'histogram':
+                    snapshot = metric.snapshot()
+                    entry.update({'count': snapshot.count, 'sum': snapshot.total, 'mean': snapshot.mean})
+                    entry.update({f"p{q * 100:g}": snapshot.quantile(q) for q in quantiles})
+                else:
+                    entry['value'] = metric.value()
+                entries.append(entry)
+            result[family.name] = {'type': family.kind, 'series': entries}
+        return result
+
+
+def _escape_help(text: str) -> str:
+    return text.replace('\\', '\\\\').replace('\n', '\\n')
+
+
+def _format_labels(labels: List[Tuple[str, str]]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape_label(value)}"' for name, value in labels) + '}'
+
+
+def _escape_label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    if value == -math.inf:
+        return '-Inf'
+    if math.isnan(value):
+        return 'NaN'
+    if float(value).is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+def pipeline_stage_histogram(registry: Optional[MetricsRegistry] = None) -> MetricFamily:
+    """The shared per-stage latency histogram, labelled by `stage`."""
+    return (registry or get_metrics_registry()).histogram(
+        'mina_pipeline_stage_duration_seconds', 'Latency of transcription pipeline stages', ('stage',))
+
+
+# Global metrics registry
+_metrics_registry: Optional[MetricsRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Get or create the process-wide metrics registry"""
+    global _metrics_registry
+    if _metrics_registry is None:
+        with _registry_lock:
+            if _metrics_registry is None:
+                _metrics_registry = MetricsRegistry()
+                logger.info("📈 Metrics registry initialized")
+    return _metrics_registry
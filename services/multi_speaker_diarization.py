@@ -3,20 +3,25 @@
 ADVANCED MULTI-SPEAKER DIARIZATION SYSTEM
 Comprehensive speaker identification, tracking, and voice characteristic analysis
 for enhanced transcription processing with speaker attribution.
+
+Speaker profiles are matched through a SpeakerEmbeddingIndex (one matrix-vector
+product per segment against running centroids); finalize_meeting() re-clusters
+the meeting's segments in the background.
 """
 
 import logging
 import numpy as np
 import time
 import threading
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Callable, Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass, field
-from collections import defaultdict, deque
+from collections import Counter, defaultdict, deque
 from scipy import signal
 from scipy.spatial.distance import cosine
-from sklearn.cluster import DBSCAN
 import uuid
 
+from services.speaker_embedding_index import ReclusterResult, SpeakerEmbeddingIndex
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -74,6 +79,7 @@ class AdvancedVoiceFeatureExtractor:
         self.sample_rate = 16000
         self.frame_length = 1024
         self.hop_length = 512
+        self.embedding_dim = 39
         
         # Feature extraction parameters
         self.mfcc_coeffs = 13
@@ -155,17 +161,16 @@ class AdvancedVoiceFeatureExtractor:
     def _extract_pitch_features(self, audio_samples: np.ndarray) -> List[float]:
         """Extract pitch-related features"""
         try:
-            # Autocorrelation-based pitch detection
-            pitch_values = []
+            # Autocorrelation-based pitch detection over half-overlapping frames
             frame_size = 1024
-            
-            for i in range(0, len(audio_samples) - frame_size, frame_size // 2):
-                frame = audio_samples[i:i + frame_size]
-                pitch = self._estimate_frame_pitch(frame)
-                if pitch > 0:
-                    pitch_values.append(pitch)
-            
-            if pitch_values:
+            starts = np.arange(0, len(audio_samples) - frame_size, frame_size // 2)
+            if len(starts) == 0:
+                return [0.0] * 5
+            frames = audio_samples[starts[:, None] + np.arange(frame_size)]
+            pitches = self._estimate_frame_pitches(frames)
+            pitch_values = pitches[pitches > 0]
+            
+            if len(pitch_values):
                 mean_pitch = np.mean(pitch_values)
                 pitch_std = np.std(pitch_values)
                 min_pitch = np.min(pitch_values)
@@ -188,30 +193,31 @@ class AdvancedVoiceFeatureExtractor:
     def _estimate_frame_pitch(self, frame: np.ndarray) -> float:
         """Estimate pitch for a single frame"""
         try:
-            # Autocorrelation method
-            autocorr = np.correlate(frame, frame, mode='full')
-            autocorr = autocorr[len(autocorr)//2:]
-            
-            # Normalize
-            if autocorr[0] > 0:
-                autocorr = autocorr / autocorr[0]
-            
-            # Find peak in pitch range
-            min_period = int(self.sample_rate / self.pitch_max)
-            max_period = int(self.sample_rate / self.pitch_min)
-            
-            if max_period < len(autocorr):
-                search_range = autocorr[min_period:max_period]
-                if len(search_range) > 0:
-                    peak_idx = np.argmax(search_range) + min_period
-                    if autocorr[peak_idx] > 0.3:  # Threshold for pitch detection
-                        return self.sample_rate / peak_idx
-            
-            return 0.0
-            
+            return float(self._estimate_frame_pitches(frame[None, :])[0])
         except Exception:
             return 0.0
     
+    def _estimate_frame_pitches(self, frames: np.ndarray) -> np.ndarray:
+        """Estimate pitch for a batch of frames (rows) with FFT autocorrelation."""
+        frame_size = frames.shape[1]
+        n_fft = 1 << (2 * frame_size - 1).bit_length()
+        spectrum = np.fft.rfft(frames, n=n_fft, axis=1)
+        autocorr = np.fft.irfft(spectrum.real ** 2 + spectrum.imag ** 2, n=n_fft, axis=1)[:, :frame_size]
+        
+        # Normalize by zero-lag energy
+        energy = autocorr[:, :1]
+        autocorr = np.divide(autocorr, energy, out=np.zeros_like(autocorr), where=energy > 0)
+        
+        # Find peak in pitch range
+        min_period = int(self.sample_rate / self.pitch_max)
+        max_period = int(self.sample_rate / self.pitch_min)
+        if max_period >= frame_size:
+            return np.zeros(len(frames))
+        
+        peak_idx = np.argmax(autocorr[:, min_period:max_period], axis=1) + min_period
+        peak_values = autocorr[np.arange(len(frames)), peak_idx]
+        return np.where(peak_values > 0.3, self.sample_rate / peak_idx, 0.0)  # Threshold for pitch detection
+    
     def _extract_formant_features(self, audio_samples: np.ndarray) -> List[float]:
         """Extract formant-related features"""
         try:
@@ -437,9 +443,13 @@ class MultiSpeakerDiarization:
         # Speaker tracking
         self.speaker_profiles: Dict[str, SpeakerProfile] = {}
         self.active_speakers: Dict[str, float] = {}  # speaker_id -> last_activity_time
+        self.embedding_index = SpeakerEmbeddingIndex(self.feature_extractor.embedding_dim, capacity=max_speakers)
         
         # Clustering parameters
         self.clustering_threshold = 0.3
+        self.merge_threshold = 0.9  # Centroid similarity at which re-clustering merges speakers
+        self.recluster_result: Optional[ReclusterResult] = None
+        self._reserved_ids = set()  # Ids handed to a re-clustering run that has not been applied yet
         self.min_segment_duration = 0.5  # seconds
         
         # Speaker overlap detection
@@ -469,7 +479,9 @@ class MultiSpeakerDiarization:
                 voice_features = self.feature_extractor.extract_comprehensive_features(audio_samples)
                 
                 # Identify speaker
+                known_speakers = len(self.speaker_profiles)
                 speaker_id, speaker_confidence = self._identify_speaker(voice_features, timestamp)
+                new_speaker = len(self.speaker_profiles) > known_speakers
                 
                 # Detect overlapping speakers
                 overlap_detected, background_speakers = self._detect_speaker_overlap(
@@ -491,7 +503,9 @@ class MultiSpeakerDiarization:
                 )
                 
                 # Update speaker tracking
-                self._update_speaker_tracking(speaker_id, voice_features, timestamp)
+                self._update_speaker_tracking(speaker_id, voice_features, timestamp, speaker_confidence, new_speaker)
+                if speaker_id in self.embedding_index:
+                    self.embedding_index.record_segment(segment_id, speaker_id, voice_features)
                 
                 # Record diarization result
                 self.diarization_history.append({
@@ -519,22 +533,11 @@ class MultiSpeakerDiarization:
                 speaker_id = self._create_new_speaker(voice_features, timestamp)
                 return speaker_id, 1.0
             
-            # Compare with existing speakers
-            best_match_id = None
-            best_similarity = 0.0
-            
-            for speaker_id, profile in self.speaker_profiles.items():
-                try:
-                    similarity = 1 - cosine(voice_features, profile.voice_features)
-                    if similarity > best_similarity:
-                        best_similarity = similarity
-                        best_match_id = speaker_id
-                except Exception as e:
-                    logger.warning(f"⚠️ Similarity calculation failed: {e}")
-                    continue
+            # Compare with every speaker centroid at once
+            best_match_id, best_similarity = self.embedding_index.best_match(voice_features)
             
             # Decision threshold
-            if best_similarity > self.clustering_threshold:
+            if best_match_id is not None and best_similarity > self.clustering_threshold:
                 return best_match_id, best_similarity
             else:
                 # Create new speaker if we haven't reached max speakers
@@ -543,7 +546,7 @@ class MultiSpeakerDiarization:
                     return new_speaker_id, 1.0
                 else:
                     # Assign to best match even if below threshold
-                    return best_match_id, best_similarity
+                    return best_match_id, max(0.0, best_similarity)
                     
         except Exception as e:
             logger.warning(f"⚠️ Speaker identification failed: {e}")
@@ -557,29 +560,10 @@ class MultiSpeakerDiarization:
     def _create_new_speaker(self, voice_features: np.ndarray, timestamp: float) -> str:
         """Create new speaker profile"""
         try:
-            speaker_id = f"speaker_{len(self.speaker_profiles) + 1}"
-            
-            # Extract initial characteristics
-            pitch_range = self._extract_pitch_range(voice_features)
-            formant_chars = self._extract_formant_characteristics(voice_features)
-            
-            profile = SpeakerProfile(
-                speaker_id=speaker_id,
-                voice_features=voice_features.copy(),
-                pitch_range=pitch_range,
-                formant_characteristics=formant_chars,
-                speaking_rate=0.0,  # Will be updated over time
-                energy_profile=float(np.mean(voice_features[:5])),  # Energy-related features
-                spectral_signature=voice_features[13:21].copy(),  # Spectral features
-                confidence_score=1.0,
-                first_seen=timestamp,
-                last_seen=timestamp,
-                total_speech_time=0.0,
-                segment_count=1
-            )
-            
-            self.speaker_profiles[speaker_id] = profile
+            speaker_id = self._next_speaker_id()
+            self.speaker_profiles[speaker_id] = self._build_profile(speaker_id, voice_features, timestamp)
             self.active_speakers[speaker_id] = timestamp
+            self.embedding_index.add_speaker(speaker_id, voice_features)
             
             logger.info(f"🆕 Created new speaker profile: {speaker_id}")
             return speaker_id
@@ -588,6 +572,36 @@ class MultiSpeakerDiarization:
             logger.error(f"❌ Speaker creation failed: {e}")
             return "speaker_unknown"
     
+    def _next_speaker_id(self) -> str:
+        """First unused speaker_N id"""
+        number = len(self.speaker_profiles) + 1
+        while f"speaker_{number}" in self.speaker_profiles or f"speaker_{number}" in self._reserved_ids:
+            number += 1
+        return f"speaker_{number}"
+    
+    def _reserve_speaker_id(self) -> str:
+        """Id for a speaker split out during re-clustering, kept free until the result is applied"""
+        speaker_id = self._next_speaker_id()
+        self._reserved_ids.add(speaker_id)
+        return speaker_id
+    
+    def _build_profile(self, speaker_id: str, voice_features: np.ndarray, timestamp: float) -> SpeakerProfile:
+        """Speaker profile seeded from one feature vector"""
+        return SpeakerProfile(
+            speaker_id=speaker_id,
+            voice_features=voice_features.copy(),
+            pitch_range=self._extract_pitch_range(voice_features),
+            formant_characteristics=self._extract_formant_characteristics(voice_features),
+            speaking_rate=0.0,  # Will be updated over time
+            energy_profile=float(np.mean(voice_features[:5])),  # Energy-related features
+            spectral_signature=voice_features[13:21].copy(),  # Spectral features
+            confidence_score=1.0,
+            first_seen=timestamp,
+            last_seen=timestamp,
+            total_speech_time=0.0,
+            segment_count=1
+        )
+    
     def _extract_pitch_range(self, voice_features: np.ndarray) -> Tuple[float, float]:
         """Extract pitch range from voice features"""
         try:
@@ -635,15 +649,13 @@ class MultiSpeakerDiarization:
             
             # High variance might indicate multiple speakers
             if energy_variance > 0.5:  # Threshold for overlap detection
-                # Find potential background speakers
-                for speaker_id, profile in self.speaker_profiles.items():
-                    if speaker_id != primary_speaker:
-                        try:
-                            similarity = 1 - cosine(voice_features, profile.voice_features)
-                            if similarity > 0.4:  # Lower threshold for background detection
-                                background_speakers.append(speaker_id)
-                        except Exception:
-                            continue
+                # Find potential background speakers (lower threshold for background detection)
+                similarities = self.embedding_index.similarities(voice_features)
+                speaker_ids = self.embedding_index.speaker_ids
+                background_speakers = [
+                    speaker_ids[row] for row in np.flatnonzero(similarities > 0.4).tolist()
+                    if speaker_ids[row] != primary_speaker
+                ]
             
             overlap_detected = len(background_speakers) > 0
             
@@ -653,12 +665,19 @@ class MultiSpeakerDiarization:
             logger.warning(f"⚠️ Overlap detection failed: {e}")
             return False, []
     
-    def _update_speaker_tracking(self, speaker_id: str, voice_features: np.ndarray, timestamp: float):
+    def _update_speaker_tracking(self, speaker_id: str, voice_features: np.ndarray, timestamp: float,
+                                 similarity: float = 1.0, new_speaker: bool = False):
         """Update speaker tracking information"""
         try:
             if speaker_id in self.speaker_profiles:
                 profile = self.speaker_profiles[speaker_id]
-                profile.update_profile(voice_features, timestamp)
+                if not new_speaker:  # A new profile is already seeded with this segment
+                    # Incremental update: fold the segment into the running centroid
+                    self.embedding_index.update(speaker_id, voice_features)
+                    profile.voice_features = self.embedding_index.centroid(speaker_id)
+                    profile.segment_count += 1
+                    profile.confidence_score = 0.9 * profile.confidence_score + 0.1 * similarity
+                profile.last_seen = timestamp
                 
                 # Update active speakers
                 self.active_speakers[speaker_id] = timestamp
@@ -708,6 +727,77 @@ class MultiSpeakerDiarization:
             background_speakers=[]
         )
     
+    def finalize_meeting(self, background: bool = True,
+                         on_complete: Optional[Callable[[ReclusterResult], None]] = None) -> Optional[threading.Thread]:
+        """
+        Re-cluster the meeting's speakers once no more audio is coming.
+        
+        Online assignment only sees the past; with the whole meeting available,
+        segments are re-clustered: profiles that absorbed several voices are
+        split, speakers that turned out to be the same voice are merged, and
+        the diarization history is relabeled (see SpeakerEmbeddingIndex.recluster).
+        
+        Args:
+            background: Run on a daemon thread instead of the caller's
+            on_complete: Called with the ReclusterResult when done
+            
+        Returns:
+            The worker thread when running in the background, otherwise None
+        """
+        def run():
+            try:
+                started = time.time()
+                result = self.embedding_index.recluster(
+                    self.merge_threshold, max_speakers=self.max_speakers, new_speaker_id=self._reserve_speaker_id
+                )
+                self._apply_recluster(result)
+                logger.info(f"🎭 Re-clustered {len(result.assignments)} segments in {time.time() - started:.2f}s: "
+                            f"{result.speaker_count} speakers, {len(result.merged)} merged, "
+                            f"{result.relabeled_segments} segments relabeled")
+                if on_complete:
+                    on_complete(result)
+            except Exception as e:
+                logger.error(f"❌ Speaker re-clustering failed: {e}")
+        
+        if not background:
+            run()
+            return None
+        thread = threading.Thread(target=run, name="speaker-recluster", daemon=True)
+        thread.start()
+        return thread
+    
+    def _apply_recluster(self, result: ReclusterResult):
+        """Relabel history, add split-out speakers and fold merged ones into their survivors"""
+        with self._lock:
+            seen: Dict[str, List[float]] = {}
+            for entry in self.diarization_history:
+                entry['speaker_id'] = result.assignments.get(entry['segment_id'], entry['speaker_id'])
+                seen.setdefault(entry['speaker_id'], []).append(entry['timestamp'])
+            
+            for speaker_id in result.created:
+                timestamps = seen.get(speaker_id) or [0.0]
+                profile = self._build_profile(speaker_id, result.centroids[speaker_id], min(timestamps))
+                profile.last_seen = max(timestamps)
+                self.speaker_profiles[speaker_id] = profile
+            
+            for absorbed, survivor in result.merged.items():
+                profile = self.speaker_profiles.pop(absorbed, None)
+                target = self.speaker_profiles.get(survivor)
+                self.active_speakers.pop(absorbed, None)
+                if profile is not None and target is not None:
+                    target.total_speech_time += profile.total_speech_time
+                    target.first_seen = min(target.first_seen, profile.first_seen)
+                    target.last_seen = max(target.last_seen, profile.last_seen)
+            
+            counts = Counter(result.assignments.values())
+            for speaker_id, centroid in result.centroids.items():
+                profile = self.speaker_profiles.get(speaker_id)
+                if profile is not None:
+                    profile.voice_features = centroid
+                    profile.segment_count = counts[speaker_id]
+            self._reserved_ids.clear()
+            self.recluster_result = result
+    
     def get_speaker_summary(self) -> Dict[str, Any]:
         """Get comprehensive speaker analysis summary"""
         try:
@@ -735,6 +825,14 @@ class MultiSpeakerDiarization:
                 # Recent activity (last 10 diarization results)
                 summary['recent_activity'] = list(self.diarization_history)[-10:]
                 
+                if self.recluster_result is not None:
+                    summary['reclustering'] = {
+                        'speaker_count': self.recluster_result.speaker_count,
+                        'merged': dict(self.recluster_result.merged),
+                        'created': list(self.recluster_result.created),
+                        'relabeled_segments': self.recluster_result.relabeled_segments
+                    }
+                
                 return summary
                 
         except Exception as e:
@@ -0,0 +1,324 @@
+"""
+Pattern Matcher - Precompiled multi-pattern extraction engine.
+
+Shared by the task, action item and decision extractors
+(PostTranscriptionOrchestrator, MeetingInsightsService, TaskExtractionService).
+
+This service provides:
+- One registry of extraction patterns, compiled once at import
+- A literal keyword prefilter: one pass over each segment finds which
+  trigger keywords occur (Aho-Corasick style, including overlapping keywords),
+  and only patterns whose keywords are present run their regex
+- Tagged matches grouped by consumer, in the same order a per-pattern
+  re.finditer loop would produce them
+- KeywordSet for compiled "does the text contain any of these phrases" checks
+"""
+
+import logging
+import re
+import threading
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ExtractionPattern:
+    """
+    A single extraction regex.
+
+    keywords are lowercase literals of which at least one must occur in the
+    case-folded text for the regex to be able to match. None disables the
+    prefilter for this pattern (the regex always runs).
+    """
+    name: str
+    group: str
+    regex: str
+    flags: int = 0
+    keywords: Optional[FrozenSet[str]] = None
+    metadata: Dict[str, Any] = field(default_factory=dict, compare=False, hash=False)
+
+
+@dataclass
+class PatternMatch:
+    """A regex match tagged with the pattern that produced it."""
+    pattern: ExtractionPattern
+    index: int  # Position of the pattern within its group
+    match: re.Match
+
+
+class KeywordSet:
+    """Compiled substring membership test for a fixed set of phrases."""
+
+    def __init__(self, phrases: Iterable[str]):
+        self.phrases = tuple(phrases)
+        ordered = sorted(set(self.phrases), key=len, reverse=True)
+        self._regex = re.compile("|".join(re.escape(p) for p in ordered)) if ordered else None
+
+    def contains_any(self, text: str) -> bool:
+        """Equivalent to any(phrase in text for phrase in phrases)."""
+        return self._regex is not None and self._regex.search(text) is not None
+
+
+class MultiPatternMatcher:
+    """
+    Runs many extraction patterns over a text with a single keyword scan.
+
+    Patterns are compiled once. scan() case-folds the text once, finds every
+    trigger keyword present with one combined lookahead regex, and then runs
+    only the patterns whose keywords were found.
+    """
+
+    def __init__(self, patterns: Sequence[ExtractionPattern]):
+        self.patterns = list(patterns)
+        self._compiled = [re.compile(p.regex, p.flags) for p in self.patterns]
+
+        self._group_members: Dict[str, List[int]] = defaultdict(list)
+        for i, pattern in enumerate(self.patterns):
+            self._group_members[pattern.group].append(i)
+
+        keywords = sorted({kw for p in self.patterns if p.keywords for kw in p.keywords},
+                          key=len, reverse=True)
+        # At any position the alternation reports only the longest keyword, so
+        # also credit every shorter keyword that is a prefix of it.
+        self._implied = {kw: [k for k in keywords if kw.startswith(k)] for kw in keywords}
+        self._keyword_regex = (
+            re.compile("(?=(" + "|".join(re.escape(k) for k in keywords) + "))")
+            if keywords else None
+        )
+
+    def _present_keywords(self, text_folded: str) -> set:
+        """All trigger keywords occurring in text_folded, overlapping included."""
+        found = set()
+        if self._keyword_regex is None:
+            return found
+        for m in self._keyword_regex.finditer(text_folded):
+            found.update(self._implied[m.group(1)])
+        return found
+
+    def scan(self, text: str, groups: Optional[Iterable[str]] = None) -> Dict[str, List[PatternMatch]]:
+        """
+        Scan text once for all patterns in the requested groups.
+
+        Args:
+            text: Text to match against (patterns see it unchanged)
+            groups: Pattern groups to run; all groups when omitted
+
+        Returns:
+            group -> matches, ordered by pattern then by position, exactly as a
+            ``for pattern: for m in re.finditer(pattern, text)`` loop would yield
+        """
+        selected = list(groups) if groups is not None else list(self._group_members)
+        # casefold() is a superset of the folding IGNORECASE applies, so the
+        # prefilter never drops a pattern that could match
+        present = self._present_keywords(text.casefold())
+
+        results: Dict[str, List[PatternMatch]] = {}
+        for group in selected:
+            group_matches = []
+            for index, i in enumerate(self._group_members.get(group, [])):
+                pattern = self.patterns[i]
+                if pattern.keywords is not None and pattern.keywords.isdisjoint(present):
+                    continue
+                for m in self._compiled[i].finditer(text):
+                    group_matches.append(PatternMatch(pattern=pattern, index=index, match=m))
+            results[group] = group_matches
+        return results
+
+    def group_patterns(self, group: str) -> List[ExtractionPattern]:
+        """Patterns registered for a group, in match order."""
+        return [self.patterns[i] for i in self._group_members.get(group, [])]
+
+
+def _kw(*words: str) -> FrozenSet[str]:
+    return frozenset(words)
+
+
+# ============================================
+# Pattern registry
+# ============================================
+
+# Pattern-based task extraction over final segments (PostTranscriptionOrchestrator).
+# Each pattern captures the task description in group 1.
+TRANSCRIPT_TASK_PATTERNS = [
+    # Explicit action markers
+    ExtractionPattern(
+        "explicit_marker", "transcript_task",
+        r"(?:action item|action|task|todo|to-do|to do|follow up|followup|next step)s?[:\-\s]+(.+?)(?:\.|$)",
+        re.IGNORECASE,
+        _kw("action", "task", "todo", "to-do", "to do", "follow up", "followup", "next step")),
+    # Commitment patterns
+    ExtractionPattern(
+        "commitment", "transcript_task",
+        r"(?:I|we|you|he|she|they)(?:'ll|\s+will|\s+need to|\s+should|\s+must|\s+have to|\s+got to|'ve got to)\s+(.+?)(?:\.|$)",
+        re.IGNORECASE,
+        _kw("'ll", "will", "need to", "should", "must", "have to", "got to")),
+    ExtractionPattern(
+        "going_to", "transcript_task",
+        r"(?:I|we)'?(?:m| am|'re| are)\s+going to\s+(.+?)(?:\.|$)",
+        re.IGNORECASE,
+        _kw("going to")),
+    # Suggestion to action
+    ExtractionPattern(
+        "suggestion", "transcript_task",
+        r"let['\s]*s\s+(.+?)(?:\.|$)",
+        re.IGNORECASE,
+        _kw("let")),
+    # Assignment patterns
+    ExtractionPattern(
+        "assignment", "transcript_task",
+        r"(?:assign|delegate|give)\s+(.+?)\s+to\s+\w+",
+        re.IGNORECASE,
+        _kw("assign", "delegate", "give")),
+    # TODO variations
+    ExtractionPattern(
+        "todo_marker", "transcript_task",
+        r"\[?(?:TODO|Action|Task|Reminder)\]?[:\-\s]+(.+?)(?:\.|$)",
+        re.IGNORECASE,
+        _kw("todo", "action", "task", "reminder")),
+    # Deadline and time-based (explicit temporal markers only)
+    ExtractionPattern(
+        "deadline", "transcript_task",
+        r"(?:deadline|due(?:\s+by)?)\s+(.+?)(?:\.|$)",
+        re.IGNORECASE,
+        _kw("deadline", "due")),
+    # Numbered action lists (e.g., "1. Review the document")
+    ExtractionPattern(
+        "numbered_action", "transcript_task",
+        r"\d+[\.\)]\s+(?:review|update|send|create|finish|complete|prepare|schedule|contact|call|email|write|fix|implement|test|deploy|check)\s+(.+?)(?:\.|$)",
+        re.IGNORECASE,
+        _kw("review", "update", "send", "create", "finish", "complete", "prepare", "schedule",
+            "contact", "call", "email", "write", "fix", "implement", "test", "deploy", "check")),
+    # Reminders
+    ExtractionPattern(
+        "reminder", "transcript_task",
+        r"(?:reminder|remember to|don't forget to)[:\-\s]*(.+?)(?:\.|$)",
+        re.IGNORECASE,
+        _kw("reminder", "remember to", "don't forget to")),
+]
+
+# Live action item / decision detection (MeetingInsightsService), run on lowercased text
+ACTION_ITEM_PATTERNS = [
+    ExtractionPattern(
+        "commitment", "action_item",
+        r'\b(?:will|should|need to|must|have to|going to)\s+(\w+(?:\s+\w+)*)',
+        keywords=_kw("will", "should", "need to", "must", "have to", "going to"),
+        metadata={'confidence': 0.7, 'category': 'general'}),
+    ExtractionPattern(
+        "explicit", "action_item",
+        r'\b(?:action item|todo|task):\s*(.+)',
+        keywords=_kw("action item", "todo", "task"),
+        metadata={'confidence': 0.9, 'category': 'explicit'}),
+    ExtractionPattern(
+        "follow_up_commitment", "action_item",
+        r'\b(\w+)\s+(?:will|should)\s+(?:follow up|reach out|contact)',
+        keywords=_kw("follow up", "reach out", "contact"),
+        metadata={'confidence': 0.8, 'category': 'follow_up'}),
+    ExtractionPattern(
+        "deadline", "action_item",
+        r'\bby\s+(\w+day|\w+\s+\d+)',
+        keywords=_kw("by"),
+        metadata={'confidence': 0.6, 'category': 'deadline'}),
+    ExtractionPattern(
+        "assignment", "action_item",
+        r'\bassign(?:ed)?\s+to\s+(\w+)',
+        keywords=_kw("assign"),
+        metadata={'confidence': 0.8, 'category': 'assignment'}),
+    ExtractionPattern(
+        "next_steps", "action_item",
+        r'\b(?:next steps?|follow up):\s*(.+)',
+        keywords=_kw("next step", "follow up"),
+        metadata={'confidence': 0.8, 'category': 'follow_up'}),
+]
+
+DECISION_PATTERNS = [
+    ExtractionPattern(
+        "explicit", "decision",
+        r'\b(?:we (?:decided|agreed|concluded)|decision made|it was decided)\s+(.+)',
+        keywords=_kw("we decided", "we agreed", "we concluded", "decision made", "it was decided"),
+        metadata={'confidence': 0.9, 'type': 'explicit'}),
+    ExtractionPattern(
+        "selection", "decision",
+        r'\b(?:let\'s go with|we\'ll use|we\'re going with)\s+(.+)',
+        keywords=_kw("let's go with", "we'll use", "we're going with"),
+        metadata={'confidence': 0.8, 'type': 'selection'}),
+    ExtractionPattern(
+        "approval", "decision",
+        r'\b(?:approved|rejected|accepted)\s+(.+)',
+        keywords=_kw("approved", "rejected", "accepted"),
+        metadata={'confidence': 0.7, 'type': 'approval'}),
+    ExtractionPattern(
+        "planning", "decision",
+        r'\bthe plan is to\s+(.+)',
+        keywords=_kw("the plan is to"),
+        metadata={'confidence': 0.7, 'type': 'planning'}),
+    ExtractionPattern(
+        "commitment", "decision",
+        r'\bwe will\s+(?:not\s+)?(.+)',
+        keywords=_kw("we will"),
+        metadata={'confidence': 0.6, 'type': 'commitment'}),
+]
+
+# Line-based fallback extraction (TaskExtractionService)
+LINE_TASK_PATTERNS = [
+    ExtractionPattern(
+        "explicit_marker", "line_task",
+        r"(?:action item|task|todo|follow up|next step)s?[:\-\s]+(.+)",
+        re.IGNORECASE,
+        _kw("action item", "task", "todo", "follow up", "next step")),
+    ExtractionPattern(
+        "modal", "line_task",
+        r"(.+)\s+(?:needs to|should|must|will)\s+(.+)",
+        re.IGNORECASE,
+        _kw("needs to", "should", "must", "will")),
+    ExtractionPattern(
+        "assignment", "line_task",
+        r"(?:assign|give|delegate)\s+(.+)\s+to\s+(\w+)",
+        re.IGNORECASE,
+        _kw("assign", "give", "delegate")),
+    ExtractionPattern(
+        "deadline", "line_task",
+        r"(.+)\s+by\s+(next week|tomorrow|end of week|friday|monday)",
+        re.IGNORECASE,
+        _kw("next week", "tomorrow", "end of week", "friday", "monday")),
+    ExtractionPattern(
+        "suggestion", "line_task",
+        r"let['\s]*s\s+(.+)",
+        re.IGNORECASE,
+        _kw("let")),
+    ExtractionPattern(
+        "we_need_to", "line_task",
+        r"we need to\s+(.+)",
+        re.IGNORECASE,
+        _kw("we need to")),
+    ExtractionPattern(
+        "someone_should", "line_task",
+        r"someone should\s+(.+)",
+        re.IGNORECASE,
+        _kw("someone should")),
+    ExtractionPattern(
+        "will_contraction", "line_task",
+        r"(?:I|we|you)['\s]*ll\s+(.+)",
+        re.IGNORECASE,
+        _kw("ll")),
+]
+
+EXTRACTION_PATTERNS = TRANSCRIPT_TASK_PATTERNS + ACTION_ITEM_PATTERNS + DECISION_PATTERNS + LINE_TASK_PATTERNS
+
+# Global matcher instance
+_global_matcher = None
+_matcher_lock = threading.Lock()
+
+
+def get_extraction_matcher() -> MultiPatternMatcher:
+    """Get global extraction pattern matcher"""
+    global _global_matcher
+
+    if _global_matcher is None:
+        with _matcher_lock:
+            if _global_matcher is None:
+                _global_matcher = MultiPatternMatcher(EXTRACTION_PATTERNS)
+
+    return _global_matcher
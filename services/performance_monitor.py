@@ -1,6 +1,10 @@
 """
 Performance Monitoring Service for Mina Live Transcription
 Tracks pipeline metrics, latency, memory, and quality indicators
+
+Latencies, queue depth, drops and retries are also recorded in the shared
+metrics registry (services/metrics_registry.py); the global averages are
+kept as running totals instead of being recomputed over every session.
 """
 
 import time
@@ -12,6 +16,8 @@ from collections import deque, defaultdict
 import json
 import logging
 
+from services.metrics_registry import MetricsRegistry, get_metrics_registry, pipeline_stage_histogram
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -34,7 +40,7 @@ class TranscriptionMetrics:
 class PerformanceMonitor:
     """Comprehensive performance monitoring for live transcription."""
     
-    def __init__(self):
+    def __init__(self, registry: Optional[MetricsRegistry] = None):
         self.metrics: Dict[str, TranscriptionMetrics] = {}
         self.global_metrics = {
             'total_sessions': 0,
@@ -45,6 +51,26 @@ class PerformanceMonitor:
             'system_memory_usage': 0.0,
             'system_cpu_usage': 0.0
         }
+        # Running totals over the latency windows and queue samples of live sessions
+        self._latency_sum = 0.0
+        self._latency_count = 0
+        self._queue_sum = 0
+        self._queue_count = 0
+
+        self.registry = registry or get_metrics_registry()
+        self.chunk_latency = pipeline_stage_histogram(self.registry).labels('transcription_chunk')
+        self.queue_length = self.registry.gauge(
+            'mina_transcription_queue_length', 'Most recent transcription queue length')
+        self.dropped_chunks = self.registry.counter(
+            'mina_transcription_dropped_chunks_total', 'Audio chunks dropped or failed')
+        self.retries = self.registry.counter('mina_transcription_retries_total', 'Transcription API retries')
+        self.sessions_started = self.registry.counter(
+            'mina_transcription_sessions_total', 'Transcription sessions started')
+        self.active_sessions = self.registry.gauge(
+            'mina_transcription_active_sessions', 'Monitored transcription sessions')
+        self.system_memory = self.registry.gauge('mina_system_memory_percent', 'System memory in use')
+        self.system_cpu = self.registry.gauge('mina_system_cpu_percent', 'System CPU utilization')
+
         self.monitoring_active = True
         self._start_system_monitoring()
     
@@ -62,6 +88,8 @@ class PerformanceMonitor:
                         'system_cpu_usage': cpu,
                         'active_sessions': len([m for m in self.metrics.values() if m])
                     })
+                    self.system_memory.set(memory.percent)
+                    self.system_cpu.set(cpu)
                     
                     # Per-session memory tracking
                     for session_id, metrics in self.metrics.items():
@@ -79,8 +107,13 @@ class PerformanceMonitor:
     
     def start_session_monitoring(self, session_id: str):
         """Initialize monitoring for a new session."""
+        if session_id in self.metrics:
+            self._release_samples(self.metrics[session_id])
+        else:
+            self.active_sessions.inc()
         self.metrics[session_id] = TranscriptionMetrics(session_id=session_id)
         self.global_metrics['total_sessions'] += 1
+        self.sessions_started.inc()
         logger.info(f"Started performance monitoring for session {session_id}")
     
     def record_session_start(self, session_id: str):
@@ -92,42 +125,42 @@ class PerformanceMonitor:
         if session_id in self.metrics:
             metrics = self.metrics[session_id]
             metrics.chunk_latency_ms.append(latency_ms)
+            self._latency_sum += latency_ms
+            self._latency_count += 1
+            self.chunk_latency.observe(latency_ms / 1000)
             
             # Keep rolling window of last 50 measurements
             if len(metrics.chunk_latency_ms) > 50:
-                metrics.chunk_latency_ms.pop(0)
+                self._latency_sum -= metrics.chunk_latency_ms.pop(0)
+                self._latency_count -= 1
             
             # Update global average
-            all_latencies = []
-            for m in self.metrics.values():
-                all_latencies.extend(m.chunk_latency_ms)
-            
-            if all_latencies:
-                self.global_metrics['avg_latency_ms'] = sum(all_latencies) / len(all_latencies)
+            if self._latency_count:
+                self.global_metrics['avg_latency_ms'] = self._latency_sum / self._latency_count
     
     def record_queue_length(self, session_id: str, queue_length: int):
         """Record current processing queue length."""
         if session_id in self.metrics:
             self.metrics[session_id].queue_lengths.append(queue_length)
+            self._queue_sum += queue_length
+            self._queue_count += 1
+            self.queue_length.set(queue_length)
             
             # Update global average
-            all_queues = []
-            for m in self.metrics.values():
-                all_queues.extend(m.queue_lengths)
-            
-            if all_queues:
-                self.global_metrics['avg_queue_length'] = sum(all_queues) / len(all_queues)
+            self.global_metrics['avg_queue_length'] = self._queue_sum / self._queue_count
     
     def record_dropped_chunk(self, session_id: str):
         """Record a dropped/failed chunk."""
         if session_id in self.metrics:
             self.metrics[session_id].dropped_chunks += 1
             self.global_metrics['total_dropped_chunks'] += 1
+            self.dropped_chunks.inc()
     
     def record_retry(self, session_id: str):
         """Record an API retry attempt."""
         if session_id in self.metrics:
             self.metrics[session_id].retry_count += 1
+            self.retries.inc()
     
     def record_transcription_result(self, session_id: str, success: bool, confidence: float = 0.0, text: str = ""):
         """🔥 ENHANCED: Record transcription result with comprehensive QA metrics."""
@@ -295,7 +328,15 @@ class PerformanceMonitor:
             
             # Keep metrics for a short while for analysis
             # Could be moved to persistent storage here
-            del self.metrics[session_id]
+            self._release_samples(self.metrics.pop(session_id))
+            self.active_sessions.dec()
+    
+    def _release_samples(self, metrics: TranscriptionMetrics):
+        """Drop a session's samples from the running global averages."""
+        self._latency_sum -= sum(metrics.chunk_latency_ms)
+        self._latency_count -= len(metrics.chunk_latency_ms)
+        self._queue_sum -= sum(metrics.queue_lengths)
+        self._queue_count -= len(metrics.queue_lengths)
     
     def shutdown(self):
         """Shutdown performance monitoring."""
@@ -1,12 +1,16 @@
 """
 Performance monitoring service.
 Tracks application performance metrics and integrates with monitoring platforms.
+
+Measurements go into the shared metrics registry (services/metrics_registry.py)
+as histograms, which `/metrics` exposes for scraping.
 """
 import time
 import logging
 from functools import wraps
 from typing import Dict, Any, Optional
-from datetime import datetime
+
+from services.metrics_registry import MetricsRegistry, get_metrics_registry
 
 logger = logging.getLogger(__name__)
 
@@ -17,105 +21,70 @@ class PerformanceMonitor:
     Tracks latency, throughput, and custom metrics.
     """
     
-    def __init__(self):
-        self.metrics_buffer = []
+    def __init__(self, registry: Optional[MetricsRegistry] = None):
+        self.registry = registry or get_metrics_registry()
         self.enabled = True
+        self.http_requests = self.registry.histogram(
+            'mina_http_request_duration_seconds', 'HTTP request latency', ('route', 'method', 'status'))
+        self.database_queries = self.registry.histogram(
+            'mina_db_query_duration_seconds', 'Database query latency', ('query_type', 'table'))
+        self.external_calls = self.registry.histogram(
+            'mina_external_api_duration_seconds', 'External API call latency', ('service', 'endpoint', 'success'))
+        self.websocket_events = self.registry.histogram(
+            'mina_websocket_event_duration_seconds', 'WebSocket event latency', ('event',))
+        self.custom_metrics = self.registry.histogram(
+            'mina_custom_metric', 'Custom application metrics', ('name', 'tags'))
     
     def track_request(self, route: str, method: str, duration_ms: float, status_code: int):
         """Track HTTP request performance."""
-        metric = {
-            'type': 'http_request',
-            'route': route,
-            'method': method,
-            'duration_ms': duration_ms,
-            'status_code': status_code,
-            'timestamp': datetime.utcnow().isoformat()
-        }
-        
-        self._record_metric(metric)
+        if not self.enabled:
+            return
+        self.http_requests.labels(route, method, status_code).observe(duration_ms / 1000)
         
         if duration_ms > 1000:
             logger.warning(f"Slow request detected: {method} {route} took {duration_ms}ms")
     
     def track_database_query(self, query_type: str, duration_ms: float, table: Optional[str] = None):
         """Track database query performance."""
-        metric = {
-            'type': 'database_query',
-            'query_type': query_type,
-            'table': table,
-            'duration_ms': duration_ms,
-            'timestamp': datetime.utcnow().isoformat()
-        }
-        
-        self._record_metric(metric)
+        if not self.enabled:
+            return
+        self.database_queries.labels(query_type, table or '').observe(duration_ms / 1000)
         
         if duration_ms > 500:
             logger.warning(f"Slow query detected: {query_type} on {table} took {duration_ms}ms")
     
     def track_external_api_call(self, service: str, endpoint: str, duration_ms: float, success: bool):
         """Track external API call performance."""
-        metric = {
-            'type': 'external_api',
-            'service': service,
-            'endpoint': endpoint,
-            'duration_ms': duration_ms,
-            'success': success,
-            'timestamp': datetime.utcnow().isoformat()
-        }
-        
-        self._record_metric(metric)
+        if self.enabled:
+            self.external_calls.labels(service, endpoint, success).observe(duration_ms / 1000)
     
     def track_websocket_latency(self, event: str, duration_ms: float):
         """Track WebSocket event latency."""
-        metric = {
-            'type': 'websocket',
-            'event': event,
-            'duration_ms': duration_ms,
-            'timestamp': datetime.utcnow().isoformat()
-        }
-        
-        self._record_metric(metric)
+        if self.enabled:
+            self.websocket_events.labels(event).observe(duration_ms / 1000)
     
     def track_custom_metric(self, name: str, value: float, tags: Optional[Dict[str, str]] = None):
         """Track custom application metric."""
-        metric = {
-            'type': 'custom',
-            'name': name,
-            'value': value,
-            'tags': tags or {},
-            'timestamp': datetime.utcnow().isoformat()
-        }
-        
-        self._record_metric(metric)
-    
-    def _record_metric(self, metric: Dict[str, Any]):
-        """Record metric to buffer and send to monitoring platforms."""
-        if not self.enabled:
-            return
-        
-        self.metrics_buffer.append(metric)
-        
-        logger.info(f"metric.{metric['type']}", extra=metric)
-        
-        if len(self.metrics_buffer) >= 100:
-            self._flush_metrics()
-    
-    def _flush_metrics(self):
-        """Flush metrics buffer to monitoring platforms."""
-        if not self.metrics_buffer:
-            return
-        
-        metrics_count = len(self.metrics_buffer)
-        self.metrics_buffer.clear()
-        
-        logger.debug(f"Flushed {metrics_count} metrics")
+        if self.enabled:
+            tag_text = ','.join(f"{k}={v}" for k, v in sorted(tags.items())) if tags else ''
+            self.custom_metrics.labels(name, tag_text).observe(value)
     
     def get_stats(self) -> Dict[str, Any]:
         """Get current performance statistics."""
-        return {
-            'metrics_buffered': len(self.metrics_buffer),
-            'enabled': self.enabled
-        }
+        requests = None
+        for _, histogram in self.http_requests.series():
+            snapshot = histogram.snapshot()
+            requests = snapshot if requests is None else requests.merge(snapshot)
+        stats = {'enabled': self.enabled, 'requests': 0}
+        if requests is not None:
+            stats.update({
+                'requests': requests.count,
+                'request_avg_ms': requests.mean * 1000,
+                'request_p50_ms': requests.quantile(0.5) * 1000,
+                'request_p95_ms': requests.quantile(0.95) * 1000,
+                'request_p99_ms': requests.quantile(0.99) * 1000
+            })
+        return stats
 
 
 performance_monitor = PerformanceMonitor()
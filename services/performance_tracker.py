@@ -10,17 +10,25 @@ from contextlib import contextmanager
 from typing import Dict, Any, Optional, Callable, List
 import logging
 
+from services.metrics_registry import MetricsRegistry, pipeline_stage_histogram
+
 logger = logging.getLogger(__name__)
 
 class PerformanceTracker:
-    """Advanced performance monitoring and optimization system."""
+    """Advanced performance monitoring and optimization system.
+
+    Durations go into the shared per-stage histogram of the metrics registry,
+    which the percentiles are read from; only the last 1000 records per
+    operation are kept for the recent averages.
+    """
     
-    def __init__(self):
-        self.operation_metrics = defaultdict(list)
+    def __init__(self, registry: Optional[MetricsRegistry] = None):
+        self.operation_metrics: Dict[str, deque] = {}
         self.latency_percentiles = {}
         self.memory_samples = deque(maxlen=1000)
         self.cpu_samples = deque(maxlen=1000)
         self.lock = threading.RLock()
+        self.stage_latency = pipeline_stage_histogram(registry)
         
     @contextmanager
     def track_operation(self, operation_name: str, context_id: str):
@@ -37,46 +45,38 @@ class PerformanceTracker:
             duration = (end_time - start_time) * 1000  # Convert to ms
             memory_delta = end_memory - start_memory
             
-            with self.lock:
-                self.operation_metrics[operation_name].append({
-                    'duration_ms': duration,
-                    'memory_delta_bytes': memory_delta,
-                    'timestamp': end_time,
-                    'context_id': context_id
-                })
-                
+            self.stage_latency.labels(operation_name).observe(duration / 1000)
+            records = self.operation_metrics.get(operation_name)
+            if records is None:
                 # Keep only recent metrics (last 1000)
-                if len(self.operation_metrics[operation_name]) > 1000:
-                    self.operation_metrics[operation_name].pop(0)
-                
-                # Update percentiles every 100 operations
-                if len(self.operation_metrics[operation_name]) % 100 == 0:
-                    self._update_percentiles(operation_name)
+                records = self.operation_metrics.setdefault(operation_name, deque(maxlen=1000))
+            records.append({
+                'duration_ms': duration,
+                'memory_delta_bytes': memory_delta,
+                'timestamp': end_time,
+                'context_id': context_id
+            })
     
     def _update_percentiles(self, operation_name: str):
         """Update latency percentiles for an operation."""
-        durations = [m['duration_ms'] for m in self.operation_metrics[operation_name][-1000:]]
-        durations.sort()
-        
-        n = len(durations)
+        snapshot = self.stage_latency.labels(operation_name).snapshot()
         self.latency_percentiles[operation_name] = {
-            'p50': durations[int(n * 0.5)] if n > 0 else 0,
-            'p90': durations[int(n * 0.9)] if n > 0 else 0,
-            'p95': durations[int(n * 0.95)] if n > 0 else 0,
-            'p99': durations[int(n * 0.99)] if n > 0 else 0,
+            name: snapshot.quantile(q) * 1000
+            for name, q in (('p50', 0.5), ('p90', 0.9), ('p95', 0.95), ('p99', 0.99))
         }
     
     def get_performance_summary(self) -> Dict[str, Any]:
         """Get comprehensive performance summary."""
         with self.lock:
             summary = {}
-            for operation, metrics in self.operation_metrics.items():
+            for operation, metrics in list(self.operation_metrics.items()):
                 if not metrics:
                     continue
                     
-                recent_metrics = metrics[-100:]  # Last 100 operations
+                recent_metrics = list(metrics)[-100:]  # Last 100 operations
                 avg_duration = sum(m['duration_ms'] for m in recent_metrics) / len(recent_metrics)
                 avg_memory = sum(m['memory_delta_bytes'] for m in recent_metrics) / len(recent_metrics)
+                self._update_percentiles(operation)
                 
                 summary[operation] = {
                     'avg_duration_ms': avg_duration,
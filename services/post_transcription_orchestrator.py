@@ -32,10 +32,29 @@ from services.analysis_service import AnalysisService
 from services.analytics_service import AnalyticsService
 from services.background_tasks import background_task_manager
 from services.event_monitoring import log_dashboard_refresh_event
+from services.pattern_matcher import KeywordSet, get_extraction_matcher
 from app import socketio
 
 logger = logging.getLogger(__name__)
 
+# Pattern-task filters: meta-commentary about the application/testing is rejected,
+# and commitment matches must contain an action verb
+_TASK_META_PHRASES = KeywordSet([
+    'task extraction', 'should be able', 'the objective', 
+    'testing the', 'i am testing', 'we are testing',
+    'the feature', 'this feature', 'the application', 'this application',
+    'the system', 'this system', 'the pipeline', 'this pipeline',
+    'the goal is', 'the purpose is', 'the idea is',
+    'i\'m recording', 'i am recording', 'screen recording'
+])
+_TASK_ACTION_VERBS = KeywordSet([
+    'review', 'update', 'send', 'create', 'finish', 'complete',
+    'prepare', 'schedule', 'contact', 'call', 'email', 'write',
+    'fix', 'implement', 'test', 'deploy', 'check', 'submit',
+    'approve', 'analyze', 'research', 'present', 'discuss',
+    'follow up', 'followup', 'reach out', 'set up', 'setup'
+])
+
 
 def _determine_priority(task_text: str, evidence_text: str, due_date: Optional[Any]) -> str:
     """
@@ -806,6 +825,15 @@ class PostTranscriptionOrchestrator:
                 quality_scores = []
                 
                 if summary and summary.actions:
+                    # Resolve every AI-suggested owner against the workspace name index in one batch
+                    from services.user_matching_service import get_user_matching_service
+                    user_matcher = get_user_matching_service()
+                    owner_matches = user_matcher.match_users(
+                        {(action.get('owner') or '').strip() for action in summary.actions if isinstance(action, dict)},
+                        session_id=session.id,
+                        workspace_id=session.workspace_id
+                    )
+                    
                     for idx, action in enumerate(summary.actions):
                         try:
                             # Step 1: Store original raw text from AI
@@ -891,14 +919,13 @@ class PostTranscriptionOrchestrator:
                                     owner_name = extracted_assignee
                             
                             # Step 7: Match user/owner (name → user_id or store name)
-                            from services.user_matching_service import get_user_matching_service
-                            user_matcher = get_user_matching_service()
-                            
                             assigned_to_id = None
                             assigned_to_name = None
                             
                             if owner_name and owner_name.lower() not in ['not specified', 'none', 'unknown', '']:
-                                match_result = user_matcher.match_user(owner_name, session.id)
+                                match_result = owner_matches.get(owner_name) or user_matcher.match_user(
+                                    owner_name, workspace_id=session.workspace_id
+                                )
                                 if match_result.success and match_result.user_id:
                                     assigned_to_id = match_result.user_id
                                     logger.info(f"[User Matching] '{owner_name}' → user_id {assigned_to_id}")
@@ -1190,36 +1217,10 @@ class PostTranscriptionOrchestrator:
             List of created Task objects
         """
         from models.task import Task
-        import re
         
-        # Comprehensive task patterns to detect action items
-        # Each pattern captures the task description in group 1
-        task_patterns = [
-            # Explicit action markers
-            r"(?:action item|action|task|todo|to-do|to do|follow up|followup|next step)s?[:\-\s]+(.+?)(?:\.|$)",
-            
-            # Commitment patterns
-            r"(?:I|we|you|he|she|they)(?:'ll|\s+will|\s+need to|\s+should|\s+must|\s+have to|\s+got to|'ve got to)\s+(.+?)(?:\.|$)",
-            r"(?:I|we)'?(?:m| am|'re| are)\s+going to\s+(.+?)(?:\.|$)",
-            
-            # Suggestion to action
-            r"let['\s]*s\s+(.+?)(?:\.|$)",
-            
-            # Assignment patterns
-            r"(?:assign|delegate|give)\s+(.+?)\s+to\s+\w+",
-            
-            # TODO variations
-            r"\[?(?:TODO|Action|Task|Reminder)\]?[:\-\s]+(.+?)(?:\.|$)",
-            
-            # Deadline and time-based (explicit temporal markers only)
-            r"(?:deadline|due(?:\s+by)?)\s+(.+?)(?:\.|$)",
-            
-            # Numbered action lists (e.g., "1. Review the document")
-            r"\d+[\.\)]\s+(?:review|update|send|create|finish|complete|prepare|schedule|contact|call|email|write|fix|implement|test|deploy|check)\s+(.+?)(?:\.|$)",
-            
-            # Reminders
-            r"(?:reminder|remember to|don't forget to)[:\-\s]*(.+?)(?:\.|$)",
-        ]
+        # Comprehensive task patterns (services/pattern_matcher.TRANSCRIPT_TASK_PATTERNS),
+        # compiled once and prefiltered by keyword so each segment is scanned once
+        matcher = get_extraction_matcher()
         
         created_tasks = []
         seen_titles = set()  # Deduplicate
@@ -1230,181 +1231,166 @@ class PostTranscriptionOrchestrator:
             text = seg_data['text']
             segment_id = seg_data['segment_id']
             
-            for idx, pattern in enumerate(task_patterns):
-                matches = re.finditer(pattern, text, re.IGNORECASE)
-                for match in matches:
-                    task_text = match.group(1).strip()
-                    
-                    # Basic validation
-                    if len(task_text) < 5 or len(task_text) > 200:
-                        logger.debug(f"[Pattern Matching] Skipped task (length {len(task_text)}): '{task_text[:50]}...'")
-                        continue
-                    
-                    # Context-aware filtering to eliminate false positives
-                    task_lower = task_text.lower()
-                    
-                    # Filter 1: Reject meta-commentary about the application/testing
-                    meta_patterns = [
-                        'task extraction', 'should be able', 'the objective', 
-                        'testing the', 'i am testing', 'we are testing',
-                        'the feature', 'this feature', 'the application', 'this application',
-                        'the system', 'this system', 'the pipeline', 'this pipeline',
-                        'the goal is', 'the purpose is', 'the idea is',
-                        'i\'m recording', 'i am recording', 'screen recording'
-                    ]
-                    if any(meta in task_lower for meta in meta_patterns):
-                        logger.debug(f"[Pattern Matching] Skipped meta-commentary: '{task_text[:50]}...'")
-                        continue
-                    
-                    # Filter 2: Reject questions (not action items)
-                    if task_text.strip().endswith('?'):
-                        logger.debug(f"[Pattern Matching] Skipped question: '{task_text[:50]}...'")
-                        continue
-                    
-                    # Filter 3: Reject if doesn't contain action verbs (for commitment patterns)
-                    # Only apply to commitment patterns (patterns 1 and 2)
-                    if idx in [1, 2]:  # Commitment patterns that use "will", "should", etc.
-                        action_verbs = [
-                            'review', 'update', 'send', 'create', 'finish', 'complete',
-                            'prepare', 'schedule', 'contact', 'call', 'email', 'write',
-                            'fix', 'implement', 'test', 'deploy', 'check', 'submit',
-                            'approve', 'analyze', 'research', 'present', 'discuss',
-                            'follow up', 'followup', 'reach out', 'set up', 'setup'
-                        ]
-                        has_action_verb = any(verb in task_lower for verb in action_verbs)
-                        if not has_action_verb:
-                            logger.debug(f"[Pattern Matching] Skipped (no action verb): '{task_text[:50]}...'")
-                            continue
-                    
-                    # Filter 4: Minimum meaningful content (at least 3 words after filtering)
-                    word_count = len(task_text.split())
-                    if word_count < 3:
-                        logger.debug(f"[Pattern Matching] Skipped (too few words): '{task_text[:50]}...'")
-                        continue
-                    
-                    # Deduplication - check full text before refinement
-                    if task_text.lower() in seen_titles:
-                        logger.debug(f"[Pattern Matching] Skipped duplicate task: '{task_text[:50]}...'")
+            for tagged in matcher.scan(text, groups=['transcript_task'])['transcript_task']:
+                idx = tagged.index
+                pattern = tagged.pattern.regex
+                match = tagged.match
+                task_text = match.group(1).strip()
+                
+                # Basic validation
+                if len(task_text) < 5 or len(task_text) > 200:
+                    logger.debug(f"[Pattern Matching] Skipped task (length {len(task_text)}): '{task_text[:50]}...'")
+                    continue
+                
+                # Context-aware filtering to eliminate false positives
+                task_lower = task_text.lower()
+                
+                # Filter 1: Reject meta-commentary about the application/testing
+                if _TASK_META_PHRASES.contains_any(task_lower):
+                    logger.debug(f"[Pattern Matching] Skipped meta-commentary: '{task_text[:50]}...'")
+                    continue
+                
+                # Filter 2: Reject questions (not action items)
+                if task_text.strip().endswith('?'):
+                    logger.debug(f"[Pattern Matching] Skipped question: '{task_text[:50]}...'")
+                    continue
+                
+                # Filter 3: Reject if doesn't contain action verbs (for commitment patterns)
+                # Only apply to commitment patterns (patterns 1 and 2)
+                if idx in [1, 2]:  # Commitment patterns that use "will", "should", etc.
+                    if not _TASK_ACTION_VERBS.contains_any(task_lower):
+                        logger.debug(f"[Pattern Matching] Skipped (no action verb): '{task_text[:50]}...'")
                         continue
-                        
-                    seen_titles.add(task_text.lower())
-                    
-                    # Track pattern match for diagnostics
-                    pattern_name = f"pattern_{idx}"
-                    pattern_match_counts[pattern_name] = pattern_match_counts.get(pattern_name, 0) + 1
-                    logger.debug(f"[Pattern Matching] Pattern {idx} matched: '{task_text[:50]}...' in segment {segment_id}")
-                    
-                    # ===== APPLY REFINEMENT TO PATTERN-MATCHED TASKS =====
-                    from services.task_refinement_service import get_task_refinement_service
-                    from services.date_parser_service import get_date_parser_service
-                    
-                    raw_task_text = task_text
-                    refinement_service = get_task_refinement_service()
-                    
-                    # Refine task text (conversational → professional)
-                    refinement_result = refinement_service.refine_task(
-                        raw_task=task_text,
-                        context={'evidence_quote': text[:200]}  # Use full segment text as context
-                    )
-                    
-                    if refinement_result.success:
-                        task_text = refinement_result.refined_text
-                        logger.info(f"[Pattern+Refinement] '{raw_task_text[:40]}...' → '{task_text[:60]}'")
-                    else:
-                        logger.warning(f"[Pattern+Refinement] Failed: {refinement_result.error}, using original")
-                    
-                    # ===== QUALITY VALIDATION: Reject meta-commentary and low-quality tasks =====
-                    from services.validation_engine import get_validation_engine
-                    
-                    validation_engine = get_validation_engine()
-                    quality_score = validation_engine.score_task_quality(
-                        task_text=task_text,
-                        evidence_quote=text[:200],
-                        transcript=text
-                    )
-                    
-                    # Reject if quality score below threshold (0.70)
-                    if quality_score.total_score < 0.70:
-                        logger.info(f"[Pattern+Validation] REJECTED (score={quality_score.total_score:.2f}): '{task_text[:60]}'")
-                        logger.debug(f"  Rejection reasons: {quality_score.deductions}")
-                        continue  # Skip this task
-                    else:
-                        logger.debug(f"[Pattern+Validation] PASSED (score={quality_score.total_score:.2f}): '{task_text[:60]}'")
-                    
-                    # Parse due date if present in text
-                    date_parser = get_date_parser_service()
-                    due_date = None
-                    due_interpretation = None
-                    
-                    # Look for temporal markers in the original segment text
-                    date_result = date_parser.parse_due_date(text)
-                    if date_result.success:
-                        due_date = date_result.date
-                        due_interpretation = date_result.interpretation
-                        logger.info(f"[Pattern+Date] Parsed due date: {due_interpretation}")
-                    
-                    # Intelligent priority detection
-                    priority = _determine_priority(
-                        task_text=task_text,
-                        evidence_text=text[:200],
-                        due_date=due_date
-                    )
-                    
-                    # Extract assignee from context
-                    extracted_assignee = _extract_assignee_from_context(
-                        evidence_text=text[:500],
-                        speaker_name=seg_data.get('speaker')
-                    )
-                    
-                    # Calculate intelligent confidence score for pattern-matched tasks
-                    # Pattern matching starts at 0.65 base, refinement boosts it
-                    base_pattern_confidence = 0.65
-                    if refinement_result.success and refinement_result.transformation_applied:
-                        # Successfully refined → 0.80-0.85 confidence
-                        pattern_confidence = 0.82
-                    elif refinement_result.success and not refinement_result.transformation_applied:
-                        # Already well-formatted → 0.75-0.80
-                        pattern_confidence = 0.78
-                    else:
-                        # Refinement failed → stay at base
-                        pattern_confidence = base_pattern_confidence
+                
+                # Filter 4: Minimum meaningful content (at least 3 words after filtering)
+                word_count = len(task_text.split())
+                if word_count < 3:
+                    logger.debug(f"[Pattern Matching] Skipped (too few words): '{task_text[:50]}...'")
+                    continue
+                
+                # Deduplication - check full text before refinement
+                if task_text.lower() in seen_titles:
+                    logger.debug(f"[Pattern Matching] Skipped duplicate task: '{task_text[:50]}...'")
+                    continue
                     
-                    # Create task in database with refinement metadata
-                    try:
-                        task = Task(
-                            session_id=session_id,
-                            title=task_text,  # Use FULL refined text (no truncation)
-                            description=f"Extracted from transcript via pattern matching",
-                            priority=priority,  # Intelligent priority detection
-                            status="todo",
-                            due_date=due_date,  # Parsed due date
-                            extracted_by_ai=False,  # Pattern-based extraction
-                            confidence_score=pattern_confidence,  # Intelligent confidence scoring
-                            extraction_context={
-                                'source': 'pattern',
-                                'raw_text': raw_task_text,  # CRITICAL: Store original for transparency
-                                'transcript_snippet': text[:500],
-                                'source_segment_id': segment_id,  # Enable 'jump to context'
-                                'start_ms': seg_data.get('start_ms'),
-                                'end_ms': seg_data.get('end_ms'),
-                                'matched_pattern': pattern[:50],  # Store which pattern matched
-                                'refinement': {
-                                    'transformation_applied': refinement_result.success,
-                                    'method': 'llm' if refinement_result.transformation_applied else 'passthrough',
-                                    'error': refinement_result.error if not refinement_result.success else None
-                                },
-                                'metadata_extraction': {
-                                    'due_date_parsed': due_interpretation,
-                                    'priority_detected': priority,
-                                    'owner_name': extracted_assignee
-                                }
+                seen_titles.add(task_text.lower())
+                
+                # Track pattern match for diagnostics
+                pattern_name = f"pattern_{idx}"
+                pattern_match_counts[pattern_name] = pattern_match_counts.get(pattern_name, 0) + 1
+                logger.debug(f"[Pattern Matching] Pattern {idx} matched: '{task_text[:50]}...' in segment {segment_id}")
+                
+                # ===== APPLY REFINEMENT TO PATTERN-MATCHED TASKS =====
+                from services.task_refinement_service import get_task_refinement_service
+                from services.date_parser_service import get_date_parser_service
+                
+                raw_task_text = task_text
+                refinement_service = get_task_refinement_service()
+                
+                # Refine task text (conversational → professional)
+                refinement_result = refinement_service.refine_task(
+                    raw_task=task_text,
+                    context={'evidence_quote': text[:200]}  # Use full segment text as context
+                )
+                
+                if refinement_result.success:
+                    task_text = refinement_result.refined_text
+                    logger.info(f"[Pattern+Refinement] '{raw_task_text[:40]}...' → '{task_text[:60]}'")
+                else:
+                    logger.warning(f"[Pattern+Refinement] Failed: {refinement_result.error}, using original")
+                
+                # ===== QUALITY VALIDATION: Reject meta-commentary and low-quality tasks =====
+                from services.validation_engine import get_validation_engine
+                
+                validation_engine = get_validation_engine()
+                quality_score = validation_engine.score_task_quality(
+                    task_text=task_text,
+                    evidence_quote=text[:200],
+                    transcript=text
+                )
+                
+                # Reject if quality score below threshold (0.70)
+                if quality_score.total_score < 0.70:
+                    logger.info(f"[Pattern+Validation] REJECTED (score={quality_score.total_score:.2f}): '{task_text[:60]}'")
+                    logger.debug(f"  Rejection reasons: {quality_score.deductions}")
+                    continue  # Skip this task
+                else:
+                    logger.debug(f"[Pattern+Validation] PASSED (score={quality_score.total_score:.2f}): '{task_text[:60]}'")
+                
+                # Parse due date if present in text
+                date_parser = get_date_parser_service()
+                due_date = None
+                due_interpretation = None
+                
+                # Look for temporal markers in the original segment text
+                date_result = date_parser.parse_due_date(text)
+                if date_result.success:
+                    due_date = date_result.date
+                    due_interpretation = date_result.interpretation
+                    logger.info(f"[Pattern+Date] Parsed due date: {due_interpretation}")
+                
+                # Intelligent priority detection
+                priority = _determine_priority(
+                    task_text=task_text,
+                    evidence_text=text[:200],
+                    due_date=due_date
+                )
+                
+                # Extract assignee from context
+                extracted_assignee = _extract_assignee_from_context(
+                    evidence_text=text[:500],
+                    speaker_name=seg_data.get('speaker')
+                )
+                
+                # Calculate intelligent confidence score for pattern-matched tasks
+                # Pattern matching starts at 0.65 base, refinement boosts it
+                base_pattern_confidence = 0.65
+                if refinement_result.success and refinement_result.transformation_applied:
+                    # Successfully refined → 0.80-0.85 confidence
+                    pattern_confidence = 0.82
+                elif refinement_result.success and not refinement_result.transformation_applied:
+                    # Already well-formatted → 0.75-0.80
+                    pattern_confidence = 0.78
+                else:
+                    # Refinement failed → stay at base
+                    pattern_confidence = base_pattern_confidence
+                
+                # Create task in database with refinement metadata
+                try:
+                    task = Task(
+                        session_id=session_id,
+                        title=task_text,  # Use FULL refined text (no truncation)
+                        description=f"Extracted from transcript via pattern matching",
+                        priority=priority,  # Intelligent priority detection
+                        status="todo",
+                        due_date=due_date,  # Parsed due date
+                        extracted_by_ai=False,  # Pattern-based extraction
+                        confidence_score=pattern_confidence,  # Intelligent confidence scoring
+                        extraction_context={
+                            'source': 'pattern',
+                            'raw_text': raw_task_text,  # CRITICAL: Store original for transparency
+                            'transcript_snippet': text[:500],
+                            'source_segment_id': segment_id,  # Enable 'jump to context'
+                            'start_ms': seg_data.get('start_ms'),
+                            'end_ms': seg_data.get('end_ms'),
+                            'matched_pattern': pattern[:50],  # Store which pattern matched
+                            'refinement': {
+                                'transformation_applied': refinement_result.success,
+                                'method': 'llm' if refinement_result.transformation_applied else 'passthrough',
+                                'error': refinement_result.error if not refinement_result.success else None
+                            },
+                            'metadata_extraction': {
+                                'due_date_parsed': due_interpretation,
+                                'priority_detected': priority,
+                                'owner_name': extracted_assignee
                             }
-                        )
-                        db.session.add(task)
-                        created_tasks.append(task)
-                    except Exception as e:
-                        logger.warning(f"Failed to create pattern-extracted task: {e}")
-                        continue
+                        }
+                    )
+                    db.session.add(task)
+                    created_tasks.append(task)
+                except Exception as e:
+                    logger.warning(f"Failed to create pattern-extracted task: {e}")
+                    continue
         
         # Commit all tasks at once with comprehensive error handling
         try:
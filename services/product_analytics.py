@@ -1,12 +1,26 @@
 """
 Product analytics service for tracking user events and behavior.
 Separate from meeting analytics (analytics_service.py).
+
+Events are not written on the request thread: track() appends to a bounded
+in-process buffer that a background thread flushes with one bulk INSERT per
+batch, by size or by age. Batches that cannot be written (database down) and
+events that overflow a full buffer are appended to a JSON-lines spill file,
+which is replayed ahead of the next successful flush. Reports are computed
+with a single grouped aggregate query each.
 """
+import atexit
+import json
 import logging
+import os
+import threading
+import time
+from collections import deque
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
+from flask import current_app, has_app_context
 from models import db
-from sqlalchemy import func, and_
+from sqlalchemy import case, func, insert, or_, select
 
 logger = logging.getLogger(__name__)
 
@@ -17,9 +31,9 @@ class AnalyticsEvent(db.Model):
     
     id = db.Column(db.Integer, primary_key=True)
     event_name = db.Column(db.String(100), nullable=False, index=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), index=True)
-    workspace_id = db.Column(db.Integer, db.ForeignKey('workspace.id'), index=True)
-    properties = db.Column(db.JSON, default={})
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), index=True)
+    workspace_id = db.Column(db.Integer, db.ForeignKey('workspaces.id'), index=True)
+    properties = db.Column(db.JSON, default=dict)
     timestamp = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     session_id = db.Column(db.String(36))
     
@@ -29,11 +43,224 @@ class AnalyticsEvent(db.Model):
     )
 
 
+class AnalyticsEventBuffer:
+    """
+    Bounded buffer of pending AnalyticsEvent rows with size/age flushing.
+
+    add() only takes a lock and appends; a daemon thread writes batches of up
+    to `batch_size` rows, waking as soon as a batch is full or the oldest
+    pending event is `max_age` seconds old.
+    """
+
+    def __init__(self, batch_size: Optional[int] = None, max_age: Optional[float] = None,
+                 capacity: Optional[int] = None, spill_path: Optional[str] = None):
+        self.batch_size = batch_size or int(os.environ.get('ANALYTICS_BATCH_SIZE', 500))
+        self.max_age = max_age if max_age is not None else float(os.environ.get('ANALYTICS_FLUSH_SECONDS', 2.0))
+        self.capacity = capacity or int(os.environ.get('ANALYTICS_BUFFER_CAPACITY', 10000))
+        self.spill_path = spill_path or os.environ.get('ANALYTICS_SPILL_PATH', 'instance/analytics_spill.jsonl')
+
+        self._pending: deque = deque()
+        self._oldest = 0.0
+        self._app = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()   # One writer at a time
+        self._spill_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+
+        self.stats = {'buffered': 0, 'flushed': 0, 'batches': 0, 'spilled': 0, 'replayed': 0, 'failed_flushes': 0,
+                      'dropped': 0}
+
+    def add(self, row: Dict[str, Any]):
+        """Queue one event row; overflow goes straight to the spill file."""
+        if self._app is None and has_app_context():
+            self._app = current_app._get_current_object()
+        with self._lock:
+            if len(self._pending) >= self.capacity:
+                overflow = True
+            else:
+                overflow = False
+                if not self._pending:
+                    self._oldest = time.monotonic()
+                self._pending.append(row)
+                self.stats['buffered'] += 1
+                full = len(self._pending) >= self.batch_size
+        if overflow:
+            self._spill([row])
+            return
+        if self._worker is None:
+            self._start_worker()
+        if full:
+            self._wake.set()
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self) -> int:
+        """
+        Write everything pending now (also replays the spill file first).
+
+        Returns:
+            Number of buffered rows written to the database
+        """
+        written = 0
+        with self._flush_lock:
+            self._replay_spill()
+            while True:
+                with self._lock:
+                    batch = [self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))]
+                    if self._pending:
+                        self._oldest = time.monotonic()
+                if not batch:
+                    return written
+                if not self._write(batch):
+                    self._spill(batch)
+                    return written
+                written += len(batch)
+
+    def _write(self, rows: List[Dict[str, Any]]) -> bool:
+        """Bulk insert one batch; False when the database is unavailable."""
+        if self._app is None and not has_app_context():
+            return False
+        try:
+            if has_app_context():
+                self._insert(rows)
+            else:
+                with self._app.app_context():
+                    self._insert(rows)
+            self.stats['flushed'] += len(rows)
+            self.stats['batches'] += 1
+            return True
+        except Exception as e:
+            self.stats['failed_flushes'] += 1
+            logger.error(f"Analytics flush of {len(rows)} events failed: {e}")
+            return False
+
+    @staticmethod
+    def _insert(rows: List[Dict[str, Any]]):
+        try:
+            db.session.execute(insert(AnalyticsEvent), rows)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+    # =========================================================================
+    # SPILL FILE
+    # =========================================================================
+
+    def _spill(self, rows: List[Dict[str, Any]]):
+        """Append rows to the spill file so they survive until the database is back."""
+        lines = []
+        for row in rows:
+            # Serialized one at a time so a row that cannot be encoded is dropped alone
+            try:
+                lines.append(json.dumps(row, default=_encode_datetime) + '\n')
+            except (TypeError, ValueError) as e:
+                self.stats['dropped'] += 1
+                logger.error(f"Dropped analytics event {row.get('event_name')!r}, not serializable: {e}")
+        if not lines:
+            return
+        try:
+            with self._spill_lock:
+                os.makedirs(os.path.dirname(self.spill_path) or '.', exist_ok=True)
+                with open(self.spill_path, 'a', encoding='utf-8') as spill:
+                    spill.writelines(lines)
+                    spill.flush()
+                    os.fsync(spill.fileno())
+            self.stats['spilled'] += len(lines)
+            logger.warning(f"Spilled {len(lines)} analytics events to {self.spill_path}")
+        except OSError as e:
+            self.stats['dropped'] += len(lines)
+            logger.error(f"Dropped {len(lines)} analytics events, spill failed: {e}")
+
+    def _replay_spill(self):
+        """Insert spilled rows ahead of new ones; the file is removed only once they are written."""
+        with self._spill_lock:
+            if not os.path.exists(self.spill_path):
+                return
+            replaying = self.spill_path + '.replaying'
+            os.replace(self.spill_path, replaying)
+        rows = []
+        with open(replaying, encoding='utf-8') as spill:
+            for line in spill:
+                if not line.strip():
+                    continue
+                try:
+                    rows.append(_decode_row(json.loads(line)))
+                except ValueError as e:
+                    self.stats['dropped'] += 1  # e.g. a line torn by a crash mid-write
+                    logger.error(f"Dropped unreadable spilled analytics event: {e}")
+        for start in range(0, len(rows), self.batch_size):
+            if not self._write(rows[start:start + self.batch_size]):
+                self._spill(rows[start:])
+                os.remove(replaying)
+                return
+        os.remove(replaying)
+        self.stats['replayed'] += len(rows)
+        logger.info(f"Replayed {len(rows)} spilled analytics events")
+
+    # =========================================================================
+    # BACKGROUND FLUSHING
+    # =========================================================================
+
+    def _start_worker(self):
+        with self._lock:
+            if self._worker is not None:
+                return
+            self._worker = threading.Thread(target=self._run, name='analytics-flush', daemon=True)
+        self._worker.start()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                with self._lock:
+                    age = time.monotonic() - self._oldest if self._pending else None
+                timeout = self.max_age if age is None else max(0.0, self.max_age - age)
+                self._wake.wait(timeout)
+                self._wake.clear()
+                with self._lock:
+                    due = self._pending and (len(self._pending) >= self.batch_size
+                                             or time.monotonic() - self._oldest >= self.max_age)
+                if due:
+                    self.flush()
+            except Exception as e:
+                # The flusher must outlive any one bad batch
+                logger.error(f"Analytics flusher error: {e}", exc_info=True)
+                self._stopped.wait(self.max_age)
+
+    def shutdown(self):
+        """Stop the flusher and write what is left."""
+        self._stopped.set()
+        self._wake.set()
+        if self._worker is not None:
+            self._worker.join(timeout=5)
+        self.flush()
+
+
+def _encode_datetime(value):
+    if isinstance(value, datetime):
+        return {'__datetime__': value.isoformat()}
+    raise TypeError(f"Not JSON serializable: {type(value).__name__}")
+
+
+def _decode_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    timestamp = row.get('timestamp')
+    if isinstance(timestamp, dict) and '__datetime__' in timestamp:
+        row['timestamp'] = datetime.fromisoformat(timestamp['__datetime__'])
+    return row
+
+
 class ProductAnalytics:
     """Track and analyze product usage events."""
     
-    def __init__(self):
+    def __init__(self, buffered: Optional[bool] = None, buffer: Optional[AnalyticsEventBuffer] = None):
         self.enabled = True
+        if buffered is None:
+            buffered = os.environ.get('ANALYTICS_BUFFERED', 'true').lower() != 'false'
+        self.buffer = (buffer or AnalyticsEventBuffer()) if buffered else None
     
     def track(
         self,
@@ -46,6 +273,9 @@ class ProductAnalytics:
         """
         Track a product analytics event.
         
+        Buffered by default: the row is written by the background flusher
+        within ANALYTICS_FLUSH_SECONDS, so reports may lag by that much.
+        
         Args:
             event_name: Event identifier (e.g., 'meeting.created')
             user_id: User who triggered the event
@@ -56,16 +286,20 @@ class ProductAnalytics:
         if not self.enabled:
             return
         
+        row = {
+            'event_name': event_name,
+            'user_id': user_id,
+            'workspace_id': workspace_id,
+            'properties': properties or {},
+            'session_id': session_id,
+            'timestamp': datetime.utcnow()
+        }
+        if self.buffer is not None:
+            self.buffer.add(row)
+            return
+        
         try:
-            event = AnalyticsEvent(
-                event_name=event_name,
-                user_id=user_id,
-                workspace_id=workspace_id,
-                properties=properties or {},
-                session_id=session_id
-            )
-            
-            db.session.add(event)
+            db.session.add(AnalyticsEvent(**row))
             db.session.commit()
             
             logger.debug(f"Tracked event: {event_name}", extra={
@@ -78,6 +312,16 @@ class ProductAnalytics:
             db.session.rollback()
             logger.error(f"Failed to track event {event_name}: {e}")
     
+    def flush(self) -> int:
+        """Write buffered events now; returns the number written."""
+        return self.buffer.flush() if self.buffer is not None else 0
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Ingestion counters for the buffered path."""
+        if self.buffer is None:
+            return {'buffered': False}
+        return {'buffered': True, 'pending': self.buffer.pending(), **self.buffer.stats}
+    
     def track_user_signup(self, user_id: int, workspace_id: int, properties: Optional[Dict] = None):
         """Track user signup event."""
         self.track('user.signup', user_id=user_id, workspace_id=workspace_id, properties=properties)
@@ -125,26 +369,20 @@ class ProductAnalytics:
         try:
             cutoff = datetime.utcnow() - timedelta(days=days)
             
-            # Users who signed up in period
-            signups = db.session.query(
-                func.count(func.distinct(AnalyticsEvent.user_id))
-            ).filter(
-                AnalyticsEvent.event_name == 'user.signup',
-                AnalyticsEvent.timestamp >= cutoff
-            ).scalar() or 0
+            # One row per user: signed up in period / ever started a session
+            signed_up_in_period = (AnalyticsEvent.event_name == 'user.signup') & (AnalyticsEvent.timestamp >= cutoff)
+            per_user = select(
+                func.max(case((signed_up_in_period, 1), else_=0)).label('signed_up'),
+                func.max(case((AnalyticsEvent.event_name == 'session.started', 1), else_=0)).label('started')
+            ).where(
+                AnalyticsEvent.event_name.in_(('user.signup', 'session.started')),
+                AnalyticsEvent.user_id.isnot(None)
+            ).group_by(AnalyticsEvent.user_id).subquery()
             
-            # Users who started first session
-            activated = db.session.query(
-                func.count(func.distinct(AnalyticsEvent.user_id))
-            ).filter(
-                AnalyticsEvent.event_name == 'session.started',
-                AnalyticsEvent.user_id.in_(
-                    db.session.query(AnalyticsEvent.user_id).filter(
-                        AnalyticsEvent.event_name == 'user.signup',
-                        AnalyticsEvent.timestamp >= cutoff
-                    )
-                )
-            ).scalar() or 0
+            signups, activated = db.session.execute(select(
+                func.coalesce(func.sum(per_user.c.signed_up), 0),
+                func.coalesce(func.sum(per_user.c.signed_up * per_user.c.started), 0)
+            )).one()
             
             return activated / signups if signups > 0 else 0.0
             
@@ -165,36 +403,25 @@ class ProductAnalytics:
         try:
             cutoff = datetime.utcnow() - timedelta(days=days)
             
+            # Per-event-type counts for the user; feature adoption is the number of rows
+            counts = dict(db.session.execute(
+                select(AnalyticsEvent.event_name, func.count(AnalyticsEvent.id)).where(
+                    AnalyticsEvent.user_id == user_id,
+                    AnalyticsEvent.timestamp >= cutoff
+                ).group_by(AnalyticsEvent.event_name)
+            ).all())
+            
             # Meeting frequency (30 points)
-            meetings = db.session.query(func.count(AnalyticsEvent.id)).filter(
-                AnalyticsEvent.user_id == user_id,
-                AnalyticsEvent.event_name == 'meeting.created',
-                AnalyticsEvent.timestamp >= cutoff
-            ).scalar() or 0
-            meeting_score = min(meetings / days * 100, 30)
+            meeting_score = min(counts.get('meeting.created', 0) / days * 100, 30)
             
             # Task creation (25 points)
-            tasks_created = db.session.query(func.count(AnalyticsEvent.id)).filter(
-                AnalyticsEvent.user_id == user_id,
-                AnalyticsEvent.event_name == 'task.created',
-                AnalyticsEvent.timestamp >= cutoff
-            ).scalar() or 0
-            task_create_score = min(tasks_created / (days * 2) * 25, 25)
+            task_create_score = min(counts.get('task.created', 0) / (days * 2) * 25, 25)
             
             # Task completion (25 points)
-            tasks_completed = db.session.query(func.count(AnalyticsEvent.id)).filter(
-                AnalyticsEvent.user_id == user_id,
-                AnalyticsEvent.event_name == 'task.completed',
-                AnalyticsEvent.timestamp >= cutoff
-            ).scalar() or 0
-            task_complete_score = min(tasks_completed / (days * 2) * 25, 25)
+            task_complete_score = min(counts.get('task.completed', 0) / (days * 2) * 25, 25)
             
             # Feature adoption (20 points) - unique event types used
-            unique_events = db.session.query(func.count(func.distinct(AnalyticsEvent.event_name))).filter(
-                AnalyticsEvent.user_id == user_id,
-                AnalyticsEvent.timestamp >= cutoff
-            ).scalar() or 0
-            feature_score = min(unique_events / 10 * 20, 20)
+            feature_score = min(len(counts) / 10 * 20, 20)
             
             total_score = meeting_score + task_create_score + task_complete_score + feature_score
             return round(total_score, 1)
@@ -213,24 +440,27 @@ class ProductAnalytics:
             cohort_date = datetime.utcnow() - timedelta(days=cohort_days)
             cohort_start = cohort_date.replace(hour=0, minute=0, second=0)
             cohort_end = cohort_start + timedelta(days=1)
+            recent_cutoff = datetime.utcnow() - timedelta(days=7)
             
-            # Users who signed up in cohort day
-            cohort_users = db.session.query(AnalyticsEvent.user_id).filter(
-                AnalyticsEvent.event_name == 'user.signup',
-                AnalyticsEvent.timestamp >= cohort_start,
-                AnalyticsEvent.timestamp < cohort_end
-            ).distinct().all()
-            
-            cohort_user_ids = [u[0] for u in cohort_users]
+            # One row per user seen in either window: in cohort / active in last 7 days
+            signed_up_in_cohort = (
+                (AnalyticsEvent.event_name == 'user.signup')
+                & (AnalyticsEvent.timestamp >= cohort_start)
+                & (AnalyticsEvent.timestamp < cohort_end)
+            )
+            per_user = select(
+                func.max(case((signed_up_in_cohort, 1), else_=0)).label('in_cohort'),
+                func.max(case((AnalyticsEvent.timestamp >= recent_cutoff, 1), else_=0)).label('active')
+            ).where(
+                AnalyticsEvent.user_id.isnot(None),
+                or_(signed_up_in_cohort, AnalyticsEvent.timestamp >= recent_cutoff)
+            ).group_by(AnalyticsEvent.user_id).subquery()
             
-            # Users from cohort who had activity in last 7 days
-            recent_cutoff = datetime.utcnow() - timedelta(days=7)
-            retained = db.session.query(func.count(func.distinct(AnalyticsEvent.user_id))).filter(
-                AnalyticsEvent.user_id.in_(cohort_user_ids),
-                AnalyticsEvent.timestamp >= recent_cutoff
-            ).scalar() or 0
+            cohort_size, retained = db.session.execute(select(
+                func.coalesce(func.sum(per_user.c.in_cohort), 0),
+                func.coalesce(func.sum(per_user.c.in_cohort * per_user.c.active), 0)
+            )).one()
             
-            cohort_size = len(cohort_user_ids)
             retention_rate = (retained / cohort_size * 100) if cohort_size > 0 else 0
             
             return {
@@ -247,25 +477,17 @@ class ProductAnalytics:
     def get_conversion_funnel(self) -> Dict[str, Any]:
         """Get conversion funnel metrics."""
         try:
-            # Total signups
-            total_signups = db.session.query(
-                func.count(func.distinct(AnalyticsEvent.user_id))
-            ).filter(AnalyticsEvent.event_name == 'user.signup').scalar() or 0
-            
-            # Users who created first meeting
-            first_meeting = db.session.query(
-                func.count(func.distinct(AnalyticsEvent.user_id))
-            ).filter(AnalyticsEvent.event_name == 'meeting.created').scalar() or 0
-            
-            # Users who started session
-            first_session = db.session.query(
-                func.count(func.distinct(AnalyticsEvent.user_id))
-            ).filter(AnalyticsEvent.event_name == 'session.started').scalar() or 0
+            # Distinct users per funnel step
+            steps = dict(db.session.execute(
+                select(AnalyticsEvent.event_name, func.count(func.distinct(AnalyticsEvent.user_id))).where(
+                    AnalyticsEvent.event_name.in_(('user.signup', 'meeting.created', 'session.started', 'task.created'))
+                ).group_by(AnalyticsEvent.event_name)
+            ).all())
             
-            # Users who created tasks
-            created_task = db.session.query(
-                func.count(func.distinct(AnalyticsEvent.user_id))
-            ).filter(AnalyticsEvent.event_name == 'task.created').scalar() or 0
+            total_signups = steps.get('user.signup', 0)
+            first_meeting = steps.get('meeting.created', 0)
+            first_session = steps.get('session.started', 0)
+            created_task = steps.get('task.created', 0)
             
             return {
                 'signup': total_signups,
@@ -283,3 +505,5 @@ class ProductAnalytics:
 
 
 product_analytics = ProductAnalytics()
+if product_analytics.buffer is not None:
+    atexit.register(product_analytics.buffer.shutdown)
@@ -0,0 +1,281 @@
+"""
+Rate Limit Engine - atomic GCRA and sliding-log limits
+Each check is one server-side script on Redis: read, decide and record
+happen atomically, so concurrent workers can never admit more than the
+limit, and one round trip replaces the old pipeline + ZREM pair. The clock
+is Redis TIME, shared by every worker.
+
+Algorithms:
+- gcra: generic cell rate algorithm (a token bucket stored as one
+  "theoretical arrival time"); `limit` requests per `window`, bursting up
+  to `limit`, refilling smoothly. One string key per client.
+- sliding_log: exact sliding window; every admitted request is a unique
+  sorted-set member, so requests in the same microsecond are all counted.
+
+MemoryRateLimitBackend implements the same arithmetic in Python for tests
+and single-node deployments. RateLimitEngine adds a local pre-check: once
+a key is denied, the decision stands until its retry time (denied requests
+consume nothing), so repeat requests from a client that is over the limit
+are answered without a Redis round trip.
+"""
+
+import logging
+import math
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+ALGORITHMS = ('gcra', 'sliding_log')
+
+
+@dataclass(frozen=True)
+class RateLimitDecision:
+    """Outcome of one rate-limit check; times in seconds."""
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float       # Wait before a request of the same cost can pass (0 when allowed)
+    reset_after: float       # Until the key is back to its full allowance
+    cached: bool = False     # Answered by the local pre-check
+
+    def to_info(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """Header-style fields used by DistributedRateLimiter."""
+        now = time.time() if now is None else now
+        return {
+            'limit': self.limit,
+            'remaining': self.remaining,
+            'reset_time': int(math.ceil(now + self.reset_after)),
+            'retry_after': int(math.ceil(self.retry_after))
+        }
+
+
+def _decision(limit: int, result) -> RateLimitDecision:
+    allowed, remaining, retry_us, reset_us = (int(value) for value in result)
+    return RateLimitDecision(bool(allowed), limit, max(0, remaining), retry_us / 1e6, max(0, reset_us) / 1e6)
+
+
+# =============================================================================
+# REDIS BACKEND
+# =============================================================================
+
+GCRA_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000000 + tonumber(t[2])
+local emission = tonumber(ARGV[1])
+local tolerance = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then tat = now end
+local new_tat = tat + emission * cost
+local allow_at = new_tat - tolerance
+if now < allow_at then
+  return {0, math.max(0, math.floor((tolerance - (tat - now)) / emission)), allow_at - now, tat - now}
+end
+redis.call('SET', KEYS[1], string.format('%d', new_tat), 'PX', math.ceil((new_tat - now) / 1000))
+return {1, math.floor((tolerance - (new_tat - now)) / emission), 0, new_tat - now}
+"""
+
+SLIDING_LOG_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000000 + tonumber(t[2])
+local window = tonumber(ARGV[1])
+local limit = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - window)
+local count = redis.call('ZCARD', KEYS[1])
+if count + cost > limit then
+  local index = count + cost - limit - 1
+  local entry = redis.call('ZRANGE', KEYS[1], index, index, 'WITHSCORES')
+  local newest = redis.call('ZRANGE', KEYS[1], -1, -1, 'WITHSCORES')
+  return {0, limit - count, tonumber(entry[2]) + window - now, tonumber(newest[2]) + window - now}
+end
+for i = 1, cost do
+  redis.call('ZADD', KEYS[1], now, ARGV[4] .. ':' .. i)
+end
+redis.call('PEXPIRE', KEYS[1], math.ceil(window / 1000))
+return {1, limit - count - cost, 0, window}
+"""
+
+
+class RedisRateLimitBackend:
+    """Runs each check as one EVALSHA against a shared Redis."""
+
+    def __init__(self, redis_client):
+        self.redis_client = redis_client
+        self._gcra = redis_client.register_script(GCRA_SCRIPT)
+        self._sliding_log = redis_client.register_script(SLIDING_LOG_SCRIPT)
+
+    def gcra(self, key: str, limit: int, window: float, cost: int = 1) -> RateLimitDecision:
+        emission = max(1, int(round(window * 1e6 / limit)))
+        return _decision(limit, self._gcra(keys=[key], args=[emission, emission * limit, cost]))
+
+    def sliding_log(self, key: str, limit: int, window: float, cost: int = 1) -> RateLimitDecision:
+        token = uuid.uuid4().hex
+        return _decision(limit, self._sliding_log(keys=[key], args=[int(window * 1e6), limit, cost, token]))
+
+
+# =============================================================================
+# IN-MEMORY BACKEND
+# =============================================================================
+
+class MemoryRateLimitBackend:
+    """
+    Same algorithms and results as the Redis scripts, for one process.
+
+    Args:
+        clock: Wall-clock seconds, injectable for tests
+    """
+
+    SWEEP_EVERY = 10000   # Checks between removals of idle keys
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self._clock = clock
+        self._tats: Dict[str, int] = {}
+        self._logs: Dict[str, Deque[int]] = {}
+        self._windows: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._checks = 0
+
+    def _now(self) -> int:
+        return int(self._clock() * 1e6)
+
+    def gcra(self, key: str, limit: int, window: float, cost: int = 1) -> RateLimitDecision:
+        emission = max(1, int(round(window * 1e6 / limit)))
+        tolerance = emission * limit
+        with self._lock:
+            self._tick()
+            now = self._now()
+            tat = max(self._tats.get(key, now), now)
+            new_tat = tat + emission * cost
+            allow_at = new_tat - tolerance
+            if now < allow_at:
+                return _decision(limit, (0, max(0, (tolerance - (tat - now)) // emission), allow_at - now, tat - now))
+            self._tats[key] = new_tat
+            return _decision(limit, (1, (tolerance - (new_tat - now)) // emission, 0, new_tat - now))
+
+    def sliding_log(self, key: str, limit: int, window: float, cost: int = 1) -> RateLimitDecision:
+        window_us = int(window * 1e6)
+        with self._lock:
+            self._tick()
+            now = self._now()
+            log = self._logs.setdefault(key, deque())
+            self._windows[key] = window_us
+            while log and log[0] <= now - window_us:
+                log.popleft()
+            count = len(log)
+            if count + cost > limit:
+                entry = log[count + cost - limit - 1]
+                return _decision(limit, (0, limit - count, entry + window_us - now, log[-1] + window_us - now))
+            log.extend([now] * cost)
+            return _decision(limit, (1, limit - count - cost, 0, window_us))
+
+    def _tick(self):
+        """Drop idle keys now and then, as key expiry does on Redis."""
+        self._checks += 1
+        if self._checks % self.SWEEP_EVERY:
+            return
+        now = self._now()
+        self._tats = {key: tat for key, tat in self._tats.items() if tat > now}
+        for key in [key for key, log in self._logs.items() if not log or log[-1] <= now - self._windows[key]]:
+            del self._logs[key]
+            del self._windows[key]
+
+
+# =============================================================================
+# ENGINE
+# =============================================================================
+
+class RateLimitEngine:
+    """
+    Rate-limit checks with a local pre-check in front of a backend.
+
+    Args:
+        backend: RedisRateLimitBackend or MemoryRateLimitBackend
+        precheck: Answer repeat requests from denied keys locally
+        precheck_max_keys: Bound on remembered denials
+    """
+
+    def __init__(self, backend, precheck: bool = True, precheck_max_keys: Optional[int] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.backend = backend
+        self.precheck = precheck
+        self.precheck_max_keys = precheck_max_keys or int(os.environ.get('RATE_LIMIT_PRECHECK_KEYS', 10000))
+        self._clock = clock
+        self._denied: Dict[str, Tuple[float, int, RateLimitDecision]] = {}
+        self._lock = threading.Lock()
+        self.stats = {'checks': 0, 'backend_calls': 0, 'precheck_hits': 0, 'denied': 0}
+
+    def check(self, key: str, limit: int, window: float, algorithm: str = 'gcra',
+              cost: int = 1) -> RateLimitDecision:
+        """
+        Count a request against `limit` per `window` seconds.
+
+        Args:
+            key: Client/endpoint key; include limit and window if they vary
+            limit: Requests allowed per window (also the burst size for gcra)
+            window: Window length in seconds
+            algorithm: 'gcra' or 'sliding_log'
+            cost: Units this request consumes
+
+        Returns:
+            RateLimitDecision
+        """
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"Unknown rate limit algorithm: {algorithm}")
+        if not 0 < cost <= limit:
+            raise ValueError(f"cost must be between 1 and the limit ({limit})")
+
+        self.stats['checks'] += 1
+        if self.precheck:
+            cached = self._cached_denial(key, cost)
+            if cached:
+                self.stats['precheck_hits'] += 1
+                self.stats['denied'] += 1
+                return cached
+
+        self.stats['backend_calls'] += 1
+        decision = getattr(self.backend, algorithm)(key, limit, window, cost)
+        if not decision.allowed:
+            self.stats['denied'] += 1
+            if self.precheck and decision.retry_after > 0:
+                self._remember_denial(key, cost, decision)
+        return decision
+
+    def _cached_denial(self, key: str, cost: int) -> Optional[RateLimitDecision]:
+        with self._lock:
+            entry = self._denied.get(key)
+            if entry is None:
+                return None
+            until, denied_cost, decision = entry
+            remaining = until - self._clock()
+            if remaining <= 0:
+                del self._denied[key]
+                return None
+        if cost < denied_cost:
+            return None   # A cheaper request may still fit
+        return RateLimitDecision(False, decision.limit, decision.remaining, remaining,
+                                 max(remaining, decision.reset_after - (decision.retry_after - remaining)), cached=True)
+
+    def _remember_denial(self, key: str, cost: int, decision: RateLimitDecision):
+        with self._lock:
+            if len(self._denied) >= self.precheck_max_keys:
+                now = self._clock()
+                self._denied = {k: v for k, v in self._denied.items() if v[0] > now}
+                while len(self._denied) >= self.precheck_max_keys:
+                    del self._denied[next(iter(self._denied))]
+            self._denied[key] = (self._clock() + decision.retry_after, cost, decision)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Checks, backend round trips saved by the pre-check, denials."""
+        checks = max(1, self.stats['checks'])
+        return {
+            **self.stats,
+            'precheck_hit_rate': self.stats['precheck_hits'] / checks,
+            'remembered_denials': len(self._denied)
+        }
@@ -3,23 +3,119 @@ Role-Based Access Control (RBAC) Service for Mina.
 
 This module provides comprehensive role-based access control functionality
 including permission checking, role management, and team collaboration features.
+
+Permission checks are answered from an in-memory decision cache: the
+role -> permission grants are loaded once into a PermissionIndex and active
+memberships are cached per user. Both are dropped whenever the policy version
+changes; the version is bumped on every membership or permission write and is
+shared through Redis (REDIS_URL) so other processes see the change within
+RBAC_VERSION_CHECK_INTERVAL seconds.
 """
 
 import logging
+import os
 import secrets
 import string
+import threading
+import time
+from collections import OrderedDict, defaultdict
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional, Set, Tuple
-from sqlalchemy import and_, or_
+from typing import Dict, List, Any, Optional, Set, Tuple, Iterable
+
+try:
+    import redis
+except Exception:  # redis not installed
+    redis = None
 
 logger = logging.getLogger(__name__)
 
 
+class PermissionIndex:
+    """In-memory role -> permission grant matrix."""
+    
+    def __init__(self, permission_names: Iterable[str],
+                 grants: Iterable[Tuple[str, str, Optional[int], Optional[int]]]):
+        """
+        Args:
+            permission_names: All known permission names
+            grants: Granted (role, permission_name, organization_id, team_id) rows;
+                    a None organization/team id applies to every context
+        """
+        self.permission_names = frozenset(permission_names)
+        self._grants: Dict[Tuple[str, str], List[Tuple[Optional[int], Optional[int]]]] = defaultdict(list)
+        for role, permission_name, organization_id, team_id in grants:
+            self._grants[(role, permission_name)].append((organization_id, team_id))
+    
+    def allows(self, roles: Iterable[str], permission_name: str,
+               organization_id: Optional[int] = None, team_id: Optional[int] = None) -> bool:
+        """Whether any of the roles is granted the permission in this context."""
+        for role in roles:
+            for grant_org, grant_team in self._grants.get((role, permission_name), ()):
+                if ((grant_org is None or grant_org == organization_id) and
+                        (grant_team is None or grant_team == team_id)):
+                    return True
+        return False
+
+
+class PolicyVersion:
+    """
+    Monotonic RBAC policy version.
+    
+    Local bumps take effect immediately. With Redis the counter is shared, and
+    remote bumps are picked up at most every check_interval seconds.
+    """
+    
+    REDIS_KEY = "rbac:policy_version"
+    
+    def __init__(self, redis_client=None, check_interval: float = 1.0, clock=time.monotonic):
+        self._redis = redis_client
+        self._check_interval = check_interval
+        self._clock = clock
+        self._local = 0
+        self._local_lock = threading.Lock()  # Concurrent bumps must never collapse into one
+        self._remote = 0
+        self._last_check = float('-inf')
+    
+    def current(self) -> Tuple[int, int]:
+        if self._redis is not None and self._clock() - self._last_check >= self._check_interval:
+            self._last_check = self._clock()
+            try:
+                self._remote = int(self._redis.get(self.REDIS_KEY) or 0)
+            except Exception as e:
+                logger.warning(f"RBAC policy version check failed: {e}")
+        return (self._remote, self._local)
+    
+    def bump(self) -> Tuple[int, int]:
+        with self._local_lock:
+            self._local += 1
+        if self._redis is not None:
+            try:
+                self._remote = int(self._redis.incr(self.REDIS_KEY))
+                self._last_check = self._clock()
+            except Exception as e:
+                logger.warning(f"RBAC policy version bump failed: {e}")
+        return (self._remote, self._local)
+
+
+def _make_redis_client():
+    url = os.getenv("REDIS_URL")
+    if url and redis:
+        return redis.from_url(url, decode_responses=True)
+    return None
+
+
+def _resource_attr(resource: Any, name: str) -> Any:
+    if isinstance(resource, dict):
+        return resource.get(name)
+    return getattr(resource, name, None)
+
+
 class RBACService:
     """Service for managing role-based access control and team collaboration."""
     
-    def __init__(self):
-        self.permission_cache: Dict[str, Dict[str, Any]] = {}
+    _MISSING = object()
+    
+    def __init__(self, redis_client=None, membership_cache_size: int = 10000):
         self.role_hierarchy = {
             'super_admin': ['organization_admin', 'team_admin', 'manager', 'member', 'guest'],
             'organization_admin': ['team_admin', 'manager', 'member', 'guest'],
@@ -28,6 +124,19 @@ class RBACService:
             'member': ['guest'],
             'guest': []
         }
+        
+        # Decision cache, valid for a single policy version
+        self.policy_version = PolicyVersion(
+            redis_client if redis_client is not None else _make_redis_client(),
+            check_interval=float(os.getenv('RBAC_VERSION_CHECK_INTERVAL', '1.0'))
+        )
+        self.membership_cache_size = membership_cache_size
+        self._cache_lock = threading.Lock()
+        self._cache_version: Optional[Tuple[int, int]] = None
+        self._permission_index: Optional[PermissionIndex] = None
+        self._org_roles: "OrderedDict[Tuple[int, int], Optional[str]]" = OrderedDict()
+        self._team_roles: "OrderedDict[Tuple[int, int], Optional[str]]" = OrderedDict()
+        self.cache_stats = {'hits': 0, 'misses': 0, 'invalidations': 0}
     
     def check_permission(self, user_id: int, permission_name: str, 
                         organization_id: Optional[int] = None, 
@@ -47,73 +156,16 @@ class RBACService:
             Boolean indicating if user has permission
         """
         try:
-            from models.organization import (
-                OrganizationMembership, TeamMembership, Permission, RolePermission
-            )
-            from app import db
-            
-            # Get user's organization role
-            org_membership = None
-            if organization_id:
-                org_membership = db.session.query(OrganizationMembership).filter_by(
-                    user_id=user_id,
-                    organization_id=organization_id,
-                    is_active=True
-                ).first()
-            
-            # Get user's team role
-            team_membership = None
-            if team_id:
-                team_membership = db.session.query(TeamMembership).filter_by(
-                    user_id=user_id,
-                    team_id=team_id,
-                    is_active=True
-                ).first()
-            
-            # Get permission
-            permission = db.session.query(Permission).filter_by(name=permission_name).first()
-            if not permission:
+            index = self._get_permission_index()
+            if permission_name not in index.permission_names:
                 logger.warning(f"Permission '{permission_name}' not found")
                 return False
             
-            # Check super admin (has all permissions)
-            if org_membership and org_membership.role.value == 'super_admin':
-                return True
-            
-            # Check role-based permissions
-            roles_to_check = []
+            org_role = self._get_org_role(user_id, organization_id) if organization_id else None
+            team_role = self._get_team_role(user_id, team_id) if team_id else None
             
-            # Add organization role
-            if org_membership:
-                roles_to_check.append(org_membership.role.value)
-                # Add inherited roles
-                roles_to_check.extend(self.role_hierarchy.get(org_membership.role.value, []))
-            
-            # Add team role
-            if team_membership:
-                team_role = f"team_{team_membership.role.value}"
-                roles_to_check.append(team_role)
-            
-            # Check if any role has the permission
-            for role in roles_to_check:
-                role_permission = db.session.query(RolePermission).filter(
-                    and_(
-                        RolePermission.role == role,
-                        RolePermission.permission_id == permission.id,
-                        RolePermission.granted == True,
-                        or_(
-                            RolePermission.organization_id == organization_id,
-                            RolePermission.organization_id.is_(None)
-                        ),
-                        or_(
-                            RolePermission.team_id == team_id,
-                            RolePermission.team_id.is_(None)
-                        )
-                    )
-                ).first()
-                
-                if role_permission:
-                    return True
+            if self._roles_allow(index, org_role, team_role, permission_name, organization_id, team_id):
+                return True
             
             # Check resource-specific permissions if resource_id provided
             if resource_id:
@@ -127,6 +179,208 @@ class RBACService:
             logger.error(f"Error checking permission {permission_name} for user {user_id}: {e}")
             return False
     
+    def filter_permitted(self, user_id: int, resources: Iterable[Any],
+                         permission_name: str = 'view_meeting') -> List[Any]:
+        """
+        Filter resources down to those the user holds a permission on.
+        
+        Each resource is a dict or object exposing ``id``, ``organization_id`` and
+        ``team_id``. Memberships for all contexts are fetched in one query per
+        membership type and ownership fallbacks in one query per permission.
+        
+        Args:
+            user_id: User ID to check
+            resources: Resources to filter
+            permission_name: Name of the permission to check
+            
+        Returns:
+            Permitted resources, in input order
+        """
+        resources = list(resources)
+        try:
+            index = self._get_permission_index()
+            if permission_name not in index.permission_names:
+                logger.warning(f"Permission '{permission_name}' not found")
+                return []
+            
+            contexts = {
+                (_resource_attr(r, 'organization_id'), _resource_attr(r, 'team_id'))
+                for r in resources
+            }
+            self._prefetch_memberships(
+                user_id,
+                {org_id for org_id, _ in contexts if org_id},
+                {team_id for _, team_id in contexts if team_id}
+            )
+            
+            decisions = {}
+            for organization_id, team_id in contexts:
+                org_role = self._get_org_role(user_id, organization_id) if organization_id else None
+                team_role = self._get_team_role(user_id, team_id) if team_id else None
+                decisions[(organization_id, team_id)] = self._roles_allow(
+                    index, org_role, team_role, permission_name, organization_id, team_id
+                )
+            
+            denied_ids = [
+                _resource_attr(r, 'id') for r in resources
+                if not decisions[(_resource_attr(r, 'organization_id'), _resource_attr(r, 'team_id'))]
+                and _resource_attr(r, 'id')
+            ]
+            owned = self._load_owned_resource_ids(user_id, permission_name, denied_ids) if denied_ids else set()
+            
+            return [
+                r for r in resources
+                if decisions[(_resource_attr(r, 'organization_id'), _resource_attr(r, 'team_id'))]
+                or _resource_attr(r, 'id') in owned
+            ]
+            
+        except Exception as e:
+            logger.error(f"Error filtering resources by {permission_name} for user {user_id}: {e}")
+            return []
+    
+    def invalidate_policy_cache(self):
+        """Bump the policy version after a membership or permission change."""
+        self.policy_version.bump()
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Decision cache statistics."""
+        with self._cache_lock:
+            lookups = self.cache_stats['hits'] + self.cache_stats['misses']
+            return {
+                **self.cache_stats,
+                'hit_rate': self.cache_stats['hits'] / lookups if lookups else 0.0,
+                'cached_memberships': len(self._org_roles) + len(self._team_roles),
+                'policy_version': self._cache_version
+            }
+    
+    # ====================================
+    # DECISION CACHE
+    # ====================================
+    
+    def _sync_policy_version(self):
+        """Drop cached decisions built for an older policy version (caller holds _cache_lock)."""
+        version = self.policy_version.current()
+        if version != self._cache_version:
+            if self._cache_version is not None:
+                self.cache_stats['invalidations'] += 1
+            self._cache_version = version
+            self._permission_index = None
+            self._org_roles.clear()
+            self._team_roles.clear()
+    
+    def _get_permission_index(self) -> PermissionIndex:
+        with self._cache_lock:
+            self._sync_policy_version()
+            index = self._permission_index
+            version = self._cache_version
+        if index is not None:
+            return index
+        
+        index = self._load_permission_index()
+        with self._cache_lock:
+            if self._cache_version == version:
+                self._permission_index = index
+        return index
+    
+    def _get_org_role(self, user_id: int, organization_id: int) -> Optional[str]:
+        return self._get_membership_role(self._org_roles, self._load_org_roles, user_id, organization_id)
+    
+    def _get_team_role(self, user_id: int, team_id: int) -> Optional[str]:
+        return self._get_membership_role(self._team_roles, self._load_team_roles, user_id, team_id)
+    
+    def _get_membership_role(self, cache: OrderedDict, loader, user_id: int, context_id: int) -> Optional[str]:
+        key = (user_id, context_id)
+        with self._cache_lock:
+            self._sync_policy_version()
+            role = cache.get(key, self._MISSING)
+            if role is not self._MISSING:
+                cache.move_to_end(key)
+                self.cache_stats['hits'] += 1
+                return role
+            self.cache_stats['misses'] += 1
+            version = self._cache_version
+        
+        role = loader(user_id, [context_id]).get(context_id)
+        self._store_memberships(cache, user_id, {context_id: role}, version)
+        return role
+    
+    def _prefetch_memberships(self, user_id: int, organization_ids: Set[int], team_ids: Set[int]):
+        """Load uncached memberships for many contexts in one query per membership type."""
+        for cache, loader, context_ids in ((self._org_roles, self._load_org_roles, organization_ids),
+                                           (self._team_roles, self._load_team_roles, team_ids)):
+            with self._cache_lock:
+                self._sync_policy_version()
+                missing = [cid for cid in context_ids if (user_id, cid) not in cache]
+                version = self._cache_version
+            if missing:
+                roles = loader(user_id, missing)
+                self._store_memberships(cache, user_id, {cid: roles.get(cid) for cid in missing}, version)
+    
+    def _store_memberships(self, cache: OrderedDict, user_id: int,
+                           roles: Dict[int, Optional[str]], version: Tuple[int, int]):
+        with self._cache_lock:
+            if self._cache_version != version:
+                return
+            for context_id, role in roles.items():
+                cache[(user_id, context_id)] = role
+                cache.move_to_end((user_id, context_id))
+            while len(cache) > self.membership_cache_size:
+                cache.popitem(last=False)
+    
+    def _roles_allow(self, index: PermissionIndex, org_role: Optional[str], team_role: Optional[str],
+                     permission_name: str, organization_id: Optional[int], team_id: Optional[int]) -> bool:
+        # Check super admin (has all permissions)
+        if org_role == 'super_admin':
+            return True
+        
+        roles_to_check = []
+        if org_role:
+            roles_to_check.append(org_role)
+            # Add inherited roles
+            roles_to_check.extend(self.role_hierarchy.get(org_role, []))
+        if team_role:
+            roles_to_check.append(f"team_{team_role}")
+        
+        return index.allows(roles_to_check, permission_name, organization_id, team_id)
+    
+    def _load_permission_index(self) -> PermissionIndex:
+        """Load all permissions and granted role permissions."""
+        from models.organization import Permission, RolePermission
+        from app import db
+        
+        permission_names = [name for (name,) in db.session.query(Permission.name).all()]
+        grants = db.session.query(
+            RolePermission.role, Permission.name,
+            RolePermission.organization_id, RolePermission.team_id
+        ).join(Permission, RolePermission.permission_id == Permission.id).filter(
+            RolePermission.granted == True
+        ).all()
+        return PermissionIndex(permission_names, grants)
+    
+    def _load_org_roles(self, user_id: int, organization_ids: List[int]) -> Dict[int, str]:
+        """Active organization roles for a user, keyed by organization id."""
+        from models.organization import OrganizationMembership
+        from app import db
+        
+        rows = db.session.query(OrganizationMembership.organization_id, OrganizationMembership.role).filter(
+            OrganizationMembership.user_id == user_id,
+            OrganizationMembership.organization_id.in_(organization_ids),
+            OrganizationMembership.is_active == True
+        ).all()
+        return {organization_id: role.value for organization_id, role in rows}
+    
+    def _load_team_roles(self, user_id: int, team_ids: List[int]) -> Dict[int, str]:
+        """Active team roles for a user, keyed by team id."""
+        from models.organization import TeamMembership
+        from app import db
+        
+        rows = db.session.query(TeamMembership.team_id, TeamMembership.role).filter(
+            TeamMembership.user_id == user_id,
+            TeamMembership.team_id.in_(team_ids),
+            TeamMembership.is_active == True
+        ).all()
+        return {team_id: role.value for team_id, role in rows}
+    
     def get_user_roles(self, user_id: int) -> Dict[str, Any]:
         """Get all roles for a user across organizations and teams."""
         try:
@@ -197,6 +451,7 @@ class RBACService:
             )
             db.session.add(membership)
             db.session.commit()
+            self.invalidate_policy_cache()
             
             logger.info(f"Created organization '{name}' with ID {org.id}")
             return org.id
@@ -238,6 +493,7 @@ class RBACService:
             )
             db.session.add(membership)
             db.session.commit()
+            self.invalidate_policy_cache()
             
             logger.info(f"Created team '{name}' with ID {team.id}")
             return team.id
@@ -307,6 +563,7 @@ class RBACService:
                 db.session.add(membership)
             
             db.session.commit()
+            self.invalidate_policy_cache()
             
             # TODO: Send invitation email
             logger.info(f"Invited user {email} to organization {organization_id}")
@@ -383,6 +640,7 @@ class RBACService:
                 db.session.add(membership)
             
             db.session.commit()
+            self.invalidate_policy_cache()
             
             # TODO: Send invitation email
             logger.info(f"Invited user {email} to team {team_id}")
@@ -415,6 +673,7 @@ class RBACService:
                 org_membership.invitation_expires_at = None
                 
                 db.session.commit()
+                self.invalidate_policy_cache()
                 logger.info(f"User {user_id} accepted organization invitation")
                 return True
             
@@ -434,6 +693,7 @@ class RBACService:
                 team_membership.invitation_expires_at = None
                 
                 db.session.commit()
+                self.invalidate_policy_cache()
                 logger.info(f"User {user_id} accepted team invitation")
                 return True
             
@@ -551,6 +811,7 @@ class RBACService:
                     db.session.add(permission)
             
             db.session.commit()
+            self.invalidate_policy_cache()
             
             # Define default role permissions
             self._initialize_role_permissions()
@@ -637,6 +898,7 @@ class RBACService:
                             db.session.add(role_perm)
             
             db.session.commit()
+            self.invalidate_policy_cache()
             logger.info("Role permissions initialized successfully")
             
         except Exception as e:
@@ -671,6 +933,27 @@ class RBACService:
             logger.error(f"Error checking resource permission: {e}")
             return False
     
+    def _load_owned_resource_ids(self, user_id: int, permission_name: str,
+                                 resource_ids: List[int]) -> Set[int]:
+        """Batched form of _check_resource_permission: ids among resource_ids the user owns."""
+        try:
+            if permission_name in ['edit_meeting', 'delete_meeting']:
+                from models.session import Session as owned_model
+            elif permission_name in ['edit_task', 'delete_task']:
+                from models.task import Task as owned_model
+            else:
+                return set()
+            from app import db
+            
+            rows = db.session.query(owned_model.id).filter(
+                owned_model.id.in_(resource_ids), owned_model.user_id == user_id
+            ).all()
+            return {resource_id for (resource_id,) in rows}
+            
+        except Exception as e:
+            logger.error(f"Error checking resource permissions: {e}")
+            return set()
+    
     def _generate_invitation_token(self) -> str:
         """Generate a secure invitation token."""
         alphabet = string.ascii_letters + string.digits
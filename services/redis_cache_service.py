@@ -78,7 +78,8 @@ class RedisCacheService:
             'audio_cache': 'mina:audio:',
             'temp': 'mina:temp:',
             'health': 'mina:health:',
-            'circuit_breaker': 'mina:cb:'
+            'circuit_breaker': 'mina:cb:',
+            'generation': 'mina:gen:'
         }
         
         self._initialize_redis()
@@ -245,18 +246,17 @@ class RedisCacheService:
             return 0
     
     def get_keys_by_pattern(self, pattern: str, prefix: str = 'temp') -> List[str]:
-        """Get keys matching a pattern"""
+        """Get keys matching a pattern (incremental SCAN, never blocks Redis like KEYS)"""
         if not self.is_available():
             return []
         
         try:
             full_pattern = self._build_key(pattern, prefix)
-            keys = self.client.keys(full_pattern)  # type: ignore
             
             # Remove prefix from keys
             prefix_len = len(self.key_prefixes[prefix])
             result_keys = []
-            for key in keys:
+            for key in self.client.scan_iter(match=full_pattern, count=500):  # type: ignore
                 if isinstance(key, bytes):
                     key_str = key.decode('utf-8')
                 else:
@@ -282,25 +282,86 @@ class RedisCacheService:
             return False
     
     def clear_prefix(self, prefix: str) -> int:
-        """Clear all keys with given prefix"""
+        """
+        Clear all keys with given prefix.
+        
+        Walks the keyspace with SCAN, so cost grows with the number of keys.
+        Prefer bump_generation() for invalidating response caches.
+        """
         if not self.is_available():
             return 0
         
         try:
             pattern = f"{self.key_prefixes[prefix]}*"
-            keys = self.client.keys(pattern)  # type: ignore
-            
-            if keys:
-                deleted = self.client.delete(*keys)  # type: ignore
+            deleted = 0
+            batch = []
+            for key in self.client.scan_iter(match=pattern, count=500):  # type: ignore
+                batch.append(key)
+                if len(batch) >= 500:
+                    deleted += self.client.delete(*batch)  # type: ignore
+                    batch = []
+            if batch:
+                deleted += self.client.delete(*batch)  # type: ignore
+            
+            if deleted:
                 logger.info(f"🗑️ Cleared {deleted} keys with prefix {prefix}")
-                return deleted
-            
-            return 0
+            return deleted
             
         except Exception as e:
             logger.error(f"❌ Cache clear prefix error for {prefix}: {e}")
             return 0
     
+    # Generation counters for tag-based invalidation
+    def get_generations(self, tags: List[str]) -> Optional[Dict[str, int]]:
+        """
+        Current generation of each tag (0 if never bumped), in one round trip.
+        
+        None when Redis cannot be read: callers must then bypass the cache,
+        since entries under the last known generations may be invalidated.
+        """
+        if not tags:
+            return {}
+        if not self.is_available():
+            return None
+        
+        try:
+            values = self.client.mget([self._build_key(tag, 'generation') for tag in tags])  # type: ignore
+            return {tag: int(value or 0) for tag, value in zip(tags, values)}
+            
+        except Exception as e:
+            logger.error(f"❌ Cache generation read error: {e}")
+            with self.stats_lock:
+                self.stats.errors += 1
+            return None
+    
+    def bump_generation(self, *tags: str) -> Dict[str, int]:
+        """
+        Invalidate everything cached under the given tags.
+        
+        O(1) per tag: keys embedding the old generation are simply never read
+        again and expire on their own TTL.
+        """
+        if not self.is_available() or not tags:
+            return {}
+        
+        try:
+            pipe = self.client.pipeline()  # type: ignore
+            for tag in tags:
+                pipe.incr(self._build_key(tag, 'generation'))
+            generations = dict(zip(tags, (int(value) for value in pipe.execute())))
+            
+            with self.stats_lock:
+                self.stats.deletes += len(tags)
+            
+            logger.debug(f"🔄 Bumped cache generations: {generations}")
+            return generations
+            
+        except Exception as e:
+            logger.error(f"❌ Cache generation bump error for {tags}: {e}")
+            with self.stats_lock:
+                self.stats.errors += 1
+            return {}
+    
     def get_memory_usage(self) -> Dict[str, Any]:
         """Get Redis memory usage information"""
         if not self.is_available():
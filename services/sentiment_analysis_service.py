@@ -83,6 +83,11 @@ class SentimentAnalysisService:
         self.intensifiers = self._load_intensifiers()
         self.negation_words = {'not', 'no', 'never', 'none', 'neither', 'nowhere', 'nothing'}
         
+        # Flattened word polarity table for batch scoring (positive wins on overlap,
+        # matching _get_word_sentiment)
+        self._word_polarity = {word: -1.0 for word in self.negative_words}
+        self._word_polarity.update({word: 1.0 for word in self.positive_words})
+        
         # Voice-based emotion indicators
         self.voice_emotion_mapping = self._create_voice_emotion_mapping()
         
@@ -194,6 +199,59 @@ class SentimentAnalysisService:
             logger.error(f"❌ Text sentiment analysis failed: {e}")
             return SentimentScore(neutral=1.0)
     
+    def score_texts_compound(self, texts: List[str]) -> List[float]:
+        """
+        Lexicon compound sentiment for many texts in one vectorized pass.
+        
+        Equivalent to ``_analyze_text_sentiment(text).compound`` for each text
+        (same negation window, intensifiers and normalization), but tokens from
+        all texts are scored together with NumPy instead of word by word.
+        
+        Args:
+            texts: Texts to score, e.g. one per meeting time window
+            
+        Returns:
+            Compound score per text, in input order
+        """
+        if not texts:
+            return []
+        
+        token_lists = [self._preprocess_text(text) for text in texts]
+        counts = np.fromiter((len(words) for words in token_lists), dtype=np.int64, count=len(texts))
+        if counts.sum() == 0:
+            return [0.0] * len(texts)
+        
+        tokens = [word for words in token_lists for word in words]
+        doc_ids = np.repeat(np.arange(len(texts)), counts)
+        polarity = np.fromiter((self._word_polarity.get(w, 0.0) for w in tokens), dtype=np.float64, count=len(tokens))
+        is_negation = np.fromiter((w in self.negation_words for w in tokens), dtype=bool, count=len(tokens))
+        intensity = np.fromiter((self.intensifiers.get(w, 0.0) for w in tokens), dtype=np.float64, count=len(tokens))
+        
+        def shifted(values: np.ndarray, k: int, fill) -> np.ndarray:
+            """values[i - k] where token i - k belongs to the same text, else fill."""
+            out = np.full_like(values, fill)
+            if k < len(values):
+                same_doc = doc_ids[k:] == doc_ids[:-k]
+                out[k:] = np.where(same_doc, values[:-k], fill)
+            return out
+        
+        # Negation within 3 preceding words
+        negated = shifted(is_negation, 1, False) | shifted(is_negation, 2, False) | shifted(is_negation, 3, False)
+        
+        # Intensifier 1 word back, else 2 words back at reduced effect
+        prev1 = shifted(intensity, 1, 0.0)
+        prev2 = shifted(intensity, 2, 0.0)
+        multiplier = np.where(prev1 > 0, prev1, np.where(prev2 > 0, prev2 * 0.8, 1.0))
+        
+        word_sentiment = polarity * np.where(negated, -1.0, 1.0) * multiplier
+        positive = np.bincount(doc_ids, weights=np.clip(word_sentiment, 0, None), minlength=len(texts))
+        negative = np.bincount(doc_ids, weights=np.clip(-word_sentiment, 0, None), minlength=len(texts))
+        
+        compound = np.zeros(len(texts))
+        nonempty = counts > 0
+        compound[nonempty] = (positive[nonempty] - negative[nonempty]) / counts[nonempty]
+        return compound.tolist()
+    
     def _analyze_text_emotions(self, text: str) -> EmotionProfile:
         """Analyze emotions from text content"""
         try:
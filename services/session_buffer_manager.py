@@ -23,6 +23,8 @@ except ImportError:
     
 import struct
 
+from services.speech_compactor import get_speech_compactor
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -65,6 +67,9 @@ class SessionMetrics:
     decode_failures: int = 0
     api_failures: int = 0
     backpressure_events: int = 0
+    silent_flushes_skipped: int = 0
+    bytes_saved: int = 0
+    audio_seconds_saved: float = 0.0
 
 class ContainerReconstructor:
     """Advanced container reconstruction for multi-format support"""
@@ -303,6 +308,15 @@ class SessionBufferManager:
             current_time = time.time()
             time_since_last_flush = (current_time - self.last_flush) * 1000
             
+            # Raw PCM with nothing but silence buffered: never worth a transcription call.
+            # VAD cannot read container (WebM/Ogg) chunks, and SPEECH_COMPACTION=false
+            # sends audio as-is, so those buffers are never judged silent
+            if (not self.format_detected and get_speech_compactor().enabled
+                    and not any(chunk.has_speech for chunk in self.chunks)):
+                if time_since_last_flush > self.config.max_flush_ms:
+                    self._discard_silence()
+                return False
+            
             # Forced flush conditions
             if time_since_last_flush > self.config.max_flush_ms:
                 logger.debug(f"🕒 Session {self.session_id}: Forced flush (timeout)")
@@ -333,6 +347,17 @@ class SessionBufferManager:
             
             return False
     
+    def _discard_silence(self):
+        """Drop a silence-only buffer instead of flushing it on timeout."""
+        dropped = len(self.raw_buffer)
+        self.metrics.silent_flushes_skipped += 1
+        self.metrics.bytes_saved += dropped
+        self.metrics.audio_seconds_saved += dropped / (self.config.target_sample_rate * 2)
+        self.chunks.clear()
+        self.raw_buffer.clear()
+        self.last_flush = time.time()
+        logger.debug(f"🔇 Session {self.session_id}: Skipped silent flush ({dropped} bytes)")
+    
     def assemble_flush_payload(self) -> Tuple[bytes, str, Dict]:
         """Assemble optimized payload for transcription"""
         with self.lock:
@@ -344,13 +369,21 @@ class SessionBufferManager:
                 flush_chunks = list(self.chunks)
                 chunk_data = [chunk.data for chunk in flush_chunks]
                 
-                # Reconstruct container
+                # Reconstruct container; raw PCM is compacted to its speech instead
+                time_offsets = None
                 if self.format_detected:
                     payload_bytes = self.reconstructor.reconstruct_container(
                         chunk_data, self.format_detected
                     )
                 else:
-                    payload_bytes = b''.join(chunk_data)
+                    compaction = get_speech_compactor().compact(
+                        [(chunk.data, bool(chunk.has_speech)) for chunk in flush_chunks],
+                        base_time=flush_chunks[0].timestamp, session_id=self.session_id
+                    )
+                    payload_bytes = compaction.audio
+                    time_offsets = compaction.offset_map.to_dict()
+                    self.metrics.bytes_saved += compaction.original_bytes - len(compaction.audio)
+                    self.metrics.audio_seconds_saved += compaction.original_seconds - compaction.compacted_seconds
                 
                 # Metadata for API
                 metadata = {
@@ -361,6 +394,8 @@ class SessionBufferManager:
                     'sequence_range': f"{flush_chunks[0].sequence_id}-{flush_chunks[-1].sequence_id}",
                     'format': self.format_detected or 'unknown'
                 }
+                if time_offsets is not None:
+                    metadata['time_offsets'] = time_offsets
                 
                 # Update metrics
                 self.metrics.chunks_processed += len(flush_chunks)
@@ -442,6 +477,7 @@ class SessionBufferManager:
             self.is_active = False
             self.chunks.clear()
             self.raw_buffer.clear()
+            get_speech_compactor().release(self.session_id)
             logger.info(f"🔚 Session {self.session_id} ended")
 
 class SessionBufferRegistry:
@@ -12,19 +12,93 @@ Key Features:
 - Speaker labeling and management
 - Timeline-based speaker tracking
 - Integration with transcription pipeline
+
+Speakers are matched through a per-session SpeakerEmbeddingIndex: voice
+features are mapped to a fixed-layout weighted embedding, so comparing a
+segment against every speaker is one matrix-vector product.
 """
 
 import logging
+import threading
 import time
 import numpy as np
-from typing import Dict, Any, Optional, List, Tuple
+from functools import lru_cache
+from typing import Callable, Dict, Any, Optional, List, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 import json
 
+from services.speaker_embedding_index import ReclusterResult, SpeakerEmbeddingIndex
+
 logger = logging.getLogger(__name__)
 
+# Embedding layout: (feature, center, scale, weight). Each scalar feature is
+# centered and scaled to roughly unit spread, then weighted by the square root
+# of its share in voice similarity (F0 25%, formants 20%, spectral 15%, MFCC 25%,
+# temporal 10%, quality 5%) so squared contributions follow those shares.
+_SCALAR_EMBEDDING_SPEC: List[Tuple[str, float, float, float]] = [
+    ('formant_1', 500.0, 400.0, np.sqrt(0.2 / 3)),
+    ('formant_2', 1500.0, 500.0, np.sqrt(0.2 / 3)),
+    ('formant_3', 2500.0, 600.0, np.sqrt(0.2 / 3)),
+    ('spectral_centroid', 1500.0, 1000.0, np.sqrt(0.15 / 3)),
+    ('spectral_rolloff', 3000.0, 1500.0, np.sqrt(0.15 / 3)),
+    ('spectral_bandwidth', 1500.0, 750.0, np.sqrt(0.15 / 3)),
+    ('speaking_rate_estimate', 150.0, 50.0, np.sqrt(0.1 / 2)),
+    ('pause_ratio', 0.3, 0.25, np.sqrt(0.1 / 2)),
+    ('voice_quality_score', 0.5, 0.25, np.sqrt(0.05)),
+]
+_F0_CENTER_HZ, _F0_SCALE_LOG, _F0_WEIGHT = 160.0, 0.5, np.sqrt(0.25)
+_MFCC_COUNT, _MFCC_WEIGHT = 12, np.sqrt(0.25)  # MFCC 1-12; C0 is overall level
+VOICE_EMBEDDING_DIM = 1 + len(_SCALAR_EMBEDDING_SPEC) + _MFCC_COUNT
+
+
+def voice_embedding(features: Dict[str, Any]) -> np.ndarray:
+    """
+    Map a voice feature dict to a fixed-layout embedding for cosine matching.
+    
+    Missing or non-positive features contribute zero.
+    
+    Args:
+        features: Output of SpeakerDiarizationEngine._extract_voice_features
+        
+    Returns:
+        Vector of length VOICE_EMBEDDING_DIM
+    """
+    embedding = np.zeros(VOICE_EMBEDDING_DIM)
+    if not features:
+        return embedding
+    
+    f0 = features.get('fundamental_frequency', 0.0)
+    if f0 > 0:
+        embedding[0] = _F0_WEIGHT * np.log(f0 / _F0_CENTER_HZ) / _F0_SCALE_LOG
+    
+    for i, (name, center, scale, weight) in enumerate(_SCALAR_EMBEDDING_SPEC, start=1):
+        value = features.get(name, 0.0)
+        if value > 0:
+            embedding[i] = weight * (value - center) / scale
+    
+    mfcc = np.asarray(features.get('mfcc_features') or [], dtype=np.float64)[1:_MFCC_COUNT + 1]
+    norm = np.linalg.norm(mfcc)
+    if norm > 0:
+        start = 1 + len(_SCALAR_EMBEDDING_SPEC)
+        embedding[start:start + len(mfcc)] = _MFCC_WEIGHT * mfcc / norm
+    
+    return embedding
+
+
+@lru_cache(maxsize=16)
+def _dct_basis(n_coefficients: int, length: int) -> np.ndarray:
+    """DCT-II basis rows cos(pi * m * (k + 0.5) / length), cached per spectrum length."""
+    return np.cos(np.pi * np.arange(n_coefficients)[:, None] * (np.arange(length) + 0.5) / length)
+
+
+def _autocorrelation(audio_array: np.ndarray) -> np.ndarray:
+    """Non-negative lags of the linear autocorrelation, via one zero-padded FFT."""
+    n_fft = 1 << (2 * len(audio_array) - 1).bit_length()
+    spectrum = np.fft.rfft(audio_array, n=n_fft)
+    return np.fft.irfft(spectrum.real ** 2 + spectrum.imag ** 2, n=n_fft)[:len(audio_array)]
+
 class SpeakerIdentificationMode(Enum):
     """Speaker identification modes."""
     AUTOMATIC = "automatic"  # AI-based automatic identification
@@ -79,6 +153,7 @@ class DiarizationConfig:
     # Speaker tracking
     speaker_switch_penalty: float = 0.1  # Penalty for frequent speaker switches
     min_speaker_confidence: float = 0.6  # Minimum confidence for speaker assignment
+    recluster_merge_threshold: float = 0.9  # Centroid similarity at which speakers merge after the meeting
     
     # Labeling
     auto_label_speakers: bool = True
@@ -106,6 +181,8 @@ class SpeakerDiarizationEngine:
         
         # Voice feature tracking
         self.voice_features_history: Dict[str, List[Dict[str, Any]]] = {}  # {speaker_id: [features]}
+        self.session_indexes: Dict[str, SpeakerEmbeddingIndex] = {}  # {session_id: speaker centroids}
+        self.recluster_results: Dict[str, ReclusterResult] = {}
         
         # Metrics
         self.total_segments_processed = 0
@@ -125,6 +202,9 @@ class SpeakerDiarizationEngine:
         if session_id not in self.session_speakers:
             self.session_speakers[session_id] = {}
             self.session_segments[session_id] = []
+            self.session_indexes[session_id] = SpeakerEmbeddingIndex(
+                VOICE_EMBEDDING_DIM, capacity=self.config.max_speakers
+            )
             
             # Pre-register expected speakers if provided
             if expected_speakers:
@@ -158,10 +238,11 @@ class SpeakerDiarizationEngine:
         try:
             # Extract voice features from audio
             voice_features = self._extract_voice_features(audio_data)
+            embedding = voice_embedding(voice_features)
             
             # Identify speaker based on features
             speaker_identification = self._identify_speaker(
-                session_id, voice_features, start_time, end_time
+                session_id, voice_features, start_time, end_time, embedding
             )
             
             speaker_id = speaker_identification['speaker_id']
@@ -183,7 +264,8 @@ class SpeakerDiarizationEngine:
             self.session_segments[session_id].append(segment)
             
             # Update speaker profile
-            self._update_speaker_profile(session_id, speaker_id, segment, voice_features)
+            self._update_speaker_profile(session_id, speaker_id, segment, voice_features, embedding,
+                                         new_speaker=speaker_identification['method'].startswith('new_speaker'))
             
             # Check for speaker switches
             speaker_switch = self._detect_speaker_switch(session_id, speaker_id)
@@ -328,7 +410,8 @@ class SpeakerDiarizationEngine:
             return {}
     
     def _identify_speaker(self, session_id: str, voice_features: Dict[str, Any],
-                         start_time: float, end_time: float) -> Dict[str, Any]:
+                         start_time: float, end_time: float,
+                         embedding: Optional[np.ndarray] = None) -> Dict[str, Any]:
         """
         Identify speaker based on voice features and session context.
         
@@ -337,40 +420,54 @@ class SpeakerDiarizationEngine:
             voice_features: Extracted voice features
             start_time: Segment start time
             end_time: Segment end time
+            embedding: voice_embedding(voice_features), computed if omitted
             
         Returns:
             Speaker identification result
         """
         session_speakers = self.session_speakers.get(session_id, {})
+        index = self._session_index(session_id)
+        if embedding is None:
+            embedding = voice_embedding(voice_features)
         
         if not session_speakers:
             # First speaker in session
-            speaker_id = self._create_new_speaker(session_id, voice_features)
+            speaker_id = self._create_new_speaker(session_id, voice_features, embedding)
             return {'speaker_id': speaker_id, 'confidence': 0.8, 'method': 'new_speaker'}
         
-        # Find best matching speaker
-        best_match = None
-        best_score = 0.0
-        
-        for speaker_id, profile in session_speakers.items():
-            similarity_score = self._calculate_voice_similarity(
-                voice_features, profile.voice_characteristics
+        # Find best matching speaker: cosine against every centroid in one product,
+        # mapped to 0-1, with the speaker switch penalty applied
+        if len(index):
+            scores = (1.0 + index.similarities(embedding)) / 2
+            scores *= self._temporal_factors(session_id, index.speaker_ids, start_time)
+            row = int(np.argmax(scores))
+            if scores[row] > self.config.min_speaker_confidence:
+                return {'speaker_id': index.speaker_ids[row], 'confidence': float(scores[row]),
+                        'method': 'voice_match'}
+        
+        # Create new speaker
+        new_speaker_id = self._create_new_speaker(session_id, voice_features, embedding)
+        return {'speaker_id': new_speaker_id, 'confidence': 0.7, 'method': 'new_speaker_threshold'}
+    
+    def _session_index(self, session_id: str) -> SpeakerEmbeddingIndex:
+        """Embedding index for a session, created on first use."""
+        index = self.session_indexes.get(session_id)
+        if index is None:
+            index = self.session_indexes[session_id] = SpeakerEmbeddingIndex(
+                VOICE_EMBEDDING_DIM, capacity=self.config.max_speakers
             )
-            
-            # Consider temporal factors (speaker switch penalty)
-            temporal_factor = self._calculate_temporal_factor(session_id, speaker_id, start_time)
-            adjusted_score = similarity_score * temporal_factor
-            
-            if adjusted_score > best_score and adjusted_score > self.config.min_speaker_confidence:
-                best_score = adjusted_score
-                best_match = speaker_id
-        
-        if best_match:
-            return {'speaker_id': best_match, 'confidence': best_score, 'method': 'voice_match'}
-        else:
-            # Create new speaker
-            new_speaker_id = self._create_new_speaker(session_id, voice_features)
-            return {'speaker_id': new_speaker_id, 'confidence': 0.7, 'method': 'new_speaker_threshold'}
+        return index
+    
+    def _temporal_factors(self, session_id: str, speaker_ids: List[str], current_time: float) -> np.ndarray:
+        """Switch penalty for every indexed speaker except the one heard in the last 10 seconds."""
+        factors = np.full(len(speaker_ids), 1.0)
+        segments = self.session_segments.get(session_id)
+        if segments and current_time - segments[-1].end_time < 10.0:
+            factors[:] = 1.0 - self.config.speaker_switch_penalty
+            last_speaker = segments[-1].speaker_id
+            if last_speaker in speaker_ids:
+                factors[speaker_ids.index(last_speaker)] = 1.0
+        return factors
     
     def _calculate_voice_similarity(self, features1: Dict[str, Any], features2: Dict[str, Any]) -> float:
         """🎤 Enhanced voice similarity calculation using advanced features."""
@@ -532,7 +629,8 @@ class SpeakerDiarizationEngine:
             # Apply switch penalty
             return 1.0 - self.config.speaker_switch_penalty
     
-    def _create_new_speaker(self, session_id: str, voice_features: Dict[str, Any]) -> str:
+    def _create_new_speaker(self, session_id: str, voice_features: Dict[str, Any],
+                            embedding: Optional[np.ndarray] = None) -> str:
         """Create a new speaker profile."""
         speaker_count = len(self.session_speakers.get(session_id, {}))
         speaker_id = f"{session_id}_speaker_{speaker_count:02d}"
@@ -553,6 +651,10 @@ class SpeakerDiarizationEngine:
             self.session_speakers[session_id] = {}
         
         self.session_speakers[session_id][speaker_id] = profile
+        if voice_features:
+            self._session_index(session_id).add_speaker(
+                speaker_id, embedding if embedding is not None else voice_embedding(voice_features)
+            )
         
         logger.info(f"Created new speaker: {speaker_id} ({label})")
         return speaker_id
@@ -560,26 +662,30 @@ class SpeakerDiarizationEngine:
     # === 🎤 ENTERPRISE-GRADE VOICE ANALYSIS METHODS ===
     
     def _estimate_f0_advanced(self, audio_array: np.ndarray, sample_rate: int) -> np.ndarray:
-        """Advanced F0 estimation using multiple methods."""
+        """Advanced F0 estimation using multiple methods sharing one windowed FFT."""
+        windowed = audio_array * np.hanning(len(audio_array))
+        n_fft = 1 << (2 * len(windowed) - 1).bit_length()  # Zero padding keeps autocorrelation linear
+        spectrum = np.fft.rfft(windowed, n=n_fft)
+        
         # Method 1: Autocorrelation
-        autocorr_f0 = self._f0_autocorrelation(audio_array, sample_rate)
+        autocorr_f0 = self._f0_autocorrelation(audio_array, sample_rate, spectrum)
         
         # Method 2: Cepstrum (simplified)
-        cepstrum_f0 = self._f0_cepstrum(audio_array, sample_rate)
+        cepstrum_f0 = self._f0_cepstrum(audio_array, sample_rate, spectrum)
         
         # Combine methods
         f0_candidates = [f for f in [autocorr_f0, cepstrum_f0] if 50 <= f <= 500]
         
         return np.array(f0_candidates) if f0_candidates else np.array([])
     
-    def _f0_autocorrelation(self, audio_array: np.ndarray, sample_rate: int) -> float:
-        """F0 estimation using autocorrelation method."""
-        # Apply window
-        windowed = audio_array * np.hanning(len(audio_array))
-        
-        # Autocorrelation
-        autocorr = np.correlate(windowed, windowed, mode='full')
-        autocorr = autocorr[autocorr.size // 2:]
+    def _f0_autocorrelation(self, audio_array: np.ndarray, sample_rate: int,
+                            spectrum: Optional[np.ndarray] = None) -> float:
+        """F0 estimation using autocorrelation method (Wiener-Khinchin: irfft of |X|^2)."""
+        if spectrum is None:
+            autocorr = _autocorrelation(audio_array * np.hanning(len(audio_array)))
+        else:
+            n_fft = 2 * (len(spectrum) - 1)
+            autocorr = np.fft.irfft(spectrum.real ** 2 + spectrum.imag ** 2, n=n_fft)[:len(audio_array)]
         
         # Search in typical speech range: 50-500 Hz
         min_period = int(sample_rate / 500)
@@ -599,23 +705,24 @@ class SpeakerDiarizationEngine:
         # Validate result
         return f0 if 50 <= f0 <= 500 else 0.0
     
-    def _f0_cepstrum(self, audio_array: np.ndarray, sample_rate: int) -> float:
+    def _f0_cepstrum(self, audio_array: np.ndarray, sample_rate: int,
+                     spectrum: Optional[np.ndarray] = None) -> float:
         """F0 estimation using cepstrum method."""
         # Apply window and compute spectrum
-        windowed = audio_array * np.hanning(len(audio_array))
-        spectrum = np.abs(np.fft.rfft(windowed))
+        if spectrum is None:
+            spectrum = np.fft.rfft(audio_array * np.hanning(len(audio_array)))
         
         # Log spectrum (avoid log(0))
-        log_spectrum = np.log(spectrum + 1e-10)
+        log_spectrum = np.log(np.abs(spectrum) + 1e-10)
         
-        # Cepstrum
+        # Cepstrum (quefrency in samples regardless of FFT padding)
         cepstrum = np.fft.irfft(log_spectrum)
         
         # Search for peak in quefrency domain
         min_quefrency = int(sample_rate / 500)  # 500 Hz
         max_quefrency = int(sample_rate / 50)   # 50 Hz
         
-        if max_quefrency >= len(cepstrum):
+        if max_quefrency >= min(len(cepstrum), len(audio_array)):
             return 0.0
         
         search_cepstrum = cepstrum[min_quefrency:max_quefrency]
@@ -749,8 +856,7 @@ class SpeakerDiarizationEngine:
             return 0.0
         
         # Compute autocorrelation for periodicity
-        autocorr = np.correlate(audio_array, audio_array, mode='full')
-        autocorr = autocorr[autocorr.size // 2:]
+        autocorr = _autocorrelation(audio_array)
         
         # Estimate periodic and aperiodic components
         max_autocorr = np.max(autocorr[1:])  # Exclude zero-lag
@@ -819,15 +925,7 @@ class SpeakerDiarizationEngine:
         log_power = np.log(magnitude_spectrum ** 2 + 1e-10)
         
         # Simple DCT approximation for MFCC
-        mfcc_coeffs = []
-        
-        for m in range(n_mfcc):
-            coeff = 0.0
-            for k in range(len(log_power)):
-                coeff += log_power[k] * np.cos(np.pi * m * (k + 0.5) / len(log_power))
-            mfcc_coeffs.append(coeff)
-        
-        return mfcc_coeffs
+        return (_dct_basis(n_mfcc, len(log_power)) @ log_power).tolist()
     
     def _estimate_gender_advanced(self, features: Dict[str, Any]) -> str:
         """Advanced gender estimation using multiple features."""
@@ -893,7 +991,8 @@ class SpeakerDiarizationEngine:
         return float(np.mean(quality_factors)) if quality_factors else 0.0
     
     def _update_speaker_profile(self, session_id: str, speaker_id: str, 
-                               segment: SpeakerSegment, voice_features: Dict[str, Any]):
+                               segment: SpeakerSegment, voice_features: Dict[str, Any],
+                               embedding: Optional[np.ndarray] = None, new_speaker: bool = False):
         """Update speaker profile with new segment data."""
         if session_id not in self.session_speakers or speaker_id not in self.session_speakers[session_id]:
             return
@@ -904,7 +1003,7 @@ class SpeakerDiarizationEngine:
         profile.last_detected = segment.end_time
         profile.total_speaking_time += segment.duration
         profile.segments_count += 1
-        profile.confidence_scores.append(segment.avg_confidence)
+        profile.confidence_scores.append(segment.confidence)
         
         # Update voice characteristics (running average)
         if profile.voice_characteristics:
@@ -922,6 +1021,18 @@ class SpeakerDiarizationEngine:
                     profile.voice_characteristics[feature] = (old_value + new_value) / 2
         else:
             profile.voice_characteristics = voice_features.copy()
+        
+        # Matching uses the running centroid of the speaker's embeddings
+        if not voice_features:
+            return
+        if embedding is None:
+            embedding = voice_embedding(voice_features)
+        index = self._session_index(session_id)
+        if speaker_id not in index:
+            index.add_speaker(speaker_id, embedding)
+        elif not new_speaker:  # A new speaker's row is already seeded with this segment
+            index.update(speaker_id, embedding)
+        index.record_segment(segment.segment_id, speaker_id, embedding)
     
     def _detect_speaker_switch(self, session_id: str, current_speaker_id: str) -> bool:
         """Detect if there was a speaker switch."""
@@ -976,7 +1087,7 @@ class SpeakerDiarizationEngine:
                 'end_time': segment.end_time,
                 'duration': segment.duration,
                 'text': segment.text,
-                'confidence': segment.avg_confidence
+                'confidence': segment.confidence
             })
         
         return timeline
@@ -1007,10 +1118,100 @@ class SpeakerDiarizationEngine:
         
         return stats
     
+    def finalize_session(self, session_id: str, background: bool = True,
+                         on_complete: Optional[Callable[[ReclusterResult], None]] = None) -> Optional[threading.Thread]:
+        """
+        Re-cluster a finished session's speakers.
+        
+        Segments are re-clustered with the whole meeting in view: profiles that
+        absorbed several voices are split, speakers whose centroids converge
+        are merged into the one that spoke most, and the session timeline is
+        relabeled accordingly.
+        
+        Args:
+            session_id: Session identifier
+            background: Run on a daemon thread instead of the caller's
+            on_complete: Called with the ReclusterResult when done
+            
+        Returns:
+            The worker thread when running in the background, otherwise None
+        """
+        index = self.session_indexes.get(session_id)
+        if index is None:
+            return None
+        
+        result_ids: List[str] = []
+        
+        def run():
+            try:
+                result = index.recluster(
+                    self.config.recluster_merge_threshold,
+                    max_speakers=self.config.max_speakers,
+                    new_speaker_id=lambda: self._next_speaker_id(session_id, result_ids)
+                )
+                self._apply_recluster(session_id, result)
+                logger.info(f"Re-clustered session {session_id}: {result.speaker_count} speakers, "
+                            f"{len(result.merged)} merged, {result.relabeled_segments} segments relabeled")
+                if on_complete:
+                    on_complete(result)
+            except Exception as e:
+                logger.error(f"Speaker re-clustering failed for session {session_id}: {e}")
+        
+        if not background:
+            run()
+            return None
+        thread = threading.Thread(target=run, name=f"speaker-recluster-{session_id}", daemon=True)
+        thread.start()
+        return thread
+    
+    def _next_speaker_id(self, session_id: str, reserved: List[str]) -> str:
+        """Unused speaker id for a profile split out during re-clustering."""
+        speakers = self.session_speakers.get(session_id, {})
+        number = len(speakers) + len(reserved)
+        while f"{session_id}_speaker_{number:02d}" in speakers:
+            number += 1
+        reserved.append(f"{session_id}_speaker_{number:02d}")
+        return reserved[-1]
+    
+    def _apply_recluster(self, session_id: str, result: ReclusterResult):
+        """Relabel session segments, add split-out speakers and fold merged ones into their survivors."""
+        segments = self.session_segments.get(session_id, [])
+        for segment in segments:
+            segment.speaker_id = result.assignments.get(segment.segment_id, segment.speaker_id)
+        
+        speakers = self.session_speakers.setdefault(session_id, {})
+        for speaker_id in result.created:
+            number = len(speakers) + 1
+            speakers[speaker_id] = SpeakerProfile(
+                speaker_id=speaker_id,
+                label=(self.config.speaker_label_format.format(number) if self.config.auto_label_speakers
+                       else f"Speaker {number}")
+            )
+        
+        for absorbed, survivor in result.merged.items():
+            profile, target = speakers.get(absorbed), speakers.get(survivor)
+            if profile is None or target is None:
+                continue
+            target.first_detected = min(target.first_detected, profile.first_detected)
+            target.last_detected = max(target.last_detected, profile.last_detected)
+            if profile.name and not target.name:  # Keep a manual label
+                target.name, target.label = profile.name, profile.label
+            speakers.pop(absorbed)
+        
+        # Speaking time and confidences follow the relabeled timeline
+        for profile in speakers.values():
+            own = [segment for segment in segments if segment.speaker_id == profile.speaker_id]
+            profile.total_speaking_time = sum(segment.duration for segment in own)
+            profile.segments_count = len(own)
+            profile.confidence_scores = [segment.confidence for segment in own]
+        self.recluster_results[session_id] = result
+    
     def cleanup_session(self, session_id: str):
         """Clean up session data."""
         self.session_speakers.pop(session_id, None)
         self.session_segments.pop(session_id, None)
+        self.session_indexes.pop(session_id, None)
+        self.recluster_results.pop(session_id, None)
         
         logger.info(f"Cleaned up speaker diarization data for session {session_id}")
 
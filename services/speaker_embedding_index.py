@@ -0,0 +1,323 @@
+"""
+Speaker Embedding Index - contiguous speaker centroids for diarization
+
+Speaker profiles live as rows of one matrix: a running sum and count per
+speaker (the centroid) and the L2-normalized centroid used for matching, so
+comparing a new segment against every speaker is one matrix-vector product and
+absorbing a segment into a profile touches one row. Once enough segments have
+been seen, embeddings and centroids are centered on the meeting's running mean
+before normalizing: hand-crafted voice features share a large common component
+that otherwise makes every pair of speakers look alike under cosine
+similarity. Segment embeddings are kept in a growable float32 buffer so the
+meeting can be re-clustered once it is over, splitting profiles that absorbed
+several voices and merging speakers whose centroids converge.
+"""
+
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalize each row; all-zero rows stay zero."""
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return np.divide(matrix, norms, out=np.zeros_like(matrix, dtype=np.float64), where=norms > 0)
+
+
+@dataclass
+class ReclusterResult:
+    """Outcome of end-of-meeting re-clustering."""
+    assignments: Dict[str, str] = field(default_factory=dict)   # segment_id -> speaker_id
+    merged: Dict[str, str] = field(default_factory=dict)        # absorbed speaker -> surviving speaker
+    created: List[str] = field(default_factory=list)           # speakers split out of an online profile
+    centroids: Dict[str, np.ndarray] = field(default_factory=dict)  # speaker -> mean raw embedding
+    relabeled_segments: int = 0
+    speaker_count: int = 0
+    iterations: int = 0
+
+
+class SpeakerEmbeddingIndex:
+    """
+    Speaker centroids and segment embeddings as contiguous NumPy arrays.
+
+    Not tied to a feature set: callers decide what an embedding is. Methods are
+    safe to call from a background re-clustering thread while the owner keeps
+    matching.
+    """
+
+    def __init__(self, dim: int, capacity: int = 16, segment_capacity: int = 1024, center_after: int = 10):
+        self.dim = dim
+        self._sums = np.zeros((capacity, dim))
+        self._counts = np.zeros(capacity)
+        self._unit = np.zeros((capacity, dim))
+        self.speaker_ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+
+        # Running mean of every embedding seen; used for centering once
+        # `center_after` embeddings have been observed
+        self.center_after = center_after
+        self._total = np.zeros(dim)
+        self._observed = 0
+        self._center: Optional[np.ndarray] = None
+        self._stale = False
+
+        self._segments = np.zeros((segment_capacity, dim), dtype=np.float32)
+        self._segment_rows = np.zeros(segment_capacity, dtype=np.int32)
+        self.segment_ids: List[str] = []
+
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.speaker_ids)
+
+    def __contains__(self, speaker_id: str) -> bool:
+        return speaker_id in self._rows
+
+    # =========================================================================
+    # SPEAKERS
+    # =========================================================================
+
+    def add_speaker(self, speaker_id: str, embedding: np.ndarray) -> int:
+        """
+        Add a speaker seeded with one embedding.
+
+        Args:
+            speaker_id: Speaker identifier (must be new)
+            embedding: Initial embedding of length `dim`
+
+        Returns:
+            Row of the speaker in the centroid matrix
+        """
+        with self._lock:
+            row = len(self.speaker_ids)
+            if row == len(self._sums):
+                self._sums = self._grow(self._sums)
+                self._counts = self._grow(self._counts)
+                self._unit = self._grow(self._unit)
+            self._sums[row] = embedding
+            self._counts[row] = 1
+            self.speaker_ids.append(speaker_id)
+            self._rows[speaker_id] = row
+            self._observe(embedding)
+            self._unit[row] = self._normalize(self._sums[row])
+            return row
+
+    def update(self, speaker_id: str, embedding: np.ndarray):
+        """Fold one embedding into the speaker's running centroid."""
+        with self._lock:
+            row = self._rows[speaker_id]
+            self._sums[row] += embedding
+            self._counts[row] += 1
+            self._observe(embedding)
+            self._unit[row] = self._normalize(self._sums[row] / self._counts[row])
+
+    def centroid(self, speaker_id: str) -> np.ndarray:
+        """Mean embedding of a speaker."""
+        row = self._rows[speaker_id]
+        return self._sums[row] / self._counts[row]
+
+    def similarities(self, embedding: np.ndarray) -> np.ndarray:
+        """
+        Cosine similarity of an embedding to every speaker centroid.
+
+        Returns:
+            Array aligned with `speaker_ids`
+        """
+        with self._lock:
+            count = len(self.speaker_ids)
+            if count == 0:
+                return np.zeros(0)
+            if self._stale:
+                self._refresh_units()
+            return self._unit[:count] @ self._normalize(embedding)
+
+    def best_match(self, embedding: np.ndarray, weights: Optional[np.ndarray] = None) -> Tuple[Optional[str], float]:
+        """
+        Closest speaker by cosine similarity.
+
+        Args:
+            embedding: Query embedding
+            weights: Optional per-speaker multipliers applied before choosing
+
+        Returns:
+            (speaker_id, similarity) or (None, 0.0) when the index is empty
+        """
+        scores = self.similarities(embedding)
+        if len(scores) == 0:
+            return None, 0.0
+        if weights is not None:
+            scores = scores * weights
+        row = int(np.argmax(scores))
+        return self.speaker_ids[row], float(scores[row])
+
+    def _observe(self, embedding: np.ndarray):
+        """Fold an embedding into the running mean; centroids are re-normalized lazily."""
+        self._total += embedding
+        self._observed += 1
+        if self._observed >= self.center_after:
+            self._center = self._total / self._observed
+            self._stale = True
+
+    def _normalize(self, vector: np.ndarray) -> np.ndarray:
+        """Center (once warmed up) and L2-normalize one vector."""
+        if self._center is not None:
+            vector = vector - self._center
+        return normalize_rows(vector)
+
+    def _refresh_units(self):
+        """Re-normalize every centroid against the current center (one array operation)."""
+        count = len(self.speaker_ids)
+        centroids = self._sums[:count] / self._counts[:count, None]
+        if self._center is not None:
+            centroids = centroids - self._center
+        self._unit[:count] = normalize_rows(centroids)
+        self._stale = False
+
+    # =========================================================================
+    # SEGMENTS AND RE-CLUSTERING
+    # =========================================================================
+
+    def record_segment(self, segment_id: str, speaker_id: str, embedding: np.ndarray):
+        """Remember a segment's embedding and online assignment for re-clustering."""
+        with self._lock:
+            position = len(self.segment_ids)
+            if position == len(self._segments):
+                self._segments = self._grow(self._segments)
+                self._segment_rows = self._grow(self._segment_rows)
+            self._segments[position] = embedding
+            self._segment_rows[position] = self._rows[speaker_id]
+            self.segment_ids.append(segment_id)
+
+    def recluster(self, merge_threshold: float = 0.9, assign_threshold: float = 0.8,
+                  max_speakers: Optional[int] = None, max_iterations: int = 10,
+                  new_speaker_id: Optional[Callable[[], str]] = None) -> ReclusterResult:
+        """
+        Re-cluster every recorded segment with the whole meeting in view.
+
+        Online matching commits to a speaker before the meeting's mean is
+        known, so early segments can land in the wrong profile. Here segments
+        are centered on the full-meeting mean, seeded with a single leader pass
+        in arrival order (a new cluster whenever no centroid reaches
+        `assign_threshold`), refined k-means style, and clusters whose centroids
+        exceed `merge_threshold` are merged. Each cluster takes the id of the
+        online speaker contributing most of its segments; a second cluster
+        claiming the same speaker gets a fresh id from `new_speaker_id` (or is
+        folded into that speaker when no factory is given). Works on a
+        snapshot, so the index keeps serving matches while it runs.
+
+        Args:
+            merge_threshold: Centroid similarity above which clusters are merged
+            assign_threshold: Minimum similarity to join an existing cluster in the leader pass
+            max_speakers: Upper bound on clusters (defaults to the online speaker count)
+            max_iterations: Upper bound on refinement passes
+            new_speaker_id: Factory for ids of speakers split out of an online profile
+
+        Returns:
+            ReclusterResult with per-segment speaker ids, merged and created speakers
+            and each final speaker's mean embedding
+        """
+        with self._lock:
+            count = len(self.segment_ids)
+            speaker_ids = list(self.speaker_ids)
+            raw = self._segments[:count].astype(np.float64)
+            online = self._segment_rows[:count].copy()
+            segment_ids = list(self.segment_ids)
+
+        result = ReclusterResult()
+        if count == 0 or not speaker_ids:
+            return result
+
+        segments = normalize_rows(raw - raw.mean(axis=0)) if count >= self.center_after else normalize_rows(raw)
+        labels = self._leader_pass(segments, assign_threshold, max_speakers or len(speaker_ids))
+        labels, result.iterations = self._refine(segments, labels, max_iterations)
+        labels = self._merge_closest(segments, labels, merge_threshold)
+        labels, iterations = self._refine(segments, labels, max_iterations)
+        result.iterations += iterations
+
+        # Largest clusters claim their dominant online speaker first
+        names: Dict[int, str] = {}
+        clusters, sizes = np.unique(labels, return_counts=True)
+        for cluster in clusters[np.argsort(-sizes, kind='stable')].tolist():
+            dominant = speaker_ids[int(np.bincount(online[labels == cluster]).argmax())]
+            if dominant not in names.values():
+                names[cluster] = dominant
+            elif new_speaker_id is not None:
+                names[cluster] = new_speaker_id()
+                result.created.append(names[cluster])
+            else:
+                names[cluster] = dominant
+
+        final = np.array([names[label] for label in labels.tolist()], dtype=object)
+        surviving = set(names.values())
+        for row in np.unique(online).tolist():
+            if speaker_ids[row] not in surviving:
+                values, counts = np.unique(final[online == row], return_counts=True)
+                result.merged[speaker_ids[row]] = str(values[int(np.argmax(counts))])
+
+        for name in surviving:
+            result.centroids[name] = raw[final == name].mean(axis=0)
+        result.assignments = dict(zip(segment_ids, final.tolist()))
+        result.relabeled_segments = int(np.count_nonzero(final != np.array(speaker_ids, dtype=object)[online]))
+        result.speaker_count = len(surviving)
+        return result
+
+    @staticmethod
+    def _leader_pass(segments: np.ndarray, assign_threshold: float, max_clusters: int) -> np.ndarray:
+        """Assign segments in order, opening a cluster when nothing is close enough."""
+        sums = np.zeros((max_clusters, segments.shape[1]))
+        labels = np.zeros(len(segments), dtype=np.int64)
+        opened = 0
+        for position, segment in enumerate(segments):
+            if opened:
+                scores = normalize_rows(sums[:opened]) @ segment
+                best = int(np.argmax(scores))
+            if not opened or (scores[best] < assign_threshold and opened < max_clusters):
+                best = opened
+                opened += 1
+            sums[best] += segment
+            labels[position] = best
+        return labels
+
+    def _refine(self, segments: np.ndarray, labels: np.ndarray, max_iterations: int) -> Tuple[np.ndarray, int]:
+        """Nearest-centroid reassignment until labels stop changing."""
+        iterations = 0
+        for iterations in range(1, max_iterations + 1):
+            clusters = np.unique(labels)
+            centroids = self._cluster_centroids(segments, labels, clusters)
+            new_labels = clusters[np.argmax(segments @ centroids.T, axis=1)]
+            if np.array_equal(new_labels, labels):
+                break
+            labels = new_labels
+        return labels, iterations
+
+    @staticmethod
+    def _cluster_centroids(segments: np.ndarray, labels: np.ndarray, clusters: np.ndarray) -> np.ndarray:
+        """Normalized mean of each cluster's segments, one row per cluster."""
+        sums = np.zeros((int(clusters.max()) + 1, segments.shape[1]))
+        np.add.at(sums, labels, segments)
+        return normalize_rows(sums[clusters])
+
+    def _merge_closest(self, segments: np.ndarray, labels: np.ndarray, merge_threshold: float) -> np.ndarray:
+        """Merge the most similar pair of clusters until none exceeds the threshold."""
+        clusters = np.unique(labels)
+        while len(clusters) > 1:
+            centroids = self._cluster_centroids(segments, labels, clusters)
+            similarity = centroids @ centroids.T
+            np.fill_diagonal(similarity, -np.inf)
+            first, second = np.unravel_index(int(np.argmax(similarity)), similarity.shape)
+            if similarity[first, second] <= merge_threshold:
+                break
+            labels = np.where(labels == clusters[second], clusters[first], labels)
+            clusters = np.unique(labels)
+        return labels
+
+    @staticmethod
+    def _grow(array: np.ndarray) -> np.ndarray:
+        grown = np.zeros((len(array) * 2,) + array.shape[1:], dtype=array.dtype)
+        grown[:len(array)] = array
+        return grown
@@ -0,0 +1,248 @@
+"""
+Speech Compactor - speech-only payloads for Whisper
+Uses the per-chunk VAD decisions already made on the realtime path to drop or
+shorten silent spans before a buffer is uploaded. Silence is billed audio time
+and adds upload and inference latency, but carries no words.
+
+Each speech run keeps `pad_ms` of context on either side; silences shorter
+than `max_silence_ms` after padding are kept whole so natural pauses survive,
+and longer ones collapse to the two paddings. A buffer with no speech at all
+produces an empty payload and should not be sent. Every payload carries an
+OffsetMap that projects times in the compacted audio (e.g. Whisper word or
+segment timestamps) back onto meeting time.
+"""
+
+import logging
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class OffsetMap:
+    """Piecewise map from compacted-audio time to meeting time."""
+    base_time: float = 0.0           # Meeting time of the first sample of the original buffer
+    sample_rate: int = 16000
+    source_starts: List[int] = field(default_factory=list)   # Kept range starts in the original buffer
+    target_starts: List[int] = field(default_factory=list)   # Where each range starts in the compacted audio
+    lengths: List[int] = field(default_factory=list)         # Range lengths, samples
+
+    def to_meeting_time(self, seconds):
+        """
+        Project compacted-audio time(s) onto meeting time.
+
+        Times inside a kept range shift by that range's offset; times past the
+        end of the compacted audio clamp to the end of the last range.
+
+        Args:
+            seconds: Scalar or array of seconds in the compacted audio
+
+        Returns:
+            Meeting time(s) in seconds, same shape as `seconds`
+        """
+        samples = np.asarray(seconds, dtype=float) * self.sample_rate
+        if self.lengths:
+            target = np.asarray(self.target_starts)
+            row = np.clip(np.searchsorted(target, samples, side='right') - 1, 0, len(target) - 1)
+            samples = np.asarray(self.source_starts)[row] + np.clip(samples - target[row], 0, np.asarray(self.lengths)[row])
+        projected = self.base_time + samples / self.sample_rate
+        return projected if np.ndim(seconds) else float(projected)
+
+    def project(self, items: Iterable[Dict[str, Any]], keys: Sequence[str] = ('start', 'end')) -> List[Dict[str, Any]]:
+        """Copies of word/segment dicts with their `keys` re-projected to meeting time."""
+        items = [dict(item) for item in items]
+        for key in keys:
+            present = [item for item in items if item.get(key) is not None]
+            if present:
+                for item, value in zip(present, self.to_meeting_time([float(item[key]) for item in present])):
+                    item[key] = float(value)
+        return items
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-friendly [source_start, target_start, duration] spans in seconds."""
+        rate = float(self.sample_rate)
+        return {
+            'base_time': self.base_time,
+            'spans': [[s / rate, t / rate, n / rate]
+                      for s, t, n in zip(self.source_starts, self.target_starts, self.lengths)]
+        }
+
+
+@dataclass
+class CompactionResult:
+    """A compacted PCM payload and how to map it back."""
+    audio: bytes
+    offset_map: OffsetMap
+    original_bytes: int
+    original_seconds: float
+
+    @property
+    def has_speech(self) -> bool:
+        return bool(self.audio)
+
+    @property
+    def compacted_seconds(self) -> float:
+        return sum(self.offset_map.lengths) / self.offset_map.sample_rate
+
+
+@dataclass
+class CompactionStats:
+    """Per-session savings."""
+    payloads: int = 0
+    skipped_payloads: int = 0        # Buffers without speech that were never sent
+    bytes_in: int = 0
+    bytes_out: int = 0
+    seconds_in: float = 0.0
+    seconds_out: float = 0.0
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.bytes_in - self.bytes_out
+
+    @property
+    def seconds_saved(self) -> float:
+        return self.seconds_in - self.seconds_out
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'payloads': self.payloads,
+            'skipped_payloads': self.skipped_payloads,
+            'bytes_in': self.bytes_in,
+            'bytes_out': self.bytes_out,
+            'bytes_saved': self.bytes_saved,
+            'audio_seconds_in': round(self.seconds_in, 3),
+            'audio_seconds_out': round(self.seconds_out, 3),
+            'audio_seconds_saved': round(self.seconds_saved, 3),
+            'saved_ratio': self.seconds_saved / self.seconds_in if self.seconds_in else 0.0
+        }
+
+
+class SpeechCompactor:
+    """
+    Compact buffered 16-bit mono PCM chunks down to their speech.
+
+    Stateless per call apart from the per-session savings counters, so one
+    instance serves every session.
+    """
+
+    def __init__(self, sample_rate: int = 16000, pad_ms: Optional[int] = None,
+                 max_silence_ms: Optional[int] = None):
+        self.sample_rate = sample_rate
+        self.pad_ms = pad_ms if pad_ms is not None else int(os.environ.get('COMPACTION_PAD_MS', 200))
+        self.max_silence_ms = (max_silence_ms if max_silence_ms is not None
+                               else int(os.environ.get('COMPACTION_MAX_SILENCE_MS', 300)))
+        self.enabled = os.environ.get('SPEECH_COMPACTION', 'true').lower() != 'false'
+        self._stats: Dict[str, CompactionStats] = {}
+        self._lock = threading.Lock()
+
+    def compact(self, chunks: Sequence[Tuple[bytes, bool]], base_time: float = 0.0,
+                session_id: Optional[str] = None) -> CompactionResult:
+        """
+        Keep the speech of a buffer plus padding.
+
+        Args:
+            chunks: (pcm_bytes, is_speech) per chunk in arrival order; a WAV
+                header on a chunk is skipped
+            base_time: Meeting time of the first sample
+            session_id: Session to account the savings to
+
+        Returns:
+            CompactionResult; `audio` is empty when no chunk had speech
+        """
+        pcm = [chunk[44:] if chunk[:4] == b'RIFF' else chunk for chunk, _ in chunks]
+        pcm = [data[:len(data) - len(data) % 2] for data in pcm]  # Whole 16-bit samples only
+        lengths = np.array([len(data) // 2 for data in pcm], dtype=np.int64)
+        bounds = np.concatenate(([0], np.cumsum(lengths)))
+        total = int(bounds[-1])
+        offset_map = OffsetMap(base_time=base_time, sample_rate=self.sample_rate)
+
+        if not self.enabled:
+            ranges = [(0, total)] if total else []
+        else:
+            ranges = self._speech_ranges(np.array([speech for _, speech in chunks], dtype=bool), bounds)
+
+        joined = b''.join(pcm)
+        kept = []
+        position = 0
+        for start, end in ranges:
+            offset_map.source_starts.append(start)
+            offset_map.target_starts.append(position)
+            offset_map.lengths.append(end - start)
+            kept.append(joined[start * 2:end * 2])
+            position += end - start
+
+        result = CompactionResult(b''.join(kept), offset_map, len(joined), total / self.sample_rate)
+        if session_id is not None:
+            self._record(session_id, result)
+        return result
+
+    def _speech_ranges(self, speech: np.ndarray, bounds: np.ndarray) -> List[Tuple[int, int]]:
+        """Padded speech runs in samples, merged across short silences."""
+        edges = np.flatnonzero(np.diff(np.concatenate(([False], speech, [False])).astype(np.int8)))
+        if len(edges) == 0:
+            return []
+        pad = self.sample_rate * self.pad_ms // 1000
+        max_gap = self.sample_rate * self.max_silence_ms // 1000
+        total = int(bounds[-1])
+
+        ranges: List[Tuple[int, int]] = []
+        for first, last in zip(edges[::2].tolist(), edges[1::2].tolist()):
+            start, end = max(0, int(bounds[first]) - pad), min(total, int(bounds[last]) + pad)
+            if ranges and start - ranges[-1][1] <= max_gap:
+                ranges[-1] = (ranges[-1][0], end)
+            else:
+                ranges.append((start, end))
+        return ranges
+
+    def _record(self, session_id: str, result: CompactionResult):
+        with self._lock:
+            stats = self._stats.setdefault(session_id, CompactionStats())
+            stats.bytes_in += result.original_bytes
+            stats.seconds_in += result.original_seconds
+            if result.has_speech:
+                stats.payloads += 1
+                stats.bytes_out += len(result.audio)
+                stats.seconds_out += result.compacted_seconds
+            else:
+                stats.skipped_payloads += 1
+
+    def get_session_stats(self, session_id: str) -> Dict[str, Any]:
+        """Bytes and audio-seconds saved for a session."""
+        with self._lock:
+            return self._stats.get(session_id, CompactionStats()).to_dict()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Savings summed over all tracked sessions."""
+        with self._lock:
+            total = CompactionStats()
+            for stats in self._stats.values():
+                for name in ('payloads', 'skipped_payloads', 'bytes_in', 'bytes_out', 'seconds_in', 'seconds_out'):
+                    setattr(total, name, getattr(total, name) + getattr(stats, name))
+            summary = total.to_dict()
+            summary['sessions'] = len(self._stats)
+            return summary
+
+    def release(self, session_id: str) -> Dict[str, Any]:
+        """Forget a finished session and return its final savings."""
+        with self._lock:
+            return self._stats.pop(session_id, CompactionStats()).to_dict()
+
+
+# Global speech compactor
+_speech_compactor: Optional[SpeechCompactor] = None
+_speech_compactor_lock = threading.Lock()
+
+
+def get_speech_compactor() -> SpeechCompactor:
+    """Get the global speech compactor."""
+    global _speech_compactor
+    if _speech_compactor is None:
+        with _speech_compactor_lock:
+            if _speech_compactor is None:
+                _speech_compactor = SpeechCompactor()
+    return _speech_compactor
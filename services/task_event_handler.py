@@ -988,8 +988,11 @@ class TaskEventHandler:
             # Reorder events using TemporalRecoveryEngine
             ordered_events = temporal_recovery_engine.reorder_events(event_objects)
             
-            # Detect conflicts using vector clocks
-            conflicts = event_sequencer.detect_conflicts(ordered_events) if len(ordered_events) > 1 else []
+            # Detect conflicts using vector clocks (only events on the same task can conflict)
+            conflicts = event_sequencer.detect_conflicts(
+                ordered_events,
+                resource_key=lambda e: (e.payload or {}).get('task_id')
+            ) if len(ordered_events) > 1 else []
             
             # Replay events in order
             processed_count = 0
@@ -10,6 +10,7 @@ from datetime import datetime, timedelta, date
 from dataclasses import dataclass
 from models import db, Task, Meeting, Segment
 from services.openai_client_manager import get_openai_client
+from services.pattern_matcher import LINE_TASK_PATTERNS, get_extraction_matcher
 
 
 @dataclass
@@ -30,16 +31,8 @@ class TaskExtractionService:
     
     def __init__(self):
         self.client = get_openai_client()
-        self.task_patterns = [
-            r"(?:action item|task|todo|follow up|next step)s?[:\-\s]+(.+)",
-            r"(.+)\s+(?:needs to|should|must|will)\s+(.+)",
-            r"(?:assign|give|delegate)\s+(.+)\s+to\s+(\w+)",
-            r"(.+)\s+by\s+(next week|tomorrow|end of week|friday|monday)",
-            r"let['\s]*s\s+(.+)",
-            r"we need to\s+(.+)",
-            r"someone should\s+(.+)",
-            r"(?:I|we|you)['\s]*ll\s+(.+)"
-        ]
+        self.task_patterns = [p.regex for p in LINE_TASK_PATTERNS]
+        self.pattern_matcher = get_extraction_matcher()
         
         self.priority_keywords = {
             "urgent": ["urgent", "asap", "immediately", "critical", "emergency"],
@@ -131,20 +124,22 @@ class TaskExtractionService:
             # Use unified AI model manager with GPT-4.1 fallback
             from services.ai_model_manager import AIModelManager
             
+            request_params = {
+                "messages": [
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt}
+                ],
+                "temperature": 0.3,
+                "max_tokens": 1500
+            }
+            
             def make_api_call(model: str):
-                return self.client.chat.completions.create(
-                    model=model,
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt}
-                    ],
-                    temperature=0.3,
-                    max_tokens=1500
-                )
+                return self.client.chat.completions.create(model=model, **request_params)
             
             result_obj = AIModelManager.call_with_fallback(
                 make_api_call,
-                operation_name="task extraction"
+                operation_name="task extraction",
+                cache_request=request_params
             )
             
             if not result_obj.success:
@@ -189,24 +184,22 @@ class TaskExtractionService:
             if len(line) < 10:  # Skip very short lines
                 continue
             
-            # Try each pattern
-            for pattern in self.task_patterns:
-                matches = re.finditer(pattern, line, re.IGNORECASE)
-                for match in matches:
-                    task_text = match.group(1).strip()
+            # Try each pattern (keyword-prefiltered, single scan per line)
+            for tagged in self.pattern_matcher.scan(line, groups=['line_task'])['line_task']:
+                task_text = tagged.match.group(1).strip()
+                
+                if len(task_text) > 5:  # Basic validation
+                    priority = self._determine_priority(line)
+                    assignee = self._extract_assignee(line)
                     
-                    if len(task_text) > 5:  # Basic validation
-                        priority = self._determine_priority(line)
-                        assignee = self._extract_assignee(line)
-                        
-                        task = ExtractedTask(
-                            title=task_text[:100],  # Limit title length
-                            priority=priority,
-                            confidence=0.6,  # Lower confidence for pattern matching
-                            assigned_to=assignee,
-                            context={"source": "pattern", "line": line}
-                        )
-                        tasks.append(task)
+                    task = ExtractedTask(
+                        title=task_text[:100],  # Limit title length
+                        priority=priority,
+                        confidence=0.6,  # Lower confidence for pattern matching
+                        assigned_to=assignee,
+                        context={"source": "pattern", "line": line}
+                    )
+                    tasks.append(task)
         
         return tasks
 
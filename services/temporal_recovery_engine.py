@@ -19,6 +19,7 @@ from sqlalchemy import select, and_
 from models import db
 from models.event_ledger import EventLedger, EventStatus
 from services.event_sequencer import event_sequencer
+from services.causal_ordering import causal_order
 
 logger = logging.getLogger(__name__)
 
@@ -240,7 +241,8 @@ class TemporalRecoveryEngine:
         """
         Sort events using vector clock causality.
         
-        Uses topological sort based on happens-before relationships.
+        Topological sort by level of the happens-before DAG (see
+        services.causal_ordering); events stay in input order within a level.
         
         Args:
             events: Events to sort
@@ -249,52 +251,7 @@ class TemporalRecoveryEngine:
             Sorted events
         """
         try:
-            if not events:
-                return []
-            
-            # Build happens-before graph
-            ordered = []
-            remaining = events.copy()
-            
-            while remaining:
-                # Find events that don't happen-after any remaining events
-                can_proceed = []
-                
-                for event in remaining:
-                    happens_after_remaining = False
-                    
-                    for other in remaining:
-                        if event.id == other.id:
-                            continue
-                        
-                        # Compare vector clocks
-                        if event.vector_clock and other.vector_clock:
-                            relation = event_sequencer.compare_vector_clocks(
-                                event.vector_clock,
-                                other.vector_clock
-                            )
-                            
-                            if relation == "after":
-                                # This event happens after the other
-                                happens_after_remaining = True
-                                break
-                    
-                    if not happens_after_remaining:
-                        can_proceed.append(event)
-                
-                if not can_proceed:
-                    # Deadlock - add remaining by sequence number
-                    can_proceed = sorted(
-                        remaining,
-                        key=lambda e: (e.sequence_num or 0, e.created_at or datetime.min)
-                    )[:1]
-                
-                # Add to ordered list
-                for event in can_proceed:
-                    ordered.append(event)
-                    remaining.remove(event)
-            
-            return ordered
+            return causal_order(events)
             
         except Exception as e:
             logger.error(f"Failed to sort by vector clock: {e}")
@@ -3,15 +3,239 @@ Text Matcher Utility - Evidence-Based Task Validation
 
 Validates that extracted tasks/insights actually exist in the source transcript
 using fuzzy matching, keyword detection, and confidence scoring to prevent AI hallucination.
+
+Each transcript is indexed once (TranscriptIndex): normalized words and
+sentences, an inverted word -> sentence index, and per-word/per-sentence
+character-count signatures. SequenceMatcher.ratio() is 2M / (len(a) + len(b))
+where the M matched characters form a common subsequence, so shared
+character counts bound M, and for fuzzy-match windows a bit-parallel LCS
+computed for all candidate windows at once bounds it tighter. Candidates are
+aligned best-bound first and the search stops once no remaining candidate
+can beat the best score found, so scores are the same as aligning every
+window and sentence.
 """
 
 import re
 import logging
+import threading
+from collections import OrderedDict
 from typing import Dict, List, Tuple, Optional
 from difflib import SequenceMatcher
 
+import numpy as np
+
 logger = logging.getLogger(__name__)
 
+STOP_WORDS = frozenset({'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for'})
+WINDOW_EXTRA_WORDS = 5       # Context words added to each fuzzy-match window
+MIN_EVIDENCE_RATIO = 0.3     # Combined score a sentence needs to count as evidence
+SEED_WINDOWS = 8             # Windows aligned on the character bound alone before the LCS pass
+
+POPCOUNT8 = np.array([bin(value).count('1') for value in range(256)], dtype=np.int64)
+
+
+def _normalize(text: str) -> str:
+    """Lowercase and collapse whitespace."""
+    if not text:
+        return ""
+    return re.sub(r'\s+', ' ', text.lower().strip())
+
+
+class TranscriptIndex:
+    """
+    Evidence index over one transcript, built once and queried per extraction.
+
+    Args:
+        transcript: Raw transcript text
+    """
+
+    def __init__(self, transcript: str):
+        self.transcript = transcript
+        self.clean = _normalize(transcript)
+        self.words = self.clean.split()
+
+        # Sentences as _find_best_evidence has always cut them: raw quote + normalized form
+        raw_sentences = [s.strip() for s in re.split(r'[.!?]+', transcript or '')]
+        self.sentences = [s for s in raw_sentences if len(s) > 10]
+        self.clean_sentences = [_normalize(s) for s in self.sentences]
+
+        self._columns: Dict[str, int] = {}
+        for text in [self.clean] + self.clean_sentences:
+            for char in set(text):
+                if char != ' ' and char not in self._columns:
+                    self._columns[char] = len(self._columns)
+
+        # Prefix sums over words: character counts and lengths of any word range
+        self._word_prefix = np.zeros((len(self.words) + 1, len(self._columns)), dtype=np.int32)
+        if self.words:
+            counts = self._char_counts(self.words)
+            np.cumsum(counts, axis=0, out=self._word_prefix[1:])
+        self._length_prefix = np.zeros(len(self.words) + 1, dtype=np.int64)
+        np.cumsum([len(word) for word in self.words], out=self._length_prefix[1:])
+
+        # Character codes of the normalized transcript (space and padding get the last two codes)
+        self._space_code = len(self._columns)
+        self._pad_code = len(self._columns) + 1
+        self._codes = np.array([self._columns.get(char, self._space_code) for char in self.clean], dtype=np.int64)
+        word_lengths = np.diff(self._length_prefix)
+        self._word_starts = self._length_prefix[:-1] + np.arange(len(self.words))
+        self._word_ends = self._word_starts + word_lengths
+
+        # Sentence signatures, lengths and inverted word index
+        self._sentence_counts = self._char_counts(self.clean_sentences)
+        self._sentence_spaces = np.array([s.count(' ') for s in self.clean_sentences], dtype=np.int64)
+        self._sentence_lengths = np.array([len(s) for s in self.clean_sentences], dtype=np.int64)
+        postings: Dict[str, List[int]] = {}
+        for sentence_id, sentence in enumerate(self.clean_sentences):
+            for word in set(sentence.split()):
+                postings.setdefault(word, []).append(sentence_id)
+        self._postings = {word: np.array(ids, dtype=np.int64) for word, ids in postings.items()}
+
+        self._contains: Dict[str, bool] = {}
+        self.stats = {'windows': 0, 'windows_aligned': 0, 'sentences': 0, 'sentences_aligned': 0}
+
+    def _char_counts(self, texts: List[str]) -> np.ndarray:
+        """Character-count signature per text (spaces excluded)."""
+        counts = np.zeros((len(texts), len(self._columns)), dtype=np.int32)
+        rows, columns = [], []
+        for row, text in enumerate(texts):
+            for char in text:
+                column = self._columns.get(char)
+                if column is not None:
+                    rows.append(row)
+                    columns.append(column)
+        np.add.at(counts, (np.array(rows, dtype=np.int64), np.array(columns, dtype=np.int64)), 1)
+        return counts
+
+    def _signature(self, text: str) -> Tuple[np.ndarray, np.ndarray, int]:
+        """Columns and counts of the characters of `text` seen in the transcript, plus its spaces."""
+        counts: Dict[int, int] = {}
+        for char in text:
+            column = self._columns.get(char)
+            if column is not None:
+                counts[column] = counts.get(column, 0) + 1
+        columns = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+        values = np.fromiter(counts.values(), dtype=np.int32, count=len(counts))
+        return columns, values, text.count(' ')
+
+    def contains(self, text: str) -> bool:
+        """Substring test against the normalized transcript, memoized."""
+        found = self._contains.get(text)
+        if found is None:
+            found = self._contains[text] = text in self.clean
+        return found
+
+    def _lcs_lengths(self, text: str, first: np.ndarray, last: np.ndarray) -> np.ndarray:
+        """
+        Upper bound on the longest common subsequence of `text` with each
+        transcript span clean[first:last], all spans advanced in lockstep
+        (bit-parallel LCS, 64 characters of `text` per machine word; a text
+        longer than that is bounded by the sum over its pieces).
+        """
+        total = np.zeros(len(first), dtype=np.int64)
+        steps = int((last - first).max()) if len(first) else 0
+        for offset in range(0, len(text), 64):
+            piece = text[offset:offset + 64]
+            match = np.zeros(self._pad_code + 1, dtype=np.uint64)
+            for bit, char in enumerate(piece):
+                code = self._space_code if char == ' ' else self._columns.get(char)
+                if code is not None:
+                    match[code] |= np.uint64(1 << bit)
+            v = np.full(len(first), np.iinfo(np.uint64).max, dtype=np.uint64)
+            for step in range(steps):
+                position = first + step
+                codes = np.where(position < last, self._codes[np.minimum(position, len(self._codes) - 1)],
+                                 self._pad_code)
+                m = match[codes]
+                v = (v + (v & m)) | (v & ~m)
+            low = np.uint64((1 << len(piece)) - 1)
+            unmatched = POPCOUNT8[(v & low).view(np.uint8)].reshape(-1, 8).sum(axis=1)
+            total += len(piece) - unmatched
+        return total
+
+    def best_window_ratio(self, extracted: str, key_word_count: int) -> float:
+        """
+        Best SequenceMatcher ratio of `extracted` against every window of
+        key_word_count + 5 words (starting at each of the first
+        len(words) - key_word_count + 1 words).
+        """
+        starts = np.arange(max(0, len(self.words) - key_word_count + 1))
+        if not len(starts):
+            return 0.0
+        ends = np.minimum(starts + key_word_count + WINDOW_EXTRA_WORDS, len(self.words))
+        spaces = ends - starts - 1
+
+        columns, values, extracted_spaces = self._signature(extracted)
+        prefix = self._word_prefix[:, columns]
+        shared = np.minimum(prefix[ends] - prefix[starts], values).sum(axis=1) + np.minimum(spaces, extracted_spaces)
+        lengths = self._length_prefix[ends] - self._length_prefix[starts] + spaces
+        bounds = 2.0 * shared / (len(extracted) + lengths)
+        order = np.argsort(-bounds, kind='stable')
+
+        best = 0.0
+        aligned = 0
+
+        def align(start: int) -> float:
+            window = ' '.join(self.words[start:start + key_word_count + WINDOW_EXTRA_WORDS])
+            return SequenceMatcher(None, extracted, window).ratio()
+
+        # A few windows on the character bound alone give a score to prune against
+        for start in order[:SEED_WINDOWS].tolist():
+            if bounds[start] <= best:
+                break
+            best = max(best, align(start))
+            aligned += 1
+
+        # Then an order-aware bound for every window that could still win
+        remaining = order[SEED_WINDOWS:]
+        remaining = remaining[bounds[remaining] > best]
+        if len(remaining):
+            lcs = self._lcs_lengths(extracted, self._word_starts[remaining], self._word_ends[ends[remaining] - 1])
+            lcs_bounds = 2.0 * lcs / (len(extracted) + lengths[remaining])
+            for position in np.argsort(-lcs_bounds, kind='stable').tolist():
+                if lcs_bounds[position] <= best:
+                    break
+                best = max(best, align(int(remaining[position])))
+                aligned += 1
+        self.stats['windows'] += len(starts)
+        self.stats['windows_aligned'] += aligned
+        return best
+
+    def best_sentence(self, extracted: str) -> Optional[str]:
+        """
+        Sentence maximizing 0.6 * word overlap + 0.4 * SequenceMatcher ratio
+        (earliest on ties), or None when no sentence scores above 0.3.
+        """
+        extracted_words = set(extracted.split())
+        if not self.sentences or not extracted_words:
+            return None
+
+        overlap = np.zeros(len(self.sentences), dtype=np.int64)
+        for word in extracted_words:
+            ids = self._postings.get(word)
+            if ids is not None:
+                overlap[ids] += 1
+        overlap_ratio = overlap / len(extracted_words)
+
+        columns, values, extracted_spaces = self._signature(extracted)
+        shared = (np.minimum(self._sentence_counts[:, columns], values).sum(axis=1)
+                  + np.minimum(self._sentence_spaces, extracted_spaces))
+        bounds = overlap_ratio * 0.6 + (2.0 * shared / (len(extracted) + self._sentence_lengths)) * 0.4
+
+        best_ratio, best_id = MIN_EVIDENCE_RATIO, None
+        aligned = 0
+        for sentence_id in np.argsort(-bounds, kind='stable').tolist():
+            if bounds[sentence_id] < best_ratio or (best_id is None and bounds[sentence_id] == best_ratio):
+                break
+            seq_ratio = SequenceMatcher(None, extracted, self.clean_sentences[sentence_id]).ratio()
+            combined = overlap_ratio[sentence_id] * 0.6 + seq_ratio * 0.4
+            aligned += 1
+            if combined > best_ratio or (combined == best_ratio and best_id is not None and sentence_id < best_id):
+                best_ratio, best_id = combined, sentence_id
+        self.stats['sentences'] += len(self.sentences)
+        self.stats['sentences_aligned'] += aligned
+        return self.sentences[best_id] if best_id is not None else None
+
 
 class TextMatcher:
     """
@@ -47,9 +271,27 @@ class TextMatcher:
         """Initialize TextMatcher with default configuration."""
         self.min_fuzzy_ratio = 0.6  # Minimum similarity ratio (0-1)
         self.min_keyword_matches = 1  # Minimum keywords that must match
+        self.index_cache_size = 4  # Transcripts whose index is kept between calls
+        self._indexes: "OrderedDict[str, TranscriptIndex]" = OrderedDict()
+        self._index_lock = threading.Lock()
+    
+    def get_index(self, transcript: str) -> TranscriptIndex:
+        """Evidence index for a transcript, built on first use and reused by later validations."""
+        with self._index_lock:
+            index = self._indexes.get(transcript)
+            if index is not None:
+                self._indexes.move_to_end(transcript)
+                return index
+        index = TranscriptIndex(transcript)
+        with self._index_lock:
+            self._indexes[transcript] = index
+            while len(self._indexes) > self.index_cache_size:
+                self._indexes.popitem(last=False)
+        return index
     
     def validate_extraction(self, extracted_text: str, transcript: str, 
-                          extraction_type: str = 'action') -> Dict:
+                          extraction_type: str = 'action',
+                          index: Optional[TranscriptIndex] = None) -> Dict:
         """
         Validate that extracted text has evidence in the transcript.
         
@@ -57,6 +299,7 @@ class TextMatcher:
             extracted_text: The text extracted by AI (task, decision, etc.)
             transcript: The full source transcript
             extraction_type: Type of extraction ('action', 'decision', 'risk')
+            index: Prebuilt index of `transcript` (looked up or built when omitted)
             
         Returns:
             Dictionary with:
@@ -65,14 +308,15 @@ class TextMatcher:
             - evidence_quote: best matching quote from transcript
             - match_details: breakdown of what matched
         """
-        # Normalize texts
+        # Normalize extraction; the transcript is normalized once in its index
         extracted_clean = self._normalize_text(extracted_text)
-        transcript_clean = self._normalize_text(transcript)
+        if index is None:
+            index = self.get_index(transcript)
         
         # Calculate confidence score (0-100)
-        fuzzy_score = self._calculate_fuzzy_match(extracted_clean, transcript_clean)
-        keyword_score = self._calculate_keyword_score(extracted_clean, transcript_clean, extraction_type)
-        evidence_quote = self._find_best_evidence(extracted_clean, transcript)
+        fuzzy_score = self._calculate_fuzzy_match(extracted_clean, index)
+        keyword_score = self._calculate_keyword_score(extracted_clean, index, extraction_type)
+        evidence_quote = self._find_best_evidence(extracted_clean, index)
         quote_score = 40 if evidence_quote else 0
         
         # Weighted confidence score (FIXED: More weight on fuzzy match)
@@ -110,48 +354,36 @@ class TextMatcher:
     
     def _normalize_text(self, text: str) -> str:
         """Normalize text for comparison: lowercase, remove extra whitespace."""
-        if not text:
-            return ""
-        # Lowercase and normalize whitespace
-        normalized = re.sub(r'\s+', ' ', text.lower().strip())
-        return normalized
+        return _normalize(text)
     
-    def _calculate_fuzzy_match(self, extracted: str, transcript: str) -> float:
+    def _calculate_fuzzy_match(self, extracted: str, index: TranscriptIndex) -> float:
         """
         Calculate fuzzy match score using sliding window.
         
         Returns:
             Score 0-100 based on best substring match
         """
-        if not extracted or not transcript:
+        if not extracted or not index.clean:
             return 0.0
         
         # Extract key words (ignore common words)
-        stop_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for'}
-        key_words = [w for w in extracted.split() if w not in stop_words and len(w) > 2]
+        key_words = [w for w in extracted.split() if w not in STOP_WORDS and len(w) > 2]
         
         if not key_words:
             return 0.0
         
         # Check if key words appear in transcript
-        words_found = sum(1 for word in key_words if word in transcript)
+        words_found = sum(1 for word in key_words if index.contains(word))
         word_match_ratio = words_found / len(key_words)
         
-        # Sliding window to find best matching substring
-        window_size = len(extracted)
-        words = transcript.split()
-        best_ratio = 0.0
-        
-        for i in range(len(words) - len(key_words) + 1):
-            window = ' '.join(words[i:i + len(key_words) + 5])  # Allow some extra context
-            ratio = SequenceMatcher(None, extracted, window).ratio()
-            best_ratio = max(best_ratio, ratio)
+        # Best matching window of key-word count + 5 words (allow some extra context)
+        best_ratio = index.best_window_ratio(extracted, len(key_words))
         
         # Combine word presence and sequence matching
         fuzzy_score = (word_match_ratio * 0.7 + best_ratio * 0.3) * 100
         return min(fuzzy_score, 100.0)
     
-    def _calculate_keyword_score(self, extracted: str, transcript: str, 
+    def _calculate_keyword_score(self, extracted: str, index: TranscriptIndex, 
                                  extraction_type: str) -> float:
         """
         Calculate score based on presence of relevant keywords.
@@ -178,7 +410,7 @@ class TextMatcher:
         
         # FIXED: Score based on percentage of EXTRACTED keywords found in transcript
         # (Not percentage of entire keyword catalog)
-        matching_keywords = [kw for kw in extracted_keywords if kw in transcript]
+        matching_keywords = [kw for kw in extracted_keywords if index.contains(kw)]
         
         if not matching_keywords:
             # Extracted text has keywords but none appear in transcript - suspicious
@@ -188,53 +420,19 @@ class TextMatcher:
         keyword_score = (len(matching_keywords) / len(extracted_keywords)) * 100
         return min(keyword_score, 100.0)
     
-    def _find_best_evidence(self, extracted: str, transcript: str) -> Optional[str]:
+    def _find_best_evidence(self, extracted: str, index: TranscriptIndex) -> Optional[str]:
         """
         Find the best matching quote from transcript as evidence.
         
+        Sentences are scored 60% on word overlap and 40% on sequence
+        similarity; the index only aligns sentences that could still win.
+        
         Returns:
             Best matching sentence/phrase from transcript, or None
         """
-        if not extracted or not transcript:
-            return None
-        
-        # Split transcript into sentences
-        sentences = re.split(r'[.!?]+', transcript)
-        sentences = [s.strip() for s in sentences if len(s.strip()) > 10]
-        
-        if not sentences:
+        if not extracted or not index.transcript:
             return None
-        
-        # Find sentence with highest similarity
-        best_match = None
-        best_ratio = 0.0
-        
-        extracted_words = set(self._normalize_text(extracted).split())
-        
-        for sentence in sentences:
-            sentence_clean = self._normalize_text(sentence)
-            sentence_words = set(sentence_clean.split())
-            
-            # Calculate word overlap
-            if not sentence_words:
-                continue
-                
-            overlap = len(extracted_words & sentence_words)
-            overlap_ratio = overlap / len(extracted_words) if extracted_words else 0
-            
-            # Also check sequence similarity
-            seq_ratio = SequenceMatcher(None, 
-                                       self._normalize_text(extracted), 
-                                       sentence_clean).ratio()
-            
-            # Combined score
-            combined_ratio = overlap_ratio * 0.6 + seq_ratio * 0.4
-            
-            if combined_ratio > best_ratio and combined_ratio > 0.3:  # Minimum threshold
-                best_ratio = combined_ratio
-                best_match = sentence.strip()
-        
-        return best_match if best_ratio > 0.3 else None
+        return index.best_sentence(self._normalize_text(extracted))
     
     def validate_task_list(self, tasks: List[Dict], transcript: str) -> List[Dict]:
         """
@@ -248,6 +446,7 @@ class TextMatcher:
             Filtered list containing only validated tasks with validation metadata
         """
         validated_tasks = []
+        index = self.get_index(transcript)
         
         for i, task in enumerate(tasks):
             # Extract task text (handle different field names)
@@ -258,7 +457,7 @@ class TextMatcher:
                 continue
             
             # Validate against transcript
-            validation = self.validate_extraction(task_text, transcript, 'action')
+            validation = self.validate_extraction(task_text, transcript, 'action', index=index)
             
             # Only keep tasks that pass validation
             if validation['is_valid']:
@@ -27,6 +27,7 @@ if TYPE_CHECKING:
 from models import Session, Segment
 from app import db
 from services.session_service import SessionService
+from services.speech_compactor import get_speech_compactor
 from datetime import datetime
 import numpy as np
 
@@ -138,6 +139,7 @@ class TranscriptionService:
         self.whisper_service = WhisperStreamingService(transcription_config)
         
         self.audio_processor = AudioProcessor()
+        self.speech_compactor = get_speech_compactor()
         
         # 🔥 PHASE 3: Initialize audio quality analyzer
         quality_config = QualityEnhancementConfig(
@@ -484,6 +486,7 @@ class TranscriptionService:
         # Cleanup
         del self.active_sessions[session_id]
         del self.session_callbacks[session_id]
+        self.speech_compactor.release(session_id)
         
         # 🔥 PHASE 4: Unregister session from performance optimizer
         try:
@@ -1188,6 +1191,7 @@ class TranscriptionService:
             'stats': session_data['stats'],
             'vad_stats': vad_stats,
             'whisper_stats': whisper_stats,
+            'compaction': self.speech_compactor.get_session_stats(session_id),
             'pending_processing': session_data['pending_processing']
         }
     
@@ -1432,7 +1436,7 @@ class TranscriptionService:
             
             # VAD check for finalization decisions
             vad_result = self.vad_service.process_audio_chunk(audio_data, timestamp)
-            logger.debug(f"VAD Result for session {session_id}: is_speech={vad_result.is_speech}, confidence={vad_result.confidence}")
+            logger.debug("VAD Result for session %s: is_speech=%s, confidence=%s", session_id, vad_result.is_speech, vad_result.confidence)
             
             # 🔥 PERFORMANCE MONITORING: Track chunk processing start
             chunk_start_time = time.time()
@@ -1441,9 +1445,12 @@ class TranscriptionService:
             state.setdefault('audio_buffer', [])
             state.setdefault('buffer_duration', 0.0)
             
-            # Add audio to buffer
+            # Add audio to buffer, remembering the VAD decision for compaction
             chunk_duration = len(audio_data) / (16000 * 2)  # Estimate duration for 16kHz 16-bit mono
+            if not state['audio_buffer']:
+                state['buffer_start'] = now
             state['audio_buffer'].append(audio_data)
+            state.setdefault('buffer_speech', []).append(bool(getattr(vad_result, 'is_speech', True)))
             state['buffer_duration'] += chunk_duration
             
             # Only process when we have enough buffered audio (2+ seconds or 5+ chunks)
@@ -1453,18 +1460,30 @@ class TranscriptionService:
             )
             
             if not should_process:
-                logger.debug(f"🔄 Buffering audio: {len(state['audio_buffer'])} chunks, {state['buffer_duration']:.2f}s")
+                logger.debug("🔄 Buffering audio: %d chunks, %.2fs", len(state['audio_buffer']), state['buffer_duration'])
                 return None
                 
-            # Combine buffered audio into single chunk with proper WAV format
-            combined_audio = self._create_wav_from_chunks(state['audio_buffer'])
+            # Drop or shorten silent spans before paying for them; skip the call when nothing was speech
+            compaction = self.speech_compactor.compact(
+                list(zip(state['audio_buffer'], state['buffer_speech'])),
+                base_time=state.get('buffer_start', now), session_id=session_id
+            )
             
             # Clear buffer
             state['audio_buffer'] = []
+            state['buffer_speech'] = []
             state['buffer_duration'] = 0.0
             
+            if not compaction.has_speech:
+                logger.debug("🔇 Skipping Whisper for session %s: %.2fs buffer without speech",
+                             session_id, compaction.original_seconds)
+                return None
+            
+            # Combine compacted audio into single chunk with proper WAV format
+            combined_audio = self._create_wav_from_chunks([compaction.audio])
+            
             # Process combined audio with Whisper API
-            logger.info(f"🎤 WHISPER API CALL: Sending buffered audio to Whisper for session {session_id}, combined size: {len(combined_audio)} bytes")
+            logger.info("🎤 WHISPER API CALL: Sending buffered audio to Whisper for session %s, combined size: %d bytes", session_id, len(combined_audio))
             res = self.whisper_service.transcribe_chunk_sync(
                 audio_data=combined_audio,
                 session_id=session_id
@@ -1490,11 +1509,16 @@ class TranscriptionService:
                 logger.warning(f"⚠️ WHISPER API returned empty text for session {session_id}: {res} (latency: {processing_latency_ms:.2f}ms)")
                 return None
             else:
-                logger.info(f"✅ WHISPER SUCCESS: Got text '{res['text'][:100]}...' for session {session_id} (latency: {processing_latency_ms:.2f}ms)")
+                logger.info("✅ WHISPER SUCCESS: Got text '%.100s...' for session %s (latency: %.2fms)", res['text'], session_id, processing_latency_ms)
                 # 🔥 PERFORMANCE: Record successful transcription
                 if hasattr(self, 'performance_monitor') and self.performance_monitor:
                     self.performance_monitor.record_transcription_result(session_id, True, res.get('confidence', 0.8))
                 
+            # Word/segment timestamps refer to the compacted audio; move them onto meeting time
+            for key in ('words', 'segments'):
+                if res.get(key):
+                    res[key] = compaction.offset_map.project(res[key])
+            
             # 2) CRITICAL QUALITY FILTERING - Apply before updating buffer
             text = res['text'].strip()
             conf = float(res.get('confidence', 0.8))
@@ -1504,7 +1528,7 @@ class TranscriptionService:
                 if self._is_repetitive_text(text):
                     # 🔇 REDUCED NOISE: Only log repetitive text warnings for debugging
                     if len(text.split()) > 2:  # Only log significant repetitions
-                        logger.debug(f"Quality: Filtered repetitive text ({len(text.split())} words)")
+                        logger.debug("Quality: Filtered repetitive text (%d words)", len(text.split()))
                     return None
                 
                 # Filter 2: Check for duplicates of recent text - TEMPORARILY DISABLED FOR DEBUGGING
@@ -1513,10 +1537,10 @@ class TranscriptionService:
                     state['stats'].setdefault('dedupe_hits', 0)
                     state['stats']['dedupe_hits'] += 1
                     # 🔇 REDUCED NOISE: Minimal duplicate logging
-                    logger.debug(f"DUPLICATE FILTER: Filtered duplicate text for session {session_id}: '{text}'")
+                    logger.debug("DUPLICATE FILTER: Filtered duplicate text for session %s: '%s'", session_id, text)
                     return None
                 else:
-                    logger.info(f"🔧 ITER3: DUPLICATE FILTER BYPASSED for '{text}'")
+                    logger.debug("🔧 ITER3: DUPLICATE FILTER BYPASSED for '%s'", text)
                 
                 # Filter 3: 🔥 ITER3 - CONFIDENCE FILTER TEMPORARILY DISABLED
                 vad_dict = {'is_speech': getattr(vad_result, 'is_speech', True), 'confidence': getattr(vad_result, 'confidence', 0.8)} if vad_result else {'is_speech': True, 'confidence': 0.8}
@@ -1532,19 +1556,19 @@ class TranscriptionService:
                         state['stats']['adaptive_conf_adjustments'] += 1
                     
                     # 🔇 REDUCED NOISE: Only log low confidence when significant
-                    logger.debug(f"CONFIDENCE FILTER: Suppressed low confidence text for session {session_id}: '{text}' (conf: {conf:.2f} < {adaptive_conf:.2f})")
+                    logger.debug("CONFIDENCE FILTER: Suppressed low confidence text for session %s: '%s' (conf: %.2f < %.2f)", session_id, text, conf, adaptive_conf)
                     return None
                 else:
-                    logger.info(f"🔧 ITER3: CONFIDENCE FILTER BYPASSED for '{text}' (conf: {conf:.2f})")
+                    logger.debug("🔧 ITER3: CONFIDENCE FILTER BYPASSED for '%s' (conf: %.2f)", text, conf)
                 
                 # Filter 4: Minimum meaningful length (more permissive) - RELAXED
                 if len(text.strip()) < 1:
-                    logger.debug(f"SYNC QUALITY FILTER: Rejected empty text for session {session_id}: '{text}'")
+                    logger.debug("SYNC QUALITY FILTER: Rejected empty text for session %s: '%s'", session_id, text)
                     return None
                 
                 # 🔥 ITER3: EMERGENCY SEGMENT CREATION - Force every text through
                 if len(text.strip()) >= 1:  # Accept ANY non-empty text
-                    logger.info(f"🚨 ITER3 EMERGENCY: Force finalizing '{text}' - bypassing all filters!")
+                    logger.debug("🚨 ITER3 EMERGENCY: Force finalizing '%s' - bypassing all filters!", text)
                     self._persist_segment(session_id, text, conf, time.time())
                     return {
                         'text': text,
@@ -1553,7 +1577,7 @@ class TranscriptionService:
                         'timestamp': time.time()
                     }
                 
-                logger.info(f"SYNC QUALITY CHECK PASSED for session {session_id}: '{text}' (confidence: {conf:.2f})")
+                logger.info("SYNC QUALITY CHECK PASSED for session %s: '%s' (confidence: %.2f)", session_id, text, conf)
                 
                 # Quality check passed - append to rolling buffer
                 buf += (' ' if buf and text else '') + text
@@ -1574,7 +1598,7 @@ class TranscriptionService:
                 # This ensures transcription results always reach the frontend
                 if not emit_interim and not finalize and buf.strip():
                     emit_interim = True
-                    logger.info(f"🔧 FORCED INTERIM: Ensuring output for session {session_id}: '{buf}'")
+                    logger.info("🔧 FORCED INTERIM: Ensuring output for session %s: '%s'", session_id, buf)
                 
                 if finalize:
                     # FINAL: Additional quality check on final buffer
@@ -3,15 +3,107 @@ UserMatchingService - Resolve speaker/owner names to user IDs
 
 Maps names mentioned in transcripts (e.g., "Sarah", "John") to actual user IDs
 or stores them as metadata when users don't exist yet.
+
+Lookups run against a per-workspace in-memory WorkspaceNameIndex built once
+from the active members: exact name tokens, nickname canonical forms,
+Soundex keys and character trigrams, each a dict from key to user ids. A
+reference is resolved token by token from those dicts, so the cost does not
+grow with workspace size except for the trigram fallback, which only counts
+the (capped) posting lists of the reference's own trigrams. Indexes are
+dropped when a member is added, removed or renamed (on commit) and expire
+after USER_MATCH_INDEX_TTL seconds so changes made by other processes are
+picked up too.
 """
 
 import logging
 import os
-from typing import Optional, List, Dict
-from dataclasses import dataclass
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict, defaultdict
+from itertools import groupby
+from typing import Optional, List, Dict, Iterable, Set, Tuple
+from dataclasses import dataclass, field
+
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
+UNASSIGNED_NAMES = {'not specified', 'unknown', 'none', ''}
+
+# Per-token evidence weights
+EXACT_WEIGHT = 1.0
+NICKNAME_WEIGHT = 0.9
+PHONETIC_WEIGHT = 0.6
+PHONETIC_SPELLING_BONUS = 0.3   # Scaled by trigram similarity
+FUZZY_WEIGHT = 0.8              # Scaled by trigram similarity
+MIN_TRIGRAM_SIMILARITY = 0.4
+FUZZY_CANDIDATES = 30      # Name tokens scored exactly per misspelled token
+TOKEN_CACHE_SIZE = 4096     # Scored tokens kept per workspace index
+METHOD_STRENGTH = ['fuzzy', 'phonetic', 'nickname', 'exact_name', 'exact_full_name']
+
+HONORIFICS = {'mr', 'mrs', 'ms', 'miss', 'dr', 'prof', 'sir', 'madam'}
+
+# Nickname -> canonical first name
+NICKNAMES = {
+    'abby': 'abigail', 'al': 'albert', 'alex': 'alexander', 'andy': 'andrew', 'drew': 'andrew',
+    'tony': 'anthony', 'becky': 'rebecca', 'ben': 'benjamin', 'benny': 'benjamin', 'bill': 'william',
+    'billy': 'william', 'will': 'william', 'liam': 'william', 'bob': 'robert', 'bobby': 'robert',
+    'rob': 'robert', 'robbie': 'robert', 'bert': 'robert', 'cathy': 'catherine', 'kate': 'catherine',
+    'katie': 'catherine', 'chris': 'christopher', 'dan': 'daniel', 'danny': 'daniel', 'dave': 'david',
+    'davy': 'david', 'deb': 'deborah', 'debbie': 'deborah', 'dick': 'richard', 'rick': 'richard',
+    'rich': 'richard', 'ed': 'edward', 'eddie': 'edward', 'ted': 'edward', 'liz': 'elizabeth',
+    'beth': 'elizabeth', 'betty': 'elizabeth', 'lizzie': 'elizabeth', 'eliza': 'elizabeth',
+    'frank': 'francis', 'fred': 'frederick', 'greg': 'gregory', 'hank': 'henry', 'harry': 'henry',
+    'jack': 'john', 'johnny': 'john', 'jim': 'james', 'jimmy': 'james', 'jamie': 'james',
+    'jen': 'jennifer', 'jenny': 'jennifer', 'jeff': 'jeffrey', 'jerry': 'gerald', 'joe': 'joseph',
+    'joey': 'joseph', 'jon': 'jonathan', 'josh': 'joshua', 'ken': 'kenneth', 'kenny': 'kenneth',
+    'larry': 'lawrence', 'leo': 'leonard', 'len': 'leonard', 'maggie': 'margaret', 'meg': 'margaret',
+    'peggy': 'margaret', 'matt': 'matthew', 'mike': 'michael', 'mikey': 'michael', 'mick': 'michael',
+    'nate': 'nathan', 'nick': 'nicholas', 'pat': 'patrick', 'patty': 'patricia', 'trish': 'patricia',
+    'pete': 'peter', 'phil': 'philip', 'ray': 'raymond', 'ron': 'ronald', 'ronnie': 'ronald',
+    'sam': 'samuel', 'sammy': 'samuel', 'sandy': 'sandra', 'steve': 'steven', 'stevie': 'steven',
+    'stephen': 'steven', 'sue': 'susan', 'suzy': 'susan', 'tom': 'thomas', 'tommy': 'thomas',
+    'tim': 'timothy', 'timmy': 'timothy', 'vicky': 'victoria', 'tori': 'victoria', 'val': 'valerie',
+    'walt': 'walter', 'zach': 'zachary', 'zack': 'zachary',
+}
+
+# Soundex digit per letter; vowels (and y) separate runs, h and w are dropped
+_SOUNDEX_TABLE = str.maketrans(
+    'bfpvcgjkqsxzdtlmnraeiouyhw', '11112222222233455600000000', ''
+)
+_SOUNDEX_TABLE.update({ord('h'): None, ord('w'): None})
+_TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+_POSSESSIVE_PATTERN = re.compile(r"'s\b")
+
+
+def normalize_name(text: str) -> List[str]:
+    """Lowercase ASCII name tokens without accents, possessives or honorifics."""
+    if not text.isascii():
+        text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+    text = _POSSESSIVE_PATTERN.sub('', text.lower())
+    return [token for token in _TOKEN_PATTERN.findall(text) if token not in HONORIFICS]
+
+
+def canonical_name(token: str) -> str:
+    return NICKNAMES.get(token, token)
+
+
+def soundex(token: str) -> str:
+    """American Soundex code of a lowercase alphabetic token ('' otherwise)."""
+    if not token.isalpha():
+        return ''
+    first = token[0]
+    coded = (first.translate(_SOUNDEX_TABLE) or '0') + token[1:].translate(_SOUNDEX_TABLE)
+    digits = [digit for digit, _ in groupby(coded)][1:]   # Runs after the first letter's own
+    return (first.upper() + ''.join(digit for digit in digits if digit != '0'))[:4].ljust(4, '0')
+
+
+def trigrams(token: str) -> Set[str]:
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
 
 @dataclass
 class UserMatchResult:
@@ -23,25 +115,217 @@ class UserMatchResult:
     match_method: str
 
 
+@dataclass
+class WorkspaceNameIndex:
+    """Name lookup tables for one workspace's members."""
+    workspace_id: Optional[int]
+    names: Dict[int, str] = field(default_factory=dict)                       # user_id -> display label
+    full_names: Dict[str, Set[int]] = field(default_factory=lambda: defaultdict(set))
+    tokens: Dict[str, Set[int]] = field(default_factory=lambda: defaultdict(set))
+    nicknames: Dict[str, Set[int]] = field(default_factory=lambda: defaultdict(set))
+    phonetic: Dict[str, Set[int]] = field(default_factory=lambda: defaultdict(set))
+    trigram_postings: Dict[str, np.ndarray] = field(default_factory=lambda: defaultdict(list))   # Arrays once built
+    token_ids: Dict[int, Tuple[int, str]] = field(default_factory=dict)        # posting id -> (user_id, token)
+    built_at: float = field(default_factory=time.monotonic)
+    max_posting_fraction: float = 0.01
+    _token_scores: Dict[str, Tuple[Dict[int, float], Dict[int, str]]] = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def build(cls, workspace_id: Optional[int], members: Iterable[Tuple]) -> "WorkspaceNameIndex":
+        """
+        Args:
+            workspace_id: Workspace the members belong to
+            members: (user_id, first_name, last_name, display_name, username, email) rows
+        """
+        index = cls(workspace_id)
+        features: Dict[str, Tuple[str, str, Set[str]]] = {}   # Per distinct token: canonical, soundex, trigrams
+        seen_tokens: Set[Tuple[int, str]] = set()
+        for user_id, first_name, last_name, display_name, username, email in members:
+            full = ' '.join(part for part in (first_name, last_name) if part)
+            index.names[user_id] = display_name or full or username or str(user_id)
+
+            labels = {full, display_name, username, (email or '').split('@')[0]}
+            for label in labels:
+                label_tokens = normalize_name(label or '')
+                if label_tokens:
+                    index.full_names[' '.join(label_tokens)].add(user_id)
+                for token in label_tokens:
+                    if (user_id, token) in seen_tokens:
+                        continue
+                    seen_tokens.add((user_id, token))
+                    index.tokens[token].add(user_id)
+                    if not token.isalpha():
+                        continue   # Ids in usernames/emails only match exactly
+                    if token not in features:
+                        features[token] = (canonical_name(token), soundex(token), trigrams(token))
+                    canonical, code, grams = features[token]
+                    index.nicknames[canonical].add(user_id)
+                    index.phonetic[code].add(user_id)
+                    posting = len(index.token_ids)
+                    index.token_ids[posting] = (user_id, token)
+                    for gram in grams:
+                        index.trigram_postings[gram].append(posting)
+        index.trigram_postings = {gram: np.array(postings, dtype=np.int32)
+                                  for gram, postings in index.trigram_postings.items()}
+        return index
+
+    def __len__(self):
+        return len(self.names)
+
+    def score_token(self, token: str) -> Tuple[Dict[int, float], Dict[int, str]]:
+        """Best weight and its method per user for one reference token (memoized per index)."""
+        cached = self._token_scores.get(token)
+        if cached is not None:
+            return cached
+        weights: Dict[int, float] = dict.fromkeys(self.tokens.get(token, ()), EXACT_WEIGHT)
+        methods: Dict[int, str] = dict.fromkeys(weights, 'exact_name')
+        for user_id in self.nicknames.get(canonical_name(token), ()):
+            if user_id not in weights:
+                weights[user_id], methods[user_id] = NICKNAME_WEIGHT, 'nickname'
+        # Misheard or misspelled: sounds-alike members, ranked by spelling similarity when nothing matched exactly
+        similar = self._fuzzy(token) if not weights and len(token) >= 3 and token.isalpha() else {}
+        for user_id in self.phonetic.get(soundex(token), ()):
+            if user_id not in weights:
+                weights[user_id] = PHONETIC_WEIGHT + PHONETIC_SPELLING_BONUS * similar.get(user_id, 0.0)
+                methods[user_id] = 'phonetic'
+        for user_id, similarity in similar.items():
+            if user_id not in weights:
+                weights[user_id], methods[user_id] = FUZZY_WEIGHT * similarity, 'fuzzy'
+        if len(self._token_scores) >= TOKEN_CACHE_SIZE:
+            self._token_scores.clear()
+        self._token_scores[token] = (weights, methods)
+        return weights, methods
+
+    def _fuzzy(self, token: str) -> Dict[int, float]:
+        """
+        Best trigram (Jaccard) similarity per user above MIN_TRIGRAM_SIMILARITY.
+
+        Candidates are the name tokens sharing the most of the reference's
+        trigrams, counted over postings no longer than max_posting_fraction
+        of all tokens; only those candidates are scored exactly.
+        """
+        grams = trigrams(token)
+        limit = max(50, int(len(self.token_ids) * self.max_posting_fraction))
+        selected = []
+        skipped = 0
+        for gram in grams:
+            postings = self.trigram_postings.get(gram)
+            if postings is not None and len(postings) > limit:
+                skipped += 1
+            elif postings is not None:
+                selected.append(postings)
+        if not selected:
+            return {}
+        postings, shared = np.unique(np.concatenate(selected), return_counts=True)
+        # Jaccard >= MIN_TRIGRAM_SIMILARITY needs at least that share of the reference's trigrams in common
+        keep = shared >= MIN_TRIGRAM_SIMILARITY * len(grams) - skipped
+        postings, shared = postings[keep], shared[keep]
+        if len(postings) > FUZZY_CANDIDATES:
+            postings = postings[np.argpartition(-shared, FUZZY_CANDIDATES - 1)[:FUZZY_CANDIDATES]]
+        weights: Dict[int, float] = {}
+        for posting in postings.tolist():
+            user_id, name_token = self.token_ids[posting]
+            other = trigrams(name_token)
+            similarity = len(grams & other) / len(grams | other)
+            if similarity >= MIN_TRIGRAM_SIMILARITY and similarity > weights.get(user_id, 0.0):
+                weights[user_id] = similarity
+        return weights
+
+    def candidates(self, name_reference: str, limit: int = 5) -> List[UserMatchResult]:
+        """
+        Rank members for a name reference.
+
+        A full-name hit scores 1.0; otherwise each reference token contributes
+        its best evidence and a member's score is the mean over the tokens.
+        A member's confidence is its score divided by the number of members
+        scoring at least as high, so an ambiguous first name never resolves
+        on its own.
+
+        Args:
+            name_reference: Name as mentioned (e.g. "Sarah", "Bob Smith")
+            limit: Maximum number of results
+
+        Returns:
+            Results ordered by confidence, best first
+        """
+        tokens = normalize_name(name_reference)
+        if not tokens:
+            return []
+
+        exact = self.full_names.get(' '.join(tokens))
+        if exact:
+            totals = dict.fromkeys(exact, float(len(tokens)))
+            per_token = [({}, dict.fromkeys(exact, 'exact_full_name'))]
+        else:
+            per_token = [self.score_token(token) for token in tokens]
+            totals = per_token[0][0]
+            if len(per_token) > 1:
+                totals = dict(totals)
+                for weights, _ in per_token[1:]:
+                    for user_id, weight in weights.items():
+                        totals[user_id] = totals.get(user_id, 0.0) + weight
+        if not totals:
+            return []
+
+        user_ids = np.fromiter(totals.keys(), dtype=np.int64, count=len(totals))
+        values = np.fromiter(totals.values(), dtype=float, count=len(totals))
+        if len(values) > limit:
+            best = np.argpartition(-values, limit - 1)[:limit]
+        else:
+            best = np.arange(len(values))
+        best = best[np.lexsort((user_ids[best], -values[best]))]
+        top = [(int(user_ids[i]), float(values[i])) for i in best]
+        ties = int(np.count_nonzero(values >= top[0][1] - 1e-9))
+        results = []
+        for user_id, total in top:
+            rivals = int(np.count_nonzero(values >= total - 1e-9))   # Members at least as likely
+            if ties > 1:
+                method = 'ambiguous'
+            else:   # Report the weakest evidence used
+                method = min((methods[user_id] for _, methods in per_token if user_id in methods),
+                             key=METHOD_STRENGTH.index)
+            results.append(UserMatchResult(
+                success=True,
+                user_id=user_id,
+                user_name=self.names[user_id],
+                match_confidence=round(total / len(tokens) / rivals, 3),
+                match_method=method
+            ))
+        return results
+
+
 class UserMatchingService:
     """Service for matching names to users"""
-    
-    def __init__(self):
+
+    def __init__(self, min_confidence: Optional[float] = None, index_ttl: Optional[float] = None,
+                 max_workspaces: Optional[int] = None):
         """Initialize user matching service"""
-        pass
-    
-    def match_user(self, name_reference: str, session_id: Optional[int] = None) -> UserMatchResult:
+        self.min_confidence = (min_confidence if min_confidence is not None
+                               else float(os.environ.get('USER_MATCH_MIN_CONFIDENCE', 0.7)))
+        self.index_ttl = index_ttl if index_ttl is not None else float(os.environ.get('USER_MATCH_INDEX_TTL', 600))
+        self.max_workspaces = max_workspaces or int(os.environ.get('USER_MATCH_MAX_WORKSPACES', 256))
+        self._indexes: "OrderedDict[Optional[int], WorkspaceNameIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'lookups': 0, 'matched': 0, 'index_builds': 0, 'invalidations': 0}
+
+    # =========================================================================
+    # MATCHING
+    # =========================================================================
+
+    def match_user(self, name_reference: str, session_id: Optional[int] = None,
+                   workspace_id: Optional[int] = None) -> UserMatchResult:
         """
         Match a name reference to a user ID.
-        
+
         Args:
             name_reference: Name mentioned in transcript (e.g., "Sarah", "John Smith")
-            session_id: Optional session ID for context
-            
+            session_id: Optional session ID; its workspace is searched
+            workspace_id: Workspace to search (takes precedence over session_id)
+
         Returns:
             UserMatchResult with user_id if found, or None with name stored
         """
-        if not name_reference or name_reference.strip().lower() in ['not specified', 'unknown', 'none', '']:
+        if not name_reference or name_reference.strip().lower() in UNASSIGNED_NAMES:
             return UserMatchResult(
                 success=False,
                 user_id=None,
@@ -49,53 +333,220 @@ class UserMatchingService:
                 match_confidence=0.0,
                 match_method="no_name_provided"
             )
-        
-        name_clean = name_reference.strip()
-        
-        # For now, return None and store the name in extraction_context
-        # Future: Implement actual user lookup from database
-        # TODO: Query User table for matching names (fuzzy match)
-        # TODO: Consider session participants if available
-        # TODO: Allow user to confirm/correct assignments via UI
-        
-        logger.debug(f"User matching: '{name_clean}' - storing as metadata (no user lookup yet)")
-        
+
+        if workspace_id is None and session_id is not None:
+            workspace_id = self._session_workspace(session_id)
+        return self._resolve(name_reference.strip(), workspace_id)
+
+    def match_candidates(self, name_reference: str, workspace_id: Optional[int], limit: int = 5) -> List[UserMatchResult]:
+        """Ranked candidate members for a name reference, best first."""
+        index = self.get_index(workspace_id)
+        return index.candidates(name_reference, limit) if index is not None else []
+
+    def match_users(self, name_references: Iterable[str], session_id: Optional[int] = None,
+                    workspace_id: Optional[int] = None) -> Dict[str, UserMatchResult]:
+        """
+        Resolve many name references with one workspace lookup and one index.
+
+        Args:
+            name_references: Names as mentioned; duplicates are resolved once
+            session_id: Optional session ID; its workspace is searched
+            workspace_id: Workspace to search (takes precedence over session_id)
+
+        Returns:
+            Dict of reference -> UserMatchResult
+        """
+        if workspace_id is None and session_id is not None:
+            workspace_id = self._session_workspace(session_id)
+        results = {}
+        for reference in name_references:
+            if reference not in results:
+                results[reference] = self.match_user(reference, workspace_id=workspace_id)
+        return results
+
+    def resolve_transcript_names(self, texts: Iterable[str], session_id: Optional[int] = None,
+                                 workspace_id: Optional[int] = None) -> Dict[str, UserMatchResult]:
+        """
+        Find every capitalized name mention in transcript text that resolves to a member.
+
+        Speaker prefixes ("Sarah: ...") and capitalized one- or two-word
+        mentions are collected across all texts and resolved in one batch.
+
+        Args:
+            texts: Segment texts or a list with the whole transcript
+            session_id: Optional session ID; its workspace is searched
+            workspace_id: Workspace to search (takes precedence over session_id)
+
+        Returns:
+            Dict of mention -> successful UserMatchResult
+        """
+        mentions: Dict[str, None] = {}
+        for text in texts:
+            speaker = self.extract_speaker_from_segment(text)
+            if speaker:
+                mentions[speaker] = None
+            for match in re.finditer(r'\b([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)\b', text):
+                mentions[match.group(1)] = None
+        results = self.match_users(mentions, session_id=session_id, workspace_id=workspace_id)
+        return {mention: result for mention, result in results.items() if result.success}
+
+    def _resolve(self, name_clean: str, workspace_id: Optional[int]) -> UserMatchResult:
+        self.stats['lookups'] += 1
+        index = self.get_index(workspace_id) if workspace_id is not None else None
+        if index is None:
+            logger.debug(f"User matching: '{name_clean}' - no workspace context, storing as metadata")
+            return UserMatchResult(False, None, name_clean, 0.0, "name_stored_only")
+
+        candidates = index.candidates(name_clean, limit=1)
+        if candidates and candidates[0].match_confidence >= self.min_confidence:
+            self.stats['matched'] += 1
+            return candidates[0]
+
+        best = candidates[0] if candidates else None
+        logger.debug(f"User matching: '{name_clean}' - no confident match"
+                     + (f" (best {best.user_name} at {best.match_confidence})" if best else ""))
         return UserMatchResult(
-            success=False,  # No actual user ID match yet
+            success=False,
             user_id=None,
             user_name=name_clean,
-            match_confidence=0.0,
-            match_method="name_stored_only"
+            match_confidence=best.match_confidence if best else 0.0,
+            match_method=best.match_method if best and best.match_method == 'ambiguous' else "no_match"
         )
-    
+
+    # =========================================================================
+    # INDEX CACHE
+    # =========================================================================
+
+    def get_index(self, workspace_id: Optional[int]) -> Optional[WorkspaceNameIndex]:
+        """The workspace's name index, built on first use or after invalidation/expiry."""
+        with self._lock:
+            index = self._indexes.get(workspace_id)
+            if index is not None and time.monotonic() - index.built_at < self.index_ttl:
+                self._indexes.move_to_end(workspace_id)
+                return index
+
+        try:
+            index = self.build_index(workspace_id)
+        except Exception as e:
+            logger.warning(f"Could not build name index for workspace {workspace_id}: {e}")
+            return None
+
+        with self._lock:
+            self._indexes[workspace_id] = index
+            self._indexes.move_to_end(workspace_id)
+            while len(self._indexes) > self.max_workspaces:
+                self._indexes.popitem(last=False)
+        return index
+
+    def build_index(self, workspace_id: Optional[int]) -> WorkspaceNameIndex:
+        """Load the workspace's active members and index their names."""
+        from sqlalchemy import select
+        from models import db
+        from models.user import User
+
+        started = time.perf_counter()
+        rows = db.session.execute(
+            select(User.id, User.first_name, User.last_name, User.display_name, User.username, User.email)
+            .where(User.workspace_id == workspace_id, User.active.is_(True))
+        ).all()
+        index = WorkspaceNameIndex.build(workspace_id, rows)
+        self.stats['index_builds'] += 1
+        logger.info(f"👥 Indexed {len(index)} members of workspace {workspace_id} "
+                    f"in {(time.perf_counter() - started) * 1000:.1f}ms")
+        return index
+
+    def invalidate(self, workspace_id: Optional[int] = None):
+        """Drop one workspace's index, or all of them."""
+        with self._lock:
+            if workspace_id is None:
+                self._indexes.clear()
+            else:
+                self._indexes.pop(workspace_id, None)
+            self.stats['invalidations'] += 1
+
+    @staticmethod
+    def _session_workspace(session_id: int) -> Optional[int]:
+        try:
+            from models import db
+            from models.session import Session
+            return db.session.query(Session.workspace_id).filter(Session.id == session_id).scalar()
+        except Exception as e:
+            logger.debug(f"Could not resolve workspace of session {session_id}: {e}")
+            return None
+
     def extract_speaker_from_segment(self, segment_text: str) -> Optional[str]:
         """
         Extract speaker name from segment text if present.
-        
+
         Example: "Sarah: Let's review the budget" → "Sarah"
-        
+
         Args:
             segment_text: Transcript segment text
-            
+
         Returns:
             Speaker name if found, None otherwise
         """
-        import re
-        
         # Pattern: "Name: text" at start of segment
         match = re.match(r'^([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)\s*:\s*', segment_text)
         if match:
             return match.group(1)
-        
+
         return None
 
 
+# =============================================================================
+# MEMBERSHIP CHANGE TRACKING
+# =============================================================================
+
+_NAME_FIELDS = ('workspace_id', 'first_name', 'last_name', 'display_name', 'username', 'email', 'active')
+
+
+def _register_membership_listeners():
+    """Invalidate a workspace's index once a commit adds, removes or renames one of its members."""
+    from sqlalchemy import event, inspect
+    from sqlalchemy.orm import Session as OrmSession
+    from models.user import User
+
+    def _touched(session, workspace_ids):
+        session.info.setdefault('user_matching_workspaces', set()).update(workspace_ids)
+
+    @event.listens_for(User, 'after_insert')
+    @event.listens_for(User, 'after_delete')
+    def _member_added_or_removed(mapper, connection, target):
+        _touched(inspect(target).session, {target.workspace_id})
+
+    @event.listens_for(User, 'after_update')
+    def _member_updated(mapper, connection, target):
+        state = inspect(target)
+        changed = [name for name in _NAME_FIELDS if state.attrs[name].history.has_changes()]
+        if changed:
+            _touched(state.session, {target.workspace_id, *state.attrs.workspace_id.history.deleted})
+
+    @event.listens_for(OrmSession, 'after_commit')
+    def _invalidate_on_commit(session):
+        workspace_ids = session.info.pop('user_matching_workspaces', None)
+        if workspace_ids and _user_matching_service is not None:
+            for workspace_id in workspace_ids:
+                _user_matching_service.invalidate(workspace_id)
+
+    @event.listens_for(OrmSession, 'after_rollback')
+    def _discard_on_rollback(session):
+        session.info.pop('user_matching_workspaces', None)
+
+
 # Singleton instance
 _user_matching_service = None
+_user_matching_service_lock = threading.Lock()
 
 def get_user_matching_service() -> UserMatchingService:
     """Get singleton user matching service instance"""
     global _user_matching_service
     if _user_matching_service is None:
-        _user_matching_service = UserMatchingService()
+        with _user_matching_service_lock:
+            if _user_matching_service is None:
+                try:
+                    _register_membership_listeners()
+                except Exception as e:
+                    logger.warning(f"Membership change tracking unavailable, relying on index TTL: {e}")
+                _user_matching_service = UserMatchingService()
     return _user_matching_service
@@ -14,16 +14,23 @@ Key Features:
 - Environmental noise profiling and adaptation
 - Advanced temporal logic with hysteresis
 - Real-time quality metrics and performance monitoring
+
+Chunks are split into fixed-size frames and transformed as one 2-D batch
+(frames × bins) with the window, frequency grid and band masks precomputed per
+service. The frame-averaged spectrum feeds every spectral feature, and only the
+previous spectrum is kept for flux. The "fast" tier (VAD_TIER=fast) skips
+spectral work for chunks whose energy alone decides the outcome.
 """
 
 import logging
+import os
 import numpy as np
 from typing import Optional, Tuple, List, Dict, Any
 from dataclasses import dataclass, field
 from collections import deque
 from enum import Enum
 import time
-from scipy import signal
+from scipy import ndimage, signal
 from scipy.stats import entropy
 
 logger = logging.getLogger(__name__)
@@ -72,6 +79,15 @@ class VADConfig:
     multi_band_analysis: bool = True
     spectral_smoothing: bool = True
     temporal_smoothing_factor: float = 0.3
+    
+    # Processing tier: 'full' always runs spectral analysis, 'fast' skips it when
+    # energy is below fast_silence_ratio × or above fast_speech_ratio × the
+    # adaptive energy threshold
+    tier: str = field(default_factory=lambda: os.environ.get('VAD_TIER', 'full'))
+    fast_silence_ratio: float = 1.0
+    fast_speech_ratio: float = 6.0
+    # Attach per-chunk feature dicts to each VADResult
+    detailed_results: bool = True
 
 @dataclass
 class NoiseProfile:
@@ -90,6 +106,81 @@ class VADResult:
         self.confidence = confidence
         self.energy = energy
         self.timestamp = timestamp
+        self.tier = 'full'  # 'fast' when energy alone decided the chunk
+
+# =============================================================================
+# BATCHED FRAME SPECTRUM
+# =============================================================================
+
+@dataclass
+class FrameSpectrum:
+    """Frame-averaged spectrum of one chunk."""
+    magnitude: np.ndarray   # mean |X| per bin
+    power: np.ndarray       # mean |X|^2 per bin
+    frame_count: int
+
+class FrameSpectrumAnalyzer:
+    """
+    Batched FFT of fixed-size frames with everything that depends only on the
+    frame size precomputed: Hann window, FFT size, frequency grid, band and
+    region masks, and the pre-emphasis magnitude response.
+    """
+    
+    PRE_EMPHASIS = 0.97
+    
+    def __init__(self, sample_rate: int, frame_size: int, frequency_bands: List[Tuple[float, float]]):
+        self.frame_size = frame_size
+        # Zero padding for better frequency resolution
+        self.n_fft = max(512, 1 << (frame_size - 1).bit_length())
+        self.window = np.hanning(frame_size).astype(np.float32)
+        self.freqs = np.fft.rfftfreq(self.n_fft, 1 / sample_rate)
+        
+        # |1 - a·e^{-jω}|: pre-emphasis applied to the spectrum instead of a second FFT
+        omega = 2 * np.pi * self.freqs / sample_rate
+        self.pre_emphasis_gain = np.abs(1 - self.PRE_EMPHASIS * np.exp(-1j * omega))
+        
+        # Band and region masks as weight vectors so each feature is one dot product
+        freqs = self.freqs
+        self.band_matrix = np.stack([
+            ((freqs >= low) & (freqs <= high)).astype(np.float64) for low, high in frequency_bands
+        ])
+        self.formant_weights = (
+            ((freqs >= 300) & (freqs <= 1000)).astype(np.float64) +   # F1 region
+            ((freqs >= 800) & (freqs <= 2500)).astype(np.float64)     # F2 region
+        )
+        self.high_freq_mask = (freqs > 4000).astype(np.float64)
+        self.low_freq_mask = (freqs < 300).astype(np.float64)
+    
+    def frames(self, audio_array: np.ndarray) -> np.ndarray:
+        """
+        Split a chunk into a (frames × frame_size) view.
+        
+        A partial trailing frame is covered by one extra frame aligned to the end
+        of the chunk, so every sample contributes.
+        """
+        count, remainder = divmod(len(audio_array), self.frame_size)
+        frames = audio_array[:count * self.frame_size].reshape(count, self.frame_size)
+        if remainder and count:
+            frames = np.vstack([frames, audio_array[-self.frame_size:]])
+        return frames
+    
+    def analyze(self, audio_array: np.ndarray) -> FrameSpectrum:
+        """
+        Windowed FFT of every frame in one call, averaged over frames.
+        
+        Args:
+            audio_array: Float samples, at least one frame long
+            
+        Returns:
+            FrameSpectrum with per-bin mean magnitude and power
+        """
+        frames = self.frames(audio_array)
+        spectra = np.abs(np.fft.rfft(frames * self.window, n=self.n_fft, axis=1))
+        return FrameSpectrum(
+            magnitude=spectra.mean(axis=0),
+            power=np.square(spectra).mean(axis=0),
+            frame_count=len(frames)
+        )
 
 class VADService:
     """
@@ -106,7 +197,7 @@ class VADService:
         # Enhanced buffer management
         self.speech_frames = deque(maxlen=200)    # Extended for better analysis
         self.silence_frames = deque(maxlen=100)   # Enhanced silence tracking
-        self.spectral_history = deque(maxlen=50)  # Spectral analysis history
+        self._previous_spectrum: Optional[np.ndarray] = None  # For spectral flux
         
         # Adaptive state tracking
         self.current_state = 'silence'  # 'silence', 'speech', 'transition'
@@ -118,11 +209,14 @@ class VADService:
         self.noise_profile = NoiseProfile()
         self.noise_samples = deque(maxlen=self.config.noise_estimation_window)
         self.spectral_noise_samples = deque(maxlen=30)
+        self._noise_floor_estimate: Optional[float] = None
         self.adaptive_thresholds = self._initialize_adaptive_thresholds()
         
         # Multi-band analysis
         self.frequency_bands = self._initialize_frequency_bands()
-        self.band_energies_history = deque(maxlen=20)
+        self.spectrum_analyzer = FrameSpectrumAnalyzer(
+            self.config.sample_rate, self.frame_size, self.frequency_bands
+        )
         
         # Performance statistics
         self.statistics = {
@@ -131,6 +225,7 @@ class VADService:
             'false_positives': 0,
             'environment_switches': 0,
             'adaptation_events': 0,
+            'fast_path_frames': 0,
             'snr_measurements': deque(maxlen=100),
             'quality_scores': deque(maxlen=50)
         }
@@ -216,17 +311,27 @@ class VADService:
             
             # === ENHANCED FEATURE EXTRACTION ===
             # Basic features
-            energy = self._calculate_energy(audio_array)
+            rms_energy = float(np.sqrt(np.dot(audio_array, audio_array) / len(audio_array)))
+            energy = rms_energy if rms_energy >= self.config.noise_gate_threshold else 0.0
             zero_crossings = self._calculate_zero_crossings(audio_array)
             
-            # Advanced spectral features
-            spectral_features = self._calculate_enhanced_spectral_features(audio_array)
-            
-            # Multi-band analysis
-            band_features = self._analyze_frequency_bands(audio_array) if self.config.multi_band_analysis else {}
+            decided_probability = self._energy_decision(energy) if self.config.tier == 'fast' else None
             
-            # Environmental noise analysis
-            noise_features = self._analyze_environmental_noise(audio_array)
+            if decided_probability is None:
+                # Advanced spectral features from one batched FFT over the chunk's frames
+                spectrum = self.spectrum_analyzer.analyze(audio_array)
+                spectral_features = self._calculate_enhanced_spectral_features(spectrum)
+                
+                # Multi-band analysis
+                band_features = self._analyze_frequency_bands(spectrum) if self.config.multi_band_analysis else {}
+                
+                # Environmental noise analysis
+                noise_features = self._analyze_environmental_noise(rms_energy, spectrum)
+            else:
+                # Fast tier: energy alone decides, the noise floor still tracks
+                spectral_features, band_features = {}, {}
+                noise_features = self._estimate_noise_level(rms_energy)
+                self.statistics['fast_path_frames'] += 1
             
             # === ADAPTIVE PROCESSING ===
             # Update environmental profile
@@ -239,15 +344,20 @@ class VADService:
             
             # === SPEECH DETECTION ===
             # Calculate comprehensive speech probability
-            speech_probability = self._calculate_enhanced_speech_probability(
-                energy, zero_crossings, spectral_features, band_features, noise_features
-            )
+            if decided_probability is None:
+                speech_probability = self._calculate_enhanced_speech_probability(
+                    energy, zero_crossings, spectral_features, band_features, noise_features
+                )
+            else:
+                speech_probability = decided_probability
             
             # Apply temporal smoothing and hysteresis
             is_speech = self._apply_enhanced_temporal_logic(speech_probability, timestamp)
             
             # Quality assessment
-            quality_score = self._assess_audio_quality(audio_array, spectral_features, noise_features)
+            quality_score = None
+            if decided_probability is None:
+                quality_score = self._assess_audio_quality(audio_array, rms_energy, spectral_features, noise_features)
             
             # === STATE UPDATES ===
             # Update voice timing for gating
@@ -259,12 +369,16 @@ class VADService:
             
             # Create enhanced VAD result
             result = VADResult(is_speech, float(speech_probability), float(energy), timestamp)
-            result.spectral_features = spectral_features
-            result.band_features = band_features
-            result.noise_features = noise_features
-            result.quality_score = quality_score
-            result.environment = self.noise_profile.environment.value
-            result.adaptive_thresholds = self.adaptive_thresholds.copy()
+            if decided_probability is not None:
+                result.tier = 'fast'
+            if self.config.detailed_results:
+                # Feature dicts are built fresh per chunk, so they are attached without copying
+                result.spectral_features = spectral_features
+                result.band_features = band_features
+                result.noise_features = noise_features
+                result.quality_score = quality_score
+                result.environment = self.noise_profile.environment.value
+                result.adaptive_thresholds = dict(self.adaptive_thresholds)
             
             return result
             
@@ -286,6 +400,25 @@ class VADService:
         
         return energy
     
+    def _energy_decision(self, energy: float) -> Optional[float]:
+        """
+        Fast-tier shortcut: speech probability when energy alone is decisive.
+        
+        Args:
+            energy: Noise-gated RMS energy of the chunk
+            
+        Returns:
+            0.0 below fast_silence_ratio × the adaptive energy threshold, the
+            saturated energy probability above fast_speech_ratio ×, otherwise None
+        """
+        threshold = self.adaptive_thresholds['energy']
+        if energy < threshold * self.config.fast_silence_ratio:
+            return 0.0
+        if energy >= threshold * self.config.fast_speech_ratio:
+            sensitivity_factor = 1.0 + (self.config.sensitivity - 0.5) * 0.6
+            return max(0.0, min(1.0, sensitivity_factor))
+        return None
+    
     def _calculate_zero_crossings(self, audio_array: np.ndarray) -> int:
         """Calculate zero crossing rate."""
         if len(audio_array) <= 1:
@@ -295,91 +428,56 @@ class VADService:
         zero_crossings = np.sum(np.diff(np.sign(audio_array)) != 0)
         return zero_crossings
     
-    def _calculate_enhanced_spectral_features(self, audio_array: np.ndarray) -> Dict[str, float]:
-        """🎤 Calculate enhanced spectral features with advanced analysis."""
-        if len(audio_array) < 64:  # Minimum for FFT
-            return {'spectral_centroid': 0.0, 'spectral_rolloff': 0.0, 'spectral_bandwidth': 0.0, 'spectral_flatness': 0.0}
-        
-        # Pre-emphasis filter for speech enhancement
-        pre_emphasized = np.append(audio_array[0], audio_array[1:] - 0.97 * audio_array[:-1])
-        
-        # Apply windowing
-        windowed = pre_emphasized * np.hanning(len(pre_emphasized))
-        
-        # FFT with zero padding for better frequency resolution
-        n_fft = max(512, len(windowed))
-        fft = np.fft.rfft(windowed, n=n_fft)
-        magnitude = np.abs(fft)
+    def _calculate_enhanced_spectral_features(self, spectrum: 'FrameSpectrum') -> Dict[str, float]:
+        """🎤 Spectral shape features of the pre-emphasized, frame-averaged spectrum."""
+        analyzer = self.spectrum_analyzer
+        freqs = analyzer.freqs
+        magnitude = spectrum.magnitude * analyzer.pre_emphasis_gain
         power_spectrum = magnitude ** 2
+        magnitude_sum = float(magnitude.sum())
         
-        # Frequency array
-        freqs = np.fft.rfftfreq(n_fft, 1/self.config.sample_rate)
-        
-        # Enhanced spectral features
         features = {}
         
         # Spectral centroid (center of mass of spectrum)
-        if np.sum(magnitude) > 0:
-            features['spectral_centroid'] = float(np.sum(freqs * magnitude) / np.sum(magnitude))
-        else:
-            features['spectral_centroid'] = 0.0
+        centroid = float(freqs @ magnitude) / magnitude_sum if magnitude_sum > 0 else 0.0
+        features['spectral_centroid'] = centroid
         
         # Spectral rolloff (85% of spectral energy)
         cumsum = np.cumsum(power_spectrum)
         total_energy = cumsum[-1]
         if total_energy > 0:
-            rolloff_idx = np.where(cumsum >= 0.85 * total_energy)[0]
-            features['spectral_rolloff'] = float(freqs[rolloff_idx[0]] if len(rolloff_idx) > 0 else freqs[-1])
+            rolloff_idx = min(int(np.searchsorted(cumsum, 0.85 * total_energy)), len(freqs) - 1)
+            features['spectral_rolloff'] = float(freqs[rolloff_idx])
         else:
             features['spectral_rolloff'] = 0.0
         
         # Spectral bandwidth (spread around centroid)
-        if np.sum(magnitude) > 0 and features['spectral_centroid'] > 0:
-            centroid = features['spectral_centroid']
-            bandwidth = np.sqrt(np.sum(((freqs - centroid) ** 2) * magnitude) / np.sum(magnitude))
-            features['spectral_bandwidth'] = float(bandwidth)
+        if magnitude_sum > 0 and centroid > 0:
+            features['spectral_bandwidth'] = float(np.sqrt((((freqs - centroid) ** 2) @ magnitude) / magnitude_sum))
         else:
             features['spectral_bandwidth'] = 0.0
         
         # Spectral flatness (measure of how noise-like vs tonal)
-        if len(magnitude) > 0 and np.all(magnitude > 1e-10):
+        if magnitude_sum > 0 and magnitude.min() > 1e-10:
             geometric_mean = np.exp(np.mean(np.log(magnitude + 1e-10)))
-            arithmetic_mean = np.mean(magnitude)
-            features['spectral_flatness'] = float(geometric_mean / arithmetic_mean) if arithmetic_mean > 0 else 0.0
+            features['spectral_flatness'] = float(geometric_mean / (magnitude_sum / len(magnitude)))
         else:
             features['spectral_flatness'] = 0.0
         
-        # Spectral flux (change from previous frame)
-        if len(self.spectral_history) > 0:
-            prev_spectrum = self.spectral_history[-1]
-            if len(prev_spectrum) == len(magnitude):
-                spectral_flux = np.sum((magnitude - prev_spectrum) ** 2)
-                features['spectral_flux'] = float(spectral_flux)
-            else:
-                features['spectral_flux'] = 0.0
-        else:
-            features['spectral_flux'] = 0.0
-        
-        # Store current spectrum for next frame
-        self.spectral_history.append(magnitude.copy())
+        # Spectral flux (change from previous chunk); only the last spectrum is kept
+        previous = self._previous_spectrum
+        features['spectral_flux'] = float(np.sum((magnitude - previous) ** 2)) if previous is not None else 0.0
+        self._previous_spectrum = magnitude
         
         # Speech-specific features
-        features['formant_activity'] = self._detect_formant_activity(magnitude, freqs)
+        features['formant_activity'] = self._detect_formant_activity(magnitude, magnitude_sum)
         features['harmonic_strength'] = self._calculate_harmonic_strength(magnitude, freqs)
         
         return features
     
-    def _detect_formant_activity(self, magnitude: np.ndarray, freqs: np.ndarray) -> float:
-        """Detect formant activity in typical speech ranges."""
-        # Check for peaks in formant regions
-        f1_region = (freqs >= 300) & (freqs <= 1000)  # F1 region
-        f2_region = (freqs >= 800) & (freqs <= 2500)  # F2 region
-        
-        f1_energy = np.sum(magnitude[f1_region]) if np.any(f1_region) else 0
-        f2_energy = np.sum(magnitude[f2_region]) if np.any(f2_region) else 0
-        total_energy = np.sum(magnitude)
-        
-        formant_ratio = (f1_energy + f2_energy) / (total_energy + 1e-10)
+    def _detect_formant_activity(self, magnitude: np.ndarray, magnitude_sum: float) -> float:
+        """Detect formant activity in typical speech ranges (F1 300-1000 Hz, F2 800-2500 Hz)."""
+        formant_ratio = float(self.spectrum_analyzer.formant_weights @ magnitude) / (magnitude_sum + 1e-10)
         return float(min(1.0, formant_ratio * 2))  # Normalize to 0-1
     
     def _calculate_harmonic_strength(self, magnitude: np.ndarray, freqs: np.ndarray) -> float:
@@ -389,7 +487,7 @@ class VADService:
             return 0.0
         
         # Smooth spectrum to find peaks
-        smoothed = signal.medfilt(magnitude, kernel_size=5)
+        smoothed = ndimage.median_filter(magnitude, size=5, mode='constant')
         
         # Find peaks
         peaks = signal.find_peaks(smoothed, height=np.max(smoothed) * 0.1)[0]
@@ -397,82 +495,71 @@ class VADService:
         if len(peaks) < 2:
             return 0.0
         
-        # Check for harmonic relationships
+        # Check for harmonic relationships between every pair of peaks at once
         peak_freqs = freqs[peaks]
-        harmonic_score = 0.0
-        
-        for i, f1 in enumerate(peak_freqs[:-1]):
-            for f2 in peak_freqs[i+1:]:
-                if f1 > 0 and 1.8 <= f2/f1 <= 2.2:  # Approximately 2:1 ratio
-                    harmonic_score += 1.0
-                elif f1 > 0 and 2.8 <= f2/f1 <= 3.2:  # Approximately 3:1 ratio
-                    harmonic_score += 0.5
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratios = peak_freqs[None, :] / peak_freqs[:, None]
+        upper = np.triu(np.ones_like(ratios, dtype=bool), k=1) & (peak_freqs[:, None] > 0)
+        harmonic_score = (
+            np.count_nonzero(upper & (ratios >= 1.8) & (ratios <= 2.2)) +
+            0.5 * np.count_nonzero(upper & (ratios >= 2.8) & (ratios <= 3.2))
+        )
         
         return float(min(1.0, harmonic_score / max(1, len(peaks))))
     
-    def _analyze_frequency_bands(self, audio_array: np.ndarray) -> Dict[str, float]:
+    def _analyze_frequency_bands(self, spectrum: 'FrameSpectrum') -> Dict[str, float]:
         """🎤 Multi-band frequency analysis for enhanced speech detection."""
-        if len(audio_array) < 64:
-            return {f'band_{i}_energy': 0.0 for i in range(len(self.frequency_bands))}
-        
-        # FFT for frequency domain analysis
-        windowed = audio_array * np.hanning(len(audio_array))
-        fft = np.fft.rfft(windowed)
-        magnitude = np.abs(fft) ** 2
-        freqs = np.fft.rfftfreq(len(audio_array), 1/self.config.sample_rate)
+        band_ratios = self.spectrum_analyzer.band_matrix @ spectrum.power
+        band_ratios /= spectrum.power.sum() + 1e-10
         
         band_features = {}
-        total_energy = np.sum(magnitude)
-        
-        for i, (low_freq, high_freq) in enumerate(self.frequency_bands):
-            # Find frequency indices for this band
-            band_mask = (freqs >= low_freq) & (freqs <= high_freq)
-            band_energy = np.sum(magnitude[band_mask]) if np.any(band_mask) else 0.0
-            
-            # Normalize by total energy
-            band_ratio = band_energy / (total_energy + 1e-10)
-            band_features[f'band_{i}_energy'] = float(band_ratio)
+        for i, band_ratio in enumerate(band_ratios.tolist()):
+            band_features[f'band_{i}_energy'] = band_ratio
             
             # Band-specific features
             if i == 0:  # Low frequency (F0 region)
-                band_features['f0_strength'] = float(min(1.0, band_ratio * 5))  # Amplify F0 contribution
+                band_features['f0_strength'] = min(1.0, band_ratio * 5)  # Amplify F0 contribution
             elif i == 1 or i == 2:  # Formant regions
-                band_features[f'formant_{i}_strength'] = float(min(1.0, band_ratio * 3))
+                band_features[f'formant_{i}_strength'] = min(1.0, band_ratio * 3)
             elif i == 3 or i == 4:  # High frequency (consonants)
-                band_features[f'consonant_{i-3}_strength'] = float(min(1.0, band_ratio * 4))
+                band_features[f'consonant_{i-3}_strength'] = min(1.0, band_ratio * 4)
         
         # Calculate band energy ratios for speech characteristics
-        low_energy = sum(band_features.get(f'band_{i}_energy', 0) for i in range(2))
-        high_energy = sum(band_features.get(f'band_{i}_energy', 0) for i in range(2, 5))
+        low_energy = float(band_ratios[:2].sum())
+        high_energy = float(band_ratios[2:5].sum())
         
         band_features['speech_balance'] = float(low_energy / (high_energy + 1e-10))
         band_features['total_speech_energy'] = float(low_energy + high_energy)
         
-        # Store for trend analysis
-        self.band_energies_history.append(band_features.copy())
-        
         return band_features
     
-    def _analyze_environmental_noise(self, audio_array: np.ndarray) -> Dict[str, float]:
+    def _estimate_noise_level(self, rms_energy: float) -> Dict[str, float]:
+        """🎤 Noise level and SNR against the rolling noise floor (time domain only)."""
+        noise_features = {'noise_level': float(rms_energy)}
+        
+        # Signal-to-noise ratio estimation
+        if len(self.noise_samples) > 5:
+            # 25th percentile of noise samples as noise floor, recomputed only when a sample is added
+            if self._noise_floor_estimate is None:
+                self._noise_floor_estimate = float(np.percentile(self.noise_samples, 25))
+            noise_floor = self._noise_floor_estimate
+            snr_db = 20 * np.log10((rms_energy + 1e-10) / (noise_floor + 1e-10))
+            noise_features['estimated_snr'] = float(max(-10, min(40, snr_db)))  # Clip to reasonable range
+        else:
+            noise_features['estimated_snr'] = 0.0
+        
+        return noise_features
+    
+    def _analyze_environmental_noise(self, rms_energy: float, spectrum: 'FrameSpectrum') -> Dict[str, float]:
         """🎤 Analyze environmental noise characteristics."""
-        if len(audio_array) < 64:
-            return {'noise_level': 0.0, 'noise_type': 'unknown'}
-        
-        # Basic noise level
-        rms_energy = np.sqrt(np.mean(audio_array ** 2))
-        
-        # Spectral analysis for noise characterization
-        windowed = audio_array * np.hanning(len(audio_array))
-        fft = np.fft.rfft(windowed)
-        magnitude = np.abs(fft)
-        freqs = np.fft.rfftfreq(len(audio_array), 1/self.config.sample_rate)
-        
-        noise_features = {
-            'noise_level': float(rms_energy),
-            'spectral_peak': float(freqs[np.argmax(magnitude)] if len(magnitude) > 0 else 0),
-            'high_freq_noise': float(np.sum(magnitude[freqs > 4000]) / (np.sum(magnitude) + 1e-10)),
-            'low_freq_noise': float(np.sum(magnitude[freqs < 300]) / (np.sum(magnitude) + 1e-10)),
-        }
+        analyzer = self.spectrum_analyzer
+        magnitude = spectrum.magnitude
+        magnitude_sum = float(magnitude.sum()) + 1e-10
+        
+        noise_features = self._estimate_noise_level(rms_energy)
+        noise_features['spectral_peak'] = float(analyzer.freqs[int(np.argmax(magnitude))])
+        noise_features['high_freq_noise'] = float(analyzer.high_freq_mask @ magnitude) / magnitude_sum
+        noise_features['low_freq_noise'] = float(analyzer.low_freq_mask @ magnitude) / magnitude_sum
         
         # Noise type classification (simplified)
         if noise_features['high_freq_noise'] > 0.3:
@@ -484,14 +571,6 @@ class VADService:
         else:
             noise_features['noise_type'] = 'broadband'  # General ambient noise
         
-        # Signal-to-noise ratio estimation
-        if len(self.noise_samples) > 5:
-            noise_floor = np.percentile(list(self.noise_samples), 25)  # Use 25th percentile as noise floor
-            snr_db = 20 * np.log10((rms_energy + 1e-10) / (noise_floor + 1e-10))
-            noise_features['estimated_snr'] = float(max(-10, min(40, snr_db)))  # Clip to reasonable range
-        else:
-            noise_features['estimated_snr'] = 0.0
-        
         return noise_features
     
     def _update_environmental_profile(self, spectral_features: Dict[str, float], noise_features: Dict[str, float]):
@@ -502,6 +581,7 @@ class VADService:
         # Update noise profile
         if self.current_state == 'silence' and current_noise > 0:
             self.noise_samples.append(current_noise)
+            self._noise_floor_estimate = None
             
             # Update average noise level with exponential moving average
             alpha = 0.1  # Learning rate
@@ -781,8 +861,8 @@ class VADService:
         
         return False
     
-    def _assess_audio_quality(self, audio_array: np.ndarray, spectral_features: Dict[str, float], 
-                            noise_features: Dict[str, float]) -> float:
+    def _assess_audio_quality(self, audio_array: np.ndarray, rms_amplitude: float,
+                            spectral_features: Dict[str, float], noise_features: Dict[str, float]) -> float:
         """🎤 Assess overall audio quality for the current frame."""
         quality_factors = []
         
@@ -824,8 +904,8 @@ class VADService:
         quality_factors.append(('spectral', spectral_quality, 0.3))
         
         # === Dynamic range quality ===
-        peak_amplitude = np.max(np.abs(audio_array))
-        rms_amplitude = np.sqrt(np.mean(audio_array ** 2))
+        abs_audio = np.abs(audio_array)
+        peak_amplitude = float(abs_audio.max())
         
         if peak_amplitude > 0 and rms_amplitude > 0:
             dynamic_range = peak_amplitude / rms_amplitude
@@ -841,7 +921,7 @@ class VADService:
         quality_factors.append(('dynamic_range', range_quality, 0.2))
         
         # === Clipping detection ===
-        clipping_ratio = np.sum(np.abs(audio_array) > 0.95) / len(audio_array)
+        clipping_ratio = np.count_nonzero(abs_audio > 0.95) / len(audio_array)
         if clipping_ratio < 0.001:  # No clipping
             clipping_quality = 1.0
         elif clipping_ratio < 0.01:  # Minimal clipping
@@ -864,7 +944,8 @@ class VADService:
         
         return overall_quality
     
-    def _update_enhanced_statistics(self, is_speech: bool, speech_probability: float, quality_score: float):
+    def _update_enhanced_statistics(self, is_speech: bool, speech_probability: float,
+                                    quality_score: Optional[float]):
         """🎤 Update comprehensive processing statistics."""
         self.statistics['total_frames'] += 1
         
@@ -903,7 +984,9 @@ class VADService:
             'adaptive_thresholds': self.adaptive_thresholds.copy(),
             'average_noise_level': self.noise_profile.average_noise_level,
             'environment_switches': self.statistics['environment_switches'],
-            'adaptation_events': self.statistics['adaptation_events']
+            'adaptation_events': self.statistics['adaptation_events'],
+            'tier': self.config.tier,
+            'fast_path_frames': self.statistics['fast_path_frames']
         }
         
         # Quality statistics
@@ -979,6 +1062,8 @@ class VADService:
         self.silence_frames.clear()
         self.noise_samples.clear()
         self.noise_floor = 0.001
+        self._previous_spectrum = None
+        self._noise_floor_estimate = None
         
         logger.info("VAD state reset")
     
@@ -69,6 +69,13 @@ class TaskWebSocketHandlers {
             this._emitBootstrap();
         });
 
+        // Batched frame from the server broadcast pipeline: [{event, data}, ...]
+        this.socket.on('event_batch', (items) => {
+            (items || []).forEach(({ event, data }) => {
+                this.socket.listeners(event).forEach((handler) => handler(data));
+            });
+        });
+
         // CROWN⁴.5 Event Handlers (20 events)
         
         // 1. Bootstrap (initial data load)
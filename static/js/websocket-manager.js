@@ -156,6 +156,14 @@ class WebSocketManager {
      * @param {string} namespace - Namespace name
      */
     registerCROWNEvents(socket, namespace) {
+        // Batched frame from the server broadcast pipeline: [{event, data}, ...]
+        // Replay each item through the handlers registered for its event name
+        socket.on('event_batch', (items) => {
+            (items || []).forEach(({ event, data }) => {
+                socket.listeners(event).forEach((handler) => handler(data));
+            });
+        });
+        
         // Event 2: session_update:created
         socket.on('session_update:created', (data) => {
             console.log('📬 New session created:', data);
@@ -0,0 +1,251 @@
+"""
+Analytics Rollup Tests
+The daily workspace rollup must stay equal to aggregating the source tables
+through inserts, updates, deletes and bulk operations.
+"""
+
+import random
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from models.analytics import Analytics
+from models.base import Base
+from models.meeting import Meeting
+from models.task import Task
+from models.workspace_rollup import WorkspaceDailyRollup
+from services.analytics_rollup_service import (
+    AnalyticsRollupService, RollupTotals, get_analytics_rollup_service
+)
+
+
+TODAY = date.today()
+
+
+@pytest.fixture
+def rollup():
+    service = get_analytics_rollup_service()
+    service.install_listeners()
+    return service
+
+
+@pytest.fixture
+def session(rollup):
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    with Session(engine) as s:
+        yield s
+    engine.dispose()
+
+
+def _meeting(workspace_id=1, days_ago=0, status='completed', **kwargs):
+    created = datetime.combine(TODAY - timedelta(days=days_ago), datetime.min.time()) + timedelta(hours=10)
+    return Meeting(title='m', organizer_id=1, workspace_id=workspace_id,
+                   status=status, created_at=created, **kwargs)
+
+
+def _naive_totals(session, workspace_id, start_day=None):
+    """Reference: aggregate the source rows directly."""
+    totals = RollupTotals()
+    for task in session.query(Task).join(Meeting, Task.meeting_id == Meeting.id).filter(
+            Meeting.workspace_id == workspace_id):
+        if not start_day or task.created_at.date() >= start_day:
+            totals.tasks_created_count += 1
+    for meeting in session.query(Meeting).filter_by(workspace_id=workspace_id):
+        if start_day and meeting.created_at.date() < start_day:
+            continue
+        totals.meeting_count += 1
+        totals.live_meeting_count += meeting.status == 'live'
+        analytics = session.query(Analytics).filter_by(meeting_id=meeting.id).first()
+        if analytics:
+            totals.analyzed_meeting_count += analytics.analysis_status == 'completed'
+            if analytics.total_duration_minutes is not None:
+                totals.duration_minutes_sum += analytics.total_duration_minutes
+                totals.duration_count += 1
+            if analytics.meeting_efficiency_score is not None:
+                totals.efficiency_sum += analytics.meeting_efficiency_score
+                totals.efficiency_count += 1
+            totals.decisions_sum += analytics.decisions_made_count or 0
+        for task in session.query(Task).filter_by(meeting_id=meeting.id):
+            totals.task_count += 1
+            totals.completed_task_count += task.status == 'completed'
+            setattr(totals, f"{task.priority}_priority_task_count",
+                    getattr(totals, f"{task.priority}_priority_task_count") + 1)
+            if task.status == 'completed' and task.completed_at:
+                totals.completion_days_sum += (task.completed_at - task.created_at).days
+                totals.completion_days_count += 1
+    return totals
+
+
+def _compare(rollup, session, workspace_id, start_day=None):
+    actual = rollup.get_totals(workspace_id, start_day=start_day, session=session)
+    expected = _naive_totals(session, workspace_id, start_day)
+    for name in ('tasks_created_count', 'meeting_count', 'live_meeting_count', 'analyzed_meeting_count', 'duration_count',
+                 'efficiency_count', 'decisions_sum', 'task_count', 'completed_task_count',
+                 'completion_days_sum', 'completion_days_count', 'low_priority_task_count',
+                 'high_priority_task_count', 'urgent_priority_task_count'):
+        assert getattr(actual, name) == getattr(expected, name), name
+    assert actual.duration_minutes_sum == pytest.approx(expected.duration_minutes_sum)
+    assert actual.efficiency_sum == pytest.approx(expected.efficiency_sum)
+
+
+class TestIncrementalMaintenance:
+    """Flushes keep the touched buckets exact."""
+
+    def test_random_changes_match_source_aggregates(self, rollup, session):
+        rng = random.Random(33)
+        meetings, tasks = [], []
+        for step in range(300):
+            action = rng.random()
+            if action < 0.3 or not meetings:
+                meeting = _meeting(workspace_id=rng.choice([1, 2]), days_ago=rng.randint(0, 40),
+                                   status=rng.choice(['live', 'completed', 'scheduled']))
+                session.add(meeting)
+                session.flush()
+                if rng.random() < 0.7:
+                    session.add(Analytics(
+                        meeting_id=meeting.id,
+                        analysis_status=rng.choice(['completed', 'pending']),
+                        total_duration_minutes=rng.choice([None, rng.uniform(10, 90)]),
+                        meeting_efficiency_score=rng.choice([None, rng.random()]),
+                        decisions_made_count=rng.randint(0, 4),
+                    ))
+                meetings.append(meeting)
+            elif action < 0.6:
+                task = Task(title='t', meeting_id=rng.choice(meetings).id,
+                            priority=rng.choice(['low', 'medium', 'high', 'urgent']),
+                            status='todo', created_at=datetime.now() - timedelta(days=rng.randint(0, 10)))
+                session.add(task)
+                tasks.append(task)
+            elif action < 0.8 and tasks:
+                task = rng.choice(tasks)
+                task.status = 'completed'
+                task.completed_at = task.created_at + timedelta(days=rng.randint(0, 5), hours=3)
+                if rng.random() < 0.3:
+                    task.meeting_id = rng.choice(meetings).id
+            elif action < 0.9:
+                meeting = rng.choice(meetings)
+                meeting.status = rng.choice(['live', 'completed'])
+                if rng.random() < 0.2:
+                    meeting.workspace_id = 3 - meeting.workspace_id
+            elif tasks:
+                session.delete(tasks.pop(rng.randrange(len(tasks))))
+            if step % 7 == 0:
+                session.commit()
+        session.commit()
+
+        for workspace_id in (1, 2):
+            _compare(rollup, session, workspace_id)
+            _compare(rollup, session, workspace_id, start_day=TODAY - timedelta(days=10))
+
+    def test_server_default_created_at_lands_today(self, rollup, session):
+        session.add(Meeting(title='m', organizer_id=1, workspace_id=5, status='live'))
+        session.commit()
+        totals = rollup.get_totals(5, start_day=TODAY - timedelta(days=1), session=session)
+        assert totals.meeting_count == 1
+        assert totals.live_meeting_count == 1
+
+    def test_unrelated_update_skips_refresh(self, rollup, session, monkeypatch):
+        meeting = _meeting()
+        session.add(meeting)
+        session.commit()
+        calls = []
+        monkeypatch.setattr(rollup, 'refresh', lambda connection, keys: calls.append(set(keys)))
+        meeting.title = 'renamed'
+        session.commit()
+        assert calls == []
+
+    def test_failed_refresh_does_not_break_callers_transaction(self, rollup, session, monkeypatch):
+        def failing_refresh(connection, keys):
+            connection.execute(WorkspaceDailyRollup.__table__.insert(), [{'workspace_id': 99, 'day': TODAY}])
+            raise RuntimeError("refresh failed")
+
+        monkeypatch.setattr(rollup, 'refresh', failing_refresh)
+        session.add(_meeting(workspace_id=9))
+        session.commit()
+
+        assert session.query(Meeting).filter_by(workspace_id=9).count() == 1
+        # The partial refresh was rolled back to its savepoint
+        assert session.query(WorkspaceDailyRollup).filter_by(workspace_id=99).count() == 0
+
+    def test_deleting_meeting_clears_its_bucket(self, rollup, session):
+        meeting = _meeting(workspace_id=4, days_ago=3)
+        session.add(meeting)
+        session.commit()
+        session.delete(meeting)
+        session.commit()
+        row = session.query(WorkspaceDailyRollup).filter_by(workspace_id=4).one()
+        assert row.day == TODAY - timedelta(days=3)
+        assert row.meeting_count == 0
+
+    def test_mark_stale_covers_bulk_delete(self, rollup, session):
+        meeting = _meeting(workspace_id=6, days_ago=20)
+        session.add(meeting)
+        session.flush()
+        session.add(Task(title='t', meeting_id=meeting.id, created_at=datetime.now() - timedelta(days=2)))
+        session.commit()
+        assert rollup.get_totals(6, session=session).tasks_created_count == 1
+
+        days = rollup.task_created_days(session, meeting.id)
+        session.query(Task).filter_by(meeting_id=meeting.id).delete()
+        rollup.mark_stale(session, 6, days)
+        session.delete(meeting)
+        session.commit()
+
+        totals = rollup.get_totals(6, session=session)
+        assert totals.tasks_created_count == 0
+        assert totals.meeting_count == 0
+
+
+class TestRebuild:
+    def test_rebuild_matches_incremental(self, rollup, session):
+        for i in range(40):
+            meeting = _meeting(workspace_id=1, days_ago=i % 13, status='live' if i % 5 == 0 else 'completed')
+            session.add(meeting)
+            session.flush()
+            session.add(Analytics(meeting_id=meeting.id, analysis_status='completed',
+                                  total_duration_minutes=30 + i, meeting_efficiency_score=0.5))
+            session.add(Task(title='t', meeting_id=meeting.id, priority='high', status='completed',
+                             created_at=datetime.now() - timedelta(days=3),
+                             completed_at=datetime.now()))
+        session.commit()
+        incremental = rollup.get_totals(1, session=session)
+
+        session.query(WorkspaceDailyRollup).delete()
+        session.commit()
+        assert rollup.get_totals(1, session=session).meeting_count == 0
+
+        rollup.rebuild_workspace(1, session=session)
+        session.commit()
+        assert rollup.get_totals(1, session=session) == incremental
+        assert incremental.completion_days_sum == 40 * 3
+
+    def test_missing_table_disables_listener(self):
+        engine = create_engine('sqlite://')
+        Base.metadata.create_all(engine, tables=[
+            t for name, t in Base.metadata.tables.items() if name != 'workspace_daily_rollups'
+        ])
+        service = get_analytics_rollup_service()
+        service.install_listeners()
+        with Session(engine) as s:
+            s.add(_meeting())
+            s.commit()
+            assert s.query(Meeting).count() == 1
+        engine.dispose()
+
+
+class TestRollupTotals:
+    def test_averages_and_distribution(self):
+        totals = RollupTotals(duration_minutes_sum=90.0, duration_count=2, efficiency_count=0,
+                              task_count=4, completed_task_count=1,
+                              high_priority_task_count=3, low_priority_task_count=1)
+        assert totals.average('duration_minutes') == 45.0
+        assert totals.average('efficiency') is None
+        assert totals.task_completion_rate == 25.0
+        assert totals.priority_distribution == {'low': 1, 'high': 3}
+
+    def test_service_is_singleton(self):
+        assert get_analytics_rollup_service() is get_analytics_rollup_service()
+        assert isinstance(get_analytics_rollup_service(), AnalyticsRollupService)
@@ -0,0 +1,191 @@
+"""
+Batch Transcription Tests
+Silence-based windowing, bounded parallel transcription, overlap stitching and
+bulk persistence of offline recordings.
+"""
+
+import io
+import threading
+import time
+import wave
+from datetime import datetime
+
+import numpy as np
+import pytest
+from flask import Flask
+from sqlalchemy import select
+
+from models import db
+from models.segment import Segment
+from models.session import Session
+from services.batch_transcription import (
+    BatchTranscriptionConfig, BatchTranscriptionService, IncompleteTranscriptionError, decode_audio,
+    encode_wav, get_batch_transcription_service
+)
+
+SAMPLE_RATE = 16000
+
+
+def _recording(pattern, seed=39):
+    """Concatenate ('speech'|'silence', seconds) parts."""
+    rng = np.random.default_rng(seed)
+    parts = []
+    for kind, seconds in pattern:
+        t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+        noise = rng.normal(0, 0.001, len(t))
+        parts.append(noise + (0.3 * np.sin(2 * np.pi * 180 * t) if kind == 'speech' else 0))
+    return np.concatenate(parts).astype(np.float32)
+
+
+class WindowEchoEngine:
+    """Reports one timed segment per second of window audio, tracking concurrency."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, wav_bytes, config):
+        with self._lock:
+            self.active += 1
+            self.calls += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        seconds = int(len(decode_audio(wav_bytes)) / SAMPLE_RATE)
+        return {'segments': [{'start': s, 'end': s + 1, 'text': f"word{s}", 'confidence': 0.8}
+                             for s in range(seconds)]}
+
+
+@pytest.fixture
+def batch_app():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+class TestSplitting:
+    def test_windows_cover_speech_and_skip_long_silence(self):
+        service = BatchTranscriptionService(BatchTranscriptionConfig(window_seconds=10), engine=WindowEchoEngine())
+        audio = _recording([('silence', 2), ('speech', 4), ('silence', 0.1), ('speech', 3),
+                            ('silence', 8), ('speech', 5), ('silence', 1)])
+
+        regions = service.detect_speech(audio)
+        windows = service.plan_windows(regions)
+
+        assert len(regions) == 2  # The 100 ms pause is bridged
+        assert [(round(w.start, 1), round(w.end, 1)) for w in windows] == [(1.8, 9.3), (16.9, 22.3)]
+
+    def test_continuous_speech_is_cut_with_overlap(self):
+        service = BatchTranscriptionService(BatchTranscriptionConfig(window_seconds=10, overlap_seconds=1))
+        windows = service.plan_windows([(0.0, 25.0)])
+
+        assert [(w.start, w.end) for w in windows] == [(0.0, 10.0), (9.0, 19.0), (18.0, 25.0)]
+        assert [(w.keep_from, w.keep_until) for w in windows] == [(0.0, 9.5), (9.5, 18.5), (18.5, 25.0)]
+
+    def test_wav_is_decoded_to_mono_target_rate(self):
+        stereo = np.repeat(_recording([('speech', 1)])[::2, None], 2, axis=1)  # 8 kHz stereo
+        buffer = io.BytesIO()
+        with wave.open(buffer, 'wb') as wav_file:
+            wav_file.setnchannels(2)
+            wav_file.setsampwidth(2)
+            wav_file.setframerate(8000)
+            wav_file.writeframes((stereo * 32767).astype(np.int16).tobytes())
+
+        samples = decode_audio(buffer.getvalue(), SAMPLE_RATE)
+        assert len(samples) == SAMPLE_RATE
+        assert np.max(np.abs(samples)) == pytest.approx(0.3, abs=0.02)
+
+
+class TestTranscription:
+    def test_windows_run_concurrently_within_the_limit(self):
+        engine = WindowEchoEngine(delay=0.05)
+        service = BatchTranscriptionService(BatchTranscriptionConfig(window_seconds=5, max_parallel=3), engine=engine)
+        audio = _recording([('speech', 2), ('silence', 3)] * 8)
+
+        result = service.transcribe(encode_wav(audio))
+
+        assert engine.calls == result.windows == 8
+        assert engine.peak == 3
+        assert result.speech_seconds < result.audio_seconds / 2
+        assert [s.start for s in result.segments] == sorted(s.start for s in result.segments)
+        assert service.get_stats()['recordings'] == 1
+
+    def test_overlap_keeps_each_stretch_once(self):
+        service = BatchTranscriptionService(BatchTranscriptionConfig(window_seconds=10, overlap_seconds=2))
+        windows = service.plan_windows([(0.0, 18.0)])
+        responses = [
+            {'segments': [{'start': 0, 'end': 4, 'text': 'alpha beta'},
+                          {'start': 4, 'end': 8.6, 'text': 'gamma delta'},
+                          {'start': 8.6, 'end': 10, 'text': 'epsilon'}]},
+            {'segments': [{'start': 0, 'end': 0.6, 'text': 'delta'},
+                          {'start': 0.6, 'end': 4, 'text': 'Delta, epsilon zeta'},
+                          {'start': 4, 'end': 9, 'text': 'eta'}]},
+        ]
+
+        segments = service.stitch(windows, responses)
+
+        assert [s.text for s in segments] == ['alpha beta', 'gamma delta', 'epsilon zeta', 'eta']
+        assert [s.window for s in segments] == [0, 0, 1, 1]
+        assert segments[-1].start == pytest.approx(12.0)
+
+    def test_failed_window_is_reported_and_skipped(self):
+        calls = []
+
+        def flaky(wav_bytes, config):
+            calls.append(1)
+            if len(calls) == 1:
+                raise RuntimeError("timeout")
+            return {'text': 'ok'}
+
+        service = BatchTranscriptionService(BatchTranscriptionConfig(window_seconds=5, max_parallel=1), engine=flaky)
+        result = service.transcribe_samples(_recording([('speech', 2), ('silence', 3)] * 2))
+        assert result.failed_windows == [0]
+        assert [s.text for s in result.segments] == ['ok']
+
+
+class TestPersistence:
+    def test_segments_are_bulk_inserted(self, batch_app):
+        session = Session(external_id='upload-1', title='t', status='completed', started_at=datetime(2026, 10, 18))
+        db.session.add(session)
+        db.session.add(Segment(session=session, kind='interim', text='stale'))
+        db.session.commit()
+
+        service = BatchTranscriptionService(BatchTranscriptionConfig(window_seconds=10), engine=WindowEchoEngine())
+        result = service.transcribe_recording(session.id, encode_wav(_recording([('speech', 3), ('silence', 4),
+                                                                                  ('speech', 2)])), replace=True)
+
+        rows = db.session.scalars(select(Segment).where(Segment.session_id == session.id)
+                                  .order_by(Segment.start_ms)).all()
+        assert len(rows) == len(result.segments) == 5
+        assert {row.kind for row in rows} == {'final'}
+        assert rows[0].text == 'word0' and rows[0].avg_confidence == 0.8
+        assert rows[-1].start_ms > 6000
+
+    def test_failed_window_never_replaces_stored_segments(self, batch_app):
+        session = Session(external_id='upload-2', title='t', status='completed', started_at=datetime(2026, 10, 18))
+        db.session.add(session)
+        db.session.add(Segment(session=session, kind='final', text='original'))
+        db.session.commit()
+
+        def flaky(wav_bytes, config):
+            raise RuntimeError("timeout")
+
+        service = BatchTranscriptionService(BatchTranscriptionConfig(window_seconds=10), engine=flaky)
+        with pytest.raises(IncompleteTranscriptionError):
+            service.transcribe_recording(session.id, encode_wav(_recording([('speech', 3), ('silence', 4),
+                                                                        ('speech', 2)])), replace=True)
+
+        rows = db.session.scalars(select(Segment).where(Segment.session_id == session.id)).all()
+        assert [row.text for row in rows] == ['original']
+
+    def test_service_is_singleton(self):
+        assert get_batch_transcription_service() is get_batch_transcription_service()
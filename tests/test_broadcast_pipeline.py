@@ -0,0 +1,212 @@
+"""
+Broadcast Pipeline Tests
+Batching per room, refresh coalescing, frame caps and bulk ledger updates.
+"""
+
+from datetime import datetime
+
+import pytest
+
+from models.event_ledger import EventLedger, EventType
+from services.broadcast_pipeline import BATCH_EVENT_NAME, BroadcastPipeline
+from services.event_broadcaster import EventBroadcaster
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class Recorder:
+    """Captures frames, delivery callbacks and scheduled flushes."""
+
+    def __init__(self):
+        self.frames = []
+        self.deliveries = []
+        self.scheduled = []
+
+    def emit(self, event_name, payload, namespace, room):
+        self.frames.append((event_name, payload, namespace, room))
+
+    def delivered(self, namespace, room, event_ids, error):
+        self.deliveries.append((namespace, room, sorted(event_ids), error))
+
+    def spawn(self, fn, *args):
+        self.scheduled.append((fn, args))
+
+    def run_scheduled(self):
+        pending, self.scheduled = self.scheduled, []
+        for fn, args in pending:
+            fn(*args)
+
+
+@pytest.fixture
+def recorder():
+    return Recorder()
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def _pipeline(recorder, clock, **kwargs):
+    options = dict(window_ms=50, max_frames_per_second=0, max_batch_size=100)
+    options.update(kwargs)
+    return BroadcastPipeline(
+        emit=recorder.emit, on_delivered=recorder.delivered,
+        spawn=recorder.spawn, sleep=lambda seconds: None, clock=clock, **options
+    )
+
+
+class TestBatching:
+    def test_events_in_window_share_one_array_frame_per_room(self, recorder, clock):
+        pipeline = _pipeline(recorder, clock)
+        for i in range(5):
+            pipeline.enqueue('/tasks', 'workspace_1', 'task_update', {'n': i}, event_id=i)
+        pipeline.enqueue('/tasks', 'workspace_2', 'task_update', {'n': 9}, event_id=9)
+        assert recorder.frames == []
+        assert len(recorder.scheduled) == 2  # one timer per room
+
+        recorder.run_scheduled()
+        frames = {room: (name, payload) for name, payload, _, room in recorder.frames}
+        assert frames['workspace_1'][0] == BATCH_EVENT_NAME
+        assert [item['data']['n'] for item in frames['workspace_1'][1]] == [0, 1, 2, 3, 4]
+        assert frames['workspace_2'] == ('task_update', {'n': 9})
+        assert ('/tasks', 'workspace_1', [0, 1, 2, 3, 4], None) in recorder.deliveries
+
+        stats = pipeline.get_stats()
+        assert stats['frames_sent'] == 2
+        assert stats['frames_saved'] == 4
+        assert stats['pending'] == 0
+
+    def test_refreshes_collapse_to_latest_position(self, recorder, clock):
+        pipeline = _pipeline(recorder, clock)
+        pipeline.enqueue('/dashboard', 'w', 'dashboard_refresh', {'v': 1}, event_id=1, coalesce_key='refresh')
+        pipeline.enqueue('/dashboard', 'w', 'task_update', {'v': 2}, event_id=2)
+        pipeline.enqueue('/dashboard', 'w', 'dashboard_refresh', {'v': 3}, event_id=3, coalesce_key='refresh')
+        recorder.run_scheduled()
+
+        (name, payload, _, _), = recorder.frames
+        assert [(item['event'], item['data']['v']) for item in payload] == [
+            ('task_update', 2), ('dashboard_refresh', 3)
+        ]
+        # The superseded refresh is still reported as delivered
+        assert recorder.deliveries == [('/dashboard', 'w', [1, 2, 3], None)]
+        assert pipeline.get_stats()['events_coalesced'] == 1
+        assert pipeline.get_stats()['frames_saved'] == 2
+
+    def test_max_batch_size_splits_frames(self, recorder, clock):
+        pipeline = _pipeline(recorder, clock, max_batch_size=2)
+        for i in range(5):
+            pipeline.enqueue('/tasks', 'w', 'task_update', {'n': i}, event_id=i)
+        recorder.run_scheduled()
+        assert [len(p) if name == BATCH_EVENT_NAME else 1 for name, p, _, _ in recorder.frames] == [2, 2, 1]
+
+    def test_zero_window_sends_immediately(self, recorder, clock):
+        pipeline = _pipeline(recorder, clock, window_ms=0)
+        pipeline.enqueue('/dashboard', None, 'dashboard_refresh', {}, event_id=7)
+        assert recorder.frames == [('dashboard_refresh', {}, '/dashboard', None)]
+        assert recorder.scheduled == []
+
+    def test_emit_error_reports_failure(self, recorder, clock):
+        def broken(*args):
+            raise RuntimeError('socket down')
+
+        pipeline = BroadcastPipeline(emit=broken, on_delivered=recorder.delivered, window_ms=0,
+                                     max_frames_per_second=0, clock=clock)
+        pipeline.enqueue('/tasks', 'w', 'task_update', {}, event_id=4)
+        assert recorder.deliveries == [('/tasks', 'w', [4], 'socket down')]
+        assert pipeline.get_stats()['send_errors'] == 1
+
+
+class TestRateCap:
+    def test_room_over_cap_defers_and_keeps_coalescing(self, recorder, clock):
+        pipeline = _pipeline(recorder, clock, window_ms=0, max_frames_per_second=2)
+        pipeline.enqueue('/dashboard', 'w', 'dashboard_refresh', {'v': 1}, event_id=1, coalesce_key='r')
+        pipeline.enqueue('/dashboard', 'w', 'dashboard_refresh', {'v': 2}, event_id=2, coalesce_key='r')
+        assert len(recorder.frames) == 2
+
+        # Cap reached: later events wait for a token instead of being dropped
+        for v in (3, 4, 5):
+            pipeline.enqueue('/dashboard', 'w', 'dashboard_refresh', {'v': v}, event_id=v, coalesce_key='r')
+        assert len(recorder.frames) == 2
+        assert len(recorder.scheduled) == 1
+        assert pipeline.get_stats()['rate_limited'] >= 1
+
+        # Other rooms are not affected
+        pipeline.enqueue('/dashboard', 'other', 'dashboard_refresh', {'v': 0}, event_id=99)
+        assert recorder.frames[-1][3] == 'other'
+
+        clock.now += 0.5
+        recorder.run_scheduled()
+        assert recorder.frames[-1] == ('dashboard_refresh', {'v': 5}, '/dashboard', 'w')
+        assert ('/dashboard', 'w', [3, 4, 5], None) in recorder.deliveries
+
+    def test_flush_all_forces_capped_rooms(self, recorder, clock):
+        pipeline = _pipeline(recorder, clock, max_frames_per_second=1)
+        pipeline.enqueue('/tasks', 'w', 'a', {}, event_id=1)
+        pipeline.flush('/tasks', 'w')
+        pipeline.enqueue('/tasks', 'w', 'b', {}, event_id=2)
+        assert pipeline.flush('/tasks', 'w') == 0
+        assert pipeline.flush_all() == 1
+        assert pipeline.pending_count() == 0
+
+
+class FakeSocketIO:
+    def __init__(self):
+        self.emitted = []
+        self.tasks = []
+
+    def emit(self, event, payload, namespace=None, room=None):
+        self.emitted.append((event, payload, namespace, room))
+
+    def start_background_task(self, fn, *args):
+        self.tasks.append((fn, args))
+
+    def sleep(self, seconds):
+        pass
+
+
+def _event(event_id, event_type, payload):
+    return EventLedger(id=event_id, event_type=event_type, event_name=event_type.value,
+                       sequence_num=event_id, payload=payload, created_at=datetime(2026, 1, 1))
+
+
+class TestEventBroadcaster:
+    def test_pending_events_flush_per_room_with_bulk_ledger_update(self, monkeypatch):
+        from services import event_broadcaster as module
+
+        bulk_calls = []
+        monkeypatch.setattr(module.event_sequencer, 'mark_events_broadcast',
+                            lambda ids, **kwargs: bulk_calls.append((sorted(ids), kwargs)))
+        monkeypatch.setenv('BROADCAST_BATCH_WINDOW_MS', '50')
+        events = [
+            _event(1, EventType.DASHBOARD_REFRESH, {'workspace_id': 3, 'stats': {'v': 1}}),
+            _event(2, EventType.DASHBOARD_REFRESH, {'workspace_id': 3, 'stats': {'v': 2}}),
+            _event(3, EventType.SESSION_UPDATE_CREATED, {'workspace_id': 3}),
+            _event(4, EventType.ANALYTICS_REFRESH, {'workspace_id': 3, 'meeting_id': 1}),
+            _event(5, EventType.ANALYTICS_REFRESH, {'workspace_id': 3, 'meeting_id': 2}),
+        ]
+        monkeypatch.setattr(module.event_sequencer, 'get_pending_events', lambda limit: events)
+
+        broadcaster = EventBroadcaster(FakeSocketIO())
+        broadcaster.process_pending_events()
+
+        frames = {(ns, room): (name, payload) for name, payload, ns, room in broadcaster.socketio.emitted}
+        name, payload = frames[('/dashboard', 'workspace_3')]
+        assert name == BATCH_EVENT_NAME
+        assert [item['data']['event_id'] for item in payload] == [2, 3]
+        name, payload = frames[('/analytics', 'workspace_3')]
+        assert [item['data']['event_id'] for item in payload] == [4, 5]  # different meetings
+        assert sorted(ids for ids, _ in bulk_calls) == [[1, 2, 3], [4, 5]]
+        assert all(kwargs['broadcast_status'] == 'sent' for _, kwargs in bulk_calls)
+        assert broadcaster.get_broadcast_stats()['frames_saved'] == 3
+
+    def test_without_socketio_nothing_is_queued(self):
+        broadcaster = EventBroadcaster()
+        assert broadcaster.emit_event(_event(1, EventType.DASHBOARD_REFRESH, {})) is False
+        assert broadcaster.pipeline.pending_count() == 0
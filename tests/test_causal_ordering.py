@@ -0,0 +1,142 @@
+"""
+Causal Ordering Tests
+Property tests: level-based ordering and per-resource conflict detection must
+agree with the previous pairwise implementations.
+"""
+
+import random
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from services.causal_ordering import causal_order, clocks_concurrent, find_concurrent_pairs
+from services.event_sequencer import EventSequencer
+from services.temporal_recovery_engine import TemporalRecoveryEngine
+
+
+def _pairwise_sort(events):
+    """Reference: previous round-by-round scan of TemporalRecoveryEngine."""
+    ordered = []
+    remaining = events.copy()
+    while remaining:
+        can_proceed = []
+        for event in remaining:
+            happens_after_remaining = False
+            for other in remaining:
+                if event.id == other.id:
+                    continue
+                if EventSequencer.compare_vector_clocks(event.vector_clock, other.vector_clock) == "after":
+                    happens_after_remaining = True
+                    break
+            if not happens_after_remaining:
+                can_proceed.append(event)
+        for event in can_proceed:
+            ordered.append(event)
+            remaining.remove(event)
+    return ordered
+
+
+def _pairwise_conflicts(events):
+    """Reference: previous all-pairs EventSequencer.detect_conflicts."""
+    conflicts = []
+    for i, event_a in enumerate(events):
+        for event_b in events[i + 1:]:
+            if not event_a.vector_clock or not event_b.vector_clock:
+                continue
+            if EventSequencer.compare_vector_clocks(event_a.vector_clock, event_b.vector_clock) == "concurrent":
+                conflicts.append((event_a, event_b))
+    return conflicts
+
+
+def _event(i, clock, task_id=None):
+    return SimpleNamespace(id=i, vector_clock=clock, sequence_num=None, created_at=datetime(2025, 1, 1),
+                           session_id=None, payload={'task_id': task_id} if task_id else {})
+
+
+def _simulated_history(rng, clients=4, steps=60):
+    """Clocks produced by clients that increment locally and merge on sync."""
+    state = {f"c{i}": {} for i in range(clients)}
+    clocks = []
+    for _ in range(steps):
+        client = rng.choice(list(state))
+        if rng.random() < 0.3:
+            other = state[rng.choice(list(state))]
+            merged = dict(state[client])
+            for key, counter in other.items():
+                merged[key] = max(merged.get(key, 0), counter)
+            state[client] = merged
+        state[client] = EventSequencer.generate_vector_clock(client, state[client])
+        clocks.append(dict(state[client]))
+    rng.shuffle(clocks)
+    return clocks
+
+
+def _arbitrary_clocks(rng, count=40):
+    clocks = []
+    for _ in range(count):
+        clock = {f"c{rng.randint(0, 3)}": rng.randint(0, 4) for _ in range(rng.randint(1, 3))}
+        clocks.append(clock)
+    # Duplicate some clocks to exercise equal and value-equal clocks
+    clocks.extend(dict(rng.choice(clocks)) for _ in range(5))
+    clocks.append({"c0": 0, "c1": 1})
+    clocks.append({"c1": 1})
+    rng.shuffle(clocks)
+    return clocks
+
+
+class TestCausalOrder:
+    @pytest.mark.parametrize("seed", range(30))
+    def test_matches_pairwise_sort_on_simulated_histories(self, seed):
+        rng = random.Random(seed)
+        events = [_event(i, clock) for i, clock in enumerate(_simulated_history(rng))]
+        assert [e.id for e in causal_order(events)] == [e.id for e in _pairwise_sort(events)]
+
+    @pytest.mark.parametrize("seed", range(30))
+    def test_matches_pairwise_sort_on_arbitrary_clocks(self, seed):
+        rng = random.Random(1000 + seed)
+        events = [_event(i, clock) for i, clock in enumerate(_arbitrary_clocks(rng))]
+        assert [e.id for e in causal_order(events)] == [e.id for e in _pairwise_sort(events)]
+
+    def test_respects_happens_before(self):
+        rng = random.Random(7)
+        events = [_event(i, clock) for i, clock in enumerate(_simulated_history(rng, steps=300))]
+        position = {e.id: n for n, e in enumerate(causal_order(events))}
+        for a in events:
+            for b in events:
+                if EventSequencer.compare_vector_clocks(a.vector_clock, b.vector_clock) == "after":
+                    assert position[a.id] > position[b.id]
+
+    def test_invalid_clock_raises(self):
+        with pytest.raises(ValueError):
+            causal_order([_event(1, {"c0": "x"})])
+
+    def test_engine_keeps_input_order_on_invalid_clock(self):
+        events = [_event(1, {"c0": 2}), _event(2, {"c0": "x"})]
+        assert TemporalRecoveryEngine()._sort_by_vector_clock(events) == events
+
+
+class TestConflictDetection:
+    @pytest.mark.parametrize("seed", range(20))
+    def test_matches_pairwise_conflicts(self, seed):
+        rng = random.Random(2000 + seed)
+        clocks = _arbitrary_clocks(rng) if seed % 2 else _simulated_history(rng)
+        events = [_event(i, clock) for i, clock in enumerate(clocks)]
+        events.append(_event(len(events), None))
+        assert EventSequencer.detect_conflicts(events) == _pairwise_conflicts(events)
+
+    @pytest.mark.parametrize("seed", range(20))
+    def test_grouped_conflicts_are_same_resource_subset(self, seed):
+        rng = random.Random(3000 + seed)
+        events = [_event(i, clock, task_id=rng.choice([None, 1, 2, 3]))
+                  for i, clock in enumerate(_simulated_history(rng))]
+
+        grouped = EventSequencer.detect_conflicts(events, resource_key=lambda e: e.payload.get('task_id'))
+
+        expected = [(a, b) for a, b in _pairwise_conflicts(events)
+                    if a.payload.get('task_id') and a.payload.get('task_id') == b.payload.get('task_id')]
+        assert grouped == expected
+
+    def test_uncomparable_counters_conflict(self):
+        assert clocks_concurrent({"c0": 1}, {"c0": "1"})
+        assert find_concurrent_pairs([_event(1, {"a": 1}), _event(2, {"a": 1})]) == []
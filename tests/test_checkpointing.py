@@ -0,0 +1,164 @@
+"""
+Checkpointing Tests
+Base + delta chains, pipelined writes, compression, chain pruning and
+verified replay on recovery, against fakeredis.
+"""
+
+import hashlib
+import json
+import zlib
+
+import fakeredis
+import pytest
+
+from services.checkpointing import (
+    ChainState, CheckpointingConfig, CheckpointingManager, CheckpointType
+)
+
+SESSION = 'meeting-1'
+
+
+@pytest.fixture
+def redis_client():
+    return fakeredis.FakeRedis()
+
+
+def _manager(redis_client, **overrides):
+    overrides.setdefault('compression_threshold_bytes', 1 << 20)
+    return CheckpointingManager(redis_client, CheckpointingConfig(**overrides))
+
+
+def _record(redis_client, checkpoint_id):
+    return json.loads(redis_client.get(f"checkpoint:{checkpoint_id}"))
+
+
+def _transcript(n):
+    return {'segments': [{'i': i, 'text': f"segment {i} " * 5} for i in range(n)], 'notes': 'agenda ' * 300}
+
+
+class TestChainState:
+    def test_incremental_checksum_matches_fresh_replay(self):
+        writer = ChainState()
+        writer.diff({'segments': [1, 2], 'title': 'x'}, full=True)
+        ops, changed = writer.diff({'segments': [1, 2, 3, 4], 'title': 'x'}, full=False)
+
+        assert json.loads(ops) == {'set': {}, 'append': {'segments': [3, 4]}, 'del': []}
+        assert changed == 1
+        fresh = ChainState()
+        fresh.set('segments', [1, 2, 3, 4])
+        fresh.set('title', 'x')
+        assert fresh.checksum == writer.checksum
+
+    def test_in_place_mutation_is_detected(self):
+        state = {'participants': ['a']}
+        writer = ChainState()
+        writer.diff(state, full=True)
+        state['participants'][0] = 'b'
+
+        ops, _ = writer.diff(state, full=False)
+        assert json.loads(ops)['set'] == {'participants': ['b']}
+
+
+class TestWrites:
+    def test_deltas_hold_only_changes(self, redis_client):
+        manager = _manager(redis_client)
+        base_id = manager.create_checkpoint(SESSION, CheckpointType.TRANSCRIPT, _transcript(3))
+        delta_id = manager.create_checkpoint(SESSION, CheckpointType.TRANSCRIPT, _transcript(4))
+
+        base, delta = _record(redis_client, base_id), _record(redis_client, delta_id)
+        assert base['kind'] == 'base' and len(base['ops']['set']['segments']) == 3
+        assert delta['kind'] == 'delta' and delta['base_id'] == base_id and delta['seq'] == 1
+        assert delta['ops'] == {'set': {}, 'append': {'segments': [_transcript(4)['segments'][3]]}, 'del': []}
+
+    def test_one_round_trip_per_checkpoint(self, redis_client):
+        manager = _manager(redis_client)
+        for n in range(5):
+            manager.create_checkpoint(SESSION, CheckpointType.TRANSCRIPT, _transcript(n))
+
+        stats = manager.get_checkpointing_stats()
+        assert stats['redis_round_trips'] == 5
+        assert stats['redis_commands'] == 25
+        assert (stats['base_checkpoints'], stats['delta_checkpoints']) == (1, 4)
+
+    def test_large_records_are_compressed(self, redis_client):
+        manager = _manager(redis_client, compression_threshold_bytes=256)
+        checkpoint_id = manager.create_checkpoint(SESSION, CheckpointType.TRANSCRIPT, _transcript(50))
+
+        raw = redis_client.get(f"checkpoint:{checkpoint_id}")
+        assert raw[:1] == b'Z'
+        assert json.loads(zlib.decompress(raw[1:]))['checkpoint_id'] == checkpoint_id
+        assert manager.get_latest_checkpoint(SESSION).data == _transcript(50)
+
+    def test_text_clients_get_base64_records(self):
+        text_client = fakeredis.FakeRedis(decode_responses=True)
+        manager = _manager(text_client, compression_threshold_bytes=256)
+        manager.create_checkpoint(SESSION, CheckpointType.TRANSCRIPT, _transcript(50))
+        manager.create_checkpoint(SESSION, CheckpointType.TRANSCRIPT, _transcript(51))
+
+        assert manager.recover_session(SESSION)['data']['transcript'] == _transcript(51)
+
+    def test_old_chains_are_pruned(self, redis_client):
+        manager = _manager(redis_client, max_checkpoints_per_session=3, chains_retained=2)
+        ids = [manager.create_checkpoint(SESSION, CheckpointType.TRANSCRIPT, _transcript(n)) for n in range(9)]
+
+        remaining = [i.decode() for i in redis_client.zrange(f"session_checkpoints:{SESSION}", 0, -1)]
+        assert remaining == ids[3:]   # Chains of 3; the first was dropped with the third base
+        assert redis_client.get(f"checkpoint:{ids[0]}") is None
+
+
+class TestRecovery:
+    def test_replays_every_type_to_the_recovery_point(self, redis_client):
+        manager = _manager(redis_client, max_checkpoints_per_session=4)
+        restored = {}
+        manager.register_recovery_callback(CheckpointType.SESSION_STATE, lambda sid, data: restored.update(data))
+        stamps = []
+        for n in range(10):
+            manager.create_checkpoint(SESSION, CheckpointType.TRANSCRIPT, _transcript(n))
+            checkpoint_id = manager.create_checkpoint(SESSION, CheckpointType.SESSION_STATE, {'status': 'live', 'tick': n})
+            stamps.append(_record(redis_client, checkpoint_id)['timestamp'])
+
+        result = manager.recover_session(SESSION, recovery_point=stamps[6])
+
+        assert result['success'] and result['warnings'] == []
+        assert result['data']['transcript'] == _transcript(6)
+        assert result['data']['session_state'] == {'status': 'live', 'tick': 6}
+        assert restored == {'status': 'live', 'tick': 6}
+        assert manager.recover_session(SESSION)['data']['transcript'] == _transcript(9)
+
+    def test_corrupt_delta_falls_back_to_last_verified_state(self, redis_client):
+        manager = _manager(redis_client)
+        ids = [manager.create_checkpoint(SESSION, CheckpointType.TRANSCRIPT, _transcript(n)) for n in range(5)]
+        record = _record(redis_client, ids[3])
+        record['ops']['append']['segments'][0]['text'] = 'tampered'
+        redis_client.set(f"checkpoint:{ids[3]}", json.dumps(record))
+
+        result = manager.recover_session(SESSION)
+
+        assert result['success']
+        assert result['checkpoint_id'] == ids[2]
+        assert result['data']['transcript'] == _transcript(2)
+        assert result['warnings'] == [f"checksum_mismatch:{ids[3]}"]   # ids[4] is unreachable, not reported again
+        assert manager._load_checkpoint(ids[4]) is None
+
+    def test_time_range_materializes_deltas(self, redis_client):
+        manager = _manager(redis_client)
+        ids = [manager.create_checkpoint(SESSION, CheckpointType.TRANSCRIPT, _transcript(n)) for n in range(4)]
+        start, end = (_record(redis_client, checkpoint_id)['timestamp'] for checkpoint_id in ids[2:])
+
+        checkpoints = manager.get_checkpoints_by_time_range(SESSION, start, end)
+        assert [len(c.data['segments']) for c in checkpoints] == [2, 3]
+
+    def test_legacy_full_snapshots_still_recover(self, redis_client):
+        manager = _manager(redis_client)
+        legacy = {
+            'checkpoint_id': 'old_1', 'session_id': SESSION, 'checkpoint_type': 'session_state',
+            'timestamp': 1.0, 'data': {'status': 'live'}, 'metadata': {}, 'size_bytes': 18,
+            'checksum': '',
+        }
+        legacy['checksum'] = hashlib.sha256(
+            json.dumps(legacy['data'], sort_keys=True).encode()).hexdigest()[:16]
+        redis_client.set('checkpoint:old_1', json.dumps(legacy))
+        redis_client.zadd(f"session_checkpoints:{SESSION}", {'old_1': 1.0})
+
+        result = manager.recover_session(SESSION)
+        assert result['success'] and result['data'] == {'session_state': {'status': 'live'}}
@@ -0,0 +1,167 @@
+"""
+Chunk Store Tests
+Content-defined chunking, deduplicated writes, verified restores and the
+incremental path of BackupDisasterRecoveryManager against SQLite.
+"""
+
+import io
+import os
+import random
+import sqlite3
+
+import pytest
+
+from services.backup_disaster_recovery import BackupConfig, BackupDisasterRecoveryManager
+from services.chunk_store import ChunkStore, ChunkStoreError, ContentDefinedChunker, iter_blocks
+
+SMALL = dict(min_size=512, avg_size=2048, max_size=8192, read_size=16 * 1024)
+
+
+def _stream(size, seed=45):
+    return random.Random(seed).randbytes(size)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ChunkStore(str(tmp_path / 'store'), ContentDefinedChunker(**SMALL))
+
+
+class TestChunker:
+    def test_chunks_reassemble_within_bounds(self):
+        chunker = ContentDefinedChunker(**SMALL)
+        data = _stream(200_000)
+        chunks = list(chunker.chunks(iter_blocks(io.BytesIO(data), 3000)))
+
+        assert b''.join(chunks) == data
+        assert all(len(chunk) <= SMALL['max_size'] for chunk in chunks)
+        assert all(len(chunk) >= SMALL['min_size'] for chunk in chunks[:-1])
+
+    def test_boundaries_do_not_depend_on_block_size(self):
+        chunker = ContentDefinedChunker(**SMALL)
+        data = _stream(100_000)
+        by_small_blocks = list(chunker.chunks(iter_blocks(io.BytesIO(data), 777)))
+        by_one_block = list(chunker.chunks([data]))
+        assert by_small_blocks == by_one_block
+
+    def test_insertion_only_disturbs_nearby_chunks(self):
+        chunker = ContentDefinedChunker(**SMALL)
+        data = _stream(200_000)
+        edited = data[:100_000] + b'inserted row' + data[100_000:]
+
+        before, after = set(chunker.chunks([data])), set(chunker.chunks([edited]))
+        assert len(after - before) <= 2
+
+
+class TestChunkStore:
+    def test_second_write_stores_only_new_chunks(self, store):
+        data = _stream(300_000)
+        first = store.write('b1', [data])
+        second = store.write('b2', [data[:150_000] + b'changed' + data[150_007:]])
+
+        assert first.new_chunks == first.chunks
+        assert 1 <= second.new_chunks <= 2
+        assert second.bytes_written < first.bytes_written / 10
+
+    def test_restore_round_trips_and_verifies(self, store):
+        data = _stream(50_000)
+        backup = store.write('b1', iter_blocks(io.BytesIO(data), 4096))
+        output = io.BytesIO()
+
+        assert store.restore(backup.manifest_path, output) == len(data)
+        assert output.getvalue() == data
+        assert store.verify(backup.manifest_path)
+
+    def test_corrupt_chunk_fails_verification(self, store):
+        backup = store.write('b1', [_stream(50_000)])
+        digest = store.load_manifest(backup.manifest_path)['chunks'][2][0]
+        path = store.chunk_path(digest)
+        path.write_bytes(b'R' + b'\0' * (path.stat().st_size - 1))
+
+        assert store.verify(backup.manifest_path) is False
+        with pytest.raises(ChunkStoreError, match=digest):
+            store.restore(backup.manifest_path, io.BytesIO())
+
+    def test_garbage_collection_keeps_shared_chunks(self, store):
+        data = _stream(100_000)
+        first = store.write('b1', [data])
+        second = store.write('b2', [data + _stream(20_000, seed=7)])
+        only_first = {d for d, _ in store.load_manifest(first.manifest_path)['chunks']} - {
+            d for d, _ in store.load_manifest(second.manifest_path)['chunks']}
+        os.remove(first.manifest_path)
+
+        assert len(only_first) == 1   # The tail chunk, which grew in b2
+        assert store.collect_garbage()['chunks_removed'] == 1
+        os.remove(second.manifest_path)
+        assert store.collect_garbage()['chunks_removed'] == second.chunks
+
+
+class TestIncrementalBackups:
+    @pytest.fixture
+    def database(self, tmp_path, monkeypatch):
+        path = tmp_path / 'app.db'
+        connection = sqlite3.connect(path)
+        connection.execute('CREATE TABLE notes (id INTEGER PRIMARY KEY, body TEXT)')
+        rng = random.Random(45)
+        connection.executemany('INSERT INTO notes (body) VALUES (?)',
+                               [(f"note {i} " + rng.randbytes(100).hex(),) for i in range(5000)])
+        connection.commit()
+        connection.close()
+        monkeypatch.setenv('DATABASE_URL', f"sqlite:///{path}")
+        return path
+
+    @pytest.fixture
+    def manager(self, tmp_path):
+        config = BackupConfig(
+            local_backup_dir=str(tmp_path / 'local'), cloud_backup_dir=str(tmp_path / 'cloud'),
+            archive_backup_dir=str(tmp_path / 'archive'),
+            chunk_min_size=1024, chunk_avg_size=4096, chunk_max_size=16384
+        )
+        return BackupDisasterRecoveryManager(config)
+
+    def test_incremental_writes_only_changed_rows(self, manager, database):
+        full = manager.create_database_backup('full')
+        seed = manager.create_database_backup('incremental')
+        connection = sqlite3.connect(database)
+        connection.execute("UPDATE notes SET body = 'edited' WHERE id = 2500")
+        connection.commit()
+        connection.close()
+        incremental = manager.create_database_backup('incremental')
+
+        assert full.success and seed.success and incremental.success
+        assert incremental.validation_passed is True
+        assert incremental.new_chunks <= 2
+        assert incremental.bytes_written < full.bytes_written / 10
+        assert manager.get_backup_status()['total_bytes_written'] == (
+            full.bytes_written + seed.bytes_written + incremental.bytes_written)
+
+    def test_restore_from_manifest(self, manager, database, tmp_path, monkeypatch):
+        backup = manager.create_database_backup('incremental')
+        restored = tmp_path / 'restored.db'
+        monkeypatch.setenv('DATABASE_URL', f"sqlite:///{restored}")
+
+        assert manager.restore_database(backup.file_path)
+        connection = sqlite3.connect(restored)
+        assert connection.execute('SELECT COUNT(*) FROM notes').fetchone()[0] == 5000
+        connection.close()
+        assert (tmp_path / 'cloud' / 'store' / 'manifests' / os.path.basename(backup.file_path)).exists()
+
+    def test_cleanup_expires_local_and_cloud_stores(self, manager, database, tmp_path):
+        old = manager.create_database_backup('incremental')
+        connection = sqlite3.connect(database)
+        connection.execute("DELETE FROM notes WHERE id > 100")
+        connection.commit()
+        connection.close()
+        manager.create_database_backup('incremental')
+        expired = os.path.basename(old.file_path)
+        aged = 1_000_000_000   # 2001, far past any retention
+        for root in (tmp_path / 'local' / 'store', tmp_path / 'cloud' / 'store'):
+            os.utime(root / 'manifests' / expired, (aged, aged))
+
+        manager._cleanup_old_backups()
+
+        for root in (tmp_path / 'local' / 'store', tmp_path / 'cloud' / 'store'):
+            assert len(list((root / 'manifests').glob('*.json'))) == 1
+            assert not (root / 'manifests' / expired).exists()
+        cloud = ChunkStore(str(tmp_path / 'cloud' / 'store'))
+        live = {d for path in cloud.manifest_dir.glob('*.json') for d, _ in cloud.load_manifest(str(path))['chunks']}
+        assert {p.name for p in cloud.chunk_dir.glob('*/*')} == live
@@ -0,0 +1,230 @@
+"""
+Circuit Breaker Tests
+Shared state across several breaker instances standing in for workers:
+fleet-wide failure windows, local rejection while open, the single-probe
+lease under a concurrent burst, and fallback when Redis fails. Each
+scenario runs on the in-memory backend and on the Redis script when
+fakeredis can run Lua.
+"""
+
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import pytest
+
+from services.circuit_breaker import (
+    CircuitBreaker, CircuitBreakerConfig, CircuitBreakerManager, CircuitBreakerOpenError,
+    CircuitState, MemoryBreakerBackend, RedisBreakerBackend, _default_backend
+)
+
+
+class Clock:
+    def __init__(self, now=1_700_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class CountingBackend:
+    def __init__(self, backend):
+        self.backend = backend
+        self.calls = 0
+
+    def transition(self, *args):
+        self.calls += 1
+        return self.backend.transition(*args)
+
+
+class BrokenBackend:
+    def transition(self, *args):
+        raise ConnectionError("redis down")
+
+
+def _fail():
+    raise RuntimeError("upstream error")
+
+
+def _ok():
+    return 'ok'
+
+
+CONFIG = CircuitBreakerConfig(failure_threshold=3, recovery_timeout=30, success_threshold=2,
+                              request_timeout=10, failure_window=60)
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture(params=['memory', 'redis'])
+def backend(request):
+    if request.param == 'memory':
+        return MemoryBreakerBackend()
+    pytest.importorskip('lupa')   # fakeredis needs lupa for EVAL
+    fakeredis = pytest.importorskip('fakeredis')
+    return RedisBreakerBackend(fakeredis.FakeRedis(server=fakeredis.FakeServer()))
+
+
+def _workers(backend, clock, n=4):
+    return [CircuitBreaker('upstream', CONFIG, backend, clock) for _ in range(n)]
+
+
+def _trip(workers):
+    for worker in workers[:CONFIG.failure_threshold]:
+        with pytest.raises(RuntimeError):
+            worker.call(_fail)
+
+
+class TestSharedWindow:
+    def test_failures_from_different_workers_open_breaker_for_all(self, backend, clock):
+        workers = _workers(backend, clock)
+        _trip(workers)
+        # Workers that saw CLOSED trust it for one refresh interval
+        clock.now += CONFIG.state_refresh_interval
+
+        for worker in workers:
+            with pytest.raises(CircuitBreakerOpenError):
+                worker.call(_ok)
+        assert workers[-1].get_stats()['state'] == 'open'
+
+    def test_failures_outside_window_do_not_count(self, backend, clock):
+        workers = _workers(backend, clock)
+        for worker in workers[:CONFIG.failure_threshold - 1]:
+            with pytest.raises(RuntimeError):
+                worker.call(_fail)
+        clock.now += CONFIG.failure_window + 1
+
+        with pytest.raises(RuntimeError):
+            workers[-1].call(_fail)
+        assert workers[-1].call(_ok) == 'ok'
+        assert workers[-1].get_stats()['shared_failures_in_window'] == 1
+
+    def test_open_rejections_are_answered_locally(self, backend, clock):
+        counting = CountingBackend(backend)
+        worker = CircuitBreaker('upstream', CONFIG, counting, clock)
+        _trip([worker] * CONFIG.failure_threshold)
+
+        calls = counting.calls
+        for _ in range(100):
+            with pytest.raises(CircuitBreakerOpenError):
+                worker.call(_ok)
+        assert counting.calls == calls
+        assert worker.stats.local_rejections == 100
+
+    def test_closed_state_is_cached_between_refreshes(self, backend, clock):
+        counting = CountingBackend(backend)
+        worker = CircuitBreaker('upstream', CONFIG, counting, clock)
+        for _ in range(50):
+            worker.call(_ok)
+        assert counting.calls == 1
+
+
+class TestProbeLease:
+    def test_one_probe_under_concurrent_burst(self, backend, clock):
+        workers = _workers(backend, clock, n=8)
+        _trip(workers)
+        clock.now += CONFIG.recovery_timeout
+
+        upstream_calls = []
+        release = threading.Event()
+
+        def slow_probe():
+            upstream_calls.append(1)
+            release.wait(5)
+            return 'ok'
+
+        def attempt(worker):
+            try:
+                return worker.call(slow_probe)
+            except CircuitBreakerOpenError:
+                return 'rejected'
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            futures = [pool.submit(attempt, worker) for worker in workers]
+            # Everyone else is turned away while the probe is still in flight
+            wait(futures, timeout=5, return_when=FIRST_COMPLETED)
+            while sum(f.done() for f in futures) < len(futures) - 1:
+                time.sleep(0.001)
+            release.set()
+            results = [f.result() for f in futures]
+
+        assert len(upstream_calls) == 1
+        assert results.count('ok') == 1
+        assert results.count('rejected') == 7
+        assert sum(worker.stats.probes for worker in workers) == 1
+
+    def test_successful_probes_close_breaker(self, backend, clock):
+        workers = _workers(backend, clock)
+        _trip(workers)
+        clock.now += CONFIG.recovery_timeout
+
+        assert workers[0].call(_ok) == 'ok'
+        assert workers[0].get_stats()['state'] == 'half_open'
+        assert workers[1].call(_ok) == 'ok'   # Lease released, next worker probes
+
+        for worker in workers:
+            assert worker.call(_ok) == 'ok'
+        assert workers[-1].get_stats()['state'] == 'closed'
+
+    def test_probe_failure_reopens_for_everyone(self, backend, clock):
+        workers = _workers(backend, clock)
+        _trip(workers)
+        clock.now += CONFIG.recovery_timeout
+
+        with pytest.raises(RuntimeError):
+            workers[0].call(_fail)
+        for worker in workers[1:]:
+            with pytest.raises(CircuitBreakerOpenError):
+                worker.call(_ok)
+        assert workers[1].get_stats()['open_until'] == pytest.approx(clock.now + CONFIG.recovery_timeout)
+
+    def test_expired_lease_is_granted_to_another_worker(self, backend, clock):
+        workers = _workers(backend, clock)
+        _trip(workers)
+        clock.now += CONFIG.recovery_timeout
+
+        # A probe whose worker died never reports back
+        view = backend.transition('probe', 'upstream', clock.now, CONFIG, 'lost-worker')
+        assert view.probe_granted
+        with pytest.raises(CircuitBreakerOpenError):
+            workers[1].call(_ok)
+
+        clock.now += CONFIG.probe_lease
+        assert workers[1].call(_ok) == 'ok'
+        assert workers[1].stats.probes == 1
+
+
+class TestDegradedBackend:
+    def test_falls_back_to_local_state_when_shared_state_fails(self, clock):
+        worker = CircuitBreaker('upstream', CONFIG, BrokenBackend(), clock)
+        _trip([worker] * CONFIG.failure_threshold)
+
+        with pytest.raises(CircuitBreakerOpenError):
+            worker.call(_ok)
+        stats = worker.get_stats()
+        assert stats['state'] == 'open'
+        assert stats['shared_state_degraded']
+
+    def test_manager_breakers_share_backend(self, clock):
+        backend = MemoryBreakerBackend()
+        first, second = CircuitBreakerManager(backend), CircuitBreakerManager(backend)
+        for _ in range(CONFIG.failure_threshold):
+            with pytest.raises(RuntimeError):
+                first.get_breaker('openai_api', CONFIG).call(_fail)
+
+        with pytest.raises(CircuitBreakerOpenError):
+            second.get_breaker('openai_api', CONFIG).call(_ok)
+        assert second.health_check()['overall_health'] == 'unhealthy'
+        second.get_breaker('openai_api').reset()
+        assert second.get_breaker('openai_api').state == CircuitState.CLOSED
+
+    def test_redis_backend_uses_short_timeouts(self, monkeypatch):
+        pytest.importorskip('redis')
+        monkeypatch.setenv('REDIS_URL', 'redis://localhost:6379/0')
+        backend = _default_backend()
+        assert isinstance(backend, RedisBreakerBackend)
+        kwargs = backend.redis_client.connection_pool.connection_kwargs
+        assert kwargs['socket_timeout'] == kwargs['socket_connect_timeout'] == 0.25
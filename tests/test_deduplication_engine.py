@@ -0,0 +1,143 @@
+"""
+Deduplication Engine Tests
+Replays recorded interim/final result streams and checks every decision
+against the pairwise-scan implementation, plus the time-bucketed
+SegmentIndex and the bounds that skip alignments.
+"""
+
+import hashlib
+import json
+import math
+import os
+
+import pytest
+
+from services.deduplication_engine import (
+    AdvancedDeduplicationEngine, SegmentIndex, TextSegment, TranscriptionResult
+)
+
+FIXTURE = os.path.join(os.path.dirname(__file__), 'data', 'dedup_interim_results.json')
+
+
+class Clock:
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def _load_scenarios():
+    with open(FIXTURE) as f:
+        return json.load(f)['scenarios']
+
+
+def _segment(start, end, text='some words here', segment_id='s'):
+    return TextSegment(text=text, start_time=start, end_time=end, confidence=0.5, segment_id=segment_id)
+
+
+def _result(text, start, end, chunk='c', confidence=0.5, is_final=False):
+    return TranscriptionResult(text, confidence, start, end, chunk, is_final)
+
+
+class TestRecordedStreams:
+    @pytest.mark.parametrize('scenario', _load_scenarios(), ids=lambda s: s['name'])
+    def test_decisions_match_recording(self, scenario):
+        clock = Clock()
+        engine = AdvancedDeduplicationEngine(clock=clock, **scenario['config'])
+        responses = []
+        for (text, confidence, start, end, chunk, final, speaker, arrival), expected in zip(
+                scenario['results'], scenario['expected']):
+            clock.now = arrival
+            response = engine.process_transcription_result(
+                's', TranscriptionResult(text, confidence, start, end, chunk, final, speaker))
+            responses.append(response)
+            assert [response['action'], response['similar_segments_found'], response['confirmation_count'],
+                    (response['overlap_resolution'] or {}).get('action')] == expected, chunk
+
+        digest = hashlib.sha256(json.dumps(responses, sort_keys=True).encode()).hexdigest()
+        assert digest == scenario['responses_sha256']
+        assert engine.get_committed_transcript('s') == scenario['committed_transcript']
+        assert engine.get_session_stats('s') == scenario['session_stats']
+
+
+class TestSegmentIndex:
+    def test_candidates_cover_overlapping_and_nearby_segments(self):
+        index = SegmentIndex()
+        early, spanning, late = _segment(0, 1), _segment(1, 30), _segment(50, 51)
+        for segment in (early, spanning, late):
+            index.add(segment)
+
+        found = [entry.segment for entry in index.candidates(20, 22)]
+        assert found == [spanning]
+        assert [entry.segment for entry in index.candidates(0, 60)] == [early, spanning, late]
+
+    def test_refresh_moves_segment_to_new_buckets(self):
+        index = SegmentIndex()
+        segment = _segment(0, 1)
+        index.add(segment)
+        segment.end_time = 9
+        index.refresh(segment)
+        assert [entry.segment for entry in index.candidates(8, 8.5)] == [segment]
+
+        index.discard(segment)
+        assert index.candidates(0, 10) == [] and len(index) == 0
+
+    def test_unbounded_segments_are_always_candidates(self):
+        index = SegmentIndex()
+        forever, normal = _segment(0, math.inf), _segment(100, 101)
+        index.add(forever)
+        index.add(normal)
+        assert [entry.segment for entry in index.candidates(500, 501)] == [forever]
+        assert len(index.candidates(-math.inf, 0)) == 2
+
+    def test_signature_follows_text_changes(self):
+        index = SegmentIndex(signatures=True)
+        segment = _segment(0, 1, text='Hello, World!')
+        index.add(segment)
+        assert index.signature(index.candidates(0, 1)[0]).normalized == 'hello world'
+        segment.text = 'Goodbye.'
+        assert index.signature(index.candidates(0, 1)[0]).normalized == 'goodbye'
+
+
+class TestCandidateLookup:
+    def test_repeated_interim_confirms_segment(self):
+        engine = AdvancedDeduplicationEngine(clock=Clock())
+        engine.process_transcription_result('s', _result('ship the billing', 0.0, 1.0))
+        response = engine.process_transcription_result('s', _result('Ship the billing!', 0.1, 1.2, 'c2'))
+        assert response['similar_segments_found'] == 1
+        assert response['action'] == 'commit_confirmed'
+        assert len(engine.segment_index['s']) == 0   # committed segments leave the index
+
+    def test_glued_words_still_match_without_shared_tokens(self):
+        engine = AdvancedDeduplicationEngine(clock=Clock())
+        engine.process_transcription_result('s', _result('billing migration', 0.0, 1.0))
+        response = engine.process_transcription_result('s', _result('billingmigration', 0.0, 1.0, 'c2'))
+        assert response['similar_segments_found'] == 1
+
+    def test_distant_segments_are_not_compared(self):
+        engine = AdvancedDeduplicationEngine(clock=Clock())
+        engine.process_transcription_result('s', _result('ship it', 0.0, 1.0))
+        response = engine.process_transcription_result('s', _result('ship it', 60.0, 61.0, 'c2'))
+        assert response['similar_segments_found'] == 0
+        assert len(engine.active_segments['s']) == 2
+
+    def test_full_deque_evicts_from_index(self):
+        engine = AdvancedDeduplicationEngine(clock=Clock(), max_segments=3)
+        for i in range(5):
+            engine.process_transcription_result('s', _result(f'word{i}', i * 10.0, i * 10.0 + 1, f'c{i}'))
+        assert len(engine.active_segments['s']) == 3
+        assert sorted(s.segment_id for s in engine.segment_index['s'].segments()) == \
+            sorted(s.segment_id for s in engine.active_segments['s'])
+
+    def test_cleanup_drops_stale_uncommitted_segments(self):
+        clock = Clock()
+        engine = AdvancedDeduplicationEngine(clock=clock, stability_window_s=1.0)
+        engine.process_transcription_result('s', _result('um', 0.0, 0.5))
+        clock.now = 10.0
+        engine.process_transcription_result('s', _result('yeah', 10.0, 10.5, 'c2'))
+        assert [s.text for s in engine.active_segments['s']] == ['yeah']
+        assert len(engine.segment_index['s']) == 1
+
+        engine.cleanup_session('s')
+        assert 's' not in engine.segment_index and 's' not in engine.committed_index
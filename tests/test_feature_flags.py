@@ -0,0 +1,170 @@
+"""
+Feature Flag Tests
+Version-stamped snapshot refresh across processes, per-request pinning,
+stable percentage rollouts and user targeting.
+"""
+
+from contextlib import contextmanager
+
+import pytest
+from flask import Flask, g
+
+from models import db
+from models.core_models import FeatureFlag
+from services.feature_flags import (
+    DatabaseVersionStore, FlagRule, FlagSnapshot, MemoryVersionStore, _Flags, current_snapshot,
+    require_flag, rollout_bucket
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def flags_app():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@contextmanager
+def _request(app):
+    """A request with its own app context (and so its own g), as in production."""
+    with app.app_context(), app.test_request_context('/'):
+        yield
+
+
+def _set_flag(key, enabled, **fields):
+    flag = FeatureFlag.query.filter_by(key=key).first() or FeatureFlag(key=key)
+    flag.enabled = enabled
+    for name, value in fields.items():
+        setattr(flag, name, value)
+    db.session.add(flag)
+    db.session.commit()
+
+
+class TestRefresh:
+    def test_change_converges_within_check_interval(self, flags_app):
+        store, clock = MemoryVersionStore(), FakeClock()
+        writer = _Flags(store, check_interval=2.0, clock=clock)
+        reader = _Flags(store, check_interval=2.0, clock=clock)   # Another worker
+        _set_flag('beta', False)
+        assert reader.snapshot().get('beta') is False
+
+        _set_flag('beta', True)
+        writer.invalidate_cache()
+        assert writer.snapshot().get('beta') is True
+        clock.now = 1.9
+        assert reader.snapshot().get('beta') is False   # Still inside the bound
+        clock.now = 2.0
+        assert reader.snapshot().get('beta') is True
+
+    def test_unchanged_version_does_not_reload(self, flags_app):
+        clock = FakeClock()
+        service = _Flags(MemoryVersionStore(), check_interval=1.0, clock=clock)
+        _set_flag('beta', True)
+        first = service.snapshot()
+        for step in range(1, 6):
+            clock.now = step
+            assert service.snapshot() is first
+
+        assert service.stats['reloads'] == 1
+        assert service.stats['version_checks'] == 6
+
+    def test_failed_refresh_keeps_serving_last_snapshot(self, flags_app, monkeypatch):
+        store, clock = MemoryVersionStore(), FakeClock()
+        service = _Flags(store, check_interval=1.0, clock=clock)
+        _set_flag('beta', True)
+        assert service.snapshot().get('beta') is True
+
+        def unavailable():
+            raise ConnectionError("redis down")
+
+        monkeypatch.setattr(store, 'get', unavailable)
+        clock.now = 5
+        assert service.snapshot().get('beta') is True
+        assert service.stats['errors'] == 1
+        assert service.snapshot().get('beta') is True and service.stats['errors'] == 1   # No retry until the interval passes
+
+    def test_failed_database_read_rolls_back_the_session(self, flags_app, monkeypatch):
+        store = DatabaseVersionStore()
+        service = _Flags(store, check_interval=1.0, clock=FakeClock())
+        rollbacks = []
+        monkeypatch.setattr(db.session, 'rollback', lambda: rollbacks.append(1))
+        monkeypatch.setattr(store, 'get', lambda: db.session.execute(db.text('SELECT missing FROM nowhere')))
+
+        service.refresh()
+        assert service.stats['errors'] == 1 and rollbacks == [1]
+
+    def test_database_version_store(self, flags_app):
+        store = DatabaseVersionStore()
+        assert store.get() == 0
+        assert store.bump() == 1
+        assert store.bump() == 2
+
+
+class TestRequestSnapshot:
+    def test_snapshot_is_pinned_for_the_request(self, flags_app, monkeypatch):
+        store = MemoryVersionStore()
+        service = _Flags(store, check_interval=0)
+        _set_flag('beta', True)
+        monkeypatch.setattr('services.feature_flags.flags', service)
+
+        with _request(flags_app):
+            pinned = current_snapshot()
+            _set_flag('beta', False)
+            service.invalidate_cache()
+            assert current_snapshot() is pinned and pinned.get('beta') is True
+            assert g._flag_snapshot is pinned
+        with _request(flags_app):
+            assert current_snapshot().get('beta') is False
+
+    def test_require_flag_uses_snapshot(self, flags_app, monkeypatch):
+        service = _Flags(MemoryVersionStore(), check_interval=0)
+        monkeypatch.setattr('services.feature_flags.flags', service)
+        _set_flag('reports', False)
+
+        @require_flag('reports')
+        def view():
+            return 'ok'
+
+        with _request(flags_app):
+            with pytest.raises(Exception) as excinfo:
+                view()
+            assert getattr(excinfo.value, 'code', None) == 403
+        _set_flag('reports', True)
+        service.invalidate_cache()
+        with _request(flags_app):
+            assert view() == 'ok'
+
+
+class TestRollouts:
+    def test_percentage_rollout_is_stable_and_proportional(self):
+        rule = FlagRule(enabled=True, rollout_percentage=25)
+        enabled = [user for user in range(20000) if rule.is_enabled('new-ui', user)]
+
+        assert 0.23 < len(enabled) / 20000 < 0.27
+        assert enabled == [user for user in range(20000) if rule.is_enabled('new-ui', user)]
+        assert rollout_bucket('new-ui', 42) == rollout_bucket('new-ui', '42')
+
+    def test_targets_and_disabled_flags(self):
+        snapshot = FlagSnapshot(1, {
+            'partial': FlagRule(enabled=True, rollout_percentage=0, target_users=frozenset({'7'})),
+            'off': FlagRule(enabled=False, target_users=frozenset({'7'})),
+        })
+
+        assert snapshot.get('partial', user_id=7) is True
+        assert snapshot.get('partial', user_id=8) is False
+        assert snapshot.get('partial') is False   # Anonymous requests are outside partial rollouts
+        assert snapshot.get('off', user_id=7) is False
+        assert snapshot.get('missing', default=True) is True
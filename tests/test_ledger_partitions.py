@@ -0,0 +1,197 @@
+"""
+Ledger Partition Tests
+Partition windows, per-partition GROUP BY compaction with whole-partition
+retirement, and session queries bounded for partition pruning.
+"""
+
+import random
+from datetime import datetime, timedelta
+
+import pytest
+from flask import Flask
+
+from models import db
+from models.compaction_summary import CompactionSummary
+from models.event_ledger import EventLedger, EventStatus, EventType
+from models.session import Session
+from services.event_ledger_service import EventLedgerService
+from services.ledger_compactor import LedgerCompactor
+from services.ledger_partitions import LedgerPartitionManager, get_ledger_partition_manager
+
+
+NOW = datetime(2026, 10, 18, 12, 0, 0)
+
+
+@pytest.fixture
+def ledger_app():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def _event(days_ago, status=EventStatus.COMPLETED, event_type=EventType.TASK_UPDATE, hour=9, **kwargs):
+    return EventLedger(event_type=event_type, event_name=event_type.value, status=status,
+                       created_at=NOW - timedelta(days=days_ago) + timedelta(hours=hour - 12),
+                       duration_ms=kwargs.pop('duration_ms', 10.0), **kwargs)
+
+
+def _row_summary(events):
+    """Reference summary computed row by row in Python."""
+    by_type, by_status = {}, {}
+    for event in events:
+        by_type[event.event_type.value] = by_type.get(event.event_type.value, 0) + 1
+        by_status[event.status.value] = by_status.get(event.status.value, 0) + 1
+    created = [e.created_at for e in events]
+    return {
+        'total_events': len(events),
+        'by_type': by_type,
+        'by_status': by_status,
+        'total_duration_ms': sum(e.duration_ms or 0.0 for e in events),
+        'date_range': {'start': min(created).isoformat(), 'end': max(created).isoformat()},
+    }
+
+
+class TestPartitionWindows:
+    def test_windows_are_day_aligned(self):
+        manager = LedgerPartitionManager(partition_days=1)
+        partition = manager.partition_for(NOW)
+        assert partition.name == 'event_ledger_p20261018'
+        assert (partition.start, partition.end) == (datetime(2026, 10, 18), datetime(2026, 10, 19))
+
+    def test_multi_day_windows_tile_without_gaps(self):
+        manager = LedgerPartitionManager(partition_days=7)
+        moment = datetime(2026, 1, 1)
+        previous_end = None
+        for _ in range(20):
+            start, end = manager.bounds_for(moment)
+            assert start <= moment < end and end - start == timedelta(days=7)
+            assert previous_end in (None, start)
+            previous_end, moment = end, end
+
+    def test_prune_floor_allows_one_window_of_skew(self):
+        manager = LedgerPartitionManager(partition_days=1)
+        assert manager.prune_floor(NOW) == datetime(2026, 10, 17)
+
+    def test_manager_is_singleton(self):
+        assert get_ledger_partition_manager() is get_ledger_partition_manager()
+
+
+class TestCompaction:
+    def test_retires_whole_partitions_past_retention(self, ledger_app):
+        db.session.add_all([
+            _event(45), _event(45, hour=15), _event(45, EventStatus.PENDING),
+            _event(40, EventStatus.FAILED), _event(40),  # the failure is carried until 90 days
+            _event(100, EventStatus.FAILED, EventType.ERROR_OCCURRED, duration_ms=None),
+            _event(100),
+            _event(5), _event(0),
+        ])
+        db.session.commit()
+
+        result = LedgerCompactor().compact_events(now=NOW)
+
+        assert result['success']
+        assert result['partitions'] == ['event_ledger_p20260710', 'event_ledger_p20260903',
+                                        'event_ledger_p20260908']
+        assert result['events_deleted'] == 6
+        remaining = sorted((NOW - e.created_at).days for e in db.session.query(EventLedger))
+        assert remaining == [0, 5, 40]
+
+        summaries = {s.partition_name: s for s in db.session.query(CompactionSummary)}
+        oldest = summaries['event_ledger_p20260710']
+        assert oldest.events_by_status == {'failed': 1, 'completed': 1}
+        assert oldest.events_by_type == {'error_occurred': 1, 'task_update': 1}
+        assert oldest.total_duration_ms == 10.0
+        assert summaries['event_ledger_p20260903'].events_deleted == 3
+        assert summaries['event_ledger_p20260908'].events_by_status == {'completed': 1}
+
+        # Once past the failed retention the carried failure is retired too
+        later = LedgerCompactor().compact_events(now=NOW + timedelta(days=60))
+        assert 'event_ledger_p20260908' in later['partitions']
+        assert db.session.query(EventLedger).filter_by(status=EventStatus.FAILED).count() == 0
+
+    def test_each_status_keeps_its_own_retention(self, ledger_app):
+        db.session.add_all([
+            _event(10), _event(10, EventStatus.PENDING),  # pending retired after 7 days
+            _event(200, EventStatus.PROCESSING), _event(200, EventStatus.SKIPPED),  # never retired
+            _event(200),
+        ])
+        db.session.commit()
+
+        result = LedgerCompactor().compact_events(now=NOW)
+
+        assert result['events_deleted'] == 2
+        summaries = {s.partition_name: s.events_by_status for s in db.session.query(CompactionSummary)}
+        assert summaries == {'event_ledger_p20260401': {'completed': 1}, 'event_ledger_p20261008': {'pending': 1}}
+        remaining = sorted((e.status.value, (NOW - e.created_at).days) for e in db.session.query(EventLedger))
+        assert remaining == [('completed', 10), ('processing', 200), ('skipped', 200)]
+
+        # Nothing left to retire: carried rows are not summarised again
+        assert LedgerCompactor().compact_events(now=NOW)['partitions'] == []
+
+    def test_group_by_summary_matches_row_summary(self, ledger_app):
+        rng = random.Random(35)
+        events = [
+            _event(50, rng.choice(list(EventStatus)), rng.choice(list(EventType)),
+                   hour=rng.randint(0, 23), duration_ms=rng.choice([None, rng.uniform(1, 500)]))
+            for _ in range(200)
+        ]
+        db.session.add_all(events)
+        db.session.commit()
+
+        manager = get_ledger_partition_manager()
+        partition, = manager.list_partitions(db.session.connection(), before=NOW)
+        grouped = manager.summarize(db.session.connection(), partition)
+        per_row = _row_summary(events)
+
+        assert grouped['total_events'] == per_row['total_events'] == 200
+        assert grouped['by_type'] == per_row['by_type']
+        assert grouped['by_status'] == per_row['by_status']
+        assert grouped['total_duration_ms'] == pytest.approx(per_row['total_duration_ms'])
+        assert grouped['date_range'] == per_row['date_range']
+
+    def test_dry_run_reports_without_dropping(self, ledger_app):
+        db.session.add_all([_event(60), _event(61)])
+        db.session.commit()
+
+        result = LedgerCompactor().compact_events(dry_run=True, now=NOW)
+
+        assert result['events_found'] == 2
+        assert result['summary_ids'] == []
+        assert db.session.query(EventLedger).count() == 2
+        assert db.session.query(CompactionSummary).count() == 0
+
+    def test_max_partitions_bounds_a_run(self, ledger_app):
+        db.session.add_all([_event(days) for days in range(40, 50)])
+        db.session.commit()
+
+        compactor = LedgerCompactor()
+        assert len(compactor.compact_events(max_partitions=3, now=NOW)['partitions']) == 3
+        assert db.session.query(EventLedger).count() == 7
+        assert compactor.get_metrics()['summaries_created'] == 3
+
+
+class TestSessionPruning:
+    def test_session_queries_are_bounded_by_session_start(self, ledger_app):
+        session = Session(external_id='ext-1', title='t', status='active', started_at=NOW - timedelta(hours=2))
+        db.session.add(session)
+        db.session.commit()
+        db.session.add_all([
+            _event(0, session_id=session.id, external_session_id='ext-1'),
+            _event(0, session_id=session.id, external_session_id='ext-1', hour=11),
+            _event(30, session_id=None, external_session_id='ext-other'),
+        ])
+        db.session.commit()
+
+        floor = EventLedgerService._session_floor(external_session_id='ext-1')
+        assert floor == datetime(2026, 10, 17)
+        assert EventLedgerService._session_floor(session_id=session.id) == floor
+        assert EventLedgerService._session_floor(external_session_id='missing') is None
+
+        events = EventLedgerService.get_session_events(external_session_id='ext-1')
+        assert [e.created_at.hour for e in events] == [9, 11]
+        assert EventLedgerService.get_last_event(session_id=session.id).created_at.hour == 11
@@ -0,0 +1,242 @@
+"""
+LLM Response Cache Tests
+Prompt-level caching, TTL/LRU eviction and single-flight coalescing.
+"""
+
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from services.ai_model_manager import AIModelManager
+from services.llm_response_cache import LLMResponseCache
+import services.llm_response_cache as llm_cache_module
+
+
+def _response(text="ok", tokens=100):
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=text))],
+        usage=SimpleNamespace(total_tokens=tokens),
+    )
+
+
+REQUEST = {"messages": [{"role": "user", "content": "hello"}], "temperature": 0.3}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestLLMResponseCache:
+    """Test caching behaviour of LLMResponseCache."""
+
+    def test_identical_requests_hit_cache(self):
+        cache = LLMResponseCache()
+        calls = []
+
+        def api_call():
+            calls.append(1)
+            return _response(tokens=250)
+
+        first = cache.get_or_call("gpt-4.1", REQUEST, api_call, caller="summary")
+        second = cache.get_or_call("gpt-4.1", dict(REQUEST), api_call, caller="summary")
+
+        assert first is second
+        assert len(calls) == 1
+        stats = cache.get_stats()['callers']['summary']
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+        assert stats['tokens_saved'] == 250
+        assert stats['hit_rate'] == 0.5
+
+    def test_key_includes_model_and_parameters(self):
+        cache = LLMResponseCache()
+        calls = []
+
+        def api_call():
+            calls.append(1)
+            return _response()
+
+        cache.get_or_call("gpt-4.1", REQUEST, api_call)
+        cache.get_or_call("gpt-4", REQUEST, api_call)
+        cache.get_or_call("gpt-4.1", {**REQUEST, "temperature": 0.9}, api_call)
+
+        assert len(calls) == 3
+
+    def test_ttl_expiry(self):
+        clock = FakeClock()
+        cache = LLMResponseCache(ttl_seconds=60, clock=clock)
+        calls = []
+
+        def api_call():
+            calls.append(1)
+            return _response()
+
+        cache.get_or_call("m", REQUEST, api_call)
+        clock.now += 59
+        cache.get_or_call("m", REQUEST, api_call)
+        clock.now += 2
+        cache.get_or_call("m", REQUEST, api_call)
+
+        assert len(calls) == 2
+
+    def test_lru_eviction_is_size_bounded(self):
+        cache = LLMResponseCache(max_entries=2)
+
+        for i in range(3):
+            cache.get_or_call("m", {"prompt": i}, lambda: _response())
+        # Touch prompt 1 so prompt 2 becomes least recently used
+        cache.get_or_call("m", {"prompt": 1}, lambda: _response())
+        cache.get_or_call("m", {"prompt": 3}, lambda: _response())
+
+        stats = cache.get_stats()
+        assert stats['entries'] == 2
+        assert stats['evictions'] == 2
+        calls = []
+        cache.get_or_call("m", {"prompt": 1}, lambda: calls.append(1) or _response())
+        assert calls == []
+
+    def test_errors_are_not_cached(self):
+        cache = LLMResponseCache()
+
+        def failing():
+            raise RuntimeError("503 service unavailable")
+
+        with pytest.raises(RuntimeError):
+            cache.get_or_call("m", REQUEST, failing)
+
+        response = cache.get_or_call("m", REQUEST, lambda: _response("recovered"))
+        assert response.choices[0].message.content == "recovered"
+        assert cache.get_stats()['callers']['default']['errors'] == 1
+
+    def test_refresh_bypasses_cached_response(self):
+        cache = LLMResponseCache()
+        cache.get_or_call("m", REQUEST, lambda: _response("bad json"))
+
+        fresh = cache.get_or_call("m", REQUEST, lambda: _response("good"), refresh=True)
+        again = cache.get_or_call("m", REQUEST, lambda: _response("unused"))
+
+        assert fresh.choices[0].message.content == "good"
+        assert again is fresh
+
+    def test_concurrent_identical_requests_are_coalesced(self):
+        cache = LLMResponseCache()
+        calls = []
+        release = threading.Event()
+
+        def slow_call():
+            calls.append(1)
+            release.wait(timeout=5)
+            return _response()
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(
+                cache.get_or_call("m", REQUEST, slow_call, caller="pipeline")))
+            for _ in range(8)
+        ]
+        for t in threads:
+            t.start()
+        time.sleep(0.1)
+        release.set()
+        for t in threads:
+            t.join()
+
+        assert len(calls) == 1
+        assert len(results) == 8
+        assert all(r is results[0] for r in results)
+        stats = cache.get_stats()['callers']['pipeline']
+        assert stats['coalesced'] == 7
+
+    def test_async_concurrent_requests_are_coalesced(self):
+        cache = LLMResponseCache()
+        calls = []
+
+        async def api_call():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return _response()
+
+        async def run():
+            return await asyncio.gather(*[
+                cache.get_or_call_async("m", REQUEST, api_call) for _ in range(5)
+            ])
+
+        results = asyncio.run(run())
+
+        assert len(calls) == 1
+        assert all(r is results[0] for r in results)
+
+    def test_async_error_propagates_to_waiters(self):
+        cache = LLMResponseCache()
+
+        async def api_call():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("timeout")
+
+        async def run():
+            return await asyncio.gather(*[
+                cache.get_or_call_async("m", REQUEST, api_call) for _ in range(3)
+            ], return_exceptions=True)
+
+        results = asyncio.run(run())
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+
+class TestModelManagerCaching:
+    """Test AIModelManager integration with the shared cache."""
+
+    @pytest.fixture(autouse=True)
+    def fresh_cache(self, monkeypatch):
+        monkeypatch.setattr(llm_cache_module, '_global_llm_cache', LLMResponseCache())
+
+    def test_call_with_fallback_uses_cache(self):
+        calls = []
+
+        def api_call(model):
+            calls.append(model)
+            return _response()
+
+        for _ in range(3):
+            result = AIModelManager.call_with_fallback(
+                api_call, operation_name="task extraction", cache_request=REQUEST
+            )
+            assert result.success
+
+        assert calls == [AIModelManager.MODEL_FALLBACK_CHAIN[0]]
+        stats = llm_cache_module.get_llm_cache().get_stats()
+        assert stats['callers']['task extraction']['hits'] == 2
+
+    def test_call_without_cache_request_is_uncached(self):
+        calls = []
+
+        def api_call(model):
+            calls.append(model)
+            return _response()
+
+        AIModelManager.call_with_fallback(api_call)
+        AIModelManager.call_with_fallback(api_call)
+
+        assert len(calls) == 2
+
+    def test_fallback_model_response_is_cached_per_model(self):
+        calls = []
+
+        def api_call(model):
+            calls.append(model)
+            if model == "primary":
+                raise RuntimeError("403 permission denied")
+            return _response()
+
+        chain = ["primary", "secondary"]
+        AIModelManager.call_with_fallback(api_call, custom_model_chain=chain, cache_request=REQUEST)
+        result = AIModelManager.call_with_fallback(api_call, custom_model_chain=chain, cache_request=REQUEST)
+
+        assert result.model_used == "secondary"
+        assert calls == ["primary", "secondary", "primary"]
@@ -0,0 +1,144 @@
+"""
+Log Pipeline Tests
+Queue-backed JSON logging, request context captured at log time, overflow
+accounting and per-call-site hot-path limits.
+"""
+
+import io
+import json
+import logging
+import queue
+
+import pytest
+from flask import Flask, g
+
+from services import log_pipeline
+from services.log_pipeline import (
+    AsyncQueueHandler, HotPathFilter, LogPipeline, StructuredJsonFormatter, get_log_pipeline
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def pipeline():
+    root = logging.getLogger()
+    saved_handlers, saved_level = root.handlers[:], root.level
+    instance = LogPipeline()
+    yield instance
+    instance.stop()
+    root.handlers[:] = saved_handlers
+    root.setLevel(saved_level)
+
+
+def _lines(stream):
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+class TestJsonPipeline:
+    def test_records_are_rendered_off_thread_with_request_context(self, pipeline):
+        stream = io.StringIO()
+        pipeline.configure(json_logs=True, level='INFO', async_logging=True, stream=stream)
+        app = Flask(__name__)
+        logger = logging.getLogger('tests.log_pipeline')
+
+        with app.test_request_context('/api/meetings', method='POST', headers={'User-Agent': 'pytest'}):
+            g.request_id = 'req-1'
+            logger.info("created %s", 'meeting', extra={'meeting_id': 7})
+        logger.info("outside request")
+        pipeline.stop()
+
+        inside, outside = _lines(stream)
+        assert inside['message'] == 'created meeting'
+        assert inside['request_id'] == 'req-1'
+        assert inside['http'] == {'method': 'POST', 'path': '/api/meetings', 'ip': None, 'user_agent': 'pytest'}
+        assert inside['meeting_id'] == 7
+        assert inside['hostname']
+        assert 'http' not in outside and 'log_context' not in outside
+
+    def test_exception_traceback_survives_the_queue(self, pipeline):
+        stream = io.StringIO()
+        pipeline.configure(json_logs=True, level='INFO', async_logging=True, stream=stream)
+        try:
+            raise ValueError("bad chunk")
+        except ValueError:
+            logging.getLogger('tests.log_pipeline').exception("decode failed")
+        pipeline.stop()
+
+        record, = _lines(stream)
+        assert record['exception']['type'] == 'ValueError'
+        assert record['exception']['message'] == 'bad chunk'
+        assert 'raise ValueError' in record['exception']['traceback']
+
+    def test_hostname_is_resolved_once(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(log_pipeline.socket, 'gethostname', lambda: calls.append(1) or 'worker-1')
+        formatter = StructuredJsonFormatter()
+        for i in range(3):
+            record = logging.LogRecord('x', logging.INFO, __file__, 1, 'm%d', (i,), None)
+            assert json.loads(formatter.format(record))['hostname'] == 'worker-1'
+        assert len(calls) == 1
+
+    def test_sync_mode_writes_directly(self, pipeline):
+        stream = io.StringIO()
+        handler = pipeline.configure(json_logs=False, level='WARNING', async_logging=False, stream=stream)
+        logging.getLogger('tests.log_pipeline').info("hidden")
+        logging.getLogger('tests.log_pipeline').warning("shown")
+        assert not isinstance(handler, AsyncQueueHandler)
+        assert stream.getvalue().count('\n') == 1 and 'shown' in stream.getvalue()
+
+
+class TestOverflow:
+    def test_full_queue_drops_and_reports_count(self):
+        handler = AsyncQueueHandler(queue.Queue(2))
+        for i in range(5):
+            handler.handle(logging.LogRecord('x', logging.INFO, __file__, 1, 'm%d', (i,), None))
+        assert (handler.enqueued, handler.dropped) == (2, 3)
+
+        handler.queue.get_nowait()
+        handler.handle(logging.LogRecord('x', logging.INFO, __file__, 1, 'next', (), None))
+        handler.queue.get_nowait()
+        assert handler.queue.get_nowait().dropped_records == 3
+
+
+class TestHotPathFilter:
+    def _record(self, line, level=logging.INFO):
+        return logging.LogRecord('hot', level, 'transcription_service.py', line, 'chunk', (), None)
+
+    def test_rate_limit_per_call_site(self):
+        clock = FakeClock()
+        hot_filter = HotPathFilter(per_second=2, clock=clock)
+        results = [hot_filter.filter(self._record(10)) for _ in range(5)]
+        assert results == [True, True, False, False, False]
+        assert hot_filter.filter(self._record(11))  # other site has its own budget
+        assert hot_filter.filter(self._record(10, logging.WARNING))
+
+        clock.now += 1.0
+        record = self._record(10)
+        assert hot_filter.filter(record)
+        assert record.suppressed == 3
+        assert hot_filter.suppressed_total == 3
+
+    def test_sampling_keeps_every_nth(self):
+        hot_filter = HotPathFilter(per_second=0, sample_every=4)
+        kept = sum(hot_filter.filter(self._record(20)) for _ in range(100))
+        assert kept == 25
+
+    def test_limit_hot_paths_installs_one_filter_per_logger(self, pipeline, monkeypatch):
+        monkeypatch.setenv('LOG_HOT_PATH_LOGGERS', 'tests.hot_a, tests.hot_b')
+        pipeline.limit_hot_paths()
+        pipeline.limit_hot_paths(per_second=1)
+        filters = [f for f in logging.getLogger('tests.hot_a').filters if isinstance(f, HotPathFilter)]
+        assert len(filters) == 1 and filters[0].per_second == 1
+        assert set(pipeline.get_stats()['suppressed']) == {'tests.hot_a', 'tests.hot_b'}
+        for name, hot_filter in pipeline.hot_path_filters.items():
+            logging.getLogger(name).removeFilter(hot_filter)
+
+    def test_pipeline_is_singleton(self):
+        assert get_log_pipeline() is get_log_pipeline()
@@ -0,0 +1,108 @@
+"""
+Meeting Insights Session State Tests
+Per-session locking, capped segment history and incremental aggregates.
+"""
+
+import threading
+
+from services.meeting_insights_service import MeetingInsightsService, SegmentHistory
+
+
+SEGMENTS = [
+    ("alice", "Welcome everyone, let's review the project timeline and deliverables."),
+    ("bob", "I'll send the updated budget report to finance by Friday."),
+    ("alice", "We decided to move the launch milestone to next quarter."),
+    ("carol", "The project deliverables look good, the timeline is realistic."),
+]
+
+
+def _feed(service, session_id, segments=SEGMENTS, start=0.0):
+    for i, (speaker, text) in enumerate(segments):
+        service.process_transcript_segment(session_id, speaker, text, start + i * 5.0,
+                                           {'compound': 0.2})
+
+
+class TestSegmentHistory:
+    def test_capped_columns(self):
+        history = SegmentHistory(max_segments=3)
+        for i in range(5):
+            history.append(f"s{i}", f"text {i}", float(i), {'compound': 0.1} if i % 2 else None)
+
+        assert len(history) == 3
+        assert history.total_segments == 5
+        rows = history.rows()
+        assert [r['text'] for r in rows] == ["text 2", "text 3", "text 4"]
+        assert rows[1]['sentiment'] == 0.1
+        assert rows[0]['sentiment'] is None
+
+
+class TestMeetingInsightsSessions:
+    def test_extracted_items_carry_session_id(self):
+        service = MeetingInsightsService()
+        _feed(service, "meeting-1")
+
+        insights = service.meeting_insights["meeting-1"]
+        assert insights.action_items
+        assert all("meeting-1" in item.id for item in insights.action_items)
+        assert insights.decisions
+        assert all("meeting-1" in d.id for d in insights.decisions)
+
+    def test_aggregates_match_full_transcript(self):
+        service = MeetingInsightsService()
+        _feed(service, "meeting-1")
+
+        all_text = " ".join(text.lower() for _, text in SEGMENTS)
+        state = service.sessions["meeting-1"]
+        for meeting_type, indicators in service.meeting_type_indicators.items():
+            expected = sum(all_text.count(indicator) for indicator in indicators)
+            assert state.indicator_counts.get(meeting_type, 0) == expected
+
+        cloud = service._generate_word_cloud_data("meeting-1")
+        assert cloud["project"] == 2
+        assert cloud["timeline"] == 2
+        assert "the" not in cloud
+
+    def test_summary_uses_whole_meeting_beyond_history_cap(self):
+        service = MeetingInsightsService(max_history_segments=2)
+        _feed(service, "meeting-1", SEGMENTS * 3)
+
+        assert len(service.get_session_segments("meeting-1")) == 2
+        assert service.sessions["meeting-1"].history.total_segments == 12
+        summary = service.generate_meeting_summary("meeting-1")
+        assert summary.word_cloud_data["project"] == 6
+
+        uncapped = MeetingInsightsService()
+        _feed(uncapped, "meeting-1", SEGMENTS * 3)
+        assert summary.meeting_type == uncapped.generate_meeting_summary("meeting-1").meeting_type
+
+    def test_sessions_are_isolated_under_concurrency(self):
+        service = MeetingInsightsService()
+        barrier = threading.Barrier(8)
+
+        def worker(n):
+            barrier.wait()
+            for round_ in range(10):
+                _feed(service, f"meeting-{n}", start=round_ * 100.0)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(service.sessions) == 8
+        for n in range(8):
+            state = service.sessions[f"meeting-{n}"]
+            assert state.history.total_segments == 10 * len(SEGMENTS)
+            assert state.insights is service.meeting_insights[f"meeting-{n}"]
+            assert state.insights.speaker_participation["bob"]["segment_count"] == 10
+
+    def test_clear_session_data(self):
+        service = MeetingInsightsService()
+        _feed(service, "meeting-1")
+        service.clear_session_data("meeting-1")
+
+        assert "meeting-1" not in service.sessions
+        assert "meeting-1" not in service.meeting_insights
+        assert service.get_session_segments("meeting-1") == []
+        assert service.generate_meeting_summary("meeting-1").action_items == []
@@ -0,0 +1,246 @@
+"""
+Metrics Registry Tests
+Quantile error bounds of the log-linear histograms against exact
+nearest-rank quantiles, merging, per-thread cells, the Prometheus text
+exposition, and the monitors that now record into the registry.
+"""
+
+import math
+import random
+import threading
+
+import pytest
+from flask import Flask
+
+from services.metrics_registry import (
+    RELATIVE_ERROR, HistogramSnapshot, MetricsRegistry, bucket_bounds, bucket_index
+)
+
+
+def exact_quantile(ordered, q):
+    return ordered[max(1, math.ceil(q * len(ordered))) - 1]
+
+
+DISTRIBUTIONS = {
+    'lognormal': lambda rng: rng.lognormvariate(-3, 1.5),
+    'uniform': lambda rng: rng.uniform(0.001, 2.0),
+    'exponential': lambda rng: rng.expovariate(20),
+    'bimodal': lambda rng: rng.gauss(0.02, 0.002) if rng.random() < 0.9 else rng.gauss(1.5, 0.1),
+    'wide': lambda rng: 10 ** rng.uniform(-7, 4),
+}
+
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry()
+
+
+class TestHistogramAccuracy:
+    @pytest.mark.parametrize('name', sorted(DISTRIBUTIONS))
+    def test_quantiles_within_relative_error(self, name):
+        rng = random.Random(name)
+        histogram = HistogramSnapshot()
+        values = [abs(DISTRIBUTIONS[name](rng)) or 1e-9 for _ in range(20000)]
+        for value in values:
+            histogram.observe(value)
+        values.sort()
+        for q in (0.0, 0.001, 0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.95, 0.99, 0.999, 1.0):
+            exact = exact_quantile(values, q)
+            assert abs(histogram.quantile(q) - exact) <= exact * RELATIVE_ERROR, q
+
+    def test_bucket_bounds_contain_value(self):
+        rng = random.Random(1)
+        for _ in range(5000):
+            value = 10 ** rng.uniform(-12, 12)
+            low, high = bucket_bounds(bucket_index(value))
+            assert low <= value < high
+            assert (high - low) / low <= 2 * RELATIVE_ERROR
+
+    def test_memory_is_bounded_by_range_not_count(self):
+        histogram = HistogramSnapshot()
+        rng = random.Random(2)
+        for _ in range(100000):
+            histogram.observe(rng.uniform(0.001, 10.0))
+        # 14 powers of two between 1ms and 10s, SUB_BUCKETS each
+        assert len(histogram.counts) <= 15 * 32
+        assert histogram.count == 100000
+
+    def test_merge_matches_single_histogram(self):
+        rng = random.Random(3)
+        values = [rng.expovariate(5) for _ in range(6000)]
+        whole, parts = HistogramSnapshot(), [HistogramSnapshot() for _ in range(3)]
+        for i, value in enumerate(values):
+            whole.observe(value)
+            parts[i % 3].observe(value)
+        merged = HistogramSnapshot().merge(parts[0]).merge(parts[1]).merge(parts[2])
+        assert merged.counts == whole.counts and merged.count == whole.count
+        assert merged.min == whole.min and merged.max == whole.max
+        assert merged.quantile(0.99) == whole.quantile(0.99)
+
+    def test_zero_and_empty(self):
+        histogram = HistogramSnapshot()
+        assert histogram.quantile(0.5) == 0.0
+        for value in (0.0, 0.0, 0.0, 2.0):
+            histogram.observe(value)
+        assert histogram.quantile(0.5) == 0.0
+        assert histogram.quantile(1.0) == 2.0
+        with pytest.raises(ValueError):
+            histogram.quantile(1.5)
+
+
+class TestRegistry:
+    def test_labels_normalize_values(self, registry):
+        requests = registry.counter('requests_total', 'Requests', ('route', 'status'))
+        requests.labels('home', 200).inc()
+        requests.labels('home', '200').inc(2)
+        requests.labels(route='home', status=200).inc()
+        assert [(values, metric.value()) for values, metric in requests.series()] == [(('home', '200'), 4.0)]
+        with pytest.raises(ValueError):
+            requests.labels('home')
+
+    def test_reregistration_returns_same_family(self, registry):
+        first = registry.histogram('latency_seconds', 'Latency', ('stage',))
+        assert registry.histogram('latency_seconds', 'Latency', ('stage',)) is first
+        with pytest.raises(ValueError):
+            registry.counter('latency_seconds', 'Latency', ('stage',))
+        with pytest.raises(ValueError):
+            registry.counter('bad-name', 'Nope')
+
+    def test_series_cap_folds_into_overflow(self):
+        registry = MetricsRegistry(max_series=3)
+        paths = registry.counter('paths_total', 'Paths', ('path',))
+        for i in range(10):
+            paths.labels(f'/p{i}').inc()
+        series = dict(paths.series())
+        assert len(series) == 4
+        assert series[('other',)].value() == 7
+
+    def test_concurrent_writers_lose_nothing(self, registry):
+        counter = registry.counter('events_total', 'Events')
+        histogram = registry.histogram('work_seconds', 'Work')
+
+        def work():
+            for i in range(5000):
+                counter.inc()
+                histogram.observe(0.001 * (i % 7 + 1))
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert counter.labels().value() == 40000
+        assert histogram.labels().snapshot().count == 40000
+        # Cells of finished threads are folded in and released
+        assert histogram.labels()._cells.read()[0].count == 40000
+        assert len(histogram.labels()._cells._cells) == 0
+
+    def test_threads_beyond_cell_cap_share_locked_cell(self, registry):
+        histogram = registry.histogram('capped_seconds', 'Capped').labels()
+        histogram._cells._max_cells = 2
+        barrier = threading.Barrier(6)
+
+        def work():
+            barrier.wait()
+            for _ in range(1000):
+                histogram.observe(0.5)
+            barrier.wait()
+
+        threads = [threading.Thread(target=work) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert histogram.snapshot().count == 6000
+
+
+class TestExposition:
+    def test_text_format(self, registry):
+        registry.counter('mina_requests_total', 'Requests "served"\nso far', ('route',)) \
+            .labels('a"b\\c').inc(3)
+        registry.gauge('mina_queue_length', 'Queue').set(2.5)
+        latency = registry.histogram('mina_latency_seconds', 'Latency', ('stage',), buckets=(0.1, 1.0))
+        for value in (0.05, 0.2, 0.3, 5.0):
+            latency.labels('asr').observe(value)
+
+        assert registry.expose().splitlines() == [
+            '# HELP mina_latency_seconds Latency',
+            '# TYPE mina_latency_seconds histogram',
+            'mina_latency_seconds_bucket{stage="asr",le="0.1"} 1',
+            'mina_latency_seconds_bucket{stage="asr",le="1"} 3',
+            'mina_latency_seconds_bucket{stage="asr",le="+Inf"} 4',
+            'mina_latency_seconds_sum{stage="asr"} 5.55',
+            'mina_latency_seconds_count{stage="asr"} 4',
+            '# HELP mina_queue_length Queue',
+            '# TYPE mina_queue_length gauge',
+            'mina_queue_length 2.5',
+            '# HELP mina_requests_total Requests "served"\\nso far',
+            '# TYPE mina_requests_total counter',
+            'mina_requests_total{route="a\\"b\\\\c"} 3',
+        ]
+
+    def test_snapshot_reports_quantiles(self, registry):
+        latency = registry.histogram('stage_seconds', 'Stage', ('stage',))
+        for i in range(1, 101):
+            latency.labels('vad').observe(i / 1000)
+        entry = registry.snapshot()['stage_seconds']['series'][0]
+        assert entry['labels'] == {'stage': 'vad'} and entry['count'] == 100
+        assert abs(entry['p99'] - 0.099) <= 0.099 * RELATIVE_ERROR
+
+
+class TestMonitorAdapters:
+    def test_middleware_records_route_and_serves_metrics(self, registry, monkeypatch):
+        from middleware import performance_middleware
+        from services.performance_monitoring import PerformanceMonitor
+
+        monkeypatch.setattr(performance_middleware, 'performance_monitor', PerformanceMonitor(registry))
+        app = Flask(__name__)
+
+        @app.route('/hello')
+        def hello():
+            return 'hi'
+
+        performance_middleware.setup_performance_middleware(app)
+        client = app.test_client()
+        assert client.get('/hello').headers['X-Response-Time'].endswith('ms')
+        client.get('/missing/123')
+
+        response = client.get('/metrics')
+        assert response.mimetype == 'text/plain'
+        body = response.get_data(as_text=True)
+        assert 'mina_http_request_duration_seconds_count{route="hello",method="GET",status="200"} 1' in body
+        assert 'route="unmatched",method="GET",status="404"' in body
+        assert client.get('/metrics?format=json').get_json()['performance']['requests'] >= 3
+
+    def test_transcription_monitor_keeps_window_averages(self, registry):
+        from services.performance_monitor import PerformanceMonitor
+
+        monitor = PerformanceMonitor(registry)
+        monitor.monitoring_active = False
+        monitor.start_session_monitoring('a')
+        monitor.start_session_monitoring('b')
+        for i in range(60):
+            monitor.record_chunk_latency('a', float(i))
+        monitor.record_chunk_latency('b', 1000.0)
+        monitor.record_queue_length('a', 4)
+        # Window of the last 50 for 'a' (10..59) plus 'b'
+        assert monitor.global_metrics['avg_latency_ms'] == pytest.approx((sum(range(10, 60)) + 1000) / 51)
+
+        monitor.end_session_monitoring('b')
+        monitor.record_chunk_latency('a', 60.0)
+        assert monitor.global_metrics['avg_latency_ms'] == pytest.approx(sum(range(11, 61)) / 50)
+        stage = registry.get('mina_pipeline_stage_duration_seconds').labels('transcription_chunk')
+        assert stage.snapshot().count == 62
+        assert registry.get('mina_transcription_active_sessions').labels().value() == 1
+
+    def test_tracker_percentiles_come_from_registry(self, registry):
+        from services.performance_tracker import PerformanceTracker
+
+        tracker = PerformanceTracker(registry)
+        for _ in range(3):
+            with tracker.track_operation('diarize', 'ctx'):
+                pass
+        summary = tracker.get_performance_summary()['operations']['diarize']
+        assert summary['total_operations'] == 3
+        assert set(summary['percentiles']) == {'p50', 'p90', 'p95', 'p99'}
+        assert registry.get('mina_pipeline_stage_duration_seconds').labels('diarize').snapshot().count == 3
@@ -0,0 +1,99 @@
+"""
+Pattern Matcher Tests
+The keyword-prefiltered matcher must return exactly what a per-pattern
+re.finditer loop returns.
+"""
+
+import random
+import re
+
+import pytest
+
+from services.pattern_matcher import (
+    EXTRACTION_PATTERNS, ExtractionPattern, KeywordSet, MultiPatternMatcher,
+    get_extraction_matcher
+)
+
+
+VOCABULARY = [
+    "I", "we", "you", "they", "will", "'ll", "should", "must", "need", "to", "have",
+    "going", "let's", "Let", "us", "assign", "delegate", "give", "TODO:", "Action",
+    "item:", "task", "reminder:", "remember", "don't", "forget", "deadline", "due",
+    "by", "Friday", "monday", "next", "week", "steps:", "follow", "up", "1.", "2)",
+    "review", "send", "the", "report", "budget", "deck", "we", "decided", "agreed",
+    "approved", "the plan is to", "we're going with", "someone", "ASAP", ".", "?",
+    "reach", "out", "contact", "Sarah", "tomorrow", "end of week", "accepted",
+]
+
+
+def _naive(patterns, text):
+    """Reference: run every pattern with re.finditer."""
+    results = {}
+    for p in patterns:
+        for m in re.finditer(p.regex, text, p.flags):
+            results.setdefault(p.group, []).append((p.name, m.span(), m.groups()))
+    return results
+
+
+def _scanned(matcher, text):
+    results = {}
+    for group, matches in matcher.scan(text).items():
+        if matches:
+            results[group] = [(t.pattern.name, t.match.span(), t.match.groups()) for t in matches]
+    return results
+
+
+class TestMultiPatternMatcher:
+    """Equivalence and ordering of the shared matcher."""
+
+    @pytest.mark.parametrize("text", [
+        "Action item: send the budget report to finance.",
+        "We'll review the deck tomorrow. Let's schedule a follow up with Sarah.",
+        "1. Review the contract 2) send notes",
+        "we decided to ship on friday and the plan is to freeze code by monday 12",
+        "Don't forget to update the roadmap. Deadline is next week.",
+        "nothing actionable here at all",
+        "",
+    ])
+    def test_matches_naive_loop(self, text):
+        matcher = get_extraction_matcher()
+        assert _scanned(matcher, text) == _naive(EXTRACTION_PATTERNS, text)
+        lowered = text.lower()
+        assert _scanned(matcher, lowered) == _naive(EXTRACTION_PATTERNS, lowered)
+
+    def test_matches_naive_loop_on_random_text(self):
+        rng = random.Random(1234)
+        matcher = get_extraction_matcher()
+        for _ in range(500):
+            words = [rng.choice(VOCABULARY) for _ in range(rng.randint(1, 30))]
+            text = " ".join(w.upper() if rng.random() < 0.1 else w for w in words)
+            assert _scanned(matcher, text) == _naive(EXTRACTION_PATTERNS, text)
+
+    def test_overlapping_keywords_are_all_detected(self):
+        patterns = [
+            ExtractionPattern("long", "g", r"follow up now", keywords=frozenset({"follow up"})),
+            ExtractionPattern("short", "g", r"follow", keywords=frozenset({"follow"})),
+            ExtractionPattern("inner", "g", r"low", keywords=frozenset({"low"})),
+        ]
+        matcher = MultiPatternMatcher(patterns)
+        names = [t.pattern.name for t in matcher.scan("please follow up now")["g"]]
+        assert names == ["long", "short", "inner"]
+
+    def test_group_selection_and_index(self):
+        matcher = get_extraction_matcher()
+        result = matcher.scan("we decided to use postgres", groups=["decision"])
+        assert list(result) == ["decision"]
+        assert result["decision"][0].pattern.name == "explicit"
+        assert result["decision"][0].index == 0
+
+    def test_pattern_without_keywords_always_runs(self):
+        matcher = MultiPatternMatcher([ExtractionPattern("any", "g", r"\d+")])
+        assert [t.match.group(0) for t in matcher.scan("call 42 and 7")["g"]] == ["42", "7"]
+
+
+class TestKeywordSet:
+    def test_contains_any(self):
+        keywords = KeywordSet(["follow up", "reach out", "setup"])
+        assert keywords.contains_any("please reach out to legal")
+        assert not keywords.contains_any("nothing to see")
+        assert not KeywordSet([]).contains_any("anything")
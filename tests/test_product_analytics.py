@@ -0,0 +1,198 @@
+"""
+Product Analytics Tests
+Buffered event ingestion (size/age flushing, bulk insert, spill file on
+database failure) and the single-query report metrics.
+"""
+
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from flask import Flask
+from sqlalchemy import func, select
+
+from models import db
+from services.product_analytics import AnalyticsEvent, AnalyticsEventBuffer, ProductAnalytics
+
+
+@pytest.fixture
+def analytics_app():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def spill_path(tmp_path):
+    return str(tmp_path / 'spill' / 'analytics.jsonl')
+
+
+def _count():
+    return db.session.scalar(select(func.count(AnalyticsEvent.id)))
+
+
+def _event(name, user_id, when):
+    db.session.add(AnalyticsEvent(event_name=name, user_id=user_id, timestamp=when, properties={}))
+
+
+class TestBufferedIngestion:
+    def test_track_defers_writes_until_flush(self, analytics_app, spill_path):
+        analytics = ProductAnalytics(buffer=AnalyticsEventBuffer(batch_size=100, max_age=60, spill_path=spill_path))
+        for user_id in range(10):
+            analytics.track_user_login(user_id)
+
+        assert _count() == 0
+        assert analytics.get_stats()['pending'] == 10
+        assert analytics.flush() == 10
+        assert _count() == 10
+        assert analytics.get_stats()['batches'] == 1
+
+    def test_full_batch_is_flushed_in_background(self, analytics_app, spill_path):
+        buffer = AnalyticsEventBuffer(batch_size=20, max_age=60, spill_path=spill_path)
+        analytics = ProductAnalytics(buffer=buffer)
+        for user_id in range(20):
+            analytics.track('feature.used', user_id=user_id)
+
+        deadline = time.monotonic() + 5
+        while buffer.stats['flushed'] < 20 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert buffer.stats['flushed'] == 20 and buffer.stats['batches'] == 1
+
+        analytics.track('feature.used', user_id=99)
+        time.sleep(0.05)
+        assert buffer.pending() == 1   # Neither full nor old yet
+        buffer.shutdown()
+        assert _count() == 21
+
+    def test_old_events_are_flushed_by_age(self, analytics_app, spill_path):
+        buffer = AnalyticsEventBuffer(batch_size=1000, max_age=0.05, spill_path=spill_path)
+        ProductAnalytics(buffer=buffer).track('user.login', user_id=1)
+
+        deadline = time.monotonic() + 5
+        while buffer.stats['flushed'] < 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert buffer.stats['flushed'] == 1
+        buffer.shutdown()
+
+    def test_failed_flush_spills_and_replays(self, analytics_app, spill_path, monkeypatch):
+        buffer = AnalyticsEventBuffer(batch_size=100, max_age=60, spill_path=spill_path)
+        analytics = ProductAnalytics(buffer=buffer)
+        analytics.track('task.created', user_id=7, properties={'task_id': 3})
+
+        def unavailable(rows):
+            raise RuntimeError("database is locked")
+
+        monkeypatch.setattr(AnalyticsEventBuffer, '_insert', staticmethod(unavailable))
+        assert analytics.flush() == 0
+        assert buffer.stats['spilled'] == 1 and buffer.stats['failed_flushes'] == 1
+
+        monkeypatch.undo()
+        analytics.track('task.completed', user_id=7)
+        analytics.flush()
+
+        rows = db.session.scalars(select(AnalyticsEvent).order_by(AnalyticsEvent.id)).all()
+        assert [row.event_name for row in rows] == ['task.created', 'task.completed']
+        assert rows[0].properties == {'task_id': 3} and isinstance(rows[0].timestamp, datetime)
+        assert buffer.stats['replayed'] == 1
+
+    def test_overflow_goes_to_spill_file(self, analytics_app, spill_path):
+        buffer = AnalyticsEventBuffer(batch_size=100, max_age=60, capacity=3, spill_path=spill_path)
+        analytics = ProductAnalytics(buffer=buffer)
+        for user_id in range(5):
+            analytics.track('user.login', user_id=user_id)
+
+        assert buffer.pending() == 3 and buffer.stats['spilled'] == 2
+        analytics.flush()
+        assert _count() == 5
+
+    def test_unserializable_row_is_dropped_alone(self, analytics_app, spill_path):
+        buffer = AnalyticsEventBuffer(batch_size=100, max_age=60, capacity=1, spill_path=spill_path)
+        analytics = ProductAnalytics(buffer=buffer)
+        analytics.track('user.login', user_id=1)
+        analytics.track('meeting.uploaded', user_id=2, properties={'file': object()})  # Overflows
+        analytics.track('user.logout', user_id=3)
+
+        assert buffer.stats['spilled'] == 1 and buffer.stats['dropped'] == 1
+        analytics.flush()
+        names = db.session.scalars(select(AnalyticsEvent.event_name).order_by(AnalyticsEvent.id)).all()
+        assert names == ['user.logout', 'user.login']
+
+    def test_flusher_survives_a_failing_flush(self, analytics_app, spill_path, monkeypatch):
+        buffer = AnalyticsEventBuffer(batch_size=1, max_age=0.05, spill_path=spill_path)
+        calls = []
+        original = AnalyticsEventBuffer.flush
+
+        def flaky_flush(self):
+            calls.append(1)
+            if len(calls) == 1:
+                raise TypeError("unexpected")
+            return original(self)
+
+        monkeypatch.setattr(AnalyticsEventBuffer, 'flush', flaky_flush)
+        ProductAnalytics(buffer=buffer).track('user.login', user_id=1)
+        deadline = time.monotonic() + 5
+        while buffer.stats['flushed'] < 1 and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert buffer.stats['flushed'] == 1 and len(calls) >= 2
+        assert buffer._worker.is_alive()
+        buffer._stopped.set()
+
+    def test_unbuffered_mode_writes_immediately(self, analytics_app):
+        analytics = ProductAnalytics(buffered=False)
+        analytics.track('user.login', user_id=1)
+        assert _count() == 1
+        assert analytics.get_stats() == {'buffered': False}
+
+
+class TestMetrics:
+    @pytest.fixture
+    def analytics(self, analytics_app):
+        return ProductAnalytics(buffered=False)
+
+    def test_activation_and_funnel(self, analytics):
+        now = datetime.utcnow()
+        _event('user.signup', 1, now - timedelta(days=2))
+        _event('user.signup', 2, now - timedelta(days=3))
+        _event('user.signup', 3, now - timedelta(days=30))   # Outside the 7-day window
+        _event('session.started', 1, now - timedelta(days=1))
+        _event('session.started', 1, now)
+        _event('session.started', 3, now)
+        _event('meeting.created', 2, now)
+        db.session.commit()
+
+        assert analytics.get_activation_rate(days=7) == pytest.approx(0.5)
+        funnel = analytics.get_conversion_funnel()
+        assert (funnel['signup'], funnel['first_session'], funnel['first_meeting'], funnel['created_task']) == (3, 2, 1, 0)
+        assert funnel['signup_to_session_rate'] == pytest.approx(200 / 3)
+
+    def test_engagement_score(self, analytics):
+        now = datetime.utcnow()
+        for _ in range(3):
+            _event('meeting.created', 5, now)
+        for _ in range(6):
+            _event('task.created', 5, now)
+        _event('task.completed', 5, now)
+        _event('meeting.created', 5, now - timedelta(days=40))   # Too old
+        _event('meeting.created', 6, now)                         # Another user
+        db.session.commit()
+
+        # meetings 3/30*100=10, created 6/60*25=2.5, completed 1/60*25, 3 event types -> 6
+        assert analytics.get_engagement_score(5, days=30) == round(10 + 2.5 + 25 / 60 + 6, 1)
+
+    def test_retention_cohort(self, analytics):
+        now = datetime.utcnow()
+        cohort_day = (now - timedelta(days=14)).replace(hour=0, minute=0, second=0) + timedelta(hours=1)
+        _event('user.signup', 1, cohort_day)
+        _event('user.signup', 2, cohort_day)
+        _event('user.signup', 3, cohort_day - timedelta(days=2))   # Different cohort
+        _event('user.login', 1, now - timedelta(days=1))
+        _event('user.login', 3, now)
+        db.session.commit()
+
+        cohort = analytics.get_retention_cohort(cohort_days=14)
+        assert (cohort['cohort_size'], cohort['retained'], cohort['retention_rate']) == (2, 1, 50.0)
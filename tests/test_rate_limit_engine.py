@@ -0,0 +1,154 @@
+"""
+Rate Limit Engine Tests
+GCRA and sliding-log semantics on the in-memory backend, the local
+pre-check, exact limits under parallel load, and the Redis scripts when
+fakeredis can run Lua.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from services.distributed_rate_limiter import DistributedRateLimiter
+from services.rate_limit_engine import (
+    MemoryRateLimitBackend, RateLimitEngine, RedisRateLimitBackend
+)
+
+
+class Clock:
+    def __init__(self, now=1_700_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class CountingBackend:
+    def __init__(self, backend):
+        self.backend = backend
+        self.calls = 0
+
+    def gcra(self, *args):
+        self.calls += 1
+        return self.backend.gcra(*args)
+
+    def sliding_log(self, *args):
+        self.calls += 1
+        return self.backend.sliding_log(*args)
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def backend(clock):
+    return MemoryRateLimitBackend(clock)
+
+
+def _admitted(engine, key, n, **kwargs):
+    return sum(engine.check(key, **kwargs).allowed for _ in range(n))
+
+
+class TestGcra:
+    def test_burst_then_smooth_refill(self, backend, clock):
+        engine = RateLimitEngine(backend, precheck=False)
+        assert _admitted(engine, 'k', 15, limit=10, window=60) == 10
+
+        denied = engine.check('k', 10, 60)
+        assert not denied.allowed and denied.retry_after == pytest.approx(6.0)
+        assert denied.reset_after == pytest.approx(60.0)
+
+        clock.now += 6.0
+        assert engine.check('k', 10, 60).allowed
+        assert not engine.check('k', 10, 60).allowed
+
+    def test_cost_consumes_several_cells(self, backend):
+        engine = RateLimitEngine(backend, precheck=False)
+        first = engine.check('k', 10, 60, cost=4)
+        assert first.allowed and first.remaining == 6
+        assert engine.check('k', 10, 60, cost=6).allowed
+        with pytest.raises(ValueError):
+            engine.check('k', 10, 60, cost=11)
+
+
+class TestSlidingLog:
+    def test_same_instant_requests_all_count(self, backend, clock):
+        engine = RateLimitEngine(backend, precheck=False)
+        assert _admitted(engine, 'k', 8, limit=5, window=1, algorithm='sliding_log') == 5
+
+        clock.now += 0.4
+        denied = engine.check('k', 5, 1, algorithm='sliding_log')
+        assert denied.retry_after == pytest.approx(0.6)
+
+        clock.now += 0.6
+        assert _admitted(engine, 'k', 8, limit=5, window=1, algorithm='sliding_log') == 5
+
+    def test_window_slides_per_request(self, backend, clock):
+        engine = RateLimitEngine(backend, precheck=False)
+        for _ in range(3):
+            assert engine.check('k', 3, 10, algorithm='sliding_log').allowed
+            clock.now += 4
+        # Entries at t=0, 4, 8; now t=12 so the first expired
+        assert engine.check('k', 3, 10, algorithm='sliding_log').allowed
+        assert not engine.check('k', 3, 10, algorithm='sliding_log').allowed
+
+
+class TestPrecheck:
+    def test_denied_clients_skip_the_backend_until_retry(self, backend, clock):
+        counting = CountingBackend(backend)
+        local = Clock(0.0)
+        engine = RateLimitEngine(counting, clock=local)
+        _admitted(engine, 'k', 10, limit=10, window=60)
+        calls = counting.calls
+
+        decisions = [engine.check('k', 10, 60) for _ in range(50)]
+        assert counting.calls == calls + 1   # Only the first denial reached the backend
+        assert all(not d.allowed for d in decisions) and decisions[-1].cached
+
+        local.now += 6.0
+        clock.now += 6.0
+        assert engine.check('k', 10, 60).allowed
+        assert engine.get_stats()['precheck_hits'] == 49
+
+    def test_cheaper_requests_are_not_short_circuited(self, backend):
+        counting = CountingBackend(backend)
+        engine = RateLimitEngine(counting)
+        engine.check('k', 10, 60, cost=8)
+        assert not engine.check('k', 10, 60, cost=5).allowed
+        assert engine.check('k', 10, 60, cost=2).allowed
+
+
+class TestConcurrency:
+    @pytest.mark.parametrize('algorithm', ['gcra', 'sliding_log'])
+    def test_exact_limit_under_parallel_load(self, backend, algorithm):
+        engine = RateLimitEngine(backend, precheck=False)
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            results = list(pool.map(lambda _: engine.check('k', 100, 60, algorithm).allowed, range(1000)))
+        assert sum(results) == 100
+
+    @pytest.mark.parametrize('algorithm', ['gcra', 'sliding_log'])
+    def test_redis_scripts_are_atomic(self, algorithm):
+        pytest.importorskip('lupa')   # fakeredis needs lupa for EVAL
+        fakeredis = pytest.importorskip('fakeredis')
+        server = fakeredis.FakeServer()
+
+        def worker(_):
+            engine = RateLimitEngine(RedisRateLimitBackend(fakeredis.FakeRedis(server=server)), precheck=False)
+            return sum(engine.check('k', 50, 60, algorithm).allowed for _ in range(25))
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            assert sum(pool.map(worker, range(8))) == 50
+
+
+class TestDistributedRateLimiter:
+    def test_same_second_burst_is_counted_exactly(self, backend):
+        limiter = DistributedRateLimiter(None, engine=RateLimitEngine(backend))
+        allowed = [limiter.check_rate_limit('ip:1.2.3.4', 'api', 10, 60)[0] for _ in range(15)]
+
+        assert allowed.count(True) == 10
+        info = limiter.check_rate_limit('ip:1.2.3.4', 'api', 10, 60)[1]
+        assert info['remaining'] == 0 and info['retry_after'] == 60   # Until the burst leaves the window
+        assert limiter.stats['rate_limit_blocks'] == 6
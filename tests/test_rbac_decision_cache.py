@@ -0,0 +1,178 @@
+"""
+RBAC Decision Cache Tests
+Cached permission index and membership lookups with versioned invalidation.
+"""
+
+import threading
+
+import fakeredis
+import pytest
+
+from services.rbac_service import PermissionIndex, PolicyVersion, RBACService
+
+
+PERMISSIONS = ['view_meeting', 'edit_meeting', 'manage_team', 'create_team']
+GRANTS = [
+    ('guest', 'view_meeting', None, None),
+    ('manager', 'edit_meeting', None, None),
+    ('organization_admin', 'create_team', None, None),
+    ('team_team_lead', 'manage_team', None, None),
+    ('member', 'edit_meeting', 7, None),  # scoped to organization 7
+]
+
+
+class FakeDirectory:
+    """In-memory stand-in for the permission/membership tables, counting queries."""
+
+    def __init__(self):
+        self.org_roles = {(1, 7): 'member', (2, 7): 'manager', (3, 8): 'super_admin'}
+        self.team_roles = {(1, 70): 'team_lead'}
+        self.owned = {(1, 500)}
+        self.queries = {'index': 0, 'org': 0, 'team': 0, 'owned': 0}
+
+    def install(self, service):
+        def load_index():
+            self.queries['index'] += 1
+            return PermissionIndex(PERMISSIONS, GRANTS)
+
+        def load_org(user_id, ids):
+            self.queries['org'] += 1
+            return {i: self.org_roles[(user_id, i)] for i in ids if (user_id, i) in self.org_roles}
+
+        def load_team(user_id, ids):
+            self.queries['team'] += 1
+            return {i: self.team_roles[(user_id, i)] for i in ids if (user_id, i) in self.team_roles}
+
+        def load_owned(user_id, permission_name, ids):
+            self.queries['owned'] += 1
+            return {i for i in ids if (user_id, i) in self.owned}
+
+        service._load_permission_index = load_index
+        service._load_org_roles = load_org
+        service._load_team_roles = load_team
+        service._load_owned_resource_ids = load_owned
+        service._check_resource_permission = (
+            lambda user_id, permission_name, resource_id, *args: (user_id, resource_id) in self.owned
+        )
+
+
+@pytest.fixture
+def directory():
+    return FakeDirectory()
+
+
+@pytest.fixture
+def service(directory, monkeypatch):
+    monkeypatch.delenv('REDIS_URL', raising=False)
+    svc = RBACService()
+    directory.install(svc)
+    return svc
+
+
+class TestCheckPermission:
+    def test_role_hierarchy_and_scopes(self, service):
+        assert service.check_permission(1, 'view_meeting', organization_id=7)  # member inherits guest
+        assert service.check_permission(1, 'edit_meeting', organization_id=7)  # scoped grant
+        assert not service.check_permission(1, 'create_team', organization_id=7)
+        assert service.check_permission(2, 'edit_meeting', organization_id=7)
+        assert service.check_permission(3, 'create_team', organization_id=8)  # super admin
+        assert service.check_permission(1, 'manage_team', organization_id=7, team_id=70)
+        assert not service.check_permission(4, 'view_meeting', organization_id=7)
+        assert not service.check_permission(1, 'unknown_permission', organization_id=7)
+
+    def test_resource_fallback(self, service):
+        assert not service.check_permission(4, 'edit_meeting', organization_id=7, resource_id=500)
+        assert service.check_permission(1, 'delete_meeting', organization_id=9, resource_id=500) is False
+        assert service.check_permission(1, 'view_meeting', organization_id=9, resource_id=500)
+
+    def test_repeated_checks_hit_cache(self, service, directory):
+        for _ in range(100):
+            assert service.check_permission(1, 'view_meeting', organization_id=7, team_id=70)
+            assert not service.check_permission(4, 'view_meeting', organization_id=7)
+
+        assert directory.queries == {'index': 1, 'org': 2, 'team': 1, 'owned': 0}
+        stats = service.get_cache_stats()
+        assert stats['misses'] == 3
+        assert stats['hit_rate'] > 0.98
+
+    def test_invalidation_reloads_memberships(self, service, directory):
+        assert not service.check_permission(4, 'view_meeting', organization_id=7)
+        directory.org_roles[(4, 7)] = 'guest'
+        assert not service.check_permission(4, 'view_meeting', organization_id=7)  # still cached
+
+        service.invalidate_policy_cache()
+
+        assert service.check_permission(4, 'view_meeting', organization_id=7)
+        assert directory.queries['index'] == 2
+        assert service.get_cache_stats()['invalidations'] == 1
+
+    def test_membership_cache_is_bounded(self, directory, monkeypatch):
+        monkeypatch.delenv('REDIS_URL', raising=False)
+        service = RBACService(membership_cache_size=3)
+        directory.install(service)
+        for org_id in range(10):
+            service.check_permission(1, 'view_meeting', organization_id=org_id)
+        assert service.get_cache_stats()['cached_memberships'] == 3
+
+
+class TestFilterPermitted:
+    def test_filters_in_order_with_batched_queries(self, service, directory):
+        resources = [
+            {'id': 1, 'organization_id': 7, 'team_id': None},
+            {'id': 2, 'organization_id': 9, 'team_id': None},
+            {'id': 500, 'organization_id': 9, 'team_id': None},
+            {'id': 3, 'organization_id': 7, 'team_id': 70},
+            {'id': 4, 'organization_id': 11, 'team_id': 71},
+        ]
+
+        permitted = service.filter_permitted(1, resources, 'edit_meeting')
+
+        assert [r['id'] for r in permitted] == [1, 500, 3]
+        assert directory.queries == {'index': 1, 'org': 1, 'team': 1, 'owned': 1}
+        for r in resources:
+            expected = service.check_permission(1, 'edit_meeting', r['organization_id'], r['team_id'], r['id'])
+            assert (r in permitted) == expected
+
+    def test_unknown_permission(self, service):
+        assert service.filter_permitted(1, [{'id': 1, 'organization_id': 7}], 'nope') == []
+
+
+class TestPolicyVersion:
+    def test_shared_through_redis(self, directory):
+        client = fakeredis.FakeRedis(decode_responses=True)
+        now = [0.0]
+        node_a = RBACService(redis_client=client)
+        node_b = RBACService(redis_client=client)
+        for node in (node_a, node_b):
+            node.policy_version = PolicyVersion(client, check_interval=1.0, clock=lambda: now[0])
+            directory.install(node)
+
+        assert not node_b.check_permission(4, 'view_meeting', organization_id=7)
+        directory.org_roles[(4, 7)] = 'guest'
+        node_a.invalidate_policy_cache()
+
+        assert node_a.check_permission(4, 'view_meeting', organization_id=7)
+        assert not node_b.check_permission(4, 'view_meeting', organization_id=7)  # within interval
+        now[0] = 1.5
+        assert node_b.check_permission(4, 'view_meeting', organization_id=7)
+
+    def test_redis_errors_fall_back_to_local_version(self):
+        class BrokenRedis:
+            def get(self, key):
+                raise ConnectionError("down")
+
+            def incr(self, key):
+                raise ConnectionError("down")
+
+        version = PolicyVersion(BrokenRedis(), check_interval=0)
+        before = version.current()
+        assert version.bump() != before
+
+    def test_concurrent_bumps_are_all_counted(self):
+        version = PolicyVersion()
+        threads = [threading.Thread(target=lambda: [version.bump() for _ in range(2000)]) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert version.current() == (0, 16000)
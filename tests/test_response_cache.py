@@ -0,0 +1,240 @@
+"""
+Response Cache Tests
+Tag/generation invalidation, ETag/304 and the L1 near-cache with
+stale-while-revalidate in middleware.cache_decorator.
+"""
+
+import time
+from types import SimpleNamespace
+
+import fakeredis
+import pytest
+from flask import Flask, jsonify
+from flask_login import LoginManager, UserMixin
+
+import middleware.cache_decorator as cache_module
+import services.redis_cache_service as redis_cache_module
+from middleware.cache_decorator import (
+    LocalResponseCache, TagGenerations, cache_response, invalidate_analytics_cache,
+    invalidate_cache, invalidate_meeting_cache, invalidate_tags
+)
+from services.redis_cache_service import RedisCacheService
+
+
+class _User(UserMixin):
+    def __init__(self, user_id, workspace_id):
+        self.id = user_id
+        self.workspace_id = workspace_id
+
+
+@pytest.fixture
+def cache_service(monkeypatch):
+    service = RedisCacheService(redis_cache_module.CacheConfig(port=1, socket_timeout=0.1))
+    service.client = fakeredis.FakeRedis()
+    service.is_connected = True
+    monkeypatch.setattr(redis_cache_module, '_global_cache_service', service)
+    monkeypatch.setattr(cache_module, '_local_cache', LocalResponseCache(64))
+    monkeypatch.setattr(cache_module, '_tag_generations', TagGenerations(check_interval=0))
+    monkeypatch.setattr(cache_module, '_stats', {k: 0 for k in cache_module._stats})
+    return service
+
+
+@pytest.fixture
+def app(cache_service):
+    app = Flask(__name__)
+    app.config['SECRET_KEY'] = 'test'
+    login_manager = LoginManager(app)
+
+    @login_manager.request_loader
+    def load_user(req):
+        user = req.headers.get('X-User')
+        if not user:
+            return None
+        user_id, workspace_id = user.split(':')
+        return _User(int(user_id), int(workspace_id))
+
+    calls = SimpleNamespace(dashboard=0, meeting=0)
+    app.calls = calls
+
+    @app.route('/dashboard')
+    @cache_response(ttl=60, prefix='analytics')
+    def dashboard():
+        calls.dashboard += 1
+        return jsonify({'calls': calls.dashboard})
+
+    @app.route('/meetings/<int:meeting_id>')
+    @cache_response(ttl=60, prefix='session', vary_on_user=False)
+    def meeting(meeting_id):
+        calls.meeting += 1
+        return jsonify({'meeting': meeting_id, 'calls': calls.meeting})
+
+    @app.route('/meetings', methods=['POST'])
+    @invalidate_cache(tags=cache_module.current_workspace_tags)
+    def create_meeting():
+        return jsonify({'success': True})
+
+    @app.route('/report')
+    @cache_response(ttl=60)
+    def report():
+        return jsonify({'report': 'static'})
+
+    @app.route('/broken')
+    @cache_response(ttl=60)
+    def broken():
+        calls.dashboard += 1
+        return jsonify({'error': True}), 500
+
+    return app
+
+
+def _get(client, path, user='1:10', **headers):
+    return client.get(path, headers={'X-User': user, **headers})
+
+
+class TestTagInvalidation:
+    def test_hit_after_miss_and_cached_as_body(self, app, cache_service):
+        client = app.test_client()
+        first = _get(client, '/dashboard')
+        second = _get(client, '/dashboard')
+
+        assert first.headers['X-Cache'] == 'MISS'
+        assert second.headers['X-Cache'] == 'HIT'
+        assert second.get_json() == first.get_json() == {'calls': 1}
+        stored = [k for k in cache_service.client.keys('mina:analytics:*')]
+        assert len(stored) == 1
+        assert b'"etag"' in cache_service.client.get(stored[0])
+
+    def test_workspace_invalidation_is_scoped(self, app):
+        client = app.test_client()
+        _get(client, '/dashboard', user='1:10')
+        _get(client, '/dashboard', user='2:20')
+
+        client.post('/meetings', headers={'X-User': '1:10'})
+
+        assert _get(client, '/dashboard', user='1:10').headers['X-Cache'] == 'MISS'
+        assert _get(client, '/dashboard', user='2:20').headers['X-Cache'] == 'HIT'
+
+    def test_meeting_invalidation(self, app):
+        client = app.test_client()
+        _get(client, '/meetings/5')
+        _get(client, '/meetings/6')
+
+        with app.test_request_context():
+            invalidate_meeting_cache(5, workspace_id=99)
+
+        assert _get(client, '/meetings/5').headers['X-Cache'] == 'MISS'
+        assert _get(client, '/meetings/6').headers['X-Cache'] == 'HIT'
+
+    def test_invalidate_all_analytics(self, app):
+        client = app.test_client()
+        _get(client, '/dashboard', user='1:10')
+        _get(client, '/meetings/5')
+
+        invalidate_analytics_cache()
+
+        assert _get(client, '/dashboard', user='1:10').headers['X-Cache'] == 'MISS'
+        assert _get(client, '/meetings/5').headers['X-Cache'] == 'HIT'
+
+    def test_generations_seen_by_other_processes(self, app, cache_service, monkeypatch):
+        client = app.test_client()
+        _get(client, '/dashboard')
+
+        # Another worker bumps the counter directly in Redis
+        cache_service.bump_generation('workspace:10')
+
+        assert _get(client, '/dashboard').headers['X-Cache'] == 'MISS'
+
+    def test_generation_read_error_bypasses_cache(self, app, cache_service, monkeypatch):
+        client = app.test_client()
+        _get(client, '/dashboard')
+        cache_service.bump_generation('workspace:10')
+
+        def broken_mget(keys):
+            raise ConnectionError("down")
+
+        # Falling back to generation 0 would serve the invalidated gen-0 entry
+        monkeypatch.setattr(cache_service.client, 'mget', broken_mget)
+        response = _get(client, '/dashboard')
+        assert 'X-Cache' not in response.headers
+        assert response.get_json() == {'calls': 2}
+        assert cache_module._stats['bypasses'] == 1
+
+    def test_error_responses_not_cached(self, app):
+        client = app.test_client()
+        _get(client, '/broken')
+        _get(client, '/broken')
+        assert app.calls.dashboard == 2
+
+
+class TestConditionalRequests:
+    def test_etag_and_304(self, app):
+        client = app.test_client()
+        first = _get(client, '/dashboard')
+        etag = first.headers['ETag']
+
+        revalidated = _get(client, '/dashboard', **{'If-None-Match': etag})
+
+        assert revalidated.status_code == 304
+        assert revalidated.data == b''
+        assert cache_module.get_response_cache_stats()['not_modified'] == 1
+
+    def test_etag_without_redis(self, app, cache_service):
+        cache_service.is_connected = False
+        client = app.test_client()
+        first = _get(client, '/report')
+        assert first.headers['X-Cache'] == 'BYPASS'
+        assert _get(client, '/report', **{'If-None-Match': first.headers['ETag']}).status_code == 304
+
+
+class TestNearCache:
+    def test_l1_serves_without_redis_reads(self, app, cache_service):
+        client = app.test_client()
+        _get(client, '/dashboard')
+        cache_service.client.flushall()  # L1 still holds the entry for this generation
+
+        assert _get(client, '/dashboard').headers['X-Cache'] == 'HIT'
+        assert cache_module.get_response_cache_stats()['l1_hits'] == 1
+
+    def test_stale_while_revalidate(self, app, monkeypatch):
+        client = app.test_client()
+        _get(client, '/dashboard')
+
+        real_time = time.time
+        monkeypatch.setattr(cache_module.time, 'time', lambda: real_time() + 90)  # past ttl, within stale window
+        stale = _get(client, '/dashboard')
+        assert stale.headers['X-Cache'] == 'STALE'
+        assert stale.get_json() == {'calls': 1}
+
+        deadline = real_time() + 5
+        while cache_module.get_response_cache_stats()['revalidations'] < 1 and real_time() < deadline:
+            time.sleep(0.01)
+        assert app.calls.dashboard == 2
+        refreshed = _get(client, '/dashboard')
+        assert refreshed.headers['X-Cache'] == 'HIT'
+        assert refreshed.get_json() == {'calls': 2}
+
+    def test_lru_bound(self):
+        local = LocalResponseCache(max_entries=2)
+        entry = cache_module.CachedResponse(b'x', 200, [], 'e', time.time() + 10, time.time() + 20)
+        for key in 'abc':
+            local.set(key, entry)
+        assert len(local) == 2
+        assert local.get('a') is None
+
+
+class TestRedisCacheService:
+    def test_scan_based_prefix_clear(self, cache_service):
+        for i in range(1200):
+            cache_service.set(f"k{i}", {'v': i}, prefix='analytics')
+        cache_service.set("other", 1, prefix='session')
+
+        assert len(cache_service.get_keys_by_pattern('k1*', prefix='analytics')) == 311
+        assert cache_service.clear_prefix('analytics') == 1200
+        assert cache_service.get('other', prefix='session') == 1
+
+    def test_generations(self, cache_service):
+        assert cache_service.get_generations(['a', 'b']) == {'a': 0, 'b': 0}
+        assert cache_service.bump_generation('a', 'b') == {'a': 1, 'b': 1}
+        cache_service.bump_generation('a')
+        assert cache_service.get_generations(['a', 'b']) == {'a': 2, 'b': 1}
+        assert invalidate_tags('b') == {'b': 2}
@@ -0,0 +1,141 @@
+"""
+Sentiment Trend Tests
+Batched, concurrent and local (vectorized lexicon) sentiment scoring of meeting windows.
+"""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import services.analytics_service as analytics_module
+import services.llm_response_cache as llm_cache_module
+from services.llm_response_cache import LLMResponseCache
+from services.sentiment_analysis_service import SentimentAnalysisService
+
+
+WINDOWS = [
+    "This is a great plan and I really love the approach",
+    "We have a serious problem, the build is broken again",
+    "I am not happy with this, it is not good at all",
+    "",
+    "Okay let's move on to the next agenda item",
+    "Absolutely fantastic work, very effective and efficient",
+]
+
+
+def _response(content: str):
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+        usage=SimpleNamespace(total_tokens=50),
+    )
+
+
+class StubAsyncClient:
+    """Minimal async OpenAI client recording requests."""
+
+    def __init__(self, responder, latency: float = 0.0):
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._responder = responder
+        self._latency = latency
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def _create(self, **kwargs):
+        self.requests.append(kwargs)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self._latency)
+            return _response(self._responder(kwargs))
+        finally:
+            self.in_flight -= 1
+
+
+class TestVectorizedLexiconSentiment:
+    """Vectorized scorer must match the per-text scorer."""
+
+    def test_matches_per_text_compound(self):
+        service = SentimentAnalysisService()
+        batch = service.score_texts_compound(WINDOWS)
+        expected = [service._analyze_text_sentiment(text).compound for text in WINDOWS]
+        assert batch == pytest.approx(expected, abs=1e-12)
+
+    def test_negation_and_intensifiers_do_not_cross_windows(self):
+        service = SentimentAnalysisService()
+        texts = ["we will not", "good", "very", "good"]
+        batch = service.score_texts_compound(texts)
+        expected = [service._analyze_text_sentiment(text).compound for text in texts]
+        assert batch == pytest.approx(expected, abs=1e-12)
+        assert batch[1] == 1.0
+
+    def test_empty_input(self):
+        service = SentimentAnalysisService()
+        assert service.score_texts_compound([]) == []
+        assert service.score_texts_compound(["", "  "]) == [0.0, 0.0]
+
+
+class TestAnalyticsSentimentWindows:
+    """AnalyticsService window scoring modes."""
+
+    @pytest.fixture(autouse=True)
+    def fresh_cache(self, monkeypatch):
+        monkeypatch.setattr(llm_cache_module, '_global_llm_cache', LLMResponseCache())
+
+    def _service(self, monkeypatch, client, mode):
+        monkeypatch.setattr(analytics_module, 'get_openai_client', lambda: client)
+        monkeypatch.setenv('ANALYTICS_SENTIMENT_MODE', mode)
+        monkeypatch.setenv('ANALYTICS_SENTIMENT_CONCURRENCY', '3')
+        return analytics_module.AnalyticsService()
+
+    def test_batched_mode_uses_single_request(self, monkeypatch):
+        def responder(kwargs):
+            windows = json.loads(kwargs['messages'][1]['content'])
+            return json.dumps({"scores": [{"window": w["window"], "score": 0.25} for w in windows]})
+
+        client = StubAsyncClient(responder)
+        service = self._service(monkeypatch, client, 'batched')
+
+        scores = asyncio.run(service._score_sentiment_windows(WINDOWS * 4))
+
+        assert len(client.requests) == 1
+        assert scores == [0.25] * len(WINDOWS) * 4
+
+    def test_batched_mode_fills_missing_windows_locally(self, monkeypatch):
+        client = StubAsyncClient(lambda kwargs: json.dumps({"scores": [{"window": 0, "score": 3}]}))
+        service = self._service(monkeypatch, client, 'batched')
+
+        scores = asyncio.run(service._score_sentiment_windows(WINDOWS))
+
+        local = service._local_window_sentiment(WINDOWS)
+        assert scores[0] == 1.0  # clamped
+        assert scores[1:] == pytest.approx(local[1:])
+
+    def test_batched_mode_falls_back_on_bad_json(self, monkeypatch):
+        client = StubAsyncClient(lambda kwargs: "not json")
+        service = self._service(monkeypatch, client, 'batched')
+
+        scores = asyncio.run(service._score_sentiment_windows(WINDOWS))
+
+        assert scores == pytest.approx(service._local_window_sentiment(WINDOWS))
+
+    def test_concurrent_mode_is_bounded(self, monkeypatch):
+        client = StubAsyncClient(lambda kwargs: "0.5", latency=0.01)
+        service = self._service(monkeypatch, client, 'concurrent')
+        texts = [f"window {i} text" for i in range(12)]
+
+        scores = asyncio.run(service._score_sentiment_windows(texts))
+
+        assert scores == [0.5] * 12
+        assert len(client.requests) == 12
+        assert client.max_in_flight <= 3
+
+    def test_local_mode_without_client(self, monkeypatch):
+        service = self._service(monkeypatch, None, 'batched')
+
+        scores = asyncio.run(service._score_sentiment_windows(WINDOWS))
+
+        assert len(scores) == len(WINDOWS)
+        assert scores[0] > 0 > scores[1]
@@ -0,0 +1,161 @@
+"""
+Speaker Embedding Index Tests
+Matrix speaker matching, incremental centroids, end-of-meeting re-clustering
+and the diarizers built on top of them.
+"""
+
+import numpy as np
+import pytest
+
+from services.multi_speaker_diarization import MultiSpeakerDiarization
+from services.speaker_diarization import (
+    DiarizationConfig, SpeakerDiarizationEngine, _autocorrelation, _dct_basis
+)
+from services.speaker_embedding_index import SpeakerEmbeddingIndex, normalize_rows
+
+SAMPLE_RATE = 16000
+
+
+def _voices(count, dim=8, seed=38):
+    """Well separated unit directions around a shared offset."""
+    rng = np.random.default_rng(seed)
+    return 5.0 + 3.0 * normalize_rows(rng.normal(size=(count, dim)))
+
+
+def _samples(voice, count, rng, spread=0.05):
+    return voice + rng.normal(0, spread, (count, len(voice)))
+
+
+def _utterance(f0, formants, seconds, rng):
+    """Harmonic voice shaped by formant bumps."""
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    phase = 2 * np.pi * np.cumsum(f0 * (1 + 0.03 * np.sin(2 * np.pi * 3 * t))) / SAMPLE_RATE
+    audio = np.zeros_like(t)
+    for k in range(1, int(6000 / f0)):
+        gain = sum(np.exp(-((k * f0 - f) / 120) ** 2) for f in formants) + 0.05
+        audio += gain * np.sin(k * phase) / k
+    audio = 0.5 * audio / np.max(np.abs(audio)) + rng.normal(0, 0.01, len(t))
+    return audio.astype(np.float32)
+
+
+class TestMatching:
+    def test_similarities_match_per_speaker_cosine(self):
+        rng = np.random.default_rng(1)
+        voices = _voices(4)
+        index = SpeakerEmbeddingIndex(dim=8, capacity=2, center_after=1000)  # No centering
+        for i, voice in enumerate(voices):
+            index.add_speaker(f"s{i}", voice)
+        query = _samples(voices[2], 1, rng)[0]
+
+        expected = [voice @ query / (np.linalg.norm(voice) * np.linalg.norm(query)) for voice in voices]
+        np.testing.assert_allclose(index.similarities(query), expected)
+        assert index.best_match(query)[0] == 's2'
+        assert len(index) == 4  # Grew past the initial capacity
+
+    def test_incremental_update_keeps_the_mean(self):
+        rng = np.random.default_rng(2)
+        embeddings = _samples(_voices(1)[0], 20, rng, spread=0.5)
+        index = SpeakerEmbeddingIndex(dim=8)
+        index.add_speaker('a', embeddings[0])
+        for embedding in embeddings[1:]:
+            index.update('a', embedding)
+        np.testing.assert_allclose(index.centroid('a'), embeddings.mean(axis=0))
+
+    def test_centering_separates_voices_sharing_an_offset(self):
+        voices = _voices(3)
+        raw = SpeakerEmbeddingIndex(dim=8, center_after=1000)
+        centered = SpeakerEmbeddingIndex(dim=8, center_after=3)
+        for index in (raw, centered):
+            for i, voice in enumerate(voices):
+                index.add_speaker(f"s{i}", voice)
+        # Shared offset makes every raw pair look alike
+        assert raw.similarities(voices[0])[1:].min() > 0.5
+        assert centered.similarities(voices[0])[1:].max() < 0.5
+
+
+class TestRecluster:
+    def _index(self, online_labels, embeddings):
+        index = SpeakerEmbeddingIndex(dim=embeddings.shape[1], segment_capacity=4)
+        for position, (label, embedding) in enumerate(zip(online_labels, embeddings)):
+            if label not in index:
+                index.add_speaker(label, embedding)
+            index.record_segment(f"seg{position}", label, embedding)
+        return index
+
+    def test_duplicate_speakers_are_merged(self):
+        rng = np.random.default_rng(3)
+        voices = _voices(2)
+        embeddings = np.vstack([_samples(voices[0], 20, rng), _samples(voices[1], 10, rng)])
+        online = ['a'] * 10 + ['c'] * 10 + ['b'] * 10  # 'c' is really 'a'
+        result = self._index(online, embeddings).recluster()
+
+        assert result.merged == {'c': 'a'}
+        assert result.speaker_count == 2
+        assert set(result.assignments[f"seg{i}"] for i in range(20)) == {'a'}
+        assert result.relabeled_segments == 10
+
+    def test_mixed_profile_is_split_with_a_fresh_id(self):
+        rng = np.random.default_rng(4)
+        voices = _voices(3)
+        embeddings = np.vstack([_samples(voice, 12, rng) for voice in voices])
+        online = ['a'] * 24 + ['b'] * 12  # 'a' absorbed two voices
+        index = self._index(online, embeddings)
+        result = index.recluster(new_speaker_id=lambda: 'new')
+
+        assert result.created == ['new']
+        assert {result.assignments[f"seg{i}"] for i in range(12)} == {'a'}
+        assert {result.assignments[f"seg{i}"] for i in range(12, 24)} == {'new'}
+        np.testing.assert_allclose(result.centroids['new'], embeddings[12:24].mean(axis=0), rtol=1e-5)
+        assert index.speaker_ids == ['a', 'b']  # Works on a snapshot
+
+
+class TestVectorizedFeatures:
+    def test_fft_autocorrelation_matches_correlate(self):
+        x = np.random.default_rng(5).normal(size=257)
+        expected = np.correlate(x, x, mode='full')[len(x) - 1:]
+        np.testing.assert_allclose(_autocorrelation(x), expected, atol=1e-9)
+
+    def test_dct_basis_matches_cosine_sum(self):
+        log_energies = np.random.default_rng(6).normal(size=26)
+        expected = [
+            sum(log_energies[j] * np.cos(np.pi * i * (j + 0.5) / 26) for j in range(26)) for i in range(13)
+        ]
+        np.testing.assert_allclose(_dct_basis(13, 26) @ log_energies, expected, atol=1e-9)
+
+
+class TestDiarizers:
+    VOICES = [(110, (700, 1200, 2600)), (210, (400, 2200, 3000))]
+
+    def _segments(self, count, seed=7):
+        rng = np.random.default_rng(seed)
+        for i in range(count):
+            f0, formants = self.VOICES[i % 2]
+            yield i % 2, _utterance(f0, formants, 1.0, rng)
+
+    def test_engine_tracks_speakers_and_finalizes(self):
+        engine = SpeakerDiarizationEngine(DiarizationConfig())
+        engine.initialize_session('m1')
+        for i, (_, audio) in enumerate(self._segments(6)):
+            result = engine.process_audio_segment('m1', (audio * 32767).astype(np.int16).tobytes(), i, i + 1.0)
+            assert result['speaker_id']
+
+        index = engine.session_indexes['m1']
+        assert len(index.segment_ids) == 6
+        engine.finalize_session('m1', background=False)
+        result = engine.recluster_results['m1']
+        speakers = engine.session_speakers['m1']
+        assert sum(profile.segments_count for profile in speakers.values()) == 6
+        assert {segment.speaker_id for segment in engine.session_segments['m1']} == set(speakers)
+        assert len(result.assignments) == 6
+
+    def test_finalize_meeting_runs_in_background(self):
+        diarizer = MultiSpeakerDiarization(max_speakers=4)
+        for i, (_, audio) in enumerate(self._segments(6)):
+            diarizer.process_audio_segment(audio, float(i), f"seg{i}")
+
+        done = []
+        thread = diarizer.finalize_meeting(on_complete=done.append)
+        thread.join(timeout=10)
+        assert done and done[0] is diarizer.recluster_result
+        assert sum(p.segment_count for p in diarizer.speaker_profiles.values()) == 6
+        assert 'reclustering' in diarizer.get_speaker_summary()
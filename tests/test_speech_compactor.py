@@ -0,0 +1,144 @@
+"""
+Speech Compactor Tests
+Speech-only payloads from per-chunk VAD decisions, the offset map back to
+meeting time, per-session savings and silence handling in the session buffer.
+"""
+
+import numpy as np
+import pytest
+
+from services.session_buffer_manager import BufferConfig, SessionBufferManager
+from services.speech_compactor import OffsetMap, SpeechCompactor, get_speech_compactor
+
+SAMPLE_RATE = 16000
+CHUNK_MS = 100
+
+
+def _chunk(value, ms=CHUNK_MS):
+    """Constant-valued PCM so kept spans can be identified after compaction."""
+    return np.full(SAMPLE_RATE * ms // 1000, value, dtype=np.int16).tobytes()
+
+
+def _buffer(pattern):
+    """One 100 ms chunk per character: 'S' speech, '.' silence; values encode the chunk index."""
+    return [(_chunk(index + 1), flag == 'S') for index, flag in enumerate(pattern)]
+
+
+@pytest.fixture
+def compactor():
+    return SpeechCompactor(pad_ms=100, max_silence_ms=300)
+
+
+class TestCompaction:
+    def test_long_silence_collapses_to_padding(self, compactor):
+        result = compactor.compact(_buffer('..SS........SS..'), base_time=100.0)
+
+        kept = np.unique(np.frombuffer(result.audio, dtype=np.int16)).tolist()
+        assert kept == [2, 3, 4, 5, 12, 13, 14, 15]  # Speech chunks plus one chunk of padding each side
+        assert result.compacted_seconds == pytest.approx(0.8)
+        assert result.original_seconds == pytest.approx(1.6)
+        assert result.offset_map.to_dict()['spans'] == [[0.1, 0.0, 0.4], [1.1, 0.4, 0.4]]
+
+    def test_short_pause_is_kept_whole(self, compactor):
+        result = compactor.compact(_buffer('SS....SS'))
+        assert result.compacted_seconds == pytest.approx(0.8)
+        assert len(result.offset_map.lengths) == 1
+
+    def test_silence_only_buffer_yields_nothing(self, compactor):
+        result = compactor.compact(_buffer('......'), session_id='quiet')
+        assert not result.has_speech and result.audio == b''
+        stats = compactor.get_session_stats('quiet')
+        assert stats['skipped_payloads'] == 1
+        assert stats['audio_seconds_saved'] == pytest.approx(0.6)
+
+    def test_wav_headers_are_stripped(self, compactor):
+        header = b'RIFF' + bytes(40)
+        result = compactor.compact([(header + _chunk(7), True)])
+        assert result.audio == _chunk(7)
+
+    def test_savings_accumulate_per_session(self, compactor):
+        compactor.compact(_buffer('..SS........SS..'), session_id='s1')
+        compactor.compact(_buffer('SSSS'), session_id='s1')
+        compactor.compact(_buffer('SS'), session_id='s2')
+
+        s1 = compactor.get_session_stats('s1')
+        assert s1['payloads'] == 2
+        assert s1['bytes_saved'] == 8 * 3200
+        assert s1['audio_seconds_saved'] == pytest.approx(0.8)
+        assert compactor.get_stats()['sessions'] == 2
+        assert compactor.release('s1')['bytes_in'] == 20 * 3200
+        assert compactor.get_session_stats('s1')['bytes_in'] == 0
+
+
+class TestOffsetMap:
+    def test_times_project_back_to_meeting_time(self, compactor):
+        offset_map = compactor.compact(_buffer('..SS........SS..'), base_time=100.0).offset_map
+
+        assert offset_map.to_meeting_time(0.0) == pytest.approx(100.1)
+        assert offset_map.to_meeting_time(0.35) == pytest.approx(100.45)
+        assert offset_map.to_meeting_time(0.5) == pytest.approx(101.2)
+        np.testing.assert_allclose(offset_map.to_meeting_time([0.45, 9.0]), [101.15, 101.5])
+
+    def test_words_are_reprojected(self, compactor):
+        offset_map = compactor.compact(_buffer('..SS........SS..'), base_time=10.0).offset_map
+        words = [{'word': 'hello', 'start': 0.1, 'end': 0.3}, {'word': 'again', 'start': 0.5, 'end': 0.7}]
+
+        projected = offset_map.project(words)
+
+        assert [(w['start'], w['end']) for w in projected] == pytest.approx([(10.2, 10.4), (11.2, 11.4)])
+        assert words[0]['start'] == 0.1  # Input untouched
+
+    def test_empty_map_is_a_plain_shift(self):
+        assert OffsetMap(base_time=5.0).to_meeting_time(1.5) == 6.5
+
+
+class TestSessionBuffer:
+    def _manager(self, monkeypatch, speech_flags):
+        manager = SessionBufferManager('buffer-test', BufferConfig(enable_quality_gating=False, max_flush_ms=0))
+        flags = iter(speech_flags)
+        monkeypatch.setattr(manager.vad_processor, 'analyze_chunk', lambda data: (next(flags), 0.1))
+        return manager
+
+    def test_silent_buffer_is_discarded_not_flushed(self, monkeypatch):
+        manager = self._manager(monkeypatch, [False] * 4)
+        for index in range(4):
+            manager.ingest_chunk(_chunk(index + 1), 'audio/pcm')
+
+        assert manager.should_flush() is False
+        assert not manager.chunks
+        assert manager.metrics.silent_flushes_skipped == 1
+        assert manager.metrics.audio_seconds_saved == pytest.approx(0.4)
+
+    def test_container_stream_is_flushed_even_when_vad_hears_nothing(self, monkeypatch):
+        manager = self._manager(monkeypatch, [False] * 4)
+        manager.ingest_chunk(b'\x1a\x45\xdf\xa3' + bytes(199), 'audio/webm')  # EBML header
+        for _ in range(3):
+            manager.ingest_chunk(bytes(201), 'audio/webm')  # Odd-length Opus clusters
+
+        assert manager.format_detected == 'webm'
+        assert manager.should_flush() is True
+        assert len(manager.chunks) == 4
+        assert manager.metrics.silent_flushes_skipped == 0
+
+    def test_kill_switch_keeps_silent_pcm(self, monkeypatch):
+        monkeypatch.setattr(get_speech_compactor(), 'enabled', False)
+        manager = self._manager(monkeypatch, [False] * 4)
+        for index in range(4):
+            manager.ingest_chunk(_chunk(index + 1), 'audio/pcm')
+
+        assert manager.should_flush() is True
+        assert manager.metrics.silent_flushes_skipped == 0
+
+    def test_pcm_payload_is_compacted_with_offsets(self, monkeypatch):
+        manager = self._manager(monkeypatch, [False] * 6 + [True] * 2 + [False] * 6)
+        for index in range(14):
+            manager.ingest_chunk(_chunk(index + 1), 'audio/pcm')
+
+        assert manager.should_flush() is True
+        payload, _, metadata = manager.assemble_flush_payload()
+        kept = np.unique(np.frombuffer(payload, dtype=np.int16)).tolist()
+        assert kept == [5, 6, 7, 8, 9, 10]  # Default 200 ms padding
+        assert metadata['time_offsets']['spans'] == [[pytest.approx(0.4), 0.0, pytest.approx(0.6)]]
+        assert manager.metrics.audio_seconds_saved == pytest.approx(0.8)
+        manager.end_session()
+        assert get_speech_compactor().get_session_stats('buffer-test')['bytes_in'] == 0
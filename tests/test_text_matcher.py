@@ -0,0 +1,134 @@
+"""
+Text Matcher Tests
+Indexed evidence search against the straightforward scan it replaces
+(every word window and every sentence aligned with SequenceMatcher),
+validation results, and reuse of the per-transcript index.
+"""
+
+import random
+import re
+from difflib import SequenceMatcher
+
+import pytest
+
+from services.text_matcher import TextMatcher, TranscriptIndex
+
+TRANSCRIPT = """Alice: Okay so let's get started. Bob, can you give us an update on the billing migration?
+Bob: Sure. The billing migration is about seventy percent done. I'll finish the data backfill by Friday.
+Carol: We decided to go with the new vendor for payments. The contract was approved yesterday.
+Alice: Great. Carol, you need to review the security checklist before the launch.
+Dmitri: One risk is that the mobile release might slip because of the app store review.
+Bob: I will also update the runbook and share it with the on-call team next week.
+Alice: Thanks everyone, let's wrap up."""
+
+
+def scan_window_ratio(extracted, transcript_clean, key_word_count):
+    words = transcript_clean.split()
+    best = 0.0
+    for i in range(len(words) - key_word_count + 1):
+        window = ' '.join(words[i:i + key_word_count + 5])
+        best = max(best, SequenceMatcher(None, extracted, window).ratio())
+    return best
+
+
+def scan_best_sentence(extracted, transcript):
+    normalize = TextMatcher()._normalize_text
+    best_match, best_ratio = None, 0.0
+    extracted_words = set(extracted.split())
+    for sentence in [s.strip() for s in re.split(r'[.!?]+', transcript) if len(s.strip()) > 10]:
+        sentence_clean = normalize(sentence)
+        overlap_ratio = len(extracted_words & set(sentence_clean.split())) / len(extracted_words)
+        combined = overlap_ratio * 0.6 + SequenceMatcher(None, extracted, sentence_clean).ratio() * 0.4
+        if combined > best_ratio and combined > 0.3:
+            best_ratio, best_match = combined, sentence.strip()
+    return best_match
+
+
+def random_transcript(rng, sentences=50):
+    vocabulary = ['billing', 'migration', 'review', 'update', 'the', 'we', 'will', 'need', 'to', 'vendor',
+                  'release', 'mobile', 'risk', 'friday', 'contract', 'data', 'team', 'share', 'launch', 'a']
+    lines = []
+    for _ in range(sentences):
+        words = [rng.choice(vocabulary) for _ in range(rng.randint(2, 14))]
+        lines.append(' '.join(words).capitalize() + rng.choice(['.', '!', '?', ',']))
+    return '\n'.join(lines)
+
+
+@pytest.fixture
+def matcher():
+    return TextMatcher()
+
+
+class TestIndexedSearch:
+    @pytest.mark.parametrize('seed', range(5))
+    def test_window_ratio_matches_full_scan(self, seed):
+        rng = random.Random(seed)
+        transcript = random_transcript(rng)
+        index = TranscriptIndex(transcript)
+        words = index.clean.split()
+        for _ in range(10):
+            start = rng.randrange(len(words))
+            extracted = ' '.join(words[start:start + rng.randint(1, 12)] + [rng.choice(['budget', 'xyz'])])
+            key_word_count = rng.randint(1, 8)
+            assert index.best_window_ratio(extracted, key_word_count) == \
+                scan_window_ratio(extracted, index.clean, key_word_count)
+
+    @pytest.mark.parametrize('seed', range(5))
+    def test_best_sentence_matches_full_scan(self, seed):
+        rng = random.Random(seed)
+        transcript = random_transcript(rng)
+        index = TranscriptIndex(transcript)
+        words = index.clean.split()
+        for _ in range(10):
+            start = rng.randrange(len(words))
+            extracted = ' '.join(words[start:start + rng.randint(1, 10)])
+            assert index.best_sentence(extracted) == scan_best_sentence(extracted, transcript)
+
+    def test_long_extraction_spanning_several_words(self):
+        # Extractions over 64 characters are bounded piecewise
+        index = TranscriptIndex(TRANSCRIPT)
+        extracted = ("the billing migration is about seventy percent done and i'll finish "
+                     "the data backfill by friday")
+        assert index.best_window_ratio(extracted, 12) == scan_window_ratio(extracted, index.clean, 12)
+
+    def test_only_a_few_windows_are_aligned(self):
+        index = TranscriptIndex(TRANSCRIPT * 20)
+        index.best_window_ratio("carol, you need to review the security checklist", 6)
+        assert index.stats['windows_aligned'] < index.stats['windows'] / 20
+
+
+class TestValidation:
+    def test_grounded_task_is_validated_with_quote(self, matcher):
+        result = matcher.validate_extraction("Bob will update the runbook and share it with on-call", TRANSCRIPT)
+        assert result['is_valid']
+        assert result['evidence_quote'].startswith("Bob: I will also update the runbook")
+
+    def test_hallucinated_task_is_rejected(self, matcher):
+        result = matcher.validate_extraction("Zara to negotiate quarterly office lease renewal", TRANSCRIPT)
+        assert not result['is_valid']
+        assert result['evidence_quote'] is None
+
+    def test_task_list_keeps_only_validated_tasks(self, matcher):
+        tasks = [{'text': "Carol needs to review the security checklist before launch"},
+                 {'action': "Finish the data backfill by Friday"},
+                 {'title': "Order new espresso machine for kitchen"},
+                 {'owner': 'nobody'}]
+        validated = matcher.validate_task_list(tasks, TRANSCRIPT)
+        assert [t.get('text') or t.get('action') for t in validated] == [
+            "Carol needs to review the security checklist before launch", "Finish the data backfill by Friday"]
+        assert all(t['validation']['validated'] for t in validated)
+
+    def test_index_is_built_once_per_transcript(self, matcher):
+        first = matcher.get_index(TRANSCRIPT)
+        matcher.validate_extraction("update the runbook", TRANSCRIPT, 'action')
+        matcher.validate_extraction("decided to go with the new vendor", TRANSCRIPT, 'decision')
+        assert matcher.get_index(TRANSCRIPT) is first
+
+        for i in range(matcher.index_cache_size):
+            matcher.get_index(f"{TRANSCRIPT} {i}")
+        assert matcher.get_index(TRANSCRIPT) is not first
+
+    def test_empty_transcript(self, matcher):
+        result = matcher.validate_extraction("Review the checklist", "")
+        assert not result['is_valid']
+        assert result['match_details']['fuzzy_score'] == 0
@@ -0,0 +1,125 @@
+"""
+User Matching Tests
+Per-workspace name index (exact, nickname, phonetic and trigram evidence),
+ambiguity handling, batch resolution and invalidation on membership changes.
+"""
+
+import pytest
+from flask import Flask
+
+from models import db
+from models.user import User
+from services.user_matching_service import (
+    UserMatchingService, WorkspaceNameIndex, get_user_matching_service, soundex
+)
+
+MEMBERS = [
+    (1, 'Sarah', 'Connor', None, 'sconnor', 'sarah.connor@example.com'),
+    (2, 'Robert', 'Smith', None, 'rsmith', 'rs@example.com'),
+    (3, 'John', 'Smith', None, 'jsmith', 'john.smith@example.com'),
+    (4, 'John', 'Doe', None, 'jdoe', 'jd@example.com'),
+    (5, 'Katherine', 'Nguyen', 'Kat Nguyen', 'knguyen', 'kn@example.com'),
+    (6, 'Siobhan', 'McAllister', None, 'smcallister', 'sm@example.com'),
+]
+
+
+@pytest.fixture
+def index():
+    return WorkspaceNameIndex.build(1, MEMBERS)
+
+
+@pytest.fixture
+def matching_app():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def _user(user_id, first, last, workspace_id=1):
+    return User(id=user_id, email=f'u{user_id}@example.com', username=f'user{user_id}', password_hash='x',
+                first_name=first, last_name=last, workspace_id=workspace_id, active=True)
+
+
+class TestNameIndex:
+    def test_full_name_and_unique_first_name(self, index):
+        assert [(r.user_id, r.match_method, r.match_confidence) for r in index.candidates('Sarah Connor')] == \
+            [(1, 'exact_full_name', 1.0)]
+        top = index.candidates("Sarah's")[0]
+        assert (top.user_id, top.match_confidence) == (1, 1.0)
+
+    def test_nickname_and_phonetic(self, index):
+        bob = index.candidates('Bob Smith')
+        assert bob[0].user_id == 2 and bob[0].match_method == 'nickname'
+        assert bob[0].match_confidence == pytest.approx(0.95)
+
+        sara = index.candidates('Sara')[0]
+        assert (sara.user_id, sara.match_method) == (1, 'phonetic')
+        assert soundex('sarah') == soundex('sara') == 'S600'
+
+    def test_misspelling_falls_back_to_trigrams(self, index):
+        assert index.candidates('Mcalister')[0].match_method == 'phonetic'
+        result = index.candidates('Konnor')[0]   # Different first letter, so no Soundex match
+        assert (result.user_id, result.match_method) == (1, 'fuzzy')
+        assert 0 < result.match_confidence < 0.7
+
+    def test_ambiguous_first_name_splits_confidence(self, index):
+        results = index.candidates('John')
+        assert {r.user_id for r in results[:2]} == {3, 4}
+        assert all(r.match_method == 'ambiguous' and r.match_confidence == 0.5 for r in results[:2])
+        assert index.candidates('John Doe')[0].user_id == 4
+
+
+class TestService:
+    def test_match_user_applies_confidence_threshold(self, index, monkeypatch):
+        service = UserMatchingService(min_confidence=0.7)
+        monkeypatch.setattr(service, 'build_index', lambda workspace_id: index)
+
+        assert service.match_user('Kat', workspace_id=1).user_id == 5
+        ambiguous = service.match_user('John', workspace_id=1)
+        assert not ambiguous.success and ambiguous.match_method == 'ambiguous'
+        assert service.match_user('Unknown').match_method == 'no_name_provided'
+        assert service.match_user('Sarah').match_method == 'name_stored_only'   # No workspace context
+
+    def test_batch_builds_index_once(self, index, monkeypatch):
+        service = UserMatchingService()
+        builds = []
+        monkeypatch.setattr(service, 'build_index', lambda workspace_id: builds.append(workspace_id) or index)
+
+        results = service.match_users(['Sarah', 'Bob Smith', 'Sarah', 'Zed'], workspace_id=1)
+        mentions = service.resolve_transcript_names(
+            ['Sarah: can Bob take the budget?', 'I will loop in Katherine Nguyen.'], workspace_id=1
+        )
+
+        assert builds == [1]
+        assert [results[name].user_id for name in ('Sarah', 'Bob Smith', 'Zed')] == [1, 2, None]
+        assert {name: r.user_id for name, r in mentions.items()} == {'Sarah': 1, 'Bob': 2, 'Katherine Nguyen': 5}
+
+
+class TestMembershipChanges:
+    def test_index_is_built_from_workspace_members(self, matching_app):
+        db.session.add_all([_user(1, 'Sarah', 'Connor'), _user(2, 'Sarah', 'Lee', workspace_id=2)])
+        db.session.commit()
+
+        result = UserMatchingService().match_user('Sarah', workspace_id=1)
+        assert (result.success, result.user_id) == (True, 1)
+
+    def test_commit_invalidates_changed_workspace(self, matching_app):
+        service = get_user_matching_service()
+        service.invalidate()
+        db.session.add(_user(1, 'Sarah', 'Connor'))
+        db.session.commit()
+        assert service.match_user('Sarah', workspace_id=1).success
+
+        db.session.add(_user(2, 'Sarah', 'Lee'))
+        db.session.commit()
+        assert service.match_user('Sarah', workspace_id=1).match_method == 'ambiguous'
+
+        db.session.get(User, 2).first_name = 'Sally'
+        db.session.commit()
+        assert service.match_user('Sarah', workspace_id=1).user_id == 1
+        assert service.stats['index_builds'] >= 3
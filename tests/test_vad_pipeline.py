@@ -0,0 +1,127 @@
+"""
+VAD Pipeline Tests
+Batched frame spectra, bounded rolling state and the energy-only fast tier of
+VADService.
+"""
+
+import numpy as np
+import pytest
+
+from services.vad_service import FrameSpectrumAnalyzer, VADConfig, VADService
+
+SAMPLE_RATE = 16000
+
+
+def _tone(freq, samples, amplitude=0.3, seed=37):
+    t = np.arange(samples) / SAMPLE_RATE
+    noise = np.random.default_rng(seed).normal(0, 0.001, samples)
+    return (amplitude * np.sin(2 * np.pi * freq * t) + noise).astype(np.float32)
+
+
+def _bytes(audio):
+    return (np.clip(audio, -1, 1) * 32767).astype(np.int16).tobytes()
+
+
+@pytest.fixture
+def analyzer():
+    service = VADService(VADConfig())
+    return service.spectrum_analyzer
+
+
+class TestFrameSpectrumAnalyzer:
+    def test_batch_matches_per_frame_fft(self, analyzer):
+        audio = _tone(440, 1000)
+        spectrum = analyzer.analyze(audio)
+
+        # 3 full frames plus one end-aligned frame for the 40-sample remainder
+        starts = [0, 320, 640, 1000 - 320]
+        per_frame = [np.abs(np.fft.rfft(audio[s:s + 320] * np.hanning(320), n=512)) for s in starts]
+        assert spectrum.frame_count == 4
+        np.testing.assert_allclose(spectrum.magnitude, np.mean(per_frame, axis=0), rtol=1e-4, atol=1e-6)
+        np.testing.assert_allclose(spectrum.power, np.mean(np.square(per_frame), axis=0), rtol=1e-4, atol=1e-8)
+
+    def test_masks_are_precomputed_for_the_frame_size(self, analyzer):
+        assert analyzer.n_fft == 512
+        assert analyzer.band_matrix.shape == (5, len(analyzer.freqs))
+        assert analyzer.pre_emphasis_gain[0] == pytest.approx(0.03)
+
+    def test_tone_lands_in_its_band(self):
+        service = VADService(VADConfig())
+        spectrum = service.spectrum_analyzer.analyze(_tone(1000, 3200))
+        bands = service._analyze_frequency_bands(spectrum)
+        low = service._calculate_enhanced_spectral_features(service.spectrum_analyzer.analyze(_tone(500, 3200)))
+        high = service._calculate_enhanced_spectral_features(service.spectrum_analyzer.analyze(_tone(3000, 3200)))
+        assert bands['band_2_energy'] > 0.95
+        assert low['spectral_centroid'] < 2500 < high['spectral_centroid']
+        assert FrameSpectrumAnalyzer(SAMPLE_RATE, 480, service.frequency_bands).n_fft == 512
+
+
+class TestRollingState:
+    def test_only_previous_spectrum_is_kept(self):
+        service = VADService(VADConfig(min_speech_duration=40))
+        for i in range(100):
+            result = service.process_audio_chunk(_bytes(_tone(200 + i, 1600, seed=i)), i * 0.1)
+        assert not hasattr(service, 'spectral_history')
+        assert service._previous_spectrum.shape == service.spectrum_analyzer.freqs.shape
+        assert result.spectral_features['spectral_flux'] > 0
+
+        service.reset_state()
+        assert service._previous_spectrum is None
+
+    def test_noise_floor_is_cached_until_a_sample_is_added(self, monkeypatch):
+        service = VADService(VADConfig())
+        service.noise_samples.extend([0.001, 0.002, 0.003, 0.004, 0.005, 0.006])
+        calls = []
+        real_percentile = np.percentile
+        monkeypatch.setattr(np, 'percentile', lambda *a, **k: calls.append(1) or real_percentile(*a, **k))
+
+        first = service._estimate_noise_level(0.01)['estimated_snr']
+        assert service._estimate_noise_level(0.01)['estimated_snr'] == first
+        assert len(calls) == 1
+
+        service.current_state = 'silence'
+        service._update_environmental_profile({}, {'noise_level': 0.5, 'estimated_snr': 0.0})
+        service._estimate_noise_level(0.01)
+        assert len(calls) == 2
+
+    def test_summary_results_skip_feature_dicts(self):
+        service = VADService(VADConfig(detailed_results=False))
+        result = service.process_audio_chunk(_bytes(_tone(300, 1600)), 0.0)
+        assert not hasattr(result, 'spectral_features')
+        assert not hasattr(result, 'adaptive_thresholds')
+
+
+class TestFastTier:
+    def _count_spectral_calls(self, service, monkeypatch):
+        calls = []
+        original = service.spectrum_analyzer.analyze
+        monkeypatch.setattr(service.spectrum_analyzer, 'analyze', lambda audio: calls.append(1) or original(audio))
+        return calls
+
+    def test_decisive_energy_skips_spectral_work(self, monkeypatch):
+        service = VADService(VADConfig(tier='fast'))
+        calls = self._count_spectral_calls(service, monkeypatch)
+
+        quiet = service.process_audio_chunk(_bytes(_tone(300, 1600, amplitude=0.002)), 0.0)
+        loud = service.process_audio_chunk(_bytes(_tone(300, 1600, amplitude=0.5)), 0.1)
+
+        assert calls == []
+        assert (quiet.tier, quiet.confidence, quiet.quality_score) == ('fast', 0.0, None)
+        assert loud.tier == 'fast' and loud.confidence == 1.0
+        assert service.get_enhanced_statistics()['fast_path_frames'] == 2
+
+    def test_ambiguous_energy_runs_full_analysis(self, monkeypatch):
+        service = VADService(VADConfig(tier='fast'))
+        calls = self._count_spectral_calls(service, monkeypatch)
+        threshold = service.adaptive_thresholds['energy']
+
+        result = service.process_audio_chunk(_bytes(_tone(300, 1600, amplitude=threshold * 3 * np.sqrt(2))), 0.0)
+
+        assert calls == [1]
+        assert result.tier == 'full' and 'spectral_centroid' in result.spectral_features
+
+    def test_tier_defaults_from_environment(self, monkeypatch):
+        monkeypatch.setenv('VAD_TIER', 'fast')
+        assert VADConfig().tier == 'fast'
+        monkeypatch.delenv('VAD_TIER')
+        assert VADConfig().tier == 'full'